@@ -35,6 +35,7 @@ The database (DB) organizes data under DB, which stores:
 import json
 from typing import Dict, Any
 from common_utils.phone_utils import normalize_phone_number
+from common_utils.tracked_db import track_changes
 
 # ---------------------------------------------------------------------------------------
 # In-Memory BigQuery Database Structure
@@ -60,7 +61,9 @@ from common_utils.phone_utils import normalize_phone_number
 #
 #   - 'expiration_time': Timestamp when the table expires
 
-DB: Dict[str, Any] = {
+# Tracked down to single tables (DB['projects'][i]['datasets'][j]['tables'][k]) so
+# that the SQLite mirror used by execute_query only reloads the tables that changed
+DB: Dict[str, Any] = track_changes({
  'projects': [
             {'datasets': [
                     {'dataset_id': 'user-activity-logs',
@@ -915,7 +918,7 @@ DB: Dict[str, Any] = {
                     }
                 ]
            
-            }
+            }, path_depth=6)
 
 
 
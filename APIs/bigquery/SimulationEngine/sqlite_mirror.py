@@ -0,0 +1,249 @@
+"""
+In-memory SQLite mirror of the BigQuery DB used by execute_query.
+
+Loading the whole DB into a fresh SQLite database for every query makes the
+cost of a query grow with the size of the project instead of the table being
+queried. The mirror keeps one in-memory SQLite connection alive and, before
+each query, reloads only the tables that changed since the previous one.
+
+Changes are detected with the ChangeTracker of the DB (see
+common_utils.tracked_db): the DB is tracked down to single tables, so a
+change anywhere inside DB['projects'][i]['datasets'][j]['tables'][k] marks
+that table dirty, and a change of a containing list or dict marks every table
+below it. Tables that were added, removed or replaced are detected by object
+identity. An untracked DB is reloaded completely on every query.
+
+As with load_db_dict_to_sqlite, tables are named by their table_id only;
+tables sharing a table_id are loaded into one SQLite table, using the schema
+of the first one.
+"""
+import json
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from common_utils.print_log import print_log
+from common_utils.tracked_db import get_change_tracker
+
+_SQLITE_TYPES = {
+    "STRING": "TEXT",
+    "INT64": "INTEGER",
+    "NUMERIC": "REAL",
+    "BIGNUMERIC": "REAL",
+    "FLOAT64": "REAL",
+    "BOOLEAN": "INTEGER",
+    "TIMESTAMP": "TEXT",
+    "DATE": "TEXT",
+    "DATETIME": "TEXT",
+    "TIME": "TEXT",
+    "BYTES": "BLOB",
+    "JSON": "TEXT",
+    "ARRAY": "TEXT",
+    "STRUCT": "TEXT",
+}
+
+TablePosition = Tuple[int, int, int]
+
+
+def _convert_json(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        try:
+            return json.dumps(value)
+        except TypeError:
+            return None  # Store as None if serialization fails
+    # If it's not a dict/list but a text type, store as is, otherwise None
+    return str(value) if isinstance(value, (str, int, float, bool)) else None
+
+
+def _convert_boolean(value: Any) -> Any:
+    return 1 if value else 0
+
+
+def _column_converter(bq_type: str) -> Optional[Callable[[Any], Any]]:
+    """Converter applied to the non-None values of a column, or None to store them as is."""
+    if bq_type in ("JSON", "ARRAY", "STRUCT"):
+        return _convert_json
+    if bq_type == "BOOLEAN":
+        return _convert_boolean
+    return None
+
+
+class _TablePlan:
+    """CREATE/INSERT statements and per-column conversions for one table schema."""
+
+    def __init__(self, table_id: str, schema: List[Dict[str, Any]]):
+        self.table_id = table_id
+        self.column_names = [field["name"] for field in schema]
+        quoted_names = [f'"{name}"' for name in self.column_names]
+        bq_types = [field["type"].upper() for field in schema]
+        self.converters = [_column_converter(bq_type) for bq_type in bq_types]
+        column_definitions = [
+            f"{quoted} {_SQLITE_TYPES.get(bq_type, 'TEXT')}" for quoted, bq_type in zip(quoted_names, bq_types)
+        ]
+        self.create_sql = f'CREATE TABLE IF NOT EXISTS "{table_id}" ({", ".join(column_definitions)});'
+        placeholders = ", ".join(["?"] * len(quoted_names))
+        self.insert_sql = f'INSERT INTO "{table_id}" ({", ".join(quoted_names)}) VALUES ({placeholders})'
+
+    def row_values(self, row: Dict[str, Any]) -> List[Any]:
+        values = []
+        for name, converter in zip(self.column_names, self.converters):
+            value = row.get(name)
+            values.append(None if value is None else converter(value) if converter else value)
+        return values
+
+    def create(self, cursor: sqlite3.Cursor) -> bool:
+        try:
+            cursor.execute(self.create_sql)
+            return True
+        except sqlite3.OperationalError as e:
+            print_log(f"Error creating table {self.table_id}: {e}. SQL: {self.create_sql}")
+            return False
+
+    def insert(self, cursor: sqlite3.Cursor, rows: List[Dict[str, Any]]):
+        """Inserts rows one by one, logging (and skipping) the rows SQLite rejects."""
+        for row in rows:
+            values = self.row_values(row)
+            try:
+                cursor.execute(self.insert_sql, values)
+            except sqlite3.Error as e:
+                print_log(f"Error inserting row into {self.table_id}: {e}. SQL: {self.insert_sql}. Values: {values}")
+
+    def insert_many(self, cursor: sqlite3.Cursor, rows: List[Dict[str, Any]]):
+        """Bulk version of insert; falls back to insert when a row is rejected."""
+        if not rows:
+            return
+        cursor.execute("SAVEPOINT bulk_insert")
+        try:
+            cursor.executemany(self.insert_sql, [self.row_values(row) for row in rows])
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT bulk_insert")
+            cursor.execute("RELEASE SAVEPOINT bulk_insert")
+            self.insert(cursor, rows)
+            return
+        cursor.execute("RELEASE SAVEPOINT bulk_insert")
+
+
+def load_table(cursor: sqlite3.Cursor, table: Dict[str, Any], bulk: bool = False) -> bool:
+    """
+    Creates a DB table in SQLite (if needed) and inserts its rows.
+
+    Returns:
+        bool: False if the table could not be created.
+    """
+    plan = _TablePlan(table["table_id"], table["schema"])
+    if not plan.create(cursor):
+        return False
+    rows = table.get("rows", [])
+    if bulk:
+        plan.insert_many(cursor, rows)
+    else:
+        plan.insert(cursor, rows)
+    return True
+
+
+def iter_tables(db: Dict[str, Any]):
+    """Yields ((project, dataset, table) index, table) for every table of the DB, in DB order."""
+    for i, project in enumerate(db.get("projects", [])):
+        for j, dataset in enumerate(project.get("datasets", [])):
+            for k, table in enumerate(dataset.get("tables", [])):
+                yield (i, j, k), table
+
+
+class SqliteMirror:
+    """Keeps an in-memory SQLite copy of a BigQuery DB dict up to date."""
+
+    def __init__(self):
+        # Held while syncing and while a query runs on the shared connection
+        self.lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db: Optional[Dict[str, Any]] = None
+        self._version: Optional[int] = None
+        # SQLite table name -> DB tables loaded into it, in DB order
+        self._loaded: Dict[str, List[Dict[str, Any]]] = {}
+
+    def connection(self, db: Dict[str, Any]) -> sqlite3.Connection:
+        """
+        Brings the mirror up to date with `db` and returns its connection.
+
+        The connection is shared: callers must not close it, and should hold
+        `lock` until they are done with it.
+        """
+        with self.lock:
+            tracker = get_change_tracker(db)
+            if tracker is not None and db is self._db and tracker.version == self._version:
+                return self._conn
+            version = tracker.version if tracker is not None else None
+            changes = None
+            if tracker is not None and db is self._db and self._version is not None:
+                changes = tracker.changes_since(self._version)
+            self._sync(db, changes)
+            self._db = db
+            self._version = version
+            return self._conn
+
+    def reset(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._db = None
+            self._version = None
+            self._loaded = {}
+
+    def _sync(self, db: Dict[str, Any], changes: Optional[List[Tuple]]):
+        if self._conn is None:
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        groups: Dict[str, List[Tuple[TablePosition, Dict[str, Any]]]] = {}
+        for position, table in iter_tables(db):
+            groups.setdefault(table["table_id"], []).append((position, table))
+
+        if changes is None:
+            dirty = set(groups) | set(self._loaded)
+        else:
+            changed_paths = set(changes)
+            dirty = {name for name in self._loaded if name not in groups}
+            for name, members in groups.items():
+                loaded = self._loaded.get(name)
+                if (
+                    loaded is None
+                    or len(loaded) != len(members)
+                    or any(a is not b for a, (_, b) in zip(loaded, members))
+                    or any(_is_changed(position, changed_paths) for position, _ in members)
+                ):
+                    dirty.add(name)
+
+        if not dirty:
+            return
+        cursor = self._conn.cursor()
+        try:
+            for name in dirty:
+                cursor.execute(f'DROP TABLE IF EXISTS "{name}"')
+                self._loaded.pop(name, None)
+                members = groups.get(name)
+                if not members:
+                    continue
+                for _, table in members:
+                    if load_table(cursor, table, bulk=True):
+                        self._loaded.setdefault(name, []).append(table)
+                if len(self._loaded.get(name, ())) != len(members):
+                    # Keep the group dirty so that it is retried on the next sync
+                    self._loaded[name] = []
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            # The mirror may be partially updated; rebuild it from scratch next time
+            self._version = None
+            self._db = None
+            self._loaded = {name: [] for name in set(self._loaded) | dirty}
+            raise
+        finally:
+            cursor.close()
+
+
+def _is_changed(position: TablePosition, changed_paths: set) -> bool:
+    i, j, k = position
+    path = ("projects", i, "datasets", j, "tables", k)
+    return any(path[:depth] in changed_paths for depth in range(len(path) + 1))
+
+
+sqlite_mirror = SqliteMirror()
@@ -34,6 +34,7 @@ from typing import Any, Dict, Optional, List
 from .models import BigQueryDatabase, Table, FieldMode
 from .custom_errors import InvalidInputError
 from .db import DB
+from .sqlite_mirror import load_table
 
 class DateTimeEncoder(json.JSONEncoder):
     """Custom JSON encoder for datetime objects."""
@@ -529,68 +530,7 @@ def load_db_dict_to_sqlite(DB: Dict[str, Any]) -> sqlite3.Connection:
     for project_entry in projects_list:
         for dataset in project_entry.get("datasets", []):
             for table in dataset.get("tables", []):
-                table_id = table["table_id"]
-                schema = table["schema"]
-                rows = table.get("rows", [])
-
-                columns_sql_definitions = []
-                column_processing_info = [] 
-
-                for field in schema:
-                    name = field["name"]
-                    bq_type = field["type"].upper() 
-                    quoted_name = f'"{name}"' 
-
-                    sqlite_type = "TEXT" 
-                    if bq_type == "STRING": sqlite_type = "TEXT"
-                    elif bq_type == "INT64": sqlite_type = "INTEGER"
-                    elif bq_type in ["NUMERIC", "BIGNUMERIC", "FLOAT64"]: sqlite_type = "REAL"
-                    elif bq_type == "BOOLEAN": sqlite_type = "INTEGER" 
-                    elif bq_type in ["TIMESTAMP", "DATE", "DATETIME", "TIME"]: sqlite_type = "TEXT"
-                    elif bq_type == "BYTES": sqlite_type = "BLOB"
-                    elif bq_type in ["JSON", "ARRAY", "STRUCT"]: sqlite_type = "TEXT"
-                    
-                    columns_sql_definitions.append(f'{quoted_name} {sqlite_type}')
-                    column_processing_info.append({"name": name, "bq_type": bq_type, "quoted_name": quoted_name})
-
-                create_sql = f'CREATE TABLE IF NOT EXISTS "{table_id}" ({", ".join(columns_sql_definitions)});'
-                try:
-                    cursor.execute(create_sql)
-                except sqlite3.OperationalError as e:
-                    print_log(f"Error creating table {table_id}: {e}. SQL: {create_sql}")
-                    continue 
-
-                if rows:
-                    col_names_for_insert_sql = [info['quoted_name'] for info in column_processing_info]
-                    placeholders = ", ".join(["?"] * len(col_names_for_insert_sql))
-                    insert_sql = f'INSERT INTO "{table_id}" ({", ".join(col_names_for_insert_sql)}) VALUES ({placeholders})'
-
-                    for row_idx, row_data in enumerate(rows):
-                        values_for_sql: List[Any] = [] # Explicitly type as List[Any]
-                        for col_info in column_processing_info:
-                            raw_value = row_data.get(col_info["name"])
-
-                            if raw_value is None:
-                                values_for_sql.append(None)
-                            elif col_info["bq_type"] in ["JSON", "ARRAY", "STRUCT"]:
-                                if isinstance(raw_value, (dict, list)):
-                                    try:
-                                        values_for_sql.append(json.dumps(raw_value))
-                                    except TypeError:
-                                        values_for_sql.append(None) # Store as None if serialization fails
-                                else:
-                                    # If it's not a dict/list but a text type, store as is, otherwise None
-                                    values_for_sql.append(str(raw_value) if isinstance(raw_value, (str, int, float, bool)) else None)
-                            elif col_info["bq_type"] == "BOOLEAN":
-                                # Handle None for BOOLEAN correctly for nullable booleans
-                                values_for_sql.append(1 if raw_value else 0 if raw_value is not None else None)
-                            else:
-                                values_for_sql.append(raw_value)
-                        
-                        try:
-                            cursor.execute(insert_sql, values_for_sql)
-                        except sqlite3.Error as e:
-                            print_log(f"Error inserting row into {table_id}: {e}. SQL: {insert_sql}. Values: {values_for_sql}")
+                load_table(cursor, table)
 
     conn.commit()
     return conn
@@ -625,7 +565,8 @@ def create_project(project_id: str) -> Dict[str, Any]:
         'datasets': []
     }
     DB['projects'].append(new_project)
-    return new_project
+    # The DB stores a (change-tracked) copy; return the stored dict
+    return DB['projects'][-1]
 
 def create_dataset(project_id: str, dataset_id: str) -> Dict[str, Any]:
     """
@@ -652,7 +593,7 @@ def create_dataset(project_id: str, dataset_id: str) -> Dict[str, Any]:
     if 'datasets' not in project: # Should have been initialized by create_project if new
         project['datasets'] = []
     project['datasets'].append(new_dataset)
-    return new_dataset
+    return project['datasets'][-1]
 
 def create_table(
     project_id: str, 
@@ -705,7 +646,7 @@ def create_table(
     if 'tables' not in dataset: # Should have been initialized by create_dataset if new
         dataset['tables'] = []
     dataset['tables'].append(new_table)
-    return new_table
+    return dataset['tables'][-1]
 
 def insert_rows(
     project_id: str, 
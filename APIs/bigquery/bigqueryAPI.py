@@ -12,9 +12,9 @@ from .SimulationEngine.custom_errors import (
 )
 from .SimulationEngine.utils import (
     parse_full_table_name,
-    load_db_dict_to_sqlite,
     validate_and_normalize_phone_numbers_in_data
 )
+from .SimulationEngine.sqlite_mirror import sqlite_mirror
 from datetime import datetime
 
 
@@ -635,50 +635,24 @@ def execute_query(query: str) -> Dict[str, List[Dict[str, Any]]]:
     # Initialize tracking variables
     bytes_processed = 0
     rows_processed = 0
-    conn = None
+    cursor = None
+
+    # Replace FQDN with just the table name, quoted.
+    # This assumes `full_table_name` is unique enough not to clash with column names or aliases.
+    # And that it's the direct reference in FROM/JOIN.
+    # Example: project-id.dataset-id.table-name -> "table-name"
+    sqlite_query = query.replace(full_table_name, f'"{table_id}"')
     try:
-        # Get database connection
-        conn = load_db_dict_to_sqlite(DB)
-        cursor = conn.cursor()
-
-        # Modify query to properly quote table names with hyphens for SQLite
-        # This simple replace might be problematic if full_table_name is a substring of another identifier
-        # A more robust way would be to parse the query or use regex with word boundaries.
-        # For now, assuming simple table references.
-        # Example: project-id.dataset-id.table-name -> "table-name"
-        # This replacement needs to be careful if `full_table_name` can appear elsewhere
-        # or if the query involves aliases that match `full_table_name`.
-        # A safer replacement would target `full_table_name` specifically after FROM or JOIN.
-        # Consider the query: SELECT col FROM project.dataset.table WHERE table.col = 1
-        # If full_table_name is "project.dataset.table", replacing it with "table"
-        # would break "table.col". The current code uses table_id.
-
-        # Current replacement logic:
-        # sqlite_query = query.replace(full_table_name, f'"{table_id}"')
-        # This is risky. If query is "SELECT a.name FROM project-foo.dataset-bar.table-baz AS a"
-        # and full_table_name is "project-foo.dataset-bar.table-baz",
-        # table_id is "table-baz". The replacement becomes "SELECT a.name FROM "table-baz" AS a"
-        # This should be okay for the FROM clause.
-
-        # A regex based replacement for the FROM clause part:
-        # Pattern to find 'FROM project.dataset.table' or 'JOIN project.dataset.table'
-        # and replace 'project.dataset.table' with '"table"'
-
-        # Replace FQDN with just the table name, quoted.
-        # This assumes `full_table_name` is unique enough not to clash with column names or aliases.
-        # And that it's the direct reference in FROM/JOIN.
-
-        # To make replacement safer, target only the FQDN after FROM or JOIN keywords.
-        # This is complex due to potential aliases and subqueries.
-        # The original simple replacement:
-        sqlite_query = query.replace(full_table_name, f'"{table_id}"')
-
-        # Execute query
-        cursor.execute(sqlite_query)
-        rows = cursor.fetchall()
-        column_names = (
-            [desc[0] for desc in cursor.description] if cursor.description else []
-        )
+        # The mirror only reloads the tables that changed since the last query
+        with sqlite_mirror.lock:
+            cursor = sqlite_mirror.connection(DB).cursor()
+
+            # Execute query
+            cursor.execute(sqlite_query)
+            rows = cursor.fetchall()
+            column_names = (
+                [desc[0] for desc in cursor.description] if cursor.description else []
+            )
 
         # Process results
         query_results = []
@@ -731,7 +705,7 @@ def execute_query(query: str) -> Dict[str, List[Dict[str, Any]]]:
             row_dict = validate_and_normalize_phone_numbers_in_data(row_dict)
             query_results.append(row_dict)
 
-        conn.close()
+        cursor.close()
 
         # bytes processed and rows processed are not used in the BigQuery emulator - can be enable in future implementaitons
         # return {"query_results": query_results, "bytes_processed": bytes_processed, "rows_processed": rows_processed}
@@ -739,8 +713,8 @@ def execute_query(query: str) -> Dict[str, List[Dict[str, Any]]]:
         return {"query_results": query_results}
 
     except Exception as e:
-        if conn:  # Ensure connection is closed if error occurs after opening
-            conn.close()
+        if cursor:  # Ensure cursor is closed if error occurs after opening
+            cursor.close()
         # Refine error message for "no such table"
         if "no such table" in str(e):
             raise InvalidQueryError(
@@ -206,19 +206,20 @@ class TestExecuteQueryComprehensive(unittest.TestCase):
         """Test execute_query with connection error handling."""
         query = "SELECT * FROM test-project.test_dataset.test_table"
         
-        with patch('bigquery.bigqueryAPI.load_db_dict_to_sqlite') as mock_load:
+        with patch('bigquery.bigqueryAPI.sqlite_mirror') as mock_mirror:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             mock_conn.cursor.return_value = mock_cursor
             mock_cursor.execute.side_effect = sqlite3.Error("Database locked")
-            mock_load.return_value = mock_conn
+            mock_mirror.connection.return_value = mock_conn
             
             with self.assertRaises(InvalidQueryError) as context:
                 execute_query(query)
             
             self.assertIn("SQLite execution error", str(context.exception))
-            # Verify connection was closed
-            mock_conn.close.assert_called_once()
+            # Verify the cursor was closed and the shared connection left open
+            mock_cursor.close.assert_called_once()
+            mock_conn.close.assert_not_called()
 
     def test_execute_query_with_complex_json_parsing(self):
         """Test query with complex JSON parsing scenarios."""
@@ -404,7 +405,7 @@ class TestExecuteQueryComprehensive(unittest.TestCase):
         })
         
         # Mock the database to return a custom object type
-        with patch('bigquery.bigqueryAPI.load_db_dict_to_sqlite') as mock_load:
+        with patch('bigquery.bigqueryAPI.sqlite_mirror') as mock_mirror:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             mock_conn.cursor.return_value = mock_cursor
@@ -420,7 +421,7 @@ class TestExecuteQueryComprehensive(unittest.TestCase):
             mock_cursor.description = [("id",), ("custom_data",)]
             mock_cursor.fetchall.return_value = [(1, CustomObject("test"))]
             
-            mock_load.return_value = mock_conn
+            mock_mirror.connection.return_value = mock_conn
             
             query = "SELECT * FROM test-project.test_dataset.other_types_test_table"
             result = execute_query(query)
@@ -429,8 +430,9 @@ class TestExecuteQueryComprehensive(unittest.TestCase):
             self.assertIn("query_results", result)
             self.assertEqual(len(result["query_results"]), 1)
             
-            # Verify connection was closed
-            mock_conn.close.assert_called_once()
+            # Verify the cursor was closed and the shared connection left open
+            mock_cursor.close.assert_called_once()
+            mock_conn.close.assert_not_called()
 
     def test_execute_query_with_complex_data_types(self):
         """Test execute_query with complex data types to ensure bytes tracking works."""
@@ -0,0 +1,178 @@
+"""
+Tests for the in-memory SQLite mirror used by execute_query.
+
+These tests check that the mirror reloads exactly the tables that changed in
+the DB, whether they were changed through the utility functions, load_state,
+or by mutating the DB dict directly.
+"""
+
+import copy
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from common_utils.tracked_db import track_changes
+
+from .. import execute_query
+from ..SimulationEngine import sqlite_mirror as sqlite_mirror_module
+from ..SimulationEngine.db import DB, load_state
+from ..SimulationEngine.sqlite_mirror import SqliteMirror, sqlite_mirror
+from ..SimulationEngine.utils import create_table, insert_rows
+
+SAMPLE_DB = {
+    "projects": [
+        {
+            "project_id": "proj",
+            "datasets": [
+                {
+                    "dataset_id": "ds",
+                    "tables": [
+                        {
+                            "table_id": "users",
+                            "schema": [
+                                {"name": "id", "type": "INT64", "mode": "REQUIRED"},
+                                {"name": "name", "type": "STRING", "mode": "NULLABLE"},
+                                {"name": "active", "type": "BOOLEAN", "mode": "NULLABLE"},
+                                {"name": "tags", "type": "JSON", "mode": "NULLABLE"},
+                            ],
+                            "rows": [
+                                {"id": 1, "name": "Alice", "active": True, "tags": ["a"]},
+                                {"id": 2, "name": "Bob", "active": False, "tags": None},
+                            ],
+                        },
+                        {
+                            "table_id": "orders",
+                            "schema": [
+                                {"name": "id", "type": "INT64", "mode": "REQUIRED"},
+                                {"name": "user_id", "type": "INT64", "mode": "REQUIRED"},
+                            ],
+                            "rows": [{"id": 10, "user_id": 1}],
+                        },
+                    ],
+                }
+            ],
+        }
+    ]
+}
+
+
+class TestSqliteMirror(BaseTestCaseWithErrorHandler):
+    """Test suite for SqliteMirror."""
+
+    def setUp(self):
+        self._original_db = copy.deepcopy(DB)
+        DB.clear()
+        DB.update(copy.deepcopy(SAMPLE_DB))
+        self.loaded_tables = []
+        original_load_table = sqlite_mirror_module.load_table
+
+        def recording_load_table(cursor, table, bulk=False):
+            self.loaded_tables.append(table["table_id"])
+            return original_load_table(cursor, table, bulk)
+
+        patcher = patch.object(sqlite_mirror_module, "load_table", side_effect=recording_load_table)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Bring the shared mirror up to date before each test
+        execute_query("SELECT id FROM proj.ds.users")
+        self.loaded_tables.clear()
+
+    def tearDown(self):
+        DB.clear()
+        DB.update(self._original_db)
+
+    def _users_table(self):
+        return DB["projects"][0]["datasets"][0]["tables"][0]
+
+    def test_unchanged_db_is_not_reloaded(self):
+        result = execute_query("SELECT name FROM proj.ds.users ORDER BY id")
+
+        self.assertEqual([r["name"] for r in result["query_results"]], ["Alice", "Bob"])
+        self.assertEqual(self.loaded_tables, [])
+
+    def test_insert_rows_reloads_only_that_table(self):
+        insert_rows("proj", "ds", "orders", [{"id": 11, "user_id": 2}])
+
+        result = execute_query("SELECT id FROM proj.ds.orders ORDER BY id")
+
+        self.assertEqual([r["id"] for r in result["query_results"]], [10, 11])
+        self.assertEqual(self.loaded_tables, ["orders"])
+
+    def test_direct_row_mutation_is_picked_up(self):
+        self._users_table()["rows"][0]["name"] = "Alicia"
+
+        result = execute_query("SELECT name FROM proj.ds.users WHERE id = 1")
+
+        self.assertEqual(result["query_results"], [{"name": "Alicia"}])
+        self.assertEqual(self.loaded_tables, ["users"])
+
+    def test_create_table_is_queryable(self):
+        create_table("proj", "other_ds", "events", [{"name": "kind", "type": "STRING", "mode": "NULLABLE"}])
+        insert_rows("proj", "other_ds", "events", [{"kind": "click"}])
+
+        result = execute_query("SELECT kind FROM proj.other_ds.events")
+
+        self.assertEqual(result["query_results"], [{"kind": "click"}])
+        self.assertEqual(self.loaded_tables, ["events"])
+
+    def test_rows_added_to_the_created_table_are_picked_up(self):
+        table = create_table("proj", "other_ds", "events", [{"name": "kind", "type": "STRING", "mode": "NULLABLE"}])
+        execute_query("SELECT kind FROM proj.other_ds.events")
+        table["rows"].append({"kind": "view"})
+
+        result = execute_query("SELECT kind FROM proj.other_ds.events")
+
+        self.assertEqual(result["query_results"], [{"kind": "view"}])
+
+    def test_removed_table_is_dropped(self):
+        del DB["projects"][0]["datasets"][0]["tables"][1]
+
+        with self.assertRaises(Exception) as context:
+            execute_query("SELECT id FROM proj.ds.orders")
+        self.assertIn("not found", str(context.exception))
+
+    def test_load_state_reloads_everything(self):
+        state = copy.deepcopy(SAMPLE_DB)
+        state["projects"][0]["datasets"][0]["tables"][0]["rows"] = [{"id": 7, "name": "Zed"}]
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(state, f)
+        self.addCleanup(os.remove, f.name)
+
+        load_state(f.name)
+        result = execute_query("SELECT id, name FROM proj.ds.users")
+
+        self.assertEqual(result["query_results"], [{"id": 7, "name": "Zed"}])
+        self.assertEqual(sorted(self.loaded_tables), ["orders", "users"])
+
+    def test_column_conversions(self):
+        result = execute_query("SELECT active, tags FROM proj.ds.users ORDER BY id")
+
+        self.assertEqual(result["query_results"], [{"active": 1, "tags": ["a"]}, {"active": 0, "tags": None}])
+
+    def test_untracked_db_is_reloaded_on_every_sync(self):
+        mirror = SqliteMirror()
+        db = copy.deepcopy(SAMPLE_DB)
+
+        mirror.connection(db)
+        db["projects"][0]["datasets"][0]["tables"][1]["rows"].append({"id": 11, "user_id": 2})
+        rows = mirror.connection(db).execute('SELECT id FROM "orders" ORDER BY id').fetchall()
+
+        self.assertEqual(rows, [(10,), (11,)])
+        self.assertEqual(sorted(self.loaded_tables), ["orders", "orders", "users", "users"])
+
+    def test_separate_tracked_dbs(self):
+        mirror = SqliteMirror()
+        first = track_changes(copy.deepcopy(SAMPLE_DB), path_depth=6)
+        second = track_changes(copy.deepcopy(SAMPLE_DB), path_depth=6)
+        second["projects"][0]["datasets"][0]["tables"][1]["rows"].clear()
+
+        self.assertEqual(mirror.connection(first).execute('SELECT COUNT(*) FROM "orders"').fetchone(), (1,))
+        self.assertEqual(mirror.connection(second).execute('SELECT COUNT(*) FROM "orders"').fetchone(), (0,))
+        self.assertIs(sqlite_mirror_module.sqlite_mirror, sqlite_mirror)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,17 @@ from .SimulationEngine.custom_errors import LLMExecutionError, ValidationError
 from typing import Optional, List, Dict, Any
 from .SimulationEngine.models import ToolContainer
 from pydantic import ValidationError as PydanticValidationError
+from common_utils.llm_gateway import LLMRequest, LLMResponse, llm_gateway, usage_of
+
+
+def _request_extras(files: Optional[List[str]], tools: Optional[List[Tool]] = None) -> List[str]:
+    """The uploaded files and the functions of the tools of a call, as part of its gateway request key."""
+    extras = [f"file:{file}" for file in files or []]
+    for tool in tools or []:
+        extras.extend(f"tool:{getattr(declaration, 'name', None)}"
+                      for declaration in getattr(tool, "function_declarations", None) or [])
+    return extras
+
 
 @tool_spec(
     spec={
@@ -190,7 +201,7 @@ def generate_llm_response(prompt: str,
         raise ValidationError(f"system_prompt must be a string got type {type(system_prompt)}.")
     # End of input validation
 
-    try:
+    def _generate(request: LLMRequest) -> LLMResponse:
         client = genai.Client(api_key=api_key)
         file_list = []
         if files is not None:
@@ -204,11 +215,16 @@ def generate_llm_response(prompt: str,
                 system_instruction=system_prompt
             )
         )
+        return LLMResponse(response.text, *usage_of(response), raw=response)
+
+    try:
+        return llm_gateway.complete(
+            LLMRequest(prompt, model_name, system_prompt=system_prompt, extras=_request_extras(files)),
+            service="call_llm", live=_generate,
+        )
     except Exception as e:
         raise LLMExecutionError(f"Model execution failed: {e}")
 
-    return response.text
-
 @tool_spec(
     spec={
         'name': 'generate_llm_response_with_tools',
@@ -340,7 +356,7 @@ def generate_llm_response_with_tools(prompt: str,
         raise ValidationError(f"All tools must be of type Tool got type {type(tools)}.")
     # End of input validation
     
-    try:
+    def _generate(request: LLMRequest) -> LLMResponse:
         client = genai.Client(api_key=api_key)
         file_list = []
         if files is not None:
@@ -355,10 +371,18 @@ def generate_llm_response_with_tools(prompt: str,
             tools=tools
         )
         )
+        return LLMResponse(response.text, *usage_of(response), raw=response)
+
+    try:
+        response = llm_gateway.respond(
+            LLMRequest(prompt, model_name, system_prompt=system_prompt, extras=_request_extras(files, tools)),
+            service="call_llm", live=_generate,
+        )
     except Exception as e:
         raise LLMExecutionError(f"Model execution failed: {e}")
 
-    function_call = response.candidates[0].content.parts[0].function_call
+    # Function calls come with the backend's response; replayed or offline answers are text only
+    function_call = response.raw.candidates[0].content.parts[0].function_call if response.raw is not None else None
     response_text = response.text
     return {
         "function_call": function_call,
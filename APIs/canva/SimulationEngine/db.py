@@ -3,6 +3,7 @@ import json
 import os
 from typing import Dict, Any
 from .db_models import CanvaDB
+from common_utils.tracked_db import track_changes
 # Define the default path to your JSON DB file
 DEFAULT_DB_PATH = os.path.join(
     os.path.dirname(
@@ -13,7 +14,7 @@ DEFAULT_DB_PATH = os.path.join(
 )
 
 # Initialize DB structure
-DB = {
+DB = track_changes({
     "Users": {},
     "Designs": {},
     "brand_templates": {},
@@ -24,7 +25,7 @@ DB = {
     "url_import_jobs": {},
     "assets": {},
     "folders": {}
-}
+}, path_depth=2)
 
 def load_default_data():
     """Load default database from DBs directory"""
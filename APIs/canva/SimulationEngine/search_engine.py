@@ -8,6 +8,11 @@ from .db import DB
 class ServiceAdapter(Adapter):
     """Adapter for converting Canva database into searchable documents."""
 
+    tracked_collections = (("Designs",),)
+
+    def get_tracked_db(self):
+        return DB
+
     def db_to_searchable_documents(self) -> List[SearchableDocument]:
         """
         Convert the Canva database into searchable documents.
@@ -15,16 +20,20 @@ class ServiceAdapter(Adapter):
         Returns:
             List[SearchableDocument]: List of searchable documents for all designs.
         """
-        searchable_documents = []
-        
-        # Get designs from the database
-        designs = DB.get("Designs", {})
-        
-        for design_id, design_data in designs.items():
-            searchable_doc = self._adapt_design(design_id, design_data)
-            searchable_documents.append(searchable_doc)
-        
-        return searchable_documents
+        return self.records_to_searchable_documents()
+
+    def record_to_searchable_documents(self, record_path, record) -> List[SearchableDocument]:
+        """
+        Convert a single design, stored at DB["Designs"][design_id], into searchable documents.
+
+        Args:
+            record_path (tuple): ("Designs", design_id).
+            record (Dict[str, Any]): The design data.
+
+        Returns:
+            List[SearchableDocument]: The searchable document for the design.
+        """
+        return [self._adapt_design(record_path[1], record)]
 
     def _adapt_design(self, design_id: str, design_data: Dict[str, Any]) -> SearchableDocument:
         """
@@ -156,7 +156,7 @@ class TestImports(BaseTestCaseWithErrorHandler):
             from canva.SimulationEngine.custom_errors import InvalidOwnershipError
             from canva.SimulationEngine.custom_errors import InvalidSortByError
 
-            assert type(DB) == dict
+            assert isinstance(DB, dict)
             assert issubclass(DesignTypeInputModel, BaseModel)
             assert issubclass(InvalidDesignIDError, Exception)
             assert issubclass(InvalidAssetIDError, Exception)
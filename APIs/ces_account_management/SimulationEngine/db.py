@@ -2,9 +2,10 @@ import os
 import json
 from typing import Dict, Any
 from .db_models import CesAccountManagementDB
+from common_utils.tracked_db import track_changes
 
 # Initialize empty database structure
-DB: Dict[str, Any] = {
+DB: Dict[str, Any] = track_changes({
     "error_simulator": {"_example_function_name": []},
     "accountDetails": {},
     "availablePlans": {},
@@ -14,7 +15,7 @@ DB: Dict[str, Any] = {
         "fail": None,
         "cancel": None
     },
-}
+})
 
 
 def save_state(filepath: str):
@@ -9,20 +9,19 @@ from .db import DB
 class ServiceAdapter(Adapter):
     """Adapter for converting CES Account Management database into searchable documents."""
 
+    tracked_collections = (("accountDetails", "*", "orders"),)
+
+    def get_tracked_db(self):
+        return DB
+
     def db_to_searchable_documents(self) -> List[SearchableDocument]:
         """Convert the CES Account Management database into searchable documents."""
-        searchable_documents = []
-
-        # Get orders from all accounts
-        account_details = DB.get("accountDetails", {})
-        for account_id, account_data in account_details.items():
-            orders = account_data.get("orders", {})
-            if orders:
-                for order_id, order_data in orders.items():
-                    searchable_doc = self._create_order_document(order_id, order_data, account_id)
-                    searchable_documents.append(searchable_doc)
-
-        return searchable_documents
+        return self.records_to_searchable_documents()
+
+    def record_to_searchable_documents(self, record_path, record) -> List[SearchableDocument]:
+        """Convert the order at DB["accountDetails"][account_id]["orders"][order_id]."""
+        _, account_id, _, order_id = record_path
+        return [self._create_order_document(order_id, record, account_id)]
 
     def _create_order_document(
         self, order_id: str, order_data: Dict[str, Any], account_id: str
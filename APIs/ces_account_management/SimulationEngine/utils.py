@@ -14,6 +14,7 @@ from .custom_errors import ActionNotSupportedError, ParseError
 from .phone_utils import normalize_phone_number
 from common_utils.print_log import print_log
 from common_utils.ces_infobot_config import CESInfobotConfigManager
+from common_utils.llm_gateway import LLMRequest, llm_gateway
 from pydantic import BaseModel
 from typing import TypeVar, Type
 import time
@@ -389,7 +390,7 @@ def get_all_available_plans_and_features() -> List[Dict[str, Any]]:
 
 def _get_gemini_response(query: str) -> str:
     """
-    Sends a query to the Gemini API using the Google GenAI library and returns the main text response.
+    Sends a query to the Gemini API through common_utils.llm_gateway and returns the main text response.
 
     Args:
         query (str): The user's text to send to the Gemini model.
@@ -398,37 +399,31 @@ def _get_gemini_response(query: str) -> str:
         str: The main text content returned by the Gemini API.
 
     Raises:
-        EnvironmentError: If the GOOGLE_API_KEY environment variable is not set.
+        EnvironmentError: If the GOOGLE_API_KEY environment variable is not set
+            (unless the LLM gateway runs offline or replays).
         RuntimeError: If there is an error with the API call.
     """
     import os
-    from google import genai
-    from google.genai import types
 
     # Get API key from environment variable
     api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if llm_gateway.uses_backend and not api_key:
         raise EnvironmentError(
             "Google API Key not found. Please create a .env file in the project root with GOOGLE_API_KEY or GEMINI_API_KEY, or set it as an environment variable."
         )
 
-    # Initialize the client
-    client = genai.Client(api_key=api_key)
-
     print_log("Sending request to Gemini 2.5 Pro with temperature 0...")
 
     try:
-        # Generate content
-        response = client.models.generate_content(
-            model="gemini-2.5-pro",
-            contents=types.Part.from_text(text=query),
-            config=types.GenerateContentConfig(
-                temperature=0  # Deterministic results
-            ),
+        # Temperature 0 for deterministic results
+        response_text = llm_gateway.complete(
+            LLMRequest(query, "gemini-2.5-pro", temperature=0),
+            service="ces_account_management",
+            live=lambda request: llm_gateway.backend.generate(request, api_key=api_key),
         )
 
-        if response.text:
-            return response.text
+        if response_text:
+            return response_text
         else:
             raise RuntimeError("No text content in Gemini response")
 
@@ -3,6 +3,7 @@
 import json
 import os
 from typing import Optional
+from common_utils.tracked_db import track_changes
 
 
 
@@ -17,7 +18,7 @@ DEFAULT_DB_PATH = os.path.join(
 
 # Load default DB on import using direct with open
 with open(DEFAULT_DB_PATH, "r", encoding="utf-8") as f:
-    DB = json.load(f)
+    DB = track_changes(json.load(f))
 
 def reset_db_for_tests():
     """Reset DB to a clean state for tests."""
@@ -4,6 +4,7 @@ from typing import Any, Dict, Optional
 from datetime import date, datetime
 from pydantic import ValidationError as PydanticValidationError
 from .db_models import CesFlightsDB
+from common_utils.tracked_db import track_changes
 
 # Add the SimulationEngine directory to the path
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SimulationEngine'))
@@ -52,7 +53,7 @@ def _load_default_db() -> Dict[str, Any]:
         }
 
 # Initialize database from file with validation
-DB = _load_default_db()
+DB = track_changes(_load_default_db())
 
 def _get_current_date() -> str:
     """Get current date in ISO format with timezone information."""
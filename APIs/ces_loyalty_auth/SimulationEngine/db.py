@@ -2,9 +2,10 @@ import os
 import json
 from typing import Dict, Any
 from .db_models import CesLoyaltyAuthDB
+from common_utils.tracked_db import track_changes
 
 # Initialize empty database structure
-DB: Dict[str, Any] = {
+DB: Dict[str, Any] = track_changes({
     "CONVERSATION_STATUS": None,
     "SESSION_STATUS": None,
     "AUTH_RESULT": None,
@@ -14,7 +15,7 @@ DB: Dict[str, Any] = {
     "PROFILE_AFTER_AUTH": {},
     "use_real_datastore": False,
     "_end_of_conversation_status": {},
-}
+})
 
 
 def save_state(filepath: str):
@@ -1,6 +1,7 @@
 # ces/SimulationEngine/db.py
 import json
 import os
+from common_utils.tracked_db import track_changes
 
 # Define the default path to your JSON DB file
 DEFAULT_DB_PATH = os.path.abspath(
@@ -8,7 +9,7 @@ DEFAULT_DB_PATH = os.path.abspath(
 )
 
 # Initialize DB structure
-DB = {}
+DB = track_changes(path_depth=2)
 
 def load_default_data():
     """Load default database from DBs directory"""
@@ -10,22 +10,21 @@ from .db import DB
 class ServiceAdapter(Adapter):
     """Adapter for converting CES Account Management database into searchable documents."""
 
-    def db_to_searchable_documents(self) -> List[SearchableDocument]:
-        """Convert the CES Account Management database into searchable documents."""
-        searchable_documents = []
-
-        # Get orders from all accounts
-        order_details = DB.get("orderDetails", {})
-        for order_id, order_data in order_details.items():
-            searchable_doc = self._create_order_document(order_id, order_data)
-            searchable_documents.append(searchable_doc)
+    tracked_collections = (("orderDetails",), ("activationGuides",))
 
-        activation_guides = DB.get("activationGuides", {})
-        for title, content in activation_guides.items():
-            searchable_doc = self._create_activation_guide_document(title, content)
-            searchable_documents.append(searchable_doc)
+    def get_tracked_db(self):
+        return DB
 
-        return searchable_documents
+    def db_to_searchable_documents(self) -> List[SearchableDocument]:
+        """Convert the CES System Activation database into searchable documents."""
+        return self.records_to_searchable_documents()
+
+    def record_to_searchable_documents(self, record_path, record) -> List[SearchableDocument]:
+        """Convert an order or activation guide into a searchable document."""
+        collection, record_id = record_path
+        if collection == "orderDetails":
+            return [self._create_order_document(record_id, record)]
+        return [self._create_activation_guide_document(record_id, record)]
 
     def _create_order_document(
         self, order_id: str, order_data: Dict[str, Any]
@@ -2,13 +2,12 @@
 import base64
 import json
 from typing import Any, Dict, List
-from google import genai
-from google.genai import types
 import google.auth.transport.requests as google_auth_transport_requests
 from google.oauth2 import service_account
 import requests
 from .db import DB
 from common_utils.ces_infobot_config import CESInfobotConfigManager
+from common_utils.llm_gateway import LLMRequest, llm_gateway
 from dotenv import load_dotenv
 
 Request = google_auth_transport_requests.Request
@@ -129,19 +128,19 @@ def search_order_details_by_query(query: str, order_id: str = "", account_id: st
     return matching_orders
 
 def search_activation_guides_by_llm(query: str) -> Dict[str, Any]:
-    client = genai.Client()
     prompt = f"Based on the user's query, provide a concise answer using the information from the following activation guide. If the query is general, summarize the guide's introduction and steps. Check the solution section under troubleshooting\n\nQuery: {query}\n\nActivation Guide:\n{json.dumps(DB['activationGuides'], indent=2)}"
     
-    response = client.models.generate_content(
-        model="gemini-2.5-pro", 
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            system_instruction=f"Just return the answer, no markdown formatting without any other interaction with the user. Make it straight forward and concise. Return with the structure: {{'answer': 'The answer to the query', 'snippets': {{'introduction': 'The introduction of the guide', 'title': 'The title of the guide', 'uri': 'The URI of the guide in the provided Activation Guides data following the format: activationGuides/DOCUMENT_TITLE'}}}} if you are not able to find the information, return an empty object: {{}}",
-            response_mime_type= "application/json",
-        )
+    response_text = llm_gateway.complete(
+        LLMRequest(
+            prompt,
+            "gemini-2.5-pro",
+            system_prompt=f"Just return the answer, no markdown formatting without any other interaction with the user. Make it straight forward and concise. Return with the structure: {{'answer': 'The answer to the query', 'snippets': {{'introduction': 'The introduction of the guide', 'title': 'The title of the guide', 'uri': 'The URI of the guide in the provided Activation Guides data following the format: activationGuides/DOCUMENT_TITLE'}}}} if you are not able to find the information, return an empty object: {{}}",
+            response_mime_type="application/json",
+        ),
+        service="ces_system_activation",
     )
 
-    return json.loads(response.text)
+    return json.loads(response_text)
 
 
 # Public configuration API functions
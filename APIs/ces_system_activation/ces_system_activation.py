@@ -6,8 +6,7 @@ import uuid
 from pydantic import ValidationError as PydanticValidationError
 from .SimulationEngine.models import SourceSnippet
 from .SimulationEngine import utils
-from google import genai
-from google.genai import types
+from common_utils.llm_gateway import LLMRequest, llm_gateway
 import sys
 import os
 from PyPDF2 import PdfReader
@@ -1539,17 +1538,17 @@ def search_order_details(
 
     if not order_id and not account_id and "pytest" not in sys.modules:
         
-        client = genai.Client()
-
-        response = client.models.generate_content(
-            model="gemini-2.5-pro", contents="Based on the following query, return the order_id and account_id. If you are not sure about the order_id and account_id, return the same value for both. The order_id and account_id only contain numbers." + input_data.query,
-            config=types.GenerateContentConfig(
-                system_instruction="return as a json object to be parsed without markdown, this output will be parsed by json.loads function. The standard format is {order_id: 'ORD<ORDER_NUMBER>', account_id: 'ACC<ACCOUNT_NUMBER>'}",
-                response_mime_type= "application/json",
-            )
+        response_text = llm_gateway.complete(
+            LLMRequest(
+                "Based on the following query, return the order_id and account_id. If you are not sure about the order_id and account_id, return the same value for both. The order_id and account_id only contain numbers." + input_data.query,
+                "gemini-2.5-pro",
+                system_prompt="return as a json object to be parsed without markdown, this output will be parsed by json.loads function. The standard format is {order_id: 'ORD<ORDER_NUMBER>', account_id: 'ACC<ACCOUNT_NUMBER>'}",
+                response_mime_type="application/json",
+            ),
+            service="ces_system_activation",
         )
 
-        result = json.loads(response.text)
+        result = json.loads(response_text)
         if result.get('order_id'):
             order_id = result.get('order_id')
         if result.get('account_id'):
@@ -1801,8 +1800,6 @@ def add_activation_guide_from_pdf(pdf_file_path: str) -> Dict[str, str]:
 
     if "pytest" not in sys.modules:
         # Use Gemini to categorize the text
-        client = genai.Client()
-        
         system_instruction = """
         You are an expert in categorizing technical documents. Based on the provided text from a PDF, you must create a JSON object that follows this exact structure:
         {
@@ -1833,17 +1830,14 @@ def add_activation_guide_from_pdf(pdf_file_path: str) -> Dict[str, str]:
         
         prompt = f"Please categorize the following text into the specified JSON format:\n\n{text}"
         
-        response = client.models.generate_content(
-            model="gemini-2.5-pro", 
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=system_instruction,
-                response_mime_type="application/json",
-            )
+        response_text = llm_gateway.complete(
+            LLMRequest(prompt, "gemini-2.5-pro", system_prompt=system_instruction,
+                       response_mime_type="application/json"),
+            service="ces_system_activation",
         )
 
         try:
-            new_guide = json.loads(response.text)
+            new_guide = json.loads(response_text)
         except json.JSONDecodeError:
             raise ValueError("Failed to parse the response from the language model as JSON.")
     else:
@@ -113,7 +113,7 @@ class TestImports(BaseTestCaseWithErrorHandler):
             from APIs.ces_system_activation.SimulationEngine.db import DB, save_state, load_state
             from APIs.ces_system_activation.SimulationEngine.utils import query_order_details_infobot, query_activation_guides_infobot
 
-            assert type(DB) == dict
+            assert isinstance(DB, dict)
             # These are dataclasses, not BaseModel
             assert hasattr(TechnicianVisitDetails, '__pydantic_fields__')
             assert hasattr(AppointmentAvailability, '__pydantic_fields__')
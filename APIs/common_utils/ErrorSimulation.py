@@ -12,11 +12,91 @@ import os
 import ast
 # import types # Not strictly used by original _resolve_function_paths but often kept
 import inspect
-from typing import Dict, Type, Optional
+from typing import Dict, Type, Optional, Tuple
 import functools
+from common_utils.decorator_cache import invalidate_decorated_functions
 
 RESOLVE_PATHS_DEBUG_MODE = False # Enable for detailed logs
 
+# Modules never inspected when resolving function paths.
+EXCLUDED_MODULES = {"dbm", "dbm.gnu", "gdbm", "shelve", "email", "tkinter", "unittest", "pydoc"}
+
+# module name -> (id(module), len(module.__dict__), frozenset of FQNs defined in it).
+# The identity/size pair detects reloads and modules that were still being
+# initialized when their table was first built.
+_module_symbol_tables: Dict[str, Tuple[int, int, frozenset]] = {}
+
+
+def _module_function_paths(mod_name: str) -> frozenset:
+    """
+    Returns the FQNs of functions, and methods of classes, defined in a loaded module.
+
+    Only members whose `__module__` is the module itself are included. Returns an
+    empty set if the module isn't loaded or is excluded.
+    """
+    module_obj = sys.modules.get(mod_name)
+    if not module_obj or not hasattr(module_obj, "__name__"):
+        return frozenset()
+    if any(excluded_part in mod_name for excluded_part in EXCLUDED_MODULES):
+        return frozenset()
+    try:
+        namespace = vars(module_obj)
+    except TypeError:
+        return frozenset()
+    cached = _module_symbol_tables.get(mod_name)
+    if cached is not None and cached[0] == id(module_obj) and cached[1] == len(namespace):
+        return cached[2]
+
+    paths = set()
+    try:
+        for name, obj in list(namespace.items()):
+            member_module_name = getattr(obj, '__module__', None)
+            if member_module_name != mod_name:
+                continue
+            if inspect.isfunction(obj): # This covers functions and non-bound methods
+                paths.add(f"{mod_name}.{name}")
+            elif inspect.isclass(obj):
+                for fname, fobj in inspect.getmembers(obj, inspect.isfunction):
+                    # Check if method's module is the class's module (which is mod_name)
+                    if getattr(fobj, '__module__', None) == mod_name:
+                        paths.add(f"{mod_name}.{obj.__name__}.{fname}")
+    except Exception:
+        pass
+    table = frozenset(paths)
+    _module_symbol_tables[mod_name] = (id(module_obj), len(namespace), table)
+    return table
+
+
+def _is_loaded_function_path(path: str) -> bool:
+    """True if `path` names a function or method defined in an already-loaded module."""
+    parts = path.split(".")
+    # "pkg.mod.func" -> module "pkg.mod"; "pkg.mod.Class.method" -> module "pkg.mod"
+    for split in (len(parts) - 1, len(parts) - 2):
+        if split >= 1 and path in _module_function_paths(".".join(parts[:split])):
+            return True
+    return False
+
+
+def _package_function_paths(packages: Optional[set]) -> list:
+    """All function FQNs defined in loaded modules of the given top-level packages (None for all)."""
+    paths = []
+    for mod_name in list(sys.modules):
+        if packages is None or mod_name.split(".", 1)[0] in packages:
+            paths.extend(_module_function_paths(mod_name))
+    return paths
+
+
+def _service_package_from_path(path: Optional[str]) -> Optional[str]:
+    """Infers the service package from '<service>/SimulationEngine/error_definitions.json'."""
+    if not path:
+        return None
+    parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+    if "SimulationEngine" in parts:
+        idx = parts.index("SimulationEngine")
+        if idx > 0:
+            return parts[idx - 1]
+    return None
+
 class ErrorSimulator:
     def __init__(
         self,
@@ -111,75 +191,63 @@ class ErrorSimulator:
             print_log(f"[WARN] ErrorSimulator: Failed to parse _function_map from {init_file}: {e}")
         return function_map
 
-    def _resolve_function_paths(self, raw_definitions: dict) -> dict: # FROM YOUR ORIGINAL
-        if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths (original logic) called with {len(raw_definitions)} raw definitions.")
-        updated = {}
-        all_paths = set()
-        EXCLUDED_MODULES = {"dbm", "dbm.gnu", "gdbm", "shelve", "email", "tkinter", "unittest", "pydoc"} # Added unittest, pydoc
-
-        modules_to_inspect = dict(sys.modules) 
-
-        for mod_name, module_obj in modules_to_inspect.items():
-            if not module_obj or not hasattr(module_obj, "__name__"):
-                continue
-            
-            # Using mod_name from dict key, which is usually the canonical import path
-            if any(excluded_part in mod_name for excluded_part in EXCLUDED_MODULES):
-                # if RESOLVE_PATHS_DEBUG_MODE: print(f"DEBUG: _resolve_function_paths: Skipping excluded module: {mod_name}")
-                continue
-            
-            # Optional: Add more filtering here if necessary, e.g., for performance on very large environments
-            # However, the original didn't have much more, so try to keep it similar.
-            # if RESOLVE_PATHS_DEBUG_MODE and "zendesk" in mod_name: # Only print for relevant modules
-            #    print(f"DEBUG: _resolve_function_paths: Inspecting module: {mod_name}")
-
-            try:
-                for name, obj in inspect.getmembers(module_obj):
-                    member_module_name = getattr(obj, '__module__', None)
-                    
-                    # Add function if it's defined in the current module
-                    if inspect.isfunction(obj): # This covers functions and non-bound methods
-                        if member_module_name == mod_name:
-                            all_paths.add(f"{mod_name}.{name}")
-                    elif inspect.isclass(obj):
-                        if member_module_name == mod_name: # Class defined in this module
-                            for fname, fobj in inspect.getmembers(obj, inspect.isfunction): # inspect.isfunction gets methods
-                                method_module_name = getattr(fobj, '__module__', None)
-                                # Check if method's module is the class's module (which is mod_name)
-                                if method_module_name == mod_name:
-                                    all_paths.add(f"{mod_name}.{obj.__name__}.{fname}")
-            except Exception as e:
-                # if RESOLVE_PATHS_DEBUG_MODE: print(f"DEBUG: _resolve_function_paths: Error inspecting module {mod_name}: {e}")
-                continue
-        
-        if RESOLVE_PATHS_DEBUG_MODE:
-            print_log(f"DEBUG: _resolve_function_paths (original logic): Collected {len(all_paths)} FQNs.")
-            # To see all collected paths if needed:
-            # for p in sorted(list(all_paths)):
-            # print(f"     {p}")
+    def _resolve_function_paths(self, raw_definitions: dict) -> dict:
+        """
+        Maps raw error-definition keys to the fully qualified paths of loaded functions.
 
+        A key is resolved through the service `_function_map` first, then looked up in the
+        symbol table of the module it names (`pkg.mod.func` or `pkg.mod.Class.method`).
+        Keys that don't resolve directly fall back to a suffix match, first over the
+        symbol tables of the key's own package and the service package, then over all
+        loaded modules. Symbol tables are built lazily per module and cached, so the
+        common case costs O(definitions) instead of a walk over every module in
+        `sys.modules`.
+        """
+        if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths called with {len(raw_definitions)} raw definitions.")
+        updated = {}
+        fallback_paths = None
+        global_paths = None
 
         for raw_key, definitions in raw_definitions.items():
             resolved_key = self._function_map.get(raw_key, raw_key) # self._function_map is likely {} if service_root_path=None
-            if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths (original logic): Resolving raw_key '{raw_key}' as '{resolved_key}'")
+            if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths: Resolving raw_key '{raw_key}' as '{resolved_key}'")
             
-            if resolved_key in all_paths:
+            if _is_loaded_function_path(resolved_key):
                 updated[resolved_key] = definitions
-                if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths (original logic): Direct match for '{resolved_key}'.")
-            else:
-                matched = False
-                # Original suffix fallback (more useful if resolved_key is not a full FQN)
-                for full_path_candidate in all_paths:
-                    if full_path_candidate.endswith("." + resolved_key) or full_path_candidate == resolved_key : # check for "package." + "module.func" or "module.Class.method"
-                        updated[full_path_candidate] = definitions
-                        matched = True
-                        if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths (original logic): Suffix/Exact fallback match for '{resolved_key}' with '{full_path_candidate}'.")
-                        break
-                if not matched and RESOLVE_PATHS_DEBUG_MODE:
-                    print_log(f"[WARNING] ErrorSimulator (original logic): Could not resolve function path: '{raw_key}' (tried as '{resolved_key}')")
+                if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths: Direct match for '{resolved_key}'.")
+                continue
+
+            # Suffix fallback for keys that aren't full FQNs (e.g. "Users.createUser"):
+            # search the service's own packages first, then every loaded module.
+            suffix = "." + resolved_key
+            if fallback_paths is None:
+                fallback_paths = _package_function_paths(self._fallback_packages(raw_definitions))
+            match = next((path for path in fallback_paths if path.endswith(suffix)), None)
+            if match is None:
+                if global_paths is None:
+                    global_paths = _package_function_paths(None)
+                match = next((path for path in global_paths if path.endswith(suffix)), None)
+            if match is not None:
+                updated[match] = definitions
+                if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths: Suffix fallback match for '{resolved_key}' with '{match}'.")
+            elif RESOLVE_PATHS_DEBUG_MODE:
+                print_log(f"[WARNING] ErrorSimulator: Could not resolve function path: '{raw_key}' (tried as '{resolved_key}')")
         
-        if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths (original logic): Returning {len(updated)} resolved definitions.")
+        if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: _resolve_function_paths: Returning {len(updated)} resolved definitions.")
         return updated
+
+    def _fallback_packages(self, raw_definitions: dict) -> set:
+        """Top-level packages searched by the suffix fallback of `_resolve_function_paths`."""
+        packages = set()
+        service_package = _service_package_from_path(self.error_definitions_path)
+        if service_package:
+            packages.add(service_package)
+        if getattr(self, "service_name", None):
+            packages.add(self.service_name)
+        for raw_key in raw_definitions:
+            resolved_key = self._function_map.get(raw_key, raw_key)
+            packages.add(resolved_key.split(".", 1)[0])
+        return packages
     # --- End of methods from ORIGINAL WORKING ErrorSimulator ---
 
     def _load_configurations(self, config_path, definitions_path):
@@ -267,6 +335,11 @@ class ErrorSimulator:
             self.max_errors_per_run = service_config.get('config', {}).get('max_errors_per_run', None)
             # print(f"DEBUG: Max errors per run: {self.max_errors_per_run}")
             self.current_error_count = 0
+            self._invalidate_decorated_functions()
+
+    def _invalidate_decorated_functions(self):
+        """Drops cached decorated functions that were built against the previous config."""
+        invalidate_decorated_functions(getattr(self, "service_name", None))
         
     def _get_exception_class(self, name: str) -> Type[Exception]:
         if hasattr(builtins, name): return getattr(builtins, name)
@@ -402,6 +475,7 @@ class ErrorSimulator:
         self.error_definitions_path = new_definitions_path
         self.error_definitions = self._resolve_function_paths(raw_definitions) # Uses original logic
         if RESOLVE_PATHS_DEBUG_MODE: print_log(f"DEBUG: load_error_definitions: self.error_definitions updated. Keys: {list(self.error_definitions.keys())}")
+        self._invalidate_decorated_functions()
 
     # (Rest of API methods: update_error_probability, update_dampen_factor, etc. as before)
     def update_error_probability(self, error_type: str, new_probability: float): # Changed to new_probability
@@ -480,5 +554,6 @@ class ErrorSimulator:
         self.error_simulation_tracker = self._initialize_tracker()
         self.current_error_count = 0
         self.error_definitions = self._resolve_function_paths(raw_definitions)
+        self._invalidate_decorated_functions()
         
         print(f"[INFO] Reloaded initial local configuration from {self._initial_error_config_path}")
\ No newline at end of file
@@ -4,7 +4,14 @@ Common utilities for API modules.
 This file makes common_utils a Python package.
 """
 import os
-from .call_logger import log_function_call, set_runtime_id, clear_log_file
+from .call_logger import (
+    log_function_call,
+    set_runtime_id,
+    clear_log_file,
+    flush_log_file,
+    close_log_file,
+    read_log_file
+)
 from .init_utils import apply_decorators, resolve_function_import, create_error_simulator
 # from .docstring_tests import TestDocstringStructure, run_tests_for_package, merge_csv_reports
 from .error_handling import handle_api_errors
@@ -42,6 +49,9 @@ __all__ = [
     'log_function_call',
     'set_runtime_id',
     'clear_log_file',
+    'flush_log_file',
+    'close_log_file',
+    'read_log_file',
     'apply_decorators',
     'TestDocstringStructure',
     'run_tests_for_package',
@@ -11,6 +11,7 @@ import copy
 from typing import Dict, List, Optional
 from pathlib import Path
 from .utils import discover_services
+from .decorator_cache import invalidate_decorated_functions
 
 
 class AuthenticationManager:
@@ -179,6 +180,9 @@ class AuthenticationManager:
         This should be called by the framework manager after all configurations are applied.
         """
         instance = cls.get_instance()
+        # Functions resolved lazily through __getattr__ are cached; drop them so
+        # the next lookup is decorated against the new configuration.
+        invalidate_decorated_functions()
         # Get all configured services
         services = list(instance.service_configs.keys())
         instance._reapply_decorators_to_imported_modules(services)
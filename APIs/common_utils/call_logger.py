@@ -2,17 +2,27 @@ from common_utils.print_log import print_log
 """
 Call logger for API modules.
 
-This module provides a decorator to log function calls to a JSON file.
+This module provides a decorator to log function calls to a JSON Lines file.
+
+Each call is serialized once, in the calling thread, and handed to a background
+writer thread that appends it to ``call_log_<RUNTIME_ID>.jsonl``. The file is
+never re-read or rewritten while logging, so the cost of a call does not grow
+with the length of the run. Use ``read_log_file`` to get the familiar
+list-of-entries view and ``flush_log_file``/``close_log_file`` when entries
+must be on disk (e.g. before handing the file to another process).
 """
 
+import atexit
 import json
 import functools
+import queue
 import threading
 import os
 import uuid
+from typing import Any, Dict, List, Optional
 
-# A thread-safe lock to prevent race conditions when multiple calls
-# from different threads try to write to the log file simultaneously.
+# A thread-safe lock guarding the runtime id / log path state and the
+# first-write initialization of the log file.
 _log_lock = threading.Lock()
 RUNTIME_ID = str(uuid.uuid4())
 
@@ -23,19 +33,110 @@ gen_agents_dir = os.path.dirname(api_dir)
 OUTPUT_DIR = os.path.join(gen_agents_dir, "call_logs")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-LOG_FILE_PATH = os.path.join(OUTPUT_DIR, f"call_log_{RUNTIME_ID}.json")
+LOG_FILE_PATH = os.path.join(OUTPUT_DIR, f"call_log_{RUNTIME_ID}.jsonl")
 _log_file_initialized = False  # Ensures file is cleared only once per process
 
+# Upper bound on serialized entries waiting for the writer thread. When the
+# queue is full, callers block until the writer catches up instead of letting
+# memory grow without limit.
+MAX_PENDING_ENTRIES = 10000
+# Maximum number of entries appended to the file in a single write.
+WRITE_BATCH_SIZE = 512
+
+_STOP = object()
+
+
+class _JsonlLogWriter:
+    """Background thread appending pre-serialized log lines to JSONL files."""
+
+    def __init__(self, max_pending: int = MAX_PENDING_ENTRIES, batch_size: int = WRITE_BATCH_SIZE):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="call-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, path: str, line: str):
+        """Queues one serialized entry for appending to ``path``."""
+        self._ensure_started()
+        self._queue.put((path, line))
+
+    def flush(self):
+        """Blocks until every queued entry has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Writes all queued entries and stops the writer thread."""
+        with self._thread_lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                self._thread = None
+                return
+            self._queue.put(_STOP)
+            thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            lines_by_path: Dict[str, List[str]] = {}
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                path, line = item
+                lines_by_path.setdefault(path, []).append(line)
+            for path, lines in lines_by_path.items():
+                self._append(path, lines)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    @staticmethod
+    def _append(path: str, lines: List[str]):
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+        except (IOError, OSError) as e:
+            # Log the error but never fail the logged function call
+            print_log(f"Warning: Failed to write to call log file: {e}")
+
+
+_writer = _JsonlLogWriter()
+atexit.register(lambda: _writer.close())
+
+
 def set_runtime_id(runtime_id: str):
     """Set a custom runtime ID and update the log file path"""
     global RUNTIME_ID, LOG_FILE_PATH, _log_file_initialized
-    RUNTIME_ID = runtime_id
-    LOG_FILE_PATH = os.path.join(OUTPUT_DIR, f"call_log_{RUNTIME_ID}.json")
-    _log_file_initialized = False  # Reset for new runtime id
+    with _log_lock:
+        RUNTIME_ID = runtime_id
+        LOG_FILE_PATH = os.path.join(OUTPUT_DIR, f"call_log_{RUNTIME_ID}.jsonl")
+        _log_file_initialized = False  # Reset for new runtime id
 
 def clear_log_file():
     """Clear the current log file to start fresh"""
     global LOG_FILE_PATH, _log_file_initialized
+    # Entries queued before the clear belong to the old log; write them out
+    # first so they cannot land in the fresh file afterwards.
+    _writer.flush()
     try:
         if os.path.exists(LOG_FILE_PATH):
             os.remove(LOG_FILE_PATH)
@@ -43,9 +144,67 @@ def clear_log_file():
         print_log(f"Warning: Failed to clear log file: {e}")
     _log_file_initialized = True
 
+def flush_log_file():
+    """Block until every logged call has been appended to its log file."""
+    _writer.flush()
+
+def close_log_file():
+    """Flush pending entries and stop the background writer.
+
+    Logging keeps working after this call; the writer is restarted on the
+    next logged function call.
+    """
+    _writer.close()
+
+def read_log_file(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Return the entries of a call log as a list, oldest first.
+
+    Pending entries are flushed before reading. Malformed lines (e.g. from a
+    process killed mid-write) are skipped. Legacy logs written as a single
+    JSON array are also accepted.
+
+    Args:
+        path (Optional[str]): Log file to read. Defaults to the current LOG_FILE_PATH.
+
+    Returns:
+        List[Dict[str, Any]]: The logged entries.
+    """
+    _writer.flush()
+    path = path or LOG_FILE_PATH
+    entries: List[Dict[str, Any]] = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except (IOError, OSError):
+        return entries
+    if content.lstrip().startswith("["):
+        try:
+            data = json.loads(content)
+            return data if isinstance(data, list) else entries
+        except (json.JSONDecodeError, ValueError):
+            return entries
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entries.append(json.loads(line))
+        except (json.JSONDecodeError, ValueError):
+            continue
+    return entries
+
+def _serialize_entry(log_entry: Dict[str, Any]) -> str:
+    try:
+        return json.dumps(log_entry) + "\n"
+    except (TypeError, ValueError):
+        # The return value is not JSON serializable; fall back to its repr.
+        response = log_entry["response"]
+        response["return_value"] = repr(response.get("return_value"))
+        return json.dumps(log_entry) + "\n"
+
 def log_function_call(package_name: str, flattened_name: str):
     """
-    A decorator factory that creates a decorator to log function calls to a JSON file.
+    A decorator factory that creates a decorator to log function calls to a JSONL file.
 
     This decorator captures the function's arguments and its response (or any
     exception raised) and logs them in a structured format. All function calls
@@ -70,12 +229,7 @@ def log_function_call(package_name: str, flattened_name: str):
             try:
                 # Execute the original function to get its result.
                 result = func(*args, **kwargs)
-                # Store the string representation of the function's response.
-                try: 
-                    json.dumps(result)
-                    response_data = {"status": "success", "return_value": result}
-                except Exception as e:
-                    response_data = {"status": "success", "return_value": repr(result)}
+                response_data = {"status": "success", "return_value": result}
                 # Return the actual result to the original caller.
                 return result
             except Exception as e:
@@ -95,49 +249,23 @@ def log_function_call(package_name: str, flattened_name: str):
                     "param_dict": param_dict,
                     "response": response_data
                 }
+                # Serialize now so later mutations of the returned objects
+                # do not leak into the log.
+                line = _serialize_entry(log_entry)
 
-                # Use a lock to safely append the new log entry to the JSON file.
                 with _log_lock:
                     # On first log write in this process, clear the file if it exists
                     if not _log_file_initialized:
+                        _writer.flush()
                         if os.path.exists(LOG_FILE_PATH):
                             try:
                                 os.remove(LOG_FILE_PATH)
                             except (IOError, OSError) as e:
                                 print_log(f"Warning: Failed to clear log file: {e}")
                         _log_file_initialized = True
-                    log_data = []
-                    try:
-                        # Check if the log file exists and has content
-                        if os.path.exists(LOG_FILE_PATH):
-                            file_size = os.path.getsize(LOG_FILE_PATH)
-                            if file_size > 0:
-                                with open(LOG_FILE_PATH, "r") as f:
-                                    # Load existing log data. If file is malformed, start fresh.
-                                    try:
-                                        log_data = json.load(f)
-                                        if not isinstance(log_data, list):
-                                            log_data = [] # Reset if the file doesn't contain a list.
-                                    except (json.JSONDecodeError, ValueError):
-                                        # Handle any JSON parsing errors, including empty files
-                                        log_data = []
-                            # If file exists but is empty (file_size == 0), log_data remains []
-                        # Note: We don't delete existing files here since we want to append within the same runtime
-                        # If you want to start fresh each time, delete the file before the first call
-                    except (IOError, FileNotFoundError, OSError):
-                        # If there are any file system errors, start with an empty list.
-                        log_data = []
-
-                    # Append the new entry for the current function call.
-                    log_data.append(log_entry)
-
-                    # Write the updated list back to the file.
-                    try:
-                        with open(LOG_FILE_PATH, "w") as f:
-                            json.dump(log_data, f, indent=4)
-                    except (IOError, OSError) as e:
-                        # Log the error but don't fail the function call
-                        print_log(f"Warning: Failed to write to call log file: {e}")
+                    log_path = LOG_FILE_PATH
+
+                _writer.submit(log_path, line)
 
         return wrapper
     return decorator
@@ -0,0 +1,275 @@
+"""
+Copy-on-write snapshots of service databases, for fast episode resets.
+
+Resetting a service used to mean reloading its default JSON file or restoring a
+`deepcopy` of its DB, both proportional to the size of the whole DB. The
+`SnapshotManager` instead keeps, for each registered service DB, a journal of
+the containers changed since each open snapshot:
+
+- `snapshot()` only opens a new journal level, whatever the size of the DB;
+- the first time a container of the DB is mutated after that, its shallow
+  contents (the pre-image) are saved, through the `before_change` callback of
+  the DB's ChangeTracker (see tracked_db.py). Every container of a tracked DB
+  is a tracked one (plain values are copied on insertion), so no mutation
+  escapes the callback and nothing has to be copied up front;
+- `restore(snapshot)` puts the pre-images back in place, so it costs the size
+  of the containers changed since the snapshot, not the size of the DB.
+
+Snapshots nest: restoring one discards the snapshots taken after it, and keeps
+the restored one open so that it can be restored again (e.g. once per
+episode). Restored containers are reported to the ChangeTracker, so indexes
+built on the DB resync as after any other mutation.
+
+Copy-on-write needs a change-tracked DB (`track_changes`). Plain dict DBs can
+be registered too, but are snapshotted with a `deepcopy`.
+
+Example:
+    snapshot = snapshot_manager.snapshot("retail", "gmail")
+    ...  # run an episode
+    snapshot_manager.restore(snapshot)
+"""
+import copy
+import importlib
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from common_utils.tracked_db import TrackedDict, TrackedList, get_change_tracker
+
+_snapshot_ids = itertools.count(1)
+
+
+class SnapshotError(ValueError):
+    """Raised for snapshots that were released, discarded, or taken by another manager."""
+
+
+class _CopyOnWriteJournal:
+    """Pre-images of the containers of one tracked DB, per open snapshot."""
+
+    def __init__(self, db: TrackedDict):
+        self.db = db
+        self.tracker = get_change_tracker(db)
+        self._lock = threading.RLock()
+        # One (snapshot id, {id(container): (container, pre-image)}) per open snapshot
+        self._levels: List[Tuple[int, Dict[int, Tuple[Any, Any]]]] = []
+
+    def _save(self, container):
+        with self._lock:
+            saved = self._levels[-1][1]
+            if id(container) not in saved:
+                saved[id(container)] = (container, dict(container) if isinstance(container, dict) else list(container))
+
+    def open(self, snapshot_id: int):
+        with self._lock:
+            self._levels.append((snapshot_id, {}))
+            self.tracker.before_change = self._save
+
+    def _index(self, snapshot_id: int) -> int:
+        for index, (level_id, _) in enumerate(self._levels):
+            if level_id == snapshot_id:
+                return index
+        raise SnapshotError(f"Snapshot {snapshot_id} is no longer open for this DB.")
+
+    def restore(self, snapshot_id: int):
+        with self._lock:
+            index = self._index(snapshot_id)
+            restored = {}
+            # The lowest level holds the contents at the time of the snapshot
+            for _, saved in reversed(self._levels[index:]):
+                for key, (container, image) in saved.items():
+                    _put_back(container, image)
+                    restored[key] = container
+            del self._levels[index + 1:]
+            self._levels[index] = (snapshot_id, {})
+            for container in restored.values():
+                container._changed()
+
+    def release(self, snapshot_id: int):
+        with self._lock:
+            index = self._index(snapshot_id)
+            if index > 0:
+                # Pre-images still needed by the snapshot below are the oldest ones
+                below = self._levels[index - 1][1]
+                for _, saved in self._levels[index:]:
+                    for key, entry in saved.items():
+                        below.setdefault(key, entry)
+            del self._levels[index:]
+            if not self._levels:
+                self.tracker.before_change = None
+
+
+class _DeepCopyJournal:
+    """Full copies of one plain dict DB, per open snapshot."""
+
+    def __init__(self, db: dict):
+        self.db = db
+        self._lock = threading.RLock()
+        self._levels: List[Tuple[int, dict]] = []
+
+    def open(self, snapshot_id: int):
+        with self._lock:
+            self._levels.append((snapshot_id, copy.deepcopy(self.db)))
+
+    def _index(self, snapshot_id: int) -> int:
+        for index, (level_id, _) in enumerate(self._levels):
+            if level_id == snapshot_id:
+                return index
+        raise SnapshotError(f"Snapshot {snapshot_id} is no longer open for this DB.")
+
+    def restore(self, snapshot_id: int):
+        with self._lock:
+            index = self._index(snapshot_id)
+            self.db.clear()
+            self.db.update(copy.deepcopy(self._levels[index][1]))
+            del self._levels[index + 1:]
+
+    def release(self, snapshot_id: int):
+        with self._lock:
+            del self._levels[self._index(snapshot_id):]
+
+
+def _put_back(container, image):
+    """Restore the shallow contents of a tracked container, without reporting each item."""
+    if isinstance(container, TrackedDict):
+        dict.clear(container)
+        dict.update(container, image)
+        children = image.items()
+    else:
+        list.__setitem__(container, slice(None), image)
+        children = enumerate(image)
+    for key, value in children:
+        if isinstance(value, (TrackedDict, TrackedList)):
+            value._attach(container, key)
+
+
+class DBSnapshot:
+    """Handle on the state of a set of service DBs, returned by `SnapshotManager.snapshot`."""
+
+    def __init__(self, manager: "SnapshotManager", snapshot_id: int, journals: Dict[str, Any]):
+        self.manager = manager
+        self.id = snapshot_id
+        self.journals = journals
+
+    @property
+    def services(self) -> List[str]:
+        return sorted(self.journals)
+
+    def __repr__(self):
+        return f"DBSnapshot(id={self.id}, services={self.services})"
+
+
+class SnapshotManager:
+    """Registry of service DBs with nested, restorable snapshots."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._journals: Dict[str, Any] = {}
+
+    @property
+    def services(self) -> List[str]:
+        """Names of the registered services."""
+        with self._lock:
+            return sorted(self._journals)
+
+    def register(self, service: str, db: Optional[dict] = None):
+        """
+        Register the DB of a service.
+
+        Args:
+            service (str): Service name, e.g. "retail".
+            db (Optional[dict]): The DB to snapshot. Defaults to the `DB` of
+                `<service>.SimulationEngine.db`.
+
+        Raises:
+            TypeError: If `db` is not a dict.
+        """
+        if db is None:
+            db = importlib.import_module(f"{service}.SimulationEngine.db").DB
+        if not isinstance(db, dict):
+            raise TypeError(f"The DB of {service} must be a dict, got {type(db).__name__}.")
+        with self._lock:
+            journal = self._journals.get(service)
+            if journal is not None and journal.db is db:
+                return
+            if get_change_tracker(db) is not None:
+                self._journals[service] = _CopyOnWriteJournal(db)
+            else:
+                self._journals[service] = _DeepCopyJournal(db)
+
+    def unregister(self, service: str):
+        """Forget a service; its open snapshots can no longer be restored."""
+        with self._lock:
+            self._journals.pop(service, None)
+
+    def is_copy_on_write(self, service: str) -> bool:
+        """Whether snapshots of `service` are copy-on-write rather than deep copies."""
+        with self._lock:
+            return isinstance(self._journals[service], _CopyOnWriteJournal)
+
+    def snapshot(self, *services: str) -> DBSnapshot:
+        """
+        Take a snapshot of the DBs of `services`.
+
+        Services not registered yet are registered with their default DB.
+        Without arguments, every registered service is snapshotted.
+
+        Returns:
+            DBSnapshot: The handle to pass to `restore` and `release`.
+        """
+        with self._lock:
+            for service in services:
+                if service not in self._journals:
+                    self.register(service)
+            journals = {service: self._journals[service] for service in (services or self._journals)}
+            snapshot_id = next(_snapshot_ids)
+            for journal in journals.values():
+                journal.open(snapshot_id)
+            return DBSnapshot(self, snapshot_id, journals)
+
+    def _check(self, snapshot: DBSnapshot):
+        if snapshot.manager is not self:
+            raise SnapshotError(f"{snapshot!r} was taken by another snapshot manager.")
+        for service, journal in snapshot.journals.items():
+            if self._journals.get(service) is not journal:
+                raise SnapshotError(f"{service} was registered again after {snapshot!r} was taken.")
+
+    def restore(self, snapshot: DBSnapshot):
+        """
+        Bring the DBs of a snapshot back to their state when it was taken.
+
+        Snapshots taken after `snapshot` on the same DBs are discarded;
+        `snapshot` itself stays open and can be restored again.
+
+        Raises:
+            SnapshotError: If `snapshot` was released or discarded.
+        """
+        with self._lock:
+            self._check(snapshot)
+            for journal in snapshot.journals.values():
+                journal.restore(snapshot.id)
+
+    def release(self, snapshot: DBSnapshot):
+        """
+        Close a snapshot (and the snapshots taken after it) without restoring it.
+
+        Raises:
+            SnapshotError: If `snapshot` was already released or discarded.
+        """
+        with self._lock:
+            self._check(snapshot)
+            for journal in snapshot.journals.values():
+                journal.release(snapshot.id)
+
+    @contextmanager
+    def restoring(self, *services: str) -> Iterator[DBSnapshot]:
+        """Context manager that snapshots `services` and restores and releases them on exit."""
+        snapshot = self.snapshot(*services)
+        try:
+            yield snapshot
+        finally:
+            self.restore(snapshot)
+            self.release(snapshot)
+
+
+snapshot_manager = SnapshotManager()
@@ -0,0 +1,79 @@
+"""
+Per-service registry of decorated API functions.
+
+`resolve_function_import` runs the full `apply_decorators` chain the first time
+a service function is looked up. The result is stored here so that repeated
+attribute access (e.g. `gmail.send_message`) is a dictionary lookup instead of
+another import plus decoration.
+
+Entries are keyed by everything that changes how a function gets decorated:
+the service, the function name, the active mutation, the error simulator,
+whether that simulator has definitions for the function, whether
+authentication applies, LOG_RECORDS_FETCHED, and a generation counter.
+Managers that change decoration-relevant configuration (MutationManager,
+AuthenticationManager.reapply_decorators, ErrorSimulator config loads) call
+`invalidate_decorated_functions` to drop stale entries.
+"""
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class DecoratedFunctionCache:
+    """Thread-safe store of decorated callables, grouped by service."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[Hashable, Tuple[Any, Any]]] = {}
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped on every invalidation."""
+        return self._generation
+
+    def get(self, service_name: str, key: Hashable, original: Any) -> Optional[Any]:
+        """
+        Return the cached decorated callable, or None on a miss.
+
+        An entry only matches if it was built from the very same `original`
+        object, so patched or reloaded implementations are never served stale.
+        """
+        entry = self._entries.get(service_name, {}).get(key)
+        if entry is None or entry[0] is not original:
+            return None
+        return entry[1]
+
+    def put(self, service_name: str, key: Hashable, original: Any, decorated: Any, generation: int):
+        """
+        Store a decorated callable built while `generation` was current.
+
+        The entry is dropped if an invalidation happened in the meantime, since it
+        may have been decorated against the old configuration.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries.setdefault(service_name, {})[key] = (original, decorated)
+
+    def invalidate(self, service_name: Optional[str] = None):
+        """Drop cached entries for one service, or for all services if None."""
+        with self._lock:
+            self._generation += 1
+            if service_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(service_name, None)
+
+    def size(self, service_name: Optional[str] = None) -> int:
+        """Number of cached entries for a service, or in total."""
+        if service_name is not None:
+            return len(self._entries.get(service_name, {}))
+        return sum(len(entries) for entries in self._entries.values())
+
+
+decorated_function_cache = DecoratedFunctionCache()
+
+
+def invalidate_decorated_functions(service_name: Optional[str] = None):
+    """Invalidate cached decorated functions for a service (or all services)."""
+    decorated_function_cache.invalidate(service_name)
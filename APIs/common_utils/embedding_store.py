@@ -0,0 +1,238 @@
+"""
+Persistent embedding store shared by the embedding managers of a process.
+
+Embeddings are stored as float32 blobs in a SQLite database keyed by
+(model, task type, dimension, sha256 of the text):
+
+- writes only append new rows (an embedding for a key never changes), in one
+  transaction per batch, instead of rewriting the whole cache file,
+- each lookup refreshes the last use time of the rows it found, in one
+  transaction per batch,
+- the database runs in WAL mode, so other processes can keep reading a
+  consistent snapshot while one of them appends,
+- when the store grows past `max_entries`, the least recently used rows are
+  evicted,
+- a bounded in-memory LRU layer in front of SQLite serves repeated lookups.
+
+`get_embedding_store(path)` returns one store per database file, so every
+search strategy of the process that points at the same file shares it.
+Relative paths are resolved under `default_store_dir()` rather than the
+current working directory.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_MEMORY_ENTRIES = 10000
+# SQLite limits the number of bound parameters per statement
+_QUERY_BATCH_SIZE = 500
+
+_stores: Dict[str, "EmbeddingStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def default_store_dir() -> str:
+    """Directory for stores given by a relative path ($EMBEDDING_STORE_DIR, else the temp dir)."""
+    return os.environ.get("EMBEDDING_STORE_DIR") or os.path.join(tempfile.gettempdir(), "embedding_store")
+
+
+def resolve_store_path(path: str) -> str:
+    """Absolute path of the store database for `path`."""
+    if not os.path.isabs(path):
+        path = os.path.join(default_store_dir(), path)
+    return os.path.abspath(path)
+
+
+def is_sqlite_file(path: str) -> bool:
+    """Whether `path` is an (initialized) SQLite database."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+class EmbeddingStore:
+    """SQLite-backed, append-only store of float32 embeddings."""
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ):
+        """
+        Opens (or creates) the store.
+
+        Args:
+            path (str): Path to the SQLite database file.
+            max_entries (int): Number of embeddings kept on disk before the least
+                recently used ones are evicted.
+            memory_entries (int): Number of embeddings kept decoded in memory.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._memory = LRUCache(maxsize=max(memory_entries, 1))
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    task_type TEXT NOT NULL,
+                    dimension INTEGER NOT NULL,
+                    text_hash BLOB NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, task_type, dimension, text_hash)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+            )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(
+        self, model: str, task_type: str, dimension: int, texts: Sequence[str]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Looks up the embeddings of `texts`.
+
+        Returns:
+            Dict[str, np.ndarray]: text -> float32 vector, for the texts found.
+        """
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[bytes, List[str]] = {}
+        used: Dict[bytes, None] = {}
+        with self._lock:
+            for text in texts:
+                digest = text_hash(text)
+                key = (model, task_type, dimension, digest)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    found[text] = vector
+                    used[digest] = None
+                else:
+                    missing.setdefault(digest, []).append(text)
+            digests = list(missing)
+            for start in range(0, len(digests), _QUERY_BATCH_SIZE):
+                batch = digests[start:start + _QUERY_BATCH_SIZE]
+                rows = self._conn.execute(
+                    "SELECT text_hash, vector FROM embeddings"
+                    " WHERE model = ? AND task_type = ? AND dimension = ?"
+                    f" AND text_hash IN ({','.join('?' * len(batch))})",
+                    (model, task_type, dimension, *batch),
+                ).fetchall()
+                for digest, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    key = (model, task_type, dimension, digest)
+                    self._memory[key] = vector
+                    used[digest] = None
+                    for text in missing[digest]:
+                        found[text] = vector
+            if used:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ?"
+                        " WHERE model = ? AND task_type = ? AND dimension = ? AND text_hash = ?",
+                        [(now, model, task_type, dimension, digest) for digest in used],
+                    )
+        return found
+
+    def put_many(
+        self, model: str, task_type: str, dimension: int, items: Iterable[Tuple[str, Sequence[float]]]
+    ):
+        """Appends embeddings for texts that are not stored yet."""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, vector in items:
+                digest = text_hash(text)
+                vector = np.asarray(vector, dtype=np.float32)
+                key = (model, task_type, dimension, digest)
+                if key not in self._memory:
+                    self._memory[key] = vector
+                rows.append((model, task_type, dimension, digest, vector.tobytes(), now))
+            with self._conn:
+                before = self._conn.total_changes
+                self._conn.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._count += self._conn.total_changes - before
+                if self._count > self.max_entries:
+                    self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            with self._conn:
+                self._conn.execute("DELETE FROM embeddings")
+            self._count = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        # Other processes may have appended too; evict against the real count
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN"
+            " (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self._count -= excess
+
+
+def get_embedding_store(
+    path: str,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+) -> EmbeddingStore:
+    """
+    Returns the store of the process for `path`, opening it on first use.
+
+    A relative `path` is resolved under `default_store_dir()`. Callers asking
+    for a larger `max_entries` than the store was opened with raise its limit.
+    """
+    path = resolve_store_path(path)
+    key = os.path.realpath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            store = _stores[key] = EmbeddingStore(path, max_entries, memory_entries)
+        elif max_entries > store.max_entries:
+            store.max_entries = max_entries
+        return store
+
+
+def close_embedding_stores():
+    """Closes and forgets all shared stores (e.g. between tests)."""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
@@ -1,4 +1,5 @@
 import json
+import copy
 import datetime
 from openapi_schema_validator.validators import OAS31Validator
 from pydantic import create_model, ValidationError
@@ -8,6 +9,8 @@ from functools import wraps
 import csv
 import os
 import inspect
+import threading
+import weakref
 
 from .fc_checkers_manager import (
     FCCheckersManager,
@@ -123,10 +126,18 @@ def _transform_nullable_schema(schema):
 
     return schema
 
-def _validate_with_openapi(data, schema, service_name, func_name, data_type):
-    """Validate data against schema and return a list of formatted errors."""
+def _compile_openapi_validator(schema):
+    """Build an OAS31 validator for a copy of `schema` with 'nullable' rewritten."""
     transformed_schema = _transform_nullable_schema(json.loads(json.dumps(schema)))
-    validator = OAS31Validator(transformed_schema)
+    return OAS31Validator(transformed_schema)
+
+def _validate_with_openapi(data, schema, service_name, func_name, data_type, validator=None):
+    """Validate data against schema and return a list of formatted errors.
+
+    Pass a precompiled `validator` (see `_ValidationPlan`) to skip rebuilding it.
+    """
+    if validator is None:
+        validator = _compile_openapi_validator(schema)
     errors = list(validator.iter_errors(data))
     formatted_errors = []
 
@@ -258,9 +269,90 @@ def _is_in_exception_context():
     
     return False
 
+class _ValidationPlan:
+    """
+    Everything needed to validate one function against its spec, built once.
+
+    Holds a copy of the spec, the signature of the function (None if the spec
+    has no 'parameters' to bind) plus, for the input ('parameters') and output
+    ('response') sections of the spec, the compiled OpenAPI validator and the
+    generated Pydantic model. Validators and models are built on first use so
+    that a schema problem surfaces at the same point of the call as before.
+    """
+
+    def __init__(self, spec, signature):
+        self.spec = spec
+        self.signature = signature
+        self._validators = {}
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def validator(self, section):
+        validator = self._validators.get(section)
+        if validator is None:
+            with self._lock:
+                validator = self._validators.get(section)
+                if validator is None:
+                    validator = _compile_openapi_validator(self.spec[section])
+                    self._validators[section] = validator
+        return validator
+
+    def model(self, section, model_name):
+        model = self._models.get(section)
+        if model is None:
+            with self._lock:
+                model = self._models.get(section)
+                if model is None:
+                    model = _generate_pydantic_model_from_schema(self.spec[section], model_name)
+                    self._models[section] = model
+        return model
+
+
+# Plans keyed by (service, function, spec hash, signature), shared by every
+# wrapper of the same spec, plus a per-function shortcut holding the spec the
+# plan was built from, so the spec is hashed again only when its contents change.
+_validation_plans: Dict[tuple, _ValidationPlan] = {}
+_plans_by_func = weakref.WeakKeyDictionary()
+_validation_plans_lock = threading.Lock()
+
+def _spec_hash(spec) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+
+def _get_validation_plan(func, spec, service_name, function_name) -> _ValidationPlan:
+    """Return the cached validation plan for `func`, building it on first use."""
+    try:
+        cached = _plans_by_func.get(func)
+    except TypeError:
+        cached = None
+    if cached is not None and cached[0] == spec:
+        return cached[1]
+
+    spec = copy.deepcopy(spec)
+    signature = inspect.signature(func) if 'parameters' in spec else None
+    key = (service_name, function_name, _spec_hash(spec), str(signature))
+    with _validation_plans_lock:
+        plan = _validation_plans.get(key)
+        if plan is None:
+            plan = _ValidationPlan(spec, signature)
+            _validation_plans[key] = plan
+    try:
+        _plans_by_func[func] = (plan.spec, plan)
+    except TypeError:
+        pass
+    return plan
+
+def clear_validation_plan_cache():
+    """Drop all compiled validation plans (e.g. after specs are regenerated)."""
+    with _validation_plans_lock:
+        _validation_plans.clear()
+        _plans_by_func.clear()
+
 def validate_schema_fc_checkers(service_name, function_name: Optional[str] = None):
     """
     A decorator factory that intercepts a function call to perform validation and logging.
+
+    The transformed schemas, validators, generated models and signature for a
+    function are compiled once into a `_ValidationPlan` and reused across calls.
     """
     def decorator(func):
         @wraps(func)
@@ -275,17 +367,19 @@ def validate_schema_fc_checkers(service_name, function_name: Optional[str] = Non
             should_raise_errors = manager.should_raise_errors(service_name, effective_function_name)
             all_errors = []
             
+            spec = getattr(func, 'spec', None)
+            plan = _get_validation_plan(func, spec, service_name, effective_function_name) if spec else None
+
             # Input validation
-            if hasattr(func, 'spec') and func.spec and 'parameters' in func.spec:
-                spec = func.spec
-                bound_args = inspect.signature(func).bind(*args, **kwargs)
+            if plan is not None and 'parameters' in spec:
+                bound_args = plan.signature.bind(*args, **kwargs)
                 # bound_args.apply_defaults()
                 
                 arguments_to_validate = bound_args.arguments.copy()
 
-                all_errors.extend(_validate_with_openapi(arguments_to_validate, spec['parameters'], service_name, effective_function_name, 'input'))
+                all_errors.extend(_validate_with_openapi(arguments_to_validate, spec['parameters'], service_name, effective_function_name, 'input', plan.validator('parameters')))
                 try:
-                    GeneratedInputModel = _generate_pydantic_model_from_schema(spec['parameters'], 'GeneratedInputModel')
+                    GeneratedInputModel = plan.model('parameters', 'GeneratedInputModel')
                     validated = GeneratedInputModel(**arguments_to_validate)
                 except ValidationError as e:
                     generated_model_schema = GeneratedInputModel.model_json_schema()
@@ -318,12 +412,11 @@ def validate_schema_fc_checkers(service_name, function_name: Optional[str] = Non
             result = func(*args, **kwargs)
 
             # Output validation
-            if hasattr(func, 'spec') and func.spec and 'response' in func.spec:
-                spec = func.spec
-                all_errors.extend(_validate_with_openapi(result, spec['response'], service_name, effective_function_name, 'output'))
+            if plan is not None and 'response' in spec:
+                all_errors.extend(_validate_with_openapi(result, spec['response'], service_name, effective_function_name, 'output', plan.validator('response')))
                 if isinstance(result, (dict, str)):  # Validate dict responses and single-field string fallbacks
                     try:
-                        GeneratedOutputModel = _generate_pydantic_model_from_schema(spec['response'], 'GeneratedOutputModel')
+                        GeneratedOutputModel = plan.model('response', 'GeneratedOutputModel')
                         
                         if isinstance(result, str):
                             # Get the first field name from the output model
@@ -14,6 +14,7 @@ Key functions:
 Import these functions in your API's __init__.py file to standardize initialization patterns.
 """
 import os
+import sys
 import json
 import importlib
 import warnings
@@ -24,6 +25,8 @@ from common_utils.call_logger import log_function_call
 from common_utils.error_handling import handle_api_errors
 from common_utils.log_complexity import log_complexity
 from common_utils.mutation_manager import MutationManager
+from common_utils.decorator_cache import decorated_function_cache
+from common_utils.authentication_manager import get_auth_manager
 # Import the specific functions we need from the redesigned config module
 from common_utils.error_simulation_manager import get_active_central_config, apply_central_config_to_simulator
 from typing import Dict, Optional
@@ -165,12 +168,37 @@ def apply_decorators(original_func, service_name: str, function_name: str, fully
  
     return final_decorated_func
 
+def _decorated_function_cache_key(service_name: str, function_name: str, fully_qualified_name: str,
+                                  mutation_name: Optional[str], error_simulator) -> tuple:
+    """
+    Build the registry key for a decorated function.
+
+    Besides the identifiers, the key captures the inputs `apply_decorators`
+    consults at decoration time, so a change to any of them yields a new entry
+    instead of a stale one.
+    """
+    auth_applies = get_auth_manager().should_apply_auth(service_name, function_name)
+    try:
+        has_error_definitions = fully_qualified_name in error_simulator.error_definitions
+    except TypeError:
+        has_error_definitions = None
+    return (
+        function_name,
+        mutation_name,
+        id(error_simulator),
+        has_error_definitions,
+        auth_applies,
+        bool(get_log_records_fetched()),
+    )
+
 def resolve_function_import(name: str, _function_map: dict, error_simulator: ErrorSimulator):
     """
     Resolve and decorate function imports for __getattr__
 
     This function resolves function imports and applies all necessary decorators including
-    authentication based on the authentication manager configuration.
+    authentication based on the authentication manager configuration. Decorated functions
+    are kept in the per-service `decorated_function_cache`, so repeated lookups skip the
+    decoration chain until the relevant configuration changes.
 
     Args:
         name (str): The name of the function to resolve
@@ -180,7 +208,7 @@ def resolve_function_import(name: str, _function_map: dict, error_simulator: Err
     Returns:
         The resolved and decorated function
     """
-    package_name = _function_map[list(_function_map.keys())[0]].split(".")[0]
+    package_name = next(iter(_function_map.values())).split(".", 1)[0]
     mutation_name = MutationManager.get_current_mutation_name_for_service(package_name)
     if mutation_name:
         _function_map = MutationManager.get_current_mutation_function_map_for_service(package_name)
@@ -193,22 +221,30 @@ def resolve_function_import(name: str, _function_map: dict, error_simulator: Err
         
         module_path, attr_name = full_path.rsplit(".", 1)
         try:
-            module = importlib.import_module(module_path)
+            # Already-imported modules are served from sys.modules directly;
+            # importlib.import_module is only needed for the first import.
+            module = sys.modules.get(module_path)
+            if module is None:
+                module = importlib.import_module(module_path)
             true_original_attr = getattr(module, attr_name)
-            if callable(true_original_attr):
-                # if RESOLVE_PATHS_DEBUG_MODE: print(f"DEBUG: __getattr__ ('{name}'): Applying decorators to '{full_path}'")
-                
-                decorated_attr = apply_decorators(
-                    original_func=true_original_attr,
-                    service_name=package_name,
-                    function_name=name,
-                    fully_qualified_name=full_path,
-                    error_simulator=error_simulator
-                )
-            else:
-                decorated_attr = true_original_attr
-            
-            globals()[name] = decorated_attr
+            if not callable(true_original_attr):
+                return true_original_attr
+
+            cache_key = _decorated_function_cache_key(package_name, name, full_path, mutation_name, error_simulator)
+            decorated_attr = decorated_function_cache.get(package_name, cache_key, true_original_attr)
+            if decorated_attr is not None:
+                return decorated_attr
+
+            generation = decorated_function_cache.generation
+            # if RESOLVE_PATHS_DEBUG_MODE: print(f"DEBUG: __getattr__ ('{name}'): Applying decorators to '{full_path}'")
+            decorated_attr = apply_decorators(
+                original_func=true_original_attr,
+                service_name=package_name,
+                function_name=name,
+                fully_qualified_name=full_path,
+                error_simulator=error_simulator
+            )
+            decorated_function_cache.put(package_name, cache_key, true_original_attr, decorated_attr, generation)
             return decorated_attr
         except ImportError as e:
             print_log(f"ERROR: __getattr__ ImportError for '{module_path}' (alias '{name}'): {e}")
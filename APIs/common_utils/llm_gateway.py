@@ -0,0 +1,496 @@
+"""
+Gateway for the text generation calls of the API simulations.
+
+Every service that asks an LLM for text (copilot, cursor and device_actions
+call_llm, google_maps_live get_gemini_response, call_llm, the Gemini calls of
+ces_system_activation and ces_account_management) sends its requests through
+`llm_gateway`, which adds, around the backend call of the service:
+
+- a content-addressed response cache, keyed by the sha256 of (model, system
+  prompt, temperature, prompt, and the response format and extras of the
+  request when set); disabled unless `cache_size` is set;
+- record and replay: in "record" mode, responses are appended to a JSONL
+  cassette file and requests already in it are answered from it; in "replay"
+  mode, requests are only answered from the cassette;
+- an "offline" mode, where a local stand-in (by default a RuleBasedBackend,
+  loaded from a rules file if one is given) answers instead of the network;
+- a token bucket on the rate of backend calls and a cap on concurrent ones;
+- retries with exponential backoff and jitter, for rate limiting, server and
+  connection errors only (and timeouts, unless the caller set its own);
+- per-service counters of calls, cache hits, replays, retries, errors,
+  latency, tokens and cost.
+
+The gateway is configured from the environment when it is imported
+(LLM_GATEWAY_MODE, LLM_GATEWAY_CASSETTE, LLM_GATEWAY_RULES,
+LLM_GATEWAY_CACHE_SIZE, LLM_GATEWAY_RATE, LLM_GATEWAY_BURST,
+LLM_GATEWAY_MAX_CONCURRENCY, LLM_GATEWAY_MAX_RETRIES), and can be
+reconfigured with `llm_gateway.configure(...)`.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from google import genai
+
+MODES = ("live", "record", "replay", "offline")
+# HTTP statuses of errors worth retrying: rate limiting and server-side failures
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+# Those of them that report a timeout
+TIMEOUT_STATUSES = frozenset({408, 504})
+
+
+class LLMGatewayError(RuntimeError):
+    """Base class of the errors raised by the gateway itself."""
+
+
+class LLMReplayMissError(LLMGatewayError):
+    """A request to replay is not in the cassette."""
+
+
+class LLMResponseError(LLMGatewayError):
+    """The backend answered without usable text; never retried."""
+
+
+class LLMRequest:
+    """
+    What a text generation call asks for; two equal requests share a key.
+
+    `response_mime_type` asks for a response format (e.g. "application/json"),
+    and `extras` names the other inputs of the call that change its response
+    (uploaded files, tools); both are part of the key only when set.
+    """
+    __slots__ = ("prompt", "model", "system_prompt", "temperature", "response_mime_type", "extras")
+
+    def __init__(self, prompt: str, model: str, system_prompt: Optional[str] = None,
+                 temperature: Optional[float] = None, response_mime_type: Optional[str] = None,
+                 extras: Iterable[str] = ()):
+        self.prompt = prompt
+        self.model = model
+        self.system_prompt = system_prompt
+        self.temperature = temperature
+        self.response_mime_type = response_mime_type
+        self.extras = tuple(extras)
+
+    @property
+    def key(self) -> str:
+        fields = [self.model, self.system_prompt, self.temperature, self.prompt]
+        if self.response_mime_type is not None or self.extras:
+            fields += [self.response_mime_type, list(self.extras)]
+        payload = json.dumps(fields, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def to_dict(self) -> Dict[str, Any]:
+        fields = {"model": self.model, "system_prompt": self.system_prompt,
+                  "temperature": self.temperature, "prompt": self.prompt}
+        if self.response_mime_type is not None or self.extras:
+            fields.update(response_mime_type=self.response_mime_type, extras=list(self.extras))
+        return fields
+
+
+class LLMResponse:
+    """
+    Text of a response, with its token counts when the backend reports them.
+
+    `raw` is the backend's own response object, for callers that read more
+    than the text (e.g. function calls). It is only kept in memory, so it is
+    None for responses replayed from a cassette or answered offline.
+    """
+    __slots__ = ("text", "input_tokens", "output_tokens", "raw")
+
+    def __init__(self, text: str, input_tokens: Optional[int] = None, output_tokens: Optional[int] = None,
+                 raw: Any = None):
+        self.text = text
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.raw = raw
+
+    @classmethod
+    def of(cls, value: Union["LLMResponse", str]) -> "LLMResponse":
+        return value if isinstance(value, LLMResponse) else cls(value)
+
+
+def usage_of(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt tokens, output tokens) of a google-genai response, None where unknown."""
+    usage = getattr(response, "usage_metadata", None)
+    counts = (getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None))
+    return tuple(count if isinstance(count, int) and not isinstance(count, bool) else None for count in counts)
+
+
+def is_transient(error: BaseException, retry_timeouts: bool = True) -> bool:
+    """
+    Whether a backend error is worth retrying. Timeouts are not when
+    `retry_timeouts` is False, i.e. when the caller set its own timeout.
+    """
+    if isinstance(error, TimeoutError):
+        return retry_timeouts
+    if isinstance(error, ConnectionError):
+        return True
+    for status in (getattr(error, "code", None), getattr(error, "status_code", None),
+                   getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(status, int) and status in RETRYABLE_STATUSES:
+            return retry_timeouts or status not in TIMEOUT_STATUSES
+    return False
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, and bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Takes a token, waiting for one if needed; returns the time waited."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RuleBasedBackend:
+    """
+    Offline stand-in for an LLM: answers with the response of the first rule
+    whose pattern is found in the prompt (and whose service matches, if the
+    rule names one), or with `default`. A response may be a string or a
+    callable taking the request.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, Any]] = (), default: Any = "OK",
+                 service_rules: Optional[Dict[str, List[Tuple[str, Any]]]] = None):
+        self.rules = [(re.compile(pattern, re.DOTALL), response) for pattern, response in rules]
+        self.service_rules = {service: [(re.compile(pattern, re.DOTALL), response) for pattern, response in rules]
+                              for service, rules in (service_rules or {}).items()}
+        self.default = default
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleBasedBackend":
+        """
+        Rules from a JSON file:
+        {"default": "...", "rules": [{"pattern": "...", "response": "...", "service": "..."}]}
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        rules, service_rules = [], {}
+        for rule in spec.get("rules", []):
+            target = service_rules.setdefault(rule["service"], []) if rule.get("service") else rules
+            target.append((rule["pattern"], rule["response"]))
+        return cls(rules, default=spec.get("default", "OK"), service_rules=service_rules)
+
+    def generate(self, request: LLMRequest, service: Optional[str] = None) -> LLMResponse:
+        for pattern, response in self.service_rules.get(service, []) + self.rules:
+            if pattern.search(request.prompt):
+                return LLMResponse.of(response(request) if callable(response) else response)
+        return LLMResponse.of(self.default(request) if callable(self.default) else self.default)
+
+
+class GeminiBackend:
+    """google-genai backend, sharing one client per API key and HTTP options."""
+
+    _MAX_CLIENTS = 16
+
+    def __init__(self):
+        self._clients: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def client(self, http_options: Any = None, api_key: Optional[str] = None) -> Any:
+        """The client for `api_key` (by default the one genai.Client reads from the environment)."""
+        # genai.Client is part of the key so that a patched client class gets its own clients
+        key = (genai.Client, api_key or os.getenv("GOOGLE_API_KEY"), repr(http_options))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                if len(self._clients) >= self._MAX_CLIENTS:
+                    self._clients.clear()
+                options = {}
+                if api_key:
+                    options["api_key"] = api_key
+                if http_options:
+                    options["http_options"] = http_options
+                client = genai.Client(**options)
+                self._clients[key] = client
+            return client
+
+    def generate(self, request: LLMRequest, http_options: Any = None, api_key: Optional[str] = None) -> LLMResponse:
+        config = {"temperature": request.temperature}
+        if request.system_prompt:
+            config["system_instruction"] = request.system_prompt
+        if request.response_mime_type:
+            config["response_mime_type"] = request.response_mime_type
+        response = self.client(http_options, api_key).models.generate_content(
+            model=request.model,
+            contents=request.prompt,
+            config=genai.types.GenerateContentConfig(**config),
+        )
+        return LLMResponse(gemini_response_text(response, request.model), *usage_of(response), raw=response)
+
+
+def gemini_response_text(response: Any, model: str) -> str:
+    """Text of the first candidate of a google-genai response; LLMResponseError if it has none."""
+    if response.candidates and response.candidates[0].content and \
+       response.candidates[0].content.parts and \
+       response.candidates[0].content.parts[0].text is not None:
+        return response.candidates[0].content.parts[0].text
+    # Gather feedback details if the response is not usable.
+    feedback_info = "N/A"
+    if hasattr(response, 'prompt_feedback') and response.prompt_feedback:
+        feedback_info = str(response.prompt_feedback)
+    elif hasattr(response, 'candidates') and response.candidates and \
+            hasattr(response.candidates[0], 'finish_reason'):
+        finish_reason_val = response.candidates[0].finish_reason
+        if isinstance(finish_reason_val, genai.types.Candidate.FinishReason):
+            if finish_reason_val != genai.types.Candidate.FinishReason.STOP:
+                feedback_info = f"Finish reason: {finish_reason_val.name}"
+        elif finish_reason_val is not None:
+            feedback_info = f"Finish reason: {str(finish_reason_val)}"
+    raise LLMResponseError(f"LLM (model: {model}) returned no usable text content. Feedback: {feedback_info}")
+
+
+class ResponseCassette:
+    """Responses by request key, loaded from and appended to a JSONL file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._responses: Dict[str, LLMResponse] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._responses[entry["key"]] = LLMResponse(
+                            entry["response"], entry.get("input_tokens"), entry.get("output_tokens"))
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        return self._responses.get(key)
+
+    def record(self, request: LLMRequest, response: LLMResponse, service: str):
+        entry = {"key": request.key, "service": service, **request.to_dict(), "response": response.text,
+                 "input_tokens": response.input_tokens, "output_tokens": response.output_tokens}
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._responses[request.key] = response
+
+
+def _new_stats() -> Dict[str, Any]:
+    return {"calls": 0, "backend_calls": 0, "cache_hits": 0, "replayed": 0, "recorded": 0, "offline": 0,
+            "retries": 0, "errors": 0, "latency_seconds": 0.0, "throttled_seconds": 0.0,
+            "input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+
+
+class LLMGateway:
+    """Routes the text generation calls of every service; see the module docstring."""
+
+    def __init__(self, mode: str = "live", cassette_path: Optional[str] = None, cache_size: int = 0,
+                 rate_per_second: float = 0.0, burst: int = 1, max_concurrency: int = 0, max_retries: int = 2,
+                 retry_base_delay: float = 0.5, retry_max_delay: float = 8.0,
+                 offline_backend: Optional[RuleBasedBackend] = None,
+                 prices: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.backend = GeminiBackend()
+        self.mode = "live"
+        self.cassette: Optional[ResponseCassette] = None
+        self.cache_size = 0
+        self._cache: "OrderedDict[str, LLMResponse]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.bucket = TokenBucket(0.0)
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._stats_lock = threading.Lock()
+        self.configure(mode=mode, cassette_path=cassette_path, cache_size=cache_size,
+                       rate_per_second=rate_per_second, burst=burst, max_concurrency=max_concurrency,
+                       max_retries=max_retries, retry_base_delay=retry_base_delay,
+                       retry_max_delay=retry_max_delay, offline_backend=offline_backend, prices=prices)
+
+    @classmethod
+    def from_env(cls) -> "LLMGateway":
+        rules_path = os.getenv("LLM_GATEWAY_RULES")
+        return cls(
+            mode=os.getenv("LLM_GATEWAY_MODE", "live"),
+            cassette_path=os.getenv("LLM_GATEWAY_CASSETTE") or None,
+            cache_size=int(os.getenv("LLM_GATEWAY_CACHE_SIZE", "0")),
+            rate_per_second=float(os.getenv("LLM_GATEWAY_RATE", "0")),
+            burst=int(os.getenv("LLM_GATEWAY_BURST", "1")),
+            max_concurrency=int(os.getenv("LLM_GATEWAY_MAX_CONCURRENCY", "0")),
+            max_retries=int(os.getenv("LLM_GATEWAY_MAX_RETRIES", "2")),
+            offline_backend=RuleBasedBackend.from_file(rules_path) if rules_path else None,
+        )
+
+    def configure(self, **settings):
+        """
+        Changes the given settings: mode, cassette_path, cache_size,
+        rate_per_second, burst, max_concurrency, max_retries, retry_base_delay,
+        retry_max_delay, offline_backend, prices ({model: (cost per million
+        input tokens, cost per million output tokens)}).
+        """
+        if "cassette_path" in settings:
+            path = settings["cassette_path"]
+            self.cassette = ResponseCassette(path) if path else None
+        if "mode" in settings:
+            if settings["mode"] not in MODES:
+                raise ValueError(f"Unknown LLM gateway mode '{settings['mode']}'; expected one of {', '.join(MODES)}")
+            self.mode = settings["mode"]
+        if self.mode in ("record", "replay") and self.cassette is None:
+            raise ValueError(f"LLM gateway mode '{self.mode}' needs a cassette file (LLM_GATEWAY_CASSETTE)")
+        if "cache_size" in settings:
+            with self._cache_lock:
+                self.cache_size = max(0, int(settings["cache_size"]))
+                self._cache.clear()
+        if "rate_per_second" in settings or "burst" in settings:
+            self.bucket = TokenBucket(settings.get("rate_per_second", self.bucket.rate),
+                                      settings.get("burst", self.bucket.burst))
+        if "max_concurrency" in settings:
+            limit = settings["max_concurrency"]
+            self._slots = threading.BoundedSemaphore(limit) if limit and limit > 0 else None
+        for name in ("max_retries", "retry_base_delay", "retry_max_delay"):
+            if name in settings:
+                setattr(self, name, settings[name])
+        if "offline_backend" in settings:
+            self.offline_backend = settings["offline_backend"] or RuleBasedBackend()
+        if "prices" in settings:
+            self.prices = dict(settings["prices"] or {})
+
+    @property
+    def uses_backend(self) -> bool:
+        """Whether calls may reach the real backend (and so need its credentials)."""
+        return self.mode in ("live", "record")
+
+    def complete(self, request: LLMRequest, service: str,
+                 live: Optional[Callable[[LLMRequest], Union[LLMResponse, str]]] = None,
+                 retry_timeouts: bool = True) -> str:
+        """
+        Text of the response to `request`, on behalf of `service`.
+
+        `live` calls the real backend; it defaults to the shared google-genai
+        backend. Errors of the backend are raised as they are, once retries are
+        exhausted. Callers that set their own timeout pass
+        `retry_timeouts=False`, so that a call that timed out is not retried.
+        """
+        return self.respond(request, service, live, retry_timeouts).text
+
+    def respond(self, request: LLMRequest, service: str,
+                live: Optional[Callable[[LLMRequest], Union[LLMResponse, str]]] = None,
+                retry_timeouts: bool = True) -> LLMResponse:
+        """`complete`, returning the whole LLMResponse."""
+        stats = self._service_stats(service)
+        started = time.perf_counter()
+        self._count(stats, calls=1)
+        try:
+            response, source = self._respond(request, service, live or self.backend.generate, stats,
+                                             retry_timeouts)
+        except Exception:
+            self._count(stats, errors=1, latency_seconds=time.perf_counter() - started)
+            raise
+        self._count(stats, **{source: 1}, latency_seconds=time.perf_counter() - started)
+        return response
+
+    def _respond(self, request: LLMRequest, service: str, live: Callable, stats: Dict[str, Any],
+                 retry_timeouts: bool = True):
+        if self.mode == "offline":
+            response = self.offline_backend.generate(request, service)
+            return response, "offline"
+        key = request.key
+        if self.mode in ("record", "replay"):
+            response = self.cassette.get(key)
+            if response is not None:
+                return response, "replayed"
+            if self.mode == "replay":
+                raise LLMReplayMissError(
+                    f"No recorded response for {service} request {key[:12]} (model {request.model}) "
+                    f"in {self.cassette.path}")
+        if self.cache_size:
+            with self._cache_lock:
+                response = self._cache.get(key)
+                if response is not None:
+                    self._cache.move_to_end(key)
+                    return response, "cache_hits"
+        response = self._call_backend(request, live, stats, retry_timeouts)
+        if self.mode == "record":
+            self.cassette.record(request, response, service)
+            self._count(stats, recorded=1)
+        if self.cache_size:
+            with self._cache_lock:
+                self._cache[key] = response
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return response, "backend_calls"
+
+    def _call_backend(self, request: LLMRequest, live: Callable, stats: Dict[str, Any],
+                      retry_timeouts: bool = True) -> LLMResponse:
+        attempt = 0
+        while True:
+            self._count(stats, throttled_seconds=self.bucket.acquire())
+            slots = self._slots
+            if slots is not None:
+                slots.acquire()
+            try:
+                response = LLMResponse.of(live(request))
+            except LLMGatewayError:
+                raise
+            except Exception as error:
+                if attempt >= self.max_retries or not is_transient(error, retry_timeouts):
+                    raise
+            else:
+                self._count_usage(stats, request, response)
+                return response
+            finally:
+                if slots is not None:
+                    slots.release()
+            attempt += 1
+            self._count(stats, retries=1)
+            # Exponential backoff with full jitter
+            time.sleep(random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)))
+
+    def _count_usage(self, stats: Dict[str, Any], request: LLMRequest, response: LLMResponse):
+        input_tokens, output_tokens = response.input_tokens or 0, response.output_tokens or 0
+        input_price, output_price = self.prices.get(request.model, (0.0, 0.0))
+        self._count(stats, input_tokens=input_tokens, output_tokens=output_tokens,
+                    cost=(input_tokens * input_price + output_tokens * output_price) / 1e6)
+
+    def _service_stats(self, service: str) -> Dict[str, Any]:
+        with self._stats_lock:
+            return self._stats.setdefault(service, _new_stats())
+
+    def _count(self, stats: Dict[str, Any], **amounts):
+        with self._stats_lock:
+            for name, amount in amounts.items():
+                stats[name] += amount
+
+    def stats(self, service: Optional[str] = None) -> Dict[str, Any]:
+        """Counters of one service, or of every service by name."""
+        with self._stats_lock:
+            if service is not None:
+                return dict(self._stats.get(service) or _new_stats())
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+
+llm_gateway = LLMGateway.from_env()
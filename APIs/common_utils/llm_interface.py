@@ -1,68 +1,76 @@
 from google import genai
 from google.genai import types
-from cachetools import LRUCache
+import hashlib
 import os
 import pickle
+import re
+
+import numpy as np
+
+from .embedding_store import get_embedding_store, is_sqlite_file
+
 
 class GeminiEmbeddingManager:
     def __init__(self, gemini_api_key: str, lru_cache_file_path: str = None, max_cache_size: int = 1000):
         """
         Initializes the GeminiEmbeddingManager.
 
+        Embeddings are cached in a persistent store shared by all managers of the
+        process that use the same cache file (see common_utils.embedding_store).
+        The store is opened on the first call to embed_content.
+
         Args:
             gemini_api_key (str): API key for Gemini.
-            lru_cache_file_path (Optional[str]): Path to the LRUCache file. If None, caching is disabled. Defaults to None.
-            max_cache_size (int): Maximum size of the LRUCache.
+            lru_cache_file_path (Optional[str]): Path to the embedding store file. If None, caching is disabled. Defaults to None.
+            max_cache_size (int): Maximum number of embeddings kept in the store.
         """
         self.gemini_api_key = gemini_api_key
-        self.cache = None
         self.lru_cache_file_path = lru_cache_file_path
-        if lru_cache_file_path:
-            self.cache = LRUCache(maxsize=max_cache_size)
-            if os.path.exists(lru_cache_file_path):
-                with open(lru_cache_file_path, "rb") as f:
-                    # Use list to avoid unnecessary dict conversion
-                    try:
-                        for k, v in pickle.load(f):
-                            self.cache[k] = v
-                    except (pickle.UnpicklingError, EOFError, ValueError) as e:
-                        print(f"Warning: Could not load cache file at '{lru_cache_file_path}'. Starting with an empty cache. Error: {e}")
-                        self.cache = LRUCache(maxsize=max_cache_size) # Reset cache
-            else:
-                self._save_cache()
-        
+        self.max_cache_size = max_cache_size
+        self.store = None
+        # Entries of a cache file written in the former pickle format, keyed by text only
+        self._legacy_cache = {}
         self.client = None
 
-    def _save_cache(self):
-        if self.lru_cache_file_path and self.cache is not None:
-            # Use list(self.cache.items()) for efficient serialization
-            with open(self.lru_cache_file_path, "wb") as f:
-                pickle.dump(list(self.cache.items()), f)
+    def _open_store(self):
+        if self.store is not None or not self.lru_cache_file_path:
+            return self.store
+        store_path = self.lru_cache_file_path
+        if os.path.exists(store_path) and os.path.getsize(store_path) and not is_sqlite_file(store_path):
+            # Pickle cache from an earlier version: keep it as a read-only fallback
+            try:
+                with open(store_path, "rb") as f:
+                    self._legacy_cache = dict(pickle.load(f))
+            except (pickle.UnpicklingError, EOFError, ValueError, TypeError) as e:
+                print(f"Warning: Could not load cache file at '{store_path}'. Starting with an empty cache. Error: {e}")
+            store_path = f"{store_path}.sqlite"
+        self.store = get_embedding_store(store_path, max_entries=self.max_cache_size)
+        return self.store
 
     def _embed_batch(self, gemini_model: str, texts: list[str], embedding_task_type: str, embedding_size: int, batch_size: int = 100):
         """
         Helper to call the embedding API for a batch of texts.
         Automatically splits large batches into smaller chunks to avoid API limits.
-        
+
         Args:
             gemini_model (str): Model name to use.
             texts (list[str]): List of texts to embed.
             embedding_task_type (str): Task type for embedding.
             embedding_size (int): Output dimensionality for embeddings.
             batch_size (int): Maximum number of texts to embed in a single API call. Defaults to 100.
-            
+
         Returns:
             list: List of embeddings, one for each input text.
         """
         if self.client is None:
             self.client = genai.Client(api_key=self.gemini_api_key)
-        
+
         all_embeddings = []
-        
+
         # Process texts in batches
         for i in range(0, len(texts), batch_size):
             batch = texts[i:i + batch_size]
-            
+
             embedContentResponse = self.client.models.embed_content(
                 model=gemini_model,
                 contents=batch,
@@ -71,16 +79,16 @@ class GeminiEmbeddingManager:
                     output_dimensionality=embedding_size,
                 ),
             )
-            
+
             # Collect embeddings from this batch
             batch_embeddings = [embedding.values for embedding in embedContentResponse.embeddings]
             all_embeddings.extend(batch_embeddings)
-        
+
         return all_embeddings
 
     def embed_content(self, gemini_model: str, uncached_texts: list[str], embedding_task_type: str, embedding_size: int):
         """
-        Calls the Gemini API to generate embeddings for the provided texts, using the LRUCache for caching.
+        Calls the Gemini API to generate embeddings for the provided texts, using the embedding store for caching.
 
         Args:
             gemini_model (str): Model name to use.
@@ -89,19 +97,23 @@ class GeminiEmbeddingManager:
             embedding_size (int): Output dimensionality for embeddings.
 
         Returns:
-            Embeddings as returned by genai.embed_content.
+            Embeddings as returned by genai.embed_content. With a cache file, the
+            embeddings of non-empty texts are rounded to float32, as stored, so
+            they are the same whether they were cached or not.
         """
         # Fast path: all empty
         if not any(uncached_texts):
             return {"embedding": [[0.0] * embedding_size for _ in uncached_texts]}
 
+        store = self._open_store()
+
         # If no cache, batch call for all non-empty
-        if self.cache is None:
+        if store is None:
             non_empty_indices = [i for i, t in enumerate(uncached_texts) if t]
             non_empty_texts = [uncached_texts[i] for i in non_empty_indices]
             if not non_empty_texts:
                 return {"embedding": [[0.0] * embedding_size for _ in uncached_texts]}
-            
+
             embeddings = self._embed_batch(gemini_model, non_empty_texts, embedding_task_type, embedding_size)
 
             # Pre-allocate result and fill in
@@ -110,27 +122,55 @@ class GeminiEmbeddingManager:
                 result[idx] = emb
             return {"embedding": result}
 
-        # With cache: check all at once, batch only uncached
+        # With cache: look all texts up at once, batch only uncached
+        cached = store.get_many(gemini_model, embedding_task_type, embedding_size, [t for t in uncached_texts if t])
         results = [None] * len(uncached_texts)
-        uncached = []
-        uncached_indices = []
+        uncached = {}
+        migrated = []
         for idx, text in enumerate(uncached_texts):
             if not text:
                 results[idx] = [0.0] * embedding_size
+            elif text in cached:
+                results[idx] = cached[text].tolist()
+            elif text in self._legacy_cache and len(self._legacy_cache[text]) == embedding_size:
+                results[idx] = np.asarray(self._legacy_cache[text], dtype=np.float32).tolist()
+                migrated.append((text, results[idx]))
             else:
-                cached = self.cache.get(text, None)
-                if cached is not None:
-                    results[idx] = cached
-                else:
-                    uncached.append(text)
-                    uncached_indices.append(idx)
+                uncached.setdefault(text, []).append(idx)
 
+        new_entries = migrated
         if uncached:
             # Batch call for all uncached
-            embeddings = self._embed_batch(gemini_model, uncached, embedding_task_type, embedding_size)
-            for idx, emb, text in zip(uncached_indices, embeddings, uncached):
-                self.cache[text] = emb
-                results[idx] = emb
-            self._save_cache()
+            texts = list(uncached)
+            embeddings = self._embed_batch(gemini_model, texts, embedding_task_type, embedding_size)
+            for text, emb in zip(texts, embeddings):
+                emb = np.asarray(emb, dtype=np.float32).tolist()
+                for idx in uncached[text]:
+                    results[idx] = emb
+                new_entries.append((text, emb))
+        if new_entries:
+            store.put_many(gemini_model, embedding_task_type, embedding_size, new_entries)
 
         return {"embedding": results}
+
+
+class FakeEmbeddingManager(GeminiEmbeddingManager):
+    """
+    Deterministic, offline stand-in for GeminiEmbeddingManager.
+
+    A text is embedded as the normalized sum of pseudo-random vectors seeded by
+    its words, so texts sharing words get similar embeddings. Caching behaves
+    exactly as for the real manager.
+    """
+
+    def _embed_batch(self, gemini_model: str, texts: list[str], embedding_task_type: str, embedding_size: int, batch_size: int = 100):
+        return [fake_embedding(text, embedding_size) for text in texts]
+
+
+def fake_embedding(text: str, embedding_size: int) -> list:
+    vector = np.zeros(embedding_size)
+    for token in re.findall(r"\w+", text.lower()) or [text]:
+        seed = int.from_bytes(hashlib.sha256(token.encode("utf-8")).digest()[:8], "little")
+        vector += np.random.default_rng(seed).standard_normal(embedding_size)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
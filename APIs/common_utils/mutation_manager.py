@@ -8,6 +8,7 @@ import sys
 import importlib
 import shutil
 from .utils import discover_services
+from .decorator_cache import invalidate_decorated_functions
 
 class MutationManager:
     _mutation_names = {}
@@ -244,6 +245,7 @@ class MutationManager:
         """
         MutationManager._validate_and_generate_mutation_path_for_service(service_name, mutation_name)
         MutationManager._mutation_names[service_name] = mutation_name
+        invalidate_decorated_functions(service_name)
 
         # --- SCHEMA BACKUP/REPLACE LOGIC ---
         if mutation_name:
@@ -0,0 +1,48 @@
+# common_utils/page_tokens.py
+"""
+Keyset page tokens of list endpoints.
+
+A page token is an opaque, URL-safe string recording the sort key of the last
+item returned and a fingerprint of the request it belongs to. The next page
+starts right after that key, so pages stay stable when items are added or
+removed elsewhere in the result between two calls. Tokens are rejected when
+they are reused with a different request.
+"""
+import base64
+import hashlib
+import json
+from typing import Any, Optional, Sequence, Tuple
+
+SortKey = Tuple[Any, ...]
+
+
+def query_fingerprint(*parts: Any) -> str:
+    """Short fingerprint of the request parameters a page token is bound to."""
+    encoded = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_page_token(last_key: Sequence[Any], fingerprint: str) -> str:
+    payload = json.dumps({"k": list(last_key), "q": fingerprint}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_page_token(page_token: Optional[str], fingerprint: str) -> Optional[SortKey]:
+    """
+    Returns the sort key a page token resumes after, or None for the first page.
+
+    Raises:
+        ValueError: If the token is malformed or was issued for another request.
+    """
+    if not page_token:
+        return None
+    try:
+        padded = page_token + "=" * (-len(page_token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        last_key = tuple(payload["k"])
+        token_fingerprint = payload["q"]
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise ValueError("Invalid page_token.")
+    if token_fingerprint != fingerprint:
+        raise ValueError("page_token does not match the request parameters.")
+    return last_key
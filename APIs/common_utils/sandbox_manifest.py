@@ -0,0 +1,211 @@
+"""
+Manifest of a terminal sandbox, used to sync it with the DB incrementally.
+
+After each command the sandbox is walked to bring the DB file_system up to
+date. Reading every file again (and sniffing it for binary content) makes each
+command cost O(workspace bytes), although most commands change few files, if
+any. The manifest remembers, per file (by DB path), the stat signature it had
+when it was last read and the content_lines read from it, so a file whose
+signature is unchanged is not read again.
+
+It also tells whether a DB entry still holds the content last read from the
+sandbox, so that only DB entries changed since then are written back to the
+sandbox before a command. The DB file_system stored by the walk is change
+tracked (see common_utils.tracked_db), and the manifest remembers the version
+of it the sandbox was last in sync with, so that only the DB entries changed
+since are compared with the content last read.
+
+The metadata collected around each command (lstat, for the change times of
+the files it did not touch) is recorded as well. The pass after a command
+stats each DB path once, and the walk that follows reuses those stats; the
+pass before the next command takes the metadata recorded then, as the sandbox
+is only written to in between by the sync, which drops the records of the
+paths it writes and of their directories.
+
+A signature that is too recent to be trusted (the file may still change within
+the filesystem's timestamp granularity without its signature changing) is not
+trusted, so such files are read again on the next sync.
+"""
+import copy
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .tracked_db import get_change_tracker
+
+# (st_mtime_ns, st_ctime_ns, st_size, st_ino, st_mode)
+StatSignature = Tuple[int, int, int, int, int]
+
+# Signatures changed less than this long before they are recorded are not trusted
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def stat_signature(stat_result: os.stat_result) -> StatSignature:
+    return (
+        stat_result.st_mtime_ns,
+        stat_result.st_ctime_ns,
+        stat_result.st_size,
+        stat_result.st_ino,
+        stat_result.st_mode,
+    )
+
+
+def content_hash(content_lines: Sequence[str]) -> str:
+    digest = hashlib.sha1()
+    for line in content_lines:
+        digest.update(line.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class ManifestEntry(NamedTuple):
+    # None if the signature was too recent to be trusted
+    signature: Optional[StatSignature]
+    content_hash: str
+    content_lines: Tuple[str, ...]
+
+
+class StatRecord(NamedTuple):
+    # Stat pass the record was made in
+    stat_pass: int
+    # os.stat(path, follow_symlinks=False)
+    stat_result: os.stat_result
+    metadata: Dict[str, Any]
+
+
+class SandboxManifest:
+    """Stat signature and last read content of each file of one sandbox."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.RLock()
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._stats: Dict[str, StatRecord] = {}
+        self._stat_pass = 0
+        self._stat_pass_open = False
+        # Tracked DB file_system the sandbox was last in sync with, and its version then
+        self._db_file_system: Optional[Dict[str, Any]] = None
+        self._db_version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cached_content_lines(self, path: str, stat_result: os.stat_result) -> Optional[List[str]]:
+        """content_lines last read from `path`, or None if the file changed since (or was never read)."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.signature is None or entry.signature != stat_signature(stat_result):
+                return None
+            return list(entry.content_lines)
+
+    def record(self, path: str, stat_result: os.stat_result, content_lines: Sequence[str]) -> None:
+        """Records the content read from `path` while it had `stat_result`."""
+        with self._lock:
+            signature = stat_signature(stat_result)
+            if max(signature[0], signature[1]) > time.time_ns() - RACY_WINDOW_NS:
+                signature = None
+            lines = tuple(content_lines)
+            self._entries[path] = ManifestEntry(signature, content_hash(lines), lines)
+
+    def is_known(self, path: str) -> bool:
+        """Whether the content of `path` was read (and not forgotten since)."""
+        with self._lock:
+            return path in self._entries
+
+    def is_synced(self, path: str, content_lines: Sequence[str]) -> Optional[bool]:
+        """
+        Whether `content_lines` (of a DB entry) is the content last read from `path`.
+
+        Returns None if nothing is known about the path.
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            if tuple(content_lines) == entry.content_lines:
+                return True
+            return content_hash(content_lines) == entry.content_hash
+
+    def mark_db_synced(self, file_system: Dict[str, Any]) -> None:
+        """Records that the sandbox reflects the DB `file_system` as it is now."""
+        with self._lock:
+            tracker = get_change_tracker(file_system)
+            self._db_file_system = file_system if tracker is not None else None
+            self._db_version = tracker.version if tracker is not None else None
+
+    def db_changes(self, file_system: Dict[str, Any]) -> Optional[Set[str]]:
+        """
+        The DB paths changed in `file_system` since `mark_db_synced`.
+
+        Returns None if that is not known (`file_system` is untracked, was
+        replaced, or changed as a whole), in which case every entry may have
+        changed.
+        """
+        with self._lock:
+            tracker = get_change_tracker(file_system)
+            if tracker is None or file_system is not self._db_file_system:
+                return None
+            changes = tracker.changes_since(self._db_version)
+            if changes is None or any(not path for path in changes):
+                return None
+            return {path[0] for path in changes}
+
+    def begin_stat_pass(self) -> None:
+        """Starts a pass over the sandbox: the stats recorded from now on are current until `end_stat_pass`."""
+        with self._lock:
+            self._stat_pass += 1
+            self._stat_pass_open = True
+
+    def end_stat_pass(self) -> None:
+        with self._lock:
+            self._stat_pass_open = False
+
+    def record_stat(self, path: str, stat_result: os.stat_result, metadata: Dict[str, Any]) -> None:
+        """Records the lstat of `path` and the metadata collected from it."""
+        with self._lock:
+            self._stats[path] = StatRecord(self._stat_pass, stat_result, copy.deepcopy(metadata))
+
+    def current_stat(self, path: str) -> Optional[StatRecord]:
+        """The stat of `path` recorded in the open stat pass, or None."""
+        with self._lock:
+            record = self._stats.get(path)
+            if record is None or not self._stat_pass_open or record.stat_pass != self._stat_pass:
+                return None
+            return record._replace(metadata=copy.deepcopy(record.metadata))
+
+    def last_metadata(self, path: str) -> Optional[Dict[str, Any]]:
+        """The metadata last recorded for `path`, or None if it was dropped (or never recorded)."""
+        with self._lock:
+            record = self._stats.get(path)
+            return None if record is None else copy.deepcopy(record.metadata)
+
+    def forget_stats(self, path: str) -> None:
+        """Drops the stats of `path` and of the directories above it, which change when it is written."""
+        with self._lock:
+            while True:
+                self._stats.pop(path, None)
+                parent = os.path.dirname(path)
+                if parent == path:
+                    break
+                path = parent
+
+    def forget(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def retain(self, paths: Set[str]) -> None:
+        """Drops the entries (and stats) of the paths that are no longer in the sandbox."""
+        with self._lock:
+            for path in [path for path in self._entries if path not in paths]:
+                del self._entries[path]
+            for path in [path for path in self._stats if path not in paths]:
+                del self._stats[path]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+            self._stat_pass_open = False
+            self._db_file_system = None
+            self._db_version = None
@@ -1,21 +1,42 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import List, Any, Dict, TYPE_CHECKING
+from typing import List, Any, Dict, Hashable, Iterator, Optional, Set, Tuple, TYPE_CHECKING
 
 from .models import SearchableDocument
+from ..tracked_db import get_change_tracker
 
 if TYPE_CHECKING:
     from .strategies import SearchStrategy
 
+RecordPath = Tuple[Hashable, ...]
+
+_MISSING = object()
+
 
 class Adapter(ABC):
     """
     Abstract base class for service-specific data adapters. It provides methods
     for converting a service's database into searchable documents and keeping
     the search index synchronized with the database state.
+
+    Adapters whose service DB is change-tracked (see common_utils.tracked_db)
+    can opt in to incremental syncs by listing the DB paths that hold their
+    records in `tracked_collections` (use "*" to match any key, e.g.
+    ("users", "*", "messages")), returning the DB from `get_tracked_db` and
+    implementing `record_to_searchable_documents`. Syncs then only re-chunk
+    the records that changed since the previous sync, and do no work at all
+    when the DB has not changed.
     """
+    tracked_collections: Tuple[RecordPath, ...] = ()
+
     def __init__(self):
         self._strategy_to_last_searchable_documents: Dict[str, Dict[str, SearchableDocument]] = {}
+        # strategy name -> (tracker, version) the strategy was last synced at
+        self._strategy_to_synced_version: Dict[str, Tuple[Any, int]] = {}
+        # strategy name -> record path -> chunk ids produced by that record
+        self._strategy_to_record_chunk_ids: Dict[str, Dict[RecordPath, Set[str]]] = {}
+        # strategy name -> chunk id -> number of records producing it
+        self._strategy_to_chunk_owners: Dict[str, Dict[str, int]] = {}
 
     @abstractmethod
     def db_to_searchable_documents(self) -> List[SearchableDocument]:
@@ -25,6 +46,35 @@ class Adapter(ABC):
         """
         raise NotImplementedError("Subclasses must implement this method")
 
+    def get_tracked_db(self) -> Any:
+        """
+        Returns the service DB holding `tracked_collections`. Incremental syncs
+        are only used while this is a change-tracked DB.
+        """
+        return None
+
+    def record_to_searchable_documents(self, record_path: RecordPath, record: Any) -> List[SearchableDocument]:
+        """
+        Converts a single record, stored at `record_path` in the DB, into
+        searchable documents. Required for adapters with `tracked_collections`.
+        """
+        raise NotImplementedError("Adapters with tracked_collections must implement this method")
+
+    def expand_dirty_records(self, dirty_records: List[RecordPath]) -> List[RecordPath]:
+        """
+        Hook for adapters whose documents depend on other records. Returns the
+        records to re-chunk, in order, given the records that changed.
+        """
+        return dirty_records
+
+    def records_to_searchable_documents(self) -> List[SearchableDocument]:
+        """Converts every record in `tracked_collections` into searchable documents."""
+        db = self.get_tracked_db()
+        searchable_documents = []
+        for record_path, record in self._iter_records(db, ()):
+            searchable_documents.extend(self.record_to_searchable_documents(record_path, record))
+        return searchable_documents
+
     def reset_from_db(self, strategy: SearchStrategy):
         """
         Clears the search index for the given strategy and re-initializes it
@@ -38,7 +88,14 @@ class Adapter(ABC):
         Initializes the search index for the given strategy with all documents
         from the database.
         """
-        added_searchable_documents = self.db_to_searchable_documents()
+        tracker = self._get_change_tracker()
+        if tracker is not None:
+            synced_version = tracker.version
+            added_searchable_documents = self._track_all_records(strategy.name)
+            self._strategy_to_synced_version[strategy.name] = (tracker, synced_version)
+        else:
+            added_searchable_documents = self.db_to_searchable_documents()
+            self._forget_records(strategy.name)
         strategy.upsert_documents(added_searchable_documents)
         # Set the last known state
         self._strategy_to_last_searchable_documents[strategy.name] = {chunk.chunk_id: chunk for chunk in added_searchable_documents}
@@ -64,8 +121,27 @@ class Adapter(ABC):
         the last known state for a given strategy to identify additions,
         updates, and deletions.
         """
-        # Regenerate all chunks from current DB
-        current_searchable_documents = self.db_to_searchable_documents()
+        tracker = self._get_change_tracker()
+        if tracker is None:
+            self._forget_records(strategy_name)
+            return self._diff_documents(strategy_name, self.db_to_searchable_documents())
+
+        synced_version = tracker.version
+        last_tracker, last_version = self._strategy_to_synced_version.get(strategy_name, (None, 0))
+        changes = None
+        if last_tracker is tracker and strategy_name in self._strategy_to_record_chunk_ids:
+            if last_version == synced_version:
+                return {"added": [], "updated": [], "deleted": []}
+            changed_paths = tracker.changes_since(last_version)
+            if changed_paths is not None:
+                changes = self._sync_changed_records(strategy_name, changed_paths)
+        if changes is None:
+            changes = self._diff_documents(strategy_name, self._track_all_records(strategy_name))
+        self._strategy_to_synced_version[strategy_name] = (tracker, synced_version)
+        return changes
+
+    def _diff_documents(self, strategy_name: str, current_searchable_documents: List[SearchableDocument]) -> dict[str, List[Any]]:
+        """Full comparison of `current_searchable_documents` with the last known state."""
         current_searchable_documents_map = {chunk.chunk_id: chunk for chunk in current_searchable_documents}
         last_searchable_documents_map = self._strategy_to_last_searchable_documents.get(strategy_name, {})
 
@@ -94,4 +170,160 @@ class Adapter(ABC):
             "added": added,
             "updated": updated,
             "deleted": deleted,
-        }
\ No newline at end of file
+        }
+
+    # ------------------------------------------------------------------
+    # Incremental sync over change-tracked DBs
+    # ------------------------------------------------------------------
+
+    def _get_change_tracker(self):
+        if not self.tracked_collections:
+            return None
+        return get_change_tracker(self.get_tracked_db())
+
+    def _forget_records(self, strategy_name: str):
+        self._strategy_to_synced_version.pop(strategy_name, None)
+        self._strategy_to_record_chunk_ids.pop(strategy_name, None)
+        self._strategy_to_chunk_owners.pop(strategy_name, None)
+
+    def _track_all_records(self, strategy_name: str) -> List[SearchableDocument]:
+        """Chunks every record and rebuilds the record -> chunk bookkeeping."""
+        db = self.get_tracked_db()
+        record_chunk_ids: Dict[RecordPath, Set[str]] = {}
+        chunk_owners: Dict[str, int] = {}
+        searchable_documents = []
+        for record_path, record in self._iter_records(db, ()):
+            chunks = self.record_to_searchable_documents(record_path, record)
+            chunk_ids = {chunk.chunk_id for chunk in chunks}
+            record_chunk_ids[record_path] = chunk_ids
+            for chunk_id in chunk_ids:
+                chunk_owners[chunk_id] = chunk_owners.get(chunk_id, 0) + 1
+            searchable_documents.extend(chunks)
+        self._strategy_to_record_chunk_ids[strategy_name] = record_chunk_ids
+        self._strategy_to_chunk_owners[strategy_name] = chunk_owners
+        return searchable_documents
+
+    def _sync_changed_records(self, strategy_name: str, changed_paths: List[RecordPath]) -> Optional[dict[str, List[Any]]]:
+        """Re-chunks only the records touched by `changed_paths`."""
+        db = self.get_tracked_db()
+        record_chunk_ids = self._strategy_to_record_chunk_ids[strategy_name]
+        # Ordered set, oldest change first, so that new documents reach the
+        # strategies in the same order as a full rebuild would add them
+        dirty_records: Dict[RecordPath, None] = {}
+        for path in reversed(changed_paths):
+            for collection in self.tracked_collections:
+                if len(path) > len(collection):
+                    if _matches(path, collection):
+                        dirty_records[path[:len(collection) + 1]] = None
+                elif _matches(path, collection):
+                    # A container at or above the collection changed: rescan
+                    # every record below it, both current and previously known.
+                    for record_path, _ in self._iter_records(db, path):
+                        dirty_records[record_path] = None
+                    for record_path in record_chunk_ids:
+                        if record_path[:len(path)] == path and any(
+                            len(record_path) == len(c) + 1 and _matches(record_path, c)
+                            for c in self.tracked_collections
+                        ):
+                            dirty_records[record_path] = None
+        if not dirty_records:
+            return {"added": [], "updated": [], "deleted": []}
+
+        last_map = self._strategy_to_last_searchable_documents.setdefault(strategy_name, {})
+        chunk_owners = self._strategy_to_chunk_owners[strategy_name]
+        added = []
+        updated = []
+        deleted = []
+        for record_path in self.expand_dirty_records(list(dirty_records)):
+            record = _lookup(db, record_path)
+            chunks = [] if record is _MISSING else self.record_to_searchable_documents(record_path, record)
+            old_chunk_ids = record_chunk_ids.pop(record_path, set())
+            new_chunk_ids = set()
+            for chunk in chunks:
+                chunk_id = chunk.chunk_id
+                if chunk_id in new_chunk_ids:
+                    continue
+                new_chunk_ids.add(chunk_id)
+                if chunk_id not in old_chunk_ids:
+                    chunk_owners[chunk_id] = chunk_owners.get(chunk_id, 0) + 1
+                previous = last_map.get(chunk_id)
+                if previous is None:
+                    added.append(chunk)
+                elif previous.original_json_obj_hash != chunk.original_json_obj_hash:
+                    updated.append(chunk)
+                else:
+                    continue
+                last_map[chunk_id] = chunk
+            for chunk_id in old_chunk_ids - new_chunk_ids:
+                owners = chunk_owners.get(chunk_id, 0) - 1
+                if owners > 0:
+                    chunk_owners[chunk_id] = owners
+                    continue
+                chunk_owners.pop(chunk_id, None)
+                previous = last_map.pop(chunk_id, None)
+                if previous is not None:
+                    deleted.append(previous)
+            if new_chunk_ids:
+                record_chunk_ids[record_path] = new_chunk_ids
+        return {
+            "added": added,
+            "updated": updated,
+            "deleted": deleted,
+        }
+
+    def _iter_records(self, db: Any, prefix: RecordPath) -> Iterator[Tuple[RecordPath, Any]]:
+        """Yields (record_path, record) for every tracked record whose path starts with `prefix`."""
+        for collection in self.tracked_collections:
+            if len(prefix) > len(collection) + 1:
+                continue
+            if not _matches(prefix, collection):
+                continue
+            for collection_path, container in _expand(db, collection, ()):
+                for key, record in _items(container):
+                    record_path = collection_path + (key,)
+                    if record_path[:len(prefix)] == prefix:
+                        yield record_path, record
+
+
+def _matches(path: RecordPath, pattern: RecordPath) -> bool:
+    """True if the first len(pattern) keys of `path` match `pattern` ("*" matches anything)."""
+    for key, expected in zip(path, pattern):
+        if expected != "*" and key != expected:
+            return False
+    return True
+
+
+def _items(container: Any):
+    if isinstance(container, dict):
+        return container.items()
+    if isinstance(container, list):
+        return enumerate(container)
+    return ()
+
+
+def _expand(node: Any, pattern: RecordPath, path: RecordPath) -> Iterator[Tuple[RecordPath, Any]]:
+    """Yields (path, container) for every container matching `pattern`."""
+    if not pattern:
+        yield path, node
+        return
+    key = pattern[0]
+    if key == "*":
+        for child_key, child in _items(node):
+            yield from _expand(child, pattern[1:], path + (child_key,))
+        return
+    child = _lookup(node, (key,))
+    if child is not _MISSING:
+        yield from _expand(child, pattern[1:], path + (key,))
+
+
+def _lookup(node: Any, path: RecordPath) -> Any:
+    for key in path:
+        if isinstance(node, dict):
+            node = node.get(key, _MISSING)
+        elif isinstance(node, list) and isinstance(key, int) and 0 <= key < len(node):
+            node = node[key]
+        else:
+            return _MISSING
+        if node is _MISSING:
+            return _MISSING
+    return node
@@ -10,7 +10,10 @@ class BaseSearchConfig(BaseModel):
 
 
 class WhooshConfig(BaseSearchConfig):
-    pass # TODO: We can extend it based on features provided by whoosh
+    # Directory for an on-disk index that is reused across restarts while the
+    # indexed documents are unchanged; None keeps the index in memory.
+    index_dir: Optional[str] = None
+    index_name: Optional[str] = None
 
 class QdrantConfig(BaseSearchConfig):
     score_threshold: float = 0.90
@@ -18,17 +21,25 @@ class QdrantConfig(BaseSearchConfig):
     embedding_task_type: str = "RETRIEVAL_DOCUMENT"
     embedding_size: int = 768
     api_key: str = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    # Embedding store shared by all strategies of the process using the same file
     cache_file: Optional[str] = "default_qdrant_cache.tmp"
     max_cache_size: int = 10000
+    # "gemini", or "fake" for a deterministic offline embedder
+    embedding_provider: str = "gemini"
 
 
 class RapidFuzzConfig(BaseSearchConfig):
     scorer: str = "WRatio"
     score_cutoff: int = 80
+    ngram_size: int = 3
+    # Above this many candidates, only score documents sharing an n-gram with the query
+    ngram_prefilter: bool = True
+    ngram_prefilter_min_candidates: int = 1000
 
 
 class SubstringConfig(BaseSearchConfig):
     case_sensitive: bool = False
+    ngram_size: int = 3
 
 
 class HybridConfig(BaseSearchConfig):
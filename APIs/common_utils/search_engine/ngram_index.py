@@ -0,0 +1,189 @@
+from typing import Any, Dict, Hashable, Iterable, Iterator, Optional, Set
+
+from .models import SearchableDocument
+
+
+class NgramIndex:
+    """
+    In-memory document store for the substring and fuzzy strategies.
+
+    Documents are kept in a chunk_id -> SearchableDocument dict (in insertion
+    order), together with:
+
+    - an n-gram inverted index over the normalized text_content, used to
+      narrow a query down to the documents that can possibly match it,
+    - postings for hashable metadata values (e.g. user_id, resource_type,
+      content_type), used to narrow metadata filters.
+
+    The postings only narrow the candidate set; callers still verify every
+    candidate against the query and the filter.
+    """
+
+    def __init__(self, n: int = 3, case_sensitive: bool = False):
+        self.n = n
+        self.case_sensitive = case_sensitive
+        self.clear()
+
+    def clear(self):
+        self.docs: Dict[str, SearchableDocument] = {}
+        self._position: Dict[str, int] = {}
+        self._next_position = 0
+        self._texts: Dict[str, str] = {}
+        self._ngram_postings: Dict[str, Set[str]] = {}
+        # Documents whose text is shorter than n have no n-grams
+        self._short_docs: Set[str] = set()
+        self._metadata_postings: Dict[str, Dict[Hashable, Set[str]]] = {}
+        self._indexed_metadata: Dict[str, Dict[str, Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.docs
+
+    def get(self, chunk_id: str) -> Optional[SearchableDocument]:
+        return self.docs.get(chunk_id)
+
+    def normalize(self, text: Optional[str]) -> str:
+        text = text or ""
+        return text if self.case_sensitive else text.lower()
+
+    def ngrams(self, text: str) -> Set[str]:
+        """N-grams of an already normalized text."""
+        n = self.n
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def normalized_text(self, chunk_id: str) -> str:
+        return self._texts[chunk_id]
+
+    def upsert(self, document: SearchableDocument):
+        """Add or replace a document, re-indexing only what changed."""
+        chunk_id = document.chunk_id
+        if chunk_id not in self._position:
+            self._position[chunk_id] = self._next_position
+            self._next_position += 1
+        text = self.normalize(document.text_content)
+        old_text = self._texts.get(chunk_id)
+        if old_text != text:
+            if old_text is not None:
+                self._unindex_text(chunk_id, old_text)
+            self._index_text(chunk_id, text)
+        self._unindex_metadata(chunk_id)
+        self._index_metadata(chunk_id, document.metadata)
+        self.docs[chunk_id] = document
+
+    def remove(self, chunk_id: str) -> Optional[SearchableDocument]:
+        document = self.docs.pop(chunk_id, None)
+        if document is None:
+            return None
+        self._position.pop(chunk_id, None)
+        self._unindex_text(chunk_id, self._texts[chunk_id])
+        self._unindex_metadata(chunk_id)
+        return document
+
+    def candidate_ids(
+        self,
+        filter: Optional[Dict] = None,
+        all_ngrams: Iterable[str] = (),
+        any_ngrams: Iterable[str] = (),
+    ) -> Optional[Set[str]]:
+        """
+        Narrows the documents using the postings.
+
+        Args:
+            filter (Optional[Dict]): Metadata filter; only values that can be
+                looked up in the postings are used.
+            all_ngrams (Iterable[str]): N-grams that a candidate must all contain.
+            any_ngrams (Iterable[str]): N-grams of which a candidate must contain
+                at least one. Documents too short to have n-grams are kept.
+
+        Returns:
+            Optional[Set[str]]: The candidate chunk ids, or None if nothing
+                could be narrowed (every document is a candidate).
+        """
+        postings = []
+        for key, value in (filter or {}).items():
+            if not _is_indexable(value):
+                # Missing keys also match None; leave it to the caller's check
+                continue
+            postings.append(self._metadata_postings.get(key, {}).get(value, set()))
+        for ngram in all_ngrams:
+            postings.append(self._ngram_postings.get(ngram, set()))
+        any_ngrams = list(any_ngrams)
+        if any_ngrams:
+            matching = set(self._short_docs)
+            for ngram in any_ngrams:
+                matching.update(self._ngram_postings.get(ngram, ()))
+            postings.append(matching)
+        if not postings:
+            return None
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return candidates
+
+    def iter_documents(self, chunk_ids: Optional[Set[str]] = None) -> Iterator[SearchableDocument]:
+        """Yields the given documents (or all of them) in insertion order."""
+        if chunk_ids is None:
+            yield from list(self.docs.values())
+            return
+        for chunk_id in sorted(chunk_ids, key=self._position.__getitem__):
+            yield self.docs[chunk_id]
+
+    @staticmethod
+    def matches_filter(document: SearchableDocument, filter: Optional[Dict]) -> bool:
+        return all(document.metadata.get(k) == v for k, v in (filter or {}).items())
+
+    def _index_text(self, chunk_id: str, text: str):
+        self._texts[chunk_id] = text
+        ngrams = self.ngrams(text)
+        if not ngrams:
+            self._short_docs.add(chunk_id)
+        for ngram in ngrams:
+            self._ngram_postings.setdefault(ngram, set()).add(chunk_id)
+
+    def _unindex_text(self, chunk_id: str, text: str):
+        self._texts.pop(chunk_id, None)
+        self._short_docs.discard(chunk_id)
+        for ngram in self.ngrams(text):
+            posting = self._ngram_postings.get(ngram)
+            if posting is not None:
+                posting.discard(chunk_id)
+                if not posting:
+                    del self._ngram_postings[ngram]
+
+    def _index_metadata(self, chunk_id: str, metadata: Dict[str, Any]):
+        indexed = {}
+        for key, value in (metadata or {}).items():
+            if not _is_indexable(value):
+                continue
+            self._metadata_postings.setdefault(key, {}).setdefault(value, set()).add(chunk_id)
+            indexed[key] = value
+        self._indexed_metadata[chunk_id] = indexed
+
+    def _unindex_metadata(self, chunk_id: str):
+        for key, value in self._indexed_metadata.pop(chunk_id, {}).items():
+            values = self._metadata_postings.get(key)
+            if values is None:
+                continue
+            posting = values.get(value)
+            if posting is None:
+                continue
+            posting.discard(chunk_id)
+            if not posting:
+                del values[value]
+                if not values:
+                    del self._metadata_postings[key]
+
+
+def _is_indexable(value: Any) -> bool:
+    if value is None:
+        return False
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
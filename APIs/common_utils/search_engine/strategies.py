@@ -1,3 +1,6 @@
+import hashlib
+import itertools
+import json
 import os
 import shutil
 from abc import ABC, abstractmethod
@@ -11,12 +14,13 @@ from whoosh.index import create_in
 from whoosh.fields import Schema, TEXT, ID, KEYWORD
 from whoosh.qparser import QueryParser
 from whoosh.query import Term, And
-from whoosh.filedb.filestore import RamStorage
+from whoosh.filedb.filestore import FileStorage, RamStorage
 from rapidfuzz import fuzz, process
 
-from ..llm_interface import GeminiEmbeddingManager
+from ..llm_interface import GeminiEmbeddingManager, FakeEmbeddingManager
 from .adapter import Adapter
 from .models import SearchableDocument
+from .ngram_index import NgramIndex
 from .configs import (
     WhooshConfig,
     QdrantConfig,
@@ -25,6 +29,8 @@ from .configs import (
     SubstringConfig,
 )
 
+FINGERPRINT_MODULUS = 2 ** 256
+
 
 class SearchStrategy(ABC):
     @abstractmethod
@@ -77,6 +83,13 @@ class SearchStrategy(ABC):
         return unique_objs
 
 class WhooshSearchStrategy(SearchStrategy):
+    # Metadata values are indexed into dynamic "<key>_kw" fields, so new
+    # metadata keys never require a schema change.
+    METADATA_FIELD_SUFFIX = "_kw"
+    # Bump when the schema or the indexed fields change, to invalidate
+    # persisted indexes.
+    INDEX_FORMAT_VERSION = 1
+
     def __init__(self, config: WhooshConfig, service_adapter: Adapter):
         self.config = config
         self.service_adapter = service_adapter
@@ -84,142 +97,205 @@ class WhooshSearchStrategy(SearchStrategy):
         self.ix = None  # Index will be created dynamically on first index() call
         self.schema = None
         self.name = "keyword"
-        self._ram_storage = None  # Use in-memory storage for Whoosh
+        self._ram_storage = None  # In-memory storage, unless config.index_dir is set
         self._all_metadata_fields = set()  # Track all unique metadata fields seen
+        # Whoosh keeps writer temp files in "<tempdir>/<indexname>.tmp", so
+        # in-memory indexes get unique names to avoid sharing that directory.
+        self._index_name = config.index_name or (
+            "MAIN" if config.index_dir else f"keyword_{uuid.uuid4().hex}"
+        )
+        # Order-independent fingerprint of the indexed documents (only kept
+        # for persistent indexes)
+        self._fingerprint = 0
 
     def _create_dynamic_schema(self, documents: List[SearchableDocument]):
-        """Dynamically creates the Whoosh schema based on all unique metadata keys from all documents."""
-        schema_fields = {
-            "chunk_id": ID(unique=True, stored=True),
-            "text_content": TEXT(stored=True),
-        }
-        # Collect all unique metadata keys from all documents
-        all_keys = set()
-        for doc in documents:
-            for key, value in doc.metadata.items():
-                if isinstance(value, (str, int, bool)):
-                    all_keys.add(key)
-        for key in all_keys:
-            schema_fields[key] = KEYWORD(stored=True)
-        self.schema = Schema(**schema_fields)
-        # Use in-memory storage instead of filesystem
-        self._ram_storage = RamStorage()
-        self.ix = self._ram_storage.create_index(self.schema)
-        self._all_metadata_fields = all_keys
-
-    def _maybe_rebuild_schema(self, new_document: SearchableDocument):
-        """If new metadata fields are found, rebuild the schema and reindex all documents."""
-        new_fields = set(
-            key for key, value in new_document.metadata.items() if isinstance(value, (str, int, bool))
+        """Creates an empty index with a fixed schema and dynamic metadata fields."""
+        self.schema = Schema(
+            chunk_id=ID(unique=True, stored=True),
+            text_content=TEXT(stored=True),
         )
-        if not new_fields.issubset(self._all_metadata_fields):
-            # New fields detected, rebuild schema and reindex everything
-            all_docs = list(self.doc_store.values()) + [new_document]
-            self._create_dynamic_schema(all_docs)
-            # Reindex all documents
-            writer = self.ix.writer()
-            for doc in all_docs:
-                doc_to_index = {"chunk_id": doc.chunk_id, "text_content": doc.text_content}
-                for key in self._all_metadata_fields:
-                    value = doc.metadata.get(key)
-                    if isinstance(value, (str, int, bool)):
-                        doc_to_index[key] = value
-                writer.update_document(**doc_to_index)
+        self.schema.add("*" + self.METADATA_FIELD_SUFFIX, KEYWORD, glob=True)
+        if self.config.index_dir:
+            os.makedirs(self.config.index_dir, exist_ok=True)
+            storage = FileStorage(self.config.index_dir)
+        else:
+            # Use in-memory storage instead of filesystem
+            self._ram_storage = RamStorage()
+            storage = self._ram_storage
+        self.ix = storage.create_index(self.schema, indexname=self._index_name)
+        self._all_metadata_fields = set()
+        self._fingerprint = 0
+        for doc in documents:
+            self._all_metadata_fields.update(self._metadata_fields(doc))
+
+    def _metadata_fields(self, document: SearchableDocument) -> Dict[str, str]:
+        return {
+            key: str(value)
+            for key, value in document.metadata.items()
+            if isinstance(value, (str, int, bool))
+        }
+
+    def _fields_to_index(self, document: SearchableDocument) -> Dict[str, Any]:
+        fields = {"chunk_id": document.chunk_id, "text_content": document.text_content}
+        for key, value in self._metadata_fields(document).items():
+            fields[key + self.METADATA_FIELD_SUFFIX] = value
+        return fields
+
+    def _document_fingerprint(self, document: SearchableDocument) -> int:
+        fields = self._fields_to_index(document)
+        digest = hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode("utf-8")).digest()
+        return int.from_bytes(digest, "big")
+
+    def _fingerprint_path(self) -> str:
+        return os.path.join(self.config.index_dir, f"{self._index_name}.fingerprint")
+
+    def _fingerprint_token(self, fingerprint: int) -> str:
+        return f"{self.INDEX_FORMAT_VERSION}:{fingerprint:x}"
+
+    def _open_persistent_index(self, documents: List[SearchableDocument]) -> bool:
+        """
+        Reuses the on-disk index if it was built from exactly these documents,
+        e.g. by a previous process started on the same DB.
+        """
+        if not self.config.index_dir:
+            return False
+        try:
+            with open(self._fingerprint_path(), "r", encoding="utf-8") as f:
+                stored_token = f.read().strip()
+        except OSError:
+            return False
+        documents_by_id = {doc.chunk_id: doc for doc in documents}
+        fingerprint = 0
+        for doc in documents_by_id.values():
+            fingerprint = (fingerprint + self._document_fingerprint(doc)) % FINGERPRINT_MODULUS
+        if stored_token != self._fingerprint_token(fingerprint):
+            return False
+        storage = FileStorage(self.config.index_dir)
+        if not storage.index_exists(self._index_name):
+            return False
+        self.ix = storage.open_index(self._index_name)
+        self.schema = self.ix.schema
+        self.doc_store = documents_by_id
+        self._all_metadata_fields = set()
+        for doc in documents_by_id.values():
+            self._all_metadata_fields.update(self._metadata_fields(doc))
+        self._fingerprint = fingerprint
+        return True
+
+    def _commit(self, writer, fingerprint: int):
+        """Commits a writer, keeping the persisted fingerprint in sync."""
+        if not self.config.index_dir:
             writer.commit()
-            # Update doc_store with new_document
-            self.doc_store[new_document.chunk_id] = new_document
-            return True
-        return False
+            return
+        # Invalidate the fingerprint first, so an interrupted commit is never reused
+        path = self._fingerprint_path()
+        if os.path.exists(path):
+            os.remove(path)
+        writer.commit()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self._fingerprint_token(fingerprint))
 
     def upsert_document(self, document: SearchableDocument):
         """Add or replace a document in the index and doc_store."""
-        if self.ix is None:
-            self._create_dynamic_schema([document])
-        else:
-            if self._maybe_rebuild_schema(document):
-                return  # Already handled by rebuild
-        existing_doc = self.doc_store.get(document.chunk_id)
-        if existing_doc is not None and existing_doc.text_content == document.text_content:
-            # Only update metadata and original_json_obj, do not reindex
-            existing_doc.metadata = document.metadata
-            existing_doc.original_json_obj = document.original_json_obj
-            self.doc_store[document.chunk_id] = existing_doc
-            return
-        writer = self.ix.writer()
-        writer.delete_by_term("chunk_id", document.chunk_id)
-        doc_to_index = {"chunk_id": document.chunk_id, "text_content": document.text_content}
-        for key in self._all_metadata_fields:
-            value = document.metadata.get(key)
-            if isinstance(value, (str, int, bool)):
-                doc_to_index[key] = value
-        writer.add_document(**doc_to_index)
-        writer.commit()
-        self.doc_store[document.chunk_id] = document
+        self.upsert_documents([document])
 
     def delete_document(self, chunk_id: str):
-        if self.ix is not None and chunk_id in self.doc_store:
-            writer = self.ix.writer()
-            writer.delete_by_term("chunk_id", chunk_id)
-            writer.commit()
-            self.doc_store.pop(chunk_id, None)
+        self._delete_chunk_ids([chunk_id])
 
     def upsert_documents(self, documents: List[SearchableDocument]):
+        """Adds or replaces documents using a single writer and commit."""
         if not documents:
             return
-        # If index is not created, create schema from all docs
+        # Last write wins for chunks repeated within the batch
+        documents = list({doc.chunk_id: doc for doc in documents}.values())
         if self.ix is None:
+            if self._open_persistent_index(documents):
+                return
             self._create_dynamic_schema(documents)
-        else:
-            # Check if any new fields are present in the batch
-            batch_fields = set()
+        track_fingerprint = bool(self.config.index_dir)
+        fingerprint = self._fingerprint
+        pending: Dict[str, SearchableDocument] = {}
+        writer = self.ix.writer()
+        try:
             for doc in documents:
-                for key, value in doc.metadata.items():
-                    if isinstance(value, (str, int, bool)):
-                        batch_fields.add(key)
-            if not batch_fields.issubset(self._all_metadata_fields):
-                # New fields detected, rebuild schema and reindex all docs
-                all_docs = list(self.doc_store.values()) + documents
-                self._create_dynamic_schema(all_docs)
-                writer = self.ix.writer()
-                for doc in all_docs:
-                    doc_to_index = {"chunk_id": doc.chunk_id, "text_content": doc.text_content}
-                    for key in self._all_metadata_fields:
-                        value = doc.metadata.get(key)
-                        if isinstance(value, (str, int, bool)):
-                            doc_to_index[key] = value
-                    writer.update_document(**doc_to_index)
-                    self.doc_store[doc.chunk_id] = doc
-                writer.commit()
-                return
-        for doc in documents:
-            self.upsert_document(doc)
-    
+                existing_doc = self.doc_store.get(doc.chunk_id)
+                fields = self._metadata_fields(doc)
+                self._all_metadata_fields.update(fields)
+                if (
+                    existing_doc is not None
+                    and existing_doc.text_content == doc.text_content
+                    and self._metadata_fields(existing_doc) == fields
+                ):
+                    # Indexed fields unchanged, only update metadata and original_json_obj
+                    existing_doc.metadata = doc.metadata
+                    existing_doc.original_json_obj = doc.original_json_obj
+                    continue
+                if existing_doc is None:
+                    writer.add_document(**self._fields_to_index(doc))
+                else:
+                    writer.update_document(**self._fields_to_index(doc))
+                    if track_fingerprint:
+                        fingerprint -= self._document_fingerprint(existing_doc)
+                if track_fingerprint:
+                    fingerprint = (fingerprint + self._document_fingerprint(doc)) % FINGERPRINT_MODULUS
+                pending[doc.chunk_id] = doc
+            self._commit(writer, fingerprint)
+        except BaseException:
+            writer.cancel()
+            raise
+        self.doc_store.update(pending)
+        self._fingerprint = fingerprint
+
     def delete_documents(self, documents: List[SearchableDocument]):
         if not documents:
             return
-        for doc in documents:
-            self.delete_document(doc.chunk_id)
+        self._delete_chunk_ids([doc.chunk_id for doc in documents])
+
+    def _delete_chunk_ids(self, chunk_ids: List[str]):
+        """Deletes documents using a single writer and commit."""
+        chunk_ids = [chunk_id for chunk_id in dict.fromkeys(chunk_ids) if chunk_id in self.doc_store]
+        if self.ix is None or not chunk_ids:
+            return
+        fingerprint = self._fingerprint
+        writer = self.ix.writer()
+        try:
+            for chunk_id in chunk_ids:
+                writer.delete_by_term("chunk_id", chunk_id)
+                if self.config.index_dir:
+                    fingerprint = (fingerprint - self._document_fingerprint(self.doc_store[chunk_id])) % FINGERPRINT_MODULUS
+            self._commit(writer, fingerprint)
+        except BaseException:
+            writer.cancel()
+            raise
+        for chunk_id in chunk_ids:
+            self.doc_store.pop(chunk_id, None)
+        self._fingerprint = fingerprint
 
     def clear_index(self):
-        # Re-initialize in-memory index and doc_store
+        # Re-initialize the index and doc_store; a persisted index is no longer reusable
+        if self.config.index_dir and os.path.exists(self._fingerprint_path()):
+            os.remove(self._fingerprint_path())
         self.ix = None
+        self.schema = None
         self._ram_storage = None
         self.doc_store = {}
         self._all_metadata_fields = set()
+        self._fingerprint = 0
 
     def _search_internal(
         self, query: str, filter: Optional[Dict], limit: Optional[int], raw: bool = False
     ):
         self.service_adapter.sync_from_db(self)
-        if not self.ix:
+        if self.ix is None:
             return []
         final_limit = limit if limit is not None else self.config.default_limit
         with self.ix.searcher() as searcher:
             parser = QueryParser("text_content", self.ix.schema)
             parsed_q = parser.parse(query) if query else None
+            # Filters on metadata fields that were never indexed are ignored
             filter_terms = [
-                Term(field, value) for field, value in (filter or {}).items()
-                if field in self.ix.schema.names()
+                Term(field + self.METADATA_FIELD_SUFFIX, str(value)) for field, value in (filter or {}).items()
+                if field in self._all_metadata_fields
             ]
             filter_q = And(filter_terms) if filter_terms else None
             final_query = parsed_q
@@ -279,7 +355,8 @@ class QdrantSearchStrategy(SearchStrategy):
         # Avoid repeated embedding calls for duplicate texts
         unique_texts = list(dict.fromkeys(texts))
         if self._embedding_manager is None:
-            self._embedding_manager = GeminiEmbeddingManager(
+            manager_cls = FakeEmbeddingManager if self.config.embedding_provider == "fake" else GeminiEmbeddingManager
+            self._embedding_manager = manager_cls(
                 gemini_api_key=self.gemini_api_key,
                 lru_cache_file_path=self.config.cache_file,
                 max_cache_size=self.config.max_cache_size
@@ -451,27 +528,28 @@ class RapidFuzzSearchStrategy(SearchStrategy):
         self.service_adapter = service_adapter
         self.name = "fuzzy"
         self.scorer = getattr(fuzz, config.scorer, fuzz.ratio)
-        self.indexed_docs: List[SearchableDocument] = []
+        # The n-gram index only prefilters candidates, so it is always case-insensitive
+        self.ngram_index = NgramIndex(n=config.ngram_size)
+
+    @property
+    def doc_store(self) -> Dict[str, SearchableDocument]:
+        return self.ngram_index.docs
+
+    @property
+    def indexed_docs(self) -> List[SearchableDocument]:
+        return list(self.ngram_index.docs.values())
 
     def upsert_document(self, document: SearchableDocument):
-        for i, doc in enumerate(self.indexed_docs):
-            if doc.chunk_id == document.chunk_id:
-                if doc.text_content == document.text_content:
-                    # Only update metadata and original_json_obj
-                    doc.metadata = document.metadata
-                    doc.original_json_obj = document.original_json_obj
-                    self.indexed_docs[i] = doc
-                else:
-                    self.indexed_docs[i] = document
-                break
-        else:
-            self.indexed_docs.append(document)
+        doc = self.ngram_index.get(document.chunk_id)
+        if doc is not None and doc.text_content == document.text_content:
+            # Only update metadata and original_json_obj
+            doc.metadata = document.metadata
+            doc.original_json_obj = document.original_json_obj
+            document = doc
+        self.ngram_index.upsert(document)
 
     def delete_document(self, chunk_id: str):
-        for i, doc in enumerate(self.indexed_docs):
-            if doc.chunk_id == chunk_id:
-                del self.indexed_docs[i]
-                break
+        self.ngram_index.remove(chunk_id)
 
     def upsert_documents(self, documents: List[SearchableDocument]):
         for doc in documents:
@@ -484,19 +562,29 @@ class RapidFuzzSearchStrategy(SearchStrategy):
             self.delete_document(doc.chunk_id)
 
     def clear_index(self):
-        self.indexed_docs = []
+        self.ngram_index.clear()
 
     def _search_internal(
         self, query: str, filter: Optional[Dict], limit: Optional[int], raw: bool = False
     ):
         self.service_adapter.sync_from_db(self)
         final_limit = limit if limit is not None else self.config.default_limit
-        candidate_docs = [
-            doc
-            for doc in self.indexed_docs
-            if all(doc.metadata.get(k) == v for k, v in (filter or {}).items())
-        ]
-        choices = {doc.chunk_id: doc.text_content for doc in candidate_docs}
+        candidate_ids = self.ngram_index.candidate_ids(filter)
+        num_candidates = len(self.ngram_index) if candidate_ids is None else len(candidate_ids)
+        if (
+            self.config.ngram_prefilter
+            and self.config.score_cutoff > 0
+            and num_candidates > self.config.ngram_prefilter_min_candidates
+        ):
+            # Only score documents sharing at least one n-gram with the query
+            query_ngrams = self.ngram_index.ngrams(self.ngram_index.normalize(query))
+            if query_ngrams:
+                candidate_ids = self.ngram_index.candidate_ids(filter, any_ngrams=query_ngrams)
+        choices = {
+            doc.chunk_id: doc.text_content
+            for doc in self.ngram_index.iter_documents(candidate_ids)
+            if NgramIndex.matches_filter(doc, filter)
+        }
         matches = process.extract(
             query,
             choices,
@@ -504,8 +592,7 @@ class RapidFuzzSearchStrategy(SearchStrategy):
             limit=final_limit,
             score_cutoff=self.config.score_cutoff,
         )
-        doc_map = {doc.chunk_id: doc for doc in candidate_docs}
-        docs = [doc_map[chunk_id] for _, _, chunk_id in matches if chunk_id in doc_map]
+        docs = [self.ngram_index.get(chunk_id) for _, _, chunk_id in matches if chunk_id in self.ngram_index]
         if raw:
             return docs
         else:
@@ -612,55 +699,53 @@ class SubstringSearchStrategy(SearchStrategy):
         self.config = config
         self.service_adapter = service_adapter
         self.name = "substring"
-        self.indexed_docs: List[SearchableDocument] = []
+        self.ngram_index = NgramIndex(n=config.ngram_size, case_sensitive=config.case_sensitive)
+
+    @property
+    def doc_store(self) -> Dict[str, SearchableDocument]:
+        return self.ngram_index.docs
+
+    @property
+    def indexed_docs(self) -> List[SearchableDocument]:
+        return list(self.ngram_index.docs.values())
 
     def upsert_document(self, document: SearchableDocument):
-        for i, doc in enumerate(self.indexed_docs):
-            if doc.chunk_id == document.chunk_id:
-                self.indexed_docs[i] = document
-                break
-        else:
-            self.indexed_docs.append(document)
+        self.ngram_index.upsert(document)
 
     def delete_document(self, chunk_id: str):
-        self.indexed_docs = [doc for doc in self.indexed_docs if doc.chunk_id != chunk_id]
+        self.ngram_index.remove(chunk_id)
 
     def upsert_documents(self, documents: List[SearchableDocument]):
         for doc in documents:
             self.upsert_document(doc)
 
     def delete_documents(self, documents: List[SearchableDocument]):
-        chunk_ids_to_delete = {doc.chunk_id for doc in documents}
-        self.indexed_docs = [doc for doc in self.indexed_docs if doc.chunk_id not in chunk_ids_to_delete]
+        for doc in documents:
+            self.delete_document(doc.chunk_id)
 
     def clear_index(self):
-        self.indexed_docs = []
+        self.ngram_index.clear()
+
+    def _iter_matches(self, query: str, filter: Optional[Dict]):
+        query_to_search = self.ngram_index.normalize(query)
+        # A document containing the query contains all of its n-grams
+        candidate_ids = self.ngram_index.candidate_ids(
+            filter, all_ngrams=self.ngram_index.ngrams(query_to_search)
+        )
+        for doc in self.ngram_index.iter_documents(candidate_ids):
+            if not NgramIndex.matches_filter(doc, filter):
+                continue
+            if query_to_search in self.ngram_index.normalized_text(doc.chunk_id):
+                yield doc
 
     def _search_internal(
         self, query: str, filter: Optional[Dict], limit: Optional[int], raw: bool = False
     ):
         self.service_adapter.sync_from_db(self)
         final_limit = limit if limit is not None else self.config.default_limit
-        
-        candidate_docs = [
-            doc
-            for doc in self.indexed_docs
-            if all(doc.metadata.get(k) == v for k, v in (filter or {}).items())
-        ]
-        
-        results = []
-        for doc in candidate_docs:
-            text_to_search = doc.text_content
-            query_to_search = query
-            if not self.config.case_sensitive:
-                text_to_search = text_to_search.lower()
-                query_to_search = query_to_search.lower()
-            
-            if query_to_search in text_to_search:
-                results.append(doc)
-
+        results = self._iter_matches(query, filter)
         if raw:
-            return results[:final_limit]
+            return list(itertools.islice(results, final_limit))
         else:
             return SearchStrategy.unique_original_json_objs_from_docs(results, limit=final_limit)
 
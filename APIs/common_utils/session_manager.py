@@ -11,6 +11,7 @@ Key Features:
 - Prevents duplicate dehydration when switching APIs
 - Tracks which API created the session
 - Thread-safe access to shared state
+- Keeps the manifest used to sync the sandbox with the DB incrementally
 """
 
 import os
@@ -18,6 +19,8 @@ import tempfile
 import logging
 from typing import Optional, Dict, Any
 
+from .sandbox_manifest import SandboxManifest
+
 # --- Logger Setup ---
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,7 @@ SHARED_SANDBOX_DIR: Optional[str] = None
 SHARED_SESSION_INITIALIZED: bool = False
 SHARED_ACTIVE_API: Optional[str] = None  # Tracks which API created the sandbox
 _SHARED_SANDBOX_TEMP_DIR_OBJ: Optional[tempfile.TemporaryDirectory] = None
+_SHARED_MANIFEST: Optional[SandboxManifest] = None
 
 
 def get_shared_session_info() -> Dict[str, Any]:
@@ -48,6 +52,31 @@ def get_shared_session_info() -> Dict[str, Any]:
     }
 
 
+def get_sandbox_manifest(sandbox_dir: Optional[str]) -> Optional[SandboxManifest]:
+    """
+    Returns the manifest of the shared sandbox, if `sandbox_dir` is the shared sandbox.
+
+    The manifest lives as long as the session: it is dropped when the session
+    is initialized, ended or reset.
+
+    Args:
+        sandbox_dir (Optional[str]): Path of the sandbox being synced.
+
+    Returns:
+        Optional[SandboxManifest]: The manifest, or None if `sandbox_dir` is not the
+            sandbox of the active shared session.
+    """
+    global _SHARED_MANIFEST
+
+    if not SHARED_SESSION_INITIALIZED or not SHARED_SANDBOX_DIR or not sandbox_dir:
+        return None
+    if os.path.realpath(sandbox_dir) != os.path.realpath(SHARED_SANDBOX_DIR):
+        return None
+    if _SHARED_MANIFEST is None or _SHARED_MANIFEST.root != SHARED_SANDBOX_DIR:
+        _SHARED_MANIFEST = SandboxManifest(SHARED_SANDBOX_DIR)
+    return _SHARED_MANIFEST
+
+
 def initialize_shared_session(api_name: str, workspace_root: str, db_instance, dehydrate_func) -> str:
     """
     Initializes or retrieves the shared sandbox session.
@@ -68,7 +97,7 @@ def initialize_shared_session(api_name: str, workspace_root: str, db_instance, d
     Raises:
         RuntimeError: If sandbox creation or dehydration fails
     """
-    global SHARED_SANDBOX_DIR, SHARED_SESSION_INITIALIZED, SHARED_ACTIVE_API, _SHARED_SANDBOX_TEMP_DIR_OBJ
+    global SHARED_SANDBOX_DIR, SHARED_SESSION_INITIALIZED, SHARED_ACTIVE_API, _SHARED_SANDBOX_TEMP_DIR_OBJ, _SHARED_MANIFEST
     
     # Check if we can reuse an existing session
     if SHARED_SESSION_INITIALIZED and SHARED_SANDBOX_DIR and os.path.exists(SHARED_SANDBOX_DIR):
@@ -97,6 +126,7 @@ def initialize_shared_session(api_name: str, workspace_root: str, db_instance, d
         SHARED_SESSION_INITIALIZED = True
         SHARED_ACTIVE_API = api_name
         _SHARED_SANDBOX_TEMP_DIR_OBJ = temp_dir_obj
+        _SHARED_MANIFEST = None
         
         logger.info(f"[{api_name}] Shared session initialized successfully")
         return sandbox_path
@@ -126,7 +156,7 @@ def end_shared_session(api_name: str, db_instance, update_func, normalize_path_f
             - success (bool): Whether the cleanup was successful
             - message (str): Description of the outcome
     """
-    global SHARED_SANDBOX_DIR, SHARED_SESSION_INITIALIZED, SHARED_ACTIVE_API, _SHARED_SANDBOX_TEMP_DIR_OBJ
+    global SHARED_SANDBOX_DIR, SHARED_SESSION_INITIALIZED, SHARED_ACTIVE_API, _SHARED_SANDBOX_TEMP_DIR_OBJ, _SHARED_MANIFEST
     
     if not SHARED_SESSION_INITIALIZED or not SHARED_SANDBOX_DIR:
         logger.info(f"[{api_name}] No active session to end")
@@ -165,6 +195,7 @@ def end_shared_session(api_name: str, db_instance, update_func, normalize_path_f
         SHARED_SANDBOX_DIR = None
         SHARED_SESSION_INITIALIZED = False
         SHARED_ACTIVE_API = None
+        _SHARED_MANIFEST = None
         
         logger.info(f"[{api_name}] Shared session ended successfully")
         return {'success': True, 'message': "Shared session ended and sandbox cleaned up successfully."}
@@ -177,6 +208,7 @@ def end_shared_session(api_name: str, db_instance, update_func, normalize_path_f
         SHARED_SESSION_INITIALIZED = False
         SHARED_ACTIVE_API = None
         _SHARED_SANDBOX_TEMP_DIR_OBJ = None
+        _SHARED_MANIFEST = None
         
         return {'success': False, 'message': f"Error during shared session cleanup: {e}"}
 
@@ -190,7 +222,7 @@ def reset_shared_session() -> None:
     
     This function will attempt to clean up the temporary directory if it exists.
     """
-    global SHARED_SANDBOX_DIR, SHARED_SESSION_INITIALIZED, SHARED_ACTIVE_API, _SHARED_SANDBOX_TEMP_DIR_OBJ
+    global SHARED_SANDBOX_DIR, SHARED_SESSION_INITIALIZED, SHARED_ACTIVE_API, _SHARED_SANDBOX_TEMP_DIR_OBJ, _SHARED_MANIFEST
     
     logger.info("Forcefully resetting shared session state with cleanup")
     
@@ -210,3 +242,4 @@ def reset_shared_session() -> None:
     SHARED_SESSION_INITIALIZED = False
     SHARED_ACTIVE_API = None
     _SHARED_SANDBOX_TEMP_DIR_OBJ = None
+    _SHARED_MANIFEST = None
@@ -0,0 +1,124 @@
+# common_utils/synced_index.py
+"""
+Indexes kept in sync with a tracked DB.
+
+Services keep secondary indexes over their DB (per user, per table, ...) that
+are built on first use and then follow the ChangeTracker of the DB (see
+common_utils.tracked_db): each lookup replays the paths changed since the
+previous one and re-indexes only the records they name. Replacing the DB
+(load_state), or a change of a whole collection, drops the affected indexes,
+which are built again on the next lookup. An untracked DB is indexed anew on
+every lookup.
+
+TrackerSyncedIndexes does that bookkeeping. A service subclasses it with the
+key extractors of its DB, `_route` (which index, and which record of it, a
+changed path concerns) and `_build` (the index under a key).
+CollectionIndexes is the common case of an index per top-level collection.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from common_utils.tracked_db import get_change_tracker
+
+# Index key of a route that drops every index
+ALL_INDEXES = object()
+
+# (index key, record key); a record key of None drops the whole index
+Route = Tuple[Hashable, Optional[Hashable]]
+ChangePath = Tuple[Hashable, ...]
+
+
+class TrackerSyncedIndexes:
+    """Indexes of a DB by key, kept in sync with the ChangeTracker of the DB."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._db: Optional[Dict[str, Any]] = None
+        self._version: Optional[int] = None
+        self._indexes: Dict[Hashable, Any] = {}
+
+    def reset(self):
+        with self._lock:
+            self._db = None
+            self._version = None
+            self._drop_all()
+
+    def _lookup(self, db: Dict[str, Any], index_key: Hashable) -> Any:
+        """The up to date index under `index_key`; it is kept only if `db` is tracked."""
+        with self._lock:
+            self._sync(db)
+            if index_key in self._indexes:
+                return self._indexes[index_key]
+            index = self._build(db, index_key)
+            if self._version is not None:
+                self._indexes[index_key] = index
+            return index
+
+    def _build(self, db: Dict[str, Any], index_key: Hashable) -> Any:
+        """The index under `index_key`, built from `db`."""
+        raise NotImplementedError
+
+    def _route(self, path: ChangePath) -> Iterable[Route]:
+        """The indexes a change at `path` (never empty) concerns, and the record of each."""
+        raise NotImplementedError
+
+    def _refresh(self, db: Dict[str, Any], index_key: Hashable, index: Any, record_key: Hashable):
+        """Re-indexes one record of `index` after it changed."""
+        index.refresh(record_key)
+
+    def _drop_all(self):
+        self._indexes.clear()
+
+    def _sync(self, db: Dict[str, Any]):
+        tracker = get_change_tracker(db)
+        if tracker is None or db is not self._db or self._version is None:
+            self._db = db
+            self._drop_all()
+            self._version = tracker.version if tracker is not None else None
+            return
+        if tracker.version == self._version:
+            return
+        changes = tracker.changes_since(self._version)
+        self._version = tracker.version
+        if changes is None or any(not path for path in changes):
+            self._drop_all()
+            return
+        self._apply(db, changes)
+
+    def _apply(self, db: Dict[str, Any], changes: List[ChangePath]):
+        """Brings the indexes up to date with the changed paths: drops first, then re-indexes records."""
+        refresh: Dict[Route, None] = {}
+        for path in changes:
+            for index_key, record_key in self._route(path):
+                if index_key is ALL_INDEXES:
+                    self._drop_all()
+                    return
+                if record_key is None:
+                    self._indexes.pop(index_key, None)
+                elif index_key in self._indexes:
+                    refresh[(index_key, record_key)] = None
+        for index_key, record_key in refresh:
+            if index_key in self._indexes:
+                self._refresh(db, index_key, self._indexes[index_key], record_key)
+
+
+class CollectionIndexes(TrackerSyncedIndexes):
+    """
+    An index per top-level collection of a tracked DB, built by `index_type`
+    from the collection and refreshed by its `refresh(key)`.
+    """
+
+    index_type: Callable[[Any], Any]
+    collection_type: type = dict
+
+    def get(self, db: Dict[str, Any], collection: str) -> Any:
+        """The up to date index of DB[collection], or None if the DB is untracked or it is not a `collection_type`."""
+        if get_change_tracker(db) is None or not isinstance(db.get(collection), self.collection_type):
+            return None
+        return self._lookup(db, collection)
+
+    def _build(self, db: Dict[str, Any], collection: str) -> Any:
+        return self.index_type(db[collection])
+
+    def _route(self, path: ChangePath) -> Iterable[Route]:
+        return ((path[0], path[1] if len(path) > 1 else None),)
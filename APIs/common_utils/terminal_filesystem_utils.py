@@ -18,6 +18,9 @@ import shlex  # For command tokenization
 from functools import wraps
 from typing import Dict, List, Optional, Any, Tuple, Union, Callable, TypeVar
 
+from . import session_manager
+from .tracked_db import track_changes
+
 
 # --- Logger Setup for this utils.py module ---
 logger = logging.getLogger(__name__)
@@ -615,6 +618,78 @@ def map_temp_path_to_db_key(temp_path: str, temp_root: str, desired_logical_root
     return final_logical_path
 
 
+def _write_entry_to_disk(entry: Dict[str, Any], new_path: str) -> None:
+    """Writes one DB file_system entry (directory, symlink or file) to `new_path`, with its metadata."""
+    if entry.get("is_directory", False):
+        os.makedirs(new_path, exist_ok=True) # Create directory
+        if "metadata" in entry:
+            _apply_file_metadata(new_path, entry["metadata"], strict_mode=False)
+    else:
+        # Create parent directory for the file if it doesn't exist
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+
+        # Check if this is a symlink
+        is_symlink = entry.get("metadata", {}).get("attributes", {}).get("is_symlink", False)
+        symlink_target = entry.get("metadata", {}).get("attributes", {}).get("symlink_target")
+
+        if is_symlink and symlink_target:
+            # For symlinks, create a new symlink pointing to the target
+            # First remove any existing file/link
+            if os.path.exists(new_path) or os.path.islink(new_path):
+                os.unlink(new_path)
+            # Create the symlink with the original target
+            os.symlink(symlink_target, new_path)
+        else:
+            # Write ALL files exactly as they were read - no line ending conversion
+            # This preserves the original line endings (CRLF will show as ^M in Linux terminals)
+            content_to_write = entry.get("content_lines", [])
+
+            # Check if this is a base64-encoded archive file
+            if (content_to_write and 
+                len(content_to_write) > 0 and 
+                content_to_write[0].strip() == BINARY_FILE_MARKER):
+
+                # This is a base64-encoded archive file - decode it back to binary
+                try:
+                    # Remove the header and join all base64 content
+                    base64_content = ''.join(line.rstrip('\n') for line in content_to_write[1:])
+                    binary_content = base64.b64decode(base64_content)
+
+                    # Write as binary file
+                    with open(new_path, "wb") as f:
+                        f.write(binary_content)
+                    _log_util_message(logging.INFO, f"Restored binary archive content for: {new_path}")
+
+                except Exception as e:
+                    _log_util_message(logging.ERROR, f"Failed to decode archive file '{new_path}': {e}")
+                    # Fall back to writing as text (will be broken but won't crash)
+                    with open(new_path, "w", encoding="utf-8") as f:
+                        f.writelines(content_to_write)
+            else:
+                # Regular text file - write as before
+                if os.path.exists(new_path):
+                    current_mode = os.stat(new_path).st_mode
+                    os.chmod(new_path, current_mode | 0o200)
+
+                # Write the file
+                with open(new_path, "w", encoding="utf-8") as f:
+                    f.writelines(content_to_write)
+
+                # Restore original permissions if they exist
+                if "metadata" in entry and "permissions" in entry["metadata"]:
+                    original_mode = entry["metadata"]["permissions"].get("mode")
+                    if original_mode is not None:
+                        os.chmod(new_path, original_mode)
+
+        # Apply metadata right after writing the file
+        if "metadata" in entry:
+            _apply_file_metadata(new_path, entry["metadata"], strict_mode=False)
+
+    # Apply metadata if available
+    if "metadata" in entry:
+        _apply_file_metadata(new_path, entry["metadata"], strict_mode=False)
+
+
 # --- Dehydrate Function ---
 def dehydrate_db_to_directory(db: Dict[str, Any], target_dir: str) -> bool:
     """Writes workspace file system content to a specified target directory."""
@@ -648,74 +723,7 @@ def dehydrate_db_to_directory(db: Dict[str, Any], target_dir: str) -> bool:
 
 
             try:
-                if entry.get("is_directory", False):
-                    os.makedirs(new_path, exist_ok=True) # Create directory
-                    if "metadata" in entry:
-                        _apply_file_metadata(new_path, entry["metadata"], strict_mode=False)
-                else:
-                    # Create parent directory for the file if it doesn't exist
-                    os.makedirs(os.path.dirname(new_path), exist_ok=True)
-
-                    # Check if this is a symlink
-                    is_symlink = entry.get("metadata", {}).get("attributes", {}).get("is_symlink", False)
-                    symlink_target = entry.get("metadata", {}).get("attributes", {}).get("symlink_target")
-
-                    if is_symlink and symlink_target:
-                        # For symlinks, create a new symlink pointing to the target
-                        # First remove any existing file/link
-                        if os.path.exists(new_path) or os.path.islink(new_path):
-                            os.unlink(new_path)
-                        # Create the symlink with the original target
-                        os.symlink(symlink_target, new_path)
-                    else:
-                        # Write ALL files exactly as they were read - no line ending conversion
-                        # This preserves the original line endings (CRLF will show as ^M in Linux terminals)
-                        content_to_write = entry.get("content_lines", [])
-                        
-                        # Check if this is a base64-encoded archive file
-                        if (content_to_write and 
-                            len(content_to_write) > 0 and 
-                            content_to_write[0].strip() == BINARY_FILE_MARKER):
-                            
-                            # This is a base64-encoded archive file - decode it back to binary
-                            try:
-                                # Remove the header and join all base64 content
-                                base64_content = ''.join(line.rstrip('\n') for line in content_to_write[1:])
-                                binary_content = base64.b64decode(base64_content)
-                                
-                                # Write as binary file
-                                with open(new_path, "wb") as f:
-                                    f.write(binary_content)
-                                _log_util_message(logging.INFO, f"Restored binary archive content for: {new_path}")
-                                
-                            except Exception as e:
-                                _log_util_message(logging.ERROR, f"Failed to decode archive file '{new_path}': {e}")
-                                # Fall back to writing as text (will be broken but won't crash)
-                                with open(new_path, "w", encoding="utf-8") as f:
-                                    f.writelines(content_to_write)
-                        else:
-                            # Regular text file - write as before
-                            if os.path.exists(new_path):
-                                current_mode = os.stat(new_path).st_mode
-                                os.chmod(new_path, current_mode | 0o200)
-
-                            # Write the file
-                            with open(new_path, "w", encoding="utf-8") as f:
-                                f.writelines(content_to_write)
-
-                            # Restore original permissions if they exist
-                            if "metadata" in entry and "permissions" in entry["metadata"]:
-                                original_mode = entry["metadata"]["permissions"].get("mode")
-                                if original_mode is not None:
-                                    os.chmod(new_path, original_mode)
-                    
-                    # Apply metadata right after writing the file
-                    if "metadata" in entry:
-                        _apply_file_metadata(new_path, entry["metadata"], strict_mode=False)
-
-                # Apply metadata if available
-                if "metadata" in entry:
-                    _apply_file_metadata(new_path, entry["metadata"], strict_mode=False)
+                _write_entry_to_disk(entry, new_path)
 
             except OSError as e:
                 _log_util_message(logging.ERROR, f"OS error writing to {new_path}: {e}", exc_info=True)
@@ -737,6 +745,99 @@ def dehydrate_db_to_directory(db: Dict[str, Any], target_dir: str) -> bool:
         _log_util_message(logging.ERROR, f"Failed to write workspace state to disk: {e}", exc_info=True)
         raise e # Re-raise the caught exception
 
+def _entry_bytes(entry: Dict[str, Any]) -> Optional[bytes]:
+    """The bytes _write_entry_to_disk writes for a regular file entry, or None if they cannot be computed."""
+    content_lines = entry.get("content_lines", [])
+    try:
+        if content_lines and content_lines[0].strip() == BINARY_FILE_MARKER:
+            return base64.b64decode(''.join(line.rstrip('\n') for line in content_lines[1:]))
+        return ''.join(content_lines).encode("utf-8")
+    except Exception:
+        return None
+
+
+def sync_db_to_sandbox(file_system: Dict[str, Any], sandbox_root: str, workspace_root: str) -> None:
+    """Writes the DB file_system entries the sandbox does not reflect yet into the sandbox.
+
+    Entries missing from the sandbox are created. When `sandbox_root` is the
+    sandbox of the shared session, its manifest also tells which files were
+    changed in the DB since they were last read from the sandbox: those are
+    written again (unless the sandbox already holds the same bytes), and the
+    files whose content is unchanged are skipped without touching the disk.
+    Only the entries the ChangeTracker of `file_system` reports as changed
+    since the last sync are compared; the others are known to be unchanged.
+    The stats the manifest recorded for the paths written (and their
+    directories) are dropped.
+
+    Args:
+        file_system (Dict[str, Any]): The DB file_system, keyed by logical path.
+        sandbox_root (str): Physical root of the sandbox.
+        workspace_root (str): Normalized logical workspace root.
+    """
+    manifest = session_manager.get_sandbox_manifest(sandbox_root)
+    changed_paths = None
+    if manifest is not None:
+        manifest.end_stat_pass()
+        changed_paths = manifest.db_changes(file_system)
+
+    for db_path, db_entry in file_system.items():
+        if not db_path.startswith(workspace_root):
+            continue
+        rel_path = os.path.relpath(db_path, workspace_root) if db_path != workspace_root else '.'
+        sandbox_path = os.path.join(sandbox_root, rel_path)
+
+        try:
+            is_directory = db_entry.get("is_directory")
+            synced = None
+            if manifest is not None and not is_directory:
+                if changed_paths is not None and db_path not in changed_paths:
+                    # Unchanged in the DB since the last sync: in sync if it was read from the sandbox
+                    synced = manifest.is_known(db_path) or None
+                else:
+                    synced = manifest.is_synced(db_path, db_entry.get("content_lines", []))
+            if synced:
+                continue
+            if synced is False:
+                # Changed in the DB since it was read from the sandbox
+                manifest.forget(db_path)
+                manifest.forget_stats(db_path)
+                expected = _entry_bytes(db_entry)
+                if expected is not None and os.path.isfile(sandbox_path):
+                    with open(sandbox_path, "rb") as f:
+                        if f.read() == expected:
+                            continue
+                _write_entry_to_disk(db_entry, sandbox_path)
+                continue
+
+            # If file exists in DB but not in sandbox, create it
+            if not os.path.exists(sandbox_path):
+                if manifest is not None:
+                    manifest.forget_stats(db_path)
+                if is_directory:
+                    os.makedirs(sandbox_path, exist_ok=True)
+                    if "metadata" in db_entry:
+                        _apply_file_metadata(sandbox_path, db_entry["metadata"], strict_mode=False)
+                else:
+                    # Create parent directory if needed
+                    parent_dir = os.path.dirname(sandbox_path)
+                    if parent_dir and not os.path.exists(parent_dir):
+                        os.makedirs(parent_dir, exist_ok=True)
+
+                    # Write file content
+                    content_lines = db_entry.get("content_lines", [])
+                    with open(sandbox_path, 'w', encoding='utf-8') as f:
+                        f.writelines(content_lines)
+
+                    # Apply metadata if available
+                    if "metadata" in db_entry:
+                        _apply_file_metadata(sandbox_path, db_entry["metadata"], strict_mode=False)
+        except Exception as e:
+            _log_util_message(logging.WARNING, f"Failed to sync {db_path} to sandbox: {e}")
+
+    if manifest is not None:
+        manifest.mark_db_synced(file_system)
+
+
 # --- Update Function ---
 def update_db_file_system_from_temp(
         db: Dict[str, Any],
@@ -770,6 +871,9 @@ def update_db_file_system_from_temp(
 
         new_file_system = {}
         processed_paths = set()
+        # Files whose stat signature is unchanged since they were last read reuse the content read then,
+        # and the paths stated by collect_post_command_metadata_state are not stated again
+        manifest = session_manager.get_sandbox_manifest(temp_root)
 
         for current_fs_root, dirs, files in os.walk(normalized_temp_root, topdown=True):
             current_physical_dir_path = _normalize_path_for_db(os.path.abspath(current_fs_root))
@@ -784,7 +888,7 @@ def update_db_file_system_from_temp(
 
             if dir_db_key_path not in processed_paths:
                 # Always read the ground truth metadata from the sandbox directory.
-                dir_metadata = _collect_file_metadata(current_physical_dir_path)
+                dir_metadata = _collect_sandbox_metadata(current_physical_dir_path, dir_db_key_path, manifest)
                 last_modified_val = dir_metadata.get("timestamps", {}).get("modify_time", get_current_timestamp_iso())
                 
                 # For metadata commands, apply in strict mode
@@ -824,10 +928,17 @@ def update_db_file_system_from_temp(
                 size_bytes = 0
                 last_modified = get_current_timestamp_iso() # Default
                 file_metadata = None  # Initialize metadata variable
+                cached_content_lines = None
+                content_cacheable = False
 
                 try:
+                    stat_record = manifest.current_stat(file_db_key_path) if manifest is not None else None
+                    if stat_record is not None:
+                        stat_info = stat_record.stat_result
+                    else:
+                        stat_info = os.stat(temp_file_full_path, follow_symlinks=False)
                     # Check if the file is a symlink first
-                    is_symlink = os.path.islink(temp_file_full_path)
+                    is_symlink = stat.S_ISLNK(stat_info.st_mode)
                     if is_symlink:
                         # For symlinks, we need special handling
                         symlink_target = os.readlink(temp_file_full_path)
@@ -872,8 +983,10 @@ def update_db_file_system_from_temp(
                         size_bytes = len(symlink_target)  # Size is the length of the target path
                     else:
                         # Regular file handling
-                        stat_info = os.stat(temp_file_full_path)
                         size_bytes = stat_info.st_size
+                        if manifest is not None:
+                            cached_content_lines = manifest.cached_content_lines(file_db_key_path, stat_info)
+                            content_cacheable = True
                         last_modified = datetime.datetime.fromtimestamp(stat_info.st_mtime, tz=datetime.timezone.utc).isoformat().replace("+00:00", "Z")
 
                         original_entry = original_state.get(file_db_key_path, {})
@@ -906,10 +1019,10 @@ def update_db_file_system_from_temp(
                                 except Exception as e:
                                     raise MetadataError(f"Failed to apply metadata in strict mode: {str(e)}") from e
 
-                    # Reuse old content_lines and metadata if file is unchanged (optional optimization)
-                    # For simplicity here, we always re-read, but you could compare with original_file_system_state.get(file_db_key_path)
-                    
-                    if size_bytes == 0:
+                    if cached_content_lines is not None:
+                        content_lines = cached_content_lines
+                        content_cacheable = False
+                    elif size_bytes == 0:
                         content_lines = []
                     elif size_bytes > MAX_FILE_SIZE_BYTES: # MAX_FILE_SIZE_BYTES needs to be defined/imported
                         content_lines = LARGE_FILE_CONTENT_PLACEHOLDER # Needs to be defined/imported
@@ -934,6 +1047,7 @@ def update_db_file_system_from_temp(
                         except Exception as e_read:
                             _log_util_message(logging.WARNING, f"Error reading binary file '{file_db_key_path}': {e_read}")
                             content_lines = BINARY_CONTENT_PLACEHOLDER
+                            content_cacheable = False
                     else:
                         # Read ALL text files in binary mode to preserve exact line endings (like real Linux)
                         try:
@@ -962,6 +1076,10 @@ def update_db_file_system_from_temp(
                         except Exception as e_read:
                             logger.warning(f"Error reading file '{file_db_key_path}': {e_read}")
                             content_lines = [f"Error: Could not read file content. Reason: {type(e_read).__name__}\n"]
+                            content_cacheable = False
+
+                    if content_cacheable:
+                        manifest.record(file_db_key_path, stat_info, content_lines)
 
 
                 except MetadataError:
@@ -1054,6 +1172,9 @@ def update_db_file_system_from_temp(
         paths_implicitly_deleted = original_logical_paths - current_logical_paths_found
         if paths_implicitly_deleted:
             _log_util_message(logging.INFO, f"Paths removed during command execution: {paths_implicitly_deleted}")
+        if manifest is not None:
+            manifest.end_stat_pass()
+            manifest.retain(processed_paths)
 
         db["workspace_root"] = final_logical_root_for_db
         
@@ -1066,6 +1187,10 @@ def update_db_file_system_from_temp(
             else:
                 db["cwd"] = final_logical_root_for_db # Reset to root if CWD seems invalid relative to new root.
         
+        if manifest is not None:
+            # Tracked, so that the next sync_db_to_sandbox compares only the entries changed since
+            new_file_system = track_changes(new_file_system, path_depth=1)
+            manifest.mark_db_synced(new_file_system)
         db["file_system"] = new_file_system
 
         # Access time handling is now done in the main collection loop above
@@ -1146,11 +1271,13 @@ def resolve_target_path_for_cd(current_cwd_abs: str,
         _log_util_message(logging.WARNING, f"cd: Target path '{resolved_path_abs}' is not a valid directory in the DB.")
         return None
 
-def _collect_file_metadata(file_path: str) -> Dict[str, Any]:
+def _collect_file_metadata(file_path: str, stat_info: Optional[os.stat_result] = None) -> Dict[str, Any]:
     """Helper function to collect file metadata.
     
     Args:
         file_path (str): Path to the file to collect metadata from
+        stat_info (Optional[os.stat_result]): os.stat(file_path, follow_symlinks=False),
+            if the caller already has it
         
     Returns:
         Dict[str, Any]: Dictionary containing the file's metadata
@@ -1161,7 +1288,8 @@ def _collect_file_metadata(file_path: str) -> Dict[str, Any]:
         Only access_time and modify_time can be set via os.utime().
     """
     try:
-        stat_info = os.stat(file_path, follow_symlinks=False)
+        if stat_info is None:
+            stat_info = os.stat(file_path, follow_symlinks=False)
         
         # Get timestamps
         access_time = datetime.datetime.fromtimestamp(stat_info.st_atime, tz=datetime.timezone.utc).isoformat().replace("+00:00", "Z")
@@ -1169,7 +1297,7 @@ def _collect_file_metadata(file_path: str) -> Dict[str, Any]:
         change_time = datetime.datetime.fromtimestamp(stat_info.st_ctime, tz=datetime.timezone.utc).isoformat().replace("+00:00", "Z")  # Cannot be restored, kernel-managed
         
         # Get file attributes
-        is_symlink = os.path.islink(file_path)
+        is_symlink = stat.S_ISLNK(stat_info.st_mode)
         is_hidden = os.path.basename(file_path).startswith('.')
         
         metadata = {
@@ -1354,6 +1482,25 @@ def _should_update_access_time(command: str) -> bool:
         # For unknown commands, be conservative and update atime
         return True
 
+def _collect_sandbox_metadata(physical_path: str, db_path: str, manifest) -> Dict[str, Any]:
+    """_collect_file_metadata(physical_path), from the stat the manifest recorded in its open stat pass if any.
+
+    Without such a stat, the path is stated and the stat is recorded.
+    """
+    if manifest is None:
+        return _collect_file_metadata(physical_path)
+    stat_record = manifest.current_stat(db_path)
+    if stat_record is not None:
+        return stat_record.metadata
+    try:
+        stat_info = os.stat(physical_path, follow_symlinks=False)
+    except OSError:
+        return _collect_file_metadata(physical_path)
+    metadata = _collect_file_metadata(physical_path, stat_info)
+    manifest.record_stat(db_path, stat_info, metadata)
+    return metadata
+
+
 def collect_pre_command_metadata_state(
     file_system: Dict[str, Any],
     exec_env_root: str,
@@ -1362,9 +1509,13 @@ def collect_pre_command_metadata_state(
     """
     Collect file metadata state from the PHYSICAL SANDBOX before command execution,
     but key the results by LOGICAL path for consistent comparison.
+
+    In the shared sandbox, the metadata its manifest recorded after the previous
+    command is reused for the paths sync_db_to_sandbox did not write since.
     """
     state = {}
     normalized_workspace_root = _normalize_path_for_db(workspace_root)
+    manifest = session_manager.get_sandbox_manifest(exec_env_root)
 
     for logical_path in file_system.keys():
         try:
@@ -1377,6 +1528,11 @@ def collect_pre_command_metadata_state(
                     continue
                 rel_path = os.path.relpath(normalized_logical_path, normalized_workspace_root)
             
+            metadata = manifest.last_metadata(normalized_logical_path) if manifest is not None else None
+            if metadata is not None:
+                state[normalized_logical_path] = {"metadata": metadata}
+                continue
+
             physical_path = _normalize_path_for_db(os.path.join(exec_env_root, rel_path))
 
             if os.path.exists(physical_path) or os.path.islink(physical_path):
@@ -1397,9 +1553,15 @@ def collect_post_command_metadata_state(
     """
     Collect file metadata state from the PHYSICAL SANDBOX after command execution,
     but key the results by LOGICAL path for consistent comparison.
+
+    In the shared sandbox, each path is stated once and the stats are recorded in
+    its manifest, for update_db_file_system_from_temp and the next command.
     """
     state = {}
     normalized_workspace_root = _normalize_path_for_db(workspace_root)
+    manifest = session_manager.get_sandbox_manifest(exec_env_root)
+    if manifest is not None:
+        manifest.begin_stat_pass()
 
     for logical_path in file_system.keys():
         try:
@@ -1414,7 +1576,15 @@ def collect_post_command_metadata_state(
             
             physical_path = _normalize_path_for_db(os.path.join(exec_env_root, rel_path))
 
-            if os.path.exists(physical_path) or os.path.islink(physical_path):
+            if manifest is not None:
+                try:
+                    stat_info = os.stat(physical_path, follow_symlinks=False)
+                except OSError:
+                    continue
+                metadata = _collect_file_metadata(physical_path, stat_info)
+                manifest.record_stat(normalized_logical_path, stat_info, metadata)
+                state[normalized_logical_path] = {"metadata": metadata}
+            elif os.path.exists(physical_path) or os.path.islink(physical_path):
                  # Use the logical path as the key
                  state[normalized_logical_path] = {"metadata": _collect_file_metadata(physical_path)}
 
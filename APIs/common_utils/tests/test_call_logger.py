@@ -19,6 +19,8 @@ from common_utils.call_logger import (
     log_function_call, 
     set_runtime_id, 
     clear_log_file,
+    flush_log_file,
+    read_log_file,
     RUNTIME_ID,
     LOG_FILE_PATH
 )
@@ -39,6 +41,8 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
 
     def tearDown(self):
         """Clean up test fixtures."""
+        # Let the background writer finish before the test directory goes away
+        flush_log_file()
         # Restore original values
         import common_utils.call_logger
         common_utils.call_logger.RUNTIME_ID = self.original_runtime_id
@@ -119,12 +123,12 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         self.assertEqual(str(context.exception), "Test exception")
 
     @patch('common_utils.call_logger._log_lock')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('json.dump')
-    @patch('os.path.exists', return_value=False)
-    @patch('os.path.getsize', return_value=0)
-    def test_log_function_call_file_writing(self, mock_getsize, mock_exists, mock_json_dump, mock_open, mock_lock):
-        """Test that log_function_call writes to file correctly."""
+    @patch('common_utils.call_logger._writer')
+    def test_log_function_call_file_writing(self, mock_writer, mock_lock):
+        """Test that log_function_call hands one JSON line to the writer."""
+        import common_utils.call_logger
+        common_utils.call_logger._log_file_initialized = True
+
         @log_function_call("test_package", "test_function")
         def test_func():
             return "success"
@@ -135,18 +139,24 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         # Verify the result
         self.assertEqual(result, "success")
         
-        # Verify file operations were called
-        mock_open.assert_called()
-        mock_json_dump.assert_called()
+        # Verify a single serialized entry was queued for the current log file
+        mock_writer.submit.assert_called_once()
+        path, line = mock_writer.submit.call_args[0]
+        self.assertEqual(path, common_utils.call_logger.LOG_FILE_PATH)
+        self.assertTrue(line.endswith("\n"))
+        self.assertEqual(json.loads(line)["function_name"], "test_package.test_function")
+
+    def test_log_function_call_append_to_existing(self):
+        """Test that log_function_call appends to an existing file without rewriting it."""
+        test_log_path = os.path.join(self.test_dir, "test_log.jsonl")
+        existing_line = json.dumps({"existing": "data"}) + "\n"
+        with open(test_log_path, 'w') as f:
+            f.write(existing_line)
+
+        import common_utils.call_logger
+        common_utils.call_logger.LOG_FILE_PATH = test_log_path
+        common_utils.call_logger._log_file_initialized = True
 
-    @patch('common_utils.call_logger._log_lock')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('json.dump')
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.getsize', return_value=100)
-    @patch('json.load', return_value=[{"existing": "data"}])
-    def test_log_function_call_append_to_existing(self, mock_json_load, mock_getsize, mock_exists, mock_json_dump, mock_open, mock_lock):
-        """Test that log_function_call appends to existing file."""
         @log_function_call("test_package", "test_function")
         def test_func():
             return "success"
@@ -157,10 +167,13 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         # Verify the result
         self.assertEqual(result, "success")
         
-        # Verify file operations were called
-        mock_open.assert_called()
-        mock_json_load.assert_called()
-        mock_json_dump.assert_called()
+        # Verify the existing content is untouched and the entry was appended
+        flush_log_file()
+        with open(test_log_path, 'r') as f:
+            self.assertTrue(f.read().startswith(existing_line))
+        log_data = read_log_file(test_log_path)
+        self.assertEqual(len(log_data), 2)
+        self.assertEqual(log_data[1]["response"]["return_value"], "success")
 
     @patch('common_utils.call_logger._log_lock')
     @patch('builtins.open', side_effect=IOError("File error"))
@@ -174,6 +187,7 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         
         # Should not raise an exception, just log a warning
         result = test_func()
+        flush_log_file()
         self.assertEqual(result, "success")
 
     def test_log_function_call_json_serialization_error(self):
@@ -395,6 +409,7 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
                 
                 # Should handle write errors gracefully
                 result = test_func()
+                flush_log_file()
                 self.assertEqual(result, "success")
                 
                 # Verify warning was logged
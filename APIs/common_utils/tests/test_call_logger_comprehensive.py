@@ -23,9 +23,12 @@ from common_utils.call_logger import (
     set_runtime_id,
     clear_log_file,
     RUNTIME_ID,
-    LOG_FILE_PATH,
+    flush_log_file,
+    close_log_file,
+    read_log_file,
     OUTPUT_DIR
 )
+import common_utils.call_logger as call_logger_module
 from common_utils.base_case import BaseTestCaseWithErrorHandler
 
 
@@ -73,11 +76,11 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         self.assertEqual(result, "result: value1 value2 custom")
         
         # Verify log file was created (check the actual log file)
-        self.assertTrue(os.path.exists(LOG_FILE_PATH))
+        flush_log_file()
+        self.assertTrue(os.path.exists(call_logger_module.LOG_FILE_PATH))
         
         # Read and verify log content
-        with open(LOG_FILE_PATH, 'r') as f:
-            log_data = json.load(f)
+        log_data = read_log_file()
         
         # Verify log structure (should be a list with one entry)
         self.assertIsInstance(log_data, list)
@@ -108,11 +111,11 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
             test_func("error_value")
         
         # Verify log file was created
-        self.assertTrue(os.path.exists(LOG_FILE_PATH))
+        flush_log_file()
+        self.assertTrue(os.path.exists(call_logger_module.LOG_FILE_PATH))
         
         # Read and verify log content
-        with open(LOG_FILE_PATH, 'r') as f:
-            log_data = json.load(f)
+        log_data = read_log_file()
         
         # Verify log structure (should be a list with one entry)
         self.assertIsInstance(log_data, list)
@@ -145,11 +148,11 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         self.assertEqual(result.value, "test_value")
         
         # Verify log file was created
-        self.assertTrue(os.path.exists(LOG_FILE_PATH))
+        flush_log_file()
+        self.assertTrue(os.path.exists(call_logger_module.LOG_FILE_PATH))
         
         # Read and verify log content
-        with open(LOG_FILE_PATH, 'r') as f:
-            log_data = json.load(f)
+        log_data = read_log_file()
         
         # Verify log structure (should be a list with one entry)
         self.assertIsInstance(log_data, list)
@@ -173,11 +176,11 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         test_func("third")
         
         # Verify log file was created
-        self.assertTrue(os.path.exists(LOG_FILE_PATH))
+        flush_log_file()
+        self.assertTrue(os.path.exists(call_logger_module.LOG_FILE_PATH))
         
         # Read and verify log content (should contain all calls)
-        with open(LOG_FILE_PATH, 'r') as f:
-            log_data = json.load(f)
+        log_data = read_log_file()
         
         # Verify all calls were logged (should be a list with 3 entries)
         self.assertIsInstance(log_data, list)
@@ -224,11 +227,11 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
             self.assertIn(f"result from thread {i}", results)
         
         # Verify log file was created (should contain all calls)
-        self.assertTrue(os.path.exists(LOG_FILE_PATH))
+        flush_log_file()
+        self.assertTrue(os.path.exists(call_logger_module.LOG_FILE_PATH))
         
         # Read and verify log content
-        with open(LOG_FILE_PATH, 'r') as f:
-            log_data = json.load(f)
+        log_data = read_log_file()
         
         # Verify log structure is valid (should be a list with 5 entries)
         self.assertIsInstance(log_data, list)
@@ -244,20 +247,16 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         """Test setting custom runtime ID."""
         # Store original values
         original_runtime_id = RUNTIME_ID
-        original_log_file_path = LOG_FILE_PATH
         
         # Test setting new runtime ID
         new_runtime_id = "test_runtime_123"
         set_runtime_id(new_runtime_id)
         
-        # Import the module again to get the updated values
-        import common_utils.call_logger as call_logger_module
-        
         # Verify runtime ID was updated
         self.assertEqual(call_logger_module.RUNTIME_ID, new_runtime_id)
         
         # Verify log file path was updated
-        expected_log_file = os.path.join(OUTPUT_DIR, f"call_log_{new_runtime_id}.json")
+        expected_log_file = os.path.join(OUTPUT_DIR, f"call_log_{new_runtime_id}.jsonl")
         self.assertEqual(call_logger_module.LOG_FILE_PATH, expected_log_file)
         
         # Restore original values
@@ -266,26 +265,26 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
     def test_clear_log_file_existing_file(self):
         """Test clearing an existing log file."""
         # Create a test log file at the actual LOG_FILE_PATH
-        with open(LOG_FILE_PATH, 'w') as f:
+        with open(call_logger_module.LOG_FILE_PATH, 'w') as f:
             json.dump({"test": "data"}, f)
         
         # Verify file exists
-        self.assertTrue(os.path.exists(LOG_FILE_PATH))
+        self.assertTrue(os.path.exists(call_logger_module.LOG_FILE_PATH))
         
         # Clear the log file
         clear_log_file()
         
         # Verify file was removed
-        self.assertFalse(os.path.exists(LOG_FILE_PATH))
+        self.assertFalse(os.path.exists(call_logger_module.LOG_FILE_PATH))
 
     def test_clear_log_file_nonexistent_file(self):
         """Test clearing a nonexistent log file."""
         # Remove the log file if it exists
-        if os.path.exists(LOG_FILE_PATH):
-            os.remove(LOG_FILE_PATH)
+        if os.path.exists(call_logger_module.LOG_FILE_PATH):
+            os.remove(call_logger_module.LOG_FILE_PATH)
         
         # Verify file doesn't exist
-        self.assertFalse(os.path.exists(LOG_FILE_PATH))
+        self.assertFalse(os.path.exists(call_logger_module.LOG_FILE_PATH))
         
         # Clear the log file (should not raise exception)
         try:
@@ -307,11 +306,11 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         self.assertEqual(result, "no args result")
         
         # Verify log file was created
-        self.assertTrue(os.path.exists(LOG_FILE_PATH))
+        flush_log_file()
+        self.assertTrue(os.path.exists(call_logger_module.LOG_FILE_PATH))
         
         # Read and verify log content
-        with open(LOG_FILE_PATH, 'r') as f:
-            log_data = json.load(f)
+        log_data = read_log_file()
         
         # Verify log structure (should be a list with one entry)
         self.assertIsInstance(log_data, list)
@@ -341,11 +340,11 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         self.assertEqual(result, "processed: 3 2 4 5")
         
         # Verify log file was created
-        self.assertTrue(os.path.exists(LOG_FILE_PATH))
+        flush_log_file()
+        self.assertTrue(os.path.exists(call_logger_module.LOG_FILE_PATH))
         
         # Read and verify log content
-        with open(LOG_FILE_PATH, 'r') as f:
-            log_data = json.load(f)
+        log_data = read_log_file()
         
         # Verify log structure (should be a list with one entry)
         self.assertIsInstance(log_data, list)
@@ -382,7 +381,70 @@ class TestCallLogger(BaseTestCaseWithErrorHandler):
         self.assertEqual(result, "result: test 123")
         
         # Verify log file was created
-        self.assertTrue(os.path.exists(LOG_FILE_PATH))
+        flush_log_file()
+        self.assertTrue(os.path.exists(call_logger_module.LOG_FILE_PATH))
+
+    def test_log_file_is_jsonl(self):
+        """Test that each call is appended as one JSON line."""
+        @log_function_call("test_package", "test_function")
+        def test_func(value):
+            return {"value": value}
+
+        test_func(1)
+        test_func(2)
+        flush_log_file()
+
+        with open(call_logger_module.LOG_FILE_PATH, 'r') as f:
+            lines = f.read().splitlines()
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[1])["response"]["return_value"], {"value": 2})
+
+    def test_logged_result_is_snapshot_at_call_time(self):
+        """Test that mutating a returned object later does not change the log."""
+        @log_function_call("test_package", "test_function")
+        def test_func():
+            return {"items": [1]}
+
+        result = test_func()
+        result["items"].append(2)
+
+        self.assertEqual(read_log_file()[0]["response"]["return_value"], {"items": [1]})
+
+    def test_logging_resumes_after_close(self):
+        """Test that close_log_file flushes and logging keeps working afterwards."""
+        @log_function_call("test_package", "test_function")
+        def test_func(value):
+            return value
+
+        test_func("before")
+        close_log_file()
+        self.assertEqual(len(read_log_file()), 1)
+
+        test_func("after")
+        log_data = read_log_file()
+        self.assertEqual([e["response"]["return_value"] for e in log_data], ["before", "after"])
+
+    def test_read_log_file_skips_malformed_lines(self):
+        """Test that a truncated trailing line does not break reading."""
+        path = os.path.join(self.temp_dir, "partial.jsonl")
+        with open(path, 'w') as f:
+            f.write(json.dumps({"function_name": "a.b"}) + "\n")
+            f.write('{"function_name": "a.')
+
+        self.assertEqual(read_log_file(path), [{"function_name": "a.b"}])
+
+    def test_read_log_file_legacy_json_array(self):
+        """Test that logs written as a single JSON array are still readable."""
+        path = os.path.join(self.temp_dir, "legacy.json")
+        with open(path, 'w') as f:
+            json.dump([{"function_name": "a.b"}, {"function_name": "c.d"}], f, indent=4)
+
+        self.assertEqual(len(read_log_file(path)), 2)
+
+    def test_read_log_file_missing_file(self):
+        """Test that reading a missing log returns an empty list."""
+        self.assertEqual(read_log_file(os.path.join(self.temp_dir, "missing.jsonl")), [])
 
 
 if __name__ == '__main__':
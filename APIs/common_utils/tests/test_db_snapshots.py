@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests for db_snapshots module.
+"""
+
+import copy
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import common_utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from common_utils import db_snapshots
+from common_utils.db_snapshots import SnapshotError, SnapshotManager
+from common_utils.tracked_db import get_change_tracker, track_changes
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+
+
+def _sample_db():
+    return {
+        "users": {
+            "u1": {"name": "Ada", "orders": ["o1"], "address": {"city": "Paris"}},
+            "u2": {"name": "Bob", "orders": [], "address": {"city": "Rome"}},
+        },
+        "orders": {"o1": {"status": "pending", "items": [{"id": "i1", "qty": 1}]}},
+        "counters": {"order": 1},
+    }
+
+
+def _mutate(db):
+    db["users"]["u1"]["address"]["city"] = "Lyon"
+    db["users"]["u1"]["orders"].append("o2")
+    db["orders"]["o2"] = {"status": "pending", "items": []}
+    db["orders"]["o1"]["items"][0]["qty"] += 2
+    db["orders"]["o1"]["items"].sort(key=lambda item: item["id"], reverse=True)
+    del db["users"]["u2"]
+    db["counters"].clear()
+
+
+class TestSnapshotManager(BaseTestCaseWithErrorHandler):
+
+    def setUp(self):
+        self.manager = SnapshotManager()
+        self.db = track_changes(_sample_db(), path_depth=2)
+        self.manager.register("svc", self.db)
+
+    def test_restore_undoes_every_mutation(self):
+        snapshot = self.manager.snapshot("svc")
+        _mutate(self.db)
+        self.db.clear()
+        self.db.update({"other": {}})
+        self.manager.restore(snapshot)
+        self.assertEqual(self.db, _sample_db())
+        self.assertTrue(self.manager.is_copy_on_write("svc"))
+
+    def test_snapshots_copy_only_changed_containers(self):
+        with patch.object(db_snapshots.copy, "deepcopy") as deepcopy:
+            snapshot = self.manager.snapshot("svc")
+            self.manager.restore(snapshot)
+            self.db["counters"]["order"] = 2
+            self.db["counters"]["order"] = 3
+            self.manager.restore(snapshot)
+        deepcopy.assert_not_called()
+        self.assertEqual(self.db, _sample_db())
+        with patch.object(db_snapshots, "_put_back", wraps=db_snapshots._put_back) as put_back:
+            self.db["users"]["u1"]["name"] = "Ada L."
+            self.manager.restore(snapshot)
+        self.assertEqual([call.args[0] for call in put_back.call_args_list], [self.db["users"]["u1"]])
+
+    def test_snapshot_can_be_restored_once_per_episode(self):
+        snapshot = self.manager.snapshot("svc")
+        for _ in range(3):
+            _mutate(self.db)
+            self.manager.restore(snapshot)
+            self.assertEqual(self.db, _sample_db())
+        # Restored containers are tracked as before
+        self.db["users"]["u1"]["address"]["city"] = "Nice"
+        self.assertEqual(get_change_tracker(self.db).changes_since(0)[0], ("users", "u1"))
+
+    def test_restore_undoes_mutations_of_inserted_records(self):
+        self.db["orders"]["o2"] = {"status": "pending", "items": []}
+        order = self.db["orders"]["o2"]
+        expected = copy.deepcopy(self.db)
+        snapshot = self.manager.snapshot("svc")
+        order["items"].append({"id": "i2", "qty": 1})
+        order["status"] = "shipped"
+        self.manager.restore(snapshot)
+
+        self.assertEqual(self.db, expected)
+        self.assertIs(self.db["orders"]["o2"], order)
+        version = get_change_tracker(self.db).version
+        order["status"] = "cancelled"
+        self.assertEqual(get_change_tracker(self.db).changes_since(version), [("orders", "o2")])
+
+    def test_nested_snapshots(self):
+        outer = self.manager.snapshot("svc")
+        self.db["users"]["u1"]["name"] = "Ada L."
+        after_first_change = copy.deepcopy(self.db)
+        inner = self.manager.snapshot("svc")
+        self.db["users"]["u1"]["name"] = "Ada Lovelace"
+        self.db["orders"].pop("o1")
+
+        self.manager.restore(inner)
+        self.assertEqual(self.db, after_first_change)
+        self.db["counters"]["order"] = 5
+        self.manager.restore(outer)
+        self.assertEqual(self.db, _sample_db())
+        with self.assertRaises(SnapshotError):
+            self.manager.restore(inner)
+
+    def test_release_keeps_changes_and_outer_snapshot(self):
+        outer = self.manager.snapshot("svc")
+        self.db["users"]["u1"]["name"] = "Ada L."
+        inner = self.manager.snapshot("svc")
+        self.db["users"]["u1"]["address"]["city"] = "Lyon"
+        self.manager.release(inner)
+        self.assertEqual(self.db["users"]["u1"]["address"]["city"], "Lyon")
+        with self.assertRaises(SnapshotError):
+            self.manager.restore(inner)
+
+        self.manager.restore(outer)
+        self.assertEqual(self.db, _sample_db())
+        self.manager.release(outer)
+        self.assertIsNone(get_change_tracker(self.db).before_change)
+
+    def test_restore_reports_restored_containers(self):
+        tracker = get_change_tracker(self.db)
+        snapshot = self.manager.snapshot("svc")
+        self.db["orders"]["o1"]["status"] = "cancelled"
+        version = tracker.version
+        self.manager.restore(snapshot)
+        self.assertEqual(tracker.changes_since(version), [("orders", "o1")])
+
+    def test_plain_dict_db_is_deep_copied(self):
+        plain = _sample_db()
+        self.manager.register("plain", plain)
+        self.assertFalse(self.manager.is_copy_on_write("plain"))
+        with self.manager.restoring("svc", "plain"):
+            _mutate(plain)
+            _mutate(self.db)
+        self.assertEqual(plain, _sample_db())
+        self.assertEqual(self.db, _sample_db())
+
+    def test_register_default_service_db(self):
+        from notes_and_lists.SimulationEngine.db import DB
+        snapshot = self.manager.snapshot("notes_and_lists")
+        self.assertIn("notes_and_lists", self.manager.services)
+        before = copy.deepcopy(DB)
+        DB["notes"].clear()
+        self.manager.restore(snapshot)
+        self.manager.release(snapshot)
+        self.assertEqual(DB, before)
+
+    def test_snapshot_of_other_manager_is_rejected(self):
+        snapshot = self.manager.snapshot("svc")
+        with self.assertRaises(SnapshotError):
+            SnapshotManager().restore(snapshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for decorator_cache module and its use by resolve_function_import.
+"""
+
+import unittest
+import os
+import sys
+import types
+from unittest.mock import patch, MagicMock
+
+# Add the parent directory to the path so we can import common_utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from common_utils.decorator_cache import (
+    DecoratedFunctionCache,
+    decorated_function_cache,
+    invalidate_decorated_functions
+)
+from common_utils.init_utils import resolve_function_import
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+
+
+class TestDecoratedFunctionCache(BaseTestCaseWithErrorHandler):
+    """Unit tests for DecoratedFunctionCache."""
+
+    def setUp(self):
+        self.cache = DecoratedFunctionCache()
+
+    def test_get_returns_stored_entry(self):
+        original, decorated = object(), object()
+        self.cache.put("svc", ("fn",), original, decorated, self.cache.generation)
+        self.assertIs(self.cache.get("svc", ("fn",), original), decorated)
+
+    def test_get_misses_when_original_changed(self):
+        original, decorated = object(), object()
+        self.cache.put("svc", ("fn",), original, decorated, self.cache.generation)
+        self.assertIsNone(self.cache.get("svc", ("fn",), object()))
+
+    def test_invalidate_single_service(self):
+        original = object()
+        self.cache.put("svc_a", ("fn",), original, "a", self.cache.generation)
+        self.cache.put("svc_b", ("fn",), original, "b", self.cache.generation)
+        self.cache.invalidate("svc_a")
+        self.assertIsNone(self.cache.get("svc_a", ("fn",), original))
+        self.assertEqual(self.cache.get("svc_b", ("fn",), original), "b")
+
+    def test_invalidate_all_services(self):
+        original = object()
+        self.cache.put("svc_a", ("fn",), original, "a", self.cache.generation)
+        self.cache.put("svc_b", ("fn",), original, "b", self.cache.generation)
+        self.cache.invalidate()
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_put_dropped_after_concurrent_invalidation(self):
+        original = object()
+        generation = self.cache.generation
+        self.cache.invalidate("svc")
+        self.cache.put("svc", ("fn",), original, "stale", generation)
+        self.assertIsNone(self.cache.get("svc", ("fn",), original))
+
+
+class TestResolveFunctionImportCaching(BaseTestCaseWithErrorHandler):
+    """Tests that resolve_function_import reuses decorated functions."""
+
+    def setUp(self):
+        self.module_name = "_decorator_cache_test_service.impl"
+        self.module = types.ModuleType(self.module_name)
+        self.module.do_work = lambda value=1: value
+        sys.modules[self.module_name] = self.module
+        self.function_map = {"do_work": f"{self.module_name}.do_work"}
+        self.error_simulator = MagicMock()
+        self.error_simulator.error_definitions = {}
+        self.error_simulator.get_error_simulation_decorator.return_value = lambda func: func
+        invalidate_decorated_functions()
+
+    def tearDown(self):
+        sys.modules.pop(self.module_name, None)
+        invalidate_decorated_functions()
+
+    def _resolve(self):
+        return resolve_function_import("do_work", self.function_map, self.error_simulator)
+
+    def test_repeated_lookup_returns_same_object(self):
+        with patch('common_utils.init_utils.apply_decorators', wraps=lambda **kw: (lambda *a, **k: kw["original_func"](*a, **k))) as mock_apply:
+            first = self._resolve()
+            second = self._resolve()
+        self.assertIs(first, second)
+        self.assertEqual(mock_apply.call_count, 1)
+        self.assertEqual(first(5), 5)
+
+    def test_patched_implementation_is_redecorated(self):
+        first = self._resolve()
+        self.module.do_work = lambda value=1: value * 2
+        second = self._resolve()
+        self.assertIsNot(first, second)
+        self.assertEqual(second(5), 10)
+
+    def test_invalidation_forces_redecoration(self):
+        first = self._resolve()
+        invalidate_decorated_functions("_decorator_cache_test_service")
+        second = self._resolve()
+        self.assertIsNot(first, second)
+
+    def test_error_definition_change_forces_redecoration(self):
+        first = self._resolve()
+        self.error_simulator.error_definitions = {self.function_map["do_work"]: []}
+        second = self._resolve()
+        self.assertIsNot(first, second)
+
+    def test_log_records_fetched_change_forces_redecoration(self):
+        first = self._resolve()
+        with patch('common_utils.init_utils.get_log_records_fetched', return_value=True):
+            second = self._resolve()
+        self.assertIsNot(first, second)
+
+    def test_mutation_change_invalidates_service(self):
+        from common_utils.mutation_manager import MutationManager
+        self._resolve()
+        self.assertEqual(decorated_function_cache.size("_decorator_cache_test_service"), 1)
+        with patch.object(MutationManager, '_validate_and_generate_mutation_path_for_service'), \
+             patch.object(MutationManager, '_restore_schema_file'):
+            MutationManager.set_current_mutation_name_for_service("_decorator_cache_test_service", None)
+        self.assertEqual(decorated_function_cache.size("_decorator_cache_test_service"), 0)
+        MutationManager._mutation_names.pop("_decorator_cache_test_service", None)
+
+
+if __name__ == '__main__':
+    unittest.main()
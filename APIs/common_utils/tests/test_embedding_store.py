@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Tests for embedding_store module and the embedding managers using it.
+"""
+
+import os
+import pickle
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add the parent directory to the path so we can import common_utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from common_utils.embedding_store import (
+    EmbeddingStore,
+    get_embedding_store,
+    close_embedding_stores,
+)
+from common_utils.llm_interface import FakeEmbeddingManager, GeminiEmbeddingManager, fake_embedding
+from common_utils.search_engine.configs import QdrantConfig
+from common_utils.search_engine.strategies import QdrantSearchStrategy
+from common_utils.tests.test_search_engine_strategies import MockAdapter
+
+MODEL = "models/text-embedding-004"
+TASK = "RETRIEVAL_DOCUMENT"
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    """Test cases for EmbeddingStore."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "embeddings.sqlite")
+
+    def tearDown(self):
+        close_embedding_stores()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_put_and_get_many(self):
+        store = EmbeddingStore(self.path)
+        store.put_many(MODEL, TASK, 3, [("hello", [0.1, 0.2, 0.3]), ("world", [1.0, 0.0, -1.0])])
+
+        found = store.get_many(MODEL, TASK, 3, ["hello", "world", "missing"])
+
+        self.assertEqual(set(found), {"hello", "world"})
+        self.assertEqual(found["hello"].dtype, np.float32)
+        np.testing.assert_allclose(found["world"], [1.0, 0.0, -1.0])
+
+    def test_key_includes_model_task_and_dimension(self):
+        store = EmbeddingStore(self.path)
+        store.put_many(MODEL, TASK, 3, [("hello", [0.1, 0.2, 0.3])])
+
+        self.assertEqual(store.get_many("other-model", TASK, 3, ["hello"]), {})
+        self.assertEqual(store.get_many(MODEL, "RETRIEVAL_QUERY", 3, ["hello"]), {})
+        self.assertEqual(store.get_many(MODEL, TASK, 4, ["hello"]), {})
+
+    def test_entries_persist_across_instances(self):
+        store = EmbeddingStore(self.path)
+        store.put_many(MODEL, TASK, 2, [("hello", [0.5, 0.25])])
+        store.close()
+
+        reopened = EmbeddingStore(self.path)
+        np.testing.assert_allclose(reopened.get_many(MODEL, TASK, 2, ["hello"])["hello"], [0.5, 0.25])
+
+    def test_writes_only_append(self):
+        store = EmbeddingStore(self.path)
+        store.put_many(MODEL, TASK, 2, [("hello", [0.5, 0.25])])
+        store.put_many(MODEL, TASK, 2, [("hello", [9.0, 9.0]), ("world", [1.0, 1.0])])
+
+        self.assertEqual(len(store), 2)
+        np.testing.assert_allclose(store.get_many(MODEL, TASK, 2, ["hello"])["hello"], [0.5, 0.25])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        store = EmbeddingStore(self.path, max_entries=2, memory_entries=1)
+        store.put_many(MODEL, TASK, 1, [("a", [1.0])])
+        store.put_many(MODEL, TASK, 1, [("b", [2.0])])
+        store.get_many(MODEL, TASK, 1, ["a"])
+        store.put_many(MODEL, TASK, 1, [("c", [3.0])])
+
+        self.assertEqual(len(store), 2)
+        other = EmbeddingStore(self.path)
+        self.assertEqual(set(other.get_many(MODEL, TASK, 1, ["a", "b", "c"])), {"a", "c"})
+
+    def test_lookups_refresh_last_use_on_disk(self):
+        store = EmbeddingStore(self.path, max_entries=2)
+        store.put_many(MODEL, TASK, 1, [("a", [1.0])])
+        store.put_many(MODEL, TASK, 1, [("b", [2.0])])
+        store.get_many(MODEL, TASK, 1, ["a"])
+
+        other = EmbeddingStore(self.path, max_entries=2)
+        other.put_many(MODEL, TASK, 1, [("c", [3.0])])
+
+        self.assertEqual(set(other.get_many(MODEL, TASK, 1, ["a", "b", "c"])), {"a", "c"})
+
+    def test_reader_sees_appends_of_other_connection(self):
+        writer = EmbeddingStore(self.path)
+        reader = EmbeddingStore(self.path)
+        self.assertEqual(reader.get_many(MODEL, TASK, 1, ["a"]), {})
+
+        writer.put_many(MODEL, TASK, 1, [("a", [1.0])])
+
+        self.assertEqual(set(reader.get_many(MODEL, TASK, 1, ["a"])), {"a"})
+        mode = sqlite3.connect(self.path).execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_get_embedding_store_is_shared_per_path(self):
+        first = get_embedding_store(self.path, max_entries=10)
+        second = get_embedding_store(os.path.join(self.temp_dir, ".", "embeddings.sqlite"), max_entries=20)
+
+        self.assertIs(first, second)
+        self.assertEqual(first.max_entries, 20)
+        self.assertIsNot(first, get_embedding_store(os.path.join(self.temp_dir, "other.sqlite")))
+
+
+class TestEmbeddingManagers(unittest.TestCase):
+    """Test cases for GeminiEmbeddingManager caching, using the fake embedder."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.temp_dir, "cache.tmp")
+
+    def tearDown(self):
+        close_embedding_stores()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fake_embedding_is_deterministic(self):
+        self.assertEqual(fake_embedding("quarterly report", 8), fake_embedding("quarterly report", 8))
+        self.assertNotEqual(fake_embedding("quarterly report", 8), fake_embedding("lunch menu", 8))
+        self.assertAlmostEqual(float(np.linalg.norm(fake_embedding("quarterly report", 8))), 1.0)
+
+    def test_store_is_opened_lazily(self):
+        FakeEmbeddingManager("key", self.cache_file)
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_managers_share_cached_embeddings(self):
+        first = FakeEmbeddingManager("key", self.cache_file)
+        second = FakeEmbeddingManager("key", self.cache_file)
+
+        with patch.object(FakeEmbeddingManager, "_embed_batch", wraps=first._embed_batch) as embed_batch:
+            embeddings = first.embed_content(MODEL, ["alpha", "", "beta", "alpha"], TASK, 4)["embedding"]
+            self.assertEqual(embed_batch.call_args[0][1], ["alpha", "beta"])
+
+            again = second.embed_content(MODEL, ["beta", "alpha"], TASK, 4)["embedding"]
+            self.assertEqual(embed_batch.call_count, 1)
+
+        self.assertIs(first.store, second.store)
+        self.assertEqual(embeddings[1], [0.0] * 4)
+        self.assertEqual(embeddings[0], embeddings[3])
+        self.assertEqual(again, [embeddings[2], embeddings[0]])
+
+    def test_relative_cache_file_is_stored_under_store_dir(self):
+        store_dir = os.path.join(self.temp_dir, "stores")
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            with patch.dict(os.environ, {"EMBEDDING_STORE_DIR": store_dir}):
+                manager = FakeEmbeddingManager("key", "relative_cache.tmp")
+                manager.embed_content(MODEL, ["alpha"], TASK, 4)
+        finally:
+            os.chdir(cwd)
+
+        self.assertEqual(manager.store.path, os.path.join(store_dir, "relative_cache.tmp"))
+        self.assertTrue(os.path.exists(manager.store.path))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "relative_cache.tmp")))
+
+    def test_without_cache_file_nothing_is_stored(self):
+        manager = FakeEmbeddingManager("key")
+        embeddings = manager.embed_content(MODEL, ["alpha"], TASK, 4)["embedding"]
+
+        self.assertIsNone(manager.store)
+        self.assertEqual(embeddings, [fake_embedding("alpha", 4)])
+
+    def test_legacy_pickle_cache_is_used_as_fallback(self):
+        with open(self.cache_file, "wb") as f:
+            pickle.dump([("alpha", [0.5, 0.5])], f)
+        manager = GeminiEmbeddingManager("key", self.cache_file)
+
+        with patch.object(GeminiEmbeddingManager, "_embed_batch", side_effect=AssertionError("API called")):
+            embeddings = manager.embed_content(MODEL, ["alpha"], TASK, 2)["embedding"]
+
+        self.assertEqual(embeddings, [[0.5, 0.5]])
+        self.assertEqual(manager.store.path, self.cache_file + ".sqlite")
+        with open(self.cache_file, "rb") as f:
+            self.assertEqual(pickle.load(f), [("alpha", [0.5, 0.5])])
+
+    def test_qdrant_strategy_with_fake_provider(self):
+        config = QdrantConfig(
+            api_key="test_key",
+            embedding_size=16,
+            embedding_provider="fake",
+            cache_file=self.cache_file,
+        )
+        strategy = QdrantSearchStrategy(config, MockAdapter())
+
+        embeddings = strategy._encode_texts(["quarterly budget", "lunch", "quarterly budget"])
+
+        self.assertIsInstance(strategy._embedding_manager, FakeEmbeddingManager)
+        self.assertEqual(embeddings[0], embeddings[2])
+        np.testing.assert_allclose(embeddings[1], fake_embedding("lunch", 16))
+        self.assertEqual(len(strategy._embedding_manager.store), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1500,6 +1500,62 @@ _function_map = {
             self.assertEqual(simulator.error_config["ValueError"]["probability"], 0.5)
             self.assertEqual(simulator.current_error_count, 0)
 
+    def _install_fake_service(self, package_name):
+        """Registers `<package_name>.impl` in sys.modules with a function and a class method."""
+        import types
+        package = types.ModuleType(package_name)
+        module = types.ModuleType(f"{package_name}.impl")
+        exec(
+            "def send(x):\n    return x\n"
+            "class Api:\n    def get(self):\n        return 1\n",
+            module.__dict__,
+        )
+        module.send.__module__ = module.__name__
+        module.Api.__module__ = module.__name__
+        module.Api.get.__module__ = module.__name__
+        sys.modules[package_name] = package
+        sys.modules[f"{package_name}.impl"] = module
+        self.addCleanup(sys.modules.pop, package_name, None)
+        self.addCleanup(sys.modules.pop, f"{package_name}.impl", None)
+        return module
+
+    def test_resolve_function_paths_direct_lookup(self):
+        """Test that FQNs of loaded functions and methods resolve without a module scan."""
+        self._install_fake_service("fake_err_service")
+        simulator = ErrorSimulator()
+        raw_definitions = {
+            "fake_err_service.impl.send": [{"exception": "ValueError"}],
+            "fake_err_service.impl.Api.get": [{"exception": "KeyError"}],
+            "fake_err_service.impl.missing": [{"exception": "KeyError"}],
+        }
+        with patch('common_utils.ErrorSimulation._package_function_paths', return_value=[]) as mock_scan:
+            result = simulator._resolve_function_paths(raw_definitions)
+        self.assertEqual(set(result), {"fake_err_service.impl.send", "fake_err_service.impl.Api.get"})
+        # Only the unresolved key needs the fallback scans: its own packages, then everything
+        self.assertEqual(mock_scan.call_count, 2)
+        self.assertIn("fake_err_service", mock_scan.call_args_list[0][0][0])
+
+    def test_resolve_function_paths_suffix_fallback(self):
+        """Test that short keys still resolve through the suffix fallback."""
+        self._install_fake_service("fake_err_service")
+        simulator = ErrorSimulator()
+        simulator._function_map = {"send_it": "impl.send"}
+        # The service package is inferred from <service>/SimulationEngine/error_definitions.json
+        simulator.error_definitions_path = os.path.join("APIs", "fake_err_service", "SimulationEngine", "error_definitions.json")
+        result = simulator._resolve_function_paths({"send_it": [{"exception": "ValueError"}]})
+        self.assertEqual(list(result), ["fake_err_service.impl.send"])
+
+    def test_resolve_function_paths_sees_functions_added_later(self):
+        """Test that cached symbol tables pick up members added after the first lookup."""
+        module = self._install_fake_service("fake_err_service")
+        simulator = ErrorSimulator()
+        self.assertEqual(simulator._resolve_function_paths({"fake_err_service.impl.late": []}), {})
+
+        exec("def late():\n    return 2\n", module.__dict__)
+        module.late.__module__ = module.__name__
+        result = simulator._resolve_function_paths({"fake_err_service.impl.late": []})
+        self.assertIn("fake_err_service.impl.late", result)
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled validation plans used by fc_checkers.validate_schema_fc_checkers.
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import common_utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from common_utils import fc_checkers
+from common_utils.fc_checkers import validate_schema_fc_checkers, clear_validation_plan_cache
+from common_utils.fc_checkers_manager import get_fc_checkers_manager, reset_fc_checkers_manager
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+
+
+SPEC = {
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "count": {"type": "integer", "nullable": True},
+        },
+        "required": ["name"],
+    },
+    "response": {
+        "type": "object",
+        "properties": {"greeting": {"type": "string"}},
+        "required": ["greeting"],
+    },
+}
+
+
+def _make_function():
+    def greet(name, count=None):
+        return {"greeting": f"hello {name}"}
+    greet.spec = SPEC
+    return greet
+
+
+class TestValidationPlanCache(BaseTestCaseWithErrorHandler):
+    """Test cases for validation plan reuse."""
+
+    def setUp(self):
+        reset_fc_checkers_manager()
+        manager = get_fc_checkers_manager()
+        manager.set_global_validation(True)
+        manager.set_global_logging(False)
+        manager.set_skip_negative_tests(False)
+        clear_validation_plan_cache()
+
+    def tearDown(self):
+        reset_fc_checkers_manager()
+        clear_validation_plan_cache()
+
+    def test_plan_is_compiled_once_across_calls(self):
+        wrapped = validate_schema_fc_checkers("test_service", "greet")(_make_function())
+        with patch.object(fc_checkers, '_generate_pydantic_model_from_schema',
+                          wraps=fc_checkers._generate_pydantic_model_from_schema) as mock_generate, \
+             patch.object(fc_checkers, '_compile_openapi_validator',
+                          wraps=fc_checkers._compile_openapi_validator) as mock_compile:
+            for i in range(5):
+                self.assertEqual(wrapped("world", count=i), {"greeting": "hello world"})
+        # One input and one output model/validator, regardless of call count
+        self.assertEqual(mock_generate.call_count, 2)
+        self.assertEqual(mock_compile.call_count, 2)
+
+    def test_plan_shared_between_wrappers_of_same_spec(self):
+        first = validate_schema_fc_checkers("test_service", "greet")(_make_function())
+        second = validate_schema_fc_checkers("test_service", "greet")(_make_function())
+        first("a")
+        with patch.object(fc_checkers, '_compile_openapi_validator') as mock_compile:
+            second("b")
+        mock_compile.assert_not_called()
+
+    def test_nullable_transformation_applied(self):
+        wrapped = validate_schema_fc_checkers("test_service", "greet")(_make_function())
+        # 'count' is nullable, so the OpenAPI validator must accept None
+        self.assertEqual(wrapped("world", count=None), {"greeting": "hello world"})
+
+    def test_invalid_input_still_raises(self):
+        wrapped = validate_schema_fc_checkers("test_service", "greet")(_make_function())
+        wrapped("warm up")
+        with self.assertRaises(ValueError) as context:
+            wrapped(123)
+        self.assertIn("Schema validation failed", str(context.exception))
+
+    def test_spec_does_not_leak_between_services(self):
+        wrapped_a = validate_schema_fc_checkers("service_a", "greet")(_make_function())
+        wrapped_b = validate_schema_fc_checkers("service_b", "greet")(_make_function())
+        wrapped_a("a")
+        wrapped_b("b")
+        self.assertEqual(len(fc_checkers._validation_plans), 2)
+
+    def test_spec_changed_in_place_gets_a_new_plan(self):
+        func = _make_function()
+        func.spec = {"parameters": {"type": "object", "properties": {"name": {"type": "string"}}}}
+        wrapped = validate_schema_fc_checkers("test_service", "greet")(func)
+        wrapped("world")
+
+        func.spec["parameters"]["properties"]["name"]["type"] = "integer"
+
+        self.assertEqual(wrapped(123), {"greeting": "hello 123"})
+        with self.assertRaises(ValueError):
+            wrapped("world")
+
+    def test_spec_without_parameters_skips_the_signature(self):
+        func = _make_function()
+        func.spec = {"response": SPEC["response"]}
+        wrapped = validate_schema_fc_checkers("test_service", "greet")(func)
+        with patch.object(fc_checkers.inspect, 'signature') as mock_signature:
+            self.assertEqual(wrapped("world"), {"greeting": "hello world"})
+        mock_signature.assert_not_called()
+
+    def test_original_spec_not_mutated(self):
+        wrapped = validate_schema_fc_checkers("test_service", "greet")(_make_function())
+        wrapped("world")
+        self.assertTrue(SPEC["parameters"]["properties"]["count"]["nullable"])
+
+
+if __name__ == '__main__':
+    unittest.main()
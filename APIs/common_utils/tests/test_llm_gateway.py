@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tests for the llm_gateway module.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add the parent directory to the path so we can import common_utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from common_utils.llm_gateway import (
+    LLMGateway,
+    LLMReplayMissError,
+    LLMRequest,
+    LLMResponse,
+    LLMResponseError,
+    RuleBasedBackend,
+    TokenBucket,
+)
+
+
+class _ServerError(Exception):
+    code = 503
+
+
+class TestLLMGateway(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cassette_path = os.path.join(self.temp_dir, "llm", "cassette.jsonl")
+        self.live = MagicMock(side_effect=lambda request: LLMResponse(f"answer to {request.prompt}", 10, 4))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_request_key_covers_model_system_prompt_and_temperature(self):
+        request = LLMRequest("prompt", "model-a", temperature=0.2)
+        self.assertEqual(request.key, LLMRequest("prompt", "model-a", temperature=0.2).key)
+        for other in (LLMRequest("prompt", "model-b", temperature=0.2),
+                      LLMRequest("prompt", "model-a", system_prompt="be brief", temperature=0.2),
+                      LLMRequest("prompt", "model-a", temperature=0.7),
+                      LLMRequest("prompt!", "model-a", temperature=0.2)):
+            self.assertNotEqual(request.key, other.key)
+
+    def test_cache_answers_repeated_requests(self):
+        gateway = LLMGateway(cache_size=1)
+        request = LLMRequest("one", "model")
+        self.assertEqual(gateway.complete(request, "svc", live=self.live), "answer to one")
+        self.assertEqual(gateway.complete(request, "svc", live=self.live), "answer to one")
+        gateway.complete(LLMRequest("two", "model"), "svc", live=self.live)
+        gateway.complete(request, "svc", live=self.live)
+        self.assertEqual(self.live.call_count, 3)
+        stats = gateway.stats("svc")
+        self.assertEqual((stats["calls"], stats["backend_calls"], stats["cache_hits"]), (4, 3, 1))
+        self.assertEqual((stats["input_tokens"], stats["output_tokens"]), (30, 12))
+
+    def test_live_mode_does_not_cache_by_default(self):
+        gateway = LLMGateway()
+        request = LLMRequest("one", "model")
+        gateway.complete(request, "svc", live=self.live)
+        gateway.complete(request, "svc", live=self.live)
+        self.assertEqual(self.live.call_count, 2)
+
+    def test_record_then_replay(self):
+        recorder = LLMGateway(mode="record", cassette_path=self.cassette_path)
+        recorder.complete(LLMRequest("one", "model", temperature=0.2), "svc", live=self.live)
+        recorder.complete(LLMRequest("one", "model", temperature=0.2), "svc", live=self.live)
+        self.assertEqual(self.live.call_count, 1)
+        with open(self.cassette_path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([(entry["prompt"], entry["response"]) for entry in entries], [("one", "answer to one")])
+
+        player = LLMGateway(mode="replay", cassette_path=self.cassette_path)
+        self.assertFalse(player.uses_backend)
+        self.assertEqual(player.complete(LLMRequest("one", "model", temperature=0.2), "svc", live=self.live),
+                         "answer to one")
+        with self.assertRaises(LLMReplayMissError):
+            player.complete(LLMRequest("one", "model", temperature=0.3), "svc", live=self.live)
+        self.assertEqual(self.live.call_count, 1)
+        self.assertEqual(player.stats("svc")["replayed"], 1)
+        self.assertEqual(player.stats("svc")["errors"], 1)
+
+    def test_replay_needs_a_cassette(self):
+        with self.assertRaises(ValueError):
+            LLMGateway(mode="replay")
+        with self.assertRaises(ValueError):
+            LLMGateway(mode="sometimes")
+
+    def test_offline_rules(self):
+        rules_path = os.path.join(self.temp_dir, "rules.json")
+        with open(rules_path, "w", encoding="utf-8") as f:
+            json.dump({"default": "NOT_RELEVANT", "rules": [
+                {"pattern": "relevant", "response": "RELEVANT: 1,2,0.9", "service": "copilot"},
+                {"pattern": "summar", "response": "A summary."},
+            ]}, f)
+        gateway = LLMGateway(mode="offline", offline_backend=RuleBasedBackend.from_file(rules_path))
+        self.assertEqual(gateway.complete(LLMRequest("is it relevant?", "m"), "copilot", live=self.live),
+                         "RELEVANT: 1,2,0.9")
+        self.assertEqual(gateway.complete(LLMRequest("is it relevant?", "m"), "cursor", live=self.live),
+                         "NOT_RELEVANT")
+        self.assertEqual(gateway.complete(LLMRequest("summarize this", "m"), "cursor", live=self.live), "A summary.")
+        self.live.assert_not_called()
+
+        gateway.configure(offline_backend=RuleBasedBackend([("echo", lambda request: request.prompt.upper())]))
+        self.assertEqual(gateway.complete(LLMRequest("echo me", "m"), "svc"), "ECHO ME")
+
+    def test_retries_transient_errors_only(self):
+        gateway = LLMGateway(max_retries=2, retry_base_delay=0.001)
+        flaky = MagicMock(side_effect=[_ServerError("unavailable"), ConnectionError("reset"), "finally"])
+        self.assertEqual(gateway.complete(LLMRequest("one", "model"), "svc", live=flaky), "finally")
+        self.assertEqual(gateway.stats("svc")["retries"], 2)
+
+        failing = MagicMock(side_effect=_ServerError("unavailable"))
+        with self.assertRaises(_ServerError):
+            gateway.complete(LLMRequest("one", "model"), "svc", live=failing)
+        self.assertEqual(failing.call_count, 3)
+
+        for error in (ValueError("bad request"), LLMResponseError("no text")):
+            broken = MagicMock(side_effect=error)
+            with self.assertRaises(type(error)):
+                gateway.complete(LLMRequest("one", "model"), "svc", live=broken)
+            self.assertEqual(broken.call_count, 1)
+
+    def test_timeouts_are_not_retried_when_the_caller_set_one(self):
+        gateway = LLMGateway(max_retries=2, retry_base_delay=0.001)
+        slow = MagicMock(side_effect=[TimeoutError("timed out"), "on time"])
+        self.assertEqual(gateway.complete(LLMRequest("one", "model"), "svc", live=slow), "on time")
+
+        for error in (TimeoutError("timed out"), type("_GatewayTimeout", (Exception,), {"code": 504})()):
+            slow = MagicMock(side_effect=error)
+            with self.assertRaises(type(error)):
+                gateway.complete(LLMRequest("one", "model"), "svc", live=slow, retry_timeouts=False)
+            self.assertEqual(slow.call_count, 1)
+
+    def test_response_format_and_extras_are_part_of_the_key(self):
+        request = LLMRequest("prompt", "model")
+        self.assertEqual(request.key, LLMRequest("prompt", "model", extras=()).key)
+        self.assertNotEqual(request.key, LLMRequest("prompt", "model", response_mime_type="application/json").key)
+        self.assertNotEqual(request.key, LLMRequest("prompt", "model", extras=("file:a.txt",)).key)
+
+    def test_concurrency_cap(self):
+        gateway = LLMGateway(max_concurrency=2)
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def live(request):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return "done"
+
+        threads = [threading.Thread(target=gateway.complete, args=(LLMRequest(str(i), "m"), "svc", live))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(gateway.stats("svc")["backend_calls"], 8)
+
+    def test_token_bucket_spaces_out_calls(self):
+        bucket = TokenBucket(rate=100, burst=2)
+        with patch("common_utils.llm_gateway.time.sleep") as sleep:
+            waits = [bucket.acquire() for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertTrue(all(wait > 0 for wait in waits[2:]))
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_cost_from_prices(self):
+        gateway = LLMGateway(prices={"model": (1.0, 2.0)})
+        gateway.complete(LLMRequest("one", "model"), "svc", live=self.live)
+        self.assertAlmostEqual(gateway.stats("svc")["cost"], (10 * 1.0 + 4 * 2.0) / 1e6)
+        self.assertEqual(set(gateway.stats()), {"svc"})
+        gateway.reset_stats()
+        self.assertEqual(gateway.stats("svc")["calls"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Unit tests for the sandbox manifest and the incremental sandbox sync using it.
+"""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from .. import sandbox_manifest, session_manager
+from .. import terminal_filesystem_utils as fs_utils
+from ..sandbox_manifest import SandboxManifest
+
+WORKSPACE = "/workspace"
+
+
+def _dehydrate(db, target_dir):
+    fs_utils.dehydrate_db_to_directory(db, target_dir)
+
+
+class TestSandboxManifest(unittest.TestCase):
+    """Test cases for SandboxManifest."""
+
+    def setUp(self):
+        patcher = patch.object(sandbox_manifest, "RACY_WINDOW_NS", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        session_manager.reset_shared_session()
+        self.addCleanup(session_manager.reset_shared_session)
+        self.db = {"workspace_root": WORKSPACE, "cwd": WORKSPACE, "file_system": {
+            WORKSPACE: {"path": WORKSPACE, "is_directory": True, "content_lines": [], "size_bytes": 0},
+        }}
+        self.sandbox = session_manager.initialize_shared_session("test_api", WORKSPACE, self.db, _dehydrate)
+        self.manifest = session_manager.get_sandbox_manifest(self.sandbox)
+
+    def _write(self, rel_path, text):
+        path = os.path.join(self.sandbox, rel_path)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def _update(self, command="ls"):
+        original = dict(self.db["file_system"])
+        fs_utils.update_db_file_system_from_temp(self.db, self.sandbox, original, WORKSPACE, command=command)
+
+    def test_signature_change_invalidates_cached_content(self):
+        path = self._write("a.txt", "one\n")
+        manifest = SandboxManifest(self.sandbox)
+        manifest.record("a", os.stat(path), ["one\n"])
+        self.assertEqual(manifest.cached_content_lines("a", os.stat(path)), ["one\n"])
+
+        self._write("a.txt", "two\n")
+
+        self.assertIsNone(manifest.cached_content_lines("a", os.stat(path)))
+
+    def test_recent_signature_is_not_trusted(self):
+        path = self._write("a.txt", "one\n")
+        manifest = SandboxManifest(self.sandbox)
+        with patch.object(sandbox_manifest, "RACY_WINDOW_NS", 10 ** 18):
+            manifest.record("a", os.stat(path), ["one\n"])
+
+        self.assertIsNone(manifest.cached_content_lines("a", os.stat(path)))
+        self.assertTrue(manifest.is_synced("a", ["one\n"]))
+        self.assertTrue(manifest.is_synced("a", ["o", "ne\n"]))
+        self.assertFalse(manifest.is_synced("a", ["two\n"]))
+        self.assertIsNone(manifest.is_synced("b", ["one\n"]))
+
+    def test_manifest_belongs_to_the_shared_session(self):
+        self.assertIs(session_manager.get_sandbox_manifest(self.sandbox + "/"), self.manifest)
+        self.assertIsNone(session_manager.get_sandbox_manifest("/somewhere/else"))
+
+        session_manager.reset_shared_session()
+
+        self.assertIsNone(session_manager.get_sandbox_manifest(self.sandbox))
+
+    def test_unchanged_files_are_not_read_again(self):
+        self._write("a.txt", "alpha\n")
+        self._write("b.txt", "beta\n")
+        self._update()
+
+        self._write("b.txt", "beta, changed\n")
+        with patch.object(fs_utils, "is_likely_binary_file", wraps=fs_utils.is_likely_binary_file) as sniff:
+            self._update()
+
+        self.assertEqual([call.args[0] for call in sniff.call_args_list], [os.path.join(self.sandbox, "b.txt")])
+        file_system = self.db["file_system"]
+        self.assertEqual(file_system[WORKSPACE + "/a.txt"]["content_lines"], ["alpha\n"])
+        self.assertEqual(file_system[WORKSPACE + "/b.txt"]["content_lines"], ["beta, changed\n"])
+
+    def test_deleted_files_leave_the_manifest(self):
+        path = self._write("a.txt", "alpha\n")
+        self._update()
+        self.assertEqual(len(self.manifest), 1)
+
+        os.remove(path)
+        self._update(command="rm a.txt")
+
+        self.assertEqual(len(self.manifest), 0)
+        self.assertNotIn(WORKSPACE + "/a.txt", self.db["file_system"])
+
+    def test_db_edits_are_pushed_to_sandbox(self):
+        path = self._write("a.txt", "alpha\n")
+        self._write("b.txt", "beta\n")
+        self._update()
+        self.db["file_system"][WORKSPACE + "/a.txt"]["content_lines"] = ["edited\n"]
+        self.db["file_system"][WORKSPACE + "/c.txt"] = {
+            "path": WORKSPACE + "/c.txt", "is_directory": False, "content_lines": ["new\n"], "size_bytes": 4,
+        }
+
+        with patch.object(fs_utils, "_write_entry_to_disk", wraps=fs_utils._write_entry_to_disk) as write:
+            fs_utils.sync_db_to_sandbox(self.db["file_system"], self.sandbox, WORKSPACE)
+
+        self.assertEqual(write.call_count, 1)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "edited\n")
+        with open(os.path.join(self.sandbox, "c.txt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "new\n")
+
+    def test_only_entries_changed_in_db_are_compared(self):
+        path = self._write("a.txt", "alpha\n")
+        self._write("b.txt", "beta\n")
+        self._update()
+        self.db["file_system"][WORKSPACE + "/a.txt"]["content_lines"][0] = "edited\n"
+
+        with patch.object(self.manifest, "is_synced", wraps=self.manifest.is_synced) as is_synced:
+            fs_utils.sync_db_to_sandbox(self.db["file_system"], self.sandbox, WORKSPACE)
+            self.assertEqual([call.args[0] for call in is_synced.call_args_list], [WORKSPACE + "/a.txt"])
+            fs_utils.sync_db_to_sandbox(self.db["file_system"], self.sandbox, WORKSPACE)
+            self.assertEqual(is_synced.call_count, 1)
+
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "edited\n")
+
+    def _run(self, command="ls", action=lambda: None):
+        file_system = self.db["file_system"]
+        fs_utils.sync_db_to_sandbox(file_system, self.sandbox, WORKSPACE)
+        pre = fs_utils.collect_pre_command_metadata_state(file_system, self.sandbox, WORKSPACE)
+        action()
+        post = fs_utils.collect_post_command_metadata_state(file_system, self.sandbox, WORKSPACE)
+        self._update(command)
+        return pre, post
+
+    def test_command_metadata_pass_stats_each_path_once(self):
+        os.makedirs(os.path.join(self.sandbox, "src"))
+        self._write("src/a.txt", "alpha\n")
+        self._write("b.txt", "beta\n")
+        self._update()
+        self._run()
+
+        with patch.object(fs_utils, "_collect_file_metadata", wraps=fs_utils._collect_file_metadata) as collect:
+            pre, post = self._run(action=lambda: self._write("b.txt", "beta, changed\n"))
+
+        # Once per path by the pass after the command, and again for the changed file once it was read
+        self.assertEqual(sorted(call.args[0] for call in collect.call_args_list),
+                         sorted([self.sandbox, os.path.join(self.sandbox, "src"),
+                                 os.path.join(self.sandbox, "src/a.txt")] + [os.path.join(self.sandbox, "b.txt")] * 2))
+        self.assertEqual(pre[WORKSPACE + "/src/a.txt"], post[WORKSPACE + "/src/a.txt"])
+        self.assertEqual(self.db["file_system"][WORKSPACE + "/b.txt"]["content_lines"], ["beta, changed\n"])
+
+        self.db["file_system"][WORKSPACE + "/src/a.txt"]["content_lines"] = ["edited\n"]
+        with patch.object(fs_utils, "_collect_file_metadata", wraps=fs_utils._collect_file_metadata) as collect:
+            fs_utils.sync_db_to_sandbox(self.db["file_system"], self.sandbox, WORKSPACE)
+            pre = fs_utils.collect_pre_command_metadata_state(self.db["file_system"], self.sandbox, WORKSPACE)
+
+        self.assertEqual(sorted(call.args[0] for call in collect.call_args_list),
+                         [self.sandbox, os.path.join(self.sandbox, "src"), os.path.join(self.sandbox, "src/a.txt")])
+        self.assertEqual(pre[WORKSPACE + "/src/a.txt"], {"metadata": fs_utils._collect_file_metadata(
+            os.path.join(self.sandbox, "src/a.txt"))})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -621,5 +621,104 @@ class TestSearchEngineAdapter(BaseTestCaseWithErrorHandler):
                 del sys.modules['common_utils.search_engine.strategies']
 
 
+
+class TrackedRecordsAdapter(Adapter):
+    """Adapter over a change-tracked DB with per-record chunking."""
+
+    tracked_collections = (("users", "*", "notes"),)
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.chunked_records = []
+
+    def get_tracked_db(self):
+        return self.db
+
+    def db_to_searchable_documents(self) -> List[SearchableDocument]:
+        return self.records_to_searchable_documents()
+
+    def record_to_searchable_documents(self, record_path, record) -> List[SearchableDocument]:
+        self.chunked_records.append(record_path)
+        return [
+            SearchableDocument(
+                parent_doc_id=record_path[-1],
+                text_content=record["text"],
+                original_json_obj=record,
+                metadata={"content_type": "text"},
+            )
+        ]
+
+
+class TestIncrementalSync(BaseTestCaseWithErrorHandler):
+    """Tests for incremental syncs over change-tracked DBs."""
+
+    def setUp(self):
+        super().setUp()
+        from common_utils.tracked_db import track_changes
+        self.db = track_changes({
+            "users": {
+                "alice": {"notes": {"n1": {"text": "one"}, "n2": {"text": "two"}}, "profile": {}},
+                "bob": {"notes": {"n3": {"text": "three"}}},
+            }
+        })
+        self.adapter = TrackedRecordsAdapter(self.db)
+        self.strategy = MockSearchStrategy("test_strategy")
+        self.adapter.init_from_db(self.strategy)
+        self.adapter.chunked_records.clear()
+
+    def _texts(self):
+        return sorted(doc.text_content for doc in self.strategy.documents)
+
+    def test_unchanged_db_does_no_work(self):
+        changes = self.adapter.get_data_changes("test_strategy")
+        self.assertEqual(changes, {"added": [], "updated": [], "deleted": []})
+        self.assertEqual(self.adapter.chunked_records, [])
+
+    def test_only_changed_record_is_rechunked(self):
+        self.db["users"]["alice"]["notes"]["n1"]["text"] = "uno"
+        self.adapter.sync_from_db(self.strategy)
+        self.assertEqual(self.adapter.chunked_records, [("users", "alice", "notes", "n1")])
+        self.assertEqual(self._texts(), ["three", "two", "uno"])
+
+    def test_unrelated_change_does_no_chunking(self):
+        self.db["users"]["alice"]["profile"]["name"] = "Alice"
+        self.adapter.sync_from_db(self.strategy)
+        self.assertEqual(self.adapter.chunked_records, [])
+
+    def test_added_and_deleted_records(self):
+        self.db["users"]["bob"]["notes"]["n4"] = {"text": "four"}
+        del self.db["users"]["alice"]["notes"]["n2"]
+        changes = self.adapter.get_data_changes("test_strategy")
+        self.assertEqual([doc.text_content for doc in changes["added"]], ["four"])
+        self.assertEqual([doc.text_content for doc in changes["deleted"]], ["two"])
+        self.assertEqual(self.adapter.chunked_records, [("users", "bob", "notes", "n4")])
+
+    def test_replaced_collection_rescans_its_records(self):
+        self.db["users"]["bob"] = {"notes": {"n5": {"text": "five"}}}
+        self.adapter.sync_from_db(self.strategy)
+        self.assertEqual(self._texts(), ["five", "one", "two"])
+        self.assertNotIn(("users", "alice", "notes", "n1"), self.adapter.chunked_records)
+
+    def test_reload_in_place_matches_full_rebuild(self):
+        self.db.clear()
+        self.db.update({"users": {"carol": {"notes": {"n6": {"text": "six"}}}}})
+        self.adapter.sync_from_db(self.strategy)
+        self.assertEqual(self._texts(), ["six"])
+
+    def test_untracked_db_falls_back_to_full_diff(self):
+        self.adapter.db = {"users": {"dave": {"notes": {"n7": {"text": "seven"}}}}}
+        self.adapter.sync_from_db(self.strategy)
+        self.assertEqual(self._texts(), ["seven"])
+
+    def test_chunks_shared_between_records_are_kept(self):
+        self.db["users"]["bob"]["notes"]["n1"] = {"text": "one"}
+        self.adapter.sync_from_db(self.strategy)
+        self.assertEqual(self._texts(), ["one", "three", "two"])
+        del self.db["users"]["bob"]["notes"]["n1"]
+        self.adapter.sync_from_db(self.strategy)
+        self.assertEqual(self._texts(), ["one", "three", "two"])
+
+
 if __name__ == '__main__':
     unittest.main()
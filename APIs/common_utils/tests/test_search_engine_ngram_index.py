@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+
+# Add the APIs directory to the path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from common_utils.search_engine.models import SearchableDocument
+from common_utils.search_engine.ngram_index import NgramIndex
+
+
+def _doc(chunk_id, text, **metadata):
+    return SearchableDocument(chunk_id=chunk_id, parent_doc_id=chunk_id, text_content=text, metadata=metadata)
+
+
+class TestNgramIndex(unittest.TestCase):
+    """Test cases for NgramIndex."""
+
+    def setUp(self):
+        self.index = NgramIndex()
+        self.index.upsert(_doc("1", "Hello World", user_id="me", resource_type="message"))
+        self.index.upsert(_doc("2", "hello there", user_id="you", resource_type="message"))
+        self.index.upsert(_doc("3", "hi", user_id="me", resource_type="draft"))
+
+    def test_all_ngrams_intersect_postings(self):
+        ngrams = self.index.ngrams(self.index.normalize("HELLO W"))
+        self.assertEqual(self.index.candidate_ids(all_ngrams=ngrams), {"1"})
+
+    def test_any_ngrams_keep_short_documents(self):
+        ngrams = self.index.ngrams("there")
+        self.assertEqual(self.index.candidate_ids(any_ngrams=ngrams), {"2", "3"})
+
+    def test_metadata_postings(self):
+        self.assertEqual(self.index.candidate_ids({"user_id": "me"}), {"1", "3"})
+        self.assertEqual(self.index.candidate_ids({"user_id": "me", "resource_type": "draft"}), {"3"})
+        self.assertEqual(self.index.candidate_ids({"user_id": "nobody"}), set())
+
+    def test_unindexable_filters_are_left_to_the_caller(self):
+        self.assertIsNone(self.index.candidate_ids())
+        self.assertIsNone(self.index.candidate_ids({"labels": ["INBOX"], "missing": None}))
+
+    def test_upsert_reindexes_text_and_metadata(self):
+        self.index.upsert(_doc("1", "goodbye", user_id="you"))
+        self.assertEqual(self.index.candidate_ids(all_ngrams=self.index.ngrams("hello")), {"2"})
+        self.assertEqual(self.index.candidate_ids({"user_id": "you"}), {"1", "2"})
+        self.assertEqual([doc.chunk_id for doc in self.index.iter_documents()], ["1", "2", "3"])
+
+    def test_remove_drops_postings(self):
+        self.index.remove("2")
+        self.assertNotIn("2", self.index)
+        self.assertEqual(self.index.candidate_ids(all_ngrams=self.index.ngrams("hello")), {"1"})
+        self.assertNotIn("you", self.index._metadata_postings["user_id"])
+        self.assertIsNone(self.index.remove("2"))
+
+    def test_iter_documents_keeps_insertion_order(self):
+        self.assertEqual([doc.chunk_id for doc in self.index.iter_documents({"3", "1"})], ["1", "3"])
+
+    def test_case_sensitive(self):
+        index = NgramIndex(case_sensitive=True)
+        index.upsert(_doc("1", "Hello"))
+        self.assertEqual(index.candidate_ids(all_ngrams=index.ngrams("hel")), set())
+        self.assertEqual(index.candidate_ids(all_ngrams=index.ngrams("Hel")), {"1"})
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.candidate_ids({"user_id": "me"}), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
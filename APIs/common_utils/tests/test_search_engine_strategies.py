@@ -196,15 +196,16 @@ class TestWhooshSearchStrategy(BaseTestCaseWithErrorHandler):
         self.assertIsNotNone(self.strategy._ram_storage)
         self.assertEqual(self.strategy._all_metadata_fields, {"field1", "field2", "field3"})
     
-    def test_maybe_rebuild_schema_with_new_fields(self):
-        """Test _maybe_rebuild_schema with new fields (lines 136-157)."""
+    def test_new_metadata_fields_do_not_rebuild_index(self):
+        """New metadata keys are indexed into dynamic fields without recreating the index."""
         doc1 = SearchableDocument(
             chunk_id="1",
             parent_doc_id="parent1",
             text_content="test content",
             metadata={"field1": "value1"}
         )
-        self.strategy._create_dynamic_schema([doc1])
+        self.strategy.upsert_document(doc1)
+        ix = self.strategy.ix
         
         doc2 = SearchableDocument(
             chunk_id="2",
@@ -213,31 +214,72 @@ class TestWhooshSearchStrategy(BaseTestCaseWithErrorHandler):
             metadata={"field1": "value2", "field2": "new_field"}
         )
         
-        result = self.strategy._maybe_rebuild_schema(doc2)
+        with patch.object(self.strategy, '_create_dynamic_schema') as mock_create:
+            self.strategy.upsert_document(doc2)
+            mock_create.assert_not_called()
         
-        self.assertTrue(result)
+        self.assertIs(self.strategy.ix, ix)
         self.assertIn("field2", self.strategy._all_metadata_fields)
+        results = self.strategy._search_internal("test", {"field2": "new_field"}, 10, raw=True)
+        self.assertEqual(results, [doc2])
     
-    def test_maybe_rebuild_schema_without_new_fields(self):
-        """Test _maybe_rebuild_schema without new fields (lines 136-157)."""
-        doc1 = SearchableDocument(
-            chunk_id="1",
-            parent_doc_id="parent1",
-            text_content="test content",
-            metadata={"field1": "value1", "field2": "value2"}
-        )
-        self.strategy._create_dynamic_schema([doc1])
+    def test_upsert_documents_uses_single_commit(self):
+        """A batch of upserts and a batch of deletes each use one writer."""
+        docs = [
+            SearchableDocument(chunk_id=str(i), parent_doc_id=f"parent{i}", text_content=f"test {i}")
+            for i in range(5)
+        ]
+        self.strategy._create_dynamic_schema(docs)
         
-        doc2 = SearchableDocument(
-            chunk_id="2",
-            parent_doc_id="parent2",
-            text_content="test content 2",
-            metadata={"field1": "value3"}
-        )
+        with patch.object(self.strategy.ix, 'writer', wraps=self.strategy.ix.writer) as mock_writer:
+            self.strategy.upsert_documents(docs)
+            self.strategy.delete_documents(docs[:3])
         
-        result = self.strategy._maybe_rebuild_schema(doc2)
+        self.assertEqual(mock_writer.call_count, 2)
+        self.assertEqual(set(self.strategy.doc_store), {"3", "4"})
+        self.assertEqual(len(self.strategy._search_internal("test", None, 10, raw=True)), 2)
+    
+    def test_failed_batch_releases_writer(self):
+        """A failing batch is cancelled so the next writer can acquire the lock."""
+        doc = SearchableDocument(chunk_id="1", parent_doc_id="parent1", text_content="test content")
+        self.strategy.upsert_document(doc)
+        
+        with patch.object(self.strategy, '_fields_to_index', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.strategy.upsert_document(
+                    SearchableDocument(chunk_id="2", parent_doc_id="parent2", text_content="other")
+                )
         
-        self.assertFalse(result)
+        self.strategy.delete_document("1")
+        self.assertEqual(self.strategy.doc_store, {})
+    
+    def test_persistent_index_is_reused_when_documents_match(self):
+        """An on-disk index is reopened instead of rebuilt for the same documents."""
+        import tempfile
+        docs = [
+            SearchableDocument(chunk_id="1", parent_doc_id="parent1", text_content="alpha", metadata={"user_id": "me"}),
+            SearchableDocument(chunk_id="2", parent_doc_id="parent2", text_content="beta", metadata={"user_id": "you"}),
+        ]
+        with tempfile.TemporaryDirectory() as index_dir:
+            config = WhooshConfig(index_dir=index_dir)
+            first = WhooshSearchStrategy(config, self.adapter)
+            first.upsert_documents(docs)
+            first.delete_document("2")
+            first.upsert_document(docs[1])
+            
+            second = WhooshSearchStrategy(config, self.adapter)
+            with patch.object(second, '_create_dynamic_schema') as mock_create:
+                second.upsert_documents(docs)
+                mock_create.assert_not_called()
+            self.assertEqual(second.rawSearch("beta", {"user_id": "you"}), [docs[1]])
+            
+            changed = docs[:1] + [
+                SearchableDocument(chunk_id="2", parent_doc_id="parent2", text_content="gamma", metadata={"user_id": "you"})
+            ]
+            third = WhooshSearchStrategy(config, self.adapter)
+            third.upsert_documents(changed)
+            self.assertEqual(third.rawSearch("beta"), [])
+            self.assertEqual(third.rawSearch("gamma"), [changed[1]])
     
     def test_upsert_document_new_document(self):
         """Test upsert_document with new document (lines 160-164, 167-195)."""
@@ -804,5 +846,93 @@ class TestRapidFuzzSearchStrategy(BaseTestCaseWithErrorHandler):
         self.assertEqual(results[0], doc)
 
 
+    def test_prefilter_skips_documents_without_shared_ngrams(self):
+        """Above ngram_prefilter_min_candidates only documents sharing an n-gram are scored."""
+        self.strategy.config.ngram_prefilter_min_candidates = 1
+        docs = [
+            SearchableDocument(chunk_id="1", parent_doc_id="parent1", text_content="weekly newsletter"),
+            SearchableDocument(chunk_id="2", parent_doc_id="parent2", text_content="zzzz qqqq"),
+        ]
+        self.strategy.upsert_documents(docs)
+
+        with patch("common_utils.search_engine.strategies.process.extract", return_value=[]) as mock_extract:
+            self.strategy._search_internal("weekly news", None, 10)
+
+        self.assertEqual(list(mock_extract.call_args[0][1]), ["1"])
+
+    def test_prefilter_disabled_for_small_candidate_sets(self):
+        """Small candidate sets are scored in full so results stay exact."""
+        docs = [
+            SearchableDocument(chunk_id="1", parent_doc_id="parent1", text_content="weekly newsletter"),
+            SearchableDocument(chunk_id="2", parent_doc_id="parent2", text_content="zzzz qqqq"),
+        ]
+        self.strategy.upsert_documents(docs)
+
+        with patch("common_utils.search_engine.strategies.process.extract", return_value=[]) as mock_extract:
+            self.strategy._search_internal("weekly news", None, 10)
+
+        self.assertEqual(list(mock_extract.call_args[0][1]), ["1", "2"])
+
+
+class TestSubstringSearchStrategy(BaseTestCaseWithErrorHandler):
+    """Test cases for SubstringSearchStrategy class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        super().setUp()
+        self.config = SubstringConfig()
+        self.adapter = MockAdapter()
+        self.strategy = SubstringSearchStrategy(self.config, self.adapter)
+        self.docs = [
+            SearchableDocument(chunk_id="1", parent_doc_id="p1", text_content="Quarterly Report",
+                               metadata={"user_id": "me", "content_type": "subject"}, original_json_obj={"id": 1}),
+            SearchableDocument(chunk_id="2", parent_doc_id="p2", text_content="quarterly budget",
+                               metadata={"user_id": "you", "content_type": "subject"}, original_json_obj={"id": 2}),
+            SearchableDocument(chunk_id="3", parent_doc_id="p3", text_content="lunch",
+                               metadata={"user_id": "me", "content_type": "body"}, original_json_obj={"id": 3}),
+        ]
+        self.strategy.upsert_documents(self.docs)
+
+    def test_search_is_case_insensitive_by_default(self):
+        """Matches are found regardless of case, in insertion order."""
+        self.assertEqual(self.strategy.search("QUARTERLY"), [{"id": 1}, {"id": 2}])
+
+    def test_search_with_filter(self):
+        """Metadata filters narrow the results."""
+        self.assertEqual(self.strategy.search("quarterly", {"user_id": "me"}), [{"id": 1}])
+        self.assertEqual(self.strategy.search("quarterly", {"content_type": "body"}), [])
+
+    def test_short_and_empty_queries(self):
+        """Queries shorter than an n-gram are still matched."""
+        self.assertEqual(self.strategy.search("un"), [{"id": 3}])
+        self.assertEqual(len(self.strategy.search("")), 3)
+
+    def test_upsert_replaces_text(self):
+        """Replacing a document updates the index and keeps its position."""
+        self.strategy.upsert_document(SearchableDocument(
+            chunk_id="1", parent_doc_id="p1", text_content="annual review", original_json_obj={"id": 1}
+        ))
+        self.assertEqual(self.strategy.search("quarterly"), [{"id": 2}])
+        self.assertEqual(self.strategy.search("annual"), [{"id": 1}])
+        self.assertEqual([doc.chunk_id for doc in self.strategy.indexed_docs], ["1", "2", "3"])
+
+    def test_delete_documents(self):
+        """Deleted documents are no longer returned."""
+        self.strategy.delete_documents(self.docs[:1])
+        self.strategy.delete_document("3")
+        self.assertEqual(self.strategy.search("quarterly"), [{"id": 2}])
+        self.assertEqual(list(self.strategy.doc_store), ["2"])
+
+    def test_case_sensitive(self):
+        """case_sensitive configs only match the exact case."""
+        strategy = SubstringSearchStrategy(SubstringConfig(case_sensitive=True), self.adapter)
+        strategy.upsert_documents(self.docs)
+        self.assertEqual(strategy.search("Quarterly"), [{"id": 1}])
+
+    def test_raw_search_limit(self):
+        """rawSearch returns at most `limit` documents."""
+        self.assertEqual(self.strategy.rawSearch("quarterly", limit=1), [self.docs[0]])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for synced_index and page_tokens modules.
+"""
+
+import os
+import sys
+
+# Add the parent directory to the path so we can import common_utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from common_utils.page_tokens import decode_page_token, encode_page_token, query_fingerprint
+from common_utils.synced_index import CollectionIndexes
+from common_utils.tracked_db import track_changes
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+
+
+class _CountingIndex:
+    """Records the keys it was built from and the keys refreshed since."""
+
+    built = 0
+
+    def __init__(self, records):
+        _CountingIndex.built += 1
+        self.records = records
+        self.keys = set(records)
+        self.refreshed = []
+
+    def refresh(self, key):
+        self.refreshed.append(key)
+        if key in self.records:
+            self.keys.add(key)
+        else:
+            self.keys.discard(key)
+
+
+class _Indexes(CollectionIndexes):
+    index_type = _CountingIndex
+
+
+class TestCollectionIndexes(BaseTestCaseWithErrorHandler):
+    def setUp(self):
+        _CountingIndex.built = 0
+        self.db = track_changes({"orders": {"o1": {"total": 1}}, "users": {"u1": {}}})
+        self.indexes = _Indexes()
+
+    def test_untracked_db_is_not_indexed(self):
+        self.assertIsNone(self.indexes.get({"orders": {}}, "orders"))
+        self.assertIsNone(self.indexes.get(self.db, "missing"))
+
+    def test_changed_records_are_refreshed(self):
+        index = self.indexes.get(self.db, "orders")
+        self.db["orders"]["o2"] = {"total": 2}
+        self.db["orders"]["o1"]["total"] = 3
+        self.db["users"]["u2"] = {}
+        del self.db["orders"]["o2"]
+        self.assertIs(self.indexes.get(self.db, "orders"), index)
+        self.assertEqual(index.refreshed, ["o2", "o1"])
+        self.assertEqual(index.keys, {"o1"})
+        self.assertEqual(_CountingIndex.built, 1)
+
+    def test_replaced_collection_or_db_drops_the_index(self):
+        index = self.indexes.get(self.db, "orders")
+        self.db["orders"] = {"o3": {}}
+        rebuilt = self.indexes.get(self.db, "orders")
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(rebuilt.keys, {"o3"})
+        other = track_changes({"orders": {}})
+        self.assertEqual(self.indexes.get(other, "orders").keys, set())
+        self.assertEqual(_CountingIndex.built, 3)
+
+
+class TestPageTokens(BaseTestCaseWithErrorHandler):
+    def test_round_trip(self):
+        fingerprint = query_fingerprint("messages", "me", None)
+        token = encode_page_token((-5, 2, "m1"), fingerprint)
+        self.assertEqual(decode_page_token(token, fingerprint), (-5, 2, "m1"))
+        self.assertIsNone(decode_page_token(None, fingerprint))
+
+    def test_rejects_malformed_and_foreign_tokens(self):
+        token = encode_page_token((1,), query_fingerprint("a"))
+        with self.assertRaisesRegex(ValueError, "does not match"):
+            decode_page_token(token, query_fingerprint("b"))
+        with self.assertRaisesRegex(ValueError, "Invalid page_token"):
+            decode_page_token("not a token!", query_fingerprint("a"))
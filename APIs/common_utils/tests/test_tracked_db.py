@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Tests for tracked_db module.
+"""
+
+import copy
+import json
+import pickle
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import common_utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from common_utils.tracked_db import (
+    ChangeTracker,
+    TrackedDict,
+    TrackedList,
+    track_changes,
+    get_change_tracker,
+    find_change_tracker
+)
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+
+
+def _sample_db():
+    return {
+        "users": {
+            "me": {
+                "messages": {"m1": {"id": "m1", "labelIds": ["INBOX"]}},
+                "settings": {"language": "en"},
+            }
+        },
+        "counters": {"message": 1},
+    }
+
+
+class TestTrackedContainers(BaseTestCaseWithErrorHandler):
+    """Tests for TrackedDict/TrackedList behaviour."""
+
+    def setUp(self):
+        self.db = track_changes(_sample_db())
+        self.tracker = get_change_tracker(self.db)
+
+    def test_nested_values_are_tracked(self):
+        message = self.db["users"]["me"]["messages"]["m1"]
+        self.assertIsInstance(message, TrackedDict)
+        self.assertIsInstance(message["labelIds"], TrackedList)
+        self.assertEqual(self.db, _sample_db())
+
+    def test_nested_mutation_reports_truncated_path(self):
+        version = self.tracker.version
+        self.db["users"]["me"]["messages"]["m1"]["labelIds"].append("STARRED")
+        self.assertEqual(self.tracker.changes_since(version), [("users", "me", "messages", "m1")])
+        self.assertEqual(self.tracker.collection_version("users"), self.tracker.version)
+        self.assertLess(self.tracker.collection_version("counters"), self.tracker.version)
+
+    def test_list_append_reports_new_index(self):
+        db = track_changes({"projects": [{"tables": []}]}, path_depth=6)
+        tracker = get_change_tracker(db)
+        version = tracker.version
+        db["projects"].append({"tables": []})
+        db["projects"][0]["tables"].append({"rows": []})
+        self.assertEqual(tracker.changes_since(version), [("projects", 0, "tables", 0), ("projects", 1)])
+
+    def test_repeated_changes_are_deduplicated(self):
+        version = self.tracker.version
+        for i in range(3):
+            self.db["counters"]["message"] = i
+        self.assertEqual(self.tracker.changes_since(version), [("counters", "message")])
+
+    def test_unchanged_db_reports_nothing(self):
+        self.assertEqual(self.tracker.changes_since(self.tracker.version), [])
+
+    def test_inserted_plain_values_are_tracked(self):
+        new_message = {"id": "m2", "labelIds": []}
+        self.db["users"]["me"]["messages"]["m2"] = new_message
+        version = self.tracker.version
+        self.db["users"]["me"]["messages"]["m2"]["labelIds"].append("INBOX")
+        self.assertEqual(self.tracker.changes_since(version), [("users", "me", "messages", "m2")])
+
+    def test_inserted_plain_values_are_copied(self):
+        new_message = {"id": "m2", "labelIds": []}
+        self.db["users"]["me"]["messages"]["m2"] = new_message
+        self.assertIsNot(self.db["users"]["me"]["messages"]["m2"], new_message)
+        version = self.tracker.version
+        new_message["labelIds"].append("INBOX")
+        self.assertEqual(self.db["users"]["me"]["messages"]["m2"]["labelIds"], [])
+        self.assertEqual(self.tracker.changes_since(version), [])
+
+    def test_shifted_list_items_report_current_index(self):
+        db = track_changes({"tracks": [{"id": i} for i in range(5)]}, path_depth=2)
+        tracker = get_change_tracker(db)
+        tracks = db["tracks"]
+        track = tracks[3]
+        for shift, index in ((lambda: tracks.insert(0, {"id": "new"}), 4),
+                             (lambda: tracks.remove(tracks[0]), 3),
+                             (lambda: tracks.pop(-5), 2),
+                             (lambda: tracks.reverse(), 1),
+                             (lambda: tracks.sort(key=lambda t: t["id"]), 2),
+                             (lambda: tracks.__delitem__(slice(0, 1)), 1),
+                             (lambda: tracks.__setitem__(slice(0, 0), [{"id": -1}]), 2)):
+            shift()
+            version = tracker.version
+            track["is_liked"] = True
+            self.assertIs(tracks[index], track)
+            self.assertEqual(tracker.changes_since(version), [("tracks", index)])
+
+    def test_removed_plain_values_do_not_report(self):
+        new_message = {"id": "m2"}
+        self.db["users"]["me"]["messages"]["m2"] = new_message
+        del self.db["users"]["me"]["messages"]["m2"]
+        version = self.tracker.version
+        new_message["id"] = "m3"
+        self.assertEqual(self.tracker.changes_since(version), [])
+
+    def test_root_update_copies_the_state(self):
+        state = _sample_db()
+        self.db.update(state)
+        self.assertIsNot(self.db["users"], state["users"])
+        self.assertIsInstance(self.db["users"]["me"], TrackedDict)
+
+    def test_detached_values_do_not_report(self):
+        message = self.db["users"]["me"]["messages"].pop("m1")
+        version = self.tracker.version
+        message["labelIds"].append("TRASH")
+        self.assertEqual(self.tracker.changes_since(version), [])
+
+    def test_moved_values_report_new_location(self):
+        messages = self.db["users"]["me"]["messages"]
+        messages["m9"] = messages.pop("m1")
+        version = self.tracker.version
+        messages["m9"]["labelIds"].clear()
+        self.assertEqual(self.tracker.changes_since(version), [("users", "me", "messages", "m9")])
+
+    def test_list_items_report_current_index(self):
+        db = track_changes({"tracks": [{"id": "a"}, {"id": "b"}]}, path_depth=2)
+        tracker = get_change_tracker(db)
+        track_b = db["tracks"][1]
+        db["tracks"].pop(0)
+        version = tracker.version
+        track_b["is_liked"] = True
+        self.assertEqual(tracker.changes_since(version), [("tracks", 0)])
+
+    def test_clear_and_update_in_place(self):
+        version = self.tracker.version
+        self.db.clear()
+        self.db.update(_sample_db())
+        self.assertIn((), self.tracker.changes_since(version))
+        self.assertIsInstance(self.db["users"]["me"], TrackedDict)
+
+    def test_copies_are_plain(self):
+        for copied in (self.db.copy(), copy.copy(self.db), copy.deepcopy(self.db),
+                       pickle.loads(pickle.dumps(self.db))):
+            self.assertIs(type(copied), dict)
+            self.assertEqual(copied, _sample_db())
+        self.assertIs(type(copy.deepcopy(self.db)["users"]["me"]["messages"]["m1"]["labelIds"]), list)
+
+    def test_json_round_trip(self):
+        self.assertEqual(json.loads(json.dumps(self.db)), _sample_db())
+
+    def test_patch_dict_restores_tracking(self):
+        with patch.dict(self.db, {"users": {}}):
+            self.assertEqual(self.db["users"], {})
+        version = self.tracker.version
+        self.db["users"]["me"]["settings"]["language"] = "fr"
+        self.assertEqual(self.tracker.changes_since(version), [("users", "me", "settings", "language")])
+
+    def test_values_from_other_db_are_copied(self):
+        other = track_changes({"x": {"y": 1}})
+        self.db["copied"] = other["x"]
+        self.assertIsNot(self.db["copied"], other["x"])
+        version = get_change_tracker(other).version
+        self.db["copied"]["y"] = 2
+        self.assertEqual(other["x"]["y"], 1)
+        self.assertEqual(get_change_tracker(other).version, version)
+
+    def test_get_change_tracker_of_plain_dict(self):
+        self.assertIsNone(get_change_tracker({}))
+
+    def test_find_change_tracker_of_nested_container(self):
+        messages = self.db["users"]["me"]["messages"]
+        self.assertIs(find_change_tracker(messages), self.tracker)
+        self.assertIs(find_change_tracker(self.db), self.tracker)
+        self.assertIsNone(find_change_tracker({}))
+
+        self.db["users"].pop("me")
+        self.assertIsNone(find_change_tracker(messages))
+
+
+class TestChangeTracker(BaseTestCaseWithErrorHandler):
+    """Tests for ChangeTracker bookkeeping."""
+
+    def test_log_truncation_forces_full_resync(self):
+        tracker = ChangeTracker(path_depth=2, max_changes=2)
+        tracker.record(("a", 1))
+        version = tracker.version
+        tracker.record(("a", 2))
+        tracker.record(("a", 3))
+        tracker.record(("a", 4))
+        self.assertIsNone(tracker.changes_since(0))
+        self.assertIsNone(tracker.changes_since(version))
+        self.assertEqual(tracker.changes_since(tracker.version - 1), [("a", 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
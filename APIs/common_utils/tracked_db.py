@@ -0,0 +1,428 @@
+"""
+Change tracking for in-memory service databases.
+
+Service `DB` objects are plain nested dicts and lists that API functions mutate
+in place. `track_changes` turns such a structure into `TrackedDict`/`TrackedList`
+containers that behave exactly like `dict`/`list` but report every mutation to a
+`ChangeTracker` owned by the root. The tracker keeps:
+
+- a global version counter, bumped on every mutation,
+- a version counter per top-level collection (e.g. DB["users"]),
+- the set of changed paths, truncated to `path_depth` keys, in the order they
+  last changed.
+
+Consumers (e.g. search engine adapters) remember the version they last saw and
+ask `changes_since(version)` for the paths that changed afterwards, instead of
+rescanning the whole DB. A tracker may also carry a `before_change` callback,
+called with each container just before it is mutated (db_snapshots uses it to
+keep the pre-image of the containers changed since a snapshot).
+
+Values stored into a tracked container are converted on insertion: plain dicts
+and lists are copied into tracked containers, so after `DB[k] = obj` the stored
+record is `DB[k]`, not `obj` (later changes to `obj` do not reach the DB).
+Tracked containers belonging to the same DB are re-parented in place. Each
+tracked container knows its key in its parent (items of a TrackedList are
+renumbered when they shift), so a change is reported without searching for it.
+Copies (`copy`, `deepcopy`, `dict.copy`, pickling) produce plain dicts and
+lists.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, List, Optional, Tuple
+
+DEFAULT_PATH_DEPTH = 4
+DEFAULT_MAX_CHANGES = 100000
+
+_MISSING = object()
+
+
+class ChangeTracker:
+    """Version counters and changed-path log for one tracked DB."""
+
+    def __init__(self, path_depth: int = DEFAULT_PATH_DEPTH, max_changes: int = DEFAULT_MAX_CHANGES):
+        self.path_depth = path_depth
+        self.max_changes = max_changes
+        self.version = 0
+        self._lock = threading.Lock()
+        self._changes: "OrderedDict[Tuple[Hashable, ...], int]" = OrderedDict()
+        self._collection_versions = {}
+        # Version of the last change that touched every collection (root level)
+        self._root_version = 0
+        # Changes at or below this version have been dropped from the log
+        self._floor_version = 0
+        # Called with a container of the DB right before it is mutated
+        self.before_change: Optional[Callable[[Any], None]] = None
+
+    def record(self, path: Tuple[Hashable, ...]):
+        """Record a mutation at `path` (a tuple of keys from the root)."""
+        path = path[:self.path_depth]
+        with self._lock:
+            self.version += 1
+            version = self.version
+            if path:
+                self._collection_versions[path[0]] = version
+            else:
+                self._root_version = version
+            changes = self._changes
+            if path in changes:
+                changes.move_to_end(path)
+            changes[path] = version
+            if len(changes) > self.max_changes:
+                _, self._floor_version = changes.popitem(last=False)
+
+    def collection_version(self, name: Hashable) -> int:
+        """Version of the last change under the top-level key `name`."""
+        return max(self._collection_versions.get(name, 0), self._root_version)
+
+    def changes_since(self, version: int) -> Optional[List[Tuple[Hashable, ...]]]:
+        """
+        Paths changed after `version`, most recent first.
+
+        Returns None if the log no longer reaches back to `version`, in which
+        case the caller has to treat everything as changed.
+        """
+        with self._lock:
+            if version < self._floor_version:
+                return None
+            changed = []
+            for path in reversed(self._changes):
+                if self._changes[path] <= version:
+                    break
+                changed.append(path)
+            return changed
+
+
+class _TrackedContainer:
+    """Parent bookkeeping shared by TrackedDict and TrackedList."""
+    __slots__ = ()
+
+    def _attach(self, parent, key):
+        self._parent = parent
+        self._key = key
+
+    def _wrap(self, key, value):
+        """Convert `value` for storage under `key` in this container."""
+        if isinstance(value, _TrackedContainer):
+            if _root_of(value) is _root_of(self) or value._parent is None and value._tracker is None:
+                value._attach(self, key)
+                return value
+            value = _plain_copy(value)
+        if isinstance(value, dict):
+            tracked = TrackedDict()
+            tracked._attach(self, key)
+            dict.update(tracked, ((k, tracked._wrap(k, v)) for k, v in value.items()))
+            return tracked
+        if isinstance(value, list):
+            tracked = TrackedList()
+            tracked._attach(self, key)
+            list.extend(tracked, [tracked._wrap(i, v) for i, v in enumerate(value)])
+            return tracked
+        return value
+
+    def _before_change(self):
+        """Hand this container to the `before_change` callback of its DB, if any."""
+        node = self
+        while node._parent is not None:
+            node = node._parent
+        tracker = node._tracker
+        if tracker is not None and tracker.before_change is not None:
+            tracker.before_change(self)
+
+    def _changed(self, key=_MISSING):
+        """Report a change of `key` in this container (or of the container itself)."""
+        nodes = [self]
+        node = self
+        while node._parent is not None:
+            node = node._parent
+            nodes.append(node)
+        tracker = node._tracker
+        if tracker is None:
+            return
+        # nodes[-1] is the root; only the first `path_depth` keys are needed
+        path = []
+        depth = tracker.path_depth
+        for i in range(len(nodes) - 1, 0, -1):
+            if len(path) >= depth:
+                break
+            parent, child = nodes[i], nodes[i - 1]
+            child_key = parent._key_of(child)
+            if child_key is _MISSING:
+                # Detached from the DB; nothing to report
+                return
+            path.append(child_key)
+        if key is not _MISSING and len(path) < depth:
+            path.append(key)
+        tracker.record(tuple(path))
+
+
+def _root_of(node):
+    while node._parent is not None:
+        node = node._parent
+    return node
+
+
+def _plain_copy(value):
+    return copy.deepcopy(value)
+
+
+class TrackedDict(_TrackedContainer, dict):
+    """A dict that reports mutations to the ChangeTracker of its DB."""
+    __slots__ = ("_parent", "_key", "_tracker")
+
+    def __init__(self, *args, **kwargs):
+        self._parent = None
+        self._key = None
+        self._tracker = None
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    def _key_of(self, child):
+        key = child._key
+        if dict.get(self, key, _MISSING) is child:
+            return key
+        return _MISSING
+
+    def __setitem__(self, key, value):
+        self._before_change()
+        dict.__setitem__(self, key, self._wrap(key, value))
+        self._changed(key)
+
+    def __delitem__(self, key):
+        if key in self:
+            self._before_change()
+        dict.__delitem__(self, key)
+        self._changed(key)
+
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        self._before_change()
+        value = dict.pop(self, key)
+        self._changed(key)
+        return value
+
+    def popitem(self):
+        if self:
+            self._before_change()
+        key, value = dict.popitem(self)
+        self._changed(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return dict.__getitem__(self, key)
+        self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        if args:
+            if len(args) > 1:
+                raise TypeError(f"update expected at most 1 argument, got {len(args)}")
+            other = args[0]
+            items = other.items() if hasattr(other, "keys") else other
+            for key, value in items:
+                self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def clear(self):
+        if not self:
+            return
+        self._before_change()
+        dict.clear(self)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        result = {}
+        memo[id(self)] = result
+        for key, value in dict.items(self):
+            result[copy.deepcopy(key, memo)] = copy.deepcopy(value, memo)
+        return result
+
+    def __reduce_ex__(self, protocol):
+        return (dict, (dict(self),))
+
+
+class TrackedList(_TrackedContainer, list):
+    """A list that reports mutations to the ChangeTracker of its DB."""
+    __slots__ = ("_parent", "_key", "_tracker")
+
+    def __init__(self, *args):
+        self._parent = None
+        self._key = None
+        self._tracker = None
+        if args:
+            self.extend(*args)
+
+    def _key_of(self, child):
+        index = child._key
+        if isinstance(index, int) and 0 <= index < len(self) and list.__getitem__(self, index) is child:
+            return index
+        return _MISSING
+
+    def _renumber(self, start=0):
+        """Store their new index in the tracked items from `start` on, after items shifted."""
+        for index in range(max(start, 0), len(self)):
+            item = list.__getitem__(self, index)
+            if isinstance(item, _TrackedContainer):
+                item._key = index
+
+    def __setitem__(self, index, value):
+        self._before_change()
+        if isinstance(index, slice):
+            list.__setitem__(self, index, [self._wrap(None, v) for v in value])
+            self._renumber()
+            self._changed()
+        else:
+            value = self._wrap(None, value)
+            list.__setitem__(self, index, value)
+            if index < 0:
+                index += len(self)
+            if isinstance(value, _TrackedContainer):
+                value._key = index
+            self._changed(index)
+
+    def __delitem__(self, index):
+        self._before_change()
+        list.__delitem__(self, index)
+        if isinstance(index, slice):
+            self._renumber()
+        else:
+            # A negative index counted from the end, before the item was removed
+            self._renumber(index + len(self) + 1 if index < 0 else index)
+        self._changed()
+
+    def append(self, value):
+        index = len(self)
+        self._before_change()
+        list.append(self, self._wrap(index, value))
+        # Appending does not shift other items, so only the new index changed
+        self._changed(index)
+
+    def extend(self, values: Iterable[Any]):
+        start = len(self)
+        self._before_change()
+        list.extend(self, [self._wrap(start + i, v) for i, v in enumerate(values)])
+        self._changed()
+
+    def insert(self, index, value):
+        self._before_change()
+        list.insert(self, index, self._wrap(None, value))
+        # The position the item went to (list.insert clamps `index` to the list)
+        self._renumber(min(index + len(self) - 1 if index < 0 else index, len(self) - 1))
+        self._changed()
+
+    def pop(self, index=-1):
+        self._before_change()
+        value = list.pop(self, index)
+        self._renumber(index + len(self) + 1 if index < 0 else index)
+        self._changed()
+        return value
+
+    def remove(self, value):
+        self._before_change()
+        try:
+            start = list.index(self, value)
+        except ValueError:
+            raise ValueError("list.remove(x): x not in list") from None
+        list.__delitem__(self, start)
+        self._renumber(start)
+        self._changed()
+
+    def clear(self):
+        if not self:
+            return
+        self._before_change()
+        list.clear(self)
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        self._before_change()
+        list.sort(self, *args, **kwargs)
+        self._renumber()
+        self._changed()
+
+    def reverse(self):
+        self._before_change()
+        list.reverse(self)
+        self._renumber()
+        self._changed()
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, n):
+        self._before_change()
+        list.__imul__(self, n)
+        self._renumber()
+        self._changed()
+        return self
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        result = []
+        memo[id(self)] = result
+        for value in list.__iter__(self):
+            result.append(copy.deepcopy(value, memo))
+        return result
+
+    def __reduce_ex__(self, protocol):
+        return (list, (list(self),))
+
+
+def track_changes(data: Optional[dict] = None, path_depth: int = DEFAULT_PATH_DEPTH,
+                  max_changes: int = DEFAULT_MAX_CHANGES) -> TrackedDict:
+    """
+    Create a change-tracked DB root holding a copy of `data`.
+
+    Args:
+        data (Optional[dict]): Initial contents.
+        path_depth (int): Number of keys from the root kept per changed path.
+            It must reach the records a consumer cares about, e.g. 4 for
+            DB["users"][user_id]["messages"][message_id].
+        max_changes (int): Number of distinct changed paths remembered before
+            the oldest are dropped.
+
+    Returns:
+        TrackedDict: The tracked root, with its ChangeTracker attached.
+    """
+    root = TrackedDict()
+    root._tracker = ChangeTracker(path_depth=path_depth, max_changes=max_changes)
+    if data:
+        root.update(data)
+    return root
+
+
+def get_change_tracker(db: Any) -> Optional[ChangeTracker]:
+    """Return the ChangeTracker of a tracked DB root, or None for untracked objects."""
+    if isinstance(db, TrackedDict):
+        return db._tracker
+    return None
+
+
+def find_change_tracker(container: Any) -> Optional[ChangeTracker]:
+    """
+    Return the ChangeTracker of the tracked DB `container` is part of.
+
+    `container` may be the root or any container currently attached under it.
+    Returns None for untracked objects and for containers detached from their DB.
+    """
+    if not isinstance(container, _TrackedContainer):
+        return None
+    node = container
+    while node._parent is not None:
+        if node._parent._key_of(node) is _MISSING:
+            return None
+        node = node._parent
+    return node._tracker
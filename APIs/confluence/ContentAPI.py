@@ -11,7 +11,8 @@ from .SimulationEngine.custom_errors import InvalidPaginationValueError, Invalid
 
 from .SimulationEngine.db import DB
 from .SimulationEngine.models import ContentInputModel
-from .SimulationEngine.utils import _evaluate_cql_tree, _collect_descendants, _preprocess_cql_functions, cascade_delete_content_data
+from .SimulationEngine.utils import _compile_cql, _cql_candidates, _evaluate_cql_plan, _collect_descendants, \
+    _contents_where, _contents_with_ancestor, _preprocess_cql_functions, cascade_delete_content_data
 import re
 import copy
 import os
@@ -277,7 +278,7 @@ def create_content(body: Dict[str, Any]) -> Dict[str, Any]:
         "minorEdit": False
     }]
     
-    return new_content
+    return DB["contents"][new_id]
 
 @tool_spec(
     spec={
@@ -786,7 +787,7 @@ def delete_content(id: str, status: Optional[str] = None) -> None:
                     - Logical operators: AND, OR, NOT (case-insensitive)
                     - Grouping: Use parentheses () for complex expressions
                     - Value types: Strings ('value' or "value"), Numbers (123 or 45.67), Keywords (null, true, false), Functions (now())
-                    - Supported fields: type, space, spaceKey, title, status, id, text, created, postingDay, label
+                    - Supported fields: type, space, spaceKey, title, status, id, text, created, postingDay, label, ancestor
                     - Field mappings:
                         * type: Content type ('page', 'blogpost', 'comment', 'attachment')
                         * space/spaceKey: The key of the space containing this content
@@ -797,6 +798,7 @@ def delete_content(id: str, status: Optional[str] = None) -> None:
                         * created: Maps to history.createdDate (supports date comparison operators)
                         * postingDay: Direct field on blogpost content (YYYY-MM-DD format, supports date comparison)
                         * label: Searches content labels directly (supports =, != operators for exact match)
+                        * ancestor: Id of any ancestor of the content item (supports =, != operators for exact match)
                         - Examples:
                           * "type='page' AND spaceKey='DOC'"
                           * "type='page' AND space='DOC'"
@@ -807,6 +809,7 @@ def delete_content(id: str, status: Optional[str] = None) -> None:
                           * "type='blogpost' AND postingDay>='2024-01-01'"
                           * "label='finished' AND type='page'"
                           * "label!='draft' OR type='blogpost'"
+                          * "ancestor='123' AND type='page'"
                           * "id = 1" (unquoted number)
                           * "postingDay = null" (null keyword for fields without values)
                           * "postingDay != null" (fields that have values)
@@ -867,7 +870,7 @@ def search_content(
             - Logical operators: AND, OR, NOT (case-insensitive)
             - Grouping: Use parentheses () for complex expressions
             - Value types: Strings ('value' or "value"), Numbers (123 or 45.67), Keywords (null, true, false), Functions (now())
-            - Supported fields: type, space, spaceKey, title, status, id, text, created, postingDay, label
+            - Supported fields: type, space, spaceKey, title, status, id, text, created, postingDay, label, ancestor
             - Field mappings:
                 * type: Content type ('page', 'blogpost', 'comment', 'attachment')
                 * space/spaceKey: The key of the space containing this content
@@ -878,6 +881,7 @@ def search_content(
                 * created: Maps to history.createdDate (supports date comparison operators)
                 * postingDay: Direct field on blogpost content (YYYY-MM-DD format, supports date comparison)
                 * label: Searches content labels directly (supports =, != operators for exact match)
+                * ancestor: Id of any ancestor of the content item (supports =, != operators for exact match)
                 - Examples:
                   * "type='page' AND spaceKey='DOC'"
                   * "type='page' AND space='DOC'"
@@ -888,6 +892,7 @@ def search_content(
                   * "type='blogpost' AND postingDay>='2024-01-01'"
                   * "label='finished' AND type='page'"
                   * "label!='draft' OR type='blogpost'"
+                  * "ancestor='123' AND type='page'"
                   * "id = 1" (unquoted number)
                   * "postingDay = null" (null keyword for fields without values)
                   * "postingDay != null" (fields that have values)
@@ -994,79 +999,13 @@ def search_content(
                 )
         expand_fields = fields
 
-    # Get all contents from database
-    all_contents = list(DB["contents"].values())
-
-    # Enhanced tokenizer regex with support for quoted strings, numbers, keywords, and functions
-    tokenizer_regex = r"""
-        \b(?:and|or|not)\b|                 # Match 'and', 'or', 'not' as whole words
-        \(|\)|                              # Match '(' or ')'
-        \w+\s*(?:>=|<=|!=|!~|>|<|=|~)\s*   # Match field name and operator part
-        (?:                                 # Non-capturing group for value types
-            '[^']*'|                        # Match single-quoted string
-            \"[^\"]*\"|                     # Match double-quoted string
-            \w+\([^)]*\)|                   # Match function calls like now()
-            \b(?:null|true|false)\b|        # Match keywords (case-insensitive)
-            \d+(?:\.\d+)?                   # Match numbers (integers and decimals)
-        )
-    """
-    tokens = re.findall(tokenizer_regex, cql, re.IGNORECASE | re.VERBOSE)
-    
-    # Enhanced validation with better error messages
-    untokenized_remains = re.sub(tokenizer_regex, "", cql, flags=re.IGNORECASE | re.VERBOSE)
-    if untokenized_remains.strip():
-        # Provide more specific error messages for common issues
-        remaining = untokenized_remains.strip()
-        
-        # Check for common syntax errors with improved detection
-        if re.search(r'==', remaining):  # Check for == operator first
-            raise ValueError(
-                "CQL query is invalid: Unsupported operator detected. "
-                "Found '==' operator. Use single '=' for equality. "
-                "Supported operators: =, !=, >, <, >=, <=, ~, !~"
-            )
-        elif re.search(r'\w+\s*[>=<!~]+\s*\w+(?!["\'])', remaining):
-            raise ValueError(
-                "CQL query is invalid: String values must be quoted. "
-                f"Found unquoted value in: '{remaining}'. "
-                "Use single or double quotes around string values."
-            )
-        elif re.search(r'["\'][^"\'\n]*$', remaining):  # Unclosed quote
-            raise ValueError(
-                "CQL query is invalid: Unclosed quote detected. "
-                "Ensure all quoted strings are properly closed."
-            )
-        elif re.search(r'\w+\s*[^>=<!~\s\'"()]+', remaining):  # Improved unsupported operator detection
-            raise ValueError(
-                "CQL query is invalid: Unsupported operator detected. "
-                "Supported operators: =, !=, >, <, >=, <=, ~, !~"
-            )
-        else:
-            raise ValueError(
-                f"CQL query is invalid: Unrecognized syntax '{remaining}'. "
-                "Check field names, operators, and quote usage."
-            )
-
-    # Validate field names in tokens for better error reporting
-    supported_fields = {"type", "space", "spaceKey", "title", "status", "id", "text", "created", "postingday", "label"}
-    supported_fields_lower = {field.lower() for field in supported_fields}
-    for token in tokens:
-        token_lower = token.lower().strip()
-        if token_lower not in {"and", "or", "not", "(", ")"}:
-            # Check if it's a field expression
-            field_match = re.match(r'(\w+)\s*[>=<!~]+', token, re.IGNORECASE)
-            if field_match:
-                field_name = field_match.group(1).lower()
-                if field_name not in supported_fields_lower:
-                    raise ValueError(
-                        f"CQL query contains unsupported field '{field_match.group(1)}'. "
-                        f"Supported fields are: {', '.join(sorted(supported_fields))}."
-                    )
+    # Tokenize and validate the query, or reuse its cached plan
+    plan = _compile_cql(cql)
 
     # Filter contents based on the CQL query with enhanced error handling
     try:
         filtered_contents = [
-            content for content in all_contents if _evaluate_cql_tree(content, tokens)
+            content for content in _cql_candidates(plan) if _evaluate_cql_plan(content, plan)
         ]
     except ValueError as e:
         # Re-raise ValueError with CQL context
@@ -1456,8 +1395,17 @@ def get_content_list(
         raise MissingTitleForPageError("Argument 'title' is required when type is 'page'.")
         
     # --- Input Validation End ---
-    # Collect all content
-    all_contents = list(DB["contents"].values())
+    # Collect the content that may pass the filters below, from the content index
+    candidate_filters = {}
+    if type:
+        candidate_filters["type"] = type
+    if spaceKey is not None:
+        candidate_filters["spaceKey"] = spaceKey
+    if title:
+        candidate_filters["title"] = title
+    if status != "any":
+        candidate_filters["status"] = status or "current"
+    all_contents = _contents_where(**candidate_filters)
 
     # Filter
     if type:
@@ -1772,7 +1720,7 @@ def get_content_children(
     children_by_type: Dict[str, List[Dict[str, Any]]] = {"page": [], "blogpost": [], "comment": [], "attachment": []}
 
     # Find direct children by searching for content that has this item as immediate parent
-    for potential_child_id, potential_child in DB["contents"].items():
+    for potential_child in _contents_with_ancestor(id):
         ancestors = potential_child.get("ancestors", [])
         
         # Check if this content is a direct child (has current content as immediate ancestor)
@@ -3409,7 +3357,7 @@ def update_content_property(id: str, key: str, body: Dict[str, Any]) -> Dict[str
     value = body.get("value", prop["value"])
     updated = {"key": key, "value": value, "version": new_version}
     DB["content_properties"][prop_key] = updated
-    return updated
+    return DB["content_properties"][prop_key]
 
 
 @tool_spec(
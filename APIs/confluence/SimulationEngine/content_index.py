@@ -0,0 +1,121 @@
+# APIs/confluence/SimulationEngine/content_index.py
+"""
+Postings over DB["contents"] of the Confluence DB: the content tree and the
+fields CQL queries and content listings filter on.
+
+A `ContentIndex` keeps the position of each content in DB order and, built on
+first use for a key extractor (a function of one content returning the keys
+it is filed under), a map from each key to the contents holding it. The
+utils module files contents:
+
+- under the ids of their ancestors, which makes the ancestors lists stored on
+  each content a closure table of the tree: the children and descendants of
+  a content, and `ancestor = X` CQL conditions, read one posting list instead
+  of scanning every content (once per level of the tree for descendants);
+- under the lower-cased value of a CQL field (type, space, status, ...), for
+  `field = value` conditions;
+- under the raw value of a field (type, spaceKey, title, status), for the
+  content listings of ContentAPI and SpaceAPI.
+
+Lookups return candidate keys: a superset of the matching contents, which the
+callers then check with the same code as before. Contents the extractor
+fails on (not a dict, malformed ancestors, an unhashable value) are always
+candidates, so the checks still decide, or fail, on them.
+
+A change of DB["contents"][id] (create, update, move, trash, delete, or a
+direct DB edit) re-indexes just that content on the next lookup (see
+common_utils.synced_index). `content_index.get` returns None for untracked
+DBs, which are scanned.
+"""
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+from common_utils.synced_index import CollectionIndexes
+
+COLLECTION = "contents"
+
+
+class ContentIndex:
+    """Postings of the contents of DB["contents"], per key extractor."""
+
+    def __init__(self, contents: Dict[str, Any]):
+        self._contents = contents
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+        for key in contents:
+            self._positions[key] = self._next_position
+            self._next_position += 1
+        # key extractor -> (posting key -> content keys, content key -> posting keys, keys of irregular contents)
+        self._postings: Dict[Callable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def records(self, keys: Optional[Iterable[str]] = None) -> List[Any]:
+        """The contents of `keys` (every content if None), in DB order."""
+        if keys is None:
+            return list(self._contents.values())
+        positions = self._positions
+        return [self._contents[key] for key in sorted(keys, key=positions.__getitem__)]
+
+    def refresh(self, key: str):
+        """Re-indexes the content of `key` after it was set, changed or deleted."""
+        if key in self._positions:
+            self._unindex(key)
+        if key not in self._contents:
+            self._positions.pop(key, None)
+            return
+        content = self._contents[key]
+        if key not in self._positions or (self._positions[key] != self._next_position - 1
+                                          and key == next(reversed(self._contents))):
+            # New, or deleted and set again: last in DB order
+            self._positions.pop(key, None)
+            self._positions[key] = self._next_position
+            self._next_position += 1
+        for keys_of, postings in self._postings.items():
+            self._file(keys_of, *postings, key, content)
+
+    def lookup(self, keys_of: Callable[[Any], Iterable[Hashable]], value: Hashable) -> Set[str]:
+        """Candidate keys of the contents for which `value in keys_of(content)`."""
+        if keys_of not in self._postings:
+            postings = self._postings[keys_of] = ({}, {}, set())
+            for key, content in self._contents.items():
+                self._file(keys_of, *postings, key, content)
+        by_value, _, irregular = self._postings[keys_of]
+        try:
+            keys = by_value.get(value, set())
+        except TypeError:
+            return set(self._positions)
+        return keys | irregular
+
+    @staticmethod
+    def _file(keys_of, by_value, key_values, irregular, key, content):
+        try:
+            values = set(keys_of(content))
+        except Exception:
+            irregular.add(key)
+            return
+        for value in values:
+            by_value.setdefault(value, set()).add(key)
+        key_values[key] = values
+
+    def _unindex(self, key: str):
+        for by_value, key_values, irregular in self._postings.values():
+            irregular.discard(key)
+            for value in key_values.pop(key, ()):
+                holders = by_value[value]
+                holders.discard(key)
+                if not holders:
+                    del by_value[value]
+
+
+class ContentIndexes(CollectionIndexes):
+    """ContentIndex of DB["contents"] of a tracked Confluence DB, kept in sync with it."""
+
+    index_type = ContentIndex
+
+    def get(self, db: Dict[str, Any], collection: str = COLLECTION) -> Optional[ContentIndex]:
+        """The up to date index of DB["contents"], or None if the DB is untracked or it is not a dict."""
+        return super().get(db, collection)
+
+
+content_index = ContentIndexes()
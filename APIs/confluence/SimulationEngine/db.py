@@ -2,6 +2,8 @@
 import json
 import os
 
+from common_utils.tracked_db import track_changes
+
 DEFAULT_DB_PATH = os.path.join(
     os.path.dirname(
         os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -10,7 +12,7 @@ DEFAULT_DB_PATH = os.path.join(
     "ConfluenceDefaultDB.json",
 )
 
-DB = {}
+DB = track_changes({}, path_depth=2)
 
 with open(DEFAULT_DB_PATH, "r", encoding="utf-8") as f:
     DB.update(json.load(f))
@@ -1,8 +1,10 @@
 # APIs/confluence/SimulationEngine/utils.py
+import functools
 import re
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 from .db import DB
+from .content_index import content_index
 
 # Export the functions that need to be imported by other modules
 __all__ = [
@@ -11,6 +13,11 @@ __all__ = [
     '_preprocess_cql_functions',
     '_evaluate_cql_expression',
     '_evaluate_cql_tree',
+    '_compile_cql',
+    '_evaluate_cql_plan',
+    '_cql_candidates',
+    '_contents_with_ancestor',
+    '_contents_where',
     '_collect_descendants',
     'cascade_delete_content_data'
 ]
@@ -151,15 +158,41 @@ def _preprocess_cql_functions(cql_query: str) -> str:
     return re.sub(function_pattern, replace_function, cql_query)
 
 
-def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
-    """Evaluates a single CQL expression against a content item.
+# Number of compiled CQL queries kept by _compile_cql
+CQL_PLAN_CACHE_SIZE = 256
+
+# Enhanced tokenizer regex with support for quoted strings, numbers, keywords, and functions
+CQL_TOKENIZER_REGEX = r"""
+    \b(?:and|or|not)\b|                 # Match 'and', 'or', 'not' as whole words
+    \(|\)|                              # Match '(' or ')'
+    \w+\s*(?:>=|<=|!=|!~|>|<|=|~)\s*   # Match field name and operator part
+    (?:                                 # Non-capturing group for value types
+        '[^']*'|                        # Match single-quoted string
+        \"[^\"]*\"|                     # Match double-quoted string
+        \w+\([^)]*\)|                   # Match function calls like now()
+        \b(?:null|true|false)\b|        # Match keywords (case-insensitive)
+        \d+(?:\.\d+)?                   # Match numbers (integers and decimals)
+    )
+"""
+
+CQL_SUPPORTED_FIELDS = {
+    "type", "space", "spaceKey", "title", "status", "id", "text", "created", "postingday", "label", "ancestor"
+}
+
+# Fields whose value depends on more than the content itself (labels live in DB["content_labels"])
+_CQL_UNINDEXED_FIELDS = {"text", "label"}
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_cql_expression(expression: str) -> Optional[Tuple[str, str, str]]:
+    """Parses a single CQL expression (e.g. "type='page'") into (field, operator, value).
 
     Args:
-        content (Dict[str, Any]): The content item to evaluate against.
-        expression (str): The CQL expression to evaluate (e.g., "type='page'").
+        expression (str): The CQL expression to parse.
 
     Returns:
-        bool: True if the content matches the expression, False otherwise.
+        Optional[Tuple[str, str, str]]: The lower-cased field name, the operator and the
+            value (keywords lower-cased), or None if the expression is malformed.
     """
     # Regex to capture field, operator, and value
     # Field names can be simple words.
@@ -178,13 +211,12 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
     if not match:
         # This can happen if a token is not a valid expression (e.g. a standalone operator passed incorrectly)
         # Or if the expression is malformed.
-        # print(f"DEBUG: No match for expression: '{expression}'") # For debugging
-        return False
+        return None
 
     groups = match.groups()
     field = groups[0].lower()  # Normalize field name to lower for case-insensitive matching
     operator = groups[1]
-    
+
     # Extract value from whichever group matched
     # Group 2: single-quoted value, Group 3: double-quoted value,
     # Group 4: keyword (null/true/false), Group 5: number
@@ -192,7 +224,7 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
     double_quoted_value = groups[3]
     keyword_value = groups[4]
     number_value = groups[5]
-    
+
     # Determine which type of value we have
     if single_quoted_value is not None:
         value = single_quoted_value
@@ -204,14 +236,24 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
         value = number_value
     else:
         # Should not happen if regex is correct
-        return False
-    
+        return None
+    return field, operator, value
+
+
+def _cql_ancestor_ids(content: Dict[str, Any]) -> List[Any]:
+    """Ids of the ancestors of a content item, as compared by the CQL 'ancestor' field."""
+    return [ancestor.get("id") if isinstance(ancestor, dict) else ancestor
+            for ancestor in content.get("ancestors") or []]
+
+
+def _cql_field_value(content: Dict[str, Any], field: str) -> Any:
+    """Value of a (lower-cased) CQL field for a content item, None if the content has no such field."""
     # Normalize field access: try common variations if direct match fails
     # For example, Confluence might use 'space' but user might type 'spaceKey'.
     # This example uses exact field names from DB structure.
     # For more robustness, you might want to map aliases or try case variations.
     content_value = None
-    
+
     # Handle special cases for nested/mapped fields first (before generic field matching)
     if field == "space":
 
@@ -223,11 +265,11 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
         # For 'text' field, search across multiple fields (master field)
         # According to official API, text searches: Title, Content body, Labels
         search_values = []
-        
+
         # Add title
         if "title" in content:
             search_values.append(str(content["title"]))
-        
+
         # Add content body
         if "body" in content and isinstance(content["body"], dict):
             storage = content["body"].get("storage", {})
@@ -235,20 +277,20 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
                 search_values.append(storage.get("value", ""))
             elif isinstance(storage, str):
                 search_values.append(storage)
-        
+
         # Add labels
         content_id = content.get("id")
         if content_id and content_id in DB.get("content_labels", {}):
             labels = DB["content_labels"][content_id]
             search_values.extend(labels)
-        
+
         # Combine all searchable text
         content_value = " ".join(search_values)
     elif field == "created":
         # For 'created' field, map to history.createdDate
         if "history" in content and isinstance(content["history"], dict):
             content_value = content["history"].get("createdDate", "")
-    
+
     elif field == "label":
         # For 'label' field, search in content labels
         content_id = content.get("id")
@@ -260,6 +302,10 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
         else:
             content_value = []  # No labels found
 
+    elif field == "ancestor":
+        # For 'ancestor' field, compare against the ids of all ancestors, like labels
+        content_value = _cql_ancestor_ids(content)
+
     # Try direct field name
     elif field in content:
         content_value = content[field]
@@ -271,7 +317,13 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
             if k.lower() == field:
                 content_value = content[k]
                 break
-    
+    return content_value
+
+
+def _match_cql_condition(content: Dict[str, Any], field: str, operator: str, value: str) -> bool:
+    """Checks a parsed CQL condition (see _parse_cql_expression) against a content item."""
+    content_value = _cql_field_value(content, field)
+
     # If field is not found in content, it cannot match
     # (unless operator is '!=' and value is something specific, but CQL usually implies field presence)
     # For robust CQL, if a field doesn't exist, comparisons like '=' should be false.
@@ -289,7 +341,7 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
             return not is_null
         else:
             return False
-    
+
     if content_value is None: # Field does not exist in content
         if operator == "!=": # field != value -> true if field is null
             return True
@@ -297,8 +349,8 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
              return True
         return False # For =, >, <, >=, <=, ~ if field is null, it's generally false
 
-    # Special handling for label field (content_value is a list of labels)
-    if field == "label" and isinstance(content_value, list):
+    # Special handling for label and ancestor fields (content_value is a list of labels or ancestor ids)
+    if field in ("label", "ancestor") and isinstance(content_value, list):
         if operator == "=":
             # Check if any label exactly matches the value (case-insensitive)
             return any(str(label).lower() == str(value).lower() for label in content_value)
@@ -337,19 +389,19 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
             # Only allow lexicographic comparison for date-like strings (ISO format)
             str_content_value = str(content_value)
             str_value = str(value)
-            
+
             # Check if both values look like dates (contain digits, hyphens, colons, etc.)
             # This is a simple heuristic to distinguish dates from clearly non-numeric strings
             date_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}')  # ISO date format
             timestamp_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}')  # ISO timestamp
-            
-            content_is_date_like = (date_pattern.match(str_content_value) or 
+
+            content_is_date_like = (date_pattern.match(str_content_value) or
                                   timestamp_pattern.match(str_content_value) or
                                   str_content_value.replace('-', '').replace(':', '').replace('T', '').replace('Z', '').replace('.', '').isdigit())
-            value_is_date_like = (date_pattern.match(str_value) or 
+            value_is_date_like = (date_pattern.match(str_value) or
                                 timestamp_pattern.match(str_value) or
                                 str_value.replace('-', '').replace(':', '').replace('T', '').replace('Z', '').replace('.', '').isdigit())
-            
+
             if content_is_date_like and value_is_date_like:
                 # Both look like dates/timestamps, allow lexicographic comparison
                 try:
@@ -370,36 +422,37 @@ def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
     return False
 
 
-def _evaluate_cql_tree(content: Dict[str, Any], tokens: List[str]) -> bool:
-    """
-    Evaluates a list of CQL tokens (in infix order) against a content item,
-    handling parentheses and logical operators (AND, OR, NOT) using
-    a standard shunting-yard-like approach for operator precedence.
+def _evaluate_cql_expression(content: Dict[str, Any], expression: str) -> bool:
+    """Evaluates a single CQL expression against a content item.
 
     Args:
         content (Dict[str, Any]): The content item to evaluate against.
-        tokens (List[str]): List of CQL tokens (expressions, operators, parentheses).
+        expression (str): The CQL expression to evaluate (e.g., "type='page'").
 
     Returns:
-        bool: True if the content matches the CQL expression tree, False otherwise.
-    
-    Raises:
-        ValueError: If the token expression is malformed (e.g. mismatched parentheses).
+        bool: True if the content matches the expression, False otherwise.
     """
-    if not tokens:
-        # An empty query could mean "match all" or "match none".
-        # Confluence usually returns all if CQL is empty.
-        # search_content handles empty cql string separately.
-        # If _evaluate_cql_tree is called with empty tokens (e.g. from a sub-expression),
-        # it should ideally not happen if tokenizer is robust.
-        # Let's assume for a sub-expression, empty tokens means true (neutral element for AND, absorbing for OR if not careful)
-        # For safety, let's make it false if called directly with no tokens.
-        # The main function `search_content` should handle an initially empty `cql` string.
-        # If `tokens` is empty here, it implies a parsing issue or an empty sub-expression.
-        # Let's make it strict: if tokens are empty, it's a non-match.
+    condition = _parse_cql_expression(expression)
+    if condition is None:
         return False
+    return _match_cql_condition(content, *condition)
 
 
+def _cql_to_rpn(tokens: List[str]) -> List[Any]:
+    """
+    Converts a list of CQL tokens (in infix order) to Reverse Polish Notation,
+    using a standard shunting-yard approach for operator precedence.
+
+    Args:
+        tokens (List[str]): List of CQL tokens (expressions, operators, parentheses).
+
+    Returns:
+        List[Any]: The operators ("and", "or", "not") and the operands, parsed
+            by _parse_cql_expression (None for a malformed expression), in RPN order.
+
+    Raises:
+        ValueError: If the parentheses are mismatched.
+    """
     # Operator precedence and associativity
     precedence = {"not": 3, "and": 2, "or": 1, "(": 0} # Lower numbers for grouping like '('
     # 'not' is right-associative, 'and'/'or' are left-associative.
@@ -411,7 +464,7 @@ def _evaluate_cql_tree(content: Dict[str, Any], tokens: List[str]) -> bool:
     for token in tokens:
         token_lower = token.lower() # Normalize operators
         if token_lower not in precedence and token_lower not in ("(", ")"): # It's an operand (expression)
-            output_queue.append(token) # Keep original case for expression evaluation
+            output_queue.append(_parse_cql_expression(token)) # Keep original case for expression evaluation
         elif token_lower == "(":
             operator_stack.append(token_lower)
         elif token_lower == ")":
@@ -433,45 +486,282 @@ def _evaluate_cql_tree(content: Dict[str, Any], tokens: List[str]) -> bool:
         if operator_stack[-1] == "(":
             raise ValueError("Mismatched parentheses in CQL query")
         output_queue.append(operator_stack.pop())
+    return output_queue
+
 
-    # Evaluate the RPN expression
+def _evaluate_cql_rpn(content: Dict[str, Any], rpn: List[Any]) -> bool:
+    """
+    Evaluates a CQL query in RPN order (see _cql_to_rpn) against a content item.
+
+    Raises:
+        ValueError: If the operators do not have enough operands, or leave more than one value.
+    """
     eval_stack: list = []
-    for token in output_queue:
-        token_lower = token.lower() # For checking operators
-        if token_lower == "and":
+    for token in rpn:
+        if token == "and":
             if len(eval_stack) < 2: raise ValueError("Invalid CQL syntax for AND")
             right = eval_stack.pop()
             left = eval_stack.pop()
             eval_stack.append(left and right)
-        elif token_lower == "or":
+        elif token == "or":
             if len(eval_stack) < 2: raise ValueError("Invalid CQL syntax for OR")
             right = eval_stack.pop()
             left = eval_stack.pop()
             eval_stack.append(left or right)
-        elif token_lower == "not":
+        elif token == "not":
             if len(eval_stack) < 1: raise ValueError("Invalid CQL syntax for NOT")
             operand = eval_stack.pop()
             eval_stack.append(not operand)
-        else: # It's an operand (an expression string like "type='page'")
-            eval_stack.append(_evaluate_cql_expression(content, token))
-            
+        else: # It's an operand (a parsed expression like ("type", "=", "page"))
+            eval_stack.append(token is not None and _match_cql_condition(content, *token))
+
     if len(eval_stack) == 1:
         return eval_stack[0]
-    elif not eval_stack and not output_queue: # Original tokens were empty, and output_queue is empty
+    elif not eval_stack and not rpn: # Original tokens were empty, and output_queue is empty
         raise ValueError("Invalid CQL: empty expression or mismatched parentheses")
-    elif not eval_stack and output_queue: # Should not happen if RPN is valid
+    elif not eval_stack and rpn: # Should not happen if RPN is valid
         raise ValueError("Invalid CQL structure leading to empty evaluation stack")
     else: # Should not happen if RPN is valid and evaluated correctly
         raise ValueError("Invalid CQL structure - multiple values left on stack")
 
-# Update _collect_descendants to work without children field
+
+def _evaluate_cql_tree(content: Dict[str, Any], tokens: List[str]) -> bool:
+    """
+    Evaluates a list of CQL tokens (in infix order) against a content item,
+    handling parentheses and logical operators (AND, OR, NOT) using
+    a standard shunting-yard-like approach for operator precedence.
+
+    Args:
+        content (Dict[str, Any]): The content item to evaluate against.
+        tokens (List[str]): List of CQL tokens (expressions, operators, parentheses).
+
+    Returns:
+        bool: True if the content matches the CQL expression tree, False otherwise.
+
+    Raises:
+        ValueError: If the token expression is malformed (e.g. mismatched parentheses).
+    """
+    if not tokens:
+        # An empty query could mean "match all" or "match none".
+        # Confluence usually returns all if CQL is empty.
+        # search_content handles empty cql string separately.
+        # If _evaluate_cql_tree is called with empty tokens (e.g. from a sub-expression),
+        # it should ideally not happen if tokenizer is robust.
+        # Let's assume for a sub-expression, empty tokens means true (neutral element for AND, absorbing for OR if not careful)
+        # For safety, let's make it false if called directly with no tokens.
+        # The main function `search_content` should handle an initially empty `cql` string.
+        # If `tokens` is empty here, it implies a parsing issue or an empty sub-expression.
+        # Let's make it strict: if tokens are empty, it's a non-match.
+        return False
+
+    return _evaluate_cql_rpn(content, _cql_to_rpn(tokens))
+
+
+@functools.lru_cache(maxsize=CQL_PLAN_CACHE_SIZE)
+def _compile_cql(cql: str) -> Dict[str, Any]:
+    """
+    Tokenizes and validates a CQL query (with functions such as now() already
+    substituted) into its plan, cached by query string.
+
+    Args:
+        cql (str): The CQL query string.
+
+    Returns:
+        Dict[str, Any]: Plan with keys "tokens", "rpn" (see _cql_to_rpn), "error" (the
+            message of a malformed expression, raised by _evaluate_cql_plan for each
+            content, as _evaluate_cql_tree does) and "well_formed" (whether every
+            operator has its operands, so that _cql_candidates may narrow the contents).
+
+    Raises:
+        ValueError: If the query has unrecognized syntax, unquoted values, unsupported
+            operators or unsupported fields.
+    """
+    tokens = re.findall(CQL_TOKENIZER_REGEX, cql, re.IGNORECASE | re.VERBOSE)
+
+    # Enhanced validation with better error messages
+    untokenized_remains = re.sub(CQL_TOKENIZER_REGEX, "", cql, flags=re.IGNORECASE | re.VERBOSE)
+    if untokenized_remains.strip():
+        # Provide more specific error messages for common issues
+        remaining = untokenized_remains.strip()
+
+        # Check for common syntax errors with improved detection
+        if re.search(r'==', remaining):  # Check for == operator first
+            raise ValueError(
+                "CQL query is invalid: Unsupported operator detected. "
+                "Found '==' operator. Use single '=' for equality. "
+                "Supported operators: =, !=, >, <, >=, <=, ~, !~"
+            )
+        elif re.search(r'\w+\s*[>=<!~]+\s*\w+(?!["\'])', remaining):
+            raise ValueError(
+                "CQL query is invalid: String values must be quoted. "
+                f"Found unquoted value in: '{remaining}'. "
+                "Use single or double quotes around string values."
+            )
+        elif re.search(r'["\'][^"\'\n]*$', remaining):  # Unclosed quote
+            raise ValueError(
+                "CQL query is invalid: Unclosed quote detected. "
+                "Ensure all quoted strings are properly closed."
+            )
+        elif re.search(r'\w+\s*[^>=<!~\s\'"()]+', remaining):  # Improved unsupported operator detection
+            raise ValueError(
+                "CQL query is invalid: Unsupported operator detected. "
+                "Supported operators: =, !=, >, <, >=, <=, ~, !~"
+            )
+        else:
+            raise ValueError(
+                f"CQL query is invalid: Unrecognized syntax '{remaining}'. "
+                "Check field names, operators, and quote usage."
+            )
+
+    # Validate field names in tokens for better error reporting
+    supported_fields_lower = {field.lower() for field in CQL_SUPPORTED_FIELDS}
+    for token in tokens:
+        token_lower = token.lower().strip()
+        if token_lower not in {"and", "or", "not", "(", ")"}:
+            # Check if it's a field expression
+            field_match = re.match(r'(\w+)\s*[>=<!~]+', token, re.IGNORECASE)
+            if field_match:
+                field_name = field_match.group(1).lower()
+                if field_name not in supported_fields_lower:
+                    raise ValueError(
+                        f"CQL query contains unsupported field '{field_match.group(1)}'. "
+                        f"Supported fields are: {', '.join(sorted(CQL_SUPPORTED_FIELDS))}."
+                    )
+
+    rpn: List[Any] = []
+    error = None
+    try:
+        rpn = _cql_to_rpn(tokens)
+    except ValueError as e:
+        error = str(e)
+
+    depth = 0
+    well_formed = error is None
+    for token in rpn:
+        arity = 2 if token in ("and", "or") else 1 if token == "not" else 0
+        if depth < arity:
+            well_formed = False
+            break
+        depth += 1 - arity
+    return {"tokens": tokens, "rpn": rpn, "error": error, "well_formed": well_formed and depth == 1}
+
+
+def _evaluate_cql_plan(content: Dict[str, Any], plan: Dict[str, Any]) -> bool:
+    """Same as _evaluate_cql_tree(content, plan["tokens"]), for a plan of _compile_cql."""
+    if not plan["tokens"]:
+        return False
+    if plan["error"] is not None:
+        raise ValueError(plan["error"])
+    return _evaluate_cql_rpn(content, plan["rpn"])
+
+
+@functools.lru_cache(maxsize=None)
+def _cql_posting_keys(field: str) -> Callable[[Dict[str, Any]], List[str]]:
+    """Key extractor filing a content item under the values `field = value` matches (lower-cased)."""
+    if field == "ancestor":
+        return lambda content: [str(ancestor_id).lower() for ancestor_id in _cql_ancestor_ids(content)]
+
+    def keys_of(content):
+        content_value = _cql_field_value(content, field)
+        return [] if content_value is None else [str(content_value).lower()]
+    return keys_of
+
+
+def _cql_candidates(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Contents that may match a compiled CQL query, in DB order.
+
+    `field = value` conditions on fields of the content itself read the content
+    index, combined through AND and OR. Other conditions, NOT and malformed
+    queries leave every content a candidate, for _evaluate_cql_plan to check.
+    """
+    index = content_index.get(DB)
+    if index is None:
+        return list(DB["contents"].values())
+    if not plan["well_formed"]:
+        return index.records()
+    stack: List[Optional[Set[str]]] = []
+    for token in plan["rpn"]:
+        if token in ("and", "or"):
+            right = stack.pop()
+            left = stack.pop()
+            if token == "and":
+                stack.append(right if left is None else left if right is None else left & right)
+            else:
+                stack.append(None if left is None or right is None else left | right)
+        elif token == "not":
+            stack.pop()
+            stack.append(None)
+        elif token is None:
+            # A malformed expression matches nothing
+            stack.append(set())
+        else:
+            field, operator, value = token
+            if operator != "=" or value == "null" or field in _CQL_UNINDEXED_FIELDS:
+                stack.append(None)
+            else:
+                stack.append(index.lookup(_cql_posting_keys(field), value.lower()))
+    return index.records(stack[0])
+
+
+def _ancestor_ids(content: Dict[str, Any]) -> List[Any]:
+    """
+    Ids of the ancestors of a content item, {"id": ...} dicts or bare ids, for the content index.
+
+    Raises unless "ancestors" is missing or a list, which keeps contents with
+    other ancestors candidates of every tree lookup.
+    """
+    ancestors = content.get("ancestors", [])
+    if not isinstance(ancestors, list):
+        raise TypeError("ancestors is not a list")
+    return [ancestor["id"] if isinstance(ancestor, dict) else ancestor for ancestor in ancestors]
+
+
+def _ancestor_dict_ids(content: Dict[str, Any]) -> List[Any]:
+    """Same as _ancestor_ids, but raising for bare ancestor ids too."""
+    ancestors = content.get("ancestors", [])
+    if not isinstance(ancestors, list):
+        raise TypeError("ancestors is not a list")
+    return [ancestor["id"] for ancestor in ancestors]
+
+
+def _contents_with_ancestor(content_id: Any, bare_ids: bool = True) -> List[Dict[str, Any]]:
+    """
+    Contents that may list `content_id` among their ancestors (every content if unknown), in DB order.
+
+    Without `bare_ids`, contents listing an ancestor by its bare id rather than
+    an {"id": ...} dict are candidates of every lookup, for callers that fail on them.
+    """
+    index = content_index.get(DB)
+    if index is None:
+        return list(DB["contents"].values())
+    return index.records(index.lookup(_ancestor_ids if bare_ids else _ancestor_dict_ids, content_id))
+
+
+@functools.lru_cache(maxsize=None)
+def _field_keys(field: str) -> Callable[[Dict[str, Any]], Tuple[Any]]:
+    """Key extractor filing a content item under content.get(field)."""
+    return lambda content: (content.get(field),)
+
+
+def _contents_where(**fields: Any) -> List[Dict[str, Any]]:
+    """Contents that may have content.get(field) == value for each of `fields`, in DB order."""
+    index = content_index.get(DB)
+    if index is None:
+        return list(DB["contents"].values())
+    keys = None
+    for field, value in fields.items():
+        matching = index.lookup(_field_keys(field), value)
+        keys = matching if keys is None else keys & matching
+    return index.records(keys)
+
 
 def _collect_descendants(
     content: Dict[str, Any], target_type: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Helper function to recursively collect descendants of a content item.
-    
+
     This function searches through all content in the database to find items that have
     the given content as an ancestor, following the official Confluence API ancestor
     relationship structure.
@@ -490,11 +780,11 @@ def _collect_descendants(
     """
     descendants = []
     content_id = content["id"]
-    
+
     # Find all content that has this content as an ancestor
-    for potential_descendant_id, potential_descendant in DB["contents"].items():
+    for potential_descendant in _contents_with_ancestor(content_id):
         ancestors = potential_descendant.get("ancestors", [])
-        
+
         # Check if current content is in the ancestor chain
         for ancestor in ancestors:
             ancestor_id = ancestor["id"] if isinstance(ancestor, dict) else ancestor
@@ -504,7 +794,7 @@ def _collect_descendants(
                 # Also collect descendants of this descendant (recursive)
                 descendants.extend(_collect_descendants(potential_descendant, target_type))
                 break
-    
+
     return descendants
 
 
@@ -4,6 +4,7 @@ from typing import Dict, List, Any, Optional
 from pydantic import ValidationError
 from confluence.SimulationEngine.db import DB
 from confluence.SimulationEngine.models import SpaceBodyInputModel
+from confluence.SimulationEngine.utils import _contents_where, _contents_with_ancestor
 
 
 @tool_spec(
@@ -178,7 +179,7 @@ def create_space(body: Dict[str, str | Optional[str]]) -> Dict[str, str]:
         "description": validated_body_model.description or "",
     }
     DB["spaces"][spaceKey] = new_space
-    return new_space
+    return DB["spaces"][spaceKey]
 
 
 @tool_spec(
@@ -257,7 +258,7 @@ def create_private_space(body: Dict[str, Any]) -> Dict[str, str]:
         "description": validated_body_model.description or "",
     }
     DB["spaces"][spaceKey] = new_space
-    return new_space
+    return DB["spaces"][spaceKey]
 
 
 @tool_spec(
@@ -538,8 +539,7 @@ def get_space_content(
     if limit <= 0:
         raise ValueError("limit must be a positive integer.")
 
-    all_contents = list(DB["contents"].values())
-    results = [c for c in all_contents if c.get("spaceKey") == spaceKey]
+    results = [c for c in _contents_where(spaceKey=spaceKey) if c.get("spaceKey") == spaceKey]
 
     # Enrich each content item with _links.webui, children, and ancestors fields
     enriched_results = []
@@ -553,7 +553,7 @@ def get_space_content(
         # Add children field: find content items that have this item in their ancestors
         content_id = enriched_content["id"]
         children = []
-        for other_content in all_contents:
+        for other_content in _contents_with_ancestor(content_id, bare_ids=False):
             if "ancestors" in other_content:
                 for ancestor in other_content["ancestors"]:
                     if ancestor.get("id") == content_id:
@@ -693,9 +693,8 @@ def get_space_content_of_type(
         raise ValueError("limit must be a positive integer.")
     # --- End Input Validation ---
 
-    # Get all contents and filter by space first
-    all_contents = list(DB["contents"].values())
-    space_contents = [c for c in all_contents if c.get("spaceKey") == spaceKey]
+    # Get the contents of the space first
+    space_contents = [c for c in _contents_where(spaceKey=spaceKey) if c.get("spaceKey") == spaceKey]
 
     # Then filter by type
     filtered = [c for c in space_contents if c.get("type") == type]
@@ -713,7 +712,7 @@ def get_space_content_of_type(
         # Add children field: find content items that have this item in their ancestors
         content_id = enriched_content["id"]
         children = []
-        for other_content in all_contents:
+        for other_content in _contents_with_ancestor(content_id, bare_ids=False):
             if "ancestors" in other_content:
                 for ancestor in other_content["ancestors"]:
                     if ancestor.get("id") == content_id:
@@ -0,0 +1,155 @@
+import copy
+import importlib
+import random
+
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+
+import confluence as ConfluenceAPI
+from confluence.SimulationEngine.db import DB
+from confluence.SimulationEngine.content_index import content_index
+from confluence.SimulationEngine.utils import _compile_cql, _evaluate_cql_plan
+
+QUERIES = [
+    "type='page'",
+    "space='DOC' AND type='blogpost'",
+    "spaceKey='ENG' OR spaceKey='doc'",
+    "ancestor='c3'",
+    "ancestor='c3' AND type='comment'",
+    "ancestor!='c3' AND space='ENG'",
+    "NOT type='page' AND status='current'",
+    "(type='page' OR type='comment') AND (space='ENG' OR title~'plan')",
+    "id='c17' OR id=17",
+    "title='Plan 4' AND status='trashed'",
+    "type='page' AND postingDay=null",
+    "label='urgent' AND type='page'",
+    "text~'plan' AND space='DOC'",
+    "type='page' AND",
+    "(type='page'",
+]
+
+
+def _random_contents(seed=0):
+    rng = random.Random(seed)
+    contents = {}
+    for i in range(120):
+        content_id = f"c{i}"
+        content = {
+            "id": content_id,
+            "type": rng.choice(["page", "page", "blogpost", "comment"]),
+            "spaceKey": rng.choice(["DOC", "ENG", "OPS"]),
+            "title": f"{rng.choice(['Plan', 'Notes', 'Report'])} {rng.randrange(10)}",
+            "status": rng.choice(["current", "current", "trashed"]),
+            "body": {"storage": {"value": "<p>plan</p>", "representation": "storage"}},
+        }
+        if i > 5 and rng.random() < 0.7:
+            parent = contents[f"c{rng.randrange(i)}"]
+            content["ancestors"] = copy.deepcopy(parent.get("ancestors", [])) + [{"id": parent["id"]}]
+        contents[content_id] = content
+    return contents
+
+
+def _scan_descendants(content):
+    """Descendants of a content, checking every content at each level."""
+    descendants = []
+    for candidate in DB["contents"].values():
+        for ancestor in candidate.get("ancestors", []):
+            if (ancestor["id"] if isinstance(ancestor, dict) else ancestor) == content["id"]:
+                descendants.append(candidate)
+                descendants.extend(_scan_descendants(candidate))
+                break
+    return descendants
+
+
+class TestContentIndex(BaseTestCaseWithErrorHandler):
+    def setUp(self):
+        self._original_DB_state = copy.deepcopy(DB)
+        DB.clear()
+        DB.update({"contents": _random_contents(), "spaces": {key: {"spaceKey": key, "name": key}
+                                                              for key in ("DOC", "ENG", "OPS")},
+                   "content_labels": {"c3": ["urgent"], "c8": ["Urgent", "draft"]},
+                   "content_properties": {}, "history": {}, "content_counter": 1000})
+
+    def tearDown(self):
+        DB.clear()
+        DB.update(self._original_DB_state)
+
+    def _scan(self, cql):
+        plan = _compile_cql(cql)
+        return [c["id"] for c in DB["contents"].values() if _evaluate_cql_plan(c, plan)]
+
+    def _search(self, cql):
+        try:
+            return [c["id"] for c in ConfluenceAPI.search_content_cql(cql=cql, limit=1000)]
+        except ValueError as e:
+            return str(e)
+
+    def test_cql_search_matches_a_scan(self):
+        for cql in QUERIES:
+            with self.subTest(cql=cql):
+                try:
+                    expected = self._scan(cql)
+                except ValueError as e:
+                    self.assertIn(str(e), self._search(cql))
+                    continue
+                self.assertEqual(self._search(cql), expected)
+        self.assertEqual(self._search("ancestor='c3'"),
+                         [c["id"] for c in DB["contents"].values() if {"id": "c3"} in c.get("ancestors", [])])
+
+    def test_cql_plans_are_cached(self):
+        compile_cql = importlib.import_module("confluence.SimulationEngine.utils")._compile_cql
+        compile_cql.cache_clear()
+        for _ in range(3):
+            ConfluenceAPI.search_content_cql(cql="type='page' AND space='DOC'")
+        self.assertEqual(compile_cql.cache_info().hits, 2)
+
+    def test_tree_lookups_match_a_scan(self):
+        for content_id in ("c0", "c3", "c10", "c60"):
+            with self.subTest(content_id=content_id):
+                content = DB["contents"][content_id]
+                descendants = ConfluenceAPI.get_content_descendants(content_id, limit=1000)
+                expected = _scan_descendants(content)
+                self.assertEqual([d["id"] for d in descendants["page"]],
+                                 [d["id"] for d in expected if d["type"] == "page"])
+                children = ConfluenceAPI.get_content_children(content_id)
+                expected = [c for c in DB["contents"].values()
+                            if c.get("ancestors") and c["ancestors"][-1]["id"] == content_id]
+                self.assertEqual([c["id"] for c in children["comment"]],
+                                 [c["id"] for c in expected if c["type"] == "comment"])
+        self.assertIsNotNone(content_index.get(DB))
+
+    def test_index_follows_moves_and_deletes(self):
+        DB["contents"]["c100"]["ancestors"] = [{"id": "c0"}]
+        self.assertIn("c100", self._search("ancestor='c0'"))
+        ConfluenceAPI.update_content("c100", {"ancestors": ["c1"]})
+        self.assertNotIn("c100", self._search("ancestor='c0'"))
+        self.assertIn(DB["contents"]["c100"], ConfluenceAPI.get_content_descendants("c1", limit=1000)[
+            DB["contents"]["c100"]["type"]])
+        created = ConfluenceAPI.create_content({"type": "comment", "title": "Fresh", "spaceKey": "OPS",
+                                                "ancestors": ["c1"]})
+        self.assertIs(created, DB["contents"][created["id"]])
+        self.assertIn(created["id"], self._search("ancestor='c1' AND space='OPS'"))
+        del DB["contents"][created["id"]]
+        self.assertNotIn(created["id"], self._search("ancestor='c1'"))
+        DB["contents"] = {"x": {"id": "x", "type": "page", "spaceKey": "OPS", "status": "current", "title": "X"}}
+        self.assertEqual(self._search("space='OPS'"), ["x"])
+        self.assertEqual([c["id"] for c in ConfluenceAPI.get_space_content("OPS")], ["x"])
+
+    def test_irregular_contents_are_still_matched(self):
+        DB["contents"]["c50"]["ancestors"] = ["c3"]
+        DB["contents"]["c51"]["type"] = ["page"]
+        DB["contents"]["c52"]["spaceKey"] = None
+        for cql in ("ancestor='c3'", "type='page'", "space='DOC' OR type='comment'"):
+            with self.subTest(cql=cql):
+                self.assertEqual(self._search(cql), self._scan(cql))
+        self.assertEqual(ConfluenceAPI.get_content_descendants("c3", limit=1000)["page"],
+                         [d for d in _scan_descendants(DB["contents"]["c3"]) if d["type"] == "page"])
+        with self.assertRaises(AttributeError):
+            ConfluenceAPI.get_space_content(DB["contents"]["c50"]["spaceKey"], limit=1000)
+
+    def test_content_list_uses_postings(self):
+        listed = ConfluenceAPI.get_content_list(type="blogpost", spaceKey="ENG", limit=1000)
+        self.assertEqual([c["id"] for c in listed],
+                         [c["id"] for c in DB["contents"].values() if c["type"] == "blogpost"
+                          and c["spaceKey"] == "ENG" and c["status"] == "current"])
+        listed = ConfluenceAPI.get_content_list(status="any", spaceKey="OPS", limit=1000)
+        self.assertEqual(len(listed), sum(c["spaceKey"] == "OPS" for c in DB["contents"].values()))
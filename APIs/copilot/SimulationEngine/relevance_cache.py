@@ -0,0 +1,86 @@
+"""
+Relevance verdicts of semantic_search, cached by query and file content.
+
+For each candidate file of a large workspace, semantic_search asks the LLM
+whether the file is relevant to the query. A verdict only depends on the query,
+the file path and the content sent to the LLM, so it is kept under (normalized
+query, sha256 of path and content): an unchanged file is never scored twice for
+the same query. Verdicts are dropped when the scoring function or the mode of
+the LLM gateway changes, since they were given by another backend.
+
+`query_terms` and `lexical_score` are the cheap prefilter semantic_search uses
+to pick the files worth scoring when there are more than it may score.
+"""
+import hashlib
+import re
+import threading
+from typing import Any, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from common_utils.llm_gateway import llm_gateway
+
+MAX_CACHED_VERDICTS = 10000
+
+_TERM = re.compile(r"\w+")
+_STOPWORDS = frozenset({
+    "the", "and", "for", "how", "what", "where", "which", "who", "why", "when", "does", "with",
+    "this", "that", "are", "from", "into", "code", "file", "files", "find", "show", "all",
+})
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct lower-cased words of a query worth looking for, in order."""
+    terms = []
+    for term in _TERM.findall(query.lower()):
+        if len(term) >= 3 and term not in _STOPWORDS and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def lexical_score(terms: List[str], path: str, text: str) -> int:
+    """Number of `terms` found in a file path or its lower-cased text."""
+    path = path.lower()
+    return sum(1 for term in terms if term in text or term in path)
+
+
+class RelevanceCache:
+    """LRU map of (normalized query, file digest) to the raw LLM verdict."""
+
+    def __init__(self, maxsize: int = MAX_CACHED_VERDICTS):
+        self._lock = threading.Lock()
+        self._verdicts = LRUCache(maxsize=maxsize)
+        self._source: Optional[Tuple[Any, str]] = None
+
+    @staticmethod
+    def key(query: str, path: str, content: str) -> Tuple[str, str]:
+        digest = hashlib.sha256(f"{path}\0{content}".encode("utf-8", errors="surrogatepass")).hexdigest()
+        return normalize_query(query), digest
+
+    def _check_source(self, scorer: Any):
+        source = (scorer, llm_gateway.mode)
+        if self._source is None or self._source[0] is not scorer or self._source[1] != source[1]:
+            self._verdicts.clear()
+            self._source = source
+
+    def get(self, scorer: Any, key: Tuple[str, str]) -> Optional[str]:
+        with self._lock:
+            self._check_source(scorer)
+            return self._verdicts.get(key)
+
+    def put(self, scorer: Any, key: Tuple[str, str], verdict: str):
+        with self._lock:
+            self._check_source(scorer)
+            self._verdicts[key] = verdict
+
+    def clear(self):
+        with self._lock:
+            self._verdicts.clear()
+            self._source = None
+
+
+relevance_cache = RelevanceCache()
@@ -26,6 +26,9 @@ from .llm_interface import call_llm
 MAX_FILES_FOR_SMALL_WORKSPACE = 20
 MAX_LLM_CONTENT_CHARS_PER_FILE = 15000  # Max characters of a file's content to send to LLM
 MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE = 50  # Limit processing for very large workspaces
+SEMANTIC_SEARCH_MAX_WORKERS = 8  # Concurrent LLM relevance calls of semantic_search
+SEMANTIC_SEARCH_ENOUGH_HITS = 10  # Above the file cap, semantic_search stops once it has this many high-confidence snippets
+SEMANTIC_SEARCH_HIGH_CONFIDENCE_SCORE = 0.8
 MAX_FILE_SIZE_TO_LOAD_CONTENT_MB = 50
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_TO_LOAD_CONTENT_MB * 1024 * 1024
 BINARY_CONTENT_PLACEHOLDER = ["<Binary File - Content Not Loaded>"]
@@ -7,14 +7,17 @@ from common_utils.tool_spec_decorator import tool_spec
 import logging
 import os
 import re
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 
 from copilot.SimulationEngine import custom_errors
 from copilot.SimulationEngine import utils
 from copilot.SimulationEngine.db import DB
 from copilot.SimulationEngine.utils import (MAX_FILES_FOR_SMALL_WORKSPACE, MAX_FILE_SIZE_BYTES,
                                             MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE,
-                                            MAX_LLM_CONTENT_CHARS_PER_FILE)
+                                            MAX_LLM_CONTENT_CHARS_PER_FILE, SEMANTIC_SEARCH_MAX_WORKERS,
+                                            SEMANTIC_SEARCH_ENOUGH_HITS, SEMANTIC_SEARCH_HIGH_CONFIDENCE_SCORE)
+from copilot.SimulationEngine.relevance_cache import lexical_score, query_terms, relevance_cache
 
 
 @tool_spec(
@@ -126,7 +129,10 @@ def semantic_search(query: str) -> List[Dict[str, Any]]:
             content_lines = []
 
         num_text_files += 1
-        total_content_size_bytes += entry.get("size_bytes", utils.calculate_size_bytes(content_lines))
+        if "size_bytes" in entry:
+            total_content_size_bytes += entry["size_bytes"]
+        else:
+            total_content_size_bytes += utils.calculate_size_bytes(content_lines)
         eligible_files_metadata.append(entry)
 
     is_small_workspace = (num_text_files < MAX_FILES_FOR_SMALL_WORKSPACE and
@@ -163,26 +169,93 @@ def semantic_search(query: str) -> List[Dict[str, Any]]:
                                     f"Processing up to {MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE} for semantic search due to size."
                                     )
 
-            files_to_process = eligible_files_metadata[:MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE]
+            files_to_process = _prefiltered_files(query, eligible_files_metadata)
 
-        for entry in files_to_process:
-            original_full_content_lines = entry.get("content_lines", [])
-            if not original_full_content_lines:
-                continue
+        results = _score_files_with_llm(
+            query, files_to_process,
+            stop_early=len(eligible_files_metadata) > MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE,
+        )
+
+    return results
+
+
+def _prefiltered_files(query: str, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Up to MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE files worth scoring with
+    the LLM: the files whose path or content holds the most query terms, then
+    the first ones in workspace order. Files holding none of the terms are left
+    out, unless none holds any.
+    """
+    terms = query_terms(query)
+    scored = []
+    if terms:
+        for position, entry in enumerate(entries):
+            text = "".join(entry.get("content_lines") or []).lower()
+            score = lexical_score(terms, entry.get("path", ""), text)
+            if score:
+                scored.append((-score, position, entry))
+    if not scored:
+        return entries[:MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE]
+    scored.sort(key=lambda item: item[:2])
+    return [entry for _, _, entry in scored[:MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE]]
+
+
+def _score_files_with_llm(query: str, entries: List[Dict[str, Any]], stop_early: bool = False) -> List[Dict[str, Any]]:
+    """
+    Snippets of the files the LLM finds relevant, sorted by relevance score.
+
+    Files are scored by a pool of SEMANTIC_SEARCH_MAX_WORKERS threads, and their
+    verdicts read in order. With `stop_early` (the workspace had more files than
+    MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE, so `entries` is already a
+    selection of them), once SEMANTIC_SEARCH_ENOUGH_HITS snippets scoring at
+    least SEMANTIC_SEARCH_HIGH_CONFIDENCE_SCORE are found, the remaining files
+    are dropped, so the results do not depend on which calls return first.
+    Otherwise every file is scored.
+    """
+    results: List[Dict[str, Any]] = []
+    if not entries:
+        return results
+    confident_hits = 0
+    with ThreadPoolExecutor(max_workers=min(SEMANTIC_SEARCH_MAX_WORKERS, len(entries))) as pool:
+        futures = [pool.submit(_score_file_relevance, query, entry) for entry in entries]
+        try:
+            for future in futures:
+                result = future.result()
+                if result is None:
+                    continue
+                results.append(result)
+                if stop_early and result["relevance_score"] >= SEMANTIC_SEARCH_HIGH_CONFIDENCE_SCORE:
+                    confident_hits += 1
+                    if confident_hits >= SEMANTIC_SEARCH_ENOUGH_HITS:
+                        break
+        finally:
+            for future in futures:
+                future.cancel()
+
+    results.sort(key=lambda x: x.get("relevance_score", 0.0), reverse=True)
+    return results
 
-            file_content_full = "".join(original_full_content_lines)
-            if not file_content_full.strip():  # Skip if file is effectively empty (only whitespace)
-                continue
 
-            if len(file_content_full) > MAX_LLM_CONTENT_CHARS_PER_FILE:
-                content_for_llm_str = file_content_full[:MAX_LLM_CONTENT_CHARS_PER_FILE] + "\n... [CONTENT TRUNCATED]"
-            else:
-                content_for_llm_str = file_content_full
+def _score_file_relevance(query: str, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The snippet of a file the LLM finds relevant to the query, or None."""
+    original_full_content_lines = entry.get("content_lines", [])
+    if not original_full_content_lines:
+        return None
 
-            numbered_content_list = utils.add_line_numbers(content_for_llm_str.splitlines(keepends=True))
-            numbered_content_for_llm = "".join(numbered_content_list)
+    file_content_full = "".join(original_full_content_lines)
+    if not file_content_full.strip():  # Skip if file is effectively empty (only whitespace)
+        return None
 
-            prompt = f"""You are a code analysis assistant.
+    if len(file_content_full) > MAX_LLM_CONTENT_CHARS_PER_FILE:
+        content_for_llm_str = file_content_full[:MAX_LLM_CONTENT_CHARS_PER_FILE] + "\n... [CONTENT TRUNCATED]"
+    else:
+        content_for_llm_str = file_content_full
+
+    numbered_content_list = utils.add_line_numbers(content_for_llm_str.splitlines(keepends=True))
+    numbered_content_for_llm = "".join(numbered_content_list)
+
+    # The continuation lines keep the indentation of the original loop body, which is part of the prompt
+    prompt = f"""You are a code analysis assistant.
             User Query: "{query}"
             File Path: "{entry['path']}"
             
@@ -203,75 +276,75 @@ def semantic_search(query: str) -> List[Dict[str, Any]]:
             
             Your response:"""
 
+    try:
+        cache_key = relevance_cache.key(query, entry["path"], content_for_llm_str)
+        llm_response_raw = relevance_cache.get(utils.call_llm, cache_key)
+        if llm_response_raw is None:
+            llm_response_raw = utils.call_llm(prompt, temperature=0.1, timeout_seconds=45)
+            relevance_cache.put(utils.call_llm, cache_key, llm_response_raw)
+        response_text = llm_response_raw.strip().upper()
+
+        if response_text == "NOT_RELEVANT":
+            return None
+
+        if response_text.startswith("RELEVANT:"):
+            parts_str = response_text[len("RELEVANT:"):].strip()
             try:
-                llm_response_raw = utils.call_llm(prompt, temperature=0.1, timeout_seconds=45)
-                response_text = llm_response_raw.strip().upper()
+                start_line_str, end_line_str, score_str = parts_str.split(',')
+                start_line = int(start_line_str.strip())
+                end_line = int(end_line_str.strip())
+                relevance_score = float(score_str.strip())
 
-                if response_text == "NOT_RELEVANT":
-                    continue
-
-                if response_text.startswith("RELEVANT:"):
-                    parts_str = response_text[len("RELEVANT:"):].strip()
-                    try:
-                        start_line_str, end_line_str, score_str = parts_str.split(',')
-                        start_line = int(start_line_str.strip())
-                        end_line = int(end_line_str.strip())
-                        relevance_score = float(score_str.strip())
-
-                        if not (0.0 <= relevance_score <= 1.0):
-                            utils._log_util_message(logging.WARNING,
-                                                    f"LLM returned invalid relevance score {relevance_score} for {entry['path']}. Response: '{llm_response_raw}'. Skipping.")
-                            continue
-                        if start_line <= 0 or end_line < start_line:
-                            utils._log_util_message(logging.WARNING,
-                                                    f"LLM returned invalid line numbers ({start_line}-{end_line}) for {entry['path']}. Response: '{llm_response_raw}'. Skipping.")
-                            continue
-
-                        max_lines_in_file = len(original_full_content_lines)
-                        if start_line > max_lines_in_file:
-                            utils._log_util_message(logging.WARNING,
-                                                    f"LLM returned start_line {start_line} > max_lines {max_lines_in_file} for {entry['path']}. Response: '{llm_response_raw}'. Skipping.")
-                            continue
-
-                        end_line = min(end_line, max_lines_in_file)
-                        if start_line > end_line:  # Re-check after end_line adjustment
-                            utils._log_util_message(logging.WARNING,
-                                                    f"LLM returned/adjusted to invalid line range ({start_line}-{end_line}) for {entry['path']}. Response: '{llm_response_raw}'. Skipping.")
-                            continue
-
-                        snippet_lines = original_full_content_lines[start_line - 1:end_line]
-                        snippet_text = "".join(snippet_lines)
-
-                        results.append({
-                            "file_path": entry["path"],
-                            "snippet": snippet_text,
-                            "start_line": start_line,
-                            "end_line": end_line,
-                            "relevance_score": relevance_score
-                        })
-
-                    except ValueError:  # Catch errors from int(), float(), or split(',')
-                        utils._log_util_message(logging.WARNING,
-                                                f"Could not parse LLM 'RELEVANT' response: '{llm_response_raw}' for file {entry['path']}. Skipping.")
-                        continue
-                else:
+                if not (0.0 <= relevance_score <= 1.0):
+                    utils._log_util_message(logging.WARNING,
+                                            f"LLM returned invalid relevance score {relevance_score} for {entry['path']}. Response: '{llm_response_raw}'. Skipping.")
+                    return None
+                if start_line <= 0 or end_line < start_line:
                     utils._log_util_message(logging.WARNING,
-                                            f"Unexpected LLM response format: '{llm_response_raw}' for file {entry['path']}. Skipping.")
+                                            f"LLM returned invalid line numbers ({start_line}-{end_line}) for {entry['path']}. Response: '{llm_response_raw}'. Skipping.")
+                    return None
 
-            except RuntimeError as e:
-                utils._log_util_message(logging.WARNING,
-                                        f"LLM call failed for file {entry['path']} during semantic search: {e}. Skipping this file.")
-            except Exception as e:
-                utils._log_util_message(logging.ERROR,
-                                        f"Unexpected error processing file {entry['path']} for semantic search: {e}",
-                                        exc_info=True)
-                raise custom_errors.SearchFailedError(
-                    f"Unexpected error during semantic search for file {entry['path']}: {str(e)}")
+                max_lines_in_file = len(original_full_content_lines)
+                if start_line > max_lines_in_file:
+                    utils._log_util_message(logging.WARNING,
+                                            f"LLM returned start_line {start_line} > max_lines {max_lines_in_file} for {entry['path']}. Response: '{llm_response_raw}'. Skipping.")
+                    return None
 
-        if results:
-            results.sort(key=lambda x: x.get("relevance_score", 0.0), reverse=True)
+                end_line = min(end_line, max_lines_in_file)
+                if start_line > end_line:  # Re-check after end_line adjustment
+                    utils._log_util_message(logging.WARNING,
+                                            f"LLM returned/adjusted to invalid line range ({start_line}-{end_line}) for {entry['path']}. Response: '{llm_response_raw}'. Skipping.")
+                    return None
+
+                snippet_lines = original_full_content_lines[start_line - 1:end_line]
+                snippet_text = "".join(snippet_lines)
+
+                return {
+                    "file_path": entry["path"],
+                    "snippet": snippet_text,
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "relevance_score": relevance_score
+                }
 
-    return results
+            except ValueError:  # Catch errors from int(), float(), or split(',')
+                utils._log_util_message(logging.WARNING,
+                                        f"Could not parse LLM 'RELEVANT' response: '{llm_response_raw}' for file {entry['path']}. Skipping.")
+                return None
+        else:
+            utils._log_util_message(logging.WARNING,
+                                    f"Unexpected LLM response format: '{llm_response_raw}' for file {entry['path']}. Skipping.")
+
+    except RuntimeError as e:
+        utils._log_util_message(logging.WARNING,
+                                f"LLM call failed for file {entry['path']} during semantic search: {e}. Skipping this file.")
+    except Exception as e:
+        utils._log_util_message(logging.ERROR,
+                                f"Unexpected error processing file {entry['path']} for semantic search: {e}",
+                                exc_info=True)
+        raise custom_errors.SearchFailedError(
+            f"Unexpected error during semantic search for file {entry['path']}: {str(e)}")
+    return None
 
 
 @tool_spec(
@@ -279,6 +279,30 @@ class TestSemanticSearch(BaseTestCaseWithErrorHandler):
                             'start_line': 1}]
         self.assertEqual(results, expected_result)
 
+    @patch("copilot.code_intelligence.MAX_FILES_FOR_SMALL_WORKSPACE", 0)
+    @patch("copilot.SimulationEngine.utils.call_llm")
+    def test_llm_prompt_layout(self, mock_call_llm):
+        DB["file_system"]["/test_ws/file1.txt"] = {
+            "path": "/test_ws/file1.txt",
+            "is_directory": False,
+            "content_lines": ["line1\n", "line2\n"],
+            "size_bytes": 1000000,
+            "last_modified": get_mock_timestamp()
+        }
+        mock_call_llm.return_value = "NOT_RELEVANT"
+        semantic_search(query="prompt layout")
+        prompt = mock_call_llm.call_args.args[0]
+        self.assertTrue(prompt.startswith('You are a code analysis assistant.\n'
+                                          '            User Query: "prompt layout"\n'
+                                          '            File Path: "/test_ws/file1.txt"\n'
+                                          '            \n'
+                                          '            File Content (with 1-indexed line numbers shown):\n'
+                                          '            ---\n'
+                                          '            1: line1\n'))
+        self.assertTrue(prompt.endswith('\n            2. If not relevant: NOT_RELEVANT\n'
+                                        '            \n'
+                                        '            Your response:'))
+
     @patch("copilot.SimulationEngine.utils.call_llm")
     def test_llm_returns_relevant_with_invalid_score(self, mock_call_llm):
         DB["file_system"]["/test_ws/file1.txt"] = {
@@ -497,7 +521,8 @@ class TestSemanticSearch(BaseTestCaseWithErrorHandler):
                 "size_bytes": MAX_FILE_SIZE_BYTES + 1,
                 "last_modified": get_mock_timestamp()
             }
-        mock_call_llm.return_value = "RELEVANT: 1,1,0.9"
+        # Below the high-confidence score, so that the search does not stop early
+        mock_call_llm.return_value = "RELEVANT: 1,1,0.5"
         results = semantic_search(query="line")
         self.assertEqual(len(results), MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE)
 
@@ -620,5 +645,70 @@ class TestSemanticSearch(BaseTestCaseWithErrorHandler):
         self.assertTrue(all(r["relevance_score"] is None for r in results))
 
 
+    def _add_large_file(self, name, content_lines):
+        DB["file_system"][f"/test_ws/{name}"] = {
+            "path": f"/test_ws/{name}",
+            "is_directory": False,
+            "content_lines": content_lines,
+            "size_bytes": MAX_FILE_SIZE_BYTES + 1,
+            "last_modified": get_mock_timestamp()
+        }
+
+    @patch("copilot.SimulationEngine.utils.call_llm")
+    def test_llm_verdicts_are_cached_by_query_and_content(self, mock_call_llm):
+        self._add_large_file("file1.txt", ["line1\n", "line2\n"])
+        self._add_large_file("file2.txt", ["lineA\n", "lineB\n"])
+        mock_call_llm.return_value = "RELEVANT: 1,2,0.5"
+        first = semantic_search(query="Find  LINE")
+        self.assertEqual(mock_call_llm.call_count, 2)
+
+        self.assertEqual(semantic_search(query="find line"), first)
+        self.assertEqual(mock_call_llm.call_count, 2)
+
+        DB["file_system"]["/test_ws/file2.txt"]["content_lines"] = ["lineC\n"]
+        semantic_search(query="find line")
+        self.assertEqual(mock_call_llm.call_count, 3)
+        self.assertIn("lineC", mock_call_llm.call_args[0][0])
+
+    @patch("copilot.SimulationEngine.utils.call_llm")
+    def test_large_workspace_scores_files_holding_query_terms(self, mock_call_llm):
+        from copilot.SimulationEngine.utils import MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE
+        for i in range(MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE + 10):
+            self._add_large_file(f"other{i}.txt", [f"unrelated content {i}"])
+        self._add_large_file("auth/session.py", ["def refresh_token(session):\n", "    return session.token\n"])
+        mock_call_llm.return_value = "RELEVANT: 1,2,0.9"
+        results = semantic_search(query="where is the session token refreshed")
+        self.assertEqual(mock_call_llm.call_count, 1)
+        self.assertEqual([result["file_path"] for result in results], ["/test_ws/auth/session.py"])
+
+    @patch("copilot.SimulationEngine.utils.call_llm")
+    def test_search_stops_after_enough_high_confidence_hits(self, mock_call_llm):
+        from copilot.SimulationEngine.utils import (MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE,
+                                                    SEMANTIC_SEARCH_ENOUGH_HITS)
+        for i in range(MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE + 10):
+            self._add_large_file(f"file{i:02d}.txt", [f"line {i}"])
+
+        def side_effect(prompt, **kwargs):
+            return "RELEVANT: 1,1,0.5" if "file00.txt" in prompt else "RELEVANT: 1,1,0.9"
+
+        mock_call_llm.side_effect = side_effect
+        results = semantic_search(query="line")
+        self.assertEqual(len(results), SEMANTIC_SEARCH_ENOUGH_HITS + 1)
+        self.assertEqual(results[-1]["file_path"], "/test_ws/file00.txt")
+        self.assertEqual([result["file_path"] for result in results[:-1]],
+                         [f"/test_ws/file{i:02d}.txt" for i in range(1, SEMANTIC_SEARCH_ENOUGH_HITS + 1)])
+
+    @patch("copilot.SimulationEngine.utils.call_llm")
+    def test_search_below_file_cap_scores_every_file(self, mock_call_llm):
+        from copilot.SimulationEngine.utils import SEMANTIC_SEARCH_ENOUGH_HITS
+        for i in range(SEMANTIC_SEARCH_ENOUGH_HITS + 15):
+            self._add_large_file(f"file{i:02d}.txt", [f"line {i}"])
+
+        mock_call_llm.return_value = "RELEVANT: 1,1,0.9"
+        results = semantic_search(query="line")
+        self.assertEqual(mock_call_llm.call_count, SEMANTIC_SEARCH_ENOUGH_HITS + 15)
+        self.assertEqual(len(results), SEMANTIC_SEARCH_ENOUGH_HITS + 15)
+
+
 if __name__ == '__main__':
     unittest.main()
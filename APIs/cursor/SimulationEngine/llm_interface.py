@@ -7,6 +7,7 @@ from typing import Optional
 from google import genai
 from google.genai import types
 from cachetools import LRUCache
+from common_utils.llm_gateway import LLMRequest, llm_gateway
 import pickle
 
 # Load environment variables from .env file in the parent 'cursor' directory.
@@ -47,15 +48,6 @@ GEMINI_API_KEY_FROM_ENV = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_K
 if GEMINI_API_KEY_FROM_ENV:
     os.environ["GOOGLE_API_KEY"] = GEMINI_API_KEY_FROM_ENV
 
-# The google-genai library uses GOOGLE_API_KEY from env.
-# A single client instance is created for reuse.
-if not os.getenv("GOOGLE_API_KEY"):
-    logger.warning("Google API Key not found in environment. Functions requiring it will fail.")
-    client = None
-else:
-    client = genai.Client()
-
-
 # Read default model name from environment; fallback to a hardcoded general model if not set.
 DEFAULT_LLM_MODEL = os.getenv(
     "DEFAULT_GEMINI_MODEL_NAME", "gemini-2.5-pro-preview-03-25"
@@ -93,13 +85,13 @@ def call_llm(
         str: The text content generated by the LLM.
 
     Raises:
-        ValueError: If the API client has not been initialized (due to a missing API key).
+        ValueError: If the API key is missing (unless the LLM gateway runs offline or replays).
         RuntimeError: If the LLM API call fails for any reason (e.g., network issues,
                       API errors, content filtering, or if no usable text content
                       is returned by the model).
     """
-    if not client:
-        msg = "Google API Key not configured, client not initialized. Set GOOGLE_API_KEY (or GEMINI_API_KEY in .env)."
+    if llm_gateway.uses_backend and not os.getenv("GOOGLE_API_KEY"):
+        msg = "Google API Key not configured. Set GOOGLE_API_KEY (or GEMINI_API_KEY in .env)."
         _log_with_caller_info(logging.ERROR, msg)
         raise ValueError(msg)
 
@@ -122,26 +114,14 @@ def call_llm(
 
         _log_with_caller_info(logging.INFO, f"Initiating LLM call. Model: {active_model_name}, Temp: {temperature}, Client Read Timeout: {actual_read_timeout_for_log}.")
 
-        response = client.models.generate_content(
-            model=f"{active_model_name}",
-            contents=prompt_text,
-            config=types.GenerateContentConfig(
-                temperature=temperature,
-                http_options=http_options if http_options else None,
-            ),
+        # The gateway shares the client, and adds caching, record/replay, rate limiting and retries.
+        return llm_gateway.complete(
+            LLMRequest(prompt_text, active_model_name, temperature=temperature), service="cursor",
+            live=lambda request: llm_gateway.backend.generate(request, http_options=http_options),
+            # A call that ran into the caller's own timeout is not retried
+            retry_timeouts=http_options is None,
         )
 
-        if response.text:
-            return response.text
-        else:
-            feedback_info = "N/A"
-            if hasattr(response, 'prompt_feedback') and response.prompt_feedback:
-                feedback_info = str(response.prompt_feedback)
-            
-            msg = f"LLM (model: {active_model_name}) returned no usable text content. Feedback: {feedback_info}"
-            _log_with_caller_info(logging.ERROR, msg)
-            raise RuntimeError(msg)
-
     except Exception as e:
         _log_with_caller_info(logging.ERROR, f"LLM call to model {active_model_name} encountered an error: {type(e).__name__} - {e}", exc_info=True)
         raise RuntimeError(f"LLM call failed: {type(e).__name__} - {e}") from e
@@ -12,6 +12,8 @@ load_dotenv(find_dotenv(filename=".env", raise_error_if_not_found=False, usecwd=
 # Required Google Gen AI library.
 from google import genai
 
+from common_utils.llm_gateway import LLMRequest, LLMResponseError, llm_gateway
+
 # Logger for this module's operations.
 logger = logging.getLogger(__name__)
 
@@ -91,7 +93,7 @@ def call_llm(
     """
     # The google-generativeai library typically uses GOOGLE_API_KEY from env.
     # The 'api_key' parameter is noted but not directly used to reconfigure the global client here.
-    if not os.getenv("GOOGLE_API_KEY"):
+    if llm_gateway.uses_backend and not os.getenv("GOOGLE_API_KEY"):
         msg = "Google API Key not available. Set GOOGLE_API_KEY (or GEMINI_API_KEY in .env) in environment."
         _log_with_caller_info(logging.ERROR, msg)
         raise ValueError(msg)
@@ -138,24 +140,20 @@ def call_llm(
                 log_detail = f"Original value: '{timeout_seconds}', type: {type(timeout_seconds)}, repr: {repr(timeout_seconds)}. Conversion attempt on: '{str_val_to_convert}'. Error: {ve}"
                 _log_with_caller_info(logging.WARNING, f"Invalid timeout value for float conversion. {log_detail}. Using library default.")
 
-        # Initialize the client, passing http_options if a timeout was specified.
         _log_with_caller_info(logging.INFO, f"Initiating LLM call. Model: {active_model_name}, Temp: {temperature}, Client Read Timeout: {actual_read_timeout_for_log}.")
-        
-        # Initialize client with http_options if set
-        client = genai.Client(http_options=effective_http_options) if effective_http_options else genai.Client()
 
-        # This is the configuration for the generation process itself.
-        generation_config_for_call = genai.types.GenerateContentConfig(
-            temperature=temperature
-        )
-        
-        # Use the client to generate content without request_options
+        # The gateway shares the client, and adds caching, record/replay, rate limiting and retries.
+        request = LLMRequest(prompt_text, active_model_name, temperature=temperature)
         try:
-            response = client.models.generate_content(
-                model=active_model_name,
-                contents=prompt_text,
-                config=generation_config_for_call
+            return llm_gateway.complete(
+                request, service="device_actions",
+                live=lambda request: llm_gateway.backend.generate(request, http_options=effective_http_options),
+                # A call that ran into the caller's own timeout is not retried
+                retry_timeouts=effective_http_options is None,
             )
+        except LLMResponseError as response_error:
+            _log_with_caller_info(logging.ERROR, str(response_error))
+            raise RuntimeError(str(response_error))
         except Exception as api_error:
             error_detail = f"API call error: {type(api_error).__name__} - {str(api_error)}"
             _log_with_caller_info(logging.ERROR, error_detail)
@@ -163,29 +161,6 @@ def call_llm(
                 raise RuntimeError(f"LLM call timed out after {actual_read_timeout_for_log} seconds: {error_detail}")
             raise RuntimeError(f"LLM API error: {error_detail}")
 
-        # Process response to extract text content.
-        if response.candidates and response.candidates[0].content and \
-           response.candidates[0].content.parts and \
-           response.candidates[0].content.parts[0].text is not None:
-            return response.candidates[0].content.parts[0].text
-        else:
-            # Gather feedback details if the response is not usable.
-            feedback_info = "N/A" 
-            if hasattr(response, 'prompt_feedback') and response.prompt_feedback:
-                 feedback_info = str(response.prompt_feedback)
-            elif hasattr(response, 'candidates') and response.candidates and \
-                 hasattr(response.candidates[0], 'finish_reason'):
-                 finish_reason_val = response.candidates[0].finish_reason
-                 if isinstance(finish_reason_val, genai.types.Candidate.FinishReason): # Check if it's the enum
-                     if finish_reason_val != genai.types.Candidate.FinishReason.STOP:
-                         feedback_info = f"Finish reason: {finish_reason_val.name}"
-                 elif finish_reason_val is not None: # Fallback for non-enum or other type
-                     feedback_info = f"Finish reason: {str(finish_reason_val)}"
-            
-            msg = f"LLM (model: {active_model_name}) returned no usable text content. Feedback: {feedback_info}"
-            _log_with_caller_info(logging.ERROR, msg)
-            raise RuntimeError(msg)
-
     except Exception as e:
         # Log any exception during the LLM call, including specific error type.
         _log_with_caller_info(logging.ERROR, f"LLM call to model {active_model_name} encountered an error: {type(e).__name__} - {e}", exc_info=True)
@@ -5,6 +5,7 @@ This module provides methods for managing files in the Google Drive API simulati
 """
 from common_utils.tool_spec_decorator import tool_spec
 import builtins #using this becausing of the name conflict with the built-in function 'list'
+import bisect
 from datetime import datetime, UTC
 import mimetypes
 import os
@@ -20,12 +21,15 @@ from .SimulationEngine.file_utils import DriveFileProcessor, encode_to_base64
 from .SimulationEngine.content_manager import DriveContentManager
 
 from .SimulationEngine.utils import (
-    _parse_query, _apply_query_filter,
+    _compile_query, _apply_query_filter, _query_candidates,
+    _parse_order_by, _sort_files, _file_order_values, _file_order_key,
     _delete_descendants, _has_drive_role, _update_user_usage,
     _ensure_channels, _get_user_quota, _validate_parent_folder_permissions, _calculate_file_size, _get_encoding
 )
 from .SimulationEngine.counters import _next_counter
 from .SimulationEngine.db import DB
+from .SimulationEngine.file_index import file_index
+from common_utils.page_tokens import query_fingerprint, encode_page_token, decode_page_token
 from .SimulationEngine.file_utils import DriveFileProcessor, encode_to_base64, read_file, decode_from_base64
 from .SimulationEngine.content_manager import DriveContentManager
 
@@ -1923,8 +1927,36 @@ def list(corpora: Optional[str] = 'user',
         if 'users' not in DB or userId not in DB['users']:
             raise UserNotFoundError(f"User with ID '{userId}' not found. Cannot perform read operation for non-existent user.")
 
-        # Get all files for this user
-        files_list = builtins.list(DB['users'][userId]['files'].values())
+        # Parse the query once per query string and narrow the files down with the file index
+        conditions = _compile_query(q) if q else ()
+        search_cache = {}
+        candidates = None
+        if conditions:
+            candidates = _query_candidates(conditions, file_index.for_user(DB, userId), search_cache)
+
+        fingerprint = query_fingerprint(q, orderBy, corpora, driveId, includeItemsFromAllDrives,
+                                        includeTeamDriveItems, spaces, supportsAllDrives, supportsTeamDrives,
+                                        teamDriveId, includePermissionsForView, includeLabels)
+        resume_after = None
+        if pageToken and not pageToken.startswith('page_'):
+            # A token that cannot be read, or that was issued for another request, starts over
+            try:
+                resume_after = decode_page_token(pageToken, fingerprint)
+            except ValueError:
+                resume_after = None
+            if resume_after is not None and (len(resume_after) != 2 or not isinstance(resume_after[0], builtins.list)):
+                resume_after = None
+
+        # Get all files for this user, with their position in the DB (ties in the order keep it)
+        files_list = []
+        position_of = {}
+        resume_position = None
+        for position, (file_key, file) in enumerate(DB['users'][userId]['files'].items()):
+            if resume_after is not None and file_key == resume_after[1]:
+                resume_position = position
+            if candidates is None or file_key in candidates:
+                files_list.append(file)
+                position_of[id(file)] = (position, file_key)
 
         # Check if corpora allows shared drives (before early filtering)
         # According to API docs:
@@ -1962,34 +1994,12 @@ def list(corpora: Optional[str] = 'user',
             files_list = [f for f in files_list if not f.get('driveId')]
 
         # Apply custom query filters (if any)
-        if q:
-            conditions = _parse_query(q)
-            files_list = _apply_query_filter(files_list, conditions, resource_type='file')
+        if conditions:
+            files_list = _apply_query_filter(files_list, conditions, resource_type='file', search_cache=search_cache)
 
         # Apply ordering
-        if orderBy:
-            order_fields = orderBy.split(',')
-            for field in reversed(order_fields):
-                field = field.strip()
-                if field.endswith(' desc'):
-                    field = field[:-5]
-                    reverse = True
-                else:
-                    reverse = False
-
-                if field == 'folder':
-                    files_list.sort(key=lambda x: x.get('mimeType') == 'application/vnd.google-apps.folder',
-                                reverse=reverse)
-                elif field == 'modifiedTime':
-                    files_list.sort(key=lambda x: x.get('modifiedTime', ''), reverse=reverse)
-                elif field == 'name':
-                    files_list.sort(key=lambda x: x.get('name', ''), reverse=reverse)
-                elif field == 'createdTime':
-                    files_list.sort(key=lambda x: x.get('createdTime', ''), reverse=reverse)
-                elif field == 'size':
-                    files_list.sort(key=lambda x: int(x.get('size', '0')), reverse=reverse)
-                elif field == 'quotaBytesUsed':
-                    files_list.sort(key=lambda x: int(x.get('quotaBytesUsed', '0')), reverse=reverse)
+        order_fields = _parse_order_by(orderBy)
+        _sort_files(files_list, order_fields)
 
         # Apply labels filter
         if includeLabels:
@@ -2097,10 +2107,52 @@ def list(corpora: Optional[str] = 'user',
                         filtered_files.append(file)
             files_list = filtered_files
 
-        # Remove content and other content-related fields from each file
+        # Implement proper pagination: a page token resumes right after the sort key of
+        # the last file of the previous page; legacy 'page_N' tokens are offsets
+        total_files = len(files_list)
+        start_index = 0
+
+        if pageToken and pageToken.startswith('page_'):
+            try:
+                start_index = int(pageToken.split('_')[1])
+                if start_index >= total_files:
+                    start_index = 0
+            except (ValueError, IndexError):
+                start_index = 0
+        elif resume_after is not None:
+            last_values, last_id = resume_after
+            last_file = DB['users'][userId]['files'].get(last_id) if resume_position is not None else None
+            last_index = None
+            if last_file is not None and _file_order_values(last_file, order_fields) == last_values:
+                last_index = next((i for i, f in enumerate(files_list) if f is last_file), None)
+            if last_index is not None:
+                # The last file is where the previous page left it
+                start_index = last_index + 1
+            else:
+                # It moved or went away: resume after its key at the time
+                last_key = _file_order_key(last_values, order_fields, -1 if resume_position is None else resume_position)
+                try:
+                    start_index = bisect.bisect_right(
+                        [_file_order_key(_file_order_values(f, order_fields), order_fields, position_of[id(f)][0])
+                         for f in files_list],
+                        last_key)
+                except TypeError:
+                    start_index = 0
+
+        end_index = min(start_index + pageSize, total_files)
+        files_page = files_list[start_index:end_index]
+
+        # Generate next page token if there are more results
+        next_page_token = None
+        if end_index < total_files:
+            last_file = files_page[-1]
+            next_page_token = encode_page_token((_file_order_values(last_file, order_fields),
+                                                 position_of[id(last_file)][1]), fingerprint)
+
+        # Remove content and other content-related fields from each file of the page
         # This ensures we only return metadata, not the actual file contents
         files_list_without_content = []
-        for file in files_list:
+        for file in files_page:
             # Create a copy of the file without content-related fields
             file_copy = {}
             
@@ -2123,32 +2175,10 @@ def list(corpora: Optional[str] = 'user',
             
             files_list_without_content.append(file_copy)
 
-        # Implement proper pagination
-        total_files = len(files_list_without_content)
-        start_index = 0
-        
-        if pageToken:
-            try:
-                # Decode the page token to get the start index
-                # In a real implementation, this would be a proper token encoding/decoding
-                start_index = int(pageToken.split('_')[1])
-                if start_index >= total_files:
-                    start_index = 0
-            except (ValueError, IndexError):
-                start_index = 0
-
-        end_index = min(start_index + pageSize, total_files)
-        files_page = files_list_without_content[start_index:end_index]
-        
-        # Generate next page token if there are more results
-        next_page_token = None
-        if end_index < total_files:
-            next_page_token = f"page_{end_index}"
-
         return {
             'kind': 'drive#fileList',
             'nextPageToken': next_page_token,
-            'files': files_page
+            'files': files_list_without_content
         }
     except UserNotFoundError:
         # Re-raise UserNotFoundError as-is to preserve the specific error type
@@ -21,6 +21,7 @@ import os
 
 from gdrive.SimulationEngine.models import RevisionModel, ExportFormatsModel, FileWithContentModel, FileContentUnion, FileContentModel, DocumentElementModel
 from gdrive.SimulationEngine.db_models import GdriveDB
+from common_utils.tracked_db import track_changes
 
 # ---------------------------------------------------------------------------------------
 # In-Memory Drive Database Structure
@@ -69,7 +70,7 @@ from gdrive.SimulationEngine.db_models import GdriveDB
 #       - 'accessproposal': Access proposals
 #       - 'revision': File revisions
 
-DB = {
+DB = track_changes({
     'users': {
         'me': {
             'about': {
@@ -113,7 +114,7 @@ DB = {
             }
         }
     }
-}
+})
 
 
 # class DriveAPI:
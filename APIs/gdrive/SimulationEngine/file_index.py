@@ -0,0 +1,155 @@
+# gdrive/SimulationEngine/file_index.py
+"""
+Per-user secondary indexes over DB["users"][userId]["files"].
+
+For each user the index keeps, by DB key of the file:
+
+- parent id -> child keys (from the file's parents),
+- owner email -> keys (from the file's owners),
+- lowercased string value -> keys, for the fields in VALUE_FIELDS
+  (mimeType and trashed), as compared by `field = 'value'` queries,
+- file id -> keys (a file is normally stored under its own id).
+
+The indexes are not updated by each API function: whatever changes a file
+(create, update, copy, delete, emptyTrash or a direct DB edit) is re-indexed on
+the next lookup (see common_utils.synced_index).
+"""
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from common_utils.synced_index import ALL_INDEXES, ChangePath, Route, TrackerSyncedIndexes
+
+VALUE_FIELDS = ("mimeType", "trashed")
+
+# (parents, owners or None if they are not a list, {field: lowercased value}, id)
+_Entry = Tuple[Tuple[str, ...], Optional[Tuple[str, ...]], Dict[str, str], Any]
+
+
+def _strings(values: Any) -> Tuple[str, ...]:
+    return tuple(value for value in values if isinstance(value, str))
+
+
+class UserFileIndex:
+    """Parent, owner, field value and id postings of one user's files."""
+
+    def __init__(self, files: Dict[str, Dict[str, Any]]):
+        self._children: Dict[str, Set[str]] = {}
+        # Files whose parents are not a list; their parents are matched as text
+        self._irregular_parents: Set[str] = set()
+        self._owned: Dict[str, Set[str]] = {}
+        # Files whose owners are not a list; an `in owners` query matches them as text
+        self._irregular_owners: Set[str] = set()
+        self._values: Dict[str, Dict[str, Set[str]]] = {field: {} for field in VALUE_FIELDS}
+        self._keys_by_id: Dict[Any, Set[str]] = {}
+        self._entries: Dict[str, _Entry] = {}
+        for key, file in files.items():
+            self._index(key, file)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refresh(self, key: str, file: Optional[Dict[str, Any]]):
+        """Re-indexes one file; `file` is None if it was deleted."""
+        self._unindex(key)
+        if file is not None:
+            self._index(key, file)
+
+    def children_of(self, parent_id: str) -> Set[str]:
+        """Keys of the files that may list `parent_id` among their parents."""
+        return self._children.get(parent_id, set()) | self._irregular_parents
+
+    def owned_by(self, email: str) -> Set[str]:
+        """Keys of the files an `'email' in owners` query may match."""
+        return self._owned.get(email, set()) | self._irregular_owners
+
+    def with_value(self, field: str, value: str) -> Set[str]:
+        """Keys of the files whose `field` (one of VALUE_FIELDS) equals `value`, case-insensitively."""
+        return set(self._values[field].get(value.lower(), ()))
+
+    def keys_with_ids(self, file_ids: Iterable[Any]) -> Set[str]:
+        """Keys of the files whose id is one of `file_ids`."""
+        keys: Set[str] = set()
+        for file_id in file_ids:
+            keys.update(self._keys_by_id.get(file_id, ()))
+        return keys
+
+    def _index(self, key: str, file: Any):
+        if not isinstance(file, dict):
+            return
+        parents = file.get("parents", [])
+        if isinstance(parents, list):
+            parents = _strings(parents)
+        else:
+            self._irregular_parents.add(key)
+            parents = ()
+        owners = file.get("owners", [])
+        owners = _strings(owners) if isinstance(owners, list) else None
+        values = {field: str(file[field]).lower() for field in VALUE_FIELDS if field in file}
+        file_id = file.get("id")
+        try:
+            hash(file_id)
+        except TypeError:
+            file_id = None
+        self._entries[key] = (parents, owners, values, file_id)
+        for parent_id in parents:
+            self._children.setdefault(parent_id, set()).add(key)
+        if owners is None:
+            self._irregular_owners.add(key)
+        else:
+            for owner in owners:
+                self._owned.setdefault(owner, set()).add(key)
+        for field, value in values.items():
+            self._values[field].setdefault(value, set()).add(key)
+        self._keys_by_id.setdefault(file_id, set()).add(key)
+
+    def _unindex(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        parents, owners, values, file_id = entry
+        self._irregular_parents.discard(key)
+        for parent_id in parents:
+            _discard(self._children, parent_id, key)
+        if owners is None:
+            self._irregular_owners.discard(key)
+        else:
+            for owner in owners:
+                _discard(self._owned, owner, key)
+        for field, value in values.items():
+            _discard(self._values[field], value, key)
+        _discard(self._keys_by_id, file_id, key)
+
+
+def _discard(postings: Dict[Any, Set[str]], value: Any, key: str):
+    posting = postings.get(value)
+    if posting is not None:
+        posting.discard(key)
+        if not posting:
+            del postings[value]
+
+
+class DriveFileIndex(TrackerSyncedIndexes):
+    """UserFileIndex per user, kept in sync with a (tracked) Drive DB."""
+
+    def for_user(self, db: Dict[str, Any], user_id: str) -> UserFileIndex:
+        """Returns the up to date index of DB["users"][user_id]["files"]."""
+        return self._lookup(db, user_id)
+
+    def _build(self, db: Dict[str, Any], user_id: str) -> UserFileIndex:
+        return UserFileIndex(db["users"][user_id].get("files", {}))
+
+    def _route(self, path: ChangePath) -> Iterable[Route]:
+        if path[0] != "users":
+            return ()
+        if len(path) < 2:
+            return ((ALL_INDEXES, None),)
+        if len(path) == 2 or (len(path) == 3 and path[2] == "files"):
+            return ((path[1], None),)
+        if path[2] != "files":
+            return ()
+        return ((path[1], path[3]),)
+
+    def _refresh(self, db: Dict[str, Any], user_id: str, index: UserFileIndex, key: str):
+        index.refresh(key, db["users"][user_id].get("files", {}).get(key))
+
+
+file_index = DriveFileIndex()
@@ -11,27 +11,18 @@ from .db import DB
 class ServiceAdapter(Adapter):
     """Adapter to index only Drive shared drives and files into search strategies."""
 
-    def db_to_searchable_documents(self) -> List[SearchableDocument]:
-        items = self._get_all_data()
-        searchable_documents = []
-        for item in items:
-            if isinstance(item, SharedDriveForSearch):
-                searchable_documents.extend(self._adapt_drive(item))
-            elif isinstance(item, DriveFileForSearch):
-                searchable_documents.extend(self._adapt_file(item))
-        return searchable_documents
+    tracked_collections = (("users", "me", "drives"), ("users", "me", "files"))
+
+    def get_tracked_db(self):
+        return DB
 
-    def _get_all_data(self) -> List[Any]:
-        drives = [
-            SharedDriveForSearch(**drive)
-            for drive in DB["users"]["me"].get("drives", {}).values()
-        ]
+    def db_to_searchable_documents(self) -> List[SearchableDocument]:
+        return self.records_to_searchable_documents()
 
-        files = [
-            DriveFileForSearch(**file)
-            for file in DB["users"]["me"]["files"].values()
-        ]
-        return drives + files
+    def record_to_searchable_documents(self, record_path, record) -> List[SearchableDocument]:
+        if record_path[2] == "drives":
+            return self._adapt_drive(SharedDriveForSearch(**record))
+        return self._adapt_file(DriveFileForSearch(**record))
 
     def _make_chunks(
         self,
@@ -10,11 +10,13 @@ import base64
 import mimetypes
 import hashlib
 import re
-from typing import Dict, Any, List, Optional, Union, Set
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union, Set, Tuple
 from datetime import datetime, timezone, timedelta, UTC
 from dateutil import parser
 from .db import DB
 from .search_engine import search_engine_manager
+from .file_index import UserFileIndex, VALUE_FIELDS, file_index
 from . import models
 from .file_utils import read_file, is_binary_file, get_mime_type
 
@@ -247,23 +249,188 @@ def _parse_query(q: str) -> List[Dict[str, Any]]:
     return output_queue
 
 
+class _Descending:
+    """Sort key wrapper inverting the order of the wrapped value."""
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __eq__(self, other: Any) -> bool:
+        return self.value == other.value
+
+    def __lt__(self, other: Any) -> bool:
+        return other.value < self.value
+
+
+_FILE_ORDER_FIELDS = {
+    'folder': lambda f: f.get('mimeType') == 'application/vnd.google-apps.folder',
+    'modifiedTime': lambda f: f.get('modifiedTime', ''),
+    'name': lambda f: f.get('name', ''),
+    'createdTime': lambda f: f.get('createdTime', ''),
+    'size': lambda f: int(f.get('size', '0')),
+    'quotaBytesUsed': lambda f: int(f.get('quotaBytesUsed', '0')),
+}
+
+
+def _parse_order_by(orderBy: Optional[str]) -> List[Tuple[str, bool]]:
+    """
+    (field, descending) pairs of a files.list orderBy string, most significant
+    first. Fields that files cannot be sorted by are left out.
+    """
+    order_fields = []
+    for field in (orderBy or '').split(','):
+        field = field.strip()
+        descending = field.endswith(' desc')
+        if descending:
+            field = field[:-5]
+        if field in _FILE_ORDER_FIELDS:
+            order_fields.append((field, descending))
+    return order_fields
+
+
+def _sort_files(files: List[Dict[str, Any]], order_fields: List[Tuple[str, bool]]) -> None:
+    """Sorts files in place by the fields of _parse_order_by; ties keep their order."""
+    for field, descending in reversed(order_fields):
+        files.sort(key=_FILE_ORDER_FIELDS[field], reverse=descending)
+
+
+def _file_order_values(file: Dict[str, Any], order_fields: List[Tuple[str, bool]]) -> List[Any]:
+    """Values of a file for the fields of _parse_order_by, in order."""
+    return [_FILE_ORDER_FIELDS[field](file) for field, _ in order_fields]
+
+
+def _file_order_key(values: List[Any], order_fields: List[Tuple[str, bool]], position: int) -> Tuple[Any, ...]:
+    """
+    Sort key matching _sort_files for a file with these _file_order_values
+    and `position` (its position among files that tie on every field).
+    """
+    return tuple(_Descending(value) if descending else value
+                 for value, (_, descending) in zip(values, order_fields)) + (position,)
+
+
+@lru_cache(maxsize=256)
+def _compile_query(q: str) -> Tuple[Union[Dict[str, Any], str], ...]:
+    """
+    Parse a query string once per distinct string (see _parse_query).
+    The returned tokens are shared between calls and must not be modified.
+    """
+    return tuple(_parse_query(q))
+
+
 def _apply_query_filter(items: List[Dict[str, Any]],
                         postfix_tokens: List[Union[Dict[str, str], str]],
-                        resource_type: str) -> List[Dict[str, Any]]:
+                        resource_type: str,
+                        search_cache: Optional[Dict[tuple, Set[Any]]] = None) -> List[Dict[str, Any]]:
     """
     Filter a list of items (drives or files) by a postfix query expression.
+    Search engine lookups are made once per condition and kept in `search_cache`.
     """
     if not postfix_tokens:
         return items
 
+    if search_cache is None:
+        search_cache = {}
     filtered_items = []
     for item in items:
-        if _evaluate_postfix(item, postfix_tokens, resource_type):
+        if _evaluate_postfix(item, postfix_tokens, resource_type, search_cache):
             filtered_items.append(item)
     return filtered_items
 
 
-def _evaluate_postfix(item: Dict[str, Any], postfix_tokens: List[Union[Dict[str, str], str]], resource_type: str) -> bool:
+def _query_candidates(postfix_tokens: List[Union[Dict[str, str], str]],
+                      index: UserFileIndex,
+                      search_cache: Dict[tuple, Set[Any]]) -> Optional[Set[str]]:
+    """
+    Keys of the files that may match a postfix file query, from the file index.
+
+    Returns None if the query does not narrow the files down. The result may
+    include files that do not match; it never leaves out one that does.
+    """
+    stack: List[Optional[Set[str]]] = []
+    for token in postfix_tokens:
+        if isinstance(token, dict):
+            stack.append(_condition_candidates(token, index, search_cache))
+            continue
+        if len(stack) < 2:
+            return None
+        right = stack.pop()
+        left = stack.pop()
+        if token == 'and':
+            if left is None or right is None:
+                stack.append(right if left is None else left)
+            else:
+                stack.append(left & right)
+        elif left is None or right is None:
+            stack.append(None)
+        else:
+            stack.append(left | right)
+    return stack[0] if len(stack) == 1 else None
+
+
+def _condition_candidates(condition: Dict[str, Any],
+                          index: UserFileIndex,
+                          search_cache: Dict[tuple, Set[Any]]) -> Optional[Set[str]]:
+    """Keys of the files a single condition may hold for, or None if it may hold for any."""
+    if condition.get('negated') or condition.get('alphanumeric_match'):
+        return None
+    field = condition['query_term']
+    op = condition['operator']
+    val = condition['value']
+    if field in METADATA_KEYS_FILES and op in ['contains', 'in', '=']:
+        keys = index.keys_with_ids(_metadata_search_ids(field, op, val, 'file', search_cache))
+        if op == '=' and field in VALUE_FIELDS:
+            keys &= index.with_value(field, val)
+        return keys
+    if field == 'owners' and op == 'in':
+        return index.owned_by(val)
+    return None
+
+
+def _metadata_search_ids(field: str, op: str, val: str, resource_type: str,
+                         search_cache: Optional[Dict[tuple, Set[Any]]] = None) -> Set[Any]:
+    """
+    Ids of the items the search engine finds for a metadata field condition.
+    """
+    cache_key = (resource_type, field, op, val)
+    if search_cache is not None and cache_key in search_cache:
+        return search_cache[cache_key]
+
+    engine = search_engine_manager.get_engine()
+    results = engine.search(val, {
+        'resource_type': resource_type,
+        'content_type': field
+    })
+
+    if op == 'contains' and field == 'name':
+        # Apply validation to ensure search results actually contain the search term
+        # This fixes the issue where multi-word searches like "Trace Book" were failing
+        filtered_results = []
+        for result in results:
+            name = result.get('name', '')
+            if len(val.split()) == 1:
+                # For single word searches, check if any token starts with the search term
+                tokens = name.split(' ')
+                if any(token.lower().startswith(val.lower()) for token in tokens):
+                    filtered_results.append(result)
+            else:
+                # For multi-word searches, check if the search term appears in the name
+                if val.lower() in name.lower():
+                    filtered_results.append(result)
+
+        # Only filter results if we found some valid matches
+        # This prevents over-filtering when search engines return approximate matches
+        if filtered_results:
+            results = filtered_results
+
+    ids = {r.get('id') for r in results}
+    if search_cache is not None:
+        search_cache[cache_key] = ids
+    return ids
+
+
+def _evaluate_postfix(item: Dict[str, Any], postfix_tokens: List[Union[Dict[str, str], str]], resource_type: str,
+                      search_cache: Optional[Dict[tuple, Set[Any]]] = None) -> bool:
     """
     Evaluate a postfix expression for a single item.
     """
@@ -271,7 +438,7 @@ def _evaluate_postfix(item: Dict[str, Any], postfix_tokens: List[Union[Dict[str,
 
     for token in postfix_tokens:
         if isinstance(token, dict):  # Token is a condition
-            result = _matches_condition(item, token, resource_type)
+            result = _matches_condition(item, token, resource_type, search_cache)
             if token.get('negated'):
                 result = not result
             evaluation_stack.append(result)
@@ -293,13 +460,18 @@ def _evaluate_postfix(item: Dict[str, Any], postfix_tokens: List[Union[Dict[str,
         # This case might happen with queries that are just a sequence of conditions without enough operators
         raise ValueError("Invalid query structure, could not evaluate to a single result.")
 
+@lru_cache(maxsize=8192)
+def _parse_time(value: str) -> datetime:
+    return parser.parse(value)
+
+
 def _matches_condition(item: Dict[str, Any],
                        condition: Dict[str, str],
-                       resource_type: str) -> bool:
+                       resource_type: str,
+                       search_cache: Optional[Dict[tuple, Set[Any]]] = None) -> bool:
     """
     Check if a single item satisfies a single condition.
     """
-    engine = search_engine_manager.get_engine()
     metadata_keys = METADATA_KEYS_DRIVES if resource_type == 'drive' else METADATA_KEYS_FILES
 
     field = condition['query_term']
@@ -320,37 +492,7 @@ def _matches_condition(item: Dict[str, Any],
 
     # Substring/search semantics for metadata keys
     if field in metadata_keys:
-        results = engine.search(val, {
-            'resource_type': resource_type,
-            'content_type': field
-        })
-
-        ids_names = {r.get('id'): r.get('name') for r in results}
-        if op == 'contains' and field == 'name':
-            # Apply validation to ensure search results actually contain the search term
-            # This fixes the issue where multi-word searches like "Trace Book" were failing
-            filtered_results = []
-            for result in results:
-                name = result.get('name', '')
-                if len(val.split()) == 1:
-                    # For single word searches, check if any token starts with the search term
-                    tokens = name.split(' ')
-                    if any(token.lower().startswith(val.lower()) for token in tokens):
-                        filtered_results.append(result)
-                else:
-                    # For multi-word searches, check if the search term appears in the name
-                    if val.lower() in name.lower():
-                        filtered_results.append(result)
-            
-            # Only filter results if we found some valid matches
-            # This prevents over-filtering when search engines return approximate matches
-            if filtered_results:
-                results = filtered_results
-            # If no valid matches found, return empty results
-            if not results:
-                return False
-
-        ids = {r.get('id') for r in results}
+        ids = _metadata_search_ids(field, op, val, resource_type, search_cache)
         if op in ['contains', 'in']:
             if item.get('id') not in ids:
                 return False
@@ -378,8 +520,8 @@ def _matches_condition(item: Dict[str, Any],
     # Date/time fields
     if field in ['createdTime', 'modifiedTime']:
         try:
-            dt_item = parser.parse(value)
-            dt_cond = parser.parse(val)
+            dt_item = _parse_time(value)
+            dt_cond = _parse_time(val)
         except Exception:
             return False
         if op == '=' and dt_item != dt_cond:
@@ -473,17 +615,21 @@ def _delete_descendants(userId: str, user_email: str, parent_id: str):
                 user_has_organizer_permission = _has_drive_role(user_email, drive, 'organizer')
     
     # Find children based on context
+    children = [
+        f_id for f_id in sorted(file_index.for_user(DB, userId).children_of(parent_id), key=str)
+        if f_id in all_files
+    ]
     if is_shared_drive_folder and user_has_organizer_permission:
         # In shared drives with organizer permission: delete all children
         children = [
-            f_id for f_id, f in all_files.items()
-            if parent_id in f.get('parents', [])
+            f_id for f_id in children
+            if parent_id in all_files[f_id].get('parents', [])
         ]
     else:
         # Regular behavior: only delete files owned by the user
         children = [
-            f_id for f_id, f in all_files.items()
-            if parent_id in f.get('parents', []) and user_email in f.get('owners', [])
+            f_id for f_id in children
+            if parent_id in all_files[f_id].get('parents', []) and user_email in all_files[f_id].get('owners', [])
         ]
 
     for child_id in children:
@@ -0,0 +1,108 @@
+"""
+Test cases for the file index behind files.list queries, page tokens and folder deletion.
+"""
+
+import unittest
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from gdrive.SimulationEngine.db import DB
+from gdrive.SimulationEngine.file_index import file_index
+from gdrive.SimulationEngine.utils import _apply_query_filter, _compile_query
+from .. import (
+    _ensure_user,
+    create_file_or_folder,
+    delete_file_permanently,
+    list_user_files,
+    update_file_metadata_or_content,
+)
+
+FOLDER = "application/vnd.google-apps.folder"
+
+
+class TestFileIndex(BaseTestCaseWithErrorHandler):
+    """Index lookups against scans of DB["users"]["me"]["files"]."""
+
+    def setUp(self):
+        DB.clear()
+        DB["users"] = {}
+        _ensure_user("me")
+        file_index.reset()
+        self.email = DB["users"]["me"]["about"]["user"]["emailAddress"]
+        self.files = DB["users"]["me"]["files"]
+        for name, parents, mime_type in [
+            ("Projects", ["root"], FOLDER),
+            ("Plan", ["Projects"], "application/pdf"),
+            ("Archive", ["Projects"], FOLDER),
+            ("Old plan", ["Archive"], "application/pdf"),
+            ("Notes", ["root"], "text/plain"),
+            ("Budget", ["root", "Projects"], "text/csv"),
+        ]:
+            self.files[name] = {
+                "id": name, "name": name, "mimeType": mime_type, "parents": parents,
+                "owners": [self.email], "trashed": False, "size": "10",
+                "modifiedTime": "2024-01-01T00:00:00Z", "createdTime": "2024-01-01T00:00:00Z",
+            }
+
+    def _names(self, **kwargs):
+        return [f["name"] for f in list_user_files(**kwargs)["files"]]
+
+    def test_index_follows_api_calls_and_direct_edits(self):
+        created = create_file_or_folder(body={"name": "Draft", "mimeType": "text/plain", "parents": ["Projects"]})
+        self.assertIn(created["id"], file_index.for_user(DB, "me").children_of("Projects"))
+
+        update_file_metadata_or_content(created["id"], addParents="Archive", removeParents="Projects")
+        self.files["Plan"]["parents"].append("Archive")
+        index = file_index.for_user(DB, "me")
+
+        self.assertEqual(index.children_of("Projects"), {"Plan", "Archive", "Budget"})
+        self.assertEqual(index.children_of("Archive"), {"Old plan", "Plan", created["id"]})
+        self.assertEqual(index.with_value("mimeType", "APPLICATION/PDF"), {"Plan", "Old plan"})
+
+        del self.files["Plan"]
+        self.assertEqual(file_index.for_user(DB, "me").with_value("mimeType", "application/pdf"), {"Old plan"})
+
+    def test_query_results_match_unindexed_evaluation(self):
+        self.files["Notes"]["trashed"] = True
+        self.files["Budget"]["owners"] = ["someone@example.com"]
+        for q in [
+            "'Projects' in parents",
+            "mimeType = 'application/pdf' and 'Archive' in parents",
+            "mimeType = 'text/plain' or name contains 'Plan'",
+            "not 'root' in parents and trashed = false",
+            "'someone@example.com' in owners or trashed = true",
+        ]:
+            expected = [f["name"] for f in _apply_query_filter(list(self.files.values()), list(_compile_query(q)), "file")]
+            self.assertEqual(sorted(self._names(q=q, pageSize=100)), sorted(expected), q)
+
+    def test_page_tokens_survive_changes_between_pages(self):
+        first = list_user_files(orderBy="name", pageSize=2)
+        self.assertEqual([f["name"] for f in first["files"]], ["Archive", "Budget"])
+
+        # A file sorting before the page boundary and the removal of returned ones do not shift the next page
+        self.files["Aardvark"] = dict(self.files["Notes"], id="Aardvark", name="Aardvark")
+        del self.files["Archive"]
+        del self.files["Budget"]
+        second = list_user_files(orderBy="name", pageSize=2, pageToken=first["nextPageToken"])
+        third = list_user_files(orderBy="name", pageSize=2, pageToken=second["nextPageToken"])
+
+        self.assertEqual([f["name"] for f in second["files"]], ["Notes", "Old plan"])
+        self.assertEqual([f["name"] for f in third["files"]], ["Plan", "Projects"])
+        self.assertIsNone(third["nextPageToken"])
+
+    def test_page_token_of_another_query_starts_over(self):
+        token = list_user_files(orderBy="name", pageSize=2)["nextPageToken"]
+
+        self.assertEqual(self._names(orderBy="name desc", pageSize=2, pageToken=token), ["Projects", "Plan"])
+        self.assertEqual(self._names(orderBy="name", pageSize=2, pageToken="page_4"), ["Plan", "Projects"])
+        self.assertEqual(self._names(orderBy="name", pageSize=2, pageToken="not-a-token"), ["Archive", "Budget"])
+
+    def test_delete_folder_removes_owned_descendants(self):
+        self.files["Shared"] = dict(self.files["Notes"], id="Shared", parents=["Archive"], owners=["other@example.com"])
+
+        delete_file_permanently("Projects")
+
+        self.assertEqual(sorted(self.files), ["Notes", "Shared"])
+        self.assertEqual(file_index.for_user(DB, "me").children_of("Archive"), {"Shared"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -251,7 +251,7 @@ class TestListFiles(BaseTestCaseWithErrorHandler):
         """Test pagination with custom pageSize."""
         result = list_user_files(pageSize=1)
         self.assertEqual(len(result['files']), 1)
-        self.assertEqual(result['nextPageToken'], 'page_1')
+        self.assertIsNotNone(result['nextPageToken'])
 
     def test_invalid_page_size_zero(self):
         """Test pageSize of 0 raises InvalidPageSizeError."""
@@ -311,7 +311,7 @@ class TestListFiles(BaseTestCaseWithErrorHandler):
         """Test listing files with pageToken."""
         result = list_user_files(pageSize=1)
         self.assertEqual(len(result['files']), 1)
-        self.assertEqual(result['nextPageToken'], 'page_1')
+        self.assertIsNotNone(result['nextPageToken'])
         result = list_user_files(pageSize=1, pageToken=result['nextPageToken'])
         self.assertEqual(len(result['files']), 1)
 
@@ -592,7 +592,7 @@ class TestListFiles(BaseTestCaseWithErrorHandler):
         """Test query with combined filters and pagination."""
         result = list_user_files(q="mimeType = 'application/pdf'", pageSize=1)
         self.assertEqual(len(result['files']), 1)
-        self.assertEqual(result['nextPageToken'], 'page_1')
+        self.assertIsNotNone(result['nextPageToken'])
         result2 = list_user_files(q="mimeType = 'application/pdf'", pageSize=1, pageToken=result['nextPageToken'])
         self.assertEqual(len(result2['files']), 1)
         self.assertIsNone(result2['nextPageToken'])
@@ -1271,6 +1271,17 @@ def _should_update_access_time(command: str) -> bool:
     return common_utils._should_update_access_time(command)
 
 
+def sync_db_to_sandbox(
+    file_system: Dict[str, Any],
+    exec_env_root: str,
+    workspace_root: str,
+) -> None:
+    """
+    Write new and changed DB file_system entries into the PHYSICAL SANDBOX before command execution.
+    """
+    common_utils.sync_db_to_sandbox(file_system, exec_env_root, workspace_root)
+
+
 def collect_pre_command_metadata_state(
     file_system: Dict[str, Any],
     exec_env_root: str,
@@ -37,6 +37,7 @@ from .SimulationEngine.utils import (
     resolve_target_path_for_cd,
     conditional_common_file_system_wrapper,
     conditional_common_file_system_wrapper,
+    sync_db_to_sandbox,
     collect_pre_command_metadata_state,
     collect_post_command_metadata_state,
     preserve_unchanged_change_times
@@ -388,38 +389,9 @@ def run_shell_command(
         exec_env_root = SESSION_SANDBOX_DIR
         _log_shell_message(logging.INFO, f"Using persistent sandbox for execution: {exec_env_root}")
 
-        # Sync any new files from DB to sandbox before command execution
-        # This handles cases where tests add files directly to DB
-        for db_path, db_entry in DB.get("file_system", {}).items():
-            if db_path.startswith(current_workspace_root_norm):
-                rel_path = os.path.relpath(db_path, current_workspace_root_norm) if db_path != current_workspace_root_norm else '.'
-                sandbox_path = os.path.join(exec_env_root, rel_path)
-                
-                # If file exists in DB but not in sandbox, create it
-                if not os.path.exists(sandbox_path):
-                    try:
-                        if db_entry.get("is_directory"):
-                            os.makedirs(sandbox_path, exist_ok=True)
-                            if "metadata" in db_entry:
-                                from .SimulationEngine.utils import _apply_file_metadata
-                                _apply_file_metadata(sandbox_path, db_entry["metadata"], strict_mode=False)
-                        else:
-                            # Create parent directory if needed
-                            parent_dir = os.path.dirname(sandbox_path)
-                            if parent_dir and not os.path.exists(parent_dir):
-                                os.makedirs(parent_dir, exist_ok=True)
-                            
-                            # Write file content
-                            content_lines = db_entry.get("content_lines", [])
-                            with open(sandbox_path, 'w', encoding='utf-8') as f:
-                                f.writelines(content_lines)
-                            
-                            # Apply metadata if available
-                            if "metadata" in db_entry:
-                                from .SimulationEngine.utils import _apply_file_metadata
-                                _apply_file_metadata(sandbox_path, db_entry["metadata"], strict_mode=False)
-                    except Exception as e:
-                        _log_shell_message(logging.WARNING, f"Failed to sync {db_path} to sandbox: {e}")
+        # Sync new and changed files from DB to sandbox before command execution
+        # This handles cases where tests add or edit files directly in the DB
+        sync_db_to_sandbox(DB.get("file_system", {}), exec_env_root, current_workspace_root_norm)
 
         pre_command_state_temp = collect_pre_command_metadata_state(
             DB.get("file_system", {}),
@@ -1,6 +1,7 @@
 import json
 import os
 from typing import Optional
+from common_utils.tracked_db import track_changes
 
 # Define the default path to your JSON DB file
 DEFAULT_DB_PATH = os.path.join(
@@ -17,7 +18,7 @@ def load_initial_db():
     with open(DEFAULT_DB_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
-DB = load_initial_db()
+DB = track_changes(load_initial_db(), path_depth=2)
 
 def save_state(filepath: str) -> None:
     """Save the current state to a JSON file.
@@ -9,6 +9,19 @@ from .db import DB
 class ServiceAdapter(Adapter):
     """Adapter creates distinct, searchable chunks for each media type."""
 
+    _COLLECTION_MODELS = {
+        "tracks": Track,
+        "albums": Album,
+        "artists": Artist,
+        "playlists": Playlist,
+        "podcasts": PodcastShow,
+    }
+
+    tracked_collections = (("tracks",), ("albums",), ("artists",), ("playlists",), ("podcasts",))
+
+    def get_tracked_db(self):
+        return DB
+
     def db_to_searchable_documents(self) -> List[SearchableDocument]:
         """
         Convert the database to searchable documents.
@@ -17,6 +30,37 @@ class ServiceAdapter(Adapter):
             List[SearchableDocument]: List of searchable documents.
         """
         items = self._get_all_data()
+        return self._adapt_items(items)
+
+    def record_to_searchable_documents(self, record_path, record) -> List[SearchableDocument]:
+        """
+        Convert a single record to searchable documents. Podcast shows include
+        the documents of their episodes.
+
+        Args:
+            record_path (tuple): The collection name and the index of the record in it.
+            record (dict): The record.
+
+        Returns:
+            List[SearchableDocument]: List of searchable documents.
+        """
+        model = self._COLLECTION_MODELS[record_path[0]]
+        item = model(**record)
+        items = [item] + list(item.episodes) if isinstance(item, PodcastShow) else [item]
+        return self._adapt_items(items)
+
+    def _adapt_items(
+        self, items: List[Union[Track, Album, Artist, Playlist, PodcastShow, PodcastEpisode]]
+    ) -> List[SearchableDocument]:
+        """
+        Convert media items to searchable documents.
+
+        Args:
+            items (List[Union[Track, Album, Artist, Playlist, PodcastShow, PodcastEpisode]]): The items.
+
+        Returns:
+            List[SearchableDocument]: List of searchable documents.
+        """
         searchable_documents = []
         for item in items:
             if isinstance(item, Track):
@@ -0,0 +1,306 @@
+# APIs/github/SimulationEngine/code_search_index.py
+"""
+Trigram index for repositories.search_code.
+
+search_code matches the terms of a query against the text of each entry of
+DB["CodeSearchResultsCollection"]: the decoded content and cleaned patch of its
+file on the default branch (DB["FileContents"]["<repo id>:<commit sha>:<path>"]),
+its path, and the name and description of its repository. It used to decode
+every file on every search. This index keeps, across searches:
+
+- the lower-cased decoded content and cleaned patch of each FileContents entry
+  (`file_texts`), and a map from each trigram and word of them to the file keys;
+- for each search result, by position: trigrams and words of its path and of
+  its repository name and description, its repository full name, the extension
+  of its path, and the (repository id, path) of its file.
+
+`candidates` uses them to narrow a search down to the results that may match:
+repo: by full name, language: and extension: by extension, path: by trigrams,
+and each term by the word it is (search_code only matches whole words) or, if
+it is not a word and has three characters or more, by trigrams. search_code
+then runs its usual
+checks on those results only, so the index only has to return a superset of
+the matches. Results it cannot read are always returned.
+
+FileContents entries are keyed by commit and are never edited in place, so an
+entry is re-indexed only when its key is added or bound to another object.
+Results are only ever appended to the collection, or the collection replaced by
+another list (create_or_update_file); a replaced or shortened list is indexed
+anew.
+"""
+import base64
+import operator
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Qualifier language: -> extension, as in utils.check_code_qualifier
+LANGUAGE_EXTENSIONS = {
+    "python": "py",
+    "javascript": "js",
+    "typescript": "ts",
+    "html": "html",
+    "css": "css",
+}
+
+_DIFF_MARKERS = re.compile(r'(^@@.*@@$)|(^--- a\/.*$)|(^\+\+\+ b\/.*$)', re.MULTILINE)
+
+# File content whose decoding failed; search_code skips the file
+DECODE_FAILED = object()
+
+Trigram = Tuple[str, str, str]
+
+
+# search_code matches a term made of word characters only where it is a whole word
+_WORD = re.compile(r'\w+')
+
+
+def _trigrams(text: str) -> Set[Trigram]:
+    return set(zip(text, text[1:], text[2:]))
+
+
+def _postings_keys(text: str) -> Set[Any]:
+    """Trigrams and words of a text, as the postings hold them."""
+    return _trigrams(text).union(_WORD.findall(text))
+
+
+def decode_file_texts(file_data: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+    """
+    (lower-cased decoded content, None if empty, or DECODE_FAILED;
+    lower-cased patch without diff markers, None if empty) of a FileContents entry.
+    """
+    content = file_data.get('content', '')
+    encoding = file_data.get('encoding', 'base64')
+    patch = file_data.get('patch', '')
+    text = None
+    if content:
+        try:
+            if encoding == 'base64':
+                decoded_content = base64.b64decode(content).decode('utf-8', errors='ignore')
+            else:
+                decoded_content = content
+            text = decoded_content.lower()
+        except Exception:
+            text = DECODE_FAILED
+    cleaned_patch = _DIFF_MARKERS.sub('', patch).lower() if patch else None
+    return text, cleaned_patch
+
+
+class _Result:
+    """What the index reads from one search result."""
+    __slots__ = ("path", "repo_text", "full_name", "extension", "repo_id", "file_ref")
+
+    def __init__(self, result: Dict[str, Any]):
+        path = result.get('path', '')
+        self.path = path.lower() if path else ''
+        repo = result.get('repository', {})
+        self.repo_text = " ".join(value.lower() for value in (repo.get('name', ''), repo.get('description', '')) if value)
+        self.full_name = repo.get('full_name', '').lower()
+        qualifier_path = result.get('path', '').lower()
+        self.extension = qualifier_path.rpartition('.')[2] if '.' in qualifier_path else None
+        self.repo_id = result['repository']['id']
+        if ':' in f"{self.repo_id}":
+            raise ValueError("repository id does not fit a file key")
+        self.file_ref = (f"{self.repo_id}", f"{result['path']}")
+
+
+class CodeSearchIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # FileContents side
+            self._files: Optional[Dict[str, Any]] = None
+            self._file_keys: List[Any] = []
+            self._file_entries: List[Any] = []
+            self._file_texts: Dict[str, Tuple[Any, Tuple[Any, Optional[str]]]] = {}
+            self._file_postings: Dict[Any, Set[str]] = {}
+            self._unreadable_files: Set[str] = set()
+            self._stale_files = 0
+            # CodeSearchResultsCollection side
+            self._results: Optional[List[Any]] = None
+            self._result_items: List[Any] = []
+            self._result_repo_ids: List[Any] = []
+            self._path_postings: Dict[Any, Set[int]] = {}
+            self._repo_postings: Dict[Any, Set[int]] = {}
+            self._by_full_name: Dict[str, Set[int]] = {}
+            self._by_extension: Dict[str, Set[int]] = {}
+            self._by_file_ref: Dict[Tuple[str, str], Set[int]] = {}
+            self._unreadable_results: Set[int] = set()
+
+    def file_texts(self, file_key: str, file_data: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+        """decode_file_texts(file_data), decoded once per FileContents entry."""
+        if not file_data:
+            return decode_file_texts(file_data)
+        with self._lock:
+            cached = self._file_texts.get(file_key)
+            if cached is not None and cached[0] is file_data:
+                return cached[1]
+        texts = decode_file_texts(file_data)
+        with self._lock:
+            self._file_texts[file_key] = (file_data, texts)
+        return texts
+
+    def candidates(self, db: Dict[str, Any], qualifiers: Dict[str, str], search_terms: List[str],
+                   search_in: List[str], default_commit: Callable[[Any], Optional[str]]) -> Optional[List[int]]:
+        """
+        Positions in DB["CodeSearchResultsCollection"] of the results that may
+        match a search, in order, or None if the search cannot be narrowed down.
+        """
+        results = db.get('CodeSearchResultsCollection', [])
+        if not isinstance(results, list):
+            return None
+        with self._lock:
+            self._sync_results(results)
+            narrowed: List[Set[int]] = []
+            for key, value in qualifiers.items():
+                positions = self._qualifier_positions(key, value)
+                if positions is not None:
+                    narrowed.append(positions)
+            # Results a qualifier narrowed the search down to are cheaper to check than terms to look up
+            if not narrowed or min(map(len, narrowed)) * 8 > len(results):
+                for term in search_terms:
+                    if _WORD.fullmatch(term) or (len(term) >= 3 and ' ' not in term):
+                        narrowed.append(self._term_positions(db, term, search_in, default_commit))
+            if not narrowed:
+                return None
+            narrowed.sort(key=len)
+            positions = narrowed[0].intersection(*narrowed[1:])
+            positions.update(self._unreadable_results)
+            return sorted(positions)
+
+    def _qualifier_positions(self, key: str, value: str) -> Optional[Set[int]]:
+        value = value.lower()
+        if key == 'repo':
+            return set(self._by_full_name.get(value, ()))
+        if key == 'language':
+            extension = LANGUAGE_EXTENSIONS.get(value)
+            return set(self._by_extension.get(extension, ())) if extension else set()
+        if key == 'extension' and '.' not in value:
+            return set(self._by_extension.get(value, ()))
+        if key == 'path' and len(value) >= 3:
+            return self._containing(self._path_postings, value)
+        return None
+
+    def _matching(self, postings: Dict[Any, Set[Any]], term: str) -> Set[Any]:
+        """Everything whose text may match `term` as search_code matches it."""
+        if _WORD.fullmatch(term):
+            return set(postings.get(term, ()))
+        return self._containing(postings, term)
+
+    def _term_positions(self, db: Dict[str, Any], term: str, search_in: List[str],
+                        default_commit: Callable[[Any], Optional[str]]) -> Set[int]:
+        positions: Set[int] = set()
+        if 'file' in search_in:
+            self._sync_files(db.get('FileContents', {}))
+            file_keys = self._matching(self._file_postings, term) | self._unreadable_files
+            positions |= self._positions_of_files(file_keys, default_commit)
+        if 'path' in search_in:
+            positions |= self._matching(self._path_postings, term)
+        if 'repo' in search_in:
+            positions |= self._matching(self._repo_postings, term)
+        return positions
+
+    def _positions_of_files(self, file_keys: Iterable[str], default_commit: Callable[[Any], Optional[str]]) -> Set[int]:
+        positions = set()
+        for file_key in file_keys:
+            parts = file_key.split(':', 2)
+            if len(parts) < 3:
+                continue
+            repo_id, commit_sha, path = parts
+            for position in self._by_file_ref.get((repo_id, path), ()):
+                if default_commit(self._result_repo_ids[position]) == commit_sha:
+                    positions.add(position)
+        return positions
+
+    @staticmethod
+    def _containing(postings: Dict[Any, Set[Any]], text: str) -> Set[Any]:
+        """Everything whose text holds every trigram of `text`."""
+        holders = [postings.get(trigram, set()) for trigram in _trigrams(text)]
+        holders.sort(key=len)
+        return holders[0].intersection(*holders[1:])
+
+    def _sync_files(self, file_contents: Any):
+        if not isinstance(file_contents, dict):
+            return
+        if file_contents is not self._files:
+            self._reset_files(file_contents)
+        keys = list(file_contents)
+        entries = list(file_contents.values())
+        if keys == self._file_keys and all(map(operator.is_, entries, self._file_entries)):
+            return
+        known = dict(zip(self._file_keys, self._file_entries))
+        for key, entry in zip(keys, entries):
+            if known.get(key, self) is not entry and isinstance(key, str):
+                if key in known:
+                    self._stale_files += 1
+                self._index_file(key, entry)
+        self._stale_files += len(known.keys() - set(keys))
+        self._file_keys, self._file_entries = keys, entries
+        # Postings of replaced or removed entries are only dropped here
+        if self._stale_files > len(keys):
+            self._reset_files(file_contents)
+            self._sync_files(file_contents)
+
+    def _reset_files(self, file_contents: Dict[str, Any]):
+        self._files = file_contents
+        self._file_texts = {key: cached for key, cached in self._file_texts.items()
+                            if file_contents.get(key) is cached[0]}
+        self._file_keys, self._file_entries = [], []
+        self._file_postings = {}
+        self._unreadable_files = set()
+        self._stale_files = 0
+
+    def _index_file(self, key: str, entry: Any):
+        self._unreadable_files.discard(key)
+        try:
+            content, patch = self.file_texts(key, entry)
+        except Exception:
+            self._unreadable_files.add(key)
+            return
+        postings_keys = set()
+        for text in (content, patch):
+            if isinstance(text, str):
+                postings_keys |= _postings_keys(text)
+        for postings_key in postings_keys:
+            self._file_postings.setdefault(postings_key, set()).add(key)
+
+    def _sync_results(self, results: List[Any]):
+        indexed = len(self._result_items)
+        if (results is not self._results or len(results) < indexed
+                or not all(map(operator.is_, results[:indexed], self._result_items))):
+            self._reset_results(results)
+            indexed = 0
+        for position in range(indexed, len(results)):
+            self._index_result(position, results[position])
+
+    def _reset_results(self, results: List[Any]):
+        self._results = results
+        self._result_items, self._result_repo_ids = [], []
+        self._path_postings, self._repo_postings = {}, {}
+        self._by_full_name, self._by_extension, self._by_file_ref = {}, {}, {}
+        self._unreadable_results = set()
+
+    def _index_result(self, position: int, result: Any):
+        self._result_items.append(result)
+        try:
+            indexed = _Result(result)
+        except Exception:
+            self._result_repo_ids.append(None)
+            self._unreadable_results.add(position)
+            return
+        self._result_repo_ids.append(indexed.repo_id)
+        for postings_key in _postings_keys(indexed.path):
+            self._path_postings.setdefault(postings_key, set()).add(position)
+        for postings_key in _postings_keys(indexed.repo_text):
+            self._repo_postings.setdefault(postings_key, set()).add(position)
+        self._by_full_name.setdefault(indexed.full_name, set()).add(position)
+        if indexed.extension is not None:
+            self._by_extension.setdefault(indexed.extension, set()).add(position)
+        self._by_file_ref.setdefault(indexed.file_ref, set()).add(position)
+
+
+code_search_index = CodeSearchIndex()
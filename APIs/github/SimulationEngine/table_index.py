@@ -0,0 +1,184 @@
+# APIs/github/SimulationEngine/table_index.py
+"""
+Key indexes over the list tables of the GitHub DB.
+
+Users, Repositories, Issues, PullRequests, Commits, Branches and the other
+tables are plain lists, so looking an item up by its id, number or sha used to
+scan the table. `table_index.find(db, table_name, key_name, value)` returns the
+first item of the table whose key equals `value` from a map of key -> positions
+instead. Keys are a field name (item.get(field)) or one of KEYS.
+
+The tables are edited in place by the API functions (and by tests), so a lookup
+only trusts the index as far as it can check it cheaply:
+
+- a table replaced by another list (_remove_raw_item_from_table, load_state,
+  reset_db, a direct assignment) is indexed anew;
+- items appended since the last lookup are indexed on the next one, a shorter
+  table is indexed anew;
+- a hit is returned only if the same item is still at its position and still
+  holds the key; otherwise that position is re-filed and the lookup retried;
+- on a miss `find` returns None and the caller scans the table as before (see
+  utils._find_by_key), so an item edited in place to hold the key is still
+  found. The item the scan finds is re-filed under its current key.
+
+An item edited in place to hold the key of an item further down the table is
+found once that item is gone or its own position is re-filed.
+
+Helpers that replace an item in place (utils._update_raw_item_in_table) report
+it through `refile`, which keeps the index valid without re-indexing.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+def _base_repository_id(pull_request: Dict[str, Any]) -> Any:
+    base = pull_request.get("base")
+    base_repo = base.get("repo") if base else None
+    return base_repo.get("id") if base_repo else None
+
+
+# Derived keys; any other key name is read as a field of the item
+KEYS: Dict[str, Callable[[Dict[str, Any]], Hashable]] = {
+    # Repositories by full name, compared case-insensitively
+    "full_name_lower": lambda repo: repo.get("full_name").lower(),
+    # Issues by (repository_id, number)
+    "repository_number": lambda issue: (issue.get("repository_id"), issue.get("number")),
+    # PullRequests by (id of the base repository, number)
+    "base_repository_number": lambda pull_request: (_base_repository_id(pull_request), pull_request.get("number")),
+    # Commits by (repository_id, sha)
+    "repository_sha": lambda commit: (commit.get("repository_id"), commit.get("sha")),
+    # Branches by (repository_id, name)
+    "repository_branch": lambda branch: (branch.get("repository_id"), branch.get("name")),
+}
+
+# Marks an item whose key cannot be read or hashed
+_UNKEYED = object()
+
+
+def _key_function(key_name: str) -> Callable[[Dict[str, Any]], Hashable]:
+    key = KEYS.get(key_name)
+    if key is None:
+        return lambda item: item.get(key_name)
+    return key
+
+
+class _KeyIndex:
+    """Positions of the items of one table by one key."""
+
+    def __init__(self, table: List[Any], key: Callable[[Dict[str, Any]], Hashable]):
+        self.table = table
+        self._key = key
+        # Item and key at each indexed position, for the checks of `first`
+        self._items: List[Any] = []
+        self._keys: List[Any] = []
+        self._positions: Dict[Hashable, List[int]] = {}
+        # Positions of unkeyed items, which a scan would have to look at
+        self._unkeyed: List[int] = []
+        self.catch_up()
+
+    def catch_up(self) -> bool:
+        """Indexes items appended to the table; False if the table shrank."""
+        if len(self.table) < len(self._items):
+            return False
+        for position in range(len(self._items), len(self.table)):
+            item = self.table[position]
+            self._items.append(item)
+            self._keys.append(None)
+            self._add(position, item)
+        return True
+
+    def first(self, value: Hashable) -> Optional[Any]:
+        """The first item holding `value`, or None if the index has none."""
+        while True:
+            positions = self._positions.get(value)
+            if not positions:
+                return None
+            position = positions[0]
+            if self._unkeyed and self._unkeyed[0] < position:
+                return None
+            item = self.table[position]
+            if item is self._items[position] and self._read_key(item) == value:
+                return item
+            # Replaced or edited in place since it was filed
+            self.refile(position)
+
+    def refile(self, position: int):
+        if position >= len(self._items):
+            return
+        self._remove(position)
+        item = self.table[position]
+        self._items[position] = item
+        self._add(position, item)
+
+    def _read_key(self, item: Any) -> Any:
+        try:
+            key = self._key(item)
+            hash(key)
+            return key
+        except Exception:
+            return _UNKEYED
+
+    def _add(self, position: int, item: Any):
+        key = self._keys[position] = self._read_key(item)
+        if key is _UNKEYED:
+            _insort(self._unkeyed, position)
+        else:
+            _insort(self._positions.setdefault(key, []), position)
+
+    def _remove(self, position: int):
+        key = self._keys[position]
+        positions = self._unkeyed if key is _UNKEYED else self._positions.get(key, [])
+        if position in positions:
+            positions.remove(position)
+        if key is not _UNKEYED and not positions:
+            self._positions.pop(key, None)
+
+
+def _insort(positions: List[int], position: int):
+    # Positions are indexed in ascending order except after `refile`
+    if not positions or positions[-1] < position:
+        positions.append(position)
+    else:
+        positions.append(position)
+        positions.sort()
+
+
+class TableIndex:
+    """_KeyIndex per (table, key), each bound to the list it indexed."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._indexes: Dict[Tuple[str, str], _KeyIndex] = {}
+
+    def find(self, db: Dict[str, Any], table_name: str, key_name: str, value: Any) -> Optional[Any]:
+        """The first item of db[table_name] whose key is `value`, or None if the index has none."""
+        table = db.get(table_name)
+        if not isinstance(table, list):
+            return None
+        try:
+            hash(value)
+        except TypeError:
+            return None
+        with self._lock:
+            index = self._indexes.get((table_name, key_name))
+            if index is None or index.table is not table or not index.catch_up():
+                index = self._build(table_name, key_name, table)
+            return index.first(value)
+
+    def refile(self, table_name: str, table: List[Any], position: int):
+        """Reports that table[position] was replaced, or edited to hold another key."""
+        with self._lock:
+            for (name, _), index in self._indexes.items():
+                if name == table_name and index.table is table:
+                    index.refile(position)
+
+    def reset(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def _build(self, table_name: str, key_name: str, table: List[Any]) -> _KeyIndex:
+        index = self._indexes[(table_name, key_name)] = _KeyIndex(table, _key_function(key_name))
+        return index
+
+
+table_index = TableIndex()
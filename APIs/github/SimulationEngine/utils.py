@@ -12,6 +12,7 @@ from .db import DB
 from .models import Label, GitHubDB, Commit
 from pydantic import ValidationError
 from .custom_errors import ValidationError, NotFoundError
+from .table_index import table_index
 
 # --- Core & Internal Utility Functions ---
 
@@ -97,13 +98,61 @@ def _get_raw_item_by_id(
     """
     Generic function to get a raw item dictionary by its ID from a specified table.
     """
+    return _find_by_key(db, table_name, id_field, item_id, lambda item: item.get(id_field) == item_id)
+
+
+def _find_by_key(db: dict, table_name: str, key_name: str, value: Any, matches) -> Optional[dict]:
+    """
+    The first item of a table for which `matches(item)` is true, where `matches`
+    compares the key `key_name` of table_index with `value`. Found through the
+    index; when the index has no such item the table is scanned, so items it
+    has not seen yet (e.g. edited in place) are still found, and re-filed.
+    """
     table = _get_table(db, table_name)
-    for item in table:
-        if item.get(id_field) == item_id:
+    item = table_index.find(db, table_name, key_name, value)
+    if item is not None:
+        return item
+    for position, item in enumerate(table):
+        if matches(item):
+            table_index.refile(table_name, table, position)
             return item
     return None
 
 
+def _find_issue_raw(db: dict, repository_id: Any, number: Any) -> Optional[dict]:
+    """Raw issue by repository ID and issue number."""
+    return _find_by_key(
+        db, "Issues", "repository_number", (repository_id, number),
+        lambda issue: issue.get("repository_id") == repository_id and issue.get("number") == number,
+    )
+
+
+def _find_pull_request_raw(db: dict, repository_id: Any, number: Any) -> Optional[dict]:
+    """Raw pull request by the ID of its base repository and its number."""
+    def matches(pr: dict) -> bool:
+        base_info = pr.get("base")
+        base_repo = base_info.get("repo") if base_info else None
+        return bool(base_repo) and base_repo.get("id") == repository_id and pr.get("number") == number
+
+    return _find_by_key(db, "PullRequests", "base_repository_number", (repository_id, number), matches)
+
+
+def _find_commit_raw(db: dict, repository_id: Any, sha: Any) -> Optional[dict]:
+    """Raw commit by repository ID and SHA."""
+    return _find_by_key(
+        db, "Commits", "repository_sha", (repository_id, sha),
+        lambda commit: commit.get("repository_id") == repository_id and commit.get("sha") == sha,
+    )
+
+
+def _find_branch_raw(db: dict, repository_id: Any, name: Any) -> Optional[dict]:
+    """Raw branch by repository ID and branch name."""
+    return _find_by_key(
+        db, "Branches", "repository_branch", (repository_id, name),
+        lambda branch: branch.get("repository_id") == repository_id and branch.get("name") == name,
+    )
+
+
 def _get_raw_items_by_field_value(
     db: dict, table_name: str, field_name: str, field_value: Any
 ) -> List[dict]:
@@ -204,6 +253,7 @@ def _update_raw_item_in_table(
         updated_item[auto_update_timestamp_field] = _get_current_timestamp_iso()
 
     table[item_index] = updated_item  # Replace the old item with the updated one
+    table_index.refile(table_name, table, item_index)
     return updated_item
 
 
@@ -232,6 +282,14 @@ def _find_repository_raw(
     """Internal helper to get raw repository data by ID or full_name."""
     if repo_id is None and repo_full_name is None:
         return None
+    if repo_full_name is None:
+        return _get_raw_item_by_id(db, "Repositories", repo_id)
+    if repo_id is None:
+        full_name = repo_full_name.lower()
+        return _find_by_key(
+            db, "Repositories", "full_name_lower", full_name,
+            lambda repo_data: repo_data.get("full_name").lower() == full_name,
+        )
     repositories_table = _get_table(db, "Repositories")
     for repo_data in repositories_table:
         if repo_id is not None and repo_data.get("id") == repo_id:
@@ -259,11 +317,10 @@ def _get_user_raw_by_identifier(
     db: dict, user_identifier: Union[int, str]
 ) -> Optional[dict]:
     """Gets raw user dictionary by user ID or login name."""
-    users_table = _get_table(db, "Users")
     if isinstance(user_identifier, int):  # User ID
         return _get_raw_item_by_id(db, "Users", user_identifier)
     elif isinstance(user_identifier, str):  # Login name
-        return next((u for u in users_table if u.get("login") == user_identifier), None)
+        return _find_by_key(db, "Users", "login", user_identifier, lambda u: u.get("login") == user_identifier)
     return None
 
 
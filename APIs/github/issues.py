@@ -1408,13 +1408,7 @@ def get_issue(owner: str, repo: str, issue_number: int) -> Dict[str, Any]:
 
     repository_id = repository_data["id"]
 
-    issues_table = utils._get_table(DB, "Issues")
-    found_issue_raw_dict = None
-    for issue_entry in issues_table:
-        if issue_entry.get("repository_id") == repository_id and\
-           issue_entry.get("number") == issue_number:
-            found_issue_raw_dict = issue_entry
-            break
+    found_issue_raw_dict = utils._find_issue_raw(DB, repository_id, issue_number)
 
     if not found_issue_raw_dict:
         raise custom_errors.NotFoundError(f"Issue #{issue_number} not found in repository '{repo_full_name}'.")
@@ -703,12 +703,7 @@ def create_pull_request_review(
     repo_id = repo_data["id"]
 
     # Find pull request
-    pr_data = None
-    for pr_item in utils._get_table(DB, "PullRequests"):
-        base_repo_of_pr = pr_item.get("base", {}).get("repo", {})
-        if base_repo_of_pr and base_repo_of_pr.get("id") == repo_id and pr_item.get("number") == pull_number:
-            pr_data = pr_item
-            break
+    pr_data = utils._find_pull_request_raw(DB, repo_id, pull_number)
     if not pr_data:
         raise custom_errors.NotFoundError(f"Pull request #{pull_number} not found in '{full_repo_name}'.")
 
@@ -764,7 +759,7 @@ def create_pull_request_review(
         if not (isinstance(commit_id, str) and re.fullmatch(models.SHA_PATTERN, commit_id.lower())):
             raise custom_errors.ValidationError(f"Invalid commit_id SHA format: '{commit_id}'. Must be 40 hex characters.")
         commit_id_lower = commit_id.lower()
-        commit_exists = any(c.get("sha") == commit_id_lower and c.get("repository_id") == repo_id for c in utils._get_table(DB, "Commits"))
+        commit_exists = utils._find_commit_raw(DB, repo_id, commit_id_lower) is not None
         if not commit_exists:
             raise custom_errors.UnprocessableEntityError(f"Commit SHA '{commit_id}' not found in repository '{full_repo_name}'.")
         final_commit_id = commit_id_lower
@@ -2641,13 +2636,7 @@ def get_pull_request_files(owner: str, repo: str, pull_number: int) -> List[Dict
     repo_id = repository_data["id"]
 
     # Find the pull request
-    pull_request = None
-    for pr in DB.get("PullRequests", []):
-        base_repo = pr.get("base", {}).get("repo", {})
-        if (pr.get("number") == pull_number and 
-            base_repo.get("id") == repo_id):
-            pull_request = pr
-            break
+    pull_request = utils._find_pull_request_raw(DB, repo_id, pull_number)
             
     if not pull_request:
         raise custom_errors.NotFoundError(f"Pull request #{pull_number} not found in repository '{repo_full_name}'.")
@@ -2903,17 +2892,8 @@ def get_pull_request_reviews(owner: str, repo: str, pull_number: int) -> List[Di
     # Assuming 'id' is a required field for a repository in DB
     repo_id = found_repo_data["id"]
 
-    found_pr_data = None
-    # Iterate through pull requests to find a match.
-    for pr_data in DB.get("PullRequests", []):
-        # A PR belongs to the repo if its base branch's repo ID matches.
-        # Also match by pull request number.
-        base_repo_id = pr_data.get("base", {}).get("repo", {}).get("id")
-        pr_number_in_db = pr_data.get("number")
-
-        if base_repo_id == repo_id and pr_number_in_db == pull_number:
-            found_pr_data = pr_data
-            break
+    # A PR belongs to the repo if its base branch's repo ID matches.
+    found_pr_data = utils._find_pull_request_raw(DB, repo_id, pull_number)
 
     if not found_pr_data:
         raise custom_errors.NotFoundError(f"Pull request #{pull_number} not found in repository '{owner}/{repo}'.")
@@ -3406,14 +3386,8 @@ def get_pull_request(owner: str, repo: str, pull_number: int) -> Dict[str, Any]:
 
     repo_id = db_repo["id"]
 
-    pull_request_db = None
-    for pr_data in DB.get("PullRequests", []):
-        # A PR belongs to the repository of its base branch
-        base_info = pr_data.get("base")
-        if base_info and base_info.get("repo") and base_info["repo"].get("id") == repo_id:
-            if pr_data.get("number") == pull_number:
-                pull_request_db = pr_data
-                break
+    # A PR belongs to the repository of its base branch
+    pull_request_db = utils._find_pull_request_raw(DB, repo_id, pull_number)
 
     if not pull_request_db:
         raise custom_errors.NotFoundError(f"Pull request #{pull_number} not found in repository '{repo_full_name}'.")
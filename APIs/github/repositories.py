@@ -21,6 +21,7 @@ try:
     from .SimulationEngine import db_models
     from .SimulationEngine.models import CreateBranchInput, ListCommitsRequest, GetCommitRequest
     from .SimulationEngine.utils import ensure_db_consistency, update_repository_timestamps
+    from .SimulationEngine.code_search_index import code_search_index, DECODE_FAILED
     from .SimulationEngine.custom_errors import (
         ValidationError,
         NotFoundError,
@@ -35,6 +36,7 @@ except ImportError:
     from SimulationEngine import custom_errors
     from SimulationEngine import models
     from SimulationEngine.models import CreateBranchInput, ListCommitsRequest
+    from SimulationEngine.code_search_index import code_search_index, DECODE_FAILED
     from SimulationEngine.custom_errors import (
         ValidationError,
         NotFoundError,
@@ -452,11 +454,7 @@ def list_commits(owner: str, repo: str, sha: Optional[str] = None, path: Optiona
     ref_name_for_error = sha # Store original sha/branch/tag name for error messages
 
     if sha:
-        branches_table = utils._get_table(DB, "Branches")
-        found_branch = next(
-            (b for b in branches_table if b.get("repository_id") == repo_id and b.get("name") == sha),
-            None
-        )
+        found_branch = utils._find_branch_raw(DB, repo_id, sha)
         if found_branch:
             start_sha = found_branch.get("commit", {}).get("sha")
             ref_name_for_error = sha # It was a branch name
@@ -469,11 +467,7 @@ def list_commits(owner: str, repo: str, sha: Optional[str] = None, path: Optiona
             raise custom_errors.NotFoundError(f"Default branch not configured for repository '{full_repo_name}'.")
 
         ref_name_for_error = default_branch_name # For error messages
-        branches_table = utils._get_table(DB, "Branches")
-        default_branch_obj = next(
-            (b for b in branches_table if b.get("repository_id") == repo_id and b.get("name") == default_branch_name),
-            None
-        )
+        default_branch_obj = utils._find_branch_raw(DB, repo_id, default_branch_name)
         if not default_branch_obj:
             raise custom_errors.NotFoundError(f"Default branch '{default_branch_name}' not found in repository '{full_repo_name}'.")
         start_sha = default_branch_obj.get("commit", {}).get("sha")
@@ -738,13 +732,7 @@ def get_commit(owner: str, repo: str, sha: str, page: Optional[int] = None, per_
     repo_id = repo_data["id"]
 
     # Find the commit
-    commits_table = utils._get_table(DB, "Commits")
-    commit_data_from_db = None
-    for c_dict in commits_table:
-        # Ensure 'repository_id' exists in commit entry 'c_dict'
-        if c_dict.get("repository_id") == repo_id and c_dict.get("sha") == sha:
-            commit_data_from_db = c_dict
-            break
+    commit_data_from_db = utils._find_commit_raw(DB, repo_id, sha)
 
     if not commit_data_from_db:
         raise custom_errors.NotFoundError(f"Commit with SHA '{sha}' not found in repository '{repo_full_name}'.")
@@ -956,12 +944,7 @@ def create_branch(owner: str, repo: str, branch: str, sha: str) -> Dict[str, Uni
         raise custom_errors.UnprocessableEntityError(f"SHA '{sha}' is not a valid SHA format.")
 
     # Validate that the SHA corresponds to an existing commit in this repository
-    commits_table = utils._get_table(DB, "Commits")
-    source_commit_exists = False
-    for c_commit in commits_table:
-        if c_commit.get("sha") == sha and c_commit.get("repository_id") == repo_id:
-            source_commit_exists = True
-            break
+    source_commit_exists = utils._find_commit_raw(DB, repo_id, sha) is not None
 
     if not source_commit_exists:
         raise NotFoundError(f"Commit with SHA '{sha}' not found in repository '{repo_full_name}'.")
@@ -972,9 +955,8 @@ def create_branch(owner: str, repo: str, branch: str, sha: str) -> Dict[str, Uni
 
     # Check if branch already exists in this repository
     branches_table = utils._get_table(DB, "Branches")
-    for b_existing in branches_table:
-        if b_existing.get("name") == branch and b_existing.get("repository_id") == repo_id:
-            raise UnprocessableEntityError(f"Branch '{branch}' already exists in repository '{repo_full_name}'.")
+    if utils._find_branch_raw(DB, repo_id, branch) is not None:
+        raise UnprocessableEntityError(f"Branch '{branch}' already exists in repository '{repo_full_name}'.")
 
     # Create the new branch data.
     new_branch_data = {
@@ -3205,18 +3187,22 @@ def search_code(
     all_code_results = DB.get('CodeSearchResultsCollection', [])
     file_contents = DB.get('FileContents', {})
     filtered_results = []
-    repositories = DB.get('Repositories', [])
     repo_default_commits = {}
-    for repo in repositories:
-        branches = DB.get('Branches', [])
-        default_branch = next(
-            (b for b in branches if b.get('repository_id') == repo['id'] and b['name'] == repo.get('default_branch', 'main')),
-            None
-        )
-        if default_branch and default_branch.get('commit', {}).get('sha'):
-            repo_default_commits[repo['id']] = default_branch['commit']['sha']
 
-    for result in all_code_results:
+    def default_commit(repo_id):
+        if repo_id not in repo_default_commits:
+            repo = utils._get_raw_item_by_id(DB, 'Repositories', repo_id)
+            default_branch = utils._find_branch_raw(DB, repo_id, repo.get('default_branch', 'main')) if repo else None
+            repo_default_commits[repo_id] = default_branch.get('commit', {}).get('sha') if default_branch else None
+        return repo_default_commits[repo_id]
+
+    # Fallback to repo description/name if 'in:' is not specified
+    search_in = qualifiers.get('in', 'file,path,repo').lower().split(',')
+    # Only the results the code search index cannot rule out are checked below
+    positions = code_search_index.candidates(DB, qualifiers, search_terms, search_in, default_commit)
+    candidate_results = all_code_results if positions is None else [all_code_results[p] for p in positions]
+
+    for result in candidate_results:
         match = True
         for key, value in qualifiers.items():
             if not utils.check_code_qualifier(result, key, value):
@@ -3226,7 +3212,7 @@ def search_code(
             continue
 
         repo_id = result['repository']['id']
-        commit_sha = repo_default_commits.get(repo_id)
+        commit_sha = default_commit(repo_id)
         
         # If commit_sha is not found for the repo, this file can't be matched.
         if not commit_sha:
@@ -3235,31 +3221,18 @@ def search_code(
         file_key = f"{repo_id}:{commit_sha}:{result['path']}"
         file_data = file_contents.get(file_key, {})
         
-        # Fallback to repo description/name if 'in:' is not specified
-        search_in = qualifiers.get('in', 'file,path,repo').lower().split(',')
         text_to_search = []
         
         if 'file' in search_in:
-            content = file_data.get('content', '')
-            encoding = file_data.get('encoding', 'base64')
-            patch = file_data.get('patch', '')
-            
-            # Decode base64 content before searching (content is stored as base64 like real API)
-            if content:
-                try:
-                    if encoding == 'base64':
-                        decoded_content = base64.b64decode(content).decode('utf-8', errors='ignore')
-                    else:
-                        decoded_content = content
-                    text_to_search.append(decoded_content.lower())
-                except Exception:
-                    # If decoding fails, skip this file
-                    continue
-            
-            if patch:
-                # remove diff markers from patch
-                cleaned_patch = re.sub(r'(^@@.*@@$)|(^--- a\/.*$)|(^\+\+\+ b\/.*$)', '', patch, flags=re.MULTILINE)
-                text_to_search.append(cleaned_patch.lower())
+            # Decoded once per file; content is stored as base64 like the real API
+            decoded_content, cleaned_patch = code_search_index.file_texts(file_key, file_data)
+            if decoded_content is DECODE_FAILED:
+                # If decoding fails, skip this file
+                continue
+            if decoded_content:
+                text_to_search.append(decoded_content)
+            if cleaned_patch is not None:
+                text_to_search.append(cleaned_patch)
         
         if 'path' in search_in:
             path = result.get('path', '')
@@ -0,0 +1,141 @@
+"""
+Test cases for the key indexes over the DB tables and the code search index.
+"""
+
+import base64
+import unittest
+from unittest.mock import patch
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from ..SimulationEngine.db import DB
+from ..SimulationEngine import utils
+from ..SimulationEngine import code_search_index as code_search_index_module
+from ..SimulationEngine.code_search_index import code_search_index
+from ..SimulationEngine.table_index import table_index
+from ..repositories import search_code
+
+
+def _encoded(text):
+    return base64.b64encode(text.encode()).decode()
+
+
+class TestTableIndex(BaseTestCaseWithErrorHandler):
+
+    def setUp(self):
+        DB.clear()
+        DB.update({
+            "Users": [{"id": 1, "login": "octocat"}, {"id": 2, "login": "hubot"}],
+            "Repositories": [
+                {"id": 101, "name": "hello", "full_name": "octocat/Hello", "default_branch": "main",
+                 "description": "Greetings"},
+                {"id": 102, "name": "tools", "full_name": "hubot/tools", "default_branch": "main",
+                 "description": "Helpers"},
+            ],
+            "Issues": [{"id": i, "repository_id": 101 + i % 2, "number": i // 2 + 1} for i in range(10)],
+            "PullRequests": [
+                {"id": 1, "number": 1, "base": {"repo": {"id": 101}}},
+                {"id": 2, "number": 1, "base": None},
+                {"id": 3, "number": 1, "base": {"repo": {"id": 102}}},
+            ],
+            "Commits": [{"id": 1, "repository_id": 101, "sha": "a" * 40}],
+            "Branches": [
+                {"name": "main", "repository_id": 101, "commit": {"sha": "a" * 40}},
+                {"name": "main", "repository_id": 102, "commit": {"sha": "b" * 40}},
+            ],
+            "FileContents": {
+                f"101:{'a' * 40}:src/app.py": {"content": _encoded("def greet(): return 'hello world'"),
+                                                "encoding": "base64", "size": 33},
+                f"102:{'b' * 40}:lib/tool.js": {"content": "function helper() {}", "encoding": "none",
+                                                 "size": 20, "patch": "@@ -1 +1 @@\n+// refactor helper"},
+            },
+            "CodeSearchResultsCollection": [
+                {"name": "app.py", "path": "src/app.py", "sha": "s1",
+                 "repository": {"id": 101, "name": "hello", "full_name": "octocat/Hello",
+                                "description": "Greetings"}},
+                {"name": "tool.js", "path": "lib/tool.js", "sha": "s2",
+                 "repository": {"id": 102, "name": "tools", "full_name": "hubot/tools",
+                                "description": "Helpers"}},
+            ],
+        })
+        table_index.reset()
+        code_search_index.reset()
+
+    def tearDown(self):
+        table_index.reset()
+        code_search_index.reset()
+
+    def test_lookups_find_the_first_matching_item(self):
+        self.assertEqual(utils._find_repository_raw(DB, repo_full_name="OCTOCAT/hello")["id"], 101)
+        self.assertEqual(utils._get_user_raw_by_identifier(DB, "hubot")["id"], 2)
+        self.assertEqual(utils._find_issue_raw(DB, 102, 3)["id"], 5)
+        self.assertEqual(utils._find_pull_request_raw(DB, 102, 1)["id"], 3)
+        self.assertEqual(utils._find_commit_raw(DB, 101, "a" * 40)["id"], 1)
+        self.assertIsNone(utils._find_commit_raw(DB, 102, "a" * 40))
+        self.assertEqual(utils._find_branch_raw(DB, 102, "main")["commit"]["sha"], "b" * 40)
+
+        DB["Issues"].insert(0, {"id": 99, "repository_id": 102, "number": 3})
+        self.assertEqual(utils._find_issue_raw(DB, 102, 3)["id"], 99)
+
+    def test_lookups_follow_edits_of_the_tables(self):
+        self.assertEqual(utils._get_raw_item_by_id(DB, "Users", 2)["login"], "hubot")
+
+        DB["Users"].append({"id": 3, "login": "monalisa"})
+        utils._update_raw_item_in_table(DB, "Users", 2, {"login": "hubot2"})
+        self.assertEqual(utils._get_user_raw_by_identifier(DB, "monalisa")["id"], 3)
+        self.assertEqual(utils._get_user_raw_by_identifier(DB, "hubot2")["id"], 2)
+        self.assertIsNone(utils._get_user_raw_by_identifier(DB, "hubot"))
+
+        DB["Users"][0]["login"] = "renamed"
+        self.assertIsNone(utils._get_user_raw_by_identifier(DB, "octocat"))
+        self.assertEqual(utils._get_user_raw_by_identifier(DB, "renamed")["id"], 1)
+
+        utils._remove_raw_item_from_table(DB, "Users", 1)
+        self.assertIsNone(utils._get_raw_item_by_id(DB, "Users", 1))
+
+        DB.clear()
+        DB.update({"Users": [{"id": 1, "login": "octocat"}]})
+        self.assertEqual(utils._get_user_raw_by_identifier(DB, "octocat")["id"], 1)
+        self.assertIsNone(utils._get_raw_item_by_id(DB, "Users", 3))
+
+    def test_items_found_by_a_scan_are_refiled(self):
+        self.assertEqual(utils._get_user_raw_by_identifier(DB, "octocat")["id"], 1)
+        DB["Users"][1]["login"] = "hubot2"
+        DB["Users"][0]["login"] = "hubot"
+        with patch.object(table_index, "_build", wraps=table_index._build) as build:
+            self.assertIsNone(table_index.find(DB, "Users", "login", "hubot2"))
+            self.assertEqual(utils._get_user_raw_by_identifier(DB, "hubot2")["id"], 2)
+            self.assertIs(table_index.find(DB, "Users", "login", "hubot2"), DB["Users"][1])
+            self.assertEqual(utils._get_user_raw_by_identifier(DB, "hubot")["id"], 1)
+            self.assertIsNone(utils._get_user_raw_by_identifier(DB, "octocat"))
+        build.assert_not_called()
+
+    def test_code_search_follows_new_files_and_branches(self):
+        self.assertEqual([item["path"] for item in search_code("helper")["items"]], ["lib/tool.js"])
+        self.assertEqual(search_code("refactor language:javascript")["total_count"], 1)
+        self.assertEqual(search_code("hello repo:octocat/hello")["total_count"], 1)
+        self.assertEqual(search_code("greet extension:js")["total_count"], 0)
+
+        new_sha = "c" * 40
+        DB["FileContents"][f"101:{new_sha}:src/app.py"] = {"content": _encoded("def wave(): pass"),
+                                                           "encoding": "base64", "size": 16}
+        DB["FileContents"][f"101:{new_sha}:src/new.py"] = {"content": _encoded("def greet(): pass"),
+                                                           "encoding": "base64", "size": 17}
+        DB["CodeSearchResultsCollection"].append(
+            {"name": "new.py", "path": "src/new.py", "sha": "s3",
+             "repository": {"id": 101, "name": "hello", "full_name": "octocat/Hello"}})
+        self.assertEqual([item["path"] for item in search_code("greet")["items"]], ["src/app.py"])
+
+        DB["Branches"][0]["commit"]["sha"] = new_sha
+        self.assertEqual([item["path"] for item in search_code("greet")["items"]], ["src/new.py"])
+        self.assertEqual([item["path"] for item in search_code("wave path:src/")["items"]], ["src/app.py"])
+
+    def test_file_contents_are_decoded_once(self):
+        search_code("helper")
+        with patch.object(code_search_index_module, "decode_file_texts",
+                          wraps=code_search_index_module.decode_file_texts) as decode:
+            search_code("helper in:file")
+            search_code("greet")
+        decode.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
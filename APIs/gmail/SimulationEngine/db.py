@@ -2,6 +2,7 @@
 import json
 import os
 from common_utils.utils import get_minified_data
+from common_utils.tracked_db import track_changes
 
 DEFAULT_DB_PATH = os.path.join(
     os.path.dirname(
@@ -11,7 +12,7 @@ DEFAULT_DB_PATH = os.path.join(
     "GmailDefaultDB.json",
 )
 
-DB = {}
+DB = track_changes()
 
 with open(DEFAULT_DB_PATH, "r", encoding="utf-8") as f:
     DB.update(json.load(f))
@@ -0,0 +1,144 @@
+# gmail/SimulationEngine/message_index.py
+"""
+Per-user secondary indexes over DB["users"][userId]["messages"].
+
+For each user the index keeps:
+
+- label -> message ids postings (labels uppercased once, at indexing time),
+- the message ids in list order (internalDate descending, then mailbox order)
+  as a sorted list of sort keys, so a page of results is a bisect away.
+
+The indexes are not updated by each API function: whatever changes a message
+(insert, send, modify, trash, delete or a direct DB edit) is re-indexed on the
+next lookup (see common_utils.synced_index).
+"""
+import bisect
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from common_utils.synced_index import ALL_INDEXES, ChangePath, Route, TrackerSyncedIndexes
+
+# (-internalDate, mailbox position, message id)
+MessageKey = Tuple[int, int, str]
+
+EXCLUDED_BY_DEFAULT = ("SPAM", "TRASH")
+
+
+def message_labels(message: Dict[str, Any]) -> FrozenSet[str]:
+    return frozenset(label.upper() for label in message.get("labelIds") or [] if isinstance(label, str))
+
+
+class UserMessageIndex:
+    """Label postings and list order of one user's messages."""
+
+    def __init__(self, messages: Dict[str, Dict[str, Any]]):
+        self.keys: List[MessageKey] = []
+        self.key_of: Dict[str, MessageKey] = {}
+        self.labels_of: Dict[str, FrozenSet[str]] = {}
+        self.label_postings: Dict[str, Set[str]] = {}
+        # Messages whose internalDate is not an integer, with the error int() raised for it
+        self.invalid_dates: Dict[str, Exception] = {}
+        self._position: Dict[str, int] = {}
+        self._next_position = 0
+        entries = []
+        for message_id, message in messages.items():
+            entry = self._index(message_id, message)
+            if entry is not None:
+                entries.append(entry)
+        self.keys = sorted(entries)
+
+    def refresh(self, message_id: str, message: Optional[Dict[str, Any]]):
+        """Re-indexes one message; `message` is None if it was deleted."""
+        self._unindex(message_id)
+        if message is None:
+            self._position.pop(message_id, None)
+            return
+        key = self._index(message_id, message)
+        if key is not None:
+            bisect.insort(self.keys, key)
+
+    def with_labels(self, label_ids: Iterable[str]) -> Optional[Set[str]]:
+        """Ids of the messages carrying all `label_ids` (case-insensitive), or None if there are none to require."""
+        result: Optional[Set[str]] = None
+        required = {label.upper() for label in label_ids}
+        for label in sorted(required, key=lambda lbl: len(self.label_postings.get(lbl, ()))):
+            posting = self.label_postings.get(label, set())
+            result = set(posting) if result is None else result & posting
+            if not result:
+                break
+        return result
+
+    def hidden(self, include_spam_trash: bool) -> Set[str]:
+        """Ids of the messages a listing skips: those in SPAM or TRASH, unless `include_spam_trash`."""
+        if include_spam_trash:
+            return set()
+        hidden: Set[str] = set()
+        for label in EXCLUDED_BY_DEFAULT:
+            hidden |= self.label_postings.get(label, set())
+        return hidden
+
+    def sorted_keys(self, message_ids: Iterable[str]) -> List[MessageKey]:
+        """Sort keys of `message_ids`, in list order; unknown ids are skipped."""
+        return sorted(self.key_of[mid] for mid in message_ids if mid in self.key_of)
+
+    def _index(self, message_id: str, message: Any) -> Optional[MessageKey]:
+        if not isinstance(message, dict):
+            return None
+        position = self._position.get(message_id)
+        if position is None:
+            position = self._position[message_id] = self._next_position
+            self._next_position += 1
+        try:
+            date = int(message.get("internalDate", 0))
+        except (TypeError, ValueError) as e:
+            self.invalid_dates[message_id] = e
+            date = 0
+        key = (-date, position, message_id)
+        self.key_of[message_id] = key
+        labels = message_labels(message)
+        self.labels_of[message_id] = labels
+        for label in labels:
+            self.label_postings.setdefault(label, set()).add(message_id)
+        return key
+
+    def _unindex(self, message_id: str):
+        key = self.key_of.pop(message_id, None)
+        if key is None:
+            return
+        index = bisect.bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            del self.keys[index]
+        self.invalid_dates.pop(message_id, None)
+        for label in self.labels_of.pop(message_id, ()):
+            posting = self.label_postings.get(label)
+            if posting is not None:
+                posting.discard(message_id)
+                if not posting:
+                    del self.label_postings[label]
+
+
+class MailboxIndex(TrackerSyncedIndexes):
+    """UserMessageIndex per user, kept in sync with a (tracked) Gmail DB."""
+
+    def for_user(self, db: Dict[str, Any], user_id: str) -> UserMessageIndex:
+        """Returns the up to date index of DB["users"][user_id]["messages"]."""
+        return self._lookup(db, user_id)
+
+    def _build(self, db: Dict[str, Any], user_id: str) -> UserMessageIndex:
+        return UserMessageIndex(db["users"][user_id].get("messages", {}))
+
+    def _route(self, path: ChangePath) -> Iterable[Route]:
+        if path[0] != "users":
+            return ()
+        if len(path) < 2:
+            return ((ALL_INDEXES, None),)
+        if len(path) == 2 or (len(path) == 3 and path[2] == "messages"):
+            return ((path[1], None),)
+        if path[2] != "messages":
+            return ()
+        return ((path[1], path[3]),)
+
+    def _refresh(self, db: Dict[str, Any], user_id: str, index: UserMessageIndex, message_id: str):
+        index.refresh(message_id, db["users"][user_id].get("messages", {}).get(message_id))
+
+
+mailbox_index = MailboxIndex()
@@ -0,0 +1,88 @@
+# gmail/SimulationEngine/pagination.py
+"""
+Pagination of the list endpoints (messages, threads, drafts, history).
+
+Pages are cut with the keyset page tokens of common_utils.page_tokens: the next
+page starts right after the sort key of the last item returned.
+"""
+import bisect
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from common_utils.page_tokens import SortKey, decode_page_token, encode_page_token, query_fingerprint
+
+
+def paginate_sorted(
+    keys: Sequence[SortKey],
+    max_results: int,
+    page_token: Optional[str],
+    fingerprint: str,
+    accept: Optional[Callable[[SortKey], bool]] = None,
+) -> Tuple[List[SortKey], Optional[str]]:
+    """
+    Returns one page of an ascending list of sort keys and the next page token.
+
+    Args:
+        keys (Sequence[SortKey]): All sort keys, ascending and unique.
+        max_results (int): Page size.
+        page_token (Optional[str]): Token of the previous page, if any.
+        fingerprint (str): Fingerprint of the request (see query_fingerprint).
+        accept (Optional[Callable[[SortKey], bool]]): Keeps only the keys it
+            returns True for; keys are tested lazily, only until the page is full.
+
+    Returns:
+        Tuple[List[SortKey], Optional[str]]: The keys of the page and the token
+            of the next page, or None if this is the last page.
+    """
+    last_key = decode_page_token(page_token, fingerprint)
+    if max(max_results, 0) == 0:
+        return [], None
+    start = 0 if last_key is None else _bisect_after(keys, last_key)
+    page: List[SortKey] = []
+    for position in range(start, len(keys)):
+        key = keys[position]
+        if accept is not None and not accept(key):
+            continue
+        if len(page) >= max_results:
+            return page, encode_page_token(page[-1], fingerprint)
+        page.append(key)
+    return page, None
+
+
+def paginate_items(
+    items: Iterable[Any],
+    key: Callable[[Any], SortKey],
+    max_results: int,
+    page_token: Optional[str],
+    fingerprint: str,
+) -> Tuple[List[Any], Optional[str]]:
+    """paginate_sorted for items that are already in result order; key(item) must ascend."""
+    keyed = [(key(item), item) for item in items]
+    by_key = dict(keyed)
+    page_keys, next_page_token = paginate_sorted([k for k, _ in keyed], max_results, page_token, fingerprint)
+    return [by_key[k] for k in page_keys], next_page_token
+
+
+def paginate_append_only(
+    items: Sequence[Any], max_results: int, page_token: Optional[str], fingerprint: str
+) -> Tuple[List[Any], Optional[str]]:
+    """Pagination of a list that is only ever appended to, keyed by position."""
+    last_key = decode_page_token(page_token, fingerprint)
+    if last_key is None:
+        start = 0
+    elif len(last_key) == 1 and isinstance(last_key[0], int) and last_key[0] >= -1:
+        start = last_key[0] + 1
+    else:
+        raise ValueError("Invalid page_token.")
+    page = list(items[start:start + max(max_results, 0)])
+    if start + len(page) < len(items) and page:
+        return page, encode_page_token((start + len(page) - 1,), fingerprint)
+    return page, None
+
+
+def _bisect_after(keys: Sequence[SortKey], last_key: SortKey) -> int:
+    try:
+        return bisect.bisect_right(keys, last_key)
+    except TypeError:
+        # The key does not compare with these keys (e.g. the items were reshaped)
+        raise ValueError("Invalid page_token.")
+
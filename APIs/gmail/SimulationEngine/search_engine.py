@@ -9,6 +9,8 @@ from gmail.SimulationEngine.db import DB
 class ServiceAdapter(Adapter):
     """Adapter creates distinct, searchable chunks for each email field."""
 
+    tracked_collections = (("users", "*", "messages"), ("users", "*", "drafts"))
+
     def get_db_hash(self) -> str:
         """
         Calculates a hash of the current database state.
@@ -16,28 +18,17 @@ class ServiceAdapter(Adapter):
         """
         return json.dumps(DB, sort_keys=True)
 
+    def get_tracked_db(self):
+        return DB
+
     def db_to_searchable_documents(self) -> List[SearchableDocument]:
-        items = self._get_all_data()
-        searchable_documents = []
-        for item in items:
-            if isinstance(item, GmailMessageForSearch):
-                searchable_documents.extend(self._adapt_message(item))
-            elif isinstance(item, GmailDraftForSearch):
-                searchable_documents.extend(self._adapt_draft(item))
-        return searchable_documents
+        return self.records_to_searchable_documents()
 
-    def _get_all_data(self) -> List[Any]:
-        messages = [
-            GmailMessageForSearch(**message, userId=user_id)
-            for user_id, messages in DB["users"].items()
-            for message in messages.get("messages", {}).values()
-        ]
-        drafts = [
-            GmailDraftForSearch(**draft, userId=user_id)
-            for user_id, drafts in DB["users"].items()
-            for draft in drafts.get("drafts", {}).values()
-        ]
-        return messages + drafts
+    def record_to_searchable_documents(self, record_path, record) -> List[SearchableDocument]:
+        _, user_id, collection, _ = record_path
+        if collection == "messages":
+            return self._adapt_message(GmailMessageForSearch(**record, userId=user_id))
+        return self._adapt_draft(GmailDraftForSearch(**record, userId=user_id))
     
     def _make_message_chunks(
         self,
@@ -16,6 +16,7 @@ from ..SimulationEngine.utils import _ensure_user, _next_counter, get_default_se
 from .. import Messages  # Relative import for Messages
 from gmail.SimulationEngine.search_engine import search_engine_manager
 from ..SimulationEngine.attachment_manager import cleanup_attachments_for_draft
+from ..SimulationEngine.pagination import paginate_items, query_fingerprint
 from ..SimulationEngine.models import parse_email_list, normalize_email_field_for_storage
 
 @tool_spec(
@@ -421,8 +422,8 @@ def create(
                 },
                 'page_token': {
                     'type': 'string',
-                    'description': """ Page token to retrieve a specific page of results. Accepted
-                    for API parity; pagination is not simulated and nextPageToken will be None. """
+                    'description': """ Page token to retrieve a specific page of results. Pass the
+                    `nextPageToken` of the previous page, with the same other parameters. """
                 }
             },
             'required': []
@@ -518,8 +519,8 @@ def list(userId: str = 'me', max_results: int = 100, q: str = '', include_spam_t
                 q='is:unread is:important'
         include_spam_trash (bool): Include drafts from SPAM and TRASH in the results.
            Defaults to False.
-        page_token (Optional[str]): Page token to retrieve a specific page of results. Accepted
-           for API parity; pagination is not simulated and nextPageToken will be None.
+        page_token (Optional[str]): Page token to retrieve a specific page of results. Pass the
+           `nextPageToken` of the previous page, with the same other parameters.
 
     Returns:
         Dict[str, Union[List[Dict[str, Union[str, Dict[str, Union[str, bool, List[str]]]]]], None]]: A dictionary containing:
@@ -539,12 +540,13 @@ def list(userId: str = 'me', max_results: int = 100, q: str = '', include_spam_t
                     - 'internalDate' (str): The internal date timestamp.
                     - 'isRead' (bool): Whether the message has been read.
                     - 'labelIds' (List[str]): List of label IDs, including 'DRAFT' in uppercase.
-            - 'nextPageToken' (None): Currently always None.
+            - 'nextPageToken' (Optional[str]): Token of the next page, or None if this is the last page.
 
     Raises:
         TypeError: If `userId` or `q` is not a string, or if `max_results` is not an integer,
                    if `include_spam_trash` is not a boolean, or if `page_token` is not a string when provided.
-        ValueError: If the specified `userId` does not exist in the database (propagated from _ensure_user), `q` is a string with only whitespace.
+        ValueError: If the specified `userId` does not exist in the database (propagated from _ensure_user), `q` is a string with only whitespace,
+                    or `page_token` is malformed or was issued for other query parameters.
         InvalidMaxResultsValueError: If `max_results` is not a positive integer or exceeds 500.
         Exception: If query evaluation fails due to malformed search syntax or other query-related errors.
     """
@@ -602,32 +604,36 @@ def list(userId: str = 'me', max_results: int = 100, q: str = '', include_spam_t
         # Create a draft-aware QueryEvaluator
         evaluator = DraftQueryEvaluator(q, messages_map, userId)
         matching_ids = evaluator.evaluate()
-        filtered_messages = [messages_map[mid] for mid in matching_ids if mid in messages_map]
-        
-        # Sort results by internalDate, descending
-        filtered_messages.sort(key=lambda m: int(m.get('internalDate') or 0), reverse=True)
-        
-        # Convert back to draft format for return
-        filtered_drafts = []
-        for message in filtered_messages:
-            # Find the original draft that contains this message
-            for draft in drafts_list:
-                if draft.get("message", {}).get("id") == message.get("id"):
-                    filtered_drafts.append(draft)
-                    break
+
+        # Convert back to draft format: the first draft containing each matching message
+        draft_of_message = {}
+        for draft in drafts_list:
+            draft_of_message.setdefault(draft.get("message", {}).get("id"), draft)
+        filtered_drafts = [draft_of_message[mid] for mid in matching_ids if mid in messages_map]
     else:
-        # Sort drafts by internalDate, descending
-        drafts_list.sort(key=lambda d: int(d.get('message', {}).get('internalDate') or 0), reverse=True)
         filtered_drafts = drafts_list
 
+    # Sort drafts by internalDate, descending, then by their order in the mailbox
+    position = {id(draft): i for i, draft in enumerate(drafts_list)}
+    sort_keys = {
+        id(draft): (-int(draft.get('message', {}).get('internalDate') or 0), position[id(draft)], draft.get('id', ''))
+        for draft in filtered_drafts
+    }
+    filtered_drafts.sort(key=lambda d: sort_keys[id(d)])
+    fingerprint = query_fingerprint("drafts", userId, q, include_spam_trash)
+    page, next_page_token = paginate_items(
+        filtered_drafts, lambda d: sort_keys[id(d)], max_results, page_token, fingerprint
+    )
+
     # Update isRead for all draft messages based on their labelIds
-    for draft in filtered_drafts[:max_results]:
+    for draft in page:
         if 'message' in draft:
             label_ids = draft['message'].get('labelIds', [])
             computed_is_read = "UNREAD" not in [label.upper() for label in label_ids]
-            draft['message']['isRead'] = computed_is_read
-    
-    return {"drafts": filtered_drafts[:max_results], "nextPageToken": None}
+            if draft['message'].get('isRead') is not computed_is_read:
+                draft['message']['isRead'] = computed_is_read
+
+    return {"drafts": page, "nextPageToken": next_page_token}
 
 
 
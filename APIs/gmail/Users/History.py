@@ -3,6 +3,7 @@ from common_utils.tool_spec_decorator import tool_spec
 # Use relative import to ensure the correct DB instance is used
 from ..SimulationEngine.db import DB
 from ..SimulationEngine.utils import _ensure_user, get_history_id
+from ..SimulationEngine.pagination import paginate_append_only, query_fingerprint
 from typing import Optional, Dict, Any, List
 
 
@@ -13,9 +14,9 @@ from typing import Optional, Dict, Any, List
         
         Retrieves a list of mailbox history records for the specified user.
         Note: Filtering parameters (`start_history_id`, `label_id`,
-        `history_types`) and pagination (`page_token`) are included
-        for API compatibility but are not fully implemented. The function currently returns
-        stored history records up to `max_results`. """,
+        `history_types`) are included for API compatibility but are not fully
+        implemented. The function returns stored history records, `max_results`
+        at a time; pass the returned `nextPageToken` as `page_token` for the next page. """,
         'parameters': {
             'type': 'object',
             'properties': {
@@ -31,8 +32,8 @@ from typing import Optional, Dict, Any, List
                 },
                 'page_token': {
                     'type': 'string',
-                    'description': """ Page token to retrieve a specific page of results.
-                    Defaults to ''. (Currently ignored). """
+                    'description': """ Page token to retrieve a specific page of results,
+                    as returned in `nextPageToken`. Defaults to ''. """
                 },
                 'start_history_id': {
                     'type': 'string',
@@ -69,17 +70,17 @@ def list(
 
     Retrieves a list of mailbox history records for the specified user.
     Note: Filtering parameters (`start_history_id`, `label_id`,
-    `history_types`) and pagination (`page_token`) are included
-    for API compatibility but are not fully implemented. The function currently returns
-    stored history records up to `max_results`.
+    `history_types`) are included for API compatibility but are not fully
+    implemented. The function returns stored history records, `max_results`
+    at a time; pass the returned `nextPageToken` as `page_token` for the next page.
 
     Args:
         userId (str): The user's email address. The special value 'me'
                 can be used to indicate the authenticated user. Defaults to 'me'.
         max_results (int): The maximum number of history records to return.
                      Defaults to 100.
-        page_token (str): Page token to retrieve a specific page of results.
-                    Defaults to ''. (Currently ignored).
+        page_token (str): Page token to retrieve a specific page of results,
+                    as returned in `nextPageToken`. Defaults to ''.
         start_history_id (str): Returns history records after the specified
                          `start_history_id`. Defaults to ''. (Currently ignored).
         label_id (str): History records specific to the specified label in uppercase.
@@ -90,18 +91,23 @@ def list(
     Returns:
         Dict[str, Any]: A dictionary containing:
             - 'history' (List[Dict]): List of history records.
-            - 'nextPageToken' (Optional[str]): Token for retrieving the next page of results.
-                Currently always None.
+            - 'nextPageToken' (Optional[str]): Token for retrieving the next page of results,
+                or None if there are no more records.
             - 'historyId' (str): The current history ID of the mailbox.
 
     Raises:
         KeyError: If the specified `userId` does not exist in the database.
+        ValueError: If `page_token` is malformed or was issued for another user.
     """
     _ensure_user(userId)
     history_data = DB["users"][userId]["history"]
 
+    # Records are only ever appended, so a record's position is a stable cursor
+    fingerprint = query_fingerprint("history", userId)
+    history_page, next_page_token = paginate_append_only(history_data, max_results, page_token, fingerprint)
+
     return {
-        "history": history_data[:max_results],
-        "nextPageToken": None,
+        "history": history_page,
+        "nextPageToken": next_page_token,
         "historyId": get_history_id(userId),
     }
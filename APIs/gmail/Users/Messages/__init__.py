@@ -9,7 +9,7 @@ import base64
 
 from datetime import datetime
 
-from typing import Optional, List, Dict, Any, Set, Union
+from typing import Optional, List, Dict, Any, Set, Union, Tuple, Sequence, Callable
 
 from pydantic import ValidationError
 
@@ -47,6 +47,8 @@ from ...SimulationEngine.attachment_manager import cleanup_attachments_for_messa
 from ...SimulationEngine import custom_errors
 from gmail.SimulationEngine.search_engine import search_engine_manager
 from ...SimulationEngine.models import parse_email_list, normalize_email_field_for_storage
+from ...SimulationEngine.message_index import MessageKey, UserMessageIndex, mailbox_index
+from ...SimulationEngine.pagination import paginate_sorted, query_fingerprint
 
 @tool_spec(
     spec={
@@ -1581,6 +1583,47 @@ def send(userId: str = "me", msg: Optional[Dict[str, Any]] = None) -> Dict[str,
     return new_msg
 
 
+def _matching_message_keys(
+    userId: str, q: str, labelIds: Optional[List[str]], include_spam_trash: bool
+) -> Tuple[UserMessageIndex, Sequence[MessageKey], Optional[Callable[[MessageKey], bool]]]:
+    """
+    Sort keys of the user's messages matching `q`, `labelIds` and `include_spam_trash`, in list order.
+
+    Returns the user's index, the keys, and a filter the keys still have to pass (or None);
+    the filter is only used when listing without a query or labels, so that a page can be
+    read off the index without looking at the rest of the mailbox.
+    """
+    user_messages = DB["users"][userId]["messages"]
+    index = mailbox_index.for_user(DB, userId)
+
+    # Initial filter for labels and spam/trash, from the label index
+    required = index.with_labels(labelIds) if labelIds else None
+    hidden = index.hidden(include_spam_trash)
+
+    if q:
+        candidate_ids = set(user_messages) if required is None else required
+        messages_map = {mid: user_messages[mid] for mid in candidate_ids - hidden}
+        evaluator = QueryEvaluator(q, messages_map, userId)
+        matching_ids = {mid for mid in evaluator.evaluate() if mid in messages_map}
+        keys, accept = index.sorted_keys(matching_ids), None
+    elif required is not None:
+        matching_ids = required - hidden
+        keys, accept = index.sorted_keys(matching_ids), None
+    else:
+        matching_ids = None
+        keys = index.keys
+        accept = (lambda key: key[2] not in hidden) if hidden else None
+
+    # Messages are listed by internalDate, descending; a non-numeric one fails the listing
+    if matching_ids is not None:
+        invalid = index.invalid_dates.keys() & matching_ids
+    else:
+        invalid = index.invalid_dates.keys() - hidden
+    if invalid:
+        raise index.invalid_dates[min(invalid)].with_traceback(None)
+    return index, keys, accept
+
+
 @tool_spec(
     spec={
         'name': 'list_messages',
@@ -1693,8 +1736,8 @@ def send(userId: str = "me", msg: Optional[Dict[str, Any]] = None) -> Dict[str,
                 },
                 'page_token': {
                     'type': 'string',
-                    'description': """ Page token to retrieve a specific page of results. Accepted for API
-                    parity; pagination is not simulated and nextPageToken will be None. """
+                    'description': """ Page token to retrieve a specific page of results. Pass the
+                    `nextPageToken` of the previous page, with the same other parameters. """
                 }
             },
             'required': []
@@ -1798,8 +1841,8 @@ def list(
         labelIds (Optional[List[str]]): List of label IDs required on messages. Defaults to None.
         include_spam_trash (bool): Include messages from SPAM and TRASH.
                            Defaults to False.
-        page_token (Optional[str]): Page token to retrieve a specific page of results. Accepted for API
-                           parity; pagination is not simulated and nextPageToken will be None.
+        page_token (Optional[str]): Page token to retrieve a specific page of results. Pass the
+                           `nextPageToken` of the previous page, with the same other parameters.
 
     Returns:
         Dict[str, Union[List[Dict[str, Union[str, bool, List[str], Dict[str, Union[str, List[Dict[str, Union[str, int, Optional[str]]]], Dict[str, Union[str, Optional[int]]]]]]]], None]]: A dictionary containing:
@@ -1830,14 +1873,15 @@ def list(
                             - 'size' (Optional[int]): The size of the attachment in bytes (present for attachments).
                     - 'body' (Dict[str, str]): The message body data.
                         - 'data' (str): The base64url-encoded content of the message body.
-            - 'nextPageToken' (None): Currently always None.
+            - 'nextPageToken' (Optional[str]): Token of the next page, or None if this is the last page.
 
     Raises:
         TypeError: If `userId` is not a string, `max_results` is not an integer, 
                    `q` is not a string, `labelIds` is not a list or contains non-strings,
                    or `include_spam_trash` is not a boolean, or `page_token` is not a string when provided.
         ValueError: If `userId` is empty, `max_results` is not a positive integer or exceeds 500,
-                    `q` is a string with only whitespace, or `userId` does not exist in the database.
+                    `q` is a string with only whitespace, `userId` does not exist in the database,
+                    or `page_token` is malformed or was issued for other query parameters.
         Exception: If query evaluation fails due to malformed search syntax or other query-related errors.
     """
     # --- Input Validation ---
@@ -1876,48 +1920,24 @@ def list(
     # --- End Input Validation ---
 
     _ensure_user(userId)
-    all_user_messages = builtins.list(DB["users"][userId]["messages"].values())
+    user_messages = DB["users"][userId]["messages"]
+    index, keys, accept = _matching_message_keys(userId, q, labelIds, include_spam_trash)
 
-    # Initial filter for labels and spam/trash
-    potential_matches = []
-    query_label_ids_upper = set(lbl.upper() for lbl in labelIds) if labelIds else set()
-
-    for msg_data in all_user_messages:
-        msg_label_ids_set = set(lbl.upper() for lbl in msg_data.get("labelIds", []))
-        
-        if not include_spam_trash and ("TRASH" in msg_label_ids_set or "SPAM" in msg_label_ids_set):
-            continue
-            
-        if query_label_ids_upper and not query_label_ids_upper.issubset(msg_label_ids_set):
-            continue
-                
-        potential_matches.append(msg_data)
-
-    if q:
-        # Replace message list with a map for faster lookups by ID
-        messages_map = {m['id']: m for m in potential_matches}
-        evaluator = QueryEvaluator(q, messages_map, userId)
-        matching_ids = evaluator.evaluate()
-        filtered_messages = [messages_map[mid] for mid in matching_ids if mid in messages_map]
-        
-        # Sort results by internalDate, descending
-        filtered_messages.sort(key=lambda m: int(m.get('internalDate', 0)), reverse=True)
-    else:
-        filtered_messages = potential_matches
-        tokens = []
-        
-        # Sort results by internalDate, descending
-        filtered_messages.sort(key=lambda m: int(m.get('internalDate', 0)), reverse=True)
+    fingerprint = query_fingerprint(
+        "messages", userId, q, sorted({lbl.upper() for lbl in labelIds or []}), include_spam_trash
+    )
+    page_keys, next_page_token = paginate_sorted(keys, max_results, page_token, fingerprint, accept)
+    messages = [user_messages[key[2]] for key in page_keys]
 
     # Update isRead for all messages based on their labelIds
-    for message in filtered_messages[:max_results]:
-        label_ids = message.get('labelIds', [])
-        computed_is_read = "UNREAD" not in [label.upper() for label in label_ids]
-        message['isRead'] = computed_is_read
+    for key, message in zip(page_keys, messages):
+        computed_is_read = "UNREAD" not in index.labels_of[key[2]]
+        if message.get('isRead') is not computed_is_read:
+            message['isRead'] = computed_is_read
 
     return {
-        "messages": filtered_messages[:max_results],
-        "nextPageToken": None
+        "messages": messages,
+        "nextPageToken": next_page_token
     }
 
 
@@ -8,6 +8,7 @@ from ..SimulationEngine.db import DB
 from ..SimulationEngine.utils import _ensure_user, get_history_id, QueryEvaluator
 from . import Messages
 from ..SimulationEngine.custom_errors import InvalidFormatValueError, ValidationError
+from ..SimulationEngine.pagination import paginate_sorted, query_fingerprint
 
 
 @tool_spec(
@@ -377,9 +378,8 @@ def get(
         'description': """ Lists the threads in the user's mailbox.
         
         Retrieves a list of threads matching the specified query criteria.
-        Note: Query parameters (`q`, `labelIds`, `include_spam_trash`, `page_token`)
-        are included for API compatibility but are not fully implemented.
-        The filtering based on these parameters is not performed. """,
+        Supports filtering based on query string (`q`), label IDs, and spam/trash inclusion,
+        and pagination with `page_token`. """,
         'parameters': {
             'type': 'object',
             'properties': {
@@ -395,18 +395,18 @@ def get(
                 },
                 'page_token': {
                     'type': 'string',
-                    'description': """ Page token to retrieve a specific page of results.
-                    Defaults to ''. (Currently ignored). """
+                    'description': """ Page token to retrieve a specific page of results: the
+                    `nextPageToken` of the previous page, with the same other parameters. Defaults to ''. """
                 },
                 'q': {
                     'type': 'string',
                     'description': """ Only return threads matching the specified query. Supports the same
-                    query format as the Gmail search box. Defaults to ''. (Currently ignored). """
+                    query format as the Gmail search box. Defaults to ''. """
                 },
                 'labelIds': {
                     'type': 'array',
                     'description': """ Only return threads with labels that match all of the specified
-                    label IDs in uppercase. Defaults to None. (Currently ignored). """,
+                    label IDs in uppercase. Defaults to None. """,
                     'items': {
                         'type': 'string'
                     }
@@ -414,7 +414,7 @@ def get(
                 'include_spam_trash': {
                     'type': 'boolean',
                     'description': """ Include threads from SPAM and TRASH in the results.
-                    Defaults to False. (Currently ignored). """
+                    Defaults to False. """
                 }
             },
             'required': []
@@ -432,16 +432,16 @@ def list(
     """Lists the threads in the user's mailbox.
 
     Retrieves a list of threads matching the specified query criteria.
-    Supports filtering based on query string (`q`), label IDs, and spam/trash inclusion.
-    Note: `page_token` is included for API compatibility but is not implemented.
+    Supports filtering based on query string (`q`), label IDs, and spam/trash inclusion,
+    and pagination with `page_token`.
 
     Args:
         userId (str): The user's email address. The special value 'me'
                 can be used to indicate the authenticated user. Defaults to 'me'.
         max_results (int): Maximum number of threads to return. Defaults to 100.
                      Actual results might be fewer if less threads exist. The maximum allowed value is 500.
-        page_token (str): Page token to retrieve a specific page of results.
-                    Defaults to ''. (Currently ignored).
+        page_token (str): Page token to retrieve a specific page of results: the
+                    `nextPageToken` of the previous page, with the same other parameters. Defaults to ''.
         q (str): Query string for filtering threads based on their messages. Strings with spaces must be enclosed
             in single (') or double (") quotes. Supports space-delimited tokens
             (each one filters the current result set). Supported tokens:
@@ -527,7 +527,7 @@ def list(
             - 'threads' (List[Dict[str, str]]): List of thread resources matching the query.
               Each thread dictionary contains:
                 - 'id' (str): The thread ID.
-            - 'nextPageToken' (None): Currently always None.
+            - 'nextPageToken' (Optional[str]): Token of the next page, or None if this is the last page.
             - 'resultSizeEstimate' (int): Estimated total number of threads matching the query.
 
     Raises:
@@ -535,7 +535,8 @@ def list(
                    `page_token` is not a string, `q` is not a string, `labelIds` is not a list or contains non-strings,
                    or `include_spam_trash` is not a boolean.
         ValueError: If `userId` is empty, `max_results` is not a positive integer,
-                    `q` is a string with only whitespace, or `userId` does not exist in the database.
+                    `q` is a string with only whitespace, `userId` does not exist in the database,
+                    or `page_token` is malformed or was issued for other query parameters.
         Exception: If query evaluation fails due to malformed search syntax or other query-related errors.
     """
     if not isinstance(userId, str):
@@ -563,52 +564,28 @@ def list(
         raise ValueError("q cannot be a string with only whitespace")
     
     _ensure_user(userId)
-    all_user_messages = builtins.list(DB["users"][userId]["messages"].values())
+    user_messages = DB["users"][userId]["messages"]
+    _, message_keys, accept = Messages._matching_message_keys(userId, q, labelIds, include_spam_trash)
 
-    # Initial filter for labels and spam/trash
-    potential_matches = []
-    query_label_ids_upper = set(lbl.upper() for lbl in labelIds) if labelIds else set()
-
-    for msg_data in all_user_messages:
-        msg_label_ids_set = set(lbl.upper() for lbl in msg_data.get("labelIds", []))
-        
-        if not include_spam_trash and ("TRASH" in msg_label_ids_set or "SPAM" in msg_label_ids_set):
-            continue
-            
-        if query_label_ids_upper and not query_label_ids_upper.issubset(msg_label_ids_set):
+    # Group messages by thread ID; a thread is listed at the position of its newest matching message
+    thread_keys = {}
+    for key in message_keys:
+        if accept is not None and not accept(key):
             continue
-                
-        potential_matches.append(msg_data)
-
-    if q:
-        # Replace message list with a map for faster lookups by ID
-        messages_map = {m['id']: m for m in potential_matches}
-        evaluator = QueryEvaluator(q, messages_map, userId)
-        matching_ids = evaluator.evaluate()
-        filtered_messages = [messages_map[mid] for mid in matching_ids if mid in messages_map]
-        
-        # Sort results by internalDate, descending
-        filtered_messages.sort(key=lambda m: int(m.get('internalDate', 0)), reverse=True)
-    else:
-        filtered_messages = potential_matches
-        tokens = []
-        
-        # Sort results by internalDate, descending
-        filtered_messages.sort(key=lambda m: int(m.get('internalDate', 0)), reverse=True)
-
-    # Group messages by thread ID
-    threads_map = {}
-    for message in filtered_messages:
-        thread_id = message["threadId"]
-        if thread_id not in threads_map:
-            threads_map[thread_id] = {"id": thread_id}
-        
-    threads_list = builtins.list(threads_map.values())
+        thread_keys.setdefault(user_messages[key[2]]["threadId"], key)
+    thread_id_of = {key: thread_id for thread_id, key in thread_keys.items()}
+
+    fingerprint = query_fingerprint(
+        "threads", userId, q, sorted({lbl.upper() for lbl in labelIds or []}), include_spam_trash
+    )
+    page_keys, next_page_token = paginate_sorted(
+        builtins.list(thread_keys.values()), max_results, page_token, fingerprint
+    )
 
     return {
-        "threads": threads_list[:max_results],
-        "nextPageToken": None,
-        "resultSizeEstimate": len(threads_list),
+        "threads": [{"id": thread_id_of[key]} for key in page_keys],
+        "nextPageToken": next_page_token,
+        "resultSizeEstimate": len(thread_keys),
     }
 
 
@@ -0,0 +1,177 @@
+# tests/test_list_pagination.py
+import unittest
+
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from ..SimulationEngine.utils import reset_db
+from ..SimulationEngine.message_index import mailbox_index
+from ..SimulationEngine.pagination import decode_page_token, encode_page_token, query_fingerprint
+from .. import (
+    DB,
+    create_draft,
+    delete_message,
+    insert_message,
+    list_drafts,
+    list_history_records,
+    list_messages,
+    list_threads,
+    modify_message_labels,
+    trash_message,
+)
+
+
+def _ids(items):
+    return [item["id"] for item in items]
+
+
+class TestListPagination(BaseTestCaseWithErrorHandler):
+    def setUp(self):
+        reset_db()
+        self.ids = []
+        for i in range(7):
+            message = insert_message("me", {
+                "sender": "alice@example.com",
+                "recipient": "me@example.com",
+                "subject": f"Report {i}",
+                "body": "weekly numbers" if i % 2 else "lunch",
+                "internalDate": str(1700000000000 + i * 1000),
+                "labelIds": ["INBOX", "IMPORTANT"] if i % 2 else ["INBOX"],
+            })
+            self.ids.append(message["id"])
+        # Newest first
+        self.ordered = list(reversed(self.ids))
+
+    def _all_pages(self, list_function, key, **kwargs):
+        pages, token = [], ""
+        while True:
+            result = list_function("me", page_token=token, **kwargs)
+            pages.append(_ids(result[key]))
+            token = result["nextPageToken"]
+            if token is None:
+                return pages
+
+    def test_messages_pages_follow_internal_date(self):
+        pages = self._all_pages(list_messages, "messages", max_results=3)
+
+        self.assertEqual(pages, [self.ordered[0:3], self.ordered[3:6], self.ordered[6:7]])
+
+    def test_messages_single_page_has_no_token(self):
+        result = list_messages("me", max_results=7)
+
+        self.assertEqual(_ids(result["messages"]), self.ordered)
+        self.assertIsNone(result["nextPageToken"])
+
+    def test_messages_pages_with_query_and_labels(self):
+        important = [mid for mid in self.ordered if int(mid.split("-")[1]) % 2 == 0]
+
+        self.assertEqual(self._all_pages(list_messages, "messages", max_results=2, labelIds=["important"]),
+                         [important[0:2], important[2:3]])
+        self.assertEqual(self._all_pages(list_messages, "messages", max_results=2, q="weekly"),
+                         [important[0:2], important[2:3]])
+
+    def test_non_numeric_internal_date_fails_the_listing(self):
+        DB["users"]["me"]["messages"][self.ids[2]]["internalDate"] = "not-a-date"
+
+        with self.assertRaisesRegex(ValueError, "not-a-date"):
+            list_messages("me", max_results=3)
+        with self.assertRaisesRegex(ValueError, "not-a-date"):
+            list_messages("me", max_results=3, labelIds=["INBOX"])
+        self.assertEqual(_ids(list_messages("me", max_results=7, q="weekly")["messages"]),
+                         [mid for mid in self.ordered if mid != self.ids[2] and int(mid.split("-")[1]) % 2 == 0])
+
+    def test_page_is_stable_when_earlier_messages_change(self):
+        first = list_messages("me", max_results=3)
+        trash_message("me", self.ordered[0])
+        insert_message("me", {"sender": "bob@example.com", "subject": "Newest", "body": "x",
+                              "internalDate": "1800000000000", "labelIds": ["INBOX"]})
+
+        second = list_messages("me", max_results=3, page_token=first["nextPageToken"])
+
+        self.assertEqual(_ids(second["messages"]), self.ordered[3:6])
+
+    def test_index_follows_modify_trash_and_delete(self):
+        modify_message_labels("me", self.ordered[1], addLabelIds=["STARRED"])
+        delete_message("me", self.ordered[2])
+        trash_message("me", self.ordered[3])
+
+        self.assertEqual(_ids(list_messages("me", labelIds=["STARRED"])["messages"]), [self.ordered[1]])
+        self.assertEqual(_ids(list_messages("me")["messages"]),
+                         [mid for i, mid in enumerate(self.ordered) if i not in (2, 3)])
+        self.assertEqual(_ids(list_messages("me", labelIds=["TRASH"], include_spam_trash=True)["messages"]),
+                         [self.ordered[3]])
+
+    def test_index_follows_direct_db_edits(self):
+        list_messages("me")
+        DB["users"]["me"]["messages"][self.ordered[0]]["internalDate"] = "1600000000000"
+
+        self.assertEqual(_ids(list_messages("me")["messages"]), self.ordered[1:] + self.ordered[:1])
+
+    def test_is_read_follows_labels(self):
+        messages = list_messages("me")["messages"]
+
+        self.assertEqual([m["isRead"] for m in messages], ["UNREAD" not in m["labelIds"] for m in messages])
+
+    def test_token_is_bound_to_query(self):
+        token = list_messages("me", max_results=2)["nextPageToken"]
+
+        with self.assertRaises(ValueError):
+            list_messages("me", max_results=2, q="weekly", page_token=token)
+        with self.assertRaises(ValueError):
+            list_messages("me", max_results=2, page_token="not-a-token")
+
+    def test_threads_pages(self):
+        pages = self._all_pages(list_threads, "threads", max_results=4)
+        result = list_threads("me", max_results=4)
+
+        expected = [DB["users"]["me"]["messages"][mid]["threadId"] for mid in self.ordered]
+        self.assertEqual(pages, [expected[0:4], expected[4:7]])
+        self.assertEqual(result["resultSizeEstimate"], 7)
+
+    def test_threads_zero_max_results_returns_empty_page(self):
+        result = list_threads("me", max_results=0)
+
+        self.assertEqual(result["threads"], [])
+        self.assertIsNone(result["nextPageToken"])
+
+    def test_drafts_pages(self):
+        draft_ids = [
+            create_draft("me", {"message": {"subject": f"Draft {i}", "body": "text",
+                                            "internalDate": str(1700000000000 + i)}})["id"]
+            for i in range(5)
+        ]
+
+        pages = self._all_pages(list_drafts, "drafts", max_results=2)
+
+        self.assertEqual(pages, [draft_ids[4:2:-1], draft_ids[2:0:-1], draft_ids[0:1]])
+
+    def test_history_pages(self):
+        history = DB["users"]["me"]["history"]
+        history.clear()
+        history.extend({"id": f"hist_{i}"} for i in range(5))
+
+        pages = self._all_pages(list_history_records, "history", max_results=2)
+
+        self.assertEqual(pages, [["hist_0", "hist_1"], ["hist_2", "hist_3"], ["hist_4"]])
+
+
+class TestPageTokens(unittest.TestCase):
+    def test_round_trip(self):
+        fingerprint = query_fingerprint("messages", "me", "", [], False)
+        token = encode_page_token((-5, 2, "message-1"), fingerprint)
+
+        self.assertEqual(decode_page_token(token, fingerprint), (-5, 2, "message-1"))
+        self.assertIsNone(decode_page_token("", fingerprint))
+
+    def test_untracked_db_is_reindexed(self):
+        db = {"users": {"me": {"messages": {"m1": {"id": "m1", "internalDate": "1", "labelIds": ["INBOX"]}}}}}
+        self.assertEqual(mailbox_index.for_user(db, "me").keys, [(-1, 0, "m1")])
+
+        db["users"]["me"]["messages"]["m2"] = {"id": "m2", "internalDate": "2", "labelIds": ["SPAM"]}
+        index = mailbox_index.for_user(db, "me")
+
+        self.assertEqual(index.keys, [(-2, 1, "m2"), (-1, 0, "m1")])
+        self.assertEqual(index.hidden(False), {"m2"})
+        mailbox_index.reset()
+
+
+if __name__ == "__main__":
+    unittest.main()
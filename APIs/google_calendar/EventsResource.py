@@ -18,7 +18,7 @@ from .SimulationEngine.utils import (
 )
 from typing import Dict, Any, Optional, List
 from .SimulationEngine.custom_errors import InvalidInputError, ResourceNotFoundError, ResourceAlreadyExistsError, PermissionDeniedError
-from .SimulationEngine.recurrence_expander import expand_recurring_events
+from .SimulationEngine.event_index import event_index
 from rfc3339_validator import validate_rfc3339
 from common_utils.datetime_utils import is_datetime_of_format, local_to_UTC, is_timezone_valid, UTC_to_local, timezone_to_offset
 
@@ -1464,20 +1464,29 @@ def list_events(
 
     query_words = q.strip().lower() if q else ''
 
+    # Only the events of the calendar that may lie in the time window are looked at
+    index = event_index.for_calendar(DB, effective_calendarId)
+    if singleEvents:
+        candidate_keys = index.single_event_candidates(timeMin_dt, timeMax_dt)
+    else:
+        candidate_keys = index.base_event_candidates(timeMin_dt, timeMax_dt)
+    all_events = DB.get("events", {})
     base_events = [
-        ev_obj
-        for key, ev_obj in DB.get("events", {}).items()
-        if isinstance(key, str) and key.split(':')[0] == effective_calendarId and event_matches_query(ev_obj, query_words)
+        (key, all_events[key])
+        for key in candidate_keys
+        if event_matches_query(all_events[key], query_words)
     ]
 
     results = []
     if singleEvents:
-        expanded_events = expand_recurring_events(
-            base_events, 
-            timeMin_dt, 
-            timeMax_dt, 
-            max_instances_per_event=50
-        )
+        # Recurring events are expanded within the window only, at most maxResults instances
+        # each (the page can not hold more of one series); expansions are memoized by the index
+        expanded_events = []
+        for key, event in base_events:
+            if event.get("recurrence"):
+                expanded_events.extend(index.instances(key, event, timeMin_dt, timeMax_dt, maxResults))
+            else:
+                expanded_events.append(event)
 
         for event in expanded_events:
             event_start = parse_iso_datetime(event.get("start", {}).get("dateTime")).replace(tzinfo=timezone.utc)
@@ -1491,7 +1500,7 @@ def list_events(
             
             results.append(event)
     else:
-        for event in base_events:
+        for _, event in base_events:
             # Filter by timeMin
             if timeMin is not None: # timeMin_dt would be None if timeMin was None
                 if "start" not in event:
@@ -1533,8 +1542,8 @@ def list_events(
     elif orderBy == "updated":
         results.sort(key=lambda x: parse_iso_datetime(x.get("updated")) if x.get("updated") else datetime.max, reverse=True)
     
-    # Converts to desired timeZone and returns the event instances
-    results_to_return = copy.deepcopy(results)
+    # Converts to desired timeZone and returns the event instances (of the page only)
+    results_to_return = copy.deepcopy(results[:maxResults])
     for item in results_to_return:
         if "start" in item and "dateTime" in item["start"] and item["start"]["dateTime"] is not None:
             # Preserve the original timezone field
@@ -1554,7 +1563,7 @@ def list_events(
             item['end']['offset'] = timezone_to_offset(item["end"]["dateTime"], timeZone)
             item["end"]["timeZone"] = original_timezone  # Preserve the original timezone field
             item["end"] = UTC_to_local(item["end"])
-    return {"items": results_to_return[:maxResults]}
+    return {"items": results_to_return}
 
 
 @tool_spec(
@@ -1,8 +1,9 @@
 # APIs/google_calendar/SimulationEngine/db.py
 import json
+from common_utils.tracked_db import track_changes
 from .db_models import GoogleCalendarDB
 
-DB = {
+DB = track_changes({
     "acl_rules": {},  # Stores ACL rule objects, keyed by ruleId
     "calendar_list": {},  # Stores CalendarList entries, keyed by calendarId
     "calendars": {},  # Stores Calendar objects, keyed by calendarId
@@ -12,7 +13,7 @@ DB = {
         "event": {},  # This might store color definitions for events
     },
     "events": {},  # Stores events, keyed by (calendarId, eventId) or a combined key
-}
+})
 
 
 def reset_db():
@@ -0,0 +1,206 @@
+# APIs/google_calendar/SimulationEngine/event_index.py
+"""
+Per-calendar time index over DB["events"] and memo of recurrence expansions.
+
+DB["events"] is keyed by "calendarId:eventId". For each calendar the index
+keeps the events in DB order and, for the two ways list_events reads event
+times, a list of (start, position, key) sorted by start time:
+
+- single: start/end "dateTime" (what singleEvents=True compares), concrete
+  events only, since recurring events are expanded first;
+- base: start/end "dateTime" or "date" (what singleEvents=False compares),
+  every event including the first occurrence of recurring ones.
+
+An event whose times cannot be read or compared, or that ends before it
+starts, is kept aside and returned by every lookup, so that list_events
+checks (and fails on) it exactly as before. Lookups return a superset of the
+events in the window, in DB order; list_events still applies its filters.
+
+Expansions of a recurring event for a window are memoized with the event's
+entry, so a series is only expanded again after it changes.
+
+Whatever changes an event (insert, import, patch, update, move, delete or a
+direct DB edit) is re-indexed, and its expansions dropped, on the next lookup
+(see common_utils.synced_index). A change of DB["events"] as a whole drops
+every index.
+"""
+import bisect
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from common_utils.synced_index import ALL_INDEXES, ChangePath, Route, TrackerSyncedIndexes
+
+from .recurrence_expander import RecurrenceExpander
+from .utils import parse_iso_datetime
+
+# Expansions memoized per recurring event (most recently used windows)
+MAX_EXPANSIONS_PER_EVENT = 16
+
+# (start, position, key)
+TimeKey = Tuple[datetime, int, str]
+
+
+def _single_time(event: Dict[str, Any], field: str) -> Optional[datetime]:
+    """Time of an event as list_events reads it with singleEvents=True."""
+    return parse_iso_datetime(event.get(field, {}).get("dateTime")).replace(tzinfo=timezone.utc)
+
+
+def _base_time(event: Dict[str, Any], field: str) -> Optional[datetime]:
+    """Time of an event as list_events reads it with singleEvents=False."""
+    value = event[field]
+    if "dateTime" in value and value["dateTime"] is not None:
+        return parse_iso_datetime(value["dateTime"]).replace(tzinfo=timezone.utc)
+    return parse_iso_datetime(value["date"])
+
+
+def _window(event: Dict[str, Any], read) -> Optional[Tuple[datetime, datetime]]:
+    """(start, end) of an event if both read as comparable aware datetimes in order, else None."""
+    try:
+        start, end = read(event, "start"), read(event, "end")
+        if start is None or end is None or start.tzinfo is None or end.tzinfo is None or end < start:
+            return None
+        return start, end
+    except Exception:
+        return None
+
+
+class _Entry:
+    __slots__ = ("position", "recurring", "single", "base", "expansions")
+
+    def __init__(self, position: int, event: Any):
+        self.position = position
+        is_dict = isinstance(event, dict)
+        self.recurring = bool(is_dict and event.get("recurrence"))
+        self.single = _window(event, _single_time) if is_dict and not self.recurring else None
+        self.base = _window(event, _base_time) if is_dict else None
+        self.expansions: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+
+
+class CalendarEventIndex:
+    """Start-time index and recurrence expansions of one calendar's events."""
+
+    def __init__(self, events: Dict[str, Any], calendar_id: str):
+        self._entries: Dict[str, _Entry] = {}
+        self._next_position = 0
+        self._single: List[TimeKey] = []
+        self._base: List[TimeKey] = []
+        # Keys that every single/base lookup returns
+        self._single_always: Dict[str, None] = {}
+        self._base_always: Dict[str, None] = {}
+        for key, event in events.items():
+            if isinstance(key, str) and key.split(':')[0] == calendar_id:
+                self._index(key, event)
+        self._single.sort()
+        self._base.sort()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refresh(self, key: str, event: Optional[Dict[str, Any]]):
+        """Re-indexes one event; `event` is None if it was deleted."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._unindex(key, entry)
+        if event is None:
+            self._entries.pop(key, None)
+        else:
+            self._index(key, event, entry.position if entry is not None else None, keep_sorted=True)
+
+    def single_event_candidates(self, time_min: Optional[datetime], time_max: Optional[datetime]) -> List[str]:
+        """Keys of the recurring events and of the concrete events that may lie in the window, in DB order."""
+        keys = self._in_window(self._single, time_min, time_max)
+        keys.extend(self._single_always)
+        return self._in_db_order(keys)
+
+    def base_event_candidates(self, time_min: Optional[datetime], time_max: Optional[datetime]) -> List[str]:
+        """Keys of the events (recurring ones by their first occurrence) that may lie in the window, in DB order."""
+        if time_min is None and time_max is None:
+            return list(self._entries)
+        keys = self._in_window(self._base, time_min, time_max)
+        keys.extend(self._base_always)
+        return self._in_db_order(keys)
+
+    def instances(self, key: str, event: Dict[str, Any], time_min: Optional[datetime],
+                  time_max: Optional[datetime], max_instances: int) -> List[Dict[str, Any]]:
+        """
+        RecurrenceExpander.expand_recurring_event(event, time_min, time_max, max_instances),
+        memoized until the event changes. The returned instances must not be modified.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return RecurrenceExpander.expand_recurring_event(event, time_min, time_max, max_instances)
+        window = (time_min, time_max, max_instances)
+        instances = entry.expansions.get(window)
+        if instances is None:
+            instances = RecurrenceExpander.expand_recurring_event(event, time_min, time_max, max_instances)
+            entry.expansions[window] = instances
+            if len(entry.expansions) > MAX_EXPANSIONS_PER_EVENT:
+                entry.expansions.popitem(last=False)
+        else:
+            entry.expansions.move_to_end(window)
+        return instances
+
+    def _in_window(self, keys: List[TimeKey], time_min: Optional[datetime], time_max: Optional[datetime]) -> List[str]:
+        # Events of the window start in [time_min, time_max], since they end by time_max
+        low = 0 if time_min is None else bisect.bisect_left(keys, (time_min,))
+        high = len(keys) if time_max is None else bisect.bisect_right(keys, (time_max, float("inf")))
+        return [key for _, _, key in keys[low:high]]
+
+    def _in_db_order(self, keys: List[str]) -> List[str]:
+        return sorted(keys, key=lambda key: self._entries[key].position)
+
+    def _index(self, key: str, event: Any, position: Optional[int] = None, keep_sorted: bool = False):
+        if position is None:
+            position = self._next_position
+            self._next_position += 1
+        entry = self._entries[key] = _Entry(position, event)
+        add = bisect.insort if keep_sorted else list.append
+        if entry.single is not None:
+            add(self._single, (entry.single[0], position, key))
+        else:
+            self._single_always[key] = None
+        if entry.base is not None:
+            add(self._base, (entry.base[0], position, key))
+        else:
+            self._base_always[key] = None
+
+    def _unindex(self, key: str, entry: _Entry):
+        if entry.single is not None:
+            _remove(self._single, (entry.single[0], entry.position, key))
+        if entry.base is not None:
+            _remove(self._base, (entry.base[0], entry.position, key))
+        self._single_always.pop(key, None)
+        self._base_always.pop(key, None)
+
+
+def _remove(keys: List[TimeKey], time_key: TimeKey):
+    index = bisect.bisect_left(keys, time_key)
+    if index < len(keys) and keys[index] == time_key:
+        del keys[index]
+
+
+class EventIndex(TrackerSyncedIndexes):
+    """CalendarEventIndex per calendar, kept in sync with a (tracked) Calendar DB."""
+
+    def for_calendar(self, db: Dict[str, Any], calendar_id: str) -> CalendarEventIndex:
+        """Returns the up to date index of the events of `calendar_id`."""
+        return self._lookup(db, calendar_id)
+
+    def _build(self, db: Dict[str, Any], calendar_id: str) -> CalendarEventIndex:
+        return CalendarEventIndex(db.get("events", {}), calendar_id)
+
+    def _route(self, path: ChangePath) -> Iterable[Route]:
+        if path[0] != "events":
+            return ()
+        if len(path) < 2:
+            return ((ALL_INDEXES, None),)
+        if not isinstance(path[1], str):
+            return ()
+        return ((path[1].split(':')[0], path[1]),)
+
+    def _refresh(self, db: Dict[str, Any], calendar_id: str, index: CalendarEventIndex, key: str):
+        index.refresh(key, db["events"].get(key))
+
+
+event_index = EventIndex()
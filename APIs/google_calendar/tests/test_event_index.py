@@ -0,0 +1,87 @@
+"""
+Test cases for the event index behind list_events.
+"""
+
+from unittest.mock import patch
+
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from ..SimulationEngine.db import DB
+from ..SimulationEngine.event_index import event_index
+from ..SimulationEngine.recurrence_expander import RecurrenceExpander
+from .. import create_calendar_list_entry, create_event, delete_event, list_events, patch_event
+
+
+class TestEventIndex(BaseTestCaseWithErrorHandler):
+    """list_events through the index against direct edits and API calls."""
+
+    def setUp(self):
+        for collection in ("events", "calendars", "calendar_list"):
+            DB[collection] = {}
+        event_index.reset()
+        for calendar_id, primary in (("primary", True), ("work", False)):
+            calendar = {"id": calendar_id, "primary": primary, "summary": calendar_id, "timeZone": "UTC"}
+            DB["calendars"][calendar_id] = dict(calendar)
+            create_calendar_list_entry(calendar)
+        for day in range(1, 29):
+            create_event("primary", {
+                "summary": f"Day {day}",
+                "start": {"dateTime": f"2024-02-{day:02d}T10:00:00Z"},
+                "end": {"dateTime": f"2024-02-{day:02d}T11:00:00Z"},
+            })
+
+    def _summaries(self, **kwargs):
+        return [event["summary"] for event in list_events(**kwargs)["items"]]
+
+    def test_window_lookups_follow_changes(self):
+        window = dict(timeMin="2024-02-10T00:00:00Z", timeMax="2024-02-12T23:59:59Z")
+        self.assertEqual(self._summaries(**window), ["Day 10", "Day 11", "Day 12"])
+
+        moved = next(key for key, event in DB["events"].items() if event["summary"] == "Day 20")
+        DB["events"][moved]["start"]["dateTime"] = "2024-02-11T12:00:00"
+        DB["events"][moved]["end"]["dateTime"] = "2024-02-11T13:00:00"
+        delete_event("primary", next(key for key, event in DB["events"].items()
+                                     if event["summary"] == "Day 10").split(":", 1)[1])
+        create_event("work", {"summary": "Elsewhere", "start": {"dateTime": "2024-02-11T09:00:00Z"},
+                              "end": {"dateTime": "2024-02-11T10:00:00Z"}})
+
+        self.assertEqual(self._summaries(**window), ["Day 11", "Day 12", "Day 20"])
+        self.assertEqual(self._summaries(singleEvents=True, **window), ["Day 11", "Day 12", "Day 20"])
+        self.assertEqual(self._summaries(calendarId="work", **window), ["Elsewhere"])
+
+    def test_recurring_series_expanded_in_window_beyond_fifty_instances(self):
+        create_event("primary", {
+            "summary": "Standup",
+            "start": {"dateTime": "2024-01-01T09:00:00Z"},
+            "end": {"dateTime": "2024-01-01T09:15:00Z"},
+            "recurrence": ["RRULE:FREQ=DAILY;UNTIL=20241231T000000Z"],
+        })
+
+        items = list_events(timeMin="2024-03-01T00:00:00Z", timeMax="2024-06-01T00:00:00Z",
+                            singleEvents=True, orderBy="startTime")["items"]
+
+        self.assertEqual(len(items), 92)
+        self.assertTrue(items[0]["start"]["dateTime"].startswith("2024-03-01T09:00:00"))
+        self.assertTrue(items[-1]["start"]["dateTime"].startswith("2024-05-31T09:00:00"))
+
+    def test_expansions_memoized_until_the_event_changes(self):
+        series = create_event("primary", {
+            "summary": "Weekly",
+            "start": {"dateTime": "2024-02-05T15:00:00Z"},
+            "end": {"dateTime": "2024-02-05T16:00:00Z"},
+            "recurrence": ["RRULE:FREQ=WEEKLY;COUNT=4"],
+        })
+        window = dict(timeMin="2024-02-01T00:00:00Z", timeMax="2024-03-01T00:00:00Z", singleEvents=True, q="weekly")
+        expand = RecurrenceExpander.expand_recurring_event
+
+        with patch.object(RecurrenceExpander, "expand_recurring_event", side_effect=expand) as expander:
+            first = list_events(**window)["items"]
+            first[0]["summary"] = "changed by the caller"
+            second = list_events(**window)["items"]
+            self.assertEqual(expander.call_count, 1)
+
+            patch_event(series["id"], "primary", {"summary": "Weekly sync"})
+            third = list_events(**window)["items"]
+            self.assertEqual(expander.call_count, 2)
+
+        self.assertEqual([event["summary"] for event in second], ["Weekly"] * 4)
+        self.assertEqual([event["summary"] for event in third], ["Weekly sync"] * 4)
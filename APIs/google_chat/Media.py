@@ -5,6 +5,7 @@ from common_utils.print_log import print_log
 import re
 from typing import Any, Dict, Union
 from .SimulationEngine.db import DB
+from .SimulationEngine.utils import _records_named
 from .SimulationEngine.custom_errors import (
     InvalidParentFormatError, 
 )
@@ -81,7 +82,7 @@ def download(resourceName: str) -> Dict[str, Union[Dict, str]]:
         DB["Attachment"] = []
     
     # Search for the attachment in the database
-    for attachment in DB["Attachment"]:
+    for attachment in _records_named(DB["Attachment"], resourceName):
         if attachment.get("name") == resourceName:
             print(f"Successfully downloaded media: {resourceName}")
             return attachment.copy()  # Return a copy to prevent external modifications
@@ -201,4 +202,4 @@ def upload(parent: str, attachment_request: Dict[str, Union[str, str]]) -> Dict[
     if "Attachment" not in DB:
         DB["Attachment"] = []
     DB["Attachment"].append(attachment)
-    return attachment
+    return DB["Attachment"][-1]
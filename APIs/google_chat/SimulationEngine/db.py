@@ -1,11 +1,12 @@
 from common_utils.print_log import print_log
+from common_utils.tracked_db import track_changes
 from .db_models import GoogleChatDB
 # APIs/google_chat/SimulationEngine/db.py
 
 import json
 import os
 
-DB = {
+DB = track_changes({
     "media": [{"resourceName": ""}],
     "User": [
         {
@@ -174,7 +175,7 @@ DB = {
             "source": "",
         }
     ],
-}
+}, path_depth=2)
 
 
 def save_state(filepath: str) -> None:
@@ -0,0 +1,199 @@
+# APIs/google_chat/SimulationEngine/table_index.py
+"""
+Postings over the list tables of the Google Chat DB (DB["Space"],
+DB["Membership"], DB["Message"], DB["Reaction"], ...).
+
+A `TableIndex` maps, built on first use for a key extractor (a function of
+one record returning the keys it is filed under), each key to the positions
+of the records holding it. The utils module files records:
+
+- under their resource name, for the get / update / delete lookups by name;
+- under every resource name their own name is nested in ("spaces/A" and
+  "spaces/A/messages" for "spaces/A/messages/1"), which gives the messages
+  and memberships of a space and the reactions of a message in table order;
+- under the thread of a message, for its replies;
+- under (member, membership name) for memberships, which gives the spaces
+  of a member.
+
+Lookups return candidate positions: a superset of the matching records,
+which the callers then check with the same code as before. Records the
+extractor fails on (not a dict, no name, an unhashable value) are always
+candidates, so the checks still decide, or fail, on them.
+
+Appending a record or changing one in place re-indexes just that position on
+the next lookup (see common_utils.synced_index).
+Removing or inserting records shifts the positions after them, and is
+recorded as a change of the table as a whole; like replacing the table (or
+the DB, e.g. load_state) it drops the index of the table, which is rebuilt
+on the next lookup. `table_index.get` returns None for untracked DBs, which
+are scanned.
+
+`TableIndexes.cached` memoizes the filtered and sorted results of list
+functions until one of the tables they read changes, so paging through a
+result slices the same list instead of filtering and sorting the table
+again for every page. A result may be scoped to the records of one table
+filed under a posting key (e.g. the messages of one space): changes of that
+table then only drop it when they touch a record that was, or now is, filed
+under that key.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from common_utils.synced_index import CollectionIndexes
+from common_utils.tracked_db import get_change_tracker
+
+RESULT_CACHE_SIZE = 64
+
+
+class TableIndex:
+    """Postings of the records of one list table, per key extractor."""
+
+    def __init__(self, records: List[Any]):
+        self._records = records
+        # key extractor -> (posting key -> positions, position -> posting keys, irregular positions)
+        self._postings: Dict[Callable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def records(self, positions: Iterable[int]) -> List[Any]:
+        """The records at `positions`, in table order."""
+        records = self._records
+        return [records[position] for position in sorted(positions)]
+
+    def refresh(self, position: int):
+        """Re-indexes the record at `position` after it was appended or changed."""
+        self._unindex(position)
+        if position >= len(self._records):
+            return
+        record = self._records[position]
+        for keys_of, postings in self._postings.items():
+            self._file(keys_of, *postings, position, record)
+
+    def lookup(self, keys_of: Callable[[Any], Iterable[Hashable]], value: Hashable) -> Set[int]:
+        """Candidate positions of the records for which `value in keys_of(record)`."""
+        if keys_of not in self._postings:
+            postings = self._postings[keys_of] = ({}, {}, set())
+            for position, record in enumerate(self._records):
+                self._file(keys_of, *postings, position, record)
+        by_value, _, irregular = self._postings[keys_of]
+        try:
+            positions = by_value.get(value, set())
+        except TypeError:
+            return set(range(len(self._records)))
+        return positions | irregular
+
+    @staticmethod
+    def _file(keys_of, by_value, position_values, irregular, position, record):
+        try:
+            values = set(keys_of(record))
+        except Exception:
+            irregular.add(position)
+            return
+        for value in values:
+            by_value.setdefault(value, set()).add(position)
+        position_values[position] = values
+
+    def _unindex(self, position: int):
+        for by_value, position_values, irregular in self._postings.values():
+            irregular.discard(position)
+            for value in position_values.pop(position, ()):
+                holders = by_value[value]
+                holders.discard(position)
+                if not holders:
+                    del by_value[value]
+
+
+class TableIndexes(CollectionIndexes):
+    """TableIndex of each list table of a tracked Google Chat DB, kept in sync with it."""
+
+    index_type = TableIndex
+    collection_type = list
+
+    def __init__(self):
+        super().__init__()
+        # (tables, query) -> (versions of the tables, DB version, positions in scope or None, result)
+        self._results: "OrderedDict[Tuple, Tuple[Tuple[int, ...], int, Optional[Set[int]], Any]]" = OrderedDict()
+
+    def cached(self, db: Dict[str, Any], tables: Tuple[str, ...], query: Hashable, compute: Callable[[], Any],
+               scope: Optional[Tuple[str, Callable[[Any], Iterable[Hashable]], Hashable]] = None) -> Any:
+        """
+        The result of `compute()`, reused for the same `query` until one of `tables` changes.
+
+        `compute` must only read `tables` of the DB and the values in `query`.
+        With `scope=(table, keys_of, value)`, `compute` must only read the
+        records of DB[table] filed under `value` by `keys_of`, and changes of
+        the other records of that table keep the result.
+        Untracked DBs and unhashable queries are computed every time.
+        """
+        tracker = get_change_tracker(db)
+        if tracker is None:
+            return compute()
+        key = (tables, query)
+        with self._lock:
+            self._sync(db)
+            versions = tuple(tracker.collection_version(table) for table in tables)
+            try:
+                entry = self._results.get(key)
+            except TypeError:
+                return compute()
+            if entry is not None and (entry[0] == versions or self._unaffected(db, tracker, tables, entry, scope)):
+                self._results[key] = (versions, self._version, entry[2], entry[3])
+                self._results.move_to_end(key)
+                return entry[3]
+            version = self._version
+            positions = self._scope_positions(db, scope)
+        result = compute()
+        with self._lock:
+            if self._db is db:
+                self._results[key] = (versions, version, positions, result)
+                self._results.move_to_end(key)
+                if len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        return result
+
+    def _scope_positions(self, db: Dict[str, Any], scope) -> Optional[Set[int]]:
+        """Positions of the records filed under the key of `scope`, or None without one."""
+        if scope is None:
+            return None
+        table, keys_of, value = scope
+        index = self.get(db, table)
+        return None if index is None else set(index.lookup(keys_of, value))
+
+    def _unaffected(self, db: Dict[str, Any], tracker, tables: Tuple[str, ...], entry, scope) -> bool:
+        """Whether the changes since `entry` was cached leave its scoped result as it is."""
+        positions = entry[2]
+        if positions is None:
+            return False
+        changes = tracker.changes_since(entry[1])
+        if changes is None:
+            return False
+        table = scope[0]
+        current = None
+        for path in changes:
+            if not path:
+                return False
+            if path[0] not in tables:
+                continue
+            if path[0] != table or len(path) < 2 or not isinstance(path[1], int):
+                return False
+            if current is None:
+                current = self._scope_positions(db, scope)
+                if current is None:
+                    return False
+            if path[1] in positions or path[1] in current:
+                return False
+        return True
+
+    def reset(self):
+        with self._lock:
+            super().reset()
+            self._results.clear()
+
+    def _sync(self, db: Dict[str, Any]):
+        if db is not self._db or self._version is None:
+            self._results.clear()
+        super()._sync(db)
+
+
+table_index = TableIndexes()
@@ -2,6 +2,7 @@
 # APIs/google_chat/SimulationEngine/utils.py
 
 from .db import DB, CURRENT_USER_ID
+from .table_index import table_index
 from datetime import datetime
 from typing import Optional, Dict, Any, List as TypingList, List, Tuple, Callable
 from common_utils.print_log import print_log
@@ -19,7 +20,7 @@ def _create_user(display_name: str, type: str = None):
         "createTime": datetime.utcnow().isoformat() + "Z",
     }
     DB["User"].append(user)
-    return user
+    return DB["User"][-1]
 
 
 def _change_user(user_id: str) -> None:
@@ -583,3 +584,99 @@ def get_space_sort_key(sort_field: str) -> Callable[[Dict[str, Any]], Any]:
         return allowed[field_lc](space)
 
     return _key
+
+
+# ---------------------------------------------------------------------------
+# Indexed lookups over the list tables of the DB (see table_index.py)
+# ---------------------------------------------------------------------------
+
+
+def _name_keys(record: Dict[str, Any]) -> Tuple[Any]:
+    """Posting keys of a record: its resource name."""
+    return (record["name"],)
+
+
+def _name_prefix_keys(record: Dict[str, Any]) -> List[str]:
+    """Posting keys of a record: the resource names its own name is nested in.
+
+    "spaces/A/messages/1" is filed under "spaces", "spaces/A" and
+    "spaces/A/messages", i.e. under every `prefix` for which
+    `name.startswith(prefix + "/")`.
+    """
+    name = record["name"]
+    prefixes = []
+    end = name.find("/")
+    while end != -1:
+        prefixes.append(name[:end])
+        end = name.find("/", end + 1)
+    return prefixes
+
+
+def _thread_keys(message: Dict[str, Any]) -> Tuple[Any]:
+    """Posting keys of a message: the name of its thread."""
+    return (message.get("thread", {}).get("name"),)
+
+
+def _member_keys(membership: Dict[str, Any]) -> Tuple[Tuple[Any, Any]]:
+    """Posting keys of a membership: (name of the member, name of the membership)."""
+    return ((membership.get("member", {}).get("name"), membership.get("name", "")),)
+
+
+def _indexed_records(records: List[Dict[str, Any]], keys_of: Callable[[Dict[str, Any]], Any],
+                     value: Any) -> List[Dict[str, Any]]:
+    """The records of the DB table `records` that may have `value` among `keys_of(record)`.
+
+    The candidates are returned in table order and include every record the
+    index could not file, so callers keep checking them as before. Tables of
+    an untracked DB, or lists that are not a table of DB, are returned whole.
+
+    Args:
+        records (List[Dict[str, Any]]): A table of DB, e.g. DB["Message"].
+        keys_of (Callable[[Dict[str, Any]], Any]): Key extractor of the postings.
+        value (Any): Posting key to look up.
+
+    Returns:
+        List[Dict[str, Any]]: Candidate records, in table order.
+    """
+    table = next((name for name, table_records in DB.items() if table_records is records), None)
+    index = table_index.get(DB, table) if table is not None else None
+    if index is None:
+        return records
+    return index.records(index.lookup(keys_of, value))
+
+
+def _records_named(records: List[Dict[str, Any]], name: Any) -> List[Dict[str, Any]]:
+    """Candidate records of the table `records` whose resource name is `name`."""
+    return _indexed_records(records, _name_keys, name)
+
+
+def _records_under(records: List[Dict[str, Any]], parent: Any) -> List[Dict[str, Any]]:
+    """Candidate records of the table `records` whose resource name starts with `parent + "/"`."""
+    return _indexed_records(records, _name_prefix_keys, parent)
+
+
+def _cached_result(tables: Tuple[str, ...], query: Any, compute: Callable[[], Any],
+                   parent: Optional[Tuple[str, str]] = None) -> Any:
+    """`compute()`, reused for the same `query` until one of the DB `tables` changes.
+
+    With `parent=(table, name)`, `compute` only reads the records of that
+    table nested under the resource `name` (see `_records_under`), and only
+    changes of those records drop the result.
+
+    The result is shared between calls and must not be modified by callers.
+    """
+    scope = None if parent is None else (parent[0], _name_prefix_keys, parent[1])
+    return table_index.cached(DB, tables, query, compute, scope)
+
+
+def _remove_records(records: List[Dict[str, Any]], removed: List[Dict[str, Any]]) -> None:
+    """Removes the records `removed` from the DB table `records` in one pass.
+
+    Equivalent to calling `records.remove(record)` for each of them when every
+    record equal to one of `removed` is in `removed` too, without rescanning
+    the table for each record.
+    """
+    if not removed:
+        return
+    removed_ids = {id(record) for record in removed}
+    records[:] = [record for record in records if id(record) not in removed_ids]
@@ -327,33 +327,41 @@ def list(
 
     # 1) Parent format already validated.
 
-    # 2) Start with memberships whose resource name begins with f"{parent}/members/"
-    all_memberships = []
-    for mem in DB.get("Membership", []): # Use .get for safety
-        if mem.get("name", "").startswith(f"{parent}/members/"):
-            all_memberships.append(mem)
+    def _matching_memberships() -> List[Dict[str, Any]]:
+        # 2) Start with memberships whose resource name begins with f"{parent}/members/"
+        all_memberships = []
+        for mem in utils._records_under(DB.get("Membership", []), f"{parent}/members"): # Use .get for safety
+            if mem.get("name", "").startswith(f"{parent}/members/"):
+                all_memberships.append(mem)
+
+        if useAdminAccess:
+            all_memberships = [
+                m for m in all_memberships if not m.get("name", "").endswith("/members/app")
+            ]
 
-    if useAdminAccess:
-        all_memberships = [
-            m for m in all_memberships if not m.get("name", "").endswith("/members/app")
-        ]
+        if filter: # filter is already known to be a string here if not None
+            exprs = parse_filter(filter)
+            # Convert DNF structure to flat list for our local apply_filter
+            flat_exprs = [expr for group in exprs for expr in group]
+            all_memberships = [m for m in all_memberships if apply_filter(m, flat_exprs)]
+
+        if showGroups is not None and not showGroups:
+            all_memberships = [
+                m
+                for m in all_memberships
+                if not m.get("member", {}).get("name", "").startswith("groups/")
+            ]
+        if showInvited is not None and not showInvited:
+            all_memberships = [
+                m for m in all_memberships if m.get("state", "").upper() != "INVITED"
+            ]
+        return all_memberships
 
-    if filter: # filter is already known to be a string here if not None
-        exprs = parse_filter(filter)
-        # Convert DNF structure to flat list for our local apply_filter
-        flat_exprs = [expr for group in exprs for expr in group]
-        all_memberships = [m for m in all_memberships if apply_filter(m, flat_exprs)]
-
-    if showGroups is not None and not showGroups:
-        all_memberships = [
-            m
-            for m in all_memberships
-            if not m.get("member", {}).get("name", "").startswith("groups/")
-        ]
-    if showInvited is not None and not showInvited:
-        all_memberships = [
-            m for m in all_memberships if m.get("state", "").upper() != "INVITED"
-        ]
+    # Reused while the memberships of the space are unchanged, so each page of the listing only slices it
+    all_memberships = utils._cached_result(
+        ("Membership",), ("list_members", parent, useAdminAccess, filter, showGroups, showInvited),
+        _matching_memberships, parent=("Membership", f"{parent}/members"),
+    )
     
     # 6) Set pageSize and pageToken.
     effective_page_size = pageSize if pageSize is not None else 100
@@ -482,7 +490,7 @@ def get(name: str, useAdminAccess: Optional[bool] = None) -> Dict[str, Union[str
 
     # 1) Locate the membership in DB
     found = None
-    for mem in DB["Membership"]:
+    for mem in utils._records_named(DB["Membership"], name):
         if mem.get("name") == name:
             found = mem
             break
@@ -705,7 +713,7 @@ def create(
     # Check for existing membership
     # Assume DB is accessible globally or passed appropriately in a real application
     global DB  # Using global DB as per original code's context
-    for m in DB["Membership"]:
+    for m in utils._records_named(DB["Membership"], membership_name):
         if m.get("name") == membership_name:
             raise MembershipAlreadyExistsError(f"Membership '{membership_name}' already exists.")
 
@@ -718,7 +726,7 @@ def create(
 
     DB["Membership"].append(membership_data)
     # print(f"Membership created => {membership_data}") # Original had a print
-    return membership_data
+    return DB["Membership"][-1]
 
 
 @tool_spec(
@@ -936,7 +944,7 @@ def patch(
     
     # Locate the membership in DB
     found = None
-    for mem in DB["Membership"]:
+    for mem in utils._records_named(DB["Membership"], name):
         if mem.get("name") == name:
             found = mem
             break
@@ -1073,7 +1081,7 @@ def delete(name: str, useAdminAccess: Optional[bool] = None) -> Dict[str, Union[
 
     # 1) Find the membership in the database.
     target = None
-    for m in DB["Membership"]:
+    for m in utils._records_named(DB["Membership"], name):
         if m.get("name") == name:
             target = m
             break
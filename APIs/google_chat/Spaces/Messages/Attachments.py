@@ -10,6 +10,7 @@ sys.path.append("APIs")
 
 from google_chat.SimulationEngine.custom_errors import AttachmentNotFound, InvalidAttachmentId, InvalidSpaceNameFormatError, ParentMessageNotFound
 from google_chat.SimulationEngine.db import DB
+from google_chat.SimulationEngine.utils import _records_named
 
 
 @tool_spec(
@@ -93,7 +94,7 @@ def get(name: str) -> Dict[str, str]:
 
     # 2) Find the message in DB
     found_message = None
-    for msg in DB["Message"]:
+    for msg in _records_named(DB["Message"], parent_message_name):
         if msg.get("name") == parent_message_name:
             found_message = msg
             break
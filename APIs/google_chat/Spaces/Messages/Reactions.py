@@ -14,6 +14,7 @@ from pydantic import BaseModel, ValidationError, model_validator
 sys.path.append("APIs")
 
 from google_chat.SimulationEngine.db import DB
+from google_chat.SimulationEngine.utils import _records_named, _records_under
 
 
 
@@ -264,7 +265,7 @@ def create(
 
     # Insert into DB
     DB["Reaction"].append(new_reaction)
-    return new_reaction
+    return DB["Reaction"][-1]
 
 
 @tool_spec(
@@ -397,7 +398,7 @@ def list(
 
     # 1) collect all reactions for parent
     all_rxns = []
-    for r in DB["Reaction"]:
+    for r in _records_under(DB["Reaction"], parent + "/reactions"):
         if r["name"].startswith(parent + "/reactions/"):
             all_rxns.append(r)
 
@@ -692,7 +693,7 @@ def delete(name: str) -> Dict:
         )
 
     # Find and remove from DB
-    for r in DB["Reaction"]:
+    for r in _records_named(DB["Reaction"], name):
         if r.get("name") == name:
             DB["Reaction"].remove(r)
             return {}
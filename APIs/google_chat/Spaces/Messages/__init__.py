@@ -14,6 +14,9 @@ from pydantic import BaseModel, Field, validator
 sys.path.append("APIs")
 
 from google_chat.SimulationEngine.db import DB, CURRENT_USER_ID
+from google_chat.SimulationEngine.utils import (
+    _cached_result, _indexed_records, _records_named, _records_under, _remove_records, _thread_keys
+)
 from google_chat.SimulationEngine.custom_errors import (
     MissingThreadDataError, 
     UserNotMemberError, DuplicateRequestIdError, InvalidMessageNameFormatError, 
@@ -457,7 +460,7 @@ def create(
                 return msg
 
     # 1) First check if the space exists
-    space_exists = any(space.get("name") == parent for space in DB.get("Space", []))
+    space_exists = any(space.get("name") == parent for space in _records_named(DB.get("Space", []), parent))
     if not space_exists:
         raise SpaceNotFoundError(
             f"Space '{parent}' does not exist. Please check the space name and try again."
@@ -465,7 +468,8 @@ def create(
     
     # 2) Then verify membership => name = "spaces/{parent}/members/{CURRENT_USER_ID}"
     membership_name = f"{parent}/members/{CURRENT_USER_ID.get('id')}"
-    is_member = any(m.get("name") == membership_name for m in DB.get("Membership", []))
+    is_member = any(m.get("name") == membership_name
+                    for m in _records_named(DB.get("Membership", []), membership_name))
     if not is_member:
         raise UserNotMemberError(
             f"User {CURRENT_USER_ID.get('id')} is not a member of space '{parent}'. Please join the space first."
@@ -543,7 +547,7 @@ def create(
     DB["Message"].append(new_message)
     # print(f"Message {new_msg_name} created successfully.") # Original print
 
-    return new_message
+    return DB["Message"][-1]
 
 
 @tool_spec(
@@ -882,7 +886,8 @@ def list(
     # 1) Check membership
     #    Assumes CURRENT_USER_ID and DB are available in the scope.
     membership_name = f"{parent}/members/{CURRENT_USER_ID.get('id')}" # type: ignore
-    user_is_member = any(mem.get("name") == membership_name for mem in DB["Membership"]) # type: ignore
+    user_is_member = any(mem.get("name") == membership_name
+                         for mem in _records_named(DB["Membership"], membership_name)) # type: ignore
     if not user_is_member:
         # In real usage, you'd raise an error (403). We'll return empty for demonstration.
         return {"messages": []}
@@ -892,6 +897,41 @@ def list(
     if effective_pageSize is None:
         effective_pageSize = 25
 
+    def _ordered_messages() -> List[Dict[str, Any]]:
+        # 4) Gather messages that belong to 'parent'
+        all_msgs = []
+        for msg in _records_under(DB["Message"], parent + "/messages"): # type: ignore
+            if msg.get("name", "").startswith(parent + "/messages/"):
+                all_msgs.append(msg)
+
+        # 5) If showDeleted != True, skip messages that have a non-empty deleteTime
+        if not showDeleted:
+            filtered_msgs = []
+            for m in all_msgs:
+                if not m.get("deleteTime"):
+                    filtered_msgs.append(m)
+            all_msgs = filtered_msgs
+
+        # 6) Filter parse
+        if filter:
+            segments = filter.split("AND")
+            filtered_msgs = [m for m in all_msgs if matches_filter(m, segments)]
+            all_msgs = filtered_msgs
+
+        # 7) Apply ordering based on orderBy parameter
+        if orderBy:
+            parts = orderBy.lower().split()
+            field = "createTime" # parts[0] is "createtime"
+            direction = parts[1] # parts[1] is "asc" or "desc"
+            all_msgs.sort(key=lambda x: x.get(field, ""), reverse=(direction == "desc"))
+        else:
+            all_msgs.sort(key=lambda x: x.get("createTime", ""), reverse=True) # Default sort
+        return all_msgs
+
+    # Reused while the messages of the space are unchanged, so each page of the listing only slices it
+    all_msgs = _cached_result(("Message",), ("list_messages", parent, showDeleted, filter, orderBy),
+                              _ordered_messages, parent=("Message", parent + "/messages"))
+
     # 3) Convert pageToken to offset
     offset = 0
     if pageToken:
@@ -902,35 +942,6 @@ def list(
         except ValueError:
             pass
 
-    # 4) Gather messages that belong to 'parent'
-    all_msgs = []
-    for msg in DB["Message"]: # type: ignore
-        if msg.get("name", "").startswith(parent + "/messages/"):
-            all_msgs.append(msg)
-
-    # 5) If showDeleted != True, skip messages that have a non-empty deleteTime
-    if not showDeleted:
-        filtered_msgs = []
-        for m in all_msgs:
-            if not m.get("deleteTime"):
-                filtered_msgs.append(m)
-        all_msgs = filtered_msgs
-
-    # 6) Filter parse
-    if filter:
-        segments = filter.split("AND")
-        filtered_msgs = [m for m in all_msgs if matches_filter(m, segments)]
-        all_msgs = filtered_msgs
-
-    # 7) Apply ordering based on orderBy parameter
-    if orderBy:
-        parts = orderBy.lower().split()
-        field = "createTime" # parts[0] is "createtime"
-        direction = parts[1] # parts[1] is "asc" or "desc"
-        all_msgs.sort(key=lambda x: x.get(field, ""), reverse=(direction == "desc"))
-    else:
-        all_msgs.sort(key=lambda x: x.get("createTime", ""), reverse=True) # Default sort
-
     # 8) Apply offset + pageSize
     total = len(all_msgs)
     page_end = offset + effective_pageSize
@@ -1205,7 +1216,7 @@ def get(name: str) -> Dict[str, Union[str, bool, int, List[Dict[str, Union[str,
 
     # 2) Check membership => "spaces/AAA/members/{CURRENT_USER_ID}"
     membership_name = f"{space_name}/members/{CURRENT_USER_ID.get('id')}"
-    is_member = any(m.get("name") == membership_name for m in DB["Membership"])
+    is_member = any(m.get("name") == membership_name for m in _records_named(DB["Membership"], membership_name))
     if not is_member:
         print_log(
             f"Caller {CURRENT_USER_ID.get('id')} is not a member of {space_name} => no permission."
@@ -1214,7 +1225,7 @@ def get(name: str) -> Dict[str, Union[str, bool, int, List[Dict[str, Union[str,
 
     # 3) Find the message
     found_msg = None
-    for msg in DB["Message"]:
+    for msg in _records_named(DB["Message"], name):
         if msg.get("name") == name:
             found_msg = msg
             break
@@ -1470,7 +1481,7 @@ def update(name: str, updateMask: str, allowMissing: bool, body: Dict[str, Union
 
     # Look for existing message
     existing = None
-    for msg in DB["Message"]:
+    for msg in _records_named(DB["Message"], name):
         if msg.get("name") == name:
             existing = msg
             break
@@ -1499,6 +1510,7 @@ def update(name: str, updateMask: str, allowMissing: bool, body: Dict[str, Union
                 "attachment": [],
             }
             DB["Message"].append(existing)
+            existing = DB["Message"][-1]
         else:
             print_log("Message not found, allowMissing=False => can't update.")
             return {}
@@ -1986,7 +1998,7 @@ def patch(
 
     # Look for existing message
     existing = None
-    for msg in DB["Message"]:
+    for msg in _records_named(DB["Message"], name):
         if msg.get("name") == name:
             existing = msg  # Reference to actual DB object - modifications auto-save
             break
@@ -2007,6 +2019,7 @@ def patch(
                 "sender": {"name": CURRENT_USER_ID.get("id"), "type": "HUMAN"},
             }
             DB["Message"].append(existing)
+            existing = DB["Message"][-1]
         else:
             print("Message not found, allowMissing=False => can't update.")
             return {}
@@ -2124,7 +2137,8 @@ def delete(name: str, force: Optional[bool]=None) -> None:
     # Check if current user is a member of the space
     if CURRENT_USER_ID and CURRENT_USER_ID.get("id"):
         membership_name = f"{space_name}/members/{CURRENT_USER_ID.get('id')}"
-        is_member = any(m.get("name") == membership_name for m in DB.get("Membership", []))
+        is_member = any(m.get("name") == membership_name
+                        for m in _records_named(DB.get("Membership", []), membership_name))
         
         if not is_member:
             raise UserNotMemberError(
@@ -2137,7 +2151,7 @@ def delete(name: str, force: Optional[bool]=None) -> None:
 
     # 1) Locate the message
     target_msg = None
-    for m in DB.get("Message", []):
+    for m in _records_named(DB.get("Message", []), name):
         if m.get("name") == name:
             target_msg = m
             break
@@ -2151,7 +2165,7 @@ def delete(name: str, force: Optional[bool]=None) -> None:
     replies = []
     
     if target_thread_name:
-        for m in DB.get("Message", []):
+        for m in _indexed_records(DB.get("Message", []), _thread_keys, target_thread_name):
             thread = m.get("thread", {})
             if (thread.get("name") == target_thread_name and 
                 m.get("name") != name):  # Don't count the target message itself
@@ -2165,8 +2179,7 @@ def delete(name: str, force: Optional[bool]=None) -> None:
             )
         else:
             # force=True => remove the replies too
-            for reply in replies:
-                DB["Message"].remove(reply)
+            _remove_records(DB["Message"], replies)
     
     # 4) Remove the target message
     DB["Message"].remove(target_msg)
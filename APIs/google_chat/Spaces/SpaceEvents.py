@@ -11,6 +11,7 @@ from datetime import datetime
 import re
 
 from google_chat.SimulationEngine.db import DB, CURRENT_USER_ID
+from google_chat.SimulationEngine.utils import _records_named, _records_under
 from google_chat.SimulationEngine.custom_errors import (
     UserNotMemberError, InvalidSpaceParentFormatError, InvalidFilterFormatError, InvalidEventTypeError,
     InvalidTimeFormatError, SpaceNotFoundError, InvalidPageSizeError, InvalidPageTokenError,
@@ -258,7 +259,7 @@ def get(name: str) -> Dict[str, Union[str, dict]]:
         print(f"Checking membership for: {membership_name}")
         
         is_member = False
-        for membership in DB.get("Membership", []):
+        for membership in _records_named(DB.get("Membership", []), membership_name):
             if membership.get("name") == membership_name:
                 is_member = True
                 break
@@ -275,7 +276,7 @@ def get(name: str) -> Dict[str, Union[str, dict]]:
     # --- Find the space event in the database ---
     print(f"Searching for space event: {name}")
     found_event = None
-    for event in DB.get("SpaceEvent", []):
+    for event in _records_named(DB.get("SpaceEvent", []), name):
         if event.get("name") == name:
             found_event = event
             break
@@ -538,7 +539,7 @@ def list(
     
     # --- Validate that the space exists ---
     space_exists = False
-    for space in DB.get("Space", []):
+    for space in _records_named(DB.get("Space", []), parent):
         if space.get("name") == parent:
             space_exists = True
             break
@@ -551,7 +552,7 @@ def list(
         membership_name = f"{parent}/members/{CURRENT_USER_ID.get('id')}"
         
         is_member = False
-        for membership in DB.get("Membership", []):
+        for membership in _records_named(DB.get("Membership", []), membership_name):
             if membership.get("name") == membership_name:
                 is_member = True
                 break
@@ -621,7 +622,7 @@ def list(
     # --- Find matching space events in the database ---
     matching_events = []
     
-    for event in DB.get("SpaceEvent", []):
+    for event in _records_under(DB.get("SpaceEvent", []), f"{parent}/spaceEvents"):
         event_name = event.get("name", "")
         
         # Check if event belongs to this space
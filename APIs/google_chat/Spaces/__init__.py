@@ -16,6 +16,9 @@ from google_chat.SimulationEngine.utils import apply_filters
 
 from google_chat.SimulationEngine.db import DB, CURRENT_USER_ID
 from google_chat.SimulationEngine.utils import default_page_size, parse_page_token, get_space_sort_key
+from google_chat.SimulationEngine.utils import (
+    _indexed_records, _member_keys, _records_named, _records_under, _remove_records
+)
 
 from google_chat.SimulationEngine.custom_errors import (
     InvalidPageSizeError, InvalidSpaceNameFormatError, MissingDisplayNameError,
@@ -191,7 +194,9 @@ def list(pageSize: Optional[int] = None, pageToken: Optional[str] = None, filter
     for sp in DB.get("Space", []):
         found_membership = False
         space_name = sp.get('name')
-        for mem in DB.get("Membership", []):
+        # Only this user's membership of this space (and memberships the index could not file) can match
+        member_key = (current_user_id, f"{space_name}/members/{current_user_id}")
+        for mem in _indexed_records(DB.get("Membership", []), _member_keys, member_key):
             # Check if this membership is for the current user by looking at the member.name field
             member_info = mem.get("member", {})
             if member_info.get("name") == current_user_id:
@@ -542,7 +547,7 @@ def get(name: str, useAdminAccess: Optional[bool] = None) -> Dict[str, Union[str
 
     # 1) Find the space in DB["Space"]
     found_space = {}
-    for sp in DB["Space"]:
+    for sp in _records_named(DB["Space"], name):
         if sp.get("name") == name:
             found_space = sp
             break
@@ -555,7 +560,7 @@ def get(name: str, useAdminAccess: Optional[bool] = None) -> Dict[str, Union[str
     membership_name = f'{name}/members/{CURRENT_USER_ID.get("id")}'
     print_log(f"Checking membership for {membership_name}")
     is_member = False
-    for mem in DB["Membership"]:
+    for mem in _records_named(DB["Membership"], membership_name):
         if mem.get("name") == membership_name:
             is_member = True
             break
@@ -1102,7 +1107,7 @@ def setup(setup_body: Dict[str, Union[dict, list]]) -> Dict[str, Union[str, bool
             
             # Check for duplicate membership (defensive programming)
             existing_membership = None
-            for existing in DB.get("Membership", []):
+            for existing in _records_named(DB.get("Membership", []), membership_name):
                 if existing.get("name") == membership_name:
                     existing_membership = existing
                     break
@@ -1543,7 +1548,7 @@ def patch(
     # --- Core Logic ---
     # 1) Locate the space in DB
     target_space = None
-    for sp in DB["Space"]:
+    for sp in _records_named(DB["Space"], name.strip()):
         if sp.get("name") == name.strip():
             target_space = sp
             break
@@ -1741,7 +1746,7 @@ def delete(name: str, useAdminAccess: Optional[bool] = None) -> Dict[str, None]:
 
     # 1) Find the space
     target_space = None
-    for sp in DB["Space"]:
+    for sp in _records_named(DB["Space"], name):
         if sp.get("name") == name:
             target_space = sp
             break
@@ -1756,7 +1761,7 @@ def delete(name: str, useAdminAccess: Optional[bool] = None) -> Dict[str, None]:
         # Check membership
         membership_name = f"{name}/members/{CURRENT_USER_ID.get('id')}"
         is_member = False
-        for mem in DB["Membership"]:
+        for mem in _records_named(DB["Membership"], membership_name):
             if mem.get("name") == membership_name:
                 is_member = True
                 break
@@ -1775,39 +1780,38 @@ def delete(name: str, useAdminAccess: Optional[bool] = None) -> Dict[str, None]:
     # 5) Remove all child resources referencing this space
     #    We'll do it by checking membership, message, reaction, and attachment names that start with "spaces/SPACE_ID"
     to_remove_memberships = []
-    for m in DB["Membership"]:
+    for m in _records_under(DB["Membership"], name):
         if m.get("name", "").startswith(name + "/"):
             to_remove_memberships.append(m)
+    _remove_records(DB["Membership"], to_remove_memberships)
     for m in to_remove_memberships:
-        DB["Membership"].remove(m)
         print_log(f"Removed membership: {m['name']}")
 
     to_remove_messages = []
-    for msg in DB["Message"]:
+    for msg in _records_under(DB["Message"], name):
         if msg.get("name", "").startswith(name + "/"):
             to_remove_messages.append(msg)
+    _remove_records(DB["Message"], to_remove_messages)
     for msg in to_remove_messages:
-        DB["Message"].remove(msg)
         print_log(f"Removed message: {msg['name']}")
 
     # Remove reactions
     to_remove_reactions = []
     if "Reaction" in DB:
-        for r in DB["Reaction"]:
+        for r in _records_under(DB["Reaction"], name):
             if r.get("name", "").startswith(name + "/"):
                 to_remove_reactions.append(r)
+        _remove_records(DB["Reaction"], to_remove_reactions)
         for r in to_remove_reactions:
-            DB["Reaction"].remove(r)
             print_log(f"Removed reaction: {r['name']}")
 
     # Remove attachments
     to_remove_attachments = []
     if "Attachment" in DB:
-        for a in DB["Attachment"]:
+        for a in _records_under(DB["Attachment"], name):
             if a.get("name", "").startswith(name + "/"):
                 to_remove_attachments.append(a)
-        for a in to_remove_attachments:
-            DB["Attachment"].remove(a)
+        _remove_records(DB["Attachment"], to_remove_attachments)
 
     # 6) Return empty response to indicate success
     print_log(f"Space '{name}' and all child resources deleted.")
@@ -0,0 +1,172 @@
+import copy
+import importlib
+import random
+from unittest.mock import patch
+
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+
+from google_chat import Spaces
+from google_chat.Spaces import Members
+from google_chat.Spaces import Messages
+from google_chat.Spaces.Messages import Reactions
+from google_chat.SimulationEngine.db import DB, CURRENT_USER_ID
+from google_chat.SimulationEngine.table_index import table_index
+from google_chat.SimulationEngine.utils import _indexed_records, _records_named, _records_under, _thread_keys
+
+USERS = [f"users/u{i}" for i in range(5)]
+
+
+def _random_tables(seed=0):
+    rng = random.Random(seed)
+    tables = {"Space": [], "Membership": [], "Message": [], "Reaction": [], "Attachment": [], "User": []}
+    for s in range(8):
+        space = f"spaces/S{s}"
+        tables["Space"].append({"name": space, "spaceType": "SPACE", "displayName": f"Space {s}"})
+        for user in USERS:
+            if rng.random() < 0.6:
+                tables["Membership"].append({"name": f"{space}/members/{user}", "state": "JOINED",
+                                             "member": {"name": user, "type": "HUMAN"}})
+        for m in range(rng.randrange(5, 20)):
+            tables["Message"].append({"name": f"{space}/messages/m{m}", "text": rng.choice(["hi", "bye"]),
+                                      "createTime": f"2024-01-{rng.randrange(1, 28):02d}T00:00:00Z",
+                                      "thread": {"name": f"{space}/threads/t{rng.randrange(3)}"}})
+            for r in range(rng.randrange(3)):
+                tables["Reaction"].append({"name": f"{space}/messages/m{m}/reactions/r{r}",
+                                           "user": {"name": rng.choice(USERS)}, "emoji": {"unicode": "🙂"}})
+    rng.shuffle(tables["Message"])
+    return tables
+
+
+class TestTableIndex(BaseTestCaseWithErrorHandler):
+    def setUp(self):
+        self._original_DB_state = copy.deepcopy(DB)
+        self._original_user = dict(CURRENT_USER_ID)
+        DB.clear()
+        DB.update(_random_tables())
+        CURRENT_USER_ID.update({"id": USERS[0]})
+
+    def tearDown(self):
+        DB.clear()
+        DB.update(self._original_DB_state)
+        CURRENT_USER_ID.clear()
+        CURRENT_USER_ID.update(self._original_user)
+
+    def _assert_lookups_match_a_scan(self):
+        for name in ("spaces/S1", "spaces/S3/messages/m2", "spaces/S7/members/users/u1", "spaces/missing"):
+            for table in ("Space", "Membership", "Message", "Reaction"):
+                self.assertEqual([r for r in _records_named(DB[table], name) if r.get("name") == name],
+                                 [r for r in DB[table] if r.get("name") == name])
+                self.assertEqual([r for r in _records_under(DB[table], name)
+                                  if r.get("name", "").startswith(name + "/")],
+                                 [r for r in DB[table] if r.get("name", "").startswith(name + "/")])
+
+    def test_lookups_match_a_scan(self):
+        self._assert_lookups_match_a_scan()
+        self.assertIsNotNone(table_index.get(DB, "Message"))
+        self.assertIsNone(table_index.get(copy.deepcopy(DB), "Message"))
+
+    def test_index_follows_changes(self):
+        self._assert_lookups_match_a_scan()
+        DB["Membership"].append({"name": f"spaces/S1/members/{USERS[0]}", "member": {"name": USERS[0]}})
+        created = Messages.create("spaces/S1", {"text": "new"})
+        self.assertIs(created, DB["Message"][-1])
+        DB["Message"][0]["name"] = "spaces/S3/messages/m2"
+        DB["Reaction"][4] = {"name": "spaces/S1/messages/x/reactions/r9"}
+        Spaces.delete("spaces/S2", useAdminAccess=True)
+        DB["Membership"].append({"name": "spaces/S7/members/users/u1", "member": {"name": "users/u1"}})
+        self._assert_lookups_match_a_scan()
+        DB["Message"] = list(reversed(DB["Message"]))
+        self._assert_lookups_match_a_scan()
+        DB.clear()
+        DB.update(_random_tables(seed=1))
+        self._assert_lookups_match_a_scan()
+
+    def test_listings_match_a_scan(self):
+        for space in ("spaces/S0", "spaces/S4"):
+            CURRENT_USER_ID.update({"id": next(m["member"]["name"] for m in DB["Membership"]
+                                               if m["name"].startswith(space + "/"))})
+            messages = sorted((m for m in DB["Message"] if m["name"].startswith(space + "/messages/")),
+                              key=lambda m: m["createTime"], reverse=True)
+            self.assertEqual(Messages.list(space, pageSize=1000)["messages"], messages)
+            self.assertEqual(Members.list(space, pageSize=1000)["memberships"],
+                             [m for m in DB["Membership"] if m["name"].startswith(space + "/members/")])
+            parent = messages[0]["name"]
+            self.assertEqual(Reactions.list(parent)["reactions"],
+                             [r for r in DB["Reaction"] if r["name"].startswith(parent + "/reactions/")])
+        user = USERS[1]
+        CURRENT_USER_ID.update({"id": user})
+        self.assertEqual(Spaces.list(pageSize=100)["spaces"],
+                         [s for s in DB["Space"] if {"name": f"{s['name']}/members/{user}", "state": "JOINED",
+                                                     "member": {"name": user, "type": "HUMAN"}} in DB["Membership"]])
+
+    def test_pages_slice_one_cached_listing(self):
+        space = "spaces/S5"
+        DB["Membership"].append({"name": f"{space}/members/{USERS[0]}", "member": {"name": USERS[0]}})
+        messages_module = importlib.import_module("google_chat.Spaces.Messages")
+        thread_filter = f'thread.name = "{space}/threads/t1"'
+        with patch.object(messages_module, "matches_filter", wraps=messages_module.matches_filter) as matches:
+            pages, token = [], None
+            while True:
+                response = Messages.list(space, pageSize=2, pageToken=token, filter=thread_filter)
+                pages.extend(response["messages"])
+                token = response.get("nextPageToken")
+                if not token:
+                    break
+            expected = [m for m in DB["Message"] if m["name"].startswith(space + "/messages/")
+                        and m["thread"]["name"] == f"{space}/threads/t1"]
+            self.assertEqual(matches.call_count, len([m for m in DB["Message"]
+                                                      if m["name"].startswith(space + "/messages/")]))
+        self.assertEqual(pages, sorted(expected, key=lambda m: m["createTime"], reverse=True))
+        moved = expected[0]
+        moved["thread"]["name"] = f"{space}/threads/t2"
+        self.assertNotIn(moved, Messages.list(space, pageSize=1000, filter=thread_filter)["messages"])
+
+    def test_listing_is_kept_when_other_spaces_change(self):
+        space = "spaces/S5"
+        DB["Membership"].append({"name": f"{space}/members/{USERS[0]}", "member": {"name": USERS[0]}})
+        messages_module = importlib.import_module("google_chat.Spaces.Messages")
+        Messages.list(space, pageSize=2)
+        other = next(m for m in DB["Message"] if m["name"].startswith("spaces/S1/"))
+        other["text"] = "edited"
+        DB["Message"].append({"name": "spaces/S2/messages/new", "createTime": "2024-02-01T00:00:00Z",
+                              "thread": {"name": "spaces/S2/threads/t0"}})
+        with patch.object(messages_module, "_records_under", wraps=messages_module._records_under) as records_under:
+            Messages.list(space, pageSize=2)
+            records_under.assert_not_called()
+            own = next(m for m in DB["Message"] if m["name"].startswith(space + "/"))
+            own["deleteTime"] = "2024-02-01T00:00:00Z"
+            self.assertNotIn(own, Messages.list(space, pageSize=1000)["messages"])
+            records_under.assert_called_once()
+
+    def test_page_tokens_are_offsets_into_the_listing(self):
+        space = "spaces/S5"
+        DB["Membership"].append({"name": f"{space}/members/{USERS[0]}", "member": {"name": USERS[0]}})
+        expected = Messages.list(space, pageSize=1000)["messages"]
+        first = Messages.list(space, pageSize=3)
+        self.assertEqual(first["nextPageToken"], "3")
+        pages, token = list(first["messages"]), first["nextPageToken"]
+        while token:
+            response = Messages.list(space, pageSize=3, pageToken=token)
+            pages.extend(response["messages"])
+            token = response.get("nextPageToken")
+        self.assertEqual(pages, expected)
+
+    def test_updates_write_to_the_stored_message(self):
+        space = "spaces/S6"
+        DB["Membership"].append({"name": f"{space}/members/{USERS[0]}", "member": {"name": USERS[0]}})
+        Messages.patch(f"{space}/messages/client-new", "text", allowMissing=True, message={"text": "patched"})
+        self.assertEqual(Messages.get(f"{space}/messages/client-new")["text"], "patched")
+
+    def test_irregular_records_are_still_checked(self):
+        DB["Membership"].insert(0, {"name": None, "member": "users/u0"})
+        with self.assertRaises(AttributeError):
+            Spaces.list()
+        with self.assertRaises(AttributeError):
+            Members.list("spaces/S0")
+        del DB["Membership"][0]
+        DB["Message"].append({"name": "spaces/S0/messages/odd", "thread": None})
+        thread = next(m for m in DB["Message"] if m["name"].startswith("spaces/S0/"))["thread"]["name"]
+        self.assertEqual([m for m in _records_under(DB["Message"], "spaces/S0")
+                          if m.get("name", "").startswith("spaces/S0/")],
+                         [m for m in DB["Message"] if m.get("name", "").startswith("spaces/S0/")])
+        self.assertIn(DB["Message"][-1], _indexed_records(DB["Message"], _thread_keys, thread))
@@ -3,11 +3,24 @@ from common_utils.print_log import print_log
 # google_maps/Places/__init__.py
 from google_maps.SimulationEngine.db import DB
 from google_maps.SimulationEngine.utils import _haversine_distance
+from google_maps.SimulationEngine.place_index import place_index
 from typing import Optional, Dict, Any, List, Union
 from google_maps.SimulationEngine.models import GetRequest, Place, AutocompleteRequest, AutocompleteResponse, PlacePrediction, Suggestion, SearchNearbyRequest, SearchTextRequest
 from pydantic import ValidationError
 from google_maps.Places import Photos
 
+
+def _candidate_places(circle=None, primary_types=None, types=None):
+    """
+    (place id, place) pairs of the DB, in DB order, that may pass a circle
+    ((latitude, longitude, radius) of its center) and type filters; all of
+    them if the place index cannot narrow the filters down.
+    """
+    index = place_index.for_db(DB)
+    positions = index.candidates(circle, primary_types, types)
+    return DB.items() if positions is None else index.places(DB, positions)
+
+
 @tool_spec(
     spec={
   'name': 'get_place_autocomplete_predictions',
@@ -163,7 +176,13 @@ def autocomplete(request_data: Dict[str, Union[str, int, bool, List[str], Dict[s
     suggestions = []
     query = params.input.lower()
 
-    for place_id, place_data in DB.items():
+    restriction_circle = None
+    if params.locationRestriction and params.locationRestriction.circle:
+        circle = params.locationRestriction.circle
+        if circle.center and circle.radius is not None:
+            restriction_circle = (circle.center.latitude, circle.center.longitude, circle.radius)
+
+    for place_id, place_data in _candidate_places(restriction_circle, params.includedPrimaryTypes):
         if query not in place_data.get("name", "").lower():
             continue
 
@@ -1013,8 +1032,14 @@ def searchNearby(request: Dict[str, Union[str, int, bool, List[str], Dict[str, U
     # This example does not implement rankPreference, regionCode, or routingParameters
     # but acknowledges them for signature completeness.
     
+    # The circle of the validated request, so a malformed one fails validation (ValidationError)
+    restriction_circle = None
+    if validated_request.locationRestriction and validated_request.locationRestriction.circle:
+        circle = validated_request.locationRestriction.circle
+        restriction_circle = (circle.center.latitude, circle.center.longitude, circle.radius)
+
     filtered_places = []
-    for place_id, place_data in DB.items():
+    for place_id, place_data in _candidate_places(restriction_circle, included_primary_types, included_types):
         # Apply filters
         if included_primary_types and place_data.get("primaryType") not in included_primary_types:
             continue
@@ -1055,6 +1080,8 @@ def searchNearby(request: Dict[str, Union[str, int, bool, List[str], Dict[str, U
         #     website=place_data.get("websiteUri"),
         # )
         filtered_places.append(place_data)
+        if len(filtered_places) >= max_result_count:
+            break
     
     return {"places": filtered_places[:max_result_count]}
 
@@ -1558,8 +1585,18 @@ def searchText(request: Dict[str, Union[str, int, bool, dict, list]]) -> Dict[st
     session_token = request.get("sessionToken")
     language_code = request.get('language_code')
 
+    location_circle = request.get("locationBias") or request.get("locationRestriction")
+    location_circle = location_circle.get("circle") if isinstance(location_circle, dict) else None
+    if isinstance(location_circle, dict):
+        center = location_circle["center"]
+        location_circle = (center["latitude"], center["longitude"], location_circle["radius"])
+    else:
+        location_circle = None
+
     results = []
-    for place_id, place in DB.items():
+    for place_id, place in _candidate_places(
+        location_circle, [included_type] if strict_type_filtering and included_type else None
+    ):
         # Basic text search in name and address
         if text_query.lower() not in place.get("name", "").lower() and \
            text_query.lower() not in place.get("formattedAddress", "").lower():
@@ -1606,5 +1643,7 @@ def searchText(request: Dict[str, Union[str, int, bool, dict, list]]) -> Dict[st
         #     website=place.get("websiteUri"),
         # )
         results.append(place)
+        if len(results) >= max_results:
+            break
 
     return {"places": results[:max_results]}
@@ -1,8 +1,10 @@
 # google_maps/SimulationEngine/db.py
 import json
 import os
+from common_utils.tracked_db import track_changes
 
-DB = {
+# Places by id; changes are tracked per place for the place index
+DB = track_changes({
     "place_empire": {
         "areaSummary": {
             "contentBlocks": [
@@ -233,7 +235,7 @@ DB = {
         "servesLunch": False,
         "nationalPhoneNumber": "",
     }
-}
+}, path_depth=1)
 
 
 def save_state(filepath: str) -> None:
@@ -0,0 +1,313 @@
+# google_maps/SimulationEngine/place_index.py
+"""
+Spatial and type indexes over the places of the Google Maps DB.
+
+autocomplete, searchNearby and searchText used to compute the distance of every
+place to the circle of a locationRestriction/locationBias, and to test the type
+filters of every place, on every request. For each place this index keeps its
+position in DB order and:
+
+- its latitude and longitude in numpy arrays, and the grid cell (CELL_DEGREES
+  wide) it falls in, with a map from each cell to the places in it;
+- a map from each of its types, and from its primary type, to the places.
+
+`candidates` returns, in DB order, the places that may pass a circle and type
+filters: those in the cells the circle overlaps, within its radius by a
+vectorized haversine (with a small margin, so that no place the exact check
+keeps is left out), and holding one of the types. The Places functions run
+their usual checks on those places only. Places whose location or types the
+index cannot read (missing coordinates, values that are not numbers or lists)
+are always returned, so the checks treat them as before.
+
+Places added (utils._create_place) or edited are re-indexed on the next
+request (see common_utils.synced_index); deleting a place drops the index.
+"""
+import itertools
+import math
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from common_utils.synced_index import ChangePath, TrackerSyncedIndexes
+
+# As in utils._haversine_distance
+EARTH_RADIUS_METERS = 6371000
+CELL_DEGREES = 0.25
+# Distances of the vectorized haversine may differ from utils._haversine_distance in the last bits
+_DISTANCE_MARGIN = 1e-3
+_DEGREES_MARGIN = 1e-6
+
+Cell = Tuple[int, int]
+
+# Marks a primary type the index cannot read
+_UNREADABLE = object()
+
+
+def haversine_distances(latitude: float, longitude: float, latitudes: np.ndarray,
+                        longitudes: np.ndarray) -> np.ndarray:
+    """utils._haversine_distance from one point to many, in meters."""
+    phi1 = math.radians(latitude)
+    phi2 = np.radians(latitudes)
+    delta_phi = np.radians(latitudes - latitude)
+    delta_lambda = np.radians(longitudes - longitude)
+    a = np.sin(delta_phi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    a = np.clip(a, 0.0, 1.0)
+    return EARTH_RADIUS_METERS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _normalized_longitude(longitude: float) -> float:
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and math.isfinite(value)
+
+
+def _coordinates(place: Any) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) of a place, or None if it has no location the index can read."""
+    try:
+        location = place.get("location")
+        if not location:
+            return None
+        latitude, longitude = location["latitude"], location["longitude"]
+    except Exception:
+        return None
+    if not (_is_number(latitude) and _is_number(longitude) and -90 <= latitude <= 90):
+        return None
+    return float(latitude), float(longitude)
+
+
+def _cell(latitude: float, longitude: float) -> Cell:
+    return math.floor(latitude / CELL_DEGREES), math.floor(_normalized_longitude(longitude) / CELL_DEGREES)
+
+
+class _Entry:
+    __slots__ = ("position", "coordinates", "cell", "types", "primary_type")
+
+    def __init__(self, position: int, place: Any):
+        self.position = position
+        self.coordinates = _coordinates(place)
+        self.cell = _cell(*self.coordinates) if self.coordinates is not None else None
+        try:
+            types = place.get("types", [])
+            self.types = set(types) if isinstance(types, list) else None
+        except Exception:
+            self.types = None
+        try:
+            primary_type = place.get("primaryType")
+            hash(primary_type)
+            self.primary_type = primary_type
+        except Exception:
+            self.primary_type = _UNREADABLE
+
+
+class PlaceFieldIndex:
+    """Cell, coordinate and type indexes of the places of one DB."""
+
+    def __init__(self, db: Dict[str, Any]):
+        self._ids: List[str] = []
+        self._entries: Dict[str, _Entry] = {}
+        self._latitudes = np.full(max(len(db), 16), np.nan)
+        self._longitudes = np.full(max(len(db), 16), np.nan)
+        self._cells: Dict[Cell, Set[int]] = {}
+        self._types: Dict[Any, Set[int]] = {}
+        self._primary_types: Dict[Any, Set[int]] = {}
+        # Places every lookup of a field returns
+        self._unlocated: Set[int] = set()
+        self._untyped: Set[int] = set()
+        self._unreadable_primary: Set[int] = set()
+        for place_id, place in db.items():
+            self.add(place_id, place)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def in_db_order(self, db: Dict[str, Any]) -> bool:
+        return list(db) == self._ids
+
+    def add(self, place_id: str, place: Any):
+        """Indexes a place added at the end of the DB."""
+        position = len(self._ids)
+        self._ids.append(place_id)
+        if position >= len(self._latitudes):
+            self._latitudes = np.concatenate([self._latitudes, np.full(len(self._latitudes), np.nan)])
+            self._longitudes = np.concatenate([self._longitudes, np.full(len(self._longitudes), np.nan)])
+        self._index(place_id, _Entry(position, place))
+
+    def refresh(self, place_id: str, place: Any):
+        """Re-indexes a place replaced or edited in place."""
+        entry = self._entries[place_id]
+        self._unindex(entry)
+        self._index(place_id, _Entry(entry.position, place))
+
+    def knows(self, place_id: str) -> bool:
+        return place_id in self._entries
+
+    def candidates(self, circle: Optional[Tuple[Any, Any, Any]] = None,
+                   primary_types: Optional[Iterable[Any]] = None,
+                   types: Optional[Iterable[Any]] = None) -> Optional[List[int]]:
+        """
+        Positions, in DB order, of the places that may lie within `circle`
+        ((latitude, longitude, radius in meters) of its center), have one of
+        `primary_types` and one of `types`; None if the index cannot narrow
+        the filters down.
+        """
+        narrowed: List[Set[int]] = []
+        if circle is not None:
+            within = self._within(*circle)
+            if within is not None:
+                narrowed.append(within)
+        if primary_types:
+            holders = self._holders(self._primary_types, primary_types, self._unreadable_primary)
+            if holders is not None:
+                narrowed.append(holders)
+        if types:
+            holders = self._holders(self._types, types, self._untyped)
+            if holders is not None:
+                narrowed.append(holders)
+        if not narrowed:
+            return None
+        narrowed.sort(key=len)
+        return sorted(narrowed[0].intersection(*narrowed[1:]))
+
+    def places(self, db: Dict[str, Any], positions: List[int]) -> Iterator[Tuple[str, Any]]:
+        """(place id, place) at each position, as DB.items() yields them."""
+        for position in positions:
+            place_id = self._ids[position]
+            yield place_id, db[place_id]
+
+    @staticmethod
+    def _holders(index: Dict[Any, Set[int]], values: Iterable[Any], irregular: Set[int]) -> Optional[Set[int]]:
+        holders = set(irregular)
+        try:
+            for value in values:
+                holders.update(index.get(value, ()))
+        except TypeError:
+            return None
+        return holders
+
+    def _within(self, latitude: Any, longitude: Any, radius: Any) -> Optional[Set[int]]:
+        if not (_is_number(latitude) and _is_number(longitude) and _is_number(radius)):
+            return None
+        angle = radius / EARTH_RADIUS_METERS
+        if angle >= math.pi / 2:
+            return None
+        if radius < 0:
+            return set(self._unlocated)
+        degrees = math.degrees(angle) + _DEGREES_MARGIN
+        low, high = latitude - degrees, latitude + degrees
+        if low <= -90 or high >= 90:
+            longitude_ranges = None
+        else:
+            spread = math.degrees(math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(latitude)))))
+            longitude_ranges = self._column_ranges(longitude, spread + _DEGREES_MARGIN)
+        rows = range(math.floor(low / CELL_DEGREES), math.floor(high / CELL_DEGREES) + 1)
+        cells = self._cells_in(rows, longitude_ranges)
+        positions = [position for cell in cells for position in self._cells.get(cell, ())]
+        within = set(self._unlocated)
+        if positions:
+            positions = np.fromiter(positions, dtype=np.int64, count=len(positions))
+            distances = haversine_distances(latitude, longitude, self._latitudes[positions], self._longitudes[positions])
+            within.update(positions[distances <= radius + _DISTANCE_MARGIN].tolist())
+        return within
+
+    @staticmethod
+    def _column_ranges(longitude: float, spread: float) -> Optional[List[Tuple[int, int]]]:
+        """Inclusive ranges of grid columns over longitude ± spread."""
+        if spread >= 180:
+            return None
+        start = _normalized_longitude(longitude - spread)
+        end = start + 2 * spread
+        first_column = math.floor(start / CELL_DEGREES)
+        if end < 180:
+            return [(first_column, math.floor(end / CELL_DEGREES))]
+        return [(first_column, math.floor(180 / CELL_DEGREES) - 1),
+                (math.floor(-180 / CELL_DEGREES), math.floor((end - 360) / CELL_DEGREES))]
+
+    def _cells_in(self, rows: range, column_ranges: Optional[List[Tuple[int, int]]]) -> List[Cell]:
+        if column_ranges is None:
+            return [cell for cell in self._cells if cell[0] in rows]
+        count = len(rows) * sum(last - first + 1 for first, last in column_ranges)
+        if count > len(self._cells):
+            return [cell for cell in self._cells
+                    if cell[0] in rows and any(first <= cell[1] <= last for first, last in column_ranges)]
+        return [(row, column) for row in rows for first, last in column_ranges for column in range(first, last + 1)]
+
+    def _index(self, place_id: str, entry: _Entry):
+        self._entries[place_id] = entry
+        position = entry.position
+        if entry.cell is None:
+            self._unlocated.add(position)
+            self._latitudes[position] = self._longitudes[position] = np.nan
+        else:
+            self._cells.setdefault(entry.cell, set()).add(position)
+            self._latitudes[position], self._longitudes[position] = entry.coordinates
+        if entry.types is None:
+            self._untyped.add(position)
+        else:
+            for place_type in entry.types:
+                self._types.setdefault(place_type, set()).add(position)
+        if entry.primary_type is _UNREADABLE:
+            self._unreadable_primary.add(position)
+        else:
+            self._primary_types.setdefault(entry.primary_type, set()).add(position)
+
+    def _unindex(self, entry: _Entry):
+        position = entry.position
+        if entry.cell is None:
+            self._unlocated.discard(position)
+        else:
+            _discard(self._cells, entry.cell, position)
+        if entry.types is None:
+            self._untyped.discard(position)
+        else:
+            for place_type in entry.types:
+                _discard(self._types, place_type, position)
+        if entry.primary_type is _UNREADABLE:
+            self._unreadable_primary.discard(position)
+        else:
+            _discard(self._primary_types, entry.primary_type, position)
+
+
+def _discard(index: Dict[Any, Set[int]], key: Any, position: int):
+    holders = index.get(key)
+    if holders is not None:
+        holders.discard(position)
+        if not holders:
+            del index[key]
+
+
+class PlaceIndex(TrackerSyncedIndexes):
+    """PlaceFieldIndex kept in sync with a (tracked) Google Maps DB."""
+
+    def for_db(self, db: Dict[str, Any]) -> PlaceFieldIndex:
+        """Returns the up to date index of the places of `db`."""
+        return self._lookup(db, None)
+
+    def _build(self, db: Dict[str, Any], index_key: None) -> PlaceFieldIndex:
+        return PlaceFieldIndex(db)
+
+    def _apply(self, db: Dict[str, Any], changes: List[ChangePath]):
+        index = self._indexes.get(None)
+        if index is None:
+            return
+        if any(path[0] not in db for path in changes):
+            self._drop_all()
+            return
+        edited = [path[0] for path in changes if index.knows(path[0])]
+        added = {path[0] for path in changes} - set(edited)
+        # Places added since are the last ones of the DB
+        tail = list(itertools.islice(reversed(db), len(added)))[::-1]
+        if set(tail) != added:
+            self._drop_all()
+            return
+        for place_id in edited:
+            index.refresh(place_id, db[place_id])
+        for place_id in tail:
+            index.add(place_id, db[place_id])
+        # A place deleted and added again moves to the end of the DB
+        if edited and not index.in_db_order(db):
+            self._drop_all()
+
+
+place_index = PlaceIndex()
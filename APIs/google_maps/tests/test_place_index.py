@@ -0,0 +1,100 @@
+"""
+Test cases for the spatial and type indexes behind autocomplete, searchNearby
+and searchText.
+"""
+
+import copy
+import unittest
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from google_maps.SimulationEngine.db import DB
+from google_maps.SimulationEngine.place_index import haversine_distances, place_index
+from google_maps.SimulationEngine.utils import _create_place, _haversine_distance
+import google_maps.Places as Places
+
+import numpy as np
+from pydantic import ValidationError
+
+
+def _place(place_id, latitude, longitude, primary_type, types):
+    return {"id": place_id, "name": f"Cafe {place_id}", "formattedAddress": "Main Street",
+            "primaryType": primary_type, "types": types,
+            "location": {"latitude": latitude, "longitude": longitude}}
+
+
+class TestPlaceIndex(BaseTestCaseWithErrorHandler):
+    """Places searches through the index against a scan of the DB."""
+
+    def setUp(self):
+        self._saved = copy.deepcopy(dict(DB))
+        DB.clear()
+        place_index.reset()
+        for i in range(40):
+            DB[f"p{i}"] = _place(f"p{i}", 40.0 + (i % 10) * 0.05, -74.0 + (i // 10) * 0.05,
+                                 ["cafe", "bar"][i % 2], [["cafe", "bar"][i % 2], ["food", "park"][i % 3 == 0]])
+        # Across the antimeridian, and without a usable location
+        DB["east"] = _place("east", 10.0, 179.999, "cafe", ["cafe"])
+        DB["west"] = _place("west", 10.0, -179.999, "cafe", ["cafe"])
+        DB["nowhere"] = {"id": "nowhere", "name": "Cafe nowhere", "types": None, "primaryType": "cafe"}
+
+    def tearDown(self):
+        DB.clear()
+        DB.update(self._saved)
+        place_index.reset()
+
+    def _scanned(self, function, request):
+        candidates = Places._candidate_places
+        Places._candidate_places = lambda *args, **kwargs: DB.items()
+        try:
+            return function(request)
+        finally:
+            Places._candidate_places = candidates
+
+    def _assert_as_scanned(self, function, request):
+        self.assertEqual(function(request), self._scanned(function, request), request)
+
+    def test_circles_and_types_match_a_scan(self):
+        circle = {"center": {"latitude": 40.2, "longitude": -73.9}, "radius": 12000}
+        self._assert_as_scanned(Places.searchNearby, {"maxResultCount": 20, "locationRestriction": {"circle": circle}})
+        self._assert_as_scanned(Places.searchNearby, {"maxResultCount": 5, "includedTypes": ["park"],
+                                                      "includedPrimaryTypes": ["cafe"]})
+        self._assert_as_scanned(Places.searchText, {"textQuery": "cafe", "pageSize": 20,
+                                                    "locationBias": {"circle": circle}})
+        self._assert_as_scanned(Places.searchText, {"textQuery": "main", "includedType": "bar",
+                                                    "strictTypeFiltering": True})
+        self._assert_as_scanned(Places.autocomplete, {"input": "cafe", "includedPrimaryTypes": ["bar"],
+                                                      "origin": {"latitude": 40.0, "longitude": -74.0},
+                                                      "locationRestriction": {"circle": circle}})
+
+    def test_circle_across_the_antimeridian(self):
+        circle = {"center": {"latitude": 10.0, "longitude": 180.0}, "radius": 1000}
+        result = Places.searchNearby({"locationRestriction": {"circle": circle}})
+        self.assertEqual([place["id"] for place in result["places"]], ["east", "west", "nowhere"])
+
+    def test_malformed_circle_fails_validation_on_empty_db(self):
+        DB.clear()
+        place_index.reset()
+        with self.assertRaises(ValidationError):
+            Places.searchNearby({"locationRestriction": {"circle": {"radius": 1000}}})
+        self.assertEqual(Places.searchNearby({"locationRestriction": {}}), {"places": []})
+
+    def test_index_follows_new_and_edited_places(self):
+        circle = {"center": {"latitude": 0.0, "longitude": 0.0}, "radius": 1000}
+        request = {"textQuery": "cafe", "locationBias": {"circle": circle}}
+        self.assertEqual(Places.searchText(request)["places"], [])
+
+        _create_place(_place("new", 0.001, 0.001, "cafe", ["cafe"]))
+        DB["p3"]["location"] = {"latitude": -0.001, "longitude": 0.0}
+        self.assertEqual([place["id"] for place in Places.searchText(request)["places"]], ["p3", "new"])
+
+        del DB["p3"]
+        self.assertEqual([place["id"] for place in Places.searchText(request)["places"]], ["new"])
+
+    def test_vectorized_haversine_matches_the_scalar_one(self):
+        latitudes = np.array([40.7, -33.9, 89.9, 0.0])
+        longitudes = np.array([-74.0, 151.2, 10.0, 179.9])
+        expected = [_haversine_distance(51.5, -0.1, lat, lng) for lat, lng in zip(latitudes, longitudes)]
+        np.testing.assert_allclose(haversine_distances(51.5, -0.1, latitudes, longitudes), expected, rtol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
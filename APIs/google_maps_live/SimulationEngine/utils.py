@@ -10,6 +10,7 @@ from typing import Optional, List, Dict, Any, Union
 from dotenv import load_dotenv
 from pydantic import BaseModel, ValidationError
 from common_utils.print_log import print_log
+from common_utils.llm_gateway import LLMRequest, llm_gateway
 from google_maps_live.SimulationEngine.db import DB
 from google_maps_live.SimulationEngine.custom_errors import (
     ParseError, 
@@ -27,6 +28,9 @@ load_dotenv()
 # Type variable for Pydantic models
 T = TypeVar('T', bound=BaseModel)
 
+# Model answering the Live API requests
+LIVE_API_MODEL = "models/chat-bard-003"
+
 
 def get_gemini_response(query: str):
     """
@@ -45,7 +49,13 @@ def get_gemini_response(query: str):
 
     # Construct the query text to send to the model.
     query_text = f"Use @Google Maps to search exactly this query, do not alter it: '{query}'"
-    
+    request = LLMRequest(query_text, LIVE_API_MODEL)
+    # The gateway adds caching, record/replay, rate limiting and retries around the POST request.
+    return llm_gateway.complete(request, service="google_maps_live", live=_post_gemini_request)
+
+
+def _post_gemini_request(request: LLMRequest) -> str:
+    """Sends an LLM gateway request to the Live API and returns the main text response."""
     # Get API key from environment variable
     api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
     if not api_key:
@@ -69,9 +79,9 @@ def get_gemini_response(query: str):
     }
 
     data = {
-        "model": "models/chat-bard-003",
+        "model": request.model,
         "generationConfig": {"candidateCount": 1},
-        "contents": [{"role": "user", "parts": {"text": query_text}}]
+        "contents": [{"role": "user", "parts": {"text": request.prompt}}]
     }
 
     print_log("Sending request to Gemini API...")
@@ -0,0 +1,177 @@
+# google_sheets/SimulationEngine/range_index.py
+"""
+Block index over the stored value ranges of a spreadsheet.
+
+Spreadsheet values are stored in spreadsheet["data"], a dict from A1 range keys
+('Sheet1!A1:C3') to 2D grids; this is also the layout save_state/load_state
+read and write. Reading or writing a range used to parse every stored key and
+test it for overlap, so filling a sheet one range at a time was quadratic.
+
+RangeIndex records, for each stored key whose sheet and bounds follow from the
+key alone, the fixed-size blocks (BLOCK_ROWS rows by BLOCK_COLS columns) it
+covers, so the keys overlapping a range are found from the blocks that range
+covers. Keys that depend on context (no sheet name, or open-ended bounds such
+as 'Sheet1!A:B', which extend to the data) and keys covering too many blocks
+are kept aside and returned by every lookup, to be checked as before. Lookups
+return keys in data order, since later ranges take precedence on reads.
+
+The indexes follow the ChangeTracker of the DB (see common_utils.tracked_db):
+an index stays valid while the DB has not changed since it was built, apart
+from the writes made through it. Untracked data is indexed anew on each lookup.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from common_utils.tracked_db import find_change_tracker
+
+BLOCK_ROWS = 256
+BLOCK_COLS = 26
+# Keys covering more blocks than this are checked on every lookup instead
+MAX_BLOCKS_PER_RANGE = 4096
+MAX_INDEXES = 32
+
+# (start_col, start_row, end_col, end_row), 1-based and inclusive
+Bounds = Tuple[int, int, int, int]
+# (lowercased sheet name, bounds); either is None if it depends on context
+RangeInfo = Tuple[Optional[str], Optional[Bounds]]
+
+
+def _block_span(start: int, end: int, size: int) -> range:
+    low, high = (start, end) if start <= end else (end, start)
+    return range((max(low, 1) - 1) // size, (max(high, 1) - 1) // size + 1)
+
+
+class RangeIndex:
+    """Blocks covered by the stored ranges of one spreadsheet data dict."""
+
+    def __init__(self, data: Dict[str, Any], describe: Callable[[Any], RangeInfo], version: Optional[int] = None):
+        self.data = data
+        # Version of the DB the index is in sync with; None for untracked data
+        self.version = version
+        self._describe = describe
+        self._info: Dict[Any, RangeInfo] = {}
+        self._position: Dict[Any, int] = {}
+        self._next_position = 0
+        self._blocks: Dict[Tuple[str, int, int], Set[Any]] = {}
+        self._sheet_members: Dict[str, Set[Any]] = {}
+        # Keys returned by every lookup
+        self._unindexed: Set[Any] = set()
+        self._extent: Optional[Tuple[int, Optional[int]]] = None
+        self._min_widths: Dict[Any, float] = {}
+        for key in data:
+            self.add(key)
+
+    @property
+    def tracked(self) -> bool:
+        return self.version is not None
+
+    def add(self, key: Any) -> None:
+        """Indexes a key added at the end of the data dict (no-op for a key already there)."""
+        if key in self._position:
+            return
+        self._position[key] = self._next_position
+        self._next_position += 1
+        sheet, bounds = info = self._describe(key)
+        self._info[key] = info
+        if sheet is not None:
+            self._sheet_members.setdefault(sheet, set()).add(key)
+        if sheet is None or bounds is None:
+            self._unindexed.add(key)
+            return
+        rows = _block_span(bounds[1], bounds[3], BLOCK_ROWS)
+        cols = _block_span(bounds[0], bounds[2], BLOCK_COLS)
+        if len(rows) * len(cols) > MAX_BLOCKS_PER_RANGE:
+            self._unindexed.add(key)
+            return
+        for row_block in rows:
+            for col_block in cols:
+                self._blocks.setdefault((sheet, row_block, col_block), set()).add(key)
+
+    def info(self, key: Any) -> RangeInfo:
+        return self._info.get(key, (None, None))
+
+    def candidates(self, sheet: str, bounds: Bounds) -> List[Any]:
+        """Keys that may overlap `bounds` on `sheet`, in data order."""
+        members = self._sheet_members.get(sheet, ())
+        rows = _block_span(bounds[1], bounds[3], BLOCK_ROWS)
+        cols = _block_span(bounds[0], bounds[2], BLOCK_COLS)
+        if len(rows) * len(cols) > len(members):
+            found = set(members)
+        else:
+            found = set()
+            for row_block in rows:
+                for col_block in cols:
+                    found.update(self._blocks.get((sheet, row_block, col_block), ()))
+        found.update(self._unindexed)
+        return sorted(found, key=self._position.__getitem__)
+
+    def sheets(self) -> Iterable[str]:
+        """Sheets of the keys whose sheet follows from the key alone."""
+        return self._sheet_members.keys()
+
+    def keys_without_sheet(self) -> List[Any]:
+        return [key for key in self._unindexed if self._info[key][0] is None]
+
+    def extent(self, compute: Callable[[], Tuple[int, Optional[int]]]) -> Tuple[int, Optional[int]]:
+        """(most rows of a grid, most cells of a row or None if there is no row), computed on first use."""
+        if self._extent is None:
+            self._extent = compute()
+        return self._extent
+
+    def grow_extent(self, rows: int, cols: int) -> None:
+        """Accounts for a grid that now has `rows` rows, the widest having `cols` cells."""
+        if self._extent is None:
+            return
+        if self._extent[1] is None:
+            self._extent = None
+            return
+        self._extent = (max(self._extent[0], rows), max(self._extent[1], cols))
+
+    def min_width(self, key: Any) -> float:
+        """Fewest cells in a row of the grid stored under `key` (inf for an empty grid)."""
+        width = self._min_widths.get(key)
+        if width is None:
+            width = min((len(row) for row in self.data[key]), default=float("inf"))
+            self._min_widths[key] = width
+        return width
+
+    def set_min_width(self, key: Any, width: float) -> None:
+        self._min_widths[key] = width
+
+    def mark_synced(self) -> None:
+        """Records that the DB changed only through this index since it was last in sync."""
+        if self.version is not None:
+            tracker = find_change_tracker(self.data)
+            self.version = tracker.version if tracker is not None else None
+
+
+class RangeIndexes:
+    """RangeIndex per spreadsheet data dict, for the most recently used spreadsheets."""
+
+    def __init__(self, max_indexes: int = MAX_INDEXES):
+        self.max_indexes = max_indexes
+        self._lock = threading.RLock()
+        self._indexes: "OrderedDict[int, RangeIndex]" = OrderedDict()
+
+    def for_data(self, data: Dict[str, Any], describe: Callable[[Any], RangeInfo]) -> RangeIndex:
+        """Returns the up to date index of `data`."""
+        tracker = find_change_tracker(data)
+        if tracker is None:
+            return RangeIndex(data, describe)
+        with self._lock:
+            index = self._indexes.get(id(data))
+            if index is None or index.data is not data or index.version != tracker.version:
+                index = RangeIndex(data, describe, tracker.version)
+                self._indexes[id(data)] = index
+                if len(self._indexes) > self.max_indexes:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(id(data))
+            return index
+
+    def reset(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+
+range_indexes = RangeIndexes()
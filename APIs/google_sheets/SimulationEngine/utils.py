@@ -5,9 +5,14 @@ within the database. It provides functions for ensuring user and file
 existence, and managing counters.
 """
 
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
 import re
 from .db import DB
+from .range_index import RangeIndex, range_indexes
+from common_utils.tracked_db import find_change_tracker
+
+_CLOSED_RANGE_PATTERN = re.compile(r"^[A-Za-z]+\d+(:[A-Za-z]+\d+)?$")
 
 def _ensure_user(userId: str = "me") -> None:
     """Ensures that a user entry exists in the database.
@@ -59,7 +64,7 @@ def update_dynamic_data(
     new_values: List[List[str]]
 ) -> None:
     """
-    Dynamically updates a specific range by rebuilding the data grid.
+    Dynamically updates a specific range, growing the stored grid that contains its start if needed.
 
     Args:
         target_range_str (str): The desired range in A1 notation.
@@ -72,23 +77,27 @@ def update_dynamic_data(
     target_sheet, target_range = split_sheet_and_range(target_range_str, spreadsheet_data)
     target_start_col, target_start_row, _, _ = parse_a1_range(target_range, spreadsheet_data)
 
-    for stored_range_key, stored_values in spreadsheet_data.items():
-        stored_sheet, stored_range = split_sheet_and_range(stored_range_key, spreadsheet_data)
-        if stored_sheet != target_sheet:
+    index = range_indexes.for_data(spreadsheet_data, _describe_stored_range)
+    target_cell = (target_start_col, target_start_row, target_start_col, target_start_row)
+    for stored_range_key in index.candidates(target_sheet, target_cell):
+        stored_bounds = _stored_range_bounds(index, stored_range_key, target_sheet, spreadsheet_data, spreadsheet_data)
+        if stored_bounds is None:
             continue
-
-        stored_start_col, stored_start_row, stored_end_col, stored_end_row = parse_a1_range(stored_range, spreadsheet_data)
+        stored_start_col, stored_start_row, stored_end_col, stored_end_row = stored_bounds
 
         # Check if the target range starts within the stored range
         if (
             stored_start_col <= target_start_col <= stored_end_col and
             stored_start_row <= target_start_row <= stored_end_row
         ):
+            stored_values = spreadsheet_data[stored_range_key]
             row_offset = target_start_row - stored_start_row
             col_offset = target_start_col - stored_start_col
 
-            # 1. Create a deep copy of the grid to modify safely.
-            new_grid = [row[:] for row in stored_values]
+            # 1. A tracked DB copies the values stored into it (see common_utils.tracked_db),
+            # so its grids share no rows with the callers' values and are updated in place;
+            # other grids are copied, as callers may still hold them.
+            new_grid = stored_values if index.tracked else [row[:] for row in stored_values]
 
             # 2. Calculate required dimensions and resize the grid if necessary.
             num_new_rows = len(new_values)
@@ -98,32 +107,94 @@ def update_dynamic_data(
             required_cols = col_offset + num_new_cols
 
             # Pad rows
+            existing_rows = len(new_grid)
+            min_width = index.min_width(stored_range_key)
             while len(new_grid) < required_rows:
                 new_grid.append([])
-            
-            # Pad columns
-            for i in range(len(new_grid)):
-                while len(new_grid[i]) < required_cols:
-                    new_grid[i].append("")
+
+            # Pad columns (only the new rows, if the existing ones are wide enough)
+            for i in range(0 if min_width < required_cols else existing_rows, len(new_grid)):
+                if len(new_grid[i]) < required_cols:
+                    new_grid[i].extend([""] * (required_cols - len(new_grid[i])))
+            index.set_min_width(
+                stored_range_key,
+                required_cols if len(new_grid) > existing_rows else max(min_width, required_cols),
+            )
 
             # 3. Place new values into the resized grid.
             for i, new_row in enumerate(new_values):
                 for j, new_cell in enumerate(new_row):
                     new_grid[row_offset + i][col_offset + j] = new_cell
 
-            # 4. Explicitly replace the old data with the new, updated grid.
-            # This is the key fix.
-            spreadsheet_data[stored_range_key] = new_grid
+            # 4. Replace the old data with the updated copy.
+            if new_grid is not stored_values:
+                spreadsheet_data[stored_range_key] = new_grid
+            index.grow_extent(len(new_grid), required_cols)
+            index.mark_synced()
             return True
 
     # If no matching range was found, create a new entry for the data.
     if target_range_str not in spreadsheet_data:
         spreadsheet_data[target_range_str] = new_values
+        index.add(target_range_str)
+        index.grow_extent(len(new_values), max((len(row) for row in new_values), default=0))
+        index.mark_synced()
         return True
 
     return False
 
 
+@lru_cache(maxsize=1 << 17)
+def _describe_stored_range(stored_range_key: Any) -> Tuple[Optional[str], Optional[Tuple[int, int, int, int]]]:
+    """
+    Sheet (lowercased) and bounds of a stored range key, as far as the key alone determines them.
+
+    A key without a sheet name belongs to the first sheet of its spreadsheet, and an
+    open-ended range (e.g. 'A:B') extends to the data, so these parts are None for such keys.
+    """
+    if not isinstance(stored_range_key, str) or '!' not in stored_range_key:
+        return None, None
+    sheet, range_part = split_sheet_and_range(stored_range_key)
+    if not _CLOSED_RANGE_PATTERN.match(range_part):
+        return sheet, None
+    return sheet, parse_a1_range(range_part, None)
+
+
+def _stored_range_bounds(
+    index: RangeIndex,
+    stored_range_key: Any,
+    target_sheet: str,
+    spreadsheet_for_sheets: Optional[dict],
+    spreadsheet_data: dict,
+) -> Optional[Tuple[int, int, int, int]]:
+    """Bounds (start_col, start_row, end_col, end_row) of a stored range on `target_sheet`, else None."""
+    stored_sheet, stored_bounds = index.info(stored_range_key)
+    if stored_sheet is None or stored_bounds is None:
+        stored_sheet, stored_range = split_sheet_and_range(stored_range_key, spreadsheet_for_sheets)
+        if stored_sheet.lower() != target_sheet.lower():
+            return None
+        return parse_a1_range(stored_range, spreadsheet_data)
+    if stored_sheet != target_sheet.lower():
+        return None
+    return stored_bounds
+
+
+def _data_extent(spreadsheet_data: dict) -> Tuple[int, Optional[int]]:
+    """
+    (most rows of a stored grid, most cells of a stored row), used to bound open-ended ranges.
+
+    The second item is None if no grid has any row.
+    """
+    def compute():
+        max_rows = max(len(rows) for rows in spreadsheet_data.values())
+        max_cols = max((len(row) for rows in spreadsheet_data.values() for row in rows), default=None)
+        return max_rows, max_cols
+
+    if find_change_tracker(spreadsheet_data) is None:
+        return compute()
+    return range_indexes.for_data(spreadsheet_data, _describe_stored_range).extent(compute)
+
+
 def get_first_visible_sheet(spreadsheet_data: dict) -> str:
     """
     Gets the first visible sheet from a spreadsheet.
@@ -322,20 +393,28 @@ def parse_a1_range(a1_range: str, spreadsheet_data: dict) -> Tuple[int, int, int
     def row_to_index(row: str) -> int:
         return int(row)
 
+    def max_rows() -> int:
+        return _data_extent(spreadsheet_data)[0] if spreadsheet_data else 1
+
+    def max_cols() -> int:
+        if not spreadsheet_data:
+            return 1
+        cols = _data_extent(spreadsheet_data)[1]
+        if cols is None:
+            raise ValueError("max() arg is an empty sequence")
+        return cols
+
     # Handle empty range (sheet-only reference)
     if not a1_range:
         # Return the entire sheet range
-        max_rows = max(len(rows) for rows in spreadsheet_data.values()) if spreadsheet_data else 1
-        max_cols = max(len(row) for rows in spreadsheet_data.values() for row in rows) if spreadsheet_data else 1
-        return 1, 1, max_cols, max_rows
+        return 1, 1, max_cols(), max_rows()
 
     # Handle single cell or column reference
     if ':' not in a1_range:
         if re.match(r"^[A-Za-z]+$", a1_range):
             # Column reference like 'A' - entire column
             col_idx = col_to_index(a1_range)
-            max_rows = max(len(rows) for rows in spreadsheet_data.values()) if spreadsheet_data else 1
-            return col_idx, 1, col_idx, max_rows
+            return col_idx, 1, col_idx, max_rows()
         elif re.match(r"^[A-Za-z]+\d+$", a1_range):
             # Single cell reference like 'A1'
             col, row = re.match(r"([A-Za-z]+)(\d+)", a1_range).groups()
@@ -345,8 +424,7 @@ def parse_a1_range(a1_range: str, spreadsheet_data: dict) -> Tuple[int, int, int
         elif re.match(r"^\d+$", a1_range):
             # Row reference like '1' - entire row
             row_idx = int(a1_range)
-            max_cols = max(len(row) for rows in spreadsheet_data.values() for row in rows) if spreadsheet_data else 1
-            return 1, row_idx, max_cols, row_idx
+            return 1, row_idx, max_cols(), row_idx
 
     # Handle ranges with colon
     start, end = a1_range.split(':')
@@ -355,15 +433,13 @@ def parse_a1_range(a1_range: str, spreadsheet_data: dict) -> Tuple[int, int, int
     if re.match(r"^[A-Za-z]+$", start) and re.match(r"^[A-Za-z]+$", end):
         start_col_idx = col_to_index(start)
         end_col_idx = col_to_index(end)
-        max_rows = max(len(rows) for rows in spreadsheet_data.values()) if spreadsheet_data else 1
-        return start_col_idx, 1, end_col_idx, max_rows
+        return start_col_idx, 1, end_col_idx, max_rows()
 
     # Handle row ranges like '1:2'
     if re.match(r"^\d+$", start) and re.match(r"^\d+$", end):
         start_row_idx = int(start)
         end_row_idx = int(end)
-        max_cols = max(len(row) for rows in spreadsheet_data.values() for row in rows) if spreadsheet_data else 1
-        return 1, start_row_idx, max_cols, end_row_idx
+        return 1, start_row_idx, max_cols(), end_row_idx
 
     # Handle mixed ranges like 'A2:C' (cell to column)
     start_match = re.match(r"([A-Za-z]+)(\d+)", start)
@@ -390,14 +466,12 @@ def parse_a1_range(a1_range: str, spreadsheet_data: dict) -> Tuple[int, int, int
         # End is just a column like C
         end_col_idx = col_to_index(end)
         # For column-only end, use max rows from spreadsheet data
-        max_rows = max(len(rows) for rows in spreadsheet_data.values()) if spreadsheet_data else 1
-        end_row_idx = max_rows
+        end_row_idx = max_rows()
     elif re.match(r"^\d+$", end):
         # End is just a row like 2
         end_row_idx = int(end)
         # For row-only end, use max columns from spreadsheet data
-        max_cols = max(len(row) for rows in spreadsheet_data.values() for row in rows) if spreadsheet_data else 1
-        end_col_idx = max_cols
+        end_col_idx = max_cols()
     else:
         raise ValueError(f"Invalid end range format: {end}")
 
@@ -459,14 +533,16 @@ def get_dynamic_data(target_range_str: str, spreadsheet_or_data: dict) -> List[L
     result_data = [[""] * num_cols for _ in range(num_rows)]
     data_found = False
 
-    for stored_range_key, stored_values in spreadsheet_data.items():
-        stored_sheet, stored_range = split_sheet_and_range(stored_range_key, spreadsheet_for_sheets)
-        
+    index = range_indexes.for_data(spreadsheet_data, _describe_stored_range)
+    target_bounds = (target_start_col, target_start_row, target_end_col, target_end_row)
+    for stored_range_key in index.candidates(target_sheet.lower(), target_bounds):
         # Compare normalized sheet names for matching
-        if stored_sheet.lower() != target_sheet.lower():
+        stored_bounds = _stored_range_bounds(index, stored_range_key, target_sheet, spreadsheet_for_sheets, spreadsheet_data)
+        if stored_bounds is None:
             continue
 
-        stored_start_col, stored_start_row, stored_end_col, stored_end_row = parse_a1_range(stored_range, spreadsheet_data)
+        stored_values = spreadsheet_data[stored_range_key]
+        stored_start_col, stored_start_row, stored_end_col, stored_end_row = stored_bounds
 
         # Check for overlap
         if (
@@ -477,18 +553,15 @@ def get_dynamic_data(target_range_str: str, spreadsheet_or_data: dict) -> List[L
             row_offset = target_start_row - stored_start_row
             col_offset = target_start_col - stored_start_col
 
-            for i in range(num_rows):
-                stored_row_index = row_offset + i
-
-                if 0 <= stored_row_index < len(stored_values):
-                    row = stored_values[stored_row_index]
+            # Only the target rows and columns the stored grid has
+            for i in range(max(0, -row_offset), min(num_rows, len(stored_values) - row_offset)):
+                row = stored_values[row_offset + i]
 
-                    for j in range(num_cols):
-                        stored_col_index = col_offset + j
-                        if 0 <= stored_col_index < len(row):
-                            # Only update if the cell is currently empty or if we have a non-empty value
-                            if not result_data[i][j] or row[stored_col_index]:
-                                result_data[i][j] = row[stored_col_index]
+                for j in range(max(0, -col_offset), min(num_cols, len(row) - col_offset)):
+                    stored_col_index = col_offset + j
+                    # Only update if the cell is currently empty or if we have a non-empty value
+                    if not result_data[i][j] or row[stored_col_index]:
+                        result_data[i][j] = row[stored_col_index]
 
     # If no data was found, return empty list to maintain backward compatibility
     if not data_found:
@@ -877,8 +950,9 @@ def validate_sheet_exists_in_spreadsheet(range_str: str, spreadsheet_data: dict,
     target_sheet, _ = split_sheet_and_range(range_str, spreadsheet)
     
     # Get available sheets from spreadsheet data
-    available_sheets = set()
-    for stored_range_key in spreadsheet_data.keys():
+    index = range_indexes.for_data(spreadsheet_data, _describe_stored_range)
+    available_sheets = set(index.sheets())
+    for stored_range_key in index.keys_without_sheet():
         stored_sheet, _ = split_sheet_and_range(stored_range_key, spreadsheet)
         available_sheets.add(stored_sheet.lower())
     
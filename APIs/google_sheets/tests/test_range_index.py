@@ -0,0 +1,99 @@
+"""
+Test cases for the range index behind get_dynamic_data/update_dynamic_data.
+"""
+
+import unittest
+from google_sheets.SimulationEngine.db import DB
+from google_sheets.SimulationEngine.range_index import BLOCK_ROWS, range_indexes
+from google_sheets.SimulationEngine.utils import get_dynamic_data, update_dynamic_data
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from .. import (
+    batch_update_spreadsheet_values,
+    create_spreadsheet,
+    get_spreadsheet_values,
+    update_spreadsheet_values,
+)
+
+
+class TestRangeIndex(BaseTestCaseWithErrorHandler):
+    """Reads and writes through the range index against the stored range layout."""
+
+    def setUp(self):
+        DB.clear()
+        DB["users"] = {"me": {"files": {}, "about": {"user": {"emailAddress": "test@example.com"}}}}
+        range_indexes.reset()
+        self.spreadsheet_id = create_spreadsheet(spreadsheet={
+            "properties": {"title": "Index"},
+            "sheets": [{"properties": {"title": "Sheet1", "sheetId": "0", "index": 0}}],
+        })["id"]
+
+    def _data(self):
+        return DB["users"]["me"]["files"][self.spreadsheet_id]["data"]
+
+    def test_rows_written_one_range_at_a_time(self):
+        rows = 3 * BLOCK_ROWS
+        for start in range(1, rows + 1, 100):
+            batch_update_spreadsheet_values(self.spreadsheet_id, "RAW", [
+                {"range": f"Sheet1!A{r}:B{r}", "values": [[f"r{r}", str(r)]]}
+                for r in range(start, min(start + 100, rows + 1))
+            ])
+
+        values = get_spreadsheet_values(self.spreadsheet_id, f"Sheet1!A{BLOCK_ROWS - 1}:B{BLOCK_ROWS + 1}")["values"]
+
+        self.assertEqual(values, [[f"r{r}", str(r)] for r in range(BLOCK_ROWS - 1, BLOCK_ROWS + 2)])
+        self.assertEqual(len(self._data()), rows)
+        self.assertEqual(len(get_spreadsheet_values(self.spreadsheet_id, "Sheet1!A:A")["values"]), 1)
+
+    def test_write_inside_stored_range_extends_it(self):
+        update_spreadsheet_values(self.spreadsheet_id, "Sheet1!A1:C3", "RAW", [["a", "b", "c"]] * 3)
+
+        update_spreadsheet_values(self.spreadsheet_id, "Sheet1!B3:D4", "RAW", [["x", "y", "z"], ["u", "v", "w"]])
+
+        self.assertEqual(list(self._data()), ["Sheet1!A1:C3"])
+        self.assertEqual(self._data()["Sheet1!A1:C3"], [
+            ["a", "b", "c", ""],
+            ["a", "b", "c", ""],
+            ["a", "x", "y", "z"],
+            ["", "u", "v", "w"],
+        ])
+        self.assertEqual(get_spreadsheet_values(self.spreadsheet_id, "Sheet1!C2:D3")["values"], [["c", ""], ["y", "z"]])
+
+    def test_write_inside_stored_range_leaves_written_values_alone(self):
+        row = ["a", "b", "c"]
+        values = [row] * 3
+        update_spreadsheet_values(self.spreadsheet_id, "Sheet1!A1:C3", "RAW", values)
+
+        update_spreadsheet_values(self.spreadsheet_id, "Sheet1!A3:B3", "RAW", [["x", "y"]])
+
+        self.assertEqual(values, [["a", "b", "c"]] * 3)
+        self.assertEqual(self._data()["Sheet1!A1:C3"][1:], [["a", "b", "c"], ["x", "y", "c"]])
+
+    def test_later_ranges_take_precedence(self):
+        update_spreadsheet_values(self.spreadsheet_id, "Sheet1!A1:B2", "RAW", [["1", "2"], ["3", "4"]])
+        self._data()["Sheet1!B2:C2"] = [["new", "5"]]
+
+        self.assertEqual(get_spreadsheet_values(self.spreadsheet_id, "Sheet1!A1:C2")["values"],
+                         [["1", "2", ""], ["3", "new", "5"]])
+
+    def test_index_follows_direct_edits(self):
+        update_spreadsheet_values(self.spreadsheet_id, "Sheet1!A1:A1", "RAW", [["first"]])
+        get_spreadsheet_values(self.spreadsheet_id, "Sheet1!A1:A1")
+
+        del self._data()["Sheet1!A1:A1"]
+        self._data()["Sheet1!A5:A5"] = [["moved"]]
+
+        self.assertEqual(get_spreadsheet_values(self.spreadsheet_id, "Sheet1!A1:A5")["values"],
+                         [[""], [""], [""], [""], ["moved"]])
+
+    def test_keys_without_sheet_or_with_open_bounds(self):
+        data = {"Data!A1:B1": [["h1", "h2"]], "A2:B2": [["x", "y"]], "Data!C:C": [["c1"], ["c2"]]}
+        spreadsheet = {"sheets": [{"properties": {"title": "Data", "index": 0}}], "data": data}
+
+        self.assertEqual(get_dynamic_data("Data!A1:C2", spreadsheet), [["h1", "h2", "c1"], ["x", "y", "c2"]])
+
+        self.assertTrue(update_dynamic_data("Data!B2", data, [["z"]]))
+        self.assertEqual(data["A2:B2"], [["x", "z"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
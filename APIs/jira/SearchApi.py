@@ -220,21 +220,17 @@ def search_issues(
     # --- End of Input Validation ---
 
     # Use JQL service to handle JQL parsing and coordinate with generic search strategies
-    # The JQL service will parse JQL, use appropriate search strategies, and apply JQL conditions
+    # The JQL service will parse JQL, use appropriate search strategies, apply JQL conditions
+    # and cut the page before reading the issues of it
     current_strategy = search_engine_manager.get_current_strategy_name()
-    all_issues = jql_service.search_issues(
+    paged_issues, total = jql_service.search_issues_page(
         jql=current_jql,
         strategy_name=current_strategy,  # Use current strategy from engine manager
-        limit=None,  # Don't limit at the service level, we'll handle pagination here
+        start_at=current_start_at,
+        max_results=current_max_results,
         additional_filters=None
     )
 
-    # Apply pagination
-    total = len(all_issues)
-    # Use current_start_at and current_max_results which account for None inputs and defaults
-    end_index = current_start_at + current_max_results
-    paged_issues = all_issues[current_start_at:end_index]
-
     return {
         "issues": paged_issues,
         "startAt": current_start_at,
@@ -1,5 +1,6 @@
 import json
 import os
+from common_utils.tracked_db import track_changes
 
 DEFAULT_DB_PATH = os.path.join(
     os.path.dirname(
@@ -9,7 +10,7 @@ DEFAULT_DB_PATH = os.path.join(
     "JiraDefaultDB.json",
 )
 
-DB = {}
+DB = track_changes(path_depth=2)
 
 with open(DEFAULT_DB_PATH, "r", encoding="utf-8") as f:
     DB.update(json.load(f))
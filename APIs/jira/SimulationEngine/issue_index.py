@@ -0,0 +1,276 @@
+# APIs/jira/SimulationEngine/issue_index.py
+"""
+Secondary indexes over DB["issues"] for JQL search.
+
+For each issue the index keeps its position in DB order and:
+
+- for project, status, assignee, reporter, priority and issuetype, the value
+  as JQL "=" compares it (lower case; the name of an assignee object), with a
+  map from each value to the issues holding it;
+- for created and updated, the date JQL compares with <, <=, > and >=, in a
+  list of (date, position, key) sorted by date. The list also serves
+  ORDER BY created/updated.
+
+`lookup` answers the indexed conditions of a parsed JQL expression (see
+utils._parse_jql) with the keys that may match it, and whether they match it
+exactly. Conditions it cannot answer (other fields or operators, NOT) leave
+the lookup to the other conditions or to a scan, and the expression is then
+evaluated on the keys it returns. An issue whose indexed value JQL cannot
+evaluate without failing (e.g. a created date that is not a string) is
+returned by every lookup of that field, inexactly, so that the evaluation
+still fails on it as before.
+
+Whatever changes an issue (create, update, assign, bulk operations, delete or
+a direct DB edit) is re-indexed on the next lookup (see
+common_utils.synced_index).
+"""
+import bisect
+import datetime
+import itertools
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from common_utils.synced_index import ChangePath, Route, TrackerSyncedIndexes
+
+from .utils import _parse_issue_date
+
+EQUALITY_FIELDS = ("project", "status", "assignee", "reporter", "priority", "issuetype")
+DATE_FIELDS = ("created", "updated")
+
+# (date, position, key)
+DateKey = Tuple[datetime.date, int, str]
+
+# Issue dates in the ISO formats _parse_issue_date accepts
+_ISO_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:T(\d{2}):(\d{2}):(\d{2})(?:\.\d{1,6})?)?Z?")
+
+# Marks a value JQL cannot evaluate without failing
+_IRREGULAR = object()
+
+
+def _issue_date(value: str) -> datetime.date:
+    """_parse_issue_date(value), without strptime for ISO dates."""
+    match = _ISO_DATE.fullmatch(value)
+    if match:
+        year, month, day, hour, minute, second = match.groups()
+        if hour is None or (int(hour) < 24 and int(minute) < 60 and int(second) < 62):
+            try:
+                return datetime.date(int(year), int(month), int(day))
+            except ValueError:
+                pass
+    return _parse_issue_date(value)
+
+
+def _equality_value(field: str, value: Any) -> Any:
+    """The value of an issue field as JQL "=" compares it (see utils._evaluate_expression)."""
+    if field == "assignee" and isinstance(value, dict):
+        name = value.get("name", "")
+        return name.lower() if isinstance(name, str) else _IRREGULAR
+    return str(value).lower()
+
+
+def _date_value(value: Any) -> Any:
+    """The date JQL range operators compare, None if they never match, _IRREGULAR if they fail."""
+    if not isinstance(value, str):
+        return _IRREGULAR
+    try:
+        return _issue_date(value)
+    except ValueError:
+        return None
+
+
+class _Entry:
+    __slots__ = ("position", "values", "dates")
+
+    def __init__(self, position: int, issue: Any):
+        self.position = position
+        fields = issue.get("fields", {}) if isinstance(issue, dict) else None
+        if isinstance(fields, dict):
+            self.values = {field: _equality_value(field, fields.get(field, "")) for field in EQUALITY_FIELDS}
+            self.dates = {field: _date_value(fields.get(field, "")) for field in DATE_FIELDS}
+        else:
+            self.values = dict.fromkeys(EQUALITY_FIELDS, _IRREGULAR)
+            self.dates = dict.fromkeys(DATE_FIELDS, _IRREGULAR)
+
+
+class IssueFieldIndex:
+    """Value and date indexes of the issues of one DB."""
+
+    def __init__(self, issues: Dict[str, Any]):
+        self._entries: Dict[str, _Entry] = {}
+        self._next_position = 0
+        self._by_value: Dict[str, Dict[str, Set[str]]] = {field: {} for field in EQUALITY_FIELDS}
+        self._by_date: Dict[str, List[DateKey]] = {field: [] for field in DATE_FIELDS}
+        # Keys that every lookup of a field returns
+        self._irregular: Dict[str, Set[str]] = {field: set() for field in EQUALITY_FIELDS + DATE_FIELDS}
+        for key, issue in issues.items():
+            self._index(key, issue)
+        for dates in self._by_date.values():
+            dates.sort()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> List[str]:
+        """Every issue key, in DB order."""
+        return list(self._entries)
+
+    def in_db_order(self, keys: Set[str]) -> List[str]:
+        return sorted(keys, key=lambda key: self._entries[key].position)
+
+    def refresh(self, key: str, issue: Any):
+        """Re-indexes one issue; `issue` is None if it was deleted."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._unindex(key, entry)
+        if issue is None:
+            self._entries.pop(key, None)
+        else:
+            self._index(key, issue, entry.position if entry is not None else None, keep_sorted=True)
+
+    def lookup(self, expression: Dict[str, Any]) -> Tuple[Optional[Set[str]], bool]:
+        """
+        (keys, exact) for a parsed JQL expression: keys of the issues that may
+        match it, or None if the index cannot narrow it down, and whether
+        exactly those issues match it.
+        """
+        kind = expression.get("type")
+        if kind == "always_true":
+            return None, True
+        if kind == "condition":
+            return self._lookup_condition(expression["field"], expression["operator"], expression.get("value"))
+        if kind != "logical" or expression["operator"] not in ("AND", "OR"):
+            return None, False
+        results = [self.lookup(child) for child in expression["children"]]
+        exact = all(result_exact for _, result_exact in results)
+        if expression["operator"] == "OR":
+            if any(keys is None for keys, _ in results):
+                return None, False
+            return set().union(*(keys for keys, _ in results)), exact
+        narrowed = [keys for keys, _ in results if keys is not None]
+        if not narrowed:
+            return None, exact
+        narrowed.sort(key=len)
+        return narrowed[0].intersection(*narrowed[1:]), exact
+
+    def ordered(self, keys: Optional[List[str]], field: str, descending: bool,
+                stop: Optional[int]) -> Optional[List[str]]:
+        """
+        The first `stop` of `keys` (in DB order; None for every issue) as
+        ORDER BY `field` sorts them, or None if `field` is not presorted or
+        some of the issues lack a date.
+        """
+        dates = self._by_date.get(field)
+        if dates is None:
+            return None
+        entries = self._entries
+        if keys is None:
+            if len(dates) != len(entries):
+                return None
+            walk = _descending(dates) if descending else dates
+            return [key for _, _, key in itertools.islice(walk, stop)]
+        if not all(isinstance(entries[key].dates[field], datetime.date) for key in keys):
+            return None
+        if len(keys) * 4 < len(dates):
+            return sorted(keys, key=lambda key: entries[key].dates[field], reverse=descending)[:stop]
+        wanted = set(keys)
+        result = []
+        for _, _, key in (_descending(dates) if descending else dates):
+            if key in wanted:
+                result.append(key)
+                if stop is not None and len(result) >= stop:
+                    break
+        return result
+
+    def _lookup_condition(self, field: str, operator: str, value: Any) -> Tuple[Optional[Set[str]], bool]:
+        irregular = self._irregular.get(field)
+        if field in EQUALITY_FIELDS and isinstance(value, str) and operator == "=":
+            keys = set(self._by_value[field].get(value.lower(), ()))
+        elif field in EQUALITY_FIELDS and field != "assignee" and isinstance(value, list) and operator == "IN":
+            keys = set()
+            for item in value:
+                keys.update(self._by_value[field].get(item.lower(), ()))
+        elif field in DATE_FIELDS and isinstance(value, str) and operator in ("<", "<=", ">", ">="):
+            keys = self._in_range(self._by_date[field], operator, value)
+        else:
+            return None, False
+        keys.update(irregular)
+        return keys, not irregular
+
+    def _in_range(self, dates: List[DateKey], operator: str, value: str) -> Set[str]:
+        try:
+            bound = _parse_issue_date(value)
+        except ValueError:
+            return set()
+        if operator in ("<", ">="):
+            split = bisect.bisect_left(dates, (bound,))
+        else:
+            split = bisect.bisect_right(dates, (bound, float("inf")))
+        selected = dates[:split] if operator in ("<", "<=") else dates[split:]
+        return {key for _, _, key in selected}
+
+    def _index(self, key: str, issue: Any, position: Optional[int] = None, keep_sorted: bool = False):
+        if position is None:
+            position = self._next_position
+            self._next_position += 1
+        entry = self._entries[key] = _Entry(position, issue)
+        for field, value in entry.values.items():
+            if value is _IRREGULAR:
+                self._irregular[field].add(key)
+            else:
+                self._by_value[field].setdefault(value, set()).add(key)
+        add = bisect.insort if keep_sorted else list.append
+        for field, date in entry.dates.items():
+            if date is _IRREGULAR:
+                self._irregular[field].add(key)
+            elif date is not None:
+                add(self._by_date[field], (date, position, key))
+
+    def _unindex(self, key: str, entry: _Entry):
+        for field, value in entry.values.items():
+            if value is _IRREGULAR:
+                self._irregular[field].discard(key)
+                continue
+            holders = self._by_value[field].get(value)
+            if holders is not None:
+                holders.discard(key)
+                if not holders:
+                    del self._by_value[field][value]
+        for field, date in entry.dates.items():
+            if date is _IRREGULAR:
+                self._irregular[field].discard(key)
+            elif date is not None:
+                dates = self._by_date[field]
+                index = bisect.bisect_left(dates, (date, entry.position, key))
+                if index < len(dates) and dates[index] == (date, entry.position, key):
+                    del dates[index]
+
+
+def _descending(dates: List[DateKey]):
+    """Entries from the latest date back, issues of the same date in DB order (as a stable reverse sort)."""
+    end = len(dates)
+    while end > 0:
+        start = bisect.bisect_left(dates, (dates[end - 1][0],), 0, end)
+        yield from dates[start:end]
+        end = start
+
+
+class IssueIndex(TrackerSyncedIndexes):
+    """IssueFieldIndex kept in sync with a (tracked) Jira DB."""
+
+    def for_db(self, db: Dict[str, Any]) -> IssueFieldIndex:
+        """Returns the up to date index of DB["issues"]."""
+        return self._lookup(db, "issues")
+
+    def _build(self, db: Dict[str, Any], collection: str) -> IssueFieldIndex:
+        return IssueFieldIndex(db.get(collection, {}))
+
+    def _route(self, path: ChangePath) -> Iterable[Route]:
+        if path[0] != "issues":
+            return ()
+        return (("issues", path[1] if len(path) > 1 else None),)
+
+    def _refresh(self, db: Dict[str, Any], collection: str, index: IssueFieldIndex, key: str):
+        index.refresh(key, db[collection].get(key))
+
+
+issue_index = IssueIndex()
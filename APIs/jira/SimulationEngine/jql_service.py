@@ -7,13 +7,22 @@ This layer is responsible for:
 3. Coordinating with generic search strategies (substring, semantic, fuzzy, etc.)
 4. Applying JQL-specific filtering, sorting, and pagination
 5. Reconstructing full issues from document chunks
+
+Queries are compiled once into plans (cached on the query) and, unless they
+search text, executed against the issue indexes of issue_index.py.
 """
 
 import re
-from typing import Dict, List, Optional, Any, Union
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Union
+from .db import DB
+from .issue_index import issue_index
 from .search_engine import service_adapter
 from .search_engine import search_engine_manager
 
+# Compiled JQL plans kept, most recently used first
+JQL_PLAN_CACHE_SIZE = 256
+
 
 class JQLService:
     """Service layer that handles JQL parsing and coordinates with generic search strategies."""
@@ -21,6 +30,8 @@ class JQLService:
     def __init__(self):
         self.service_adapter = service_adapter
         self.search_engine_manager = search_engine_manager
+        # Plans keyed on the stripped query; callers must not modify them
+        self._compile_jql = lru_cache(maxsize=JQL_PLAN_CACHE_SIZE)(self._build_plan)
 
     def _reconstruct_issues_from_chunks(self, strategy_name: str = "substring") -> List[Dict]:
         """Reconstruct full issue objects from document chunks."""
@@ -163,145 +174,218 @@ class JQLService:
             # Hybrid combines multiple approaches
             jql_service.search_issues('summary ~ "performance issue"', strategy_name="hybrid")
         """
-        from .utils import _parse_jql, _evaluate_expression, _get_sort_key
-        
+        issues, _ = self.search_issues_page(jql, strategy_name, 0, limit, additional_filters)
+        return issues
+
+    def search_issues_page(
+        self,
+        jql: str = "",
+        strategy_name: str = "substring",
+        start_at: int = 0,
+        max_results: Optional[int] = None,
+        additional_filters: Optional[Dict] = None
+    ) -> Tuple[List[Dict], int]:
+        """
+        Search issues using JQL and return one page of the results.
+
+        Queries without text search terms are answered from the issue indexes
+        (see issue_index.py): the page is cut from the matching issue keys
+        before any issue is read for it. Queries with text search terms
+        pre-filter the issues through the generic search strategy first.
+
+        Args:
+            jql: JQL query string
+            strategy_name: Generic search strategy to use (see search_issues)
+            start_at: Index of the first matching issue to return
+            max_results: Maximum number of issues to return, None for all
+            additional_filters: Additional metadata filters
+
+        Returns:
+            The issues of the page and the total number of matching issues
+        """
         # Validate query
         if jql and not jql.strip():
             raise ValueError("JQL query cannot be just whitespace")
-        
+
+        plan = self._compile_jql(jql.strip()) if jql.strip() else None
+        stop = None if max_results is None else start_at + max_results
+        if plan is not None and plan["search_terms"]:
+            issues = self._search_with_strategy(plan, strategy_name, additional_filters)
+            return issues[start_at:stop], len(issues)
+        return self._search_with_index(plan, start_at, stop, additional_filters)
+
+    def _build_plan(self, jql: str) -> Dict[str, Any]:
+        """Parses a (stripped, non-empty) JQL query into the plan search_issues_page executes."""
+        from .utils import _parse_jql
+
+        jql_components = self._parse_jql_components(jql)
+        jql_conditions = jql_components["jql_conditions"]
+        order_by_clause = jql_components["order_by_clause"]
+        order_field = None
+        descending = False
+        if order_by_clause:
+            parts = order_by_clause.split()
+            order_field = parts[0]
+            descending = len(parts) > 1 and parts[1].upper() == "DESC"
+        return {
+            "jql_conditions": jql_conditions,
+            "expression": _parse_jql(jql_conditions) if jql_conditions else None,
+            "order_field": order_field,
+            "descending": descending,
+            "search_terms": tuple(jql_components["search_terms"]),
+        }
+
+    def _search_with_index(
+        self,
+        plan: Optional[Dict[str, Any]],
+        start_at: int,
+        stop: Optional[int],
+        additional_filters: Optional[Dict]
+    ) -> Tuple[List[Dict], int]:
+        """Matches, orders and pages issue keys through the issue indexes."""
+        from .utils import _evaluate_expression, _get_sort_key
+
+        issues = DB.get("issues", {})
+        index = issue_index.for_db(DB)
+        expression = plan["expression"] if plan is not None else None
+        keys, exact = index.lookup(expression) if expression is not None else (None, True)
+        if keys is not None or not exact or additional_filters:
+            keys = index.keys() if keys is None else index.in_db_order(keys)
+        if not exact or additional_filters:
+            keys = [
+                key for key in keys
+                if (exact or _evaluate_expression(expression, issues[key]))
+                and self._matches_additional_filters(issues[key], additional_filters)
+            ]
+        # keys is None when every issue matches
+        total = len(index) if keys is None else len(keys)
+
+        order_field = plan["order_field"] if plan is not None else None
+        ordered = None
+        if order_field is not None:
+            ordered = index.ordered(keys, order_field, plan["descending"], stop)
+            if ordered is None:
+                keys = index.keys() if keys is None else keys
+                try:
+                    ordered = sorted(
+                        keys,
+                        key=lambda key: _get_sort_key(issues[key], order_field),
+                        reverse=plan["descending"],
+                    )
+                except Exception:
+                    # If sorting fails, continue without sorting
+                    pass
+        if ordered is None:
+            ordered = index.keys()[:stop] if keys is None else keys
+        page = ordered[start_at:stop]
+        return [issues[key] for key in page], total
+
+    def _search_with_strategy(
+        self,
+        plan: Dict[str, Any],
+        strategy_name: str,
+        additional_filters: Optional[Dict]
+    ) -> List[Dict]:
+        """Pre-filters issues by the text search terms of the plan through a search strategy, then applies the JQL."""
+        from .utils import _get_sort_key
+
         # Get all issues for JQL evaluation
         all_issues = self._reconstruct_issues_from_chunks(strategy_name)
-        
-        if not jql.strip():
-            # Empty query returns all issues
-            filtered_issues = all_issues
+        search_terms = list(plan["search_terms"])
+
+        if strategy_name != "substring":
+            # Use generic strategy for initial filtering
+            strategy = self.search_engine_manager.get_strategy_instance(strategy_name)
+            search_query = " ".join(search_terms)
+            
+            # Get candidate documents from generic search
+            candidate_docs = strategy.search(
+                query=search_query,
+                filter=additional_filters,
+                limit=None  # Don't limit at strategy level
+            )
+            
+            # Convert back to issue format for JQL evaluation
+            candidate_issues = []
+            seen_issue_ids = set()
+            for doc in candidate_docs:
+                if hasattr(doc, 'original_json_obj') and doc.original_json_obj:
+                    issue = doc.original_json_obj
+                    issue_id = issue.get('id')
+                    if issue_id and issue_id not in seen_issue_ids:
+                        candidate_issues.append(issue)
+                        seen_issue_ids.add(issue_id)
+                elif isinstance(doc, dict) and 'id' in doc:
+                    # Handle case where strategy returns issue objects directly
+                    issue_id = doc.get('id')
+                    if issue_id and issue_id not in seen_issue_ids:
+                        candidate_issues.append(doc)
+                        seen_issue_ids.add(issue_id)
+            
+            # Use candidates as the base set for JQL evaluation
+            base_issues = candidate_issues if candidate_issues else all_issues
         else:
-            # Parse JQL components
-            jql_components = self._parse_jql_components(jql)
-            jql_conditions = jql_components["jql_conditions"]
-            order_by_clause = jql_components["order_by_clause"]
-            search_terms = jql_components["search_terms"]
+            # For substring strategy, we can still use it for pre-filtering
+            strategy = self.search_engine_manager.get_strategy_instance(strategy_name)
+            search_query = " ".join(search_terms)
             
-            # Track whether we used search strategy for text filtering
-            used_search_strategy = False
+            candidate_docs = strategy.search(
+                query=search_query,
+                filter=additional_filters,
+                limit=None
+            )
             
-            # Option 1: Use generic search strategy to pre-filter if we have search terms
-            if search_terms and strategy_name != "substring":
-                # Use generic strategy for initial filtering
-                strategy = self.search_engine_manager.get_strategy_instance(strategy_name)
-                search_query = " ".join(search_terms)
-                
-                # Get candidate documents from generic search
-                candidate_docs = strategy.search(
-                    query=search_query,
-                    filter=additional_filters,
-                    limit=None  # Don't limit at strategy level
-                )
-                
-                # Convert back to issue format for JQL evaluation
-                candidate_issues = []
-                seen_issue_ids = set()
-                for doc in candidate_docs:
-                    if hasattr(doc, 'original_json_obj') and doc.original_json_obj:
-                        issue = doc.original_json_obj
-                        issue_id = issue.get('id')
-                        if issue_id and issue_id not in seen_issue_ids:
-                            candidate_issues.append(issue)
-                            seen_issue_ids.add(issue_id)
-                    elif isinstance(doc, dict) and 'id' in doc:
-                        # Handle case where strategy returns issue objects directly
-                        issue_id = doc.get('id')
-                        if issue_id and issue_id not in seen_issue_ids:
-                            candidate_issues.append(doc)
-                            seen_issue_ids.add(issue_id)
-                
-                # Use candidates as the base set for JQL evaluation
-                base_issues = candidate_issues if candidate_issues else all_issues
-                used_search_strategy = True
-            elif search_terms and strategy_name == "substring":
-                # For substring strategy, we can still use it for pre-filtering
-                strategy = self.search_engine_manager.get_strategy_instance(strategy_name)
-                search_query = " ".join(search_terms)
-                
-                candidate_docs = strategy.search(
-                    query=search_query,
-                    filter=additional_filters,
-                    limit=None
-                )
-                
-                
-                # Convert to issues
-                candidate_issues = []
-                seen_issue_ids = set()
-                for doc in candidate_docs:
-                    if isinstance(doc, dict) and 'id' in doc:
-                        issue_id = doc.get('id')
-                        if issue_id and issue_id not in seen_issue_ids:
-                            candidate_issues.append(doc)
-                            seen_issue_ids.add(issue_id)
-                
-                base_issues = candidate_issues if candidate_issues else all_issues
-                used_search_strategy = True
-            else:
-                # Use all issues for JQL evaluation
-                base_issues = all_issues
             
-            # Parse JQL and apply conditions with search-strategy-aware evaluation
-            if jql_conditions:
-                expression = _parse_jql(jql_conditions)
-                filtered_issues = []
-                for issue in base_issues:
-                    # If we used search strategy and have search terms, use smart evaluation
-                    if used_search_strategy and search_terms:
-                        if self._evaluate_expression_with_search_context(expression, issue, search_terms):
-                            filtered_issues.append(issue)
-                    else:
-                        # Use standard JQL evaluation
-                        if _evaluate_expression(expression, issue):
-                            filtered_issues.append(issue)
-            else:
-                filtered_issues = base_issues
-                
-            # Apply ORDER BY if specified
-            if order_by_clause:
-                parts = order_by_clause.split()
-                order_field = parts[0]
-                order_dir = "ASC"
-                if len(parts) > 1 and parts[1].upper() in ["ASC", "DESC"]:
-                    order_dir = parts[1].upper()
-                
-                reverse = order_dir == "DESC"
-                
-                try:
-                    filtered_issues = sorted(
-                        filtered_issues,
-                        key=lambda issue: _get_sort_key(issue, order_field),
-                        reverse=reverse,
-                    )
-                except Exception:
-                    # If sorting fails, continue without sorting
-                    pass
+            # Convert to issues
+            candidate_issues = []
+            seen_issue_ids = set()
+            for doc in candidate_docs:
+                if isinstance(doc, dict) and 'id' in doc:
+                    issue_id = doc.get('id')
+                    if issue_id and issue_id not in seen_issue_ids:
+                        candidate_issues.append(doc)
+                        seen_issue_ids.add(issue_id)
+            
+            base_issues = candidate_issues if candidate_issues else all_issues
+
+        # Apply conditions with search-strategy-aware evaluation
+        if plan["expression"] is not None:
+            filtered_issues = [
+                issue for issue in base_issues
+                if self._evaluate_expression_with_search_context(plan["expression"], issue, search_terms)
+            ]
+        else:
+            filtered_issues = base_issues
+
+        # Apply ORDER BY if specified
+        if plan["order_field"]:
+            try:
+                filtered_issues = sorted(
+                    filtered_issues,
+                    key=lambda issue: _get_sort_key(issue, plan["order_field"]),
+                    reverse=plan["descending"],
+                )
+            except Exception:
+                # If sorting fails, continue without sorting
+                pass
 
         # Apply additional filters
         if additional_filters:
-            temp_filtered = []
-            for issue in filtered_issues:
-                match = True
-                for filter_key, filter_value in additional_filters.items():
-                    issue_value = issue.get("fields", {}).get(filter_key)
-                    if str(issue_value) != str(filter_value):
-                        match = False
-                        break
-                if match:
-                    temp_filtered.append(issue)
-            filtered_issues = temp_filtered
-
-        # Apply limit
-        if limit is not None:
-            filtered_issues = filtered_issues[:limit]
-
+            filtered_issues = [
+                issue for issue in filtered_issues
+                if self._matches_additional_filters(issue, additional_filters)
+            ]
         return filtered_issues
 
+    @staticmethod
+    def _matches_additional_filters(issue: Dict, additional_filters: Optional[Dict]) -> bool:
+        """Whether every additional filter equals the issue field of its name (compared as strings)."""
+        for filter_key, filter_value in (additional_filters or {}).items():
+            issue_value = issue.get("fields", {}).get(filter_key)
+            if str(issue_value) != str(filter_value):
+                return False
+        return True
+
     def _evaluate_expression_with_search_context(self, expr, issue: dict, search_terms: List[str]) -> bool:
         """
         Evaluates JQL expression with search context awareness.
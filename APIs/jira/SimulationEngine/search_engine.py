@@ -7,16 +7,16 @@ from .db import DB
 class ServiceAdapter(Adapter):
     """Adapter creates distinct, searchable chunks for each JIRA issue field."""
 
+    tracked_collections = (("issues",),)
+
+    def get_tracked_db(self):
+        return DB
+
     def db_to_searchable_documents(self) -> List[SearchableDocument]:
-        issues = self._get_all_issues()
-        searchable_documents = []
-        for issue in issues:
-            searchable_documents.extend(self._adapt_issue(issue))
-        return searchable_documents
+        return self.records_to_searchable_documents()
 
-    def _get_all_issues(self) -> List[dict]:
-        """Get all issues from the DB."""
-        return list(DB["issues"].values())
+    def record_to_searchable_documents(self, record_path, record) -> List[SearchableDocument]:
+        return self._adapt_issue(record)
     
     def _adapt_issue(self, issue: dict) -> List[SearchableDocument]:
         """Convert a JIRA issue into multiple searchable documents for different fields."""
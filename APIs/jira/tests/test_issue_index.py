@@ -0,0 +1,101 @@
+"""
+Test cases for the issue indexes and compiled plans behind JQL search.
+"""
+
+import copy
+import unittest
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from ..SimulationEngine.db import DB
+from ..SimulationEngine.issue_index import issue_index
+from ..SimulationEngine.jql_service import jql_service
+from ..SimulationEngine.utils import _evaluate_expression, _get_sort_key, _parse_jql
+from .. import create_issue, delete_issue_by_id, search_issues_jql, update_issue_by_id
+
+
+class TestIssueIndex(BaseTestCaseWithErrorHandler):
+    """search_issues_jql through the indexes against a scan of DB["issues"]."""
+
+    def setUp(self):
+        self._saved = copy.deepcopy({key: DB[key] for key in ("issues", "projects")})
+        DB["issues"] = {}
+        DB["projects"]["DEMO"] = {"key": "DEMO", "name": "Demo Project"}
+        DB["projects"]["OPS"] = {"key": "OPS", "name": "Operations"}
+        issue_index.reset()
+        for i in range(12):
+            DB["issues"][f"ISSUE-{i + 1}"] = {"id": f"ISSUE-{i + 1}", "fields": {
+                "project": ["DEMO", "OPS"][i % 2],
+                "summary": f"Issue {i + 1}",
+                "status": ["Open", "In Progress", "Done"][i % 3],
+                "priority": ["High", "Low"][i % 2],
+                "assignee": {"name": ["jdoe", "asmith", "Unassigned"][i % 3]},
+                "created": f"2024-01-{i % 5 + 1:02d}T09:00:00",
+                "updated": f"2024-02-{i + 1:02d}",
+            }}
+
+    def tearDown(self):
+        DB.update(self._saved)
+        issue_index.reset()
+
+    def _ids(self, jql, **kwargs):
+        return [issue["id"] for issue in search_issues_jql(jql=jql, **kwargs)["issues"]]
+
+    def _scan(self, jql):
+        conditions, _, order = jql.partition(" ORDER BY ")
+        issues = list(DB["issues"].values())
+        if conditions:
+            expression = _parse_jql(conditions)
+            issues = [issue for issue in issues if _evaluate_expression(expression, issue)]
+        if order:
+            field, _, direction = order.partition(" ")
+            issues = sorted(issues, key=lambda issue: _get_sort_key(issue, field), reverse=direction == "DESC")
+        return [issue["id"] for issue in issues]
+
+    def test_results_and_pages_match_a_scan(self):
+        for jql in [
+            'project = "demo" AND status IN ("Open", "Done")',
+            'assignee = "JDOE" OR priority = "High"',
+            'created >= "2024-01-03" AND NOT status = "Done"',
+            'updated < "05.02.2024" OR project = "OPS" ORDER BY created DESC',
+            'status != "Open" ORDER BY updated',
+            'priority = "Low" ORDER BY created',
+        ]:
+            expected = self._scan(jql)
+            self.assertEqual(self._ids(jql, max_results=100), expected, jql)
+            page = search_issues_jql(jql=jql, start_at=2, max_results=3)
+            self.assertEqual([issue["id"] for issue in page["issues"]], expected[2:5], jql)
+            self.assertEqual(page["total"], len(expected), jql)
+
+    def test_index_follows_api_calls_and_direct_edits(self):
+        self.assertEqual(self._ids('status = "Done" AND project = "DEMO"'), ["ISSUE-3", "ISSUE-9"])
+
+        created = create_issue({"project": "DEMO", "summary": "New", "status": "Done"})
+        update_issue_by_id("ISSUE-3", {"status": "Open"})
+        delete_issue_by_id("ISSUE-9")
+        DB["issues"]["ISSUE-1"]["fields"]["status"] = "Done"
+
+        self.assertEqual(self._ids('status = "Done" AND project = "DEMO"'), ["ISSUE-1", created["id"]])
+        self.assertEqual(self._ids('status = "Done" ORDER BY created DESC'), [created["id"], "ISSUE-12", "ISSUE-1", "ISSUE-6"])
+
+    def test_dates_the_index_cannot_read_are_handled_as_by_a_scan(self):
+        DB["issues"]["ISSUE-2"]["fields"]["created"] = "not a date"
+        DB["issues"]["ISSUE-4"]["fields"]["created"] = None
+
+        with self.assertRaises(AttributeError):
+            search_issues_jql(jql='created < "2024-01-02"')
+        del DB["issues"]["ISSUE-4"]
+        self.assertEqual(self._ids('created < "2024-01-02"'), ["ISSUE-1", "ISSUE-6", "ISSUE-11"])
+        # ORDER BY over an unreadable date leaves the issues in DB order, as before
+        self.assertEqual(self._ids('project = "OPS" ORDER BY created'), ["ISSUE-2", "ISSUE-6", "ISSUE-8", "ISSUE-10", "ISSUE-12"])
+
+    def test_plans_are_compiled_once_per_query(self):
+        jql = 'project = "DEMO" ORDER BY created'
+        search_issues_jql(jql=jql)
+        hits = jql_service._compile_jql.cache_info().hits
+
+        search_issues_jql(jql=f"  {jql} ")
+
+        self.assertEqual(jql_service._compile_jql.cache_info().hits, hits + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
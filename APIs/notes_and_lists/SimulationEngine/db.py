@@ -2,9 +2,10 @@
 import json
 from typing import Dict, Any
 from copy import deepcopy
+from common_utils.tracked_db import track_changes
 
 
-DB: Dict[str, Any] = {
+DB: Dict[str, Any] = track_changes({
     "notes": {
         "note_1": {
             "id": "note_1",
@@ -243,7 +244,7 @@ DB: Dict[str, Any] = {
             "list_3"
         ]
     }
-}
+}, path_depth=2)
 
 # A snapshot of the initial state of the DB for resetting purposes.
 _INITIAL_DB_STATE = deepcopy(DB)
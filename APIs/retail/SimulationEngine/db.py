@@ -2,6 +2,8 @@ import json
 import os
 from typing import Any, Optional
 
+from common_utils.tracked_db import track_changes
+
 # Define the default path to your JSON DB file
 DEFAULT_DB_PATH = os.path.join(
     os.path.dirname(
@@ -11,11 +13,11 @@ DEFAULT_DB_PATH = os.path.join(
     "RetailDefaultDB.json",
 )
 
-DB: dict[str, Any] = {
-    "orders": {}, 
+DB: dict[str, Any] = track_changes({
+    "orders": {},
     "users": {},
     "products": {},
-}
+}, path_depth=2)
 
 def save_state(filepath: str) -> None: # pragma: no cover
     """Save the current state to a JSON file.
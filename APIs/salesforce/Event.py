@@ -311,7 +311,7 @@ def create(
 
     DB.setdefault("Event", {})
     DB["Event"][new_event["Id"]] = new_event
-    return new_event
+    return DB["Event"][new_event["Id"]]
 
 
 @tool_spec(
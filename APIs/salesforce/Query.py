@@ -1,10 +1,13 @@
 from common_utils.tool_spec_decorator import tool_spec
 # APIs/salesforce/Query.py
-from typing import List, Tuple, Dict, Any, Union
+from typing import List, Tuple, Dict, Any, Optional, Set, Union
+import functools
+import heapq
 import urllib.parse
 import re
 from datetime import datetime, timedelta
 from salesforce.SimulationEngine.db import DB
+from salesforce.SimulationEngine.query_index import sobject_index
 from salesforce.SimulationEngine.models import ConditionsListModel, ValidationError
 from salesforce.SimulationEngine import custom_errors
 
@@ -377,8 +380,12 @@ def _evaluate_single_condition(condition: Dict, record: Dict) -> bool:
     
     record_value = record[field]
     
-    # Check if value is a date literal (for date fields)
-    if isinstance(value, str) and _is_date_literal(value):
+    # Check if value is a date literal (for date fields), using the date bound for this
+    # execution of the query if there is one (see _bind_date_literals)
+    if "date_value" in condition:
+        if condition["date_value"] is not None:
+            return _evaluate_date_condition(str(record_value), operator, condition["date_value"])
+    elif isinstance(value, str) and _is_date_literal(value):
         parsed_literal = _parse_date_literal(value)
         if parsed_literal is not None:
             # Convert to string for date comparison
@@ -397,18 +404,7 @@ def _evaluate_single_condition(condition: Dict, record: Dict) -> bool:
     # For comparison operators, try to match types
     if operator in ["=", "!=", ">", "<", ">=", "<="]:
         # Try to match the type of the value to the record value
-        try:
-            # If value is a string representation of a boolean
-            if isinstance(value, str) and value.lower() in ['true', 'false']:
-                value = value.lower() == 'true'
-            # If value is a string representation of a number
-            elif isinstance(value, str) and value.replace('.', '').replace('-', '').isdigit():
-                if '.' in value:
-                    value = float(value)
-                else:
-                    value = int(value)
-        except (ValueError, AttributeError):
-            pass
+        value = _coerce_value(value)
         
         # Perform comparison
         try:
@@ -431,26 +427,205 @@ def _evaluate_single_condition(condition: Dict, record: Dict) -> bool:
     elif operator == "IN":
         # For IN operator, check if record value is in the list
         # Try to match types for each value in the list
-        matched_values = []
-        for v in value:
-            try:
-                if isinstance(v, str) and v.lower() in ['true', 'false']:
-                    matched_values.append(v.lower() == 'true')
-                elif isinstance(v, str) and v.replace('.', '').replace('-', '').isdigit():
-                    if '.' in v:
-                        matched_values.append(float(v))
-                    else:
-                        matched_values.append(int(v))
-                else:
-                    matched_values.append(v)
-            except (ValueError, AttributeError):
-                matched_values.append(v)
+        matched_values = [_coerce_value(v) for v in value]
         
         return record_value in matched_values
     
     return False
 
 
+def _coerce_value(value: Any) -> Any:
+    """Convert a string spelling a boolean or a number to that value, for comparison with record values."""
+    try:
+        # If value is a string representation of a boolean
+        if isinstance(value, str) and value.lower() in ['true', 'false']:
+            return value.lower() == 'true'
+        # If value is a string representation of a number
+        elif isinstance(value, str) and value.replace('.', '').replace('-', '').isdigit():
+            if '.' in value:
+                return float(value)
+            else:
+                return int(value)
+    except (ValueError, AttributeError):
+        pass
+    return value
+
+
+# Number of parsed queries kept by _compile_query
+QUERY_PLAN_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=QUERY_PLAN_CACHE_SIZE)
+def _compile_query(q: str) -> Dict[str, Any]:
+    """
+    Parse a URL-decoded SOQL query into its plan, cached by query string.
+
+    Returns:
+        Dict: Plan with keys "fields", "obj", "condition_tree" (see _parse_where_clause),
+            "limit", "offset" and "order_by" (the ORDER BY clause text, or None).
+            Date literals are left in the condition tree, to be resolved by
+            _bind_date_literals each time the plan is executed.
+    """
+    parts = q.split()
+
+    if parts[0].upper() != "SELECT":
+        raise ValueError("Invalid SOQL query: Must start with SELECT")
+
+    # Object to query (determine from_index first for robust field parsing)
+    from_index = -1
+    # Find FROM keyword considering it might not be in 'parts' if query is malformed before FROM
+    temp_q_parts = q.split() # Use a fresh split of q to reliably find FROM's original position
+    for i, part in enumerate(temp_q_parts):
+        if part.upper() == "FROM":
+            from_index = i # This index is relative to temp_q_parts
+            break
+    
+    if from_index == -1 or from_index == 0: # from_index == 0 means SELECT is missing or FROM is first
+         # Try to find FROM in the original 'parts' as a fallback if temp_q_parts logic is insufficient or query is very short
+        if "FROM" in parts:
+            from_index = parts.index("FROM")
+        else:
+            raise ValueError("Invalid SOQL query: Missing FROM clause or malformed structure")
+
+    # Fields to select
+    # Use 'parts' for field string construction as 'parts' is what's used for subsequent parsing
+    # Ensure from_index used for slicing 'parts' is valid for 'parts' list length
+    actual_from_index_in_parts = parts.index("FROM") if "FROM" in parts else -1
+    if actual_from_index_in_parts <= 0 : # Must be at least after SELECT (parts[0])
+        raise ValueError("Invalid SOQL query: FROM clause misplaced or missing")
+
+    fields_string = " ".join(parts[1:actual_from_index_in_parts])
+    fields = [field.strip() for field in fields_string.split(",") if field.strip()]
+
+    # Object to query
+    if actual_from_index_in_parts + 1 >= len(parts):
+        raise ValueError("Invalid SOQL query: Missing object name after FROM")
+    obj = parts[actual_from_index_in_parts + 1]
+
+    # Initialize variables for conditions, limit, offset, and order_by
+    where_index = -1
+    limit = None
+    offset = None
+    order_by = None
+
+    # Extract WHERE clause conditions
+    condition_tree = None
+    if "WHERE" in parts:
+        where_index = parts.index("WHERE")
+        # Determine the end of the WHERE clause
+        end_where_index = len(parts)
+        # Find the start of the next major clause to delimit WHERE
+        for i in range(where_index + 1, len(parts)):
+            # Check if the current part is a keyword that terminates a WHERE clause
+            # ORDER BY is two words, so check parts[i] and parts[i+1]
+            if parts[i].upper() == "ORDER" and i + 1 < len(parts) and parts[i+1].upper() == "BY":
+                end_where_index = i
+                break
+            elif parts[i].upper() in ["LIMIT", "OFFSET"]:
+                end_where_index = i
+                break
+        
+        condition_string = " ".join(parts[where_index + 1 : end_where_index])
+        condition_tree = _parse_where_clause(condition_string)
+
+    # Extract LIMIT clause
+    if "LIMIT" in parts:
+        limit_index = parts.index("LIMIT")
+        limit = int(parts[limit_index + 1])
+
+    # Extract OFFSET clause
+    if "OFFSET" in parts:
+        offset_index = parts.index("OFFSET")
+        offset = int(parts[offset_index + 1])
+
+    # Extract ORDER BY clause
+    if "ORDER BY" in q:
+        order_by_index = q.index("ORDER BY")
+        order_by = q[order_by_index + 9 :].strip()  # 9 is length of "ORDER BY "
+        if "LIMIT" in order_by:
+            order_by = order_by[: order_by.index("LIMIT")].strip()
+        if "OFFSET" in order_by:
+            order_by = order_by[: order_by.index("OFFSET")].strip()
+
+    return {
+        "fields": fields,
+        "obj": obj,
+        "condition_tree": condition_tree,
+        "limit": limit,
+        "offset": offset,
+        "order_by": order_by,
+    }
+
+
+def _bind_date_literals(tree: Union[Dict, None]) -> Union[Dict, None]:
+    """
+    Copy a condition tree, resolving the date literals of its conditions against today's date.
+
+    Each condition gets a "date_value" (the parsed date literal, None if its value is
+    not one), so the literals are parsed once per query instead of once per record.
+    """
+    if not tree:
+        return tree
+    if tree["type"] in ("and", "or"):
+        return {"type": tree["type"], "conditions": [_bind_date_literals(cond) for cond in tree["conditions"]]}
+    value = tree.get("value")
+    date_value = None
+    if isinstance(value, str) and _is_date_literal(value):
+        date_value = _parse_date_literal(value)
+    return dict(tree, date_value=date_value)
+
+
+def _tree_candidates(tree: Dict, index) -> Optional[Set[str]]:
+    """Keys of the records of the index that may satisfy a condition tree, None if it cannot tell."""
+    if tree["type"] == "and":
+        candidates = None
+        for cond in tree["conditions"]:
+            keys = _tree_candidates(cond, index)
+            if keys is not None:
+                candidates = keys if candidates is None else candidates & keys
+        return candidates
+
+    if tree["type"] == "or":
+        candidates = set()
+        for cond in tree["conditions"]:
+            keys = _tree_candidates(cond, index)
+            if keys is None:
+                return None
+            candidates |= keys
+        return candidates
+
+    if tree["type"] != "condition" or tree.get("date_value") is not None:
+        return None
+    field, operator, value = tree["field"], tree["operator"], tree["value"]
+    if operator == "=":
+        return index.equal(field, [_coerce_value(value)])
+    if operator == "IN" and isinstance(value, list):
+        return index.equal(field, [_coerce_value(v) for v in value])
+    if operator in (">", "<", ">=", "<="):
+        return index.compare(field, operator, _coerce_value(value))
+    return None
+
+
+def _sort_results(results: List[Dict[str, Any]], field: str, reverse: bool, wanted: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    Sort query results by a field, as `results.sort` would.
+
+    When only the first `wanted` results are used (ORDER BY ... LIMIT) and the sort keys
+    are all strings or all numbers, only those are selected, with a heap.
+    """
+    def sort_key(x):
+        return x.get(field, "")
+
+    if wanted is not None and wanted < len(results):
+        keys = [sort_key(x) for x in results]
+        if (all(isinstance(k, str) for k in keys)
+                or all(isinstance(k, (bool, int, float)) and k == k for k in keys)):
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            return select(wanted, results, key=sort_key)
+    results.sort(key=sort_key, reverse=reverse)
+    return results
+
+
 @tool_spec(
     spec={
         'name': 'execute_soql_query',
@@ -560,96 +735,34 @@ def get(q: str) -> Dict[str, Any]:
     try:
         # Decode URL-encoded query
         q = urllib.parse.unquote(q)
-        parts = q.split()
-
-        if parts[0].upper() != "SELECT":
-            raise ValueError("Invalid SOQL query: Must start with SELECT")
-
-        # Object to query (determine from_index first for robust field parsing)
-        from_index = -1
-        # Find FROM keyword considering it might not be in 'parts' if query is malformed before FROM
-        temp_q_parts = q.split() # Use a fresh split of q to reliably find FROM's original position
-        for i, part in enumerate(temp_q_parts):
-            if part.upper() == "FROM":
-                from_index = i # This index is relative to temp_q_parts
-                break
-        
-        if from_index == -1 or from_index == 0: # from_index == 0 means SELECT is missing or FROM is first
-             # Try to find FROM in the original 'parts' as a fallback if temp_q_parts logic is insufficient or query is very short
-            if "FROM" in parts:
-                from_index = parts.index("FROM")
-            else:
-                raise ValueError("Invalid SOQL query: Missing FROM clause or malformed structure")
-
-        # Fields to select
-        # Use 'parts' for field string construction as 'parts' is what's used for subsequent parsing
-        # Ensure from_index used for slicing 'parts' is valid for 'parts' list length
-        actual_from_index_in_parts = parts.index("FROM") if "FROM" in parts else -1
-        if actual_from_index_in_parts <= 0 : # Must be at least after SELECT (parts[0])
-            raise ValueError("Invalid SOQL query: FROM clause misplaced or missing")
-
-        fields_string = " ".join(parts[1:actual_from_index_in_parts])
-        fields = [field.strip() for field in fields_string.split(",") if field.strip()]
-
-        # Object to query
-        if actual_from_index_in_parts + 1 >= len(parts):
-            raise ValueError("Invalid SOQL query: Missing object name after FROM")
-        obj = parts[actual_from_index_in_parts + 1]
-
-        # Initialize variables for conditions, limit, offset, and order_by
-        where_index = -1
-        limit = None
-        offset = None
-        order_by = None
-
-        # Extract WHERE clause conditions
-        condition_tree = None
-        if "WHERE" in parts:
-            where_index = parts.index("WHERE")
-            # Determine the end of the WHERE clause
-            end_where_index = len(parts)
-            # Find the start of the next major clause to delimit WHERE
-            for i in range(where_index + 1, len(parts)):
-                # Check if the current part is a keyword that terminates a WHERE clause
-                # ORDER BY is two words, so check parts[i] and parts[i+1]
-                if parts[i].upper() == "ORDER" and i + 1 < len(parts) and parts[i+1].upper() == "BY":
-                    end_where_index = i
-                    break
-                elif parts[i].upper() in ["LIMIT", "OFFSET"]:
-                    end_where_index = i
-                    break
-            
-            condition_string = " ".join(parts[where_index + 1 : end_where_index])
-            condition_tree = _parse_where_clause(condition_string)
-
-        # Extract LIMIT clause
-        if "LIMIT" in parts:
-            limit_index = parts.index("LIMIT")
-            limit = int(parts[limit_index + 1])
-            #parts = parts[:limit_index]  # Remove LIMIT part from the query
-
-        # Extract OFFSET clause
-        if "OFFSET" in parts:
-            offset_index = parts.index("OFFSET")
-            offset = int(parts[offset_index + 1])
-            #parts = parts[:offset_index]  # Remove OFFSET part from the query
-
-        # Extract ORDER BY clause
-        if "ORDER BY" in q:
-            order_by_index = q.index("ORDER BY")
-            order_by = q[order_by_index + 9 :].strip()  # 9 is length of "ORDER BY "
-            if "LIMIT" in order_by:
-                order_by = order_by[: order_by.index("LIMIT")].strip()
-            if "OFFSET" in order_by:
-                order_by = order_by[: order_by.index("OFFSET")].strip()
+        plan = _compile_query(q)
+        fields = plan["fields"]
+        obj = plan["obj"]
+        limit = plan["limit"]
+        offset = plan["offset"]
+        order_by = plan["order_by"]
+        condition_tree = _bind_date_literals(plan["condition_tree"])
 
         # Get the appropriate database collection
         if obj not in DB:
             raise ValueError(f"Object {obj} not found in database")
 
+        # Records that may match the conditions, from the field indexes of the object
+        records = DB[obj].values()
+        index = sobject_index.get(DB, obj) if condition_tree else None
+        if index is not None:
+            records = index.records(_tree_candidates(condition_tree, index))
+
+        # Without ORDER BY, the first OFFSET + LIMIT matches are all that is returned
+        wanted = None
+        if limit is not None and limit >= 0 and (offset is None or offset >= 0):
+            wanted = (offset or 0) + limit
+
         # Apply conditions
         results = []
-        for record in DB[obj].values():
+        for record in records:
+            if not order_by and wanted is not None and len(results) >= wanted:
+                break
             match = True
             if condition_tree:
                 match = _evaluate_condition_tree(condition_tree, record)
@@ -668,7 +781,7 @@ def get(q: str) -> Dict[str, Any]:
             field = parts[0].strip()
             # Default to ASC if direction not specified
             direction = parts[1].strip().upper() if len(parts) > 1 else 'ASC'
-            results.sort(key=lambda x: x.get(field, ""), reverse=(direction == "DESC"))
+            results = _sort_results(results, field, direction == "DESC", wanted)
 
         # Apply OFFSET and LIMIT
         if offset is not None:
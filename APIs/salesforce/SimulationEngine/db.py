@@ -9,11 +9,13 @@ from datetime import datetime, timedelta
 from typing import Dict, Any
 import os
 
+from common_utils.tracked_db import track_changes
+
 
 # ---------------------------------------------------------------------------------------
 # In-Memory Database Structure
 # ---------------------------------------------------------------------------------------
-DB: dict = {
+DB: dict = track_changes({
     "Event": {},
     "Task": {
         "layouts": [
@@ -664,7 +666,7 @@ DB: dict = {
             "deletedDate": "2024-01-16T08:20:00Z"
         }
     }
-}
+}, path_depth=2)
 
 # -------------------------------------------------------------------
 # Persistence Helpers
@@ -0,0 +1,200 @@
+# APIs/salesforce/SimulationEngine/query_index.py
+"""
+Field indexes over the SObject tables of the Salesforce DB, for SOQL queries.
+
+For a table such as DB["Task"] or DB["Event"], a `TableIndex` keeps the
+position of each record in DB order and, built on first use for a field:
+
+- a hash index from each value of the field to the records holding it, for
+  `=` and `IN` predicates (Id, WhoId, WhatId, OwnerId, Status, ...);
+- a sorted index of the string values and of the numeric values of the field,
+  for `<`, `<=`, `>` and `>=` predicates, which Python only evaluates between
+  two strings or two numbers.
+
+Lookups return candidate keys: a superset of the matching records, which
+Query.get then checks with the same condition tree as before. Records the
+indexes cannot reason about (not a dict, an unhashable or unordered value)
+are always candidates.
+
+A change of DB[object][key] (create, update, delete, undelete, or a direct
+DB edit) re-indexes just that record on the next lookup (see
+common_utils.synced_index). `sobject_index.get` returns None for untracked
+DBs, which are scanned.
+"""
+import bisect
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from common_utils.synced_index import CollectionIndexes
+
+
+def _sort_class(value: Any) -> Optional[str]:
+    """Which sorted index a value goes to: "str", "number", or None if it is not ordered."""
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, (bool, int)) or (isinstance(value, float) and not math.isnan(value)):
+        return "number"
+    return None
+
+
+class _SortedValues:
+    """Values of one class of a field, in order, with the key of the record holding each."""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.keys: List[str] = []
+
+    def add(self, value: Any, key: str):
+        position = bisect.bisect_right(self.values, value)
+        self.values.insert(position, value)
+        self.keys.insert(position, key)
+
+    def remove(self, value: Any, key: str):
+        start = bisect.bisect_left(self.values, value)
+        position = self.keys.index(key, start, bisect.bisect_right(self.values, value))
+        del self.values[position]
+        del self.keys[position]
+
+    def compare(self, operator: str, value: Any) -> List[str]:
+        """Keys of the values v for which `v <operator> value`."""
+        if operator == ">":
+            return self.keys[bisect.bisect_right(self.values, value):]
+        if operator == ">=":
+            return self.keys[bisect.bisect_left(self.values, value):]
+        if operator == "<":
+            return self.keys[:bisect.bisect_left(self.values, value)]
+        return self.keys[:bisect.bisect_right(self.values, value)]
+
+
+class TableIndex:
+    """Hash and sorted field indexes of the records of one SObject table."""
+
+    def __init__(self, records: Dict[str, Any]):
+        self._records = records
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+        for key in records:
+            self._positions[key] = self._next_position
+            self._next_position += 1
+        # field -> (value -> keys, key -> value, keys of irregular records)
+        self._hashed: Dict[str, Any] = {}
+        # field -> (sort class -> _SortedValues, key -> (sort class, value), keys of irregular records)
+        self._sorted: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def records(self, keys: Optional[Iterable[str]] = None) -> List[Any]:
+        """The records of `keys` (every record if None), in DB order."""
+        if keys is None:
+            return list(self._records.values())
+        positions = self._positions
+        return [self._records[key] for key in sorted(keys, key=positions.__getitem__)]
+
+    def refresh(self, key: str):
+        """Re-indexes the record of `key` after it was set, changed or deleted."""
+        if key in self._positions:
+            self._unindex(key)
+        if key not in self._records:
+            self._positions.pop(key, None)
+            return
+        record = self._records[key]
+        if key not in self._positions or (self._positions[key] != self._next_position - 1
+                                          and key == next(reversed(self._records))):
+            # New, or deleted and set again: last in DB order
+            self._positions.pop(key, None)
+            self._positions[key] = self._next_position
+            self._next_position += 1
+        for field, postings in self._hashed.items():
+            self._hash(field, *postings, key, record)
+        for field, postings in self._sorted.items():
+            self._sort(field, *postings, key, record)
+
+    def equal(self, field: str, values: Iterable[Any]) -> Set[str]:
+        """Candidate keys of the records whose `field` equals one of `values`."""
+        if field not in self._hashed:
+            postings = self._hashed[field] = ({}, {}, set())
+            for key, record in self._records.items():
+                self._hash(field, *postings, key, record)
+        by_value, _, irregular = self._hashed[field]
+        keys = set(irregular)
+        for value in values:
+            try:
+                keys.update(by_value.get(value, ()))
+            except TypeError:
+                return set(self._positions)
+        return keys
+
+    def compare(self, field: str, operator: str, value: Any) -> Optional[Set[str]]:
+        """
+        Candidate keys of the records for which `record[field] <operator> value`,
+        or None if `value` is not a string or a number.
+        """
+        sort_class = _sort_class(value)
+        if sort_class is None:
+            return None
+        if field not in self._sorted:
+            postings = self._sorted[field] = ({}, {}, set())
+            for key, record in self._records.items():
+                self._sort(field, *postings, key, record)
+        by_class, _, irregular = self._sorted[field]
+        keys = set(irregular)
+        if sort_class in by_class:
+            keys.update(by_class[sort_class].compare(operator, value))
+        return keys
+
+    @staticmethod
+    def _hash(field, by_value, key_values, irregular, key, record):
+        if not isinstance(record, dict):
+            irregular.add(key)
+            return
+        if field not in record:
+            return
+        value = record[field]
+        try:
+            by_value.setdefault(value, set()).add(key)
+        except TypeError:
+            irregular.add(key)
+            return
+        key_values[key] = value
+
+    @staticmethod
+    def _sort(field, by_class, key_values, irregular, key, record):
+        if not isinstance(record, dict):
+            irregular.add(key)
+            return
+        if field not in record:
+            return
+        value = record[field]
+        sort_class = _sort_class(value)
+        if sort_class is None:
+            # None, lists and dicts compare to no string or number; anything else might
+            if value is not None and not isinstance(value, (list, dict, float)):
+                irregular.add(key)
+            return
+        by_class.setdefault(sort_class, _SortedValues()).add(value, key)
+        key_values[key] = (sort_class, value)
+
+    def _unindex(self, key: str):
+        for by_value, key_values, irregular in self._hashed.values():
+            irregular.discard(key)
+            if key in key_values:
+                value = key_values.pop(key)
+                holders = by_value[value]
+                holders.discard(key)
+                if not holders:
+                    del by_value[value]
+        for by_class, key_values, irregular in self._sorted.values():
+            irregular.discard(key)
+            if key in key_values:
+                sort_class, value = key_values.pop(key)
+                by_class[sort_class].remove(value, key)
+
+
+class SObjectIndexes(CollectionIndexes):
+    """TableIndex of each SObject table of a tracked Salesforce DB, kept in sync with it."""
+
+    index_type = TableIndex
+
+
+sobject_index = SObjectIndexes()
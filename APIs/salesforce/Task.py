@@ -357,7 +357,7 @@ def create(
     DB.setdefault("Task", {})
     DB["Task"][new_task["Id"]] = new_task
 
-    return new_task
+    return DB["Task"][new_task["Id"]]
 
 
 @tool_spec(
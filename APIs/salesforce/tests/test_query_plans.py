@@ -0,0 +1,106 @@
+import copy
+import importlib
+import random
+from datetime import datetime
+from unittest.mock import patch
+
+from salesforce import execute_soql_query
+from salesforce import Event
+from salesforce.SimulationEngine.db import DB
+from salesforce.SimulationEngine.query_index import sobject_index
+
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+
+QUERIES = [
+    "SELECT Id, Subject FROM Task WHERE Status = 'Completed'",
+    "SELECT Id, Priority FROM Task WHERE Status IN ('Open', 'Deferred') AND Priority != 'Low'",
+    "SELECT Id FROM Task WHERE (Status = 'Open' OR WhoId = '003A') AND Subject LIKE '%call%'",
+    "SELECT Id, Score FROM Task WHERE Score > 50 ORDER BY Score DESC LIMIT 5",
+    "SELECT Id, Score FROM Task WHERE Score <= 10.5 OR Score >= 95",
+    "SELECT Id, ActivityDate FROM Task WHERE ActivityDate >= '2024-03-01' ORDER BY ActivityDate ASC OFFSET 2 LIMIT 4",
+    "SELECT Id, IsHighPriority FROM Task WHERE IsHighPriority = true",
+    "SELECT Id, Subject FROM Task ORDER BY Subject LIMIT 3",
+    "SELECT Id, Subject FROM Task LIMIT 7",
+    "SELECT Id FROM Task WHERE WhatId = '006B' OFFSET 1 LIMIT 2",
+    "SELECT Id FROM Task WHERE Id = 'task-17'",
+    "SELECT Id, Score FROM Task WHERE Score < 'abc'",
+]
+
+
+def _random_tasks(seed=0):
+    rng = random.Random(seed)
+    tasks = {}
+    for i in range(80):
+        task = {
+            "Id": f"task-{i}",
+            "Subject": f"{rng.choice(['Call', 'Email', 'Meet'])} {rng.choice(['call back', 'review', 'demo'])}",
+            "Status": rng.choice(["Open", "Completed", "Deferred", "In Progress"]),
+            "Priority": rng.choice(["Low", "Normal", "High"]),
+            "WhoId": rng.choice(["003A", "003B", None]),
+            "WhatId": rng.choice(["006A", "006B"]),
+            "Score": rng.choice([rng.randint(0, 100), rng.random() * 100, "n/a", None]),
+            "ActivityDate": f"2024-0{rng.randint(1, 6)}-1{rng.randint(0, 9)}",
+            "IsHighPriority": rng.random() < 0.3,
+        }
+        if i % 9 == 0:
+            del task["Score"]
+        tasks[task["Id"]] = task
+    return tasks
+
+
+class TestQueryPlans(BaseTestCaseWithErrorHandler):
+    def setUp(self):
+        self._saved_db = copy.deepcopy(DB)
+        DB.clear()
+        DB.update({"Event": {}, "Task": _random_tasks()})
+
+    def tearDown(self):
+        DB.clear()
+        DB.update(self._saved_db)
+
+    def _scan(self, query):
+        with patch.object(sobject_index, "get", lambda db, obj: None):
+            return execute_soql_query(query)["results"]
+
+    def test_indexed_queries_match_a_scan(self):
+        for query in QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(execute_soql_query(query)["results"], self._scan(query))
+
+    def test_plans_are_cached(self):
+        compile_query = importlib.import_module("salesforce.Query")._compile_query
+        compile_query.cache_clear()
+        for _ in range(3):
+            execute_soql_query("SELECT Id FROM Task WHERE Status = 'Open'")
+        self.assertEqual(compile_query.cache_info().hits, 2)
+
+    def test_date_literals_are_bound_at_execution(self):
+        DB["Task"]["task-0"]["ActivityDate"] = "2024-05-10"
+        query = "SELECT Id FROM Task WHERE ActivityDate = TODAY"
+
+        class FixedDate(datetime):
+            day = None
+
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.fromisoformat(cls.day)
+
+        with patch("salesforce.Query.datetime", FixedDate):
+            FixedDate.day = "2024-05-10T12:00:00"
+            self.assertIn({"Id": "task-0"}, execute_soql_query(query)["results"])
+            FixedDate.day = "2024-05-11T12:00:00"
+            self.assertNotIn({"Id": "task-0"}, execute_soql_query(query)["results"])
+
+    def test_indexes_follow_db_changes(self):
+        query = "SELECT Id, Location FROM Event WHERE Location = 'Boardroom'"
+        self.assertEqual(execute_soql_query(query)["results"], [])
+        event = Event.create(Subject="Sync", Location="Boardroom")
+        self.assertEqual(execute_soql_query(query)["results"], [{"Id": event["Id"], "Location": "Boardroom"}])
+        Event.update(event["Id"], Location="Lobby")
+        self.assertEqual(execute_soql_query(query)["results"], [])
+        DB["Task"]["task-3"]["Score"] = 1000
+        self.assertEqual(execute_soql_query("SELECT Id FROM Task WHERE Score > 999")["results"], [{"Id": "task-3"}])
+        del DB["Task"]["task-3"]
+        self.assertEqual(execute_soql_query("SELECT Id FROM Task WHERE Score > 999")["results"], [])
+        DB["Task"] = {"t": {"Id": "t", "Score": 5000}}
+        self.assertEqual(execute_soql_query("SELECT Id FROM Task WHERE Score > 999")["results"], [{"Id": "t"}])
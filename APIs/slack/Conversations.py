@@ -5,6 +5,7 @@ This module provides functionality for managing conversations (channels) in Slac
 It simulates the conversations-related endpoints of the Slack API.
 """
 from common_utils.tool_spec_decorator import tool_spec
+import bisect
 import time
 import hashlib
 import random
@@ -31,6 +32,7 @@ from .SimulationEngine.custom_errors import (
 )
 from .SimulationEngine.db import DB
 from .SimulationEngine import utils
+from .SimulationEngine.message_index import message_index
 
 @tool_spec(
     spec={
@@ -482,6 +484,23 @@ def mark_read(channel: str, ts: str) -> Dict[str, bool]:
     DB["channels"][channel]['conversations']["read_cursor"] = ts
     return {"ok": True}
 
+def _history_cursor_timestamp(cursor: str) -> float:
+    """Decodes a history cursor ("ts:<timestamp>", base64) into its timestamp."""
+    try:
+        decoded_cursor = base64.b64decode(cursor).decode('utf-8')
+    except (base64.binascii.Error, UnicodeDecodeError):
+        raise InvalidCursorValueError("Invalid base64 cursor format")
+    if not decoded_cursor.startswith('ts:'):
+        raise InvalidCursorValueError("Invalid cursor format: must start with 'ts:'")
+
+    # Extract timestamp from cursor
+    cursor_timestamp_str = decoded_cursor[3:]
+    try:
+        return float(cursor_timestamp_str)
+    except ValueError:
+        raise InvalidCursorValueError(f"Invalid timestamp in cursor: {cursor_timestamp_str}")
+
+
 @tool_spec(
     spec={
         'name': 'get_conversation_history',
@@ -689,6 +708,25 @@ def history(
     if current_latest_ts is None:
         current_latest_ts = str(time.time())
 
+    timeline = message_index.timeline(DB, channel)
+    if timeline is not None:
+        # Messages in chronological order: bisect the page out of the channel timeline
+        positions, stamps = timeline.window(float(oldest), float(current_latest_ts), inclusive, user_id)
+        start_index = bisect.bisect_right(stamps, _history_cursor_timestamp(cursor)) if cursor else 0
+        end_index = min(start_index + limit, len(positions))
+        messages_page = [timeline.messages[position] for position in positions[start_index:end_index]]
+        has_more = end_index < len(positions)
+        next_page_cursor = None
+        if has_more and messages_page:
+            last_message_ts = messages_page[-1]['ts']
+            next_page_cursor = base64.b64encode(f"ts:{last_message_ts}".encode('utf-8')).decode('utf-8')
+        return {
+            "ok": True,
+            "messages": messages_page,
+            "has_more": has_more,
+            "response_metadata": {"next_cursor": next_page_cursor}
+        }
+
     # Ensure timestamps are float-convertible before comparison
     if inclusive:
         filtered_history = [
@@ -708,20 +746,8 @@ def history(
     # Apply cursor-based pagination
     start_index = 0
     if cursor:
-        try:
-            decoded_cursor = base64.b64decode(cursor).decode('utf-8')
-        except (base64.binascii.Error, UnicodeDecodeError):
-            raise InvalidCursorValueError("Invalid base64 cursor format")
-        if not decoded_cursor.startswith('ts:'):
-            raise InvalidCursorValueError("Invalid cursor format: must start with 'ts:'")
-        
-        # Extract timestamp from cursor
-        cursor_timestamp_str = decoded_cursor[3:]
-        try:
-            cursor_timestamp = float(cursor_timestamp_str)
-        except ValueError:
-            raise InvalidCursorValueError(f"Invalid timestamp in cursor: {cursor_timestamp_str}")
-        
+        cursor_timestamp = _history_cursor_timestamp(cursor)
+
         # Find the first message after the cursor timestamp
         # This ensures pagination continues from the exact position, not from user occurrence
         for i, message in enumerate(filtered_history):
@@ -1718,13 +1744,23 @@ def replies(
     if "messages" not in DB["channels"][channel]:
         return {"ok": True, "messages": [], "has_more": False, "response_metadata": {"next_cursor": None}}
 
-    parent_message = None
-    for msg in DB["channels"][channel]["messages"]:
-        if msg["ts"] == ts:
-            parent_message = msg
-            break
-    if not parent_message:
-        raise MessageNotFoundError(f"No message found against the ts: {ts}")
+    timeline = message_index.timeline(DB, channel)
+    if timeline is not None:
+        parent_position = timeline.position_of(ts)
+        if parent_position is None or not timeline.messages[parent_position]:
+            raise MessageNotFoundError(f"No message found against the ts: {ts}")
+        thread = timeline.thread(parent_position)
+        if thread is not None:
+            return _replies_page(thread, cursor, inclusive, latest, limit, oldest)
+        parent_message = timeline.messages[parent_position]
+    else:
+        parent_message = None
+        for msg in DB["channels"][channel]["messages"]:
+            if msg["ts"] == ts:
+                parent_message = msg
+                break
+        if not parent_message:
+            raise MessageNotFoundError(f"No message found against the ts: {ts}")
 
     if "replies" not in parent_message:
         thread_replies = [] # Renamed to avoid conflict with function name
@@ -1768,3 +1804,28 @@ def replies(
         "response_metadata":{"next_cursor": next_page_cursor}
     }
     return response
+
+
+def _replies_page(thread, cursor: Optional[str], inclusive: bool, latest: Optional[str], limit: int,
+                  oldest: str) -> Dict[str, Any]:
+    """The page of replies() for thread replies in chronological order, bisected out of their timeline."""
+    effective_latest = latest if latest is not None else str(time.time())
+    positions, _ = thread.window(float(oldest), float(effective_latest), inclusive)
+
+    start_index = 0
+    if cursor:
+        cursor_position = thread.position_of(cursor)
+        if cursor_position is None or not positions or not positions[0] <= cursor_position <= positions[-1]:
+            raise CursorOutOfBoundsError(f"Cursor {cursor} not found in thread replies")
+        start_index = cursor_position - positions[0] + 1
+
+    end_index = min(start_index + limit, len(positions))
+    next_page_cursor = None
+    if end_index < len(positions):
+        next_page_cursor = thread.messages[positions[end_index]]['ts']
+    return {
+        "ok": True,
+        "messages": [thread.messages[position] for position in positions[start_index:end_index]],
+        "has_more": end_index < len(positions),
+        "response_metadata": {"next_cursor": next_page_cursor}
+    }
@@ -12,6 +12,7 @@ from typing import Dict, Any, List
 from .SimulationEngine.db import DB
 from .SimulationEngine.utils import _matches_filters, _convert_timestamp_to_utc_date, _parse_query
 from .SimulationEngine.search_engine import search_engine_manager, service_adapter
+from .SimulationEngine.message_index import URL_PATTERN, message_index
 
 
 def _matches_date_filters(msg: Dict[str, Any], filters: Dict[str, Any]) -> bool:
@@ -158,19 +159,22 @@ def search_messages(query: str) -> List[Dict[str, Any]]:
         )
     # --- Input Validation End ---
 
-    # Start with all messages from all channels
-    messages_list = []
-    for channel_id, channel_data in DB.get("channels", {}).items():
-        if "messages" in channel_data:
-            for msg in channel_data["messages"]:
-                # Add channel info to each message
-                msg_with_channel = dict(msg)
-                msg_with_channel["channel"] = channel_id
-                msg_with_channel["channel_name"] = channel_data.get("name", "")
-                messages_list.append(msg_with_channel)
-
     filters = _parse_query(query, target_type="messages", strict=True)
 
+    # Start with the messages the index finds for the user, channel, has: and
+    # wildcard filters (all messages if none is given); the filters below
+    # then run on these candidates only
+    candidates = message_index.search_index(DB).candidates(
+        user=filters["user"], channel_name=filters["channel"], has=filters["has"], wildcard=filters["wildcard"]
+    )
+    messages_list = []
+    for channel_id, channel_name, msg in candidates:
+        # Add channel info to each message
+        msg_with_channel = dict(msg)
+        msg_with_channel["channel"] = channel_id
+        msg_with_channel["channel_name"] = channel_name
+        messages_list.append(msg_with_channel)
+
     # Apply filters progressively
     if filters["user"]:
         messages_list = [
@@ -188,11 +192,10 @@ def search_messages(query: str) -> List[Dict[str, Any]]:
     if "link" in filters["has"]:
         # Check for URLs in message text using comprehensive regex pattern
         # Matches http://, https://, ftp://, www., and common URL patterns including subdomains
-        url_pattern = r'(?:https?://|ftp://|www\.)\S+|(?:^|\s)[\w.-]+\.(?:com|org|net|edu|gov|io|co|info|biz|dev|uk|ca|au|de|fr|jp|cn|in|br|mx|es|it|nl|se|no|fi|dk|be|ch|at|pl|cz|gr|pt|ie|nz|sg|hk|kr|tw|th|my|ph|id|vn|za|ae|sa|eg|ng|ke|tn|ma|dz|ly|sd|gh|ug|zm|zw|bw|mz|ao|cm|ci|sn|ml|bf|ne|td|so|rw|bi|dj|er|et|gm|gn|gw|lr|mr|sl|tg)(?:/\S*)?'
         messages_list = [
             msg for msg in messages_list
             if (msg.get("links") and len(msg.get("links", [])) > 0) or 
-               re.search(url_pattern, msg.get("text", ""), re.IGNORECASE)
+               URL_PATTERN.search(msg.get("text", ""))
         ]
 
     if "reaction" in filters["has"]:
@@ -208,7 +211,7 @@ def search_messages(query: str) -> List[Dict[str, Any]]:
         ]
 
     # Handle text queries with search engine (always use search engine for text)
-    if filters["text"]:
+    if filters["text"] and messages_list:
         engine = search_engine_manager.get_engine()
 
         if filters["boolean"] == "OR":
@@ -286,9 +289,10 @@ def search_messages(query: str) -> List[Dict[str, Any]]:
             # Pattern like "te*st" - match in middle of word
             pattern = r"\b" + re.escape(wildcard_pattern).replace(r"\*", r"\w*") + r"\b"
         
+        wildcard_regex = re.compile(pattern, re.IGNORECASE)
         messages_list = [
             msg for msg in messages_list
-            if re.search(pattern, msg.get("text", ""), re.IGNORECASE)
+            if wildcard_regex.search(msg.get("text", ""))
         ]
 
     return messages_list
@@ -3,6 +3,7 @@ import os
 from typing import Dict, Any
 from pydantic import ValidationError
 from .db_models import SlackDB
+from common_utils.tracked_db import track_changes
 
 DEFAULT_DB_PATH = os.path.join(
     os.path.dirname(
@@ -12,7 +13,7 @@ DEFAULT_DB_PATH = os.path.join(
     "SlackDefaultDB.json",
 )
 
-DB = {}
+DB = track_changes(path_depth=2)
 
 # Load and validate the default database
 with open(DEFAULT_DB_PATH, "r", encoding="utf-8") as f:
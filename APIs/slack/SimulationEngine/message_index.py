@@ -0,0 +1,302 @@
+"""
+Indexes over the channel messages of the Slack DB.
+
+Two kinds of index, both built lazily and kept in sync with the DB:
+
+- a `Timeline` per channel (and per thread, for replies): the messages sorted
+  by timestamp, with their float timestamps, so that Conversations.history
+  and replies resolve `oldest`/`latest` and cursors with bisect and only copy
+  out the page they return. A timeline is only built for messages already in
+  chronological order (which is how Chat.postMessage appends them) with
+  timestamps `float` accepts; for anything else the callers scan the list as
+  before.
+- a `MessageSearchIndex` over every channel: postings of the messages by
+  sender, by channel name and by has:link / has:reaction / has:star, and an
+  inverted index of the lower-cased words of their text. search_messages
+  intersects these to pick the candidate messages before it applies its
+  filters (text, dates, exclusions, wildcards) to them. Candidates are a
+  superset of the matches: messages the index cannot reason about (not a
+  dict, text that is not an ASCII string) are always candidates, so the
+  filters still decide, or fail, on them as before.
+
+Any change under DB["channels"][channel_id] (postMessage, update, delete,
+reactions, or a direct DB edit) re-indexes just that channel on the next call
+(see common_utils.synced_index).
+"""
+import bisect
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from common_utils.synced_index import ALL_INDEXES, ChangePath, Route, TrackerSyncedIndexes
+
+# URLs as has:link finds them in message text
+URL_PATTERN = re.compile(
+    r'(?:https?://|ftp://|www\.)\S+|(?:^|\s)[\w.-]+\.(?:com|org|net|edu|gov|io|co|info|biz|dev|uk|ca|au|de|fr|jp|cn|in|br|mx|es|it|nl|se|no|fi|dk|be|ch|at|pl|cz|gr|pt|ie|nz|sg|hk|kr|tw|th|my|ph|id|vn|za|ae|sa|eg|ng|ke|tn|ma|dz|ly|sd|gh|ug|zm|zw|bw|mz|ao|cm|ci|sn|ml|bf|ne|td|so|rw|bi|dj|er|et|gm|gn|gw|lr|mr|sl|tg)(?:/\S*)?',
+    re.IGNORECASE,
+)
+
+_WORD = re.compile(r"\w+")
+
+# Index key of the MessageSearchIndex (timelines are keyed by channel id)
+_SEARCH = object()
+
+# (channel position, message position): sorts like the messages of the DB
+MessageKey = Tuple[int, int]
+
+
+class Timeline:
+    """Messages of a channel or thread, in chronological order."""
+    __slots__ = ("messages", "stamps", "_by_user", "_by_ts", "_threads")
+
+    def __init__(self, messages: List[Any], stamps: List[float]):
+        self.messages = messages
+        self.stamps = stamps
+        self._by_user: Optional[Dict[Any, Tuple[List[int], List[float]]]] = None
+        self._by_ts: Optional[Dict[Any, int]] = None
+        self._threads: Dict[int, Optional["Timeline"]] = {}
+
+    @classmethod
+    def build(cls, messages: Any) -> Optional["Timeline"]:
+        """The timeline of `messages`, or None if they are not sorted by a float timestamp."""
+        try:
+            messages = list(messages)
+            stamps = [float(message["ts"]) for message in messages]
+        except (KeyError, TypeError, ValueError):
+            return None
+        for previous, stamp in zip(stamps, stamps[1:]):
+            if not previous <= stamp:
+                return None
+        if stamps and stamps[0] != stamps[0]:
+            return None
+        return cls(messages, stamps)
+
+    def window(self, oldest: float, latest: float, inclusive: bool,
+               user: Any = None) -> Tuple[Sequence[int], List[float]]:
+        """
+        Positions of the messages between `oldest` and `latest` (from `user`
+        only, if given), and their timestamps.
+        """
+        if user is None:
+            positions, stamps = range(len(self.messages)), self.stamps
+        else:
+            positions, stamps = self._user_positions(user)
+        if inclusive:
+            lo, hi = bisect.bisect_left(stamps, oldest), bisect.bisect_right(stamps, latest)
+        else:
+            lo, hi = bisect.bisect_right(stamps, oldest), bisect.bisect_left(stamps, latest)
+        hi = max(lo, hi)
+        return positions[lo:hi], stamps[lo:hi]
+
+    def position_of(self, ts: Any) -> Optional[int]:
+        """Position of the first message whose "ts" equals `ts`."""
+        if self._by_ts is None:
+            by_ts = {}
+            for position, message in enumerate(self.messages):
+                try:
+                    by_ts.setdefault(message["ts"], position)
+                except TypeError:
+                    pass
+            self._by_ts = by_ts
+        try:
+            return self._by_ts.get(ts)
+        except TypeError:
+            return None
+
+    def thread(self, position: int) -> Optional["Timeline"]:
+        """The timeline of the replies of the message at `position`."""
+        if position not in self._threads:
+            message = self.messages[position]
+            self._threads[position] = Timeline.build(message["replies"]) if "replies" in message else Timeline([], [])
+        return self._threads[position]
+
+    def _user_positions(self, user: Any) -> Tuple[List[int], List[float]]:
+        if self._by_user is None:
+            by_user = {}
+            for position, message in enumerate(self.messages):
+                positions, stamps = by_user.setdefault(message.get("user"), ([], []))
+                positions.append(position)
+                stamps.append(self.stamps[position])
+            self._by_user = by_user
+        return self._by_user.get(user, ([], []))
+
+
+def _message_terms(message: Any) -> Optional[Tuple[Any, bool, bool, bool, Set[str]]]:
+    """(user, has link, has reaction, is starred, words) of a message, None if irregular."""
+    if not isinstance(message, dict):
+        return None
+    text = message.get("text", "")
+    if not isinstance(text, str) or not text.isascii():
+        return None
+    has_link = bool(message.get("links") and len(message.get("links", [])) > 0) or bool(URL_PATTERN.search(text))
+    has_reaction = bool(message.get("reactions") and len(message.get("reactions", [])) > 0)
+    is_starred = message.get("is_starred", False) is True
+    return message.get("user", ""), has_link, has_reaction, is_starred, set(_WORD.findall(text.lower()))
+
+
+def wildcard_word_test(wildcard: str):
+    """
+    A test on lower-cased words such that the messages search_messages
+    matches `wildcard` with all have a word passing it, or None if the
+    wildcard is not of a form the word index can narrow down.
+    """
+    parts = wildcard.lower().split("*")
+    if len(parts) != 2 or not all(part == "" or _WORD.fullmatch(part) and part.isascii() for part in parts):
+        return None
+    head, tail = parts
+    if head and tail:
+        return lambda word: len(word) >= len(head) + len(tail) and word.startswith(head) and word.endswith(tail)
+    if head:
+        return lambda word: word.startswith(head)
+    if tail:
+        return lambda word: word.endswith(tail)
+    return None
+
+
+class MessageSearchIndex:
+    """Postings and word index of the channel messages of one DB."""
+
+    def __init__(self, channels: Dict[str, Any]):
+        self._next_position = 0
+        # channel_id -> (position, name, messages, [(key, terms)])
+        self._channels: Dict[str, Tuple[int, Any, List[Any], List[Tuple[MessageKey, Any]]]] = {}
+        self._by_channel_name: Dict[Any, Set[str]] = {}
+        self._by_user: Dict[Any, Set[MessageKey]] = {}
+        self._by_has: Dict[str, Set[MessageKey]] = {"link": set(), "reaction": set(), "star": set()}
+        self._by_word: Dict[str, Set[MessageKey]] = {}
+        self._irregular: Set[MessageKey] = set()
+        self._vocabulary: Optional[List[str]] = None
+        for channel_id, channel_data in channels.items():
+            self.refresh(channel_id, channel_data)
+
+    def refresh(self, channel_id: str, channel_data: Any):
+        """Re-indexes one channel; `channel_data` is None if it was deleted."""
+        entry = self._channels.pop(channel_id, None)
+        if entry is not None:
+            self._unindex(channel_id, entry)
+        if channel_data is None:
+            return
+        position = entry[0] if entry is not None else self._next_position
+        if entry is None:
+            self._next_position += 1
+        name = channel_data.get("name", "")
+        messages = list(channel_data["messages"]) if "messages" in channel_data else []
+        indexed = []
+        for message_position, message in enumerate(messages):
+            key = (position, message_position)
+            terms = _message_terms(message)
+            indexed.append((key, terms))
+            if terms is None:
+                self._irregular.add(key)
+                continue
+            user, has_link, has_reaction, is_starred, words = terms
+            self._by_user.setdefault(user, set()).add(key)
+            for has, flag in (("link", has_link), ("reaction", has_reaction), ("star", is_starred)):
+                if flag:
+                    self._by_has[has].add(key)
+            for word in words:
+                holders = self._by_word.get(word)
+                if holders is None:
+                    holders = self._by_word[word] = set()
+                    self._vocabulary = None
+                holders.add(key)
+        self._channels[channel_id] = (position, name, messages, indexed)
+        self._by_channel_name.setdefault(name, set()).add(channel_id)
+
+    def candidates(self, user: Any = None, channel_name: Any = None, has: Set[str] = frozenset(),
+                   wildcard: Optional[str] = None) -> List[Tuple[str, Any, Any]]:
+        """
+        (channel_id, channel_name, message) of the messages that may match
+        the given filters, in DB order.
+        """
+        narrowed: List[Set[MessageKey]] = []
+        if user:
+            narrowed.append(self._by_user.get(user, set()))
+        for flag in ("link", "reaction", "star"):
+            if flag in has:
+                narrowed.append(self._by_has[flag])
+        word_test = wildcard_word_test(wildcard) if wildcard else None
+        if word_test is not None:
+            narrowed.append(self._words_passing(word_test))
+
+        channel_ids = self._by_channel_name.get(channel_name, ()) if channel_name else self._channels
+        if not narrowed:
+            return [(channel_id, name, message)
+                    for channel_id, (_, name, messages, _) in sorted(
+                        ((channel_id, self._channels[channel_id]) for channel_id in channel_ids),
+                        key=lambda item: item[1][0])
+                    for message in messages]
+        narrowed.sort(key=len)
+        keys = narrowed[0].intersection(*narrowed[1:]) | self._irregular
+        if channel_name:
+            positions = {self._channels[channel_id][0] for channel_id in channel_ids}
+            keys = {key for key in keys if key[0] in positions}
+        by_position = {position: (channel_id, name, messages)
+                       for channel_id, (position, name, messages, _) in self._channels.items()}
+        result = []
+        for channel_position, message_position in sorted(keys):
+            channel_id, name, messages = by_position[channel_position]
+            result.append((channel_id, name, messages[message_position]))
+        return result
+
+    def _words_passing(self, word_test) -> Set[MessageKey]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._by_word)
+        keys = set()
+        for word in self._vocabulary:
+            if word_test(word):
+                keys.update(self._by_word[word])
+        return keys
+
+    def _unindex(self, channel_id: str, entry):
+        _, name, _, indexed = entry
+        holders = self._by_channel_name.get(name)
+        if holders is not None:
+            holders.discard(channel_id)
+            if not holders:
+                del self._by_channel_name[name]
+        for key, terms in indexed:
+            if terms is None:
+                self._irregular.discard(key)
+                continue
+            user, _, _, _, words = terms
+            self._by_user[user].discard(key)
+            if not self._by_user[user]:
+                del self._by_user[user]
+            for keys in self._by_has.values():
+                keys.discard(key)
+            for word in words:
+                holders = self._by_word[word]
+                holders.discard(key)
+                if not holders:
+                    del self._by_word[word]
+                    self._vocabulary = None
+
+
+class MessageIndex(TrackerSyncedIndexes):
+    """Timelines and MessageSearchIndex kept in sync with a (tracked) Slack DB."""
+
+    def search_index(self, db: Dict[str, Any]) -> MessageSearchIndex:
+        """Returns the up to date search index of the channel messages of `db`."""
+        return self._lookup(db, _SEARCH)
+
+    def timeline(self, db: Dict[str, Any], channel_id: str) -> Optional[Timeline]:
+        """Returns the timeline of DB["channels"][channel_id]["messages"], None if it has to be scanned."""
+        return self._lookup(db, channel_id)
+
+    def _build(self, db: Dict[str, Any], index_key: Any) -> Any:
+        if index_key is _SEARCH:
+            return MessageSearchIndex(db.get("channels", {}))
+        return Timeline.build(db["channels"][index_key].get("messages", []))
+
+    def _route(self, path: ChangePath) -> Iterable[Route]:
+        if path[0] != "channels":
+            return ()
+        if len(path) < 2:
+            return ((ALL_INDEXES, None),)
+        return ((path[1], None), (_SEARCH, path[1]))
+
+    def _refresh(self, db: Dict[str, Any], index_key: Any, index: MessageSearchIndex, channel_id: str):
+        index.refresh(channel_id, db.get("channels", {}).get(channel_id))
+
+
+message_index = MessageIndex()
@@ -9,8 +9,71 @@ from .db import DB
 class ServiceAdapter(Adapter):
     """Adapter creates distinct, searchable chunks for each Slack message and file field."""
 
+    # Channel records hold the messages; the files of a channel are records of their own
+    tracked_collections = (("channels",), ("channels", "*", "files"), ("files",))
+
+    def __init__(self):
+        super().__init__()
+        # File record -> channels named in its chunks, and the reverse
+        self._file_record_channels = {}
+        self._channel_file_records = {}
+
+    def get_tracked_db(self):
+        return DB
+
     def db_to_searchable_documents(self) -> List[SearchableDocument]:
         items = self._get_all_data()
+        return self._adapt_items(items)
+
+    def record_to_searchable_documents(self, record_path, record) -> List[SearchableDocument]:
+        if record_path[0] == "channels" and len(record_path) == 2:
+            messages, _ = self._get_channel_data(record_path[1], record, include_files=False)
+            return self._adapt_items(messages)
+        if record_path[0] == "channels":
+            file_item = self._get_channel_file(record_path[1], record_path[3], record)
+        else:
+            file_item = self._get_global_file(record_path[1], record)
+        self._set_file_record_channels(record_path, file_item.channels if file_item else ())
+        return self._adapt_items([file_item] if file_item else [])
+
+    def _set_file_record_channels(self, record_path, channels):
+        channels = frozenset(channel for channel in channels or () if isinstance(channel, str))
+        previous = self._file_record_channels.get(record_path, frozenset())
+        for channel_id in previous - channels:
+            records = self._channel_file_records.get(channel_id)
+            if records is not None:
+                records.pop(record_path, None)
+                if not records:
+                    del self._channel_file_records[channel_id]
+        for channel_id in channels - previous:
+            self._channel_file_records.setdefault(channel_id, {})[record_path] = None
+        if channels:
+            self._file_record_channels[record_path] = channels
+        else:
+            self._file_record_channels.pop(record_path, None)
+
+    def expand_dirty_records(self, dirty_records):
+        """
+        File chunks include the names of the channels they are shared in, so
+        the file records shared in a changed channel are re-chunked as well.
+        """
+        expanded = dict.fromkeys(dirty_records)
+        for record_path in dirty_records:
+            if record_path[0] == "channels" and len(record_path) == 2:
+                for file_record in self._channel_file_records.get(record_path[1], ()):
+                    expanded.setdefault(file_record)
+            elif record_path in self._file_record_channels and not self._file_record_exists(record_path):
+                self._set_file_record_channels(record_path, ())
+        return list(expanded)
+
+    @staticmethod
+    def _file_record_exists(record_path) -> bool:
+        if record_path[0] == "files":
+            return record_path[1] in DB.get("files", {})
+        channel_data = DB.get("channels", {}).get(record_path[1])
+        return isinstance(channel_data, dict) and record_path[3] in (channel_data.get("files") or {})
+
+    def _adapt_items(self, items: List[Any]) -> List[SearchableDocument]:
         searchable_documents = []
         for item in items:
             if isinstance(item, SlackMessageForSearch):
@@ -23,53 +86,75 @@ class ServiceAdapter(Adapter):
         messages = []
         files = []
         
-        # Extract messages from channels
         for channel_id, channel_data in DB.get("channels", {}).items():
-            channel_name = channel_data.get("name", "")
-            if "messages" in channel_data:
-                for msg in channel_data["messages"]:
-                    try:
-                        msg_with_channel = dict(msg)
-                        msg_with_channel["channel"] = channel_id
-                        msg_with_channel["channel_name"] = channel_name
-                        messages.append(SlackMessageForSearch(**msg_with_channel))
-                    except Exception as e:
-                        # Skip invalid messages but continue processing
-                        print_log(f"Warning: Could not process message {msg}: {e}")
-                        continue
-            
-            # Extract files from channels
-            if "files" in channel_data:
-                for file_id, file_data in channel_data["files"].items():
-                    try:
-                        file_with_channels = dict(file_data)
-                        # Ensure file has an ID
-                        if "id" not in file_with_channels:
-                            file_with_channels["id"] = file_id
-                        # Only set channels if not already present
-                        if "channels" not in file_with_channels:
-                            file_with_channels["channels"] = [channel_id]
-                        files.append(SlackFileForSearch(**file_with_channels))
-                    except Exception as e:
-                        # Skip invalid files but continue processing
-                        print_log(f"Warning: Could not process file {file_data}: {e}")
-                        continue
+            channel_messages, channel_files = self._get_channel_data(channel_id, channel_data)
+            messages.extend(channel_messages)
+            files.extend(channel_files)
         
         # Also check global files
         for file_id, file_data in DB.get("files", {}).items():
-            try:
-                file_with_id = dict(file_data)
-                if "id" not in file_with_id:
-                    file_with_id["id"] = file_id
-                # Ensure channels field exists
-                if "channels" not in file_with_id:
-                    file_with_id["channels"] = []
-                files.append(SlackFileForSearch(**file_with_id))
-            except Exception as e:
-                print_log(f"Warning: Could not process global file {file_data}: {e}")
-                continue
+            file_item = self._get_global_file(file_id, file_data)
+            if file_item:
+                files.append(file_item)
         
         return messages + files
+
+    def _get_channel_data(self, channel_id: str, channel_data: dict, include_files: bool = True):
+        """Returns the messages and files of a channel as search models."""
+        messages = []
+        files = []
+        channel_name = channel_data.get("name", "")
+
+        # Extract messages from channels
+        if "messages" in channel_data:
+            for msg in channel_data["messages"]:
+                try:
+                    msg_with_channel = dict(msg)
+                    msg_with_channel["channel"] = channel_id
+                    msg_with_channel["channel_name"] = channel_name
+                    messages.append(SlackMessageForSearch(**msg_with_channel))
+                except Exception as e:
+                    # Skip invalid messages but continue processing
+                    print_log(f"Warning: Could not process message {msg}: {e}")
+                    continue
+        
+        # Extract files from channels
+        if include_files and "files" in channel_data:
+            for file_id, file_data in channel_data["files"].items():
+                file_item = self._get_channel_file(channel_id, file_id, file_data)
+                if file_item:
+                    files.append(file_item)
+        return messages, files
+
+    def _get_channel_file(self, channel_id: str, file_id: str, file_data: dict):
+        """Returns a file of a channel as a search model, or None if invalid."""
+        try:
+            file_with_channels = dict(file_data)
+            # Ensure file has an ID
+            if "id" not in file_with_channels:
+                file_with_channels["id"] = file_id
+            # Only set channels if not already present
+            if "channels" not in file_with_channels:
+                file_with_channels["channels"] = [channel_id]
+            return SlackFileForSearch(**file_with_channels)
+        except Exception as e:
+            # Skip invalid files but continue processing
+            print_log(f"Warning: Could not process file {file_data}: {e}")
+            return None
+
+    def _get_global_file(self, file_id: str, file_data: dict):
+        """Returns a file from DB["files"] as a search model, or None if invalid."""
+        try:
+            file_with_id = dict(file_data)
+            if "id" not in file_with_id:
+                file_with_id["id"] = file_id
+            # Ensure channels field exists
+            if "channels" not in file_with_id:
+                file_with_id["channels"] = []
+            return SlackFileForSearch(**file_with_id)
+        except Exception as e:
+            print_log(f"Warning: Could not process global file {file_data}: {e}")
+            return None
     
     def _make_message_chunks(
         self,
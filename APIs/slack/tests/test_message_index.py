@@ -0,0 +1,144 @@
+import base64
+import copy
+import random
+import re
+
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from ..SimulationEngine.db import DB
+from ..SimulationEngine.message_index import message_index, wildcard_word_test
+from .. import search_messages, get_conversation_history, get_conversation_replies
+
+WORDS = ["deploy", "deployment", "review", "lunch", "budget", "release", "redeploy", "www.example.com"]
+
+
+def _random_db(seed=0):
+    rng = random.Random(seed)
+    channels = {}
+    for c in range(4):
+        messages = []
+        for m in range(40):
+            message = {
+                "ts": f"{1712000000 + c * 1000 + m * 10}.000{m % 10}00",
+                "user": rng.choice(["U01", "U02", "U03"]),
+                "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))),
+                "reactions": [{"name": "eyes"}] if rng.random() < 0.3 else [],
+                "links": ["https://x.io"] if rng.random() < 0.1 else [],
+                "is_starred": rng.random() < 0.2,
+            }
+            if m % 7 == 0:
+                message["replies"] = [{"ts": f"{1712000000 + c * 1000 + m * 10 + r}.100000", "user": "U02",
+                                       "text": f"reply {r}"} for r in range(1, 6)]
+            messages.append(message)
+        channels[f"C{c}"] = {"id": f"C{c}", "name": ["general", "random", "general", "ops"][c],
+                             "messages": messages, "conversations": {}, "files": {}}
+    return {
+        "current_user": {"id": "U01"},
+        "users": {"U01": {"name": "alice"}, "U02": {"name": "bob"}, "U03": {"name": "carol"}},
+        "channels": channels,
+        "files": {},
+    }
+
+
+def _scan(query_user=None, channel=None, has=(), wildcard=None):
+    """search_messages filters (no text terms) evaluated message by message."""
+    result = []
+    for channel_id, channel_data in DB["channels"].items():
+        for msg in channel_data.get("messages", []):
+            text = msg.get("text", "")
+            if query_user and msg.get("user") != query_user:
+                continue
+            if channel and channel_data.get("name") != channel:
+                continue
+            if "reaction" in has and not msg.get("reactions"):
+                continue
+            if "star" in has and not msg.get("is_starred"):
+                continue
+            if wildcard and not re.search(r"\b" + re.escape(wildcard[:-1]) + r"\w*", text, re.IGNORECASE):
+                continue
+            result.append((channel_id, msg["ts"]))
+    return result
+
+
+class TestMessageIndex(BaseTestCaseWithErrorHandler):
+    def setUp(self):
+        self._saved_db = copy.deepcopy(DB)
+        DB.clear()
+        DB.update(_random_db())
+
+    def tearDown(self):
+        DB.clear()
+        DB.update(self._saved_db)
+
+    def _search(self, query):
+        return [(msg["channel"], msg["ts"]) for msg in search_messages(query)]
+
+    def test_search_filters_match_a_scan(self):
+        self.assertEqual(self._search("from:@bob in:#general"), _scan("U02", "general"))
+        self.assertEqual(self._search("has:reaction has:star"), _scan(has=("reaction", "star")))
+        self.assertEqual(self._search("deploy* from:@carol"), _scan("U03", wildcard="deploy*"))
+        self.assertEqual(self._search("in:#ops rev*"), _scan(channel="ops", wildcard="rev*"))
+        self.assertEqual(self._search("*deploy in:#random"),
+                         [(c, ts) for c, ts in _scan(channel="random")
+                          if any(word.lower().endswith("deploy") for word in re.findall(r"\w+", self._text(c, ts)))])
+
+    def _text(self, channel_id, ts):
+        return next(msg["text"] for msg in DB["channels"][channel_id]["messages"] if msg["ts"] == ts)
+
+    def test_index_follows_db_changes(self):
+        self.assertEqual(self._search("zebra*"), [])
+        DB["channels"]["C1"]["messages"].append({"ts": "1713000000.000000", "user": "U01", "text": "Zebras ahead"})
+        self.assertEqual(self._search("zebra*"), [("C1", "1713000000.000000")])
+        DB["channels"]["C1"]["messages"][-1]["text"] = "horses ahead"
+        self.assertEqual(self._search("zebra*"), [])
+        del DB["channels"]["C2"]
+        self.assertNotIn("C2", {channel for channel, _ in self._search("in:#general")})
+        DB["channels"]["C9"] = {"id": "C9", "name": "general", "messages": [{"ts": "1.000000", "text": "hi", "user": "U01"}]}
+        self.assertEqual(self._search("in:#general from:@alice")[-1], ("C9", "1.000000"))
+
+    def test_irregular_messages_are_still_filtered(self):
+        DB["channels"]["C0"]["messages"].append({"ts": "1713000000.000000", "user": "U01", "text": "déploy soon"})
+        self.assertIn(("C0", "1713000000.000000"), self._search("d*"))
+
+    def test_wildcard_word_test(self):
+        self.assertTrue(wildcard_word_test("Dep*")("deploy"))
+        self.assertTrue(wildcard_word_test("*loy")("redeploy"))
+        self.assertTrue(wildcard_word_test("d*y")("deploy"))
+        self.assertFalse(wildcard_word_test("d*y")("d"))
+        for unsupported in ("*dep*", "a.b*", "*"):
+            self.assertIsNone(wildcard_word_test(unsupported))
+
+    def test_history_pages_match_a_scan(self):
+        messages = DB["channels"]["C1"]["messages"]
+        oldest, latest = messages[5]["ts"], messages[30]["ts"]
+        for inclusive in (True, False):
+            for user_id in (None, "U02"):
+                expected = [m for m in messages
+                            if (float(oldest) <= float(m["ts"]) <= float(latest) if inclusive
+                                else float(oldest) < float(m["ts"]) < float(latest))
+                            and (user_id is None or m.get("user") == user_id)]
+                pages, cursor = [], None
+                while True:
+                    page = get_conversation_history("C1", cursor=cursor, inclusive=inclusive, latest=latest,
+                                                    limit=4, oldest=oldest, user_id=user_id)
+                    pages.extend(page["messages"])
+                    cursor = page["response_metadata"]["next_cursor"]
+                    if not page["has_more"]:
+                        break
+                self.assertEqual(pages, expected)
+        self.assertIsNotNone(message_index.timeline(DB, "C1"))
+
+    def test_history_of_unsorted_channel_is_scanned(self):
+        messages = DB["channels"]["C1"]["messages"]
+        messages.reverse()
+        self.assertIsNone(message_index.timeline(DB, "C1"))
+        cursor = base64.b64encode(f"ts:{messages[10]['ts']}".encode()).decode()
+        page = get_conversation_history("C1", cursor=cursor, limit=3)
+        self.assertEqual(page["messages"], messages[:3])
+
+    def test_replies_pages(self):
+        parent = DB["channels"]["C3"]["messages"][7]
+        first = get_conversation_replies("C3", parent["ts"], limit=2)
+        self.assertEqual(first["messages"], parent["replies"][:2])
+        second = get_conversation_replies("C3", parent["ts"], cursor=first["messages"][-1]["ts"], limit=2)
+        self.assertEqual(second["messages"], parent["replies"][2:4])
+        self.assertEqual(second["response_metadata"]["next_cursor"], parent["replies"][4]["ts"])
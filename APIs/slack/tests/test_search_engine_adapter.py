@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch
+
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from ..SimulationEngine.db import DB
+from ..SimulationEngine.search_engine import ServiceAdapter
+
+
+class TestSlackSearchAdapter(BaseTestCaseWithErrorHandler):
+    def setUp(self):
+        DB.clear()
+        DB.update(
+            {
+                "channels": {
+                    "C1": {
+                        "id": "C1",
+                        "name": "general",
+                        "messages": [{"ts": "1", "user": "U01", "text": "hello"}],
+                        "files": {"F2": {"id": "F2", "name": "notes.txt", "filetype": "text", "channels": ["C1", "C2"]}},
+                    },
+                    "C2": {
+                        "id": "C2",
+                        "name": "random",
+                        "messages": [{"ts": "2", "user": "U02", "text": "lunch?"}],
+                    },
+                    "C3": {"id": "C3", "name": "quiet", "messages": []},
+                },
+                "files": {
+                    "F1": {"id": "F1", "name": "report.pdf", "filetype": "pdf", "channels": ["C2"]},
+                    "F3": {"id": "F3", "name": "other.pdf", "filetype": "pdf", "channels": ["C3"]},
+                },
+            }
+        )
+        self.adapter = ServiceAdapter()
+        self.adapter.get_data_changes("test_strategy")
+
+    def test_renamed_channel_rechunks_only_files_shared_in_it(self):
+        DB["channels"]["C2"]["name"] = "off-topic"
+        with patch.object(
+            ServiceAdapter, "record_to_searchable_documents", autospec=True,
+            side_effect=ServiceAdapter.record_to_searchable_documents,
+        ) as record_to_documents:
+            changes = self.adapter.get_data_changes("test_strategy")
+
+        rechunked = [call.args[1] for call in record_to_documents.call_args_list]
+        self.assertCountEqual(rechunked, [("channels", "C2"), ("files", "F1"), ("channels", "C1", "files", "F2")])
+        new_channel_chunks = {
+            doc.text_content for doc in changes["added"] + changes["updated"]
+            if doc.metadata["content_type"] == "channels"
+        }
+        self.assertEqual(new_channel_chunks, {"off-topic", "general off-topic"})
+
+    def test_file_moved_out_of_channel_is_no_longer_expanded(self):
+        DB["files"]["F1"]["channels"] = ["C3"]
+        self.adapter.get_data_changes("test_strategy")
+        DB["channels"]["C2"]["name"] = "off-topic"
+        with patch.object(
+            ServiceAdapter, "record_to_searchable_documents", autospec=True,
+            side_effect=ServiceAdapter.record_to_searchable_documents,
+        ) as record_to_documents:
+            self.adapter.get_data_changes("test_strategy")
+
+        rechunked = [call.args[1] for call in record_to_documents.call_args_list]
+        self.assertCountEqual(rechunked, [("channels", "C2"), ("channels", "C1", "files", "F2")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -169,7 +169,7 @@ def create_attachment(
     return {
         "upload": {
             "token": token,
-            "attachment": attachment,
+            "attachment": DB["attachments"][str(attachment_id)],
             "attachments": all_attachments
         }
     }
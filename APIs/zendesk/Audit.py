@@ -2,6 +2,7 @@ from typing import Any, Dict, List
 
 from .SimulationEngine import custom_errors
 from .SimulationEngine.db import DB
+from .SimulationEngine.utils import get_collection_by_foreign_key
 from common_utils.tool_spec_decorator import tool_spec
 
 @tool_spec(
@@ -80,9 +81,7 @@ def list_audits_for_ticket(ticket_id: int) -> Dict[str, Any]:
 
     audits = []
     # Find all audits for the given ticket_id in DB['ticket_audits']
-    for audit in DB.get("ticket_audits", {}).values():
-        if audit.get("ticket_id") == ticket_id:
-            audits.append(audit)
+    audits.extend(get_collection_by_foreign_key(DB.get("ticket_audits", {}), "ticket_id", ticket_id))
 
     return {
         "audits": audits
@@ -2,6 +2,7 @@ from common_utils.tool_spec_decorator import tool_spec
 from typing import Optional, Dict, Any, List
 from .SimulationEngine import custom_errors
 from .SimulationEngine.db import DB
+from .SimulationEngine.utils import get_collection_by_foreign_key
 import copy
 
 @tool_spec(
@@ -101,7 +102,7 @@ def list_ticket_comments(
     ticket_comments = []
     all_comments = DB.get("comments", {})
 
-    for comment in all_comments.values():
+    for comment in get_collection_by_foreign_key(all_comments, "ticket_id", ticket_id):
         deep_copy_comment = comment.copy()
         if deep_copy_comment["ticket_id"] == ticket_id:
             if not include_inline_images and "attachments" in deep_copy_comment:
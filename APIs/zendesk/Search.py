@@ -2,8 +2,7 @@ from common_utils.tool_spec_decorator import tool_spec
 # zendesk/Search.py
 
 from typing import Any, Dict, Optional
-from .SimulationEngine.db import DB
-from .SimulationEngine.utils import _parse_search_query, _search_tickets, _search_users, _search_organizations, _search_groups, _sort_results, _get_side_loaded_data
+from .SimulationEngine.utils import _parse_search_query, _search_candidates, _search_tickets, _search_users, _search_organizations, _search_groups, _sort_results, _get_side_loaded_data
 
 
 @tool_spec(
@@ -276,28 +275,27 @@ def list_search_results(query: str, sort_by: Optional[str] = None, sort_order: O
     if start_index >= max_results:
         raise ValueError("422 Unprocessable Entity: Search results are limited to 1000 records. Please refine your search query to get fewer results.")
     
-    # Get all data from different collections
-    tickets = DB["tickets"].values()
-    users = DB["users"].values()
-    organizations = DB["organizations"].values()
-    groups = DB.get("groups", {}).values()  # Use get() to avoid KeyError if groups doesn't exist
-    
     results = []
     
-    # Search each collection based on parsed query
+    # Search each collection based on parsed query, starting from the items its index
+    # finds for the text terms and filters (all of them if the DB is not indexed)
     if not parsed_query.get("type_filter") or "ticket" in parsed_query.get("type_filter", []):
+        tickets = _search_candidates("tickets", parsed_query)
         ticket_results = _search_tickets(tickets, parsed_query)
         results.extend(ticket_results)
     
     if not parsed_query.get("type_filter") or "user" in parsed_query.get("type_filter", []):
+        users = _search_candidates("users", parsed_query)
         user_results = _search_users(users, parsed_query)
         results.extend(user_results)
     
     if not parsed_query.get("type_filter") or "organization" in parsed_query.get("type_filter", []):
+        organizations = _search_candidates("organizations", parsed_query)
         org_results = _search_organizations(organizations, parsed_query)
         results.extend(org_results)
     
     if not parsed_query.get("type_filter") or "group" in parsed_query.get("type_filter", []):
+        groups = _search_candidates("groups", parsed_query)  # DB.get() fallback if groups doesn't exist
         group_results = _search_groups(groups, parsed_query)
         results.extend(group_results)
     
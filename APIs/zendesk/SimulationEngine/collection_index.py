@@ -0,0 +1,270 @@
+# zendesk/SimulationEngine/collection_index.py
+"""
+Secondary indexes over the collections of the Zendesk DB.
+
+For a collection such as DB["tickets"] or DB["comments"], a `CollectionIndex`
+keeps the position of each record in DB order and, built on first use:
+
+- per field, a map from each value of the field to the records holding it
+  (fields holding a list, such as "tags", are indexed by element), so that
+  equality and foreign-key lookups (status, priority, assignee_id,
+  requester_id, organization_id, tags, comments and audits by ticket_id, ...)
+  read a posting list instead of scanning the collection;
+- per text extractor, the trigrams of the lower-cased text it returns for a
+  record, so that a substring or `*` wildcard search term only has to be
+  checked against the records holding all the trigrams of its literal parts;
+- per field, the keywords `extract_keywords` finds in it.
+
+Lookups return candidate keys: a superset of the matching records, which the
+callers then check with the same predicates as before. Records the index
+cannot reason about (not a dict, an unhashable value) are always candidates,
+so the predicates still decide, or fail, on them.
+
+A change of DB[collection][key] (any create, update or delete path, or a
+direct DB edit) re-indexes just that record on the next lookup (see
+common_utils.synced_index). `collection_index.get` returns None for untracked
+DBs, which are scanned.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from common_utils.synced_index import CollectionIndexes as SyncedCollectionIndexes
+
+# Shortest literal part of a search term worth looking up by trigrams
+MIN_TERM_PART = 3
+
+
+class _Empty:
+    """Element standing for an empty list in the postings of a list field."""
+
+    def __repr__(self):
+        return "EMPTY"
+
+
+EMPTY = _Empty()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CollectionIndex:
+    """Postings of the records of one collection, by field value, trigram and keyword."""
+
+    def __init__(self, records: Dict[str, Any]):
+        self._records = records
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+        for key in records:
+            self._positions[key] = self._next_position
+            self._next_position += 1
+        # (field, by element) -> (value -> keys, key -> values, keys of irregular records)
+        self._fields: Dict[str, Any] = {}
+        # text extractor -> (trigram -> keys, key -> trigrams, keys of irregular records)
+        self._texts: Dict[Callable, Any] = {}
+        # (field, keyword extractor) -> (keyword -> keys, key -> keywords, keys of irregular records)
+        self._keywords: Dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def keys(self) -> List[str]:
+        """Every key, in DB order."""
+        return list(self._positions)
+
+    def records(self, keys: Optional[Iterable[str]] = None) -> List[Any]:
+        """The records of `keys` (every record if None), in DB order."""
+        if keys is None:
+            return list(self._records.values())
+        positions = self._positions
+        return [self._records[key] for key in sorted(keys, key=positions.__getitem__)]
+
+    def refresh(self, key: str):
+        """Re-indexes the record of `key` after it was set, changed or deleted."""
+        if key in self._positions:
+            self._unindex(key)
+        if key not in self._records:
+            self._positions.pop(key, None)
+            return
+        record = self._records[key]
+        if key not in self._positions or (self._positions[key] != self._next_position - 1
+                                          and key == next(reversed(self._records))):
+            # New, or deleted and set again: last in DB order
+            self._positions.pop(key, None)
+            self._positions[key] = self._next_position
+            self._next_position += 1
+        for (field, elements), postings in self._fields.items():
+            self._index_field(field, elements, *postings, key, record)
+        for text_of, (by_trigram, key_trigrams, irregular) in self._texts.items():
+            self._index_text(text_of, by_trigram, key_trigrams, irregular, key, record)
+        for (field, extract), (by_keyword, key_keywords, irregular) in self._keywords.items():
+            self._index_keywords(field, extract, by_keyword, key_keywords, irregular, key, record)
+
+    # -- Field values ---------------------------------------------------------
+
+    def equal(self, field: str, value: Any) -> Set[str]:
+        """Candidate keys of the records for which `record.get(field) == value`."""
+        by_value, _, irregular = self._field(field, False)
+        try:
+            keys = by_value.get(value, set())
+        except TypeError:
+            return set(self._positions)
+        return keys | irregular
+
+    def select(self, field: str, predicate: Callable[[Any], bool], elements: bool = False) -> Set[str]:
+        """
+        Candidate keys of the records whose `field` holds a value passing `predicate`.
+
+        With `elements`, the field is read as a list (missing is empty) and the
+        predicate is called on each element, or on EMPTY for an empty list.
+        A predicate raising for a value keeps its records as candidates.
+        """
+        by_value, _, irregular = self._field(field, elements)
+        keys = set(irregular)
+        for value, holders in by_value.items():
+            try:
+                selected = predicate(value)
+            except Exception:
+                selected = True
+            if selected:
+                keys.update(holders)
+        return keys
+
+    def _field(self, field: str, elements: bool):
+        if (field, elements) not in self._fields:
+            postings = ({}, {}, set())
+            for key, record in self._records.items():
+                self._index_field(field, elements, *postings, key, record)
+            self._fields[(field, elements)] = postings
+        return self._fields[(field, elements)]
+
+    @staticmethod
+    def _index_field(field, elements, by_value, key_values, irregular, key, record):
+        if not isinstance(record, dict):
+            irregular.add(key)
+            return
+        if not elements:
+            values = [record.get(field)]
+        else:
+            values = record.get(field, [])
+            if not isinstance(values, list):
+                irregular.add(key)
+                return
+            values = values or [EMPTY]
+        try:
+            values = set(values)
+        except TypeError:
+            irregular.add(key)
+            return
+        key_values[key] = values
+        for value in values:
+            by_value.setdefault(value, set()).add(key)
+
+    # -- Text -----------------------------------------------------------------
+
+    def text(self, term: str, text_of: Callable[[Any], List[str]]) -> Optional[Set[str]]:
+        """
+        Candidate keys of the records for which `term` (lower-cased, with `*`
+        wildcards) occurs in one of the lower-cased texts `text_of` returns,
+        or None if the term has no literal part long enough to look up.
+        """
+        parts = [part for part in term.split("*") if len(part) >= MIN_TERM_PART]
+        if not parts:
+            return None
+        by_trigram, _, irregular = self._text(text_of)
+        wanted = sorted(set().union(*(_trigrams(part) for part in parts)),
+                        key=lambda trigram: len(by_trigram.get(trigram, ())))
+        keys = set(by_trigram.get(wanted[0], ()))
+        for trigram in wanted[1:]:
+            if not keys:
+                break
+            keys &= by_trigram.get(trigram, set())
+        return keys | irregular
+
+    def _text(self, text_of):
+        if text_of not in self._texts:
+            by_trigram, key_trigrams, irregular = {}, {}, set()
+            for key, record in self._records.items():
+                self._index_text(text_of, by_trigram, key_trigrams, irregular, key, record)
+            self._texts[text_of] = (by_trigram, key_trigrams, irregular)
+        return self._texts[text_of]
+
+    @staticmethod
+    def _index_text(text_of, by_trigram, key_trigrams, irregular, key, record):
+        try:
+            trigrams = set().union(*(_trigrams(text) for text in text_of(record)))
+        except Exception:
+            irregular.add(key)
+            return
+        key_trigrams[key] = trigrams
+        for trigram in trigrams:
+            by_trigram.setdefault(trigram, set()).add(key)
+
+    # -- Keywords -------------------------------------------------------------
+
+    def keywords(self, field: str, extract: Callable[[str], List[str]], keywords: Iterable[str]) -> Set[str]:
+        """Candidate keys of the records with one of `keywords` among the `extract`ed keywords of their `field`."""
+        by_keyword, _, irregular = self._keyword_index(field, extract)
+        keys = set(irregular)
+        for keyword in keywords:
+            keys.update(by_keyword.get(keyword, ()))
+        return keys
+
+    def _keyword_index(self, field, extract):
+        if (field, extract) not in self._keywords:
+            by_keyword, key_keywords, irregular = {}, {}, set()
+            for key, record in self._records.items():
+                self._index_keywords(field, extract, by_keyword, key_keywords, irregular, key, record)
+            self._keywords[(field, extract)] = (by_keyword, key_keywords, irregular)
+        return self._keywords[(field, extract)]
+
+    @staticmethod
+    def _index_keywords(field, extract, by_keyword, key_keywords, irregular, key, record):
+        try:
+            if field not in record or not record[field]:
+                return
+            found = set(extract(str(record[field])))
+        except Exception:
+            irregular.add(key)
+            return
+        key_keywords[key] = found
+        for keyword in found:
+            by_keyword.setdefault(keyword, set()).add(key)
+
+    def _unindex(self, key: str):
+        for by_value, key_values, irregular in self._fields.values():
+            irregular.discard(key)
+            for value in key_values.pop(key, ()):
+                holders = by_value[value]
+                holders.discard(key)
+                if not holders:
+                    del by_value[value]
+        for by_trigram, key_trigrams, irregular in self._texts.values():
+            irregular.discard(key)
+            for trigram in key_trigrams.pop(key, ()):
+                holders = by_trigram[trigram]
+                holders.discard(key)
+                if not holders:
+                    del by_trigram[trigram]
+        for by_keyword, key_keywords, irregular in self._keywords.values():
+            irregular.discard(key)
+            for keyword in key_keywords.pop(key, ()):
+                holders = by_keyword[keyword]
+                holders.discard(key)
+                if not holders:
+                    del by_keyword[keyword]
+
+
+class CollectionIndexes(SyncedCollectionIndexes):
+    """CollectionIndex of each collection of a tracked Zendesk DB, kept in sync with it."""
+
+    index_type = CollectionIndex
+
+    def for_collection(self, db: Dict[str, Any], records: Any) -> Optional[CollectionIndex]:
+        """The index of whichever collection of `db` `records` is, None if it is none of them."""
+        for name, value in db.items():
+            if value is records:
+                return self.get(db, name)
+        return None
+
+
+collection_index = CollectionIndexes()
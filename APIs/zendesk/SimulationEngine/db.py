@@ -3,11 +3,13 @@ from common_utils.print_log import print_log
 
 import json
 import os
+
+from common_utils.tracked_db import track_changes
 # ------------------------------------------------------------------------------
 # Global In-Memory Database (JSON-serializable)
 # ------------------------------------------------------------------------------
 # Original core collections (PRESERVED - DO NOT MODIFY)
-DB = {"tickets": {}, "users": {}, "organizations": {}}
+DB = track_changes({"tickets": {}, "users": {}, "organizations": {}}, path_depth=2)
 
 # Initialize additional collections for enhanced functionality (ADDITIVE ONLY)
 def _initialize_enhanced_collections():
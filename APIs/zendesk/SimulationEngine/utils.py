@@ -1,8 +1,10 @@
 from .db import DB
+from .collection_index import EMPTY, collection_index
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Tuple, Optional, Union
 import re
 import math
+import functools
 import secrets
 import mimetypes
 import random
@@ -235,7 +237,17 @@ def search_in_collection(
     
     results = []
     
-    for item_id, item in collection.items():
+    index = collection_index.for_collection(DB, collection)
+    if index is None:
+        items = collection.values()
+    else:
+        # Only the items sharing a keyword with the query can score
+        keys = set()
+        for field in search_fields:
+            keys |= index.keywords(field, extract_keywords, query_keywords)
+        items = index.records(keys)
+    
+    for item in items:
         score = 0
         
         # Search in specified fields
@@ -415,7 +427,16 @@ def filter_collection(
     
     results = []
     
-    for item_id, item in collection.items():
+    items = collection.values()
+    index = collection_index.for_collection(DB, collection)
+    if index is not None:
+        keys = None
+        for field, value in filters.items():
+            field_keys = index.equal(field, value)
+            keys = field_keys if keys is None else keys & field_keys
+        items = index.records(keys)
+    
+    for item in items:
         matches = True
         
         for field, value in filters.items():
@@ -444,8 +465,12 @@ def get_collection_by_foreign_key(
     Returns:
         List[Dict[str, Any]]: List of matching items
     """
+    items = collection.values()
+    index = collection_index.for_collection(DB, collection)
+    if index is not None:
+        items = index.records(index.equal(foreign_key, foreign_value))
     return [
-        item for item in collection.values() 
+        item for item in items 
         if item.get(foreign_key) == foreign_value
     ]
 
@@ -687,7 +712,7 @@ def create_comment(
     # Update search index
     update_search_index("comments", str(comment_id), body_stripped)
     
-    return comment
+    return DB["comments"][str(comment_id)]
 
 def delete_comment(comment_id: int) -> Dict[str, Any]:
     """
@@ -1514,73 +1539,69 @@ def _match_group(group: Dict[str, Any], parsed_query: Dict[str, Any]) -> bool:
     return True
 
 
+def _ticket_text_fields(ticket: Dict[str, Any]) -> List[str]:
+    """Lower-cased ticket content searched by text terms."""
+    return [
+        str(ticket.get("subject", "")).lower(),
+        str(ticket.get("description", "")).lower(),
+        str(ticket.get("status", "")).lower(),
+        str(ticket.get("priority", "")).lower(),
+        " ".join(ticket.get("tags", [])).lower()
+    ]
+
+
+def _user_text_fields(user: Dict[str, Any]) -> List[str]:
+    """Lower-cased user content searched by text terms."""
+    return [
+        str(user.get("name", "")).lower(),
+        str(user.get("email", "")).lower(),
+        str(user.get("role", "")).lower(),
+        str(user.get("notes", "")).lower(),
+        str(user.get("details", "")).lower(),
+        " ".join(user.get("tags", [])).lower()
+    ]
+
+
+def _organization_text_fields(org: Dict[str, Any]) -> List[str]:
+    """Lower-cased organization content searched by text terms."""
+    return [
+        str(org.get("name", "")).lower(),
+        str(org.get("details", "")).lower(),
+        str(org.get("notes", "")).lower(),
+        " ".join(org.get("tags", [])).lower()
+    ]
+
+
+def _group_text_fields(group: Dict[str, Any]) -> List[str]:
+    """Lower-cased group content searched by text terms."""
+    return [
+        str(group.get("name", "")).lower(),
+        str(group.get("description", "")).lower()
+    ]
+
+
 def _text_matches_ticket(term: str, ticket: Dict[str, Any]) -> bool:
     """Check if text term matches ticket content."""
     term_lower = term.lower()
-    searchable_fields = [
-        str(ticket.get("subject", "")),
-        str(ticket.get("description", "")),
-        str(ticket.get("status", "")),
-        str(ticket.get("priority", "")),
-        " ".join(ticket.get("tags", []))
-    ]
-    
-    for field in searchable_fields:
-        if _wildcard_match(term_lower, field.lower()):
-            return True
-    
-    return False
+    return any(_wildcard_match(term_lower, field) for field in _ticket_text_fields(ticket))
 
 
 def _text_matches_user(term: str, user: Dict[str, Any]) -> bool:
     """Check if text term matches user content."""
     term_lower = term.lower()
-    searchable_fields = [
-        str(user.get("name", "")),
-        str(user.get("email", "")),
-        str(user.get("role", "")),
-        str(user.get("notes", "")),
-        str(user.get("details", "")),
-        " ".join(user.get("tags", []))
-    ]
-    
-    for field in searchable_fields:
-        if _wildcard_match(term_lower, field.lower()):
-            return True
-    
-    return False
+    return any(_wildcard_match(term_lower, field) for field in _user_text_fields(user))
 
 
 def _text_matches_organization(term: str, org: Dict[str, Any]) -> bool:
     """Check if text term matches organization content."""
     term_lower = term.lower()
-    searchable_fields = [
-        str(org.get("name", "")),
-        str(org.get("details", "")),
-        str(org.get("notes", "")),
-        " ".join(org.get("tags", []))
-    ]
-    
-    for field in searchable_fields:
-        if _wildcard_match(term_lower, field.lower()):
-            return True
-    
-    return False
+    return any(_wildcard_match(term_lower, field) for field in _organization_text_fields(org))
 
 
 def _text_matches_group(term: str, group: Dict[str, Any]) -> bool:
     """Check if text term matches group content."""
     term_lower = term.lower()
-    searchable_fields = [
-        str(group.get("name", "")),
-        str(group.get("description", ""))
-    ]
-    
-    for field in searchable_fields:
-        if _wildcard_match(term_lower, field.lower()):
-            return True
-    
-    return False
+    return any(_wildcard_match(term_lower, field) for field in _group_text_fields(group))
 
 
 def _wildcard_match(pattern: str, text: str) -> bool:
@@ -1958,6 +1979,106 @@ def _match_tags(value: str, tags: List[str]) -> bool:
         return value.lower() in [tag.lower() for tag in tags]
 
 
+def _match_tag_element(value: str, tag: Any) -> bool:
+    """Match tags field against one element of a tag list (EMPTY for an empty list)."""
+    return _match_tags(value, [] if tag is EMPTY else [tag])
+
+
+@functools.lru_cache(maxsize=None)
+def _field_text(field: str):
+    """Text extractor of a single field, as matched by the subject/name/... filters."""
+    return lambda item: [str(item.get(field, "")).lower()]
+
+
+# Text searched by text terms, per collection
+_TEXT_FIELDS = {
+    "tickets": _ticket_text_fields,
+    "users": _user_text_fields,
+    "organizations": _organization_text_fields,
+    "groups": _group_text_fields,
+}
+
+# Filters matched by wildcard against a single field, per collection
+_TEXT_FILTERS = {
+    "tickets": {"subject", "description"},
+    "users": {"email", "name"},
+    "organizations": {"name"},
+    "groups": {"name"},
+}
+
+# Filters matched against the value of a single field, per collection:
+# filter key -> (field, whether the field is a list, match of a filter value and a field value)
+_VALUE_FILTERS = {
+    "tickets": {
+        "status": ("status", False, lambda value, item_value: _compare_values(item_value, value, ":")),
+        "priority": ("priority", False, lambda value, item_value: _compare_priority(item_value, value)),
+        "assignee": ("assignee_id", False, _match_user_field),
+        "requester": ("requester_id", False, _match_user_field),
+        "organization": ("organization_id", False, _match_organization_field),
+        "group": ("group_id", False, _match_group_field),
+        "tags": ("tags", True, _match_tag_element),
+    },
+    "users": {
+        "organization": ("organization_id", False, _match_organization_field),
+        "tags": ("tags", True, _match_tag_element),
+    },
+    "organizations": {
+        "tags": ("tags", True, _match_tag_element),
+    },
+    "groups": {},
+}
+
+
+def _search_candidates(collection: str, parsed_query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Get the items of DB[collection] that may match the parsed query, in DB order.
+
+    The text terms and the filters on indexed fields are looked up in the
+    collection index; negations and date filters are not. The items returned
+    are a superset of the matches, still to be checked by _search_*.
+    """
+    index = collection_index.get(DB, collection)
+    if index is None:
+        return list(DB.get(collection, {}).values())
+    
+    candidates = None
+    for term in parsed_query["text_terms"]:
+        keys = index.text(term.lower(), _TEXT_FIELDS[collection])
+        if keys is not None:
+            candidates = keys if candidates is None else candidates & keys
+    
+    for key, value in parsed_query["filters"].items():
+        keys = _filter_candidates(index, collection, key, value)
+        if keys is not None:
+            candidates = keys if candidates is None else candidates & keys
+    
+    return index.records(candidates)
+
+
+def _filter_candidates(index, collection: str, key: str, value: Any) -> Optional[set]:
+    """Keys of the items of the index that may match a filter, None if the index cannot tell."""
+    if isinstance(value, list):
+        keys = set()
+        for val in value:
+            val_keys = _filter_candidates(index, collection, key, val)
+            if val_keys is None:
+                return None
+            keys |= val_keys
+        return keys
+    
+    if isinstance(value, dict) and "operator" in value:
+        return index.select(key, lambda item_value: _compare_values(item_value, value["value"], value["operator"]))
+    
+    if not isinstance(value, str):
+        return None
+    if key in _VALUE_FILTERS[collection]:
+        field, is_list, match = _VALUE_FILTERS[collection][key]
+        return index.select(field, lambda item_value: match(value, item_value), elements=is_list)
+    if key in _TEXT_FILTERS[collection]:
+        return index.text(value.lower(), _field_text(key))
+    return None
+
+
 def _sort_results(results: List[Dict[str, Any]], sort_by: str, reverse: bool) -> List[Dict[str, Any]]:
     """Sort results by specified field."""
     def sort_key(item):
@@ -8,7 +8,7 @@ from .SimulationEngine.db import DB
 from .SimulationEngine.custom_errors import UserNotFoundError, UserAlreadyExistsError
 from .SimulationEngine.models import UserCreateInputData, UserUpdateInputData, UserResponseData
 from common_utils.phone_utils import normalize_phone_number
-from .SimulationEngine.utils import _generate_sequential_id
+from .SimulationEngine.utils import _generate_sequential_id, get_collection_by_foreign_key
 
 @tool_spec(
     spec={
@@ -310,14 +310,12 @@ def create_user(
     if email:
         # Normalize email to lowercase for comparison (same as Pydantic EmailStr)
         normalized_email = email.lower()
-        for existing_user in DB["users"].values():
-            if existing_user.get("email") == normalized_email:
-                raise UserAlreadyExistsError(f"User with email '{normalized_email}' already exists")
+        if get_collection_by_foreign_key(DB["users"], "email", normalized_email):
+            raise UserAlreadyExistsError(f"User with email '{normalized_email}' already exists")
     
     if external_id:
-        for existing_user in DB["users"].values():
-            if existing_user.get("external_id") == external_id:
-                raise UserAlreadyExistsError(f"User with external_id '{external_id}' already exists")
+        if get_collection_by_foreign_key(DB["users"], "external_id", external_id):
+            raise UserAlreadyExistsError(f"User with external_id '{external_id}' already exists")
                 
     try:
         # Validate input using Pydantic model
@@ -0,0 +1,131 @@
+import copy
+import random
+
+from common_utils.base_case import BaseTestCaseWithErrorHandler
+from ..SimulationEngine.db import DB
+from ..SimulationEngine.collection_index import collection_index
+from ..SimulationEngine.utils import (
+    _parse_search_query, _match_ticket, _match_user, filter_collection,
+    get_collection_by_foreign_key, search_in_collection
+)
+from .. import search, list_ticket_comments, list_audits_for_ticket
+
+WORDS = ["email", "server", "password", "reset", "printer", "billing", "outage", "vpn", "login", "Ünïcode"]
+QUERIES = [
+    "server", "pass*", "*age", "e*l", "vpn login", "status:open", "status:open OR pending priority:high",
+    "priority:urgent type:ticket", "assignee:none", "assignee:3 requester:me", "organization:101",
+    "tags:none", "tags:billing tags:vpn", "subject:*outage*", "email:*@example.com", "name:user1*",
+    "-status:closed printer", "priority>normal", "organization:none type:user", "ünï", "group:none",
+]
+
+
+def _random_db(seed=0):
+    rng = random.Random(seed)
+    tickets = {}
+    for i in range(1, 121):
+        tickets[str(i)] = {
+            "id": i,
+            "subject": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))),
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 8))),
+            "status": rng.choice(["new", "open", "pending", "hold", "solved", "closed"]),
+            "priority": rng.choice(["low", "normal", "high", "urgent", None]),
+            "assignee_id": rng.choice([None, 1, 2, 3]),
+            "requester_id": rng.choice([1, 2, 3, 4]),
+            "organization_id": rng.choice([None, 100, 101]),
+            "group_id": rng.choice([None, 10]),
+            "tags": rng.sample(["billing", "vpn", "urgent", "Login"], rng.randint(0, 2)),
+            "created_at": "2024-01-01T10:00:00Z",
+            "updated_at": "2024-01-01T11:00:00Z",
+        }
+    del tickets["7"]["tags"]
+    users = {
+        str(i): {"id": i, "name": f"User{i} {rng.choice(WORDS)}", "email": f"user{i}@example.com",
+                 "role": rng.choice(["end-user", "agent"]), "organization_id": rng.choice([None, 100, 101]),
+                 "tags": rng.sample(["vip", "vpn"], rng.randint(0, 1)),
+                 "created_at": "2024-01-01T10:00:00Z", "updated_at": "2024-01-01T11:00:00Z"}
+        for i in range(1, 31)
+    }
+    comments = {str(i): {"id": i, "ticket_id": rng.randint(1, 20), "body": rng.choice(WORDS),
+                       "attachments": []} for i in range(1, 201)}
+    return {"tickets": tickets, "users": users, "organizations": {}, "groups": {}, "comments": comments,
+            "attachments": {}, "ticket_audits": {}}
+
+
+class TestCollectionIndex(BaseTestCaseWithErrorHandler):
+    def setUp(self):
+        self._original_DB_state = copy.deepcopy(DB)
+        DB.clear()
+        DB.update(_random_db())
+
+    def tearDown(self):
+        DB.clear()
+        DB.update(self._original_DB_state)
+
+    def _scan(self, query):
+        """Ids search finds for a query, checking every ticket and user."""
+        parsed = _parse_search_query(query)
+        type_filter = parsed.get("type_filter")
+        ids = []
+        if not type_filter or "ticket" in type_filter:
+            ids += [("ticket", t["id"]) for t in DB["tickets"].values() if _match_ticket(t, parsed)]
+        if not type_filter or "user" in type_filter:
+            ids += [("user", u["id"]) for u in DB["users"].values() if _match_user(u, parsed)]
+        return ids
+
+    def _search(self, query):
+        results = []
+        page = 1
+        while True:
+            response = search(query, page=page)
+            results += [(r["result_type"], r["id"]) for r in response["results"]]
+            if "next_page" not in response:
+                return results
+            page += 1
+
+    def test_search_matches_a_scan(self):
+        for query in QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(self._search(query), self._scan(query))
+
+    def test_index_follows_db_changes(self):
+        self.assertEqual(self._search("zeppelin"), [])
+        DB["tickets"]["500"] = dict(copy.deepcopy(DB["tickets"]["1"]), id=500, subject="Zeppelin landing")
+        self.assertEqual(self._search("zeppelin"), [("ticket", 500)])
+        DB["tickets"]["500"]["subject"] = "Balloon landing"
+        DB["tickets"]["1"]["tags"].append("zeppelin")
+        self.assertEqual(self._search("zeppelin"), [("ticket", 1)])
+        self.assertEqual(self._search("tags:zeppelin status:" + DB["tickets"]["1"]["status"]), [("ticket", 1)])
+        del DB["tickets"]["1"]
+        self.assertEqual(self._search("zeppelin"), [])
+        DB["tickets"] = {"9": dict(copy.deepcopy(DB["tickets"]["500"]), id=9, status="hold")}
+        self.assertEqual(self._search("status:hold type:ticket"), [("ticket", 9)])
+        for query in QUERIES:
+            self.assertEqual(self._search(query), self._scan(query))
+
+    def test_irregular_records_are_still_matched(self):
+        DB["tickets"]["8"]["priority"] = ["high"]
+        DB["tickets"]["9"]["tags"] = "vpn"
+        for query in ("priority:high", "tags:n", "tags:none", "vpn"):
+            with self.subTest(query=query):
+                self.assertEqual(self._search(query), self._scan(query))
+
+    def test_foreign_keys_and_filters(self):
+        for ticket_id in (1, 5, 19):
+            expected = [c for c in DB["comments"].values() if c["ticket_id"] == ticket_id]
+            self.assertEqual(get_collection_by_foreign_key(DB["comments"], "ticket_id", ticket_id), expected)
+            self.assertEqual([c["id"] for c in list_ticket_comments(ticket_id)["comments"]],
+                             [c["id"] for c in expected])
+        DB["ticket_audits"]["1"] = {"id": 1, "ticket_id": 3}
+        self.assertEqual(list_audits_for_ticket(3)["audits"], [{"id": 1, "ticket_id": 3}])
+        filters = {"status": "open", "organization_id": None}
+        self.assertEqual(filter_collection(DB["tickets"], filters),
+                         [t for t in DB["tickets"].values()
+                          if t["status"] == "open" and t["organization_id"] is None])
+        self.assertIsNotNone(collection_index.get(DB, "comments"))
+
+    def test_search_in_collection_scores_candidates(self):
+        indexed = search_in_collection(DB["tickets"], "printer outage", ["subject", "description"])
+        scanned = search_in_collection(copy.deepcopy(dict(DB["tickets"])), "printer outage",
+                                       ["subject", "description"])
+        self.assertEqual(indexed, scanned)
+        self.assertTrue(indexed)
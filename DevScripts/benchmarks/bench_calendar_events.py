@@ -0,0 +1,73 @@
+"""
+Benchmark for list_events over a calendar with many events.
+
+Fills the primary calendar with `--events` one-hour events spread over a year
+and `--series` daily recurring series, then lists one-day and one-week windows,
+with and without singleEvents. Each call looks up the events of the window in
+the calendar's start-time index (google_calendar/SimulationEngine/event_index.py)
+and reuses the expansion of each recurring series for a window it was already
+expanded for.
+
+Usage:
+    python DevScripts/benchmarks/bench_calendar_events.py [--events 20000] [--series 50] [--calls 100]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import google_calendar
+from google_calendar.SimulationEngine.db import DB
+
+
+def _build_db(events: int, series: int) -> None:
+    for collection in ("events", "calendars", "calendar_list"):
+        DB[collection] = {}
+    calendar = {"id": "primary", "primary": True, "summary": "Benchmark", "timeZone": "UTC"}
+    DB["calendars"]["primary"] = dict(calendar)
+    DB["calendar_list"]["primary"] = dict(calendar)
+    start = datetime(2024, 1, 1, 8)
+    for i in range(events):
+        begin = start + timedelta(minutes=(i * 26280) % (365 * 24 * 60))
+        DB["events"][f"primary:event{i}"] = {
+            "id": f"event{i}", "summary": f"Meeting {i}",
+            "start": {"dateTime": begin.isoformat(), "offset": "+00:00", "timeZone": None},
+            "end": {"dateTime": (begin + timedelta(hours=1)).isoformat(), "offset": "+00:00", "timeZone": None},
+        }
+    for i in range(series):
+        begin = start + timedelta(minutes=15 * i)
+        DB["events"][f"primary:series{i}"] = {
+            "id": f"series{i}", "summary": f"Standup {i}",
+            "start": {"dateTime": begin.isoformat(), "offset": "+00:00", "timeZone": None},
+            "end": {"dateTime": (begin + timedelta(minutes=15)).isoformat(), "offset": "+00:00", "timeZone": None},
+            "recurrence": ["RRULE:FREQ=DAILY;UNTIL=20241231T000000Z"],
+        }
+
+
+def run(events: int, series: int, calls: int):
+    _build_db(events, series)
+    print(f"{events} events and {series} daily series")
+    for label, days, single in [("1-day window", 1, False), ("1-day window, singleEvents", 1, True),
+                                ("7-day window, singleEvents", 7, True)]:
+        start = time.perf_counter()
+        for i in range(calls):
+            day = datetime(2024, 3, 1) + timedelta(days=i % 7)
+            google_calendar.list_events(timeMin=day.isoformat() + "Z",
+                                        timeMax=(day + timedelta(days=days)).isoformat() + "Z",
+                                        singleEvents=single, orderBy="startTime" if single else None)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<30} {elapsed / calls * 1e3:8.2f} ms/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--series", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=100)
+    args = parser.parse_args()
+    run(args.events, args.series, args.calls)
@@ -0,0 +1,97 @@
+"""
+Benchmark for confluence CQL search and the content tree lookups.
+
+Fills DB["contents"] with `--contents` synthetic pages, blog posts and
+comments in a few spaces, nested up to five levels deep, then times:
+
+- search_content with space, type and ancestor conditions, once tokenizing
+  the query and checking every content (as before) and once with the cached
+  CQL plan and the candidates of the content index
+  (SimulationEngine/content_index.py),
+- get_content_descendants and get_content_children, once scanning every
+  content at each level of the tree and once reading the ancestor postings.
+
+Usage:
+    python DevScripts/benchmarks/bench_confluence_cql.py [--contents 20000] [--calls 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import confluence
+from confluence import ContentAPI
+from confluence.SimulationEngine.db import DB
+from confluence.SimulationEngine.content_index import content_index
+
+SPACES = ["DOC", "ENG", "OPS", "HR", "SALES", "LEGAL", "MKT", "IT"]
+QUERIES = ["space='ENG' AND type='blogpost'", "type='page' AND space='HR' AND title~'plan'",
+           "ancestor='{root}' AND type='comment'", "(space='OPS' OR space='IT') AND status='current'",
+           "space='LEGAL' AND NOT type='comment'"]
+
+
+def _build_db(contents: int):
+    rng = random.Random(0)
+    data = {}
+    for i in range(contents):
+        content_id = str(i + 1)
+        content = {"id": content_id, "type": rng.choice(["page", "page", "blogpost", "comment"]),
+                   "spaceKey": rng.choice(SPACES), "title": f"{rng.choice(['Plan', 'Notes', 'Report'])} {i}",
+                   "status": rng.choice(["current", "current", "current", "trashed"]),
+                   "body": {"storage": {"value": f"<p>content {i}</p>", "representation": "storage"}}}
+        if i >= 50:
+            parent = data[str(rng.randrange(1, i + 1))]
+            if len(parent.get("ancestors", [])) < 5:
+                content["ancestors"] = parent.get("ancestors", []) + [{"id": parent["id"]}]
+        data[content_id] = content
+    DB.clear()
+    DB.update({"contents": data, "spaces": {key: {"spaceKey": key, "name": key} for key in SPACES},
+               "content_labels": {}, "content_properties": {}, "history": {}, "content_counter": contents + 1})
+    return [key for key, content in data.items() if "ancestors" not in content]
+
+
+def _time(label: str, calls: int, call):
+    start = time.perf_counter()
+    for i in range(calls):
+        call(i)
+    elapsed = (time.perf_counter() - start) / calls
+    print(f"  {label:<52} {elapsed * 1e3:9.3f} ms")
+
+
+def run(contents: int, calls: int):
+    roots = _build_db(contents)
+    print(f"{contents} contents, {len(roots)} top-level pages")
+    rng = random.Random(1)
+    parents = [rng.choice(roots) for _ in range(calls)]
+    queries = [QUERIES[i % len(QUERIES)].format(root=parents[i]) for i in range(calls)]
+
+    def search(i):
+        confluence.search_content_cql(cql=queries[i], limit=100)
+
+    def tree(i):
+        confluence.get_content_descendants(parents[i])
+        confluence.get_content_children(parents[i])
+
+    with patch.object(content_index, "get", lambda db: None), \
+            patch.object(ContentAPI, "_compile_cql", ContentAPI._compile_cql.__wrapped__):
+        _time("CQL search, every content checked", calls, search)
+        _time("descendants + children, scan per tree level", calls, tree)
+    for i in range(len(QUERIES)):
+        search(i)
+    tree(0)
+    _time("CQL search, cached plan + index candidates", calls, search)
+    _time("descendants + children, ancestor postings", calls, tree)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contents", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+    run(args.contents, args.calls)
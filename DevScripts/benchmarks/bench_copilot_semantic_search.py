@@ -0,0 +1,104 @@
+"""
+Benchmark for copilot semantic_search over a large synthetic workspace, offline.
+
+Fills the copilot workspace with `--files` synthetic source files, and answers
+the LLM calls of semantic_search with the offline stand-in of the LLM gateway
+(common_utils/llm_gateway.py): a file is relevant when it holds the topic of
+the query, and every call waits `--latency` ms like a remote model would.
+Times semantic_search as it used to run (the first files of the workspace,
+scored one after another) and as it runs now: files picked by the lexical
+prefilter, scored by a pool of threads until enough high-confidence hits are
+found, with verdicts cached by query and file content (cold, then repeated).
+
+Usage:
+    python DevScripts/benchmarks/bench_copilot_semantic_search.py [--files 5000] [--latency 20] [--queries 5]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from unittest.mock import patch
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import copilot
+from copilot import code_intelligence
+from copilot.SimulationEngine.db import DB
+from copilot.SimulationEngine.relevance_cache import relevance_cache
+from copilot.SimulationEngine.utils import MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE
+from common_utils.llm_gateway import RuleBasedBackend, llm_gateway
+
+ROOT = "/bench_ws"
+TOPICS = ["invoice", "checkout", "session", "upload", "webhook", "playlist", "thumbnail", "ledger",
+          "inventory", "shipment", "coupon", "avatar", "billing", "profile", "search", "export"]
+WORDS = ["value", "result", "item", "index", "count", "data", "node", "entry", "buffer", "config"]
+
+
+def _build_db(files: int) -> None:
+    rng = random.Random(0)
+    file_system = {ROOT: {"path": ROOT, "is_directory": True, "content_lines": [], "size_bytes": 0}}
+    for i in range(files):
+        topic = rng.choice(TOPICS)
+        path = f"{ROOT}/src/{topic}/module_{i}.py"
+        lines = [f"def {topic}_{rng.choice(WORDS)}_{i}({rng.choice(WORDS)}):\n"]
+        lines += [f"    {rng.choice(WORDS)} = {rng.choice(WORDS)} + {rng.randrange(100)}\n" for _ in range(30)]
+        lines.append(f"    return {rng.choice(WORDS)}\n")
+        file_system[path] = {"path": path, "is_directory": False, "content_lines": lines,
+                             "size_bytes": sum(len(line) for line in lines)}
+    DB.clear()
+    DB.update({"workspace_root": ROOT, "cwd": ROOT, "file_system": file_system})
+
+
+def _fake_llm(latency: float):
+    query = re.compile(r'User Query: "([^"]*)"')
+
+    def verdict(request):
+        time.sleep(latency / 1e3)
+        topic = query.search(request.prompt).group(1).split()[-1]
+        if f"def {topic}_" not in request.prompt:
+            return "NOT_RELEVANT"
+        return f"RELEVANT: 1,5,{0.7 + (len(request.prompt) % 30) / 100:.2f}"
+
+    return verdict
+
+
+def _time(label: str, queries, search):
+    start = time.perf_counter()
+    counts = [len(search(query)) for query in queries]
+    elapsed = (time.perf_counter() - start) / len(queries)
+    print(f"  {label:<52} {elapsed * 1e3:9.1f} ms  ({sum(counts) / len(counts):.1f} snippets)")
+
+
+def _sequential_search(query):
+    relevance_cache.clear()
+    with patch.object(code_intelligence, "SEMANTIC_SEARCH_MAX_WORKERS", 1), \
+            patch.object(code_intelligence, "SEMANTIC_SEARCH_ENOUGH_HITS", float("inf")), \
+            patch.object(code_intelligence, "_prefiltered_files",
+                         lambda query, entries: entries[:MAX_FILES_TO_PROCESS_WITH_LLM_LARGE_WORKSPACE]):
+        return copilot.semantic_search(query)
+
+
+def run(files: int, latency: float, queries: int):
+    _build_db(files)
+    llm_gateway.configure(mode="offline", offline_backend=RuleBasedBackend(default=_fake_llm(latency)))
+    topics = [f"find the code about {topic}" for topic in TOPICS[:queries]]
+    print(f"{files} files, {latency} ms per LLM call")
+    _time("before: first files, one call after another", topics, _sequential_search)
+    relevance_cache.clear()
+    _time("prefilter, thread pool, early stop (cold cache)", topics, copilot.semantic_search)
+    _time("same queries again (cached verdicts)", topics, copilot.semantic_search)
+    stats = llm_gateway.stats("copilot")
+    print(f"  LLM calls: {stats['calls']}, {stats['latency_seconds']:.1f} s spent in calls")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=20.0)
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+    run(args.files, args.latency, args.queries)
@@ -0,0 +1,114 @@
+"""
+Benchmark for resetting service DBs between episodes, on the largest default DBs.
+
+For each of the `--dbs` largest files of DBs/, runs `--episodes` short episodes
+that change `--changes` random records, and resets the DB after each one:
+
+- deepcopy: `DB.clear(); DB.update(deepcopy(initial))`, as notes_and_lists does,
+- JSON reload: `load_state` of the default file,
+- snapshot: `restore` of a copy-on-write snapshot of the change-tracked DB
+  (common_utils/db_snapshots.py), taken once before the first episode.
+
+The first two run on a plain dict, which is their cheapest case. Prints the
+time per reset and checks that every reset gives back the initial DB.
+
+Usage:
+    python DevScripts/benchmarks/bench_db_snapshots.py [--dbs 10] [--episodes 20] [--changes 20]
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+from common_utils.db_snapshots import SnapshotManager
+from common_utils.tracked_db import track_changes
+
+DBS_DIR = os.path.join(os.path.dirname(APIS_DIR), "DBs")
+
+
+def _largest_dbs(count: int):
+    paths = [os.path.join(DBS_DIR, name) for name in os.listdir(DBS_DIR) if name.endswith(".json")]
+    return sorted(paths, key=os.path.getsize, reverse=True)[:count]
+
+
+def _episode(db: dict, rng: random.Random, changes: int):
+    """Change `changes` records found by walking down random keys of `db`."""
+    for i in range(changes):
+        node = db
+        for _ in range(3):
+            children = [key for key, value in node.items() if isinstance(value, dict) and value]
+            if not children:
+                break
+            node = node[rng.choice(children)]
+        node[f"bench_{i}"] = {"episode": i}
+
+
+def _time(resets: int, episode, reset) -> float:
+    elapsed = 0.0
+    for _ in range(resets):
+        episode()
+        start = time.perf_counter()
+        reset()
+        elapsed += time.perf_counter() - start
+    return elapsed / resets
+
+
+def run(dbs: int, episodes: int, changes: int, check: bool = True):
+    print(f"{episodes} episodes of {changes} changes; time per reset")
+    print(f"  {'DB':<40} {'size':>8} {'deepcopy':>11} {'JSON reload':>12} {'snapshot':>11} {'snapshot()':>11}")
+    manager = SnapshotManager()
+    for path in _largest_dbs(dbs):
+        name = os.path.basename(path)[:-len("DefaultDB.json")]
+        with open(path, encoding="utf-8") as f:
+            initial = json.load(f)
+        rng = random.Random(0)
+
+        plain = copy.deepcopy(initial)
+
+        def deepcopy_reset():
+            plain.clear()
+            plain.update(copy.deepcopy(initial))
+
+        def json_reset():
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            plain.clear()
+            plain.update(data)
+
+        deepcopy_time = _time(episodes, lambda: _episode(plain, rng, changes), deepcopy_reset)
+        json_time = _time(episodes, lambda: _episode(plain, rng, changes), json_reset)
+
+        tracked = track_changes(initial, path_depth=2)
+        manager.register(name, tracked)
+        start = time.perf_counter()
+        snapshot = manager.snapshot(name)
+        snapshot_time = time.perf_counter() - start
+
+        def check_reset():
+            manager.restore(snapshot)
+            if check and tracked != initial:
+                raise AssertionError(f"{name}: restored DB differs from the initial one")
+
+        restore_time = _time(episodes, lambda: _episode(tracked, rng, changes), lambda: manager.restore(snapshot))
+        _episode(tracked, rng, changes)
+        check_reset()
+        manager.release(snapshot)
+        print(f"  {name:<40} {os.path.getsize(path) / 1024:6.0f}KB {deepcopy_time * 1e3:8.2f} ms "
+              f"{json_time * 1e3:9.2f} ms {restore_time * 1e3:8.3f} ms {snapshot_time * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dbs", type=int, default=10)
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--no-check", dest="check", action="store_false")
+    args = parser.parse_args()
+    run(args.dbs, args.episodes, args.changes, args.check)
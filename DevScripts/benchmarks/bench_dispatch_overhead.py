@@ -0,0 +1,73 @@
+"""
+Micro-benchmark for per-call dispatch overhead of service functions.
+
+Every `service.function_name` access goes through the package `__getattr__`,
+which resolves and decorates the implementation. This script measures the cost
+of that lookup (and of lookup plus call) with the decorated-function cache
+disabled, which reproduces the old behaviour of re-decorating on every access,
+and with the cache enabled.
+
+Usage:
+    python DevScripts/benchmarks/bench_dispatch_overhead.py [--service gmail]
+        [--function get_user_profile] [--iterations 20000]
+"""
+import argparse
+import os
+import sys
+import time
+import importlib
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+from common_utils.decorator_cache import invalidate_decorated_functions
+
+
+def _time_per_op(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def run(service_name: str, function_name: str, iterations: int, call_args: dict):
+    service = importlib.import_module(service_name)
+
+    def lookup():
+        return getattr(service, function_name)
+
+    def lookup_uncached():
+        invalidate_decorated_functions(service_name)
+        return getattr(service, function_name)
+
+    def call():
+        return getattr(service, function_name)(**call_args)
+
+    def call_uncached():
+        invalidate_decorated_functions(service_name)
+        return getattr(service, function_name)(**call_args)
+
+    lookup()  # warm up imports
+    results = {
+        "lookup (re-decorate every access)": _time_per_op(lookup_uncached, iterations),
+        "lookup (cached)": _time_per_op(lookup, iterations),
+        "lookup + call (re-decorate every access)": _time_per_op(call_uncached, iterations),
+        "lookup + call (cached)": _time_per_op(call, iterations),
+    }
+    print(f"{service_name}.{function_name}, {iterations} iterations")
+    for label, seconds in results.items():
+        print(f"  {label:<42} {seconds * 1e6:10.2f} us/op")
+    speedup = results["lookup (re-decorate every access)"] / results["lookup (cached)"]
+    print(f"  lookup speedup: {speedup:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--service", default="gmail")
+    parser.add_argument("--function", default="get_user_profile")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    call_args = {"userId": "me"} if (args.service, args.function) == ("gmail", "get_user_profile") else {}
+    run(args.service, args.function, args.iterations, call_args)
@@ -0,0 +1,90 @@
+"""
+Benchmark for files.list queries, paging and folder deletion on a large Drive.
+
+Builds a drive of `--folders` folders holding `--per-folder` files each, then
+times list queries (each metadata condition is looked up in the search engine
+once per call and narrowed down through the file index of
+gdrive/SimulationEngine/file_index.py), paging through a whole listing with
+page tokens, and deleting folders (children are found through the index
+instead of a scan of all files per tree level).
+
+Usage:
+    python DevScripts/benchmarks/bench_gdrive_files.py [--folders 100] [--per-folder 100] [--page-size 100]
+"""
+import argparse
+import os
+import sys
+import time
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import gdrive
+from gdrive.SimulationEngine.db import DB
+from gdrive.SimulationEngine.utils import _ensure_user
+
+FOLDER = "application/vnd.google-apps.folder"
+
+
+def _build_db(folders: int, per_folder: int) -> None:
+    DB.clear()
+    DB["users"] = {}
+    _ensure_user("me")
+    email = DB["users"]["me"]["about"]["user"]["emailAddress"]
+    files = DB["users"]["me"]["files"]
+    for f in range(folders):
+        folder_id = f"folder_{f}"
+        files[folder_id] = {"id": folder_id, "name": f"Folder {f}", "mimeType": FOLDER, "parents": ["root"],
+                            "owners": [email], "trashed": False, "size": "0",
+                            "modifiedTime": "2024-01-01T00:00:00Z"}
+        for i in range(per_folder):
+            file_id = f"file_{f}_{i}"
+            files[file_id] = {"id": file_id, "name": f"Report {f} {i}",
+                              "mimeType": "application/pdf" if i % 3 == 0 else "text/plain",
+                              "parents": [folder_id], "owners": [email], "trashed": i % 10 == 0, "size": "10",
+                              "modifiedTime": f"2024-01-{i % 28 + 1:02d}T00:00:00Z"}
+
+
+def _time(label: str, func, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<44} {elapsed * 1e3:9.2f} ms")
+    return result
+
+
+def run(folders: int, per_folder: int, page_size: int):
+    _build_db(folders, per_folder)
+    total = folders * (per_folder + 1)
+    print(f"{total} files in {folders} folders")
+
+    gdrive.list_user_files(q="name contains 'Report'", pageSize=1)  # indexes the drive in the search engine
+    _time("'folder_7' in parents", lambda: gdrive.list_user_files(q="'folder_7' in parents", pageSize=page_size), 5)
+    _time("mimeType = pdf and trashed = false", lambda: gdrive.list_user_files(
+        q="mimeType = 'application/pdf' and trashed = false", pageSize=page_size), 5)
+    _time("modifiedTime > '2024-01-20' (no index)", lambda: gdrive.list_user_files(
+        q="modifiedTime > '2024-01-20T00:00:00Z'", pageSize=page_size), 5)
+
+    def page_through():
+        pages, token = 0, ""
+        while True:
+            result = gdrive.list_user_files(pageSize=page_size, pageToken=token)
+            pages += 1
+            token = result["nextPageToken"]
+            if not token:
+                return pages
+
+    pages = _time("page through every file", page_through)
+    print(f"  ({pages} pages of {page_size})")
+    _time("delete 10 folders", lambda: [gdrive.delete_file_permanently(f"folder_{f}") for f in range(10)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folders", type=int, default=100)
+    parser.add_argument("--per-folder", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    run(args.folders, args.per_folder, args.page_size)
@@ -0,0 +1,117 @@
+"""
+Benchmark for GitHub lookups and code search over a large DB.
+
+Fills the GitHub DB with `--repos` repositories, each with `--files` files on
+its default branch (base64 content, as stored by the API), issues, pull
+requests and commits, then times get_issue_content,
+get_repository_commit_details and search_repository_code. Lookups by (repository, number), sha and branch name go through
+the key indexes of github/SimulationEngine/table_index.py; search_code narrows
+each query down with the trigram index of
+github/SimulationEngine/code_search_index.py and reuses decoded file contents.
+
+Usage:
+    python DevScripts/benchmarks/bench_github_lookups.py [--repos 200] [--files 50] [--calls 200]
+"""
+import argparse
+import base64
+import hashlib
+import os
+import random
+import sys
+import time
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import github
+from github.SimulationEngine.db import DB
+
+WORDS = ["parse", "render", "client", "server", "cache", "token", "stream", "buffer", "config", "router",
+         "handler", "session", "socket", "schema", "widget", "logger", "queue", "worker", "metric", "signal"]
+EXTENSIONS = ["py", "js", "ts", "html", "css", "md"]
+OWNER = {"login": "octocat", "id": 1, "node_id": "U1", "type": "User", "site_admin": False}
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _build_db(repos: int, files: int) -> None:
+    rng = random.Random(0)
+    DB.clear()
+    DB.update({"CurrentUser": {"id": 1, "login": "octocat"}, "Users": [dict(OWNER, name="The Octocat")],
+               "Repositories": [], "Branches": [], "Commits": [], "Issues": [], "PullRequests": [],
+               "FileContents": {}, "CodeSearchResultsCollection": []})
+    for repo_id in range(1, repos + 1):
+        name = f"repo{repo_id}"
+        repo = {"id": repo_id, "node_id": f"R{repo_id}", "name": name, "full_name": f"octocat/{name}",
+                "private": False, "owner": OWNER, "description": f"The {rng.choice(WORDS)} project",
+                "fork": False, "default_branch": "main", "created_at": "2024-01-01T00:00:00Z",
+                "updated_at": "2024-01-01T00:00:00Z", "pushed_at": "2024-01-01T00:00:00Z"}
+        DB["Repositories"].append(repo)
+        head = _sha(name)
+        DB["Branches"].append({"name": "main", "commit": {"sha": head}, "protected": False, "repository_id": repo_id})
+        for i in range(5):
+            sha = head if i == 0 else _sha(f"{name}/{i}")
+            DB["Commits"].append({"id": len(DB["Commits"]) + 1, "sha": sha, "node_id": f"C{sha[:8]}",
+                                  "repository_id": repo_id,
+                                  "commit": {"author": {"name": "Octocat", "email": "octo@github.com",
+                                                        "date": "2024-01-01T00:00:00Z"},
+                                             "committer": {"name": "Octocat", "email": "octo@github.com",
+                                                           "date": "2024-01-01T00:00:00Z"},
+                                             "message": f"Commit {i}", "tree": {"sha": sha}, "comment_count": 0},
+                                  "author": OWNER, "committer": OWNER, "parents": []})
+        for number in range(1, 6):
+            DB["Issues"].append({"id": len(DB["Issues"]) + 1, "node_id": f"I{repo_id}-{number}",
+                                 "repository_id": repo_id, "number": number, "title": f"Issue {number}",
+                                 "user": OWNER, "labels": [], "state": "open", "locked": False,
+                                 "assignee": None, "assignees": [], "milestone": None, "comments": 0,
+                                 "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z",
+                                 "closed_at": None, "body": "", "author_association": "OWNER"})
+        for i in range(files):
+            path = f"src/{rng.choice(WORDS)}/{rng.choice(WORDS)}_{i}.{rng.choice(EXTENSIONS)}"
+            text = " ".join(rng.choice(WORDS) + str(rng.randrange(1000)) for _ in range(200))
+            DB["FileContents"][f"{repo_id}:{head}:{path}"] = {
+                "type": "file", "encoding": "base64", "size": len(text), "name": path.split("/")[-1],
+                "path": path, "content": base64.b64encode(text.encode()).decode(), "sha": _sha(path + text)}
+            DB["CodeSearchResultsCollection"].append({
+                "name": path.split("/")[-1], "path": path, "sha": _sha(path + text),
+                "repository": {"id": repo_id, "node_id": f"R{repo_id}", "name": name,
+                               "full_name": f"octocat/{name}", "owner": OWNER, "private": False,
+                               "description": repo["description"], "fork": False},
+                "score": 1.0})
+
+
+def _time(label: str, calls: int, call):
+    start = time.perf_counter()
+    for i in range(calls):
+        call(i)
+    elapsed = (time.perf_counter() - start) / calls
+    print(f"  {label:<52} {elapsed * 1e3:9.3f} ms")
+
+
+def run(repos: int, files: int, calls: int):
+    _build_db(repos, files)
+    print(f"{repos} repositories, {len(DB['CodeSearchResultsCollection'])} files, {len(DB['Issues'])} issues, "
+          f"{len(DB['Commits'])} commits")
+    _time("get_issue_content", calls, lambda i: github.get_issue_content("octocat", f"repo{i % repos + 1}", i % 5 + 1))
+    _time("get_repository_commit_details", calls,
+          lambda i: github.get_repository_commit_details("octocat", f"repo{i % repos + 1}", _sha(f"repo{i % repos + 1}")))
+    start = time.perf_counter()
+    github.search_repository_code("cache42")
+    print(f"  {'first search (decodes and indexes the files)':<52} {(time.perf_counter() - start) * 1e3:9.3f} ms")
+    _time("search_code term", calls, lambda i: github.search_repository_code(f"{WORDS[i % len(WORDS)]}{i % 1000}"))
+    _time("search_code term repo:", calls,
+          lambda i: github.search_repository_code(f"{WORDS[i % len(WORDS)]} repo:octocat/repo{i % repos + 1}"))
+    _time("search_code term language: path:", calls,
+          lambda i: github.search_repository_code(f"{WORDS[i % len(WORDS)]}7 language:python path:src/{WORDS[-i % len(WORDS)]}"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=200)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    run(args.repos, args.files, args.calls)
@@ -0,0 +1,106 @@
+"""
+Benchmark for the google_chat lookups over the DB list tables.
+
+Fills DB with `--spaces` spaces, each with a few members and
+`--messages` messages carrying reactions, then times:
+
+- get_message / get_space_member by name, and list_spaces for a member of
+  every space, once scanning the tables (as before) and once with the
+  postings of the table index (SimulationEngine/table_index.py),
+- paging through every message of a space, once filtering and sorting the
+  table for each page and once slicing the cached listing.
+
+Usage:
+    python DevScripts/benchmarks/bench_google_chat_lists.py [--spaces 200] [--messages 100] [--calls 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+from google_chat import Spaces
+from google_chat.Spaces import Members, Messages
+from google_chat.SimulationEngine.db import DB, CURRENT_USER_ID
+from google_chat.SimulationEngine.table_index import table_index
+
+USERS = [f"users/user{i}" for i in range(10)]
+
+
+def _build_db(spaces: int, messages: int):
+    rng = random.Random(0)
+    tables = {"Space": [], "Membership": [], "Message": [], "Reaction": [], "Attachment": [], "User": []}
+    for s in range(spaces):
+        space = f"spaces/SPACE_{s}"
+        tables["Space"].append({"name": space, "spaceType": "SPACE", "displayName": f"Space {s}"})
+        for user in USERS:
+            tables["Membership"].append({"name": f"{space}/members/{user}", "state": "JOINED", "role": "ROLE_MEMBER",
+                                         "member": {"name": user, "type": "HUMAN"}})
+        for m in range(messages):
+            name = f"{space}/messages/{m}"
+            tables["Message"].append({"name": name, "text": f"message {m}", "sender": {"name": rng.choice(USERS)},
+                                      "createTime": f"2024-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}T00:00:00Z",
+                                      "thread": {"name": f"{space}/threads/{rng.randrange(20)}"}})
+            if rng.random() < 0.3:
+                tables["Reaction"].append({"name": f"{name}/reactions/1", "user": {"name": rng.choice(USERS)},
+                                           "emoji": {"unicode": "🙂"}})
+    rng.shuffle(tables["Message"])
+    DB.clear()
+    DB.update(tables)
+    CURRENT_USER_ID.update({"id": USERS[0]})
+
+
+def _time(label: str, calls: int, call):
+    start = time.perf_counter()
+    for i in range(calls):
+        call(i)
+    elapsed = (time.perf_counter() - start) / calls
+    print(f"  {label:<52} {elapsed * 1e3:9.3f} ms")
+
+
+def run(spaces: int, messages: int, calls: int):
+    _build_db(spaces, messages)
+    print(f"{spaces} spaces, {len(DB['Membership'])} memberships, {len(DB['Message'])} messages")
+    rng = random.Random(1)
+    targets = [(f"spaces/SPACE_{rng.randrange(spaces)}", rng.randrange(messages)) for _ in range(calls)]
+
+    def lookups(i):
+        space, message = targets[i]
+        Messages.get(f"{space}/messages/{message}")
+        Members.get(f"{space}/members/{USERS[1]}")
+
+    def list_spaces(i):
+        Spaces.list(pageSize=20)
+
+    def page_through(i):
+        token = None
+        while True:
+            response = Messages.list(targets[i][0], pageSize=10, pageToken=token)
+            token = response.get("nextPageToken")
+            if not token:
+                break
+
+    with patch.object(table_index, "get", lambda db, table: None), \
+            patch.object(table_index, "cached", lambda db, tables, query, compute: compute()):
+        _time("get message + member, table scans", calls, lookups)
+        _time("list_spaces, membership scan per space", max(calls // 10, 1), list_spaces)
+        _time("page through a space, filter + sort per page", calls, page_through)
+    lookups(0)
+    list_spaces(0)
+    _time("get message + member, name postings", calls, lookups)
+    _time("list_spaces, member postings", max(calls // 10, 1), list_spaces)
+    _time("page through a space, cached listing", calls, page_through)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spaces", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+    run(args.spaces, args.messages, args.calls)
@@ -0,0 +1,100 @@
+"""
+Benchmark for Places searches over a large Google Maps DB.
+
+Fills the DB with `--places` synthetic places spread over the world, then
+times searchNearby, searchText and autocomplete with circles and types. Each
+search only reads the places that google_maps/SimulationEngine/place_index.py
+finds in the grid cells under its circle and in its type sets, and stops once
+it has enough results. With `--check`, every search is also run against a full
+scan of the DB and their results compared.
+
+Usage:
+    python DevScripts/benchmarks/bench_google_maps_places.py [--places 1000000] [--calls 50] [--check]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import google_maps.Places as Places
+from google_maps.SimulationEngine.db import DB
+
+TYPES = ["restaurant", "cafe", "bar", "bakery", "museum", "park", "hotel", "pharmacy", "gym", "library"]
+WORDS = ["Golden", "Blue", "Corner", "Central", "River", "Old", "Royal", "Green", "Little", "Grand"]
+
+
+def _build_db(places: int) -> None:
+    rng = random.Random(0)
+    DB.clear()
+    for i in range(places):
+        primary_type = rng.choice(TYPES)
+        DB[f"place_{i}"] = {
+            "id": f"place_{i}",
+            "name": f"{rng.choice(WORDS)} {primary_type.title()} {i}",
+            "formattedAddress": f"{i} {rng.choice(WORDS)} Street",
+            "primaryType": primary_type,
+            "types": [primary_type, rng.choice(TYPES)],
+            "rating": round(rng.uniform(1, 5), 1),
+            "location": {"latitude": rng.uniform(-60, 70), "longitude": rng.uniform(-180, 180)},
+        }
+
+
+def _circle(i: int, radius: float) -> dict:
+    rng = random.Random(i)
+    return {"center": {"latitude": rng.uniform(-60, 70), "longitude": rng.uniform(-180, 180)}, "radius": radius}
+
+
+def _scanned(function, request):
+    candidates = Places._candidate_places
+    Places._candidate_places = lambda *args, **kwargs: DB.items()
+    try:
+        return function(request)
+    finally:
+        Places._candidate_places = candidates
+
+
+def _time(label: str, calls: int, function, request, check: bool):
+    start = time.perf_counter()
+    for i in range(calls):
+        function(request(i))
+    elapsed = (time.perf_counter() - start) / calls
+    print(f"  {label:<52} {elapsed * 1e3:9.3f} ms")
+    if check:
+        for i in range(min(calls, 5)):
+            if function(request(i)) != _scanned(function, request(i)):
+                raise SystemExit(f"{label}: results differ from a full scan for {request(i)}")
+
+
+def run(places: int, calls: int, check: bool):
+    _build_db(places)
+    print(f"{places} places")
+    start = time.perf_counter()
+    Places.searchNearby({"includedTypes": ["cafe"], "maxResultCount": 1})
+    print(f"  {'first search (builds the index)':<52} {(time.perf_counter() - start) * 1e3:9.3f} ms")
+    _time("searchNearby 50 km circle", calls, Places.searchNearby,
+          lambda i: {"locationRestriction": {"circle": _circle(i, 50000)}, "maxResultCount": 20}, check)
+    _time("searchNearby 200 km circle, primary type", calls, Places.searchNearby,
+          lambda i: {"locationRestriction": {"circle": _circle(i, 200000)},
+                     "includedPrimaryTypes": [TYPES[i % len(TYPES)]]}, check)
+    _time("searchText text, 100 km bias, strict type", calls, Places.searchText,
+          lambda i: {"textQuery": WORDS[i % len(WORDS)].lower(), "locationBias": {"circle": _circle(i, 100000)},
+                     "includedType": TYPES[i % len(TYPES)], "strictTypeFiltering": True}, check)
+    _time("autocomplete 100 km circle, primary type", calls, Places.autocomplete,
+          lambda i: {"input": WORDS[i % len(WORDS)], "locationRestriction": {"circle": _circle(i, 100000)},
+                     "includedPrimaryTypes": [TYPES[i % len(TYPES)]]}, check)
+    _time("searchNearby types only", calls, Places.searchNearby,
+          lambda i: {"includedTypes": [TYPES[i % len(TYPES)]], "maxResultCount": 20}, check)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--places", type=int, default=1000000)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+    run(args.places, args.calls, args.check)
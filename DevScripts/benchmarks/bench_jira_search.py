@@ -0,0 +1,85 @@
+"""
+Benchmark for search_issues_jql over a large Jira DB.
+
+Fills DB["issues"] with `--issues` synthetic issues spread over projects,
+statuses, assignees, priorities, issue types and a year of created/updated
+dates, then times JQL searches. Each query is compiled once into a cached
+plan; its project/status/assignee/reporter/priority/issuetype conditions and
+created/updated ranges are looked up in the issue indexes of
+jira/SimulationEngine/issue_index.py, and ORDER BY created/updated walks the
+presorted date index, so only the requested page of issues is read.
+
+Usage:
+    python DevScripts/benchmarks/bench_jira_search.py [--issues 200000] [--calls 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import jira
+from jira.SimulationEngine.db import DB
+
+PROJECTS = ["DEMO", "WEB", "API", "OPS", "DATA"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed", "Done"]
+PRIORITIES = ["Lowest", "Low", "Medium", "High", "Critical"]
+ISSUE_TYPES = ["Bug", "Task", "Story", "Epic"]
+USERS = [f"user{i}" for i in range(50)]
+
+
+def _build_db(issues: int) -> None:
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    minutes = 365 * 24 * 60
+    DB["issues"] = {
+        f"ISSUE-{i + 1}": {"id": f"ISSUE-{i + 1}", "fields": {
+            "project": rng.choice(PROJECTS),
+            "summary": f"Issue number {i + 1}",
+            "description": "Synthetic benchmark issue",
+            "status": rng.choice(STATUSES),
+            "priority": rng.choice(PRIORITIES),
+            "issuetype": rng.choice(ISSUE_TYPES),
+            "assignee": {"name": rng.choice(USERS)},
+            "reporter": rng.choice(USERS),
+            "created": (start + timedelta(minutes=rng.randrange(minutes))).isoformat(),
+            "updated": (start + timedelta(minutes=rng.randrange(minutes))).isoformat(),
+        }}
+        for i in range(issues)
+    }
+
+
+def _time(label: str, jql: str, calls: int, **kwargs):
+    start = time.perf_counter()
+    for _ in range(calls):
+        result = jira.search_issues_jql(jql=jql, **kwargs)
+    elapsed = (time.perf_counter() - start) / calls
+    print(f"  {label:<52} {elapsed * 1e3:9.2f} ms  ({result['total']} matching)")
+
+
+def run(issues: int, calls: int):
+    _build_db(issues)
+    print(f"{issues} issues")
+    start = time.perf_counter()
+    jira.search_issues_jql(jql='project = "DEMO"', max_results=1)
+    print(f"  {'first search (builds the indexes)':<52} {(time.perf_counter() - start) * 1e3:9.2f} ms")
+    _time("project = DEMO AND status = Open", 'project = "DEMO" AND status = "Open"', calls)
+    _time("assignee = user7 AND priority IN (High, Critical)",
+          'assignee = "user7" AND priority IN ("High", "Critical")', calls)
+    _time("created in March ORDER BY updated DESC",
+          'created >= "2024-03-01" AND created < "2024-04-01" ORDER BY updated DESC', calls)
+    _time("ORDER BY created, page 10", "ORDER BY created", calls, start_at=450, max_results=50)
+    _time("status != Done (scan)", 'status != "Done"', calls)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=200000)
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+    run(args.issues, args.calls)
@@ -0,0 +1,80 @@
+"""
+Benchmark for the LLM gateway (common_utils/llm_gateway.py), without network.
+
+Runs copilot's call_llm against the offline rule-based stand-in, then a
+simulated backend of `--latency` ms per call: live, cached, recorded to a
+temporary cassette and replayed from it, and from `--threads` threads with the
+concurrency cap and token bucket on. Prints the time per call and the
+per-service counters of the gateway.
+
+Usage:
+    python DevScripts/benchmarks/bench_llm_gateway.py [--calls 200] [--latency 20] [--threads 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+from common_utils.llm_gateway import LLMRequest, LLMResponse, RuleBasedBackend, llm_gateway
+from copilot.SimulationEngine.llm_interface import call_llm
+
+
+def _time(label: str, calls: int, call):
+    start = time.perf_counter()
+    for i in range(calls):
+        call(i)
+    elapsed = (time.perf_counter() - start) / calls
+    print(f"  {label:<52} {elapsed * 1e3:9.3f} ms")
+
+
+def run(calls: int, latency: float, threads: int):
+    def simulated(request):
+        time.sleep(latency / 1e3)
+        return LLMResponse(f"answer to {request.prompt}", len(request.prompt) // 4, 8)
+
+    def prompt(i):
+        return LLMRequest(f"Question {i % 20}", "simulated-model", temperature=0.2)
+
+    llm_gateway.configure(mode="offline", offline_backend=RuleBasedBackend([("relevant", "RELEVANT: 1,3,0.9")]))
+    _time("copilot call_llm, offline stand-in", calls, lambda i: call_llm(f"Is snippet {i} relevant?"))
+
+    llm_gateway.configure(mode="live", cache_size=0)
+    _time("simulated backend", calls // 10, lambda i: llm_gateway.complete(prompt(i), "bench", live=simulated))
+    llm_gateway.configure(cache_size=1000)
+    _time("simulated backend, cache (20 distinct prompts)", calls,
+          lambda i: llm_gateway.complete(prompt(i), "bench", live=simulated))
+
+    with tempfile.TemporaryDirectory() as directory:
+        cassette = os.path.join(directory, "cassette.jsonl")
+        llm_gateway.configure(mode="record", cassette_path=cassette, cache_size=0)
+        _time("record", calls, lambda i: llm_gateway.complete(prompt(i), "bench", live=simulated))
+        llm_gateway.configure(mode="replay", cassette_path=cassette)
+        _time("replay", calls, lambda i: llm_gateway.complete(prompt(i), "bench", live=simulated))
+
+    llm_gateway.configure(mode="live", cassette_path=None, max_concurrency=threads // 2,
+                          rate_per_second=1e3 / latency * threads, burst=threads)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda i: llm_gateway.complete(
+            LLMRequest(f"Threaded {i}", "simulated-model"), "bench", live=simulated), range(calls)))
+    print(f"  {f'{threads} threads, at most {threads // 2} concurrent calls':<52} "
+          f"{(time.perf_counter() - start) / calls * 1e3:9.3f} ms")
+
+    for service, stats in llm_gateway.stats().items():
+        print(f"  {service}: " + ", ".join(f"{name}={value:.3f}" if isinstance(value, float) else f"{name}={value}"
+                                          for name, value in stats.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=20.0)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    run(args.calls, args.latency, args.threads)
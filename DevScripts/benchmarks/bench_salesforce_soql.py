@@ -0,0 +1,91 @@
+"""
+Benchmark for salesforce SOQL queries (Query.get / execute_soql_query).
+
+Fills DB["Task"] with `--tasks` synthetic tasks, then times a mix of queries
+with equality, IN, range and date literal conditions, ORDER BY ... LIMIT and
+plain LIMIT:
+
+- as before: every query parsed again, and every task checked and sorted,
+- with the cached query plans, the field indexes of the task table
+  (SimulationEngine/query_index.py), a heap for ORDER BY ... LIMIT, and the
+  scan stopped once LIMIT results are found.
+
+Usage:
+    python DevScripts/benchmarks/bench_salesforce_soql.py [--tasks 50000] [--calls 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+from salesforce import Query
+from salesforce.SimulationEngine.db import DB
+from salesforce.SimulationEngine.query_index import sobject_index
+
+QUERIES = [
+    "SELECT Id, Subject FROM Task WHERE WhoId = '003000000000123'",
+    "SELECT Id, Status FROM Task WHERE Id IN ('task-17', 'task-4242', 'task-31337')",
+    "SELECT Id, Subject FROM Task WHERE OwnerId = '005000000000042' AND Status = 'Completed'",
+    "SELECT Id, ActivityDate FROM Task WHERE ActivityDate >= '2024-06-25' AND Priority = 'High'",
+    "SELECT Id, ActivityDate FROM Task WHERE WhatId = '006000000000007' ORDER BY ActivityDate DESC LIMIT 10",
+    "SELECT Id, Subject, ActivityDate FROM Task ORDER BY ActivityDate DESC LIMIT 20",
+    "SELECT Id, Subject FROM Task WHERE Status = 'Open' LIMIT 25",
+    "SELECT Id FROM Task WHERE ActivityDate = LAST_N_DAYS:30 AND OwnerId = '005000000000001'",
+]
+
+
+def _build_db(tasks: int) -> None:
+    rng = random.Random(0)
+    DB["Task"] = {
+        f"task-{i}": {
+            "Id": f"task-{i}",
+            "Subject": f"Follow up {rng.randrange(10000)}",
+            "Status": rng.choice(["Open", "Completed", "In Progress", "Deferred"]),
+            "Priority": rng.choice(["Low", "Normal", "High"]),
+            "ActivityDate": f"2024-{rng.randint(1, 6):02d}-{rng.randint(1, 28):02d}",
+            "OwnerId": f"005{rng.randrange(200):012d}",
+            "WhoId": f"003{rng.randrange(tasks // 10):012d}",
+            "WhatId": f"006{rng.randrange(500):012d}",
+            "IsDeleted": False,
+        }
+        for i in range(tasks)
+    }
+
+
+def _time(label: str, calls: int, call):
+    start = time.perf_counter()
+    for i in range(calls):
+        call(i)
+    elapsed = (time.perf_counter() - start) / calls
+    print(f"  {label:<52} {elapsed * 1e3:9.3f} ms")
+
+
+def run(tasks: int, calls: int):
+    _build_db(tasks)
+    print(f"{tasks} tasks, {len(QUERIES)} queries")
+
+    def query(i):
+        Query.get(QUERIES[i % len(QUERIES)])
+
+    with patch.object(sobject_index, "get", lambda db, obj: None), \
+            patch.object(Query, "_compile_query", Query._compile_query.__wrapped__), \
+            patch.object(Query, "_sort_results", lambda results, field, reverse, wanted: sorted(
+                results, key=lambda x: x.get(field, ""), reverse=reverse)):
+        _time("parse + scan + full sort", calls, query)
+    for i in range(len(QUERIES)):
+        query(i)
+    _time("cached plan + field indexes + top-k", calls, query)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=50000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+    run(args.tasks, args.calls)
@@ -0,0 +1,164 @@
+"""
+Benchmark for the n-gram indexed substring and fuzzy search strategies.
+
+Builds a synthetic Gmail DB, chunks it with the Gmail search adapter and
+measures bulk upserts and filtered queries on SubstringSearchStrategy and
+RapidFuzzSearchStrategy. Queries are also run through a linear scan over all
+chunks, which is what both strategies did before they were backed by an
+n-gram index, and the results of both are compared.
+
+Usage:
+    python DevScripts/benchmarks/bench_search_strategies.py [--messages 100000]
+        [--users 10] [--queries 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+from rapidfuzz import process
+
+from common_utils.search_engine.adapter import Adapter
+from common_utils.search_engine.configs import RapidFuzzConfig, SubstringConfig
+from common_utils.search_engine.strategies import RapidFuzzSearchStrategy, SubstringSearchStrategy
+from gmail.SimulationEngine.models import GmailMessageForSearch
+from gmail.SimulationEngine.search_engine import ServiceAdapter as GmailAdapter
+
+WORDS = (
+    "meeting report budget quarterly invoice travel lunch project deadline review "
+    "launch design sprint roadmap hiring offsite newsletter weekly update contract "
+    "renewal customer feedback release notes security audit migration dashboard"
+).split()
+
+
+class _StaticAdapter(Adapter):
+    """Serves a fixed list of chunks; syncing is a no-op so only strategy cost is measured."""
+
+    def __init__(self, documents):
+        super().__init__()
+        self.documents = documents
+
+    def db_to_searchable_documents(self):
+        return self.documents
+
+    def sync_from_db(self, strategy):
+        pass
+
+
+def build_gmail_db(num_messages: int, num_users: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    users = {f"user{u}@example.com": {"messages": {}} for u in range(num_users)}
+    user_ids = list(users)
+    for i in range(num_messages):
+        user_id = user_ids[i % num_users]
+        message_id = f"msg_{i}"
+        users[user_id]["messages"][message_id] = {
+            "id": message_id,
+            "threadId": f"thread_{i // 5}",
+            "sender": f"{rng.choice(WORDS)}{rng.randrange(500)}@example.com",
+            "recipient": user_id,
+            "subject": " ".join(rng.choices(WORDS, k=4)),
+            "body": " ".join(rng.choices(WORDS, k=25)) + f" ref {i}",
+            "labelIds": ["INBOX", "IMPORTANT"] if i % 3 == 0 else ["INBOX"],
+            "internalDate": str(1680000000000 + i * 1000),
+        }
+    return {"users": users}
+
+
+def chunk_gmail_db(db: dict) -> list:
+    adapter = GmailAdapter()
+    documents = []
+    for user_id, user in db["users"].items():
+        for message in user["messages"].values():
+            documents.extend(adapter._adapt_message(GmailMessageForSearch(**message, userId=user_id)))
+    return documents
+
+
+def _linear_substring(documents, query, filter, limit):
+    query = query.lower()
+    results = []
+    for doc in documents:
+        if all(doc.metadata.get(k) == v for k, v in filter.items()) and query in doc.text_content.lower():
+            results.append(doc)
+    return results[:limit]
+
+
+def _linear_fuzzy(documents, query, filter, limit, config):
+    strategy_scorer = RapidFuzzSearchStrategy(config, _StaticAdapter([])).scorer
+    choices = {
+        doc.chunk_id: doc.text_content
+        for doc in documents
+        if all(doc.metadata.get(k) == v for k, v in filter.items())
+    }
+    return [chunk_id for _, _, chunk_id in process.extract(
+        query, choices, scorer=strategy_scorer, limit=limit, score_cutoff=config.score_cutoff
+    )]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(num_messages: int, num_users: int, num_queries: int, limit: int = 100):
+    db, seconds = _timed(lambda: build_gmail_db(num_messages, num_users))
+    print(f"Synthetic Gmail DB: {num_messages} messages, {num_users} users ({seconds:.1f}s)")
+    documents, seconds = _timed(lambda: chunk_gmail_db(db))
+    print(f"Chunked into {len(documents)} searchable documents ({seconds:.1f}s)")
+
+    rng = random.Random(1)
+    user_ids = list(db["users"])
+    substring_queries = [
+        (f"{rng.choice(WORDS)} {rng.choice(WORDS)}", {"resource_type": "message", "user_id": rng.choice(user_ids)})
+        for _ in range(num_queries)
+    ]
+    fuzzy_queries = [
+        (rng.choice(WORDS) + " " + rng.choice(WORDS)[:-1], {"content_type": "subject", "user_id": rng.choice(user_ids)})
+        for _ in range(num_queries)
+    ]
+
+    substring = SubstringSearchStrategy(SubstringConfig(default_limit=limit), _StaticAdapter(documents))
+    _, seconds = _timed(lambda: substring.upsert_documents(documents))
+    print(f"\nSubstringSearchStrategy bulk upsert: {seconds:.2f}s")
+    indexed_total = linear_total = 0.0
+    for query, filter in substring_queries:
+        indexed, seconds = _timed(lambda: substring.rawSearch(query, filter, limit))
+        indexed_total += seconds
+        linear, seconds = _timed(lambda: _linear_substring(documents, query, filter, limit))
+        linear_total += seconds
+        assert [d.chunk_id for d in indexed] == [d.chunk_id for d in linear], query
+    print(f"  query, n-gram index: {indexed_total / num_queries * 1000:9.2f} ms")
+    print(f"  query, linear scan:  {linear_total / num_queries * 1000:9.2f} ms")
+
+    fuzzy_config = RapidFuzzConfig(default_limit=limit)
+    fuzzy = RapidFuzzSearchStrategy(fuzzy_config, _StaticAdapter(documents))
+    _, seconds = _timed(lambda: fuzzy.upsert_documents(documents))
+    print(f"\nRapidFuzzSearchStrategy bulk upsert: {seconds:.2f}s")
+    indexed_total = linear_total = 0.0
+    recall = []
+    for query, filter in fuzzy_queries:
+        indexed, seconds = _timed(lambda: fuzzy.rawSearch(query, filter, limit))
+        indexed_total += seconds
+        linear, seconds = _timed(lambda: _linear_fuzzy(documents, query, filter, limit, fuzzy_config))
+        linear_total += seconds
+        if linear:
+            recall.append(len({d.chunk_id for d in indexed} & set(linear)) / len(linear))
+    print(f"  query, n-gram prefilter: {indexed_total / num_queries * 1000:9.2f} ms")
+    print(f"  query, linear scan:      {linear_total / num_queries * 1000:9.2f} ms")
+    if recall:
+        print(f"  recall vs linear scan:   {sum(recall) / len(recall):9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+    run(args.messages, args.users, args.queries)
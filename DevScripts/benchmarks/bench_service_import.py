@@ -0,0 +1,73 @@
+"""
+Startup benchmark: import every service package under APIs/ in one process.
+
+Services are imported one after another, the way an agent harness loading the
+full tool catalogue does, so any per-import work that scales with the number
+of already-imported modules shows up as a growing per-service time.
+
+Usage:
+    python DevScripts/benchmarks/bench_service_import.py [--only gmail,jira]
+        [--top 15]
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+SKIPPED_DIRS = {"common_utils", "service_template", "__pycache__"}
+
+
+def discover_service_packages():
+    services = []
+    for name in sorted(os.listdir(APIS_DIR)):
+        path = os.path.join(APIS_DIR, name)
+        if name in SKIPPED_DIRS or name.startswith("."):
+            continue
+        if os.path.isfile(os.path.join(path, "__init__.py")):
+            services.append(name)
+    return services
+
+
+def run(services, top: int):
+    import common_utils  # framework import is shared by every service; time it separately
+
+    timings = []
+    failures = {}
+    total_start = time.perf_counter()
+    for service in services:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(service)
+        except Exception as e:  # a service with a missing optional dependency should not stop the run
+            failures[service] = f"{type(e).__name__}: {e}"
+            traceback.print_exc(limit=1, file=sys.stderr)
+            continue
+        timings.append((service, time.perf_counter() - start))
+    total = time.perf_counter() - total_start
+
+    print(f"Imported {len(timings)}/{len(services)} services in {total:.2f}s")
+    if timings:
+        print(f"  mean per service: {sum(t for _, t in timings) / len(timings) * 1000:.1f} ms")
+    print(f"  slowest {min(top, len(timings))}:")
+    for service, seconds in sorted(timings, key=lambda item: item[1], reverse=True)[:top]:
+        print(f"    {service:<30} {seconds * 1000:9.1f} ms")
+    if failures:
+        print(f"  failed ({len(failures)}):")
+        for service, error in failures.items():
+            print(f"    {service:<30} {error[:100]}")
+    return timings, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="Comma separated list of services to import")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    selected = args.only.split(",") if args.only else discover_service_packages()
+    run(selected, args.top)
@@ -0,0 +1,64 @@
+"""
+Benchmark for filling and reading a large sheet through spreadsheets.values.
+
+Fills a sheet row by row with batchUpdate (one range per row, `--batch` ranges
+per call), then reads short row windows and a whole column with get. Each write
+and read looks up the stored ranges it overlaps through the range index of the
+spreadsheet (google_sheets/SimulationEngine/range_index.py), so the cost per
+call does not grow with the number of ranges already stored.
+
+Usage:
+    python DevScripts/benchmarks/bench_sheets_fill.py [--rows 100000] [--batch 1000] [--reads 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import google_sheets
+
+
+def run(rows: int, batch: int, reads: int):
+    spreadsheet_id = google_sheets.create_spreadsheet(spreadsheet={
+        "properties": {"title": "Benchmark"},
+        "sheets": [{"properties": {"title": "Sheet1", "sheetId": "0", "index": 0}}],
+    })["id"]
+
+    start = time.perf_counter()
+    for first in range(1, rows + 1, batch):
+        google_sheets.batch_update_spreadsheet_values(spreadsheet_id, "RAW", [
+            {"range": f"Sheet1!A{r}:C{r}", "values": [[f"row {r}", str(r), str(r * 2)]]}
+            for r in range(first, min(first + batch, rows + 1))
+        ])
+    fill = time.perf_counter() - start
+
+    step = max(1, rows // reads)
+    start = time.perf_counter()
+    for r in range(1, rows + 1, step):
+        google_sheets.get_spreadsheet_values(spreadsheet_id, f"Sheet1!A{r}:C{r + 9}")
+    window_reads = time.perf_counter() - start
+
+    start = time.perf_counter()
+    column = google_sheets.get_spreadsheet_values(spreadsheet_id, f"Sheet1!B1:B{rows}")["values"]
+    column_read = time.perf_counter() - start
+
+    calls = (rows + batch - 1) // batch
+    print(f"{rows} rows in {calls} batchUpdate calls of {batch} ranges")
+    print(f"  {'fill':<26} {fill:8.2f} s  {fill / rows * 1e6:8.1f} us/row")
+    print(f"  {'10-row window reads':<26} {window_reads:8.2f} s  "
+          f"{window_reads / len(range(1, rows + 1, step)) * 1e3:8.2f} ms/read")
+    print(f"  {'whole column read':<26} {column_read:8.2f} s  ({len(column)} rows)")
+    return fill, window_reads, column_read
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--reads", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.rows, args.batch, args.reads)
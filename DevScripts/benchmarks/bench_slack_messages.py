@@ -0,0 +1,100 @@
+"""
+Benchmark for slack search_messages and Conversations history/replies paging.
+
+Fills the slack DB with `--channels` channels of `--messages` synthetic
+messages each, then times:
+
+- search_messages with user, channel, has: and wildcard filters, once with
+  every message flattened and filtered one comprehension after another (as
+  before) and once starting from the candidates of the message index,
+- paging through a channel with Conversations.history, scanning the channel
+  for every page (as before) and bisecting the channel timeline.
+
+Usage:
+    python DevScripts/benchmarks/bench_slack_messages.py [--channels 50] [--messages 2000] [--calls 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import slack
+from slack.SimulationEngine.db import DB
+from slack.SimulationEngine.message_index import MessageSearchIndex, message_index
+
+WORDS = ["deploy", "release", "review", "budget", "lunch", "incident", "rollback", "design", "hiring", "launch",
+         "metrics", "standup", "retro", "invoice", "roadmap", "customer", "feedback", "bug", "fix", "docs"]
+QUERIES = ["from:@user7 in:#channel-3", "has:star from:@user2", "rollb* in:#channel-10",
+           "has:link has:reaction", "incid* from:@user11"]
+
+
+def _build_db(channels: int, messages: int) -> None:
+    rng = random.Random(0)
+    users = {f"U{i}": {"id": f"U{i}", "name": f"user{i}"} for i in range(20)}
+    channel_data = {}
+    for c in range(channels):
+        history = []
+        for m in range(messages):
+            history.append({
+                "ts": f"{1700000000 + m * 60}.{c:06d}",
+                "user": f"U{rng.randrange(20)}",
+                "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))),
+                "reactions": [{"name": "eyes", "users": ["U1"], "count": 1}] if rng.random() < 0.1 else [],
+                "links": ["https://example.com"] if rng.random() < 0.05 else [],
+                "is_starred": rng.random() < 0.05,
+            })
+        channel_data[f"C{c}"] = {"id": f"C{c}", "name": f"channel-{c}", "messages": history,
+                                 "conversations": {"members": list(users)}, "files": {}}
+    DB.clear()
+    DB.update({"current_user": {"id": "U1"}, "users": users, "channels": channel_data, "files": {}})
+
+
+def _time(label: str, calls: int, call):
+    start = time.perf_counter()
+    for i in range(calls):
+        call(i)
+    elapsed = (time.perf_counter() - start) / calls
+    print(f"  {label:<52} {elapsed * 1e3:9.3f} ms")
+
+
+def _page_through(channel: str):
+    cursor, pages = None, 0
+    while True:
+        page = slack.get_conversation_history(channel, cursor=cursor, limit=100, oldest="0")
+        pages += 1
+        cursor = page["response_metadata"]["next_cursor"]
+        if not page["has_more"]:
+            return pages
+
+
+def run(channels: int, messages: int, calls: int):
+    _build_db(channels, messages)
+    print(f"{channels} channels of {messages} messages")
+    full_scan = MessageSearchIndex.candidates
+    with patch.object(MessageSearchIndex, "candidates", lambda self, **filters: full_scan(self)):
+        _time("search_messages, every message filtered", calls,
+              lambda i: slack.search_messages(QUERIES[i % len(QUERIES)]))
+    message_index.search_index(DB)
+    _time("search_messages, index candidates", calls, lambda i: slack.search_messages(QUERIES[i % len(QUERIES)]))
+
+    pages = _page_through("C0")
+    with patch.object(message_index, "timeline", lambda db, channel: None):
+        _time(f"history, {pages} pages of 100, channel scan per page", max(1, calls // 4),
+              lambda i: _page_through(f"C{i % channels}"))
+    _time(f"history, {pages} pages of 100, timeline bisect", max(1, calls // 4),
+          lambda i: _page_through(f"C{i % channels}"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+    run(args.channels, args.messages, args.calls)
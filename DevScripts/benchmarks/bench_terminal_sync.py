@@ -0,0 +1,76 @@
+"""
+Benchmark for the sandbox sync done around each terminal `run_command`.
+
+Builds a workspace of many small files, then runs a sequence of commands that
+each touch at most one file. With the sandbox manifest, unchanged files are not
+read again after each command and unchanged DB entries are not compared with the
+sandbox before it; without it (the old behaviour), every file is read after
+each command.
+
+Usage:
+    python DevScripts/benchmarks/bench_terminal_sync.py [--files 20000] [--commands 100]
+"""
+import argparse
+import os
+import sys
+import time
+from unittest.mock import patch
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import terminal
+from common_utils import session_manager
+from terminal.SimulationEngine.db import DB
+
+WORKSPACE = "/home/user/bench"
+
+
+def _build_db(files: int) -> None:
+    file_system = {WORKSPACE: {"path": WORKSPACE, "is_directory": True, "content_lines": [], "size_bytes": 0}}
+    for i in range(files):
+        directory = f"{WORKSPACE}/pkg_{i // 500}"
+        file_system.setdefault(directory, {"path": directory, "is_directory": True,
+                                           "content_lines": [], "size_bytes": 0})
+        path = f"{directory}/module_{i}.py"
+        lines = [f"# module {i}\n"] + [f"def f_{j}():\n    return {i} + {j}\n\n" for j in range(40)]
+        file_system[path] = {"path": path, "is_directory": False, "content_lines": lines,
+                             "size_bytes": sum(len(line) for line in lines)}
+    DB.clear()
+    DB.update({"workspace_root": WORKSPACE, "cwd": WORKSPACE, "file_system": file_system,
+               "environment": {}, "background_processes": {}})
+
+
+def _run(files: int, commands: int) -> float:
+    _build_db(files)
+    session_manager.reset_shared_session()
+    terminal.run_command("true")  # creates and dehydrates the sandbox
+    start = time.perf_counter()
+    for i in range(commands):
+        if i % 2:
+            terminal.run_command(f"echo {i} >> pkg_0/module_0.py")
+        else:
+            terminal.run_command("ls pkg_0 > /dev/null")
+    elapsed = time.perf_counter() - start
+    session_manager.reset_shared_session()
+    return elapsed
+
+
+def run(files: int, commands: int):
+    with patch.object(session_manager, "get_sandbox_manifest", return_value=None):
+        full = _run(files, commands)
+    incremental = _run(files, commands)
+    print(f"{files} files, {commands} commands")
+    print(f"  {'full sync (no manifest)':<28} {full:8.2f} s  {full / commands * 1e3:8.1f} ms/command")
+    print(f"  {'incremental sync':<28} {incremental:8.2f} s  {incremental / commands * 1e3:8.1f} ms/command")
+    print(f"  speedup: {full / incremental:.1f}x")
+    return full, incremental
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--commands", type=int, default=100)
+    args = parser.parse_args()
+    run(args.files, args.commands)
@@ -0,0 +1,97 @@
+"""
+Benchmark for zendesk search and the ticket comment/audit lookups.
+
+Fills the zendesk DB with `--tickets` synthetic tickets, a tenth as many
+users, and five comments and audits per ticket, then times:
+
+- search with text terms, wildcards and status/priority/assignee/tags filters,
+  once checking every ticket and user (as before) and once checking only the
+  candidates of the collection index (SimulationEngine/collection_index.py),
+- list_ticket_comments and list_audits_for_ticket, scanning every comment
+  (as before) and reading the ticket_id posting list.
+
+Usage:
+    python DevScripts/benchmarks/bench_zendesk_search.py [--tickets 20000] [--calls 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+APIS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "APIs"))
+if APIS_DIR not in sys.path:
+    sys.path.insert(0, APIS_DIR)
+
+import zendesk
+from zendesk.SimulationEngine.db import DB
+from zendesk.SimulationEngine.collection_index import collection_index
+
+SYLLABLES = ["ba", "ker", "lo", "mi", "nus", "pra", "ti", "vel", "zo", "qua", "ren", "sto", "dy", "fen", "gal"]
+QUERIES = ["kerlo pratives", "status:open priority:urgent", "assignee:17 status:pending", "tags:vpn milo*",
+           "*velzo type:ticket", "email:user12*", "status:open OR pending tags:billing renba"]
+
+
+def _build_db(tickets: int) -> None:
+    rng = random.Random(0)
+    words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(3000)]
+    data = {"tickets": {}, "users": {}, "organizations": {}, "groups": {}, "comments": {}, "ticket_audits": {},
+            "attachments": {}}
+    for i in range(1, tickets // 10 + 1):
+        data["users"][str(i)] = {"id": i, "name": f"User {i}", "email": f"user{i}@example.com", "role": "agent",
+                                 "tags": [], "created_at": "2024-01-01T00:00:00Z",
+                                 "updated_at": "2024-01-01T00:00:00Z"}
+    for i in range(1, tickets + 1):
+        data["tickets"][str(i)] = {
+            "id": i, "subject": " ".join(rng.choice(words) for _ in range(4)),
+            "description": " ".join(rng.choice(words) for _ in range(20)),
+            "status": rng.choice(["new", "open", "pending", "hold", "solved", "closed"]),
+            "priority": rng.choice(["low", "normal", "high", "urgent"]),
+            "assignee_id": rng.randrange(1, tickets // 10 + 1), "requester_id": rng.randrange(1, tickets // 10 + 1),
+            "organization_id": None, "group_id": None, "tags": rng.sample(["vpn", "billing", "vip", "hardware"], 1),
+            "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z",
+        }
+        for c in range(5):
+            comment_id = (i - 1) * 5 + c + 1
+            data["comments"][str(comment_id)] = {"id": comment_id, "ticket_id": i, "body": rng.choice(words),
+                                                 "attachments": []}
+            data["ticket_audits"][str(comment_id)] = {"id": comment_id, "ticket_id": i, "events": []}
+    DB.clear()
+    DB.update(data)
+
+
+def _time(label: str, calls: int, call):
+    start = time.perf_counter()
+    for i in range(calls):
+        call(i)
+    elapsed = (time.perf_counter() - start) / calls
+    print(f"  {label:<52} {elapsed * 1e3:9.3f} ms")
+
+
+def run(tickets: int, calls: int):
+    _build_db(tickets)
+    print(f"{tickets} tickets, {tickets // 10} users, {tickets * 5} comments and audits")
+    rng = random.Random(1)
+    ticket_ids = [rng.randrange(1, tickets + 1) for _ in range(calls)]
+
+    def lookups(i):
+        zendesk.list_ticket_comments(ticket_ids[i])
+        zendesk.list_audits_for_ticket(ticket_ids[i])
+
+    with patch.object(collection_index, "get", lambda db, collection: None):
+        _time("search, every item checked", calls, lambda i: zendesk.search(QUERIES[i % len(QUERIES)]))
+        _time("comments + audits of a ticket, scan", calls, lookups)
+    for i in range(len(QUERIES)):
+        zendesk.search(QUERIES[i])
+    lookups(0)
+    _time("search, index candidates checked", calls, lambda i: zendesk.search(QUERIES[i % len(QUERIES)]))
+    _time("comments + audits of a ticket, ticket_id postings", calls, lookups)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+    run(args.tickets, args.calls)